@@ -0,0 +1,54 @@
+"""add_active_transaction_indexes
+
+Revision ID: a7b8c9d0e1f2
+Revises: f1a2b3c4d5e6
+Create Date: 2026-10-18 16:00:00.000000
+
+- transactions: índices parciales (WHERE deleted_at IS NULL) para las
+  vistas mensuales, que ahora filtran el mes como rango de fechas
+  `[inicio, mes_siguiente)` en vez de `extract(year/month)`
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: str | Sequence[str] | None = 'f1a2b3c4d5e6'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_transactions_activas_profile_fecha',
+        'transactions',
+        ['profile_id', 'fecha_transaccion'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_transactions_activas_profile_categoria_fecha',
+        'transactions',
+        ['profile_id', 'subcategory_id', 'fecha_transaccion'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_transactions_activas_profile_categoria_fecha',
+        table_name='transactions',
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.drop_index(
+        'ix_transactions_activas_profile_fecha',
+        table_name='transactions',
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
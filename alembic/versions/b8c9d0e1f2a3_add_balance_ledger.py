@@ -0,0 +1,51 @@
+"""add_balance_ledger
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18 17:00:00.000000
+
+- balance_ledger: saldos diarios acumulados por perfil, cuenta y moneda,
+  para calcular el patrimonio en cualquier fecha con una búsqueda por
+  índice. Llenarlo después de migrar con:
+
+      python -m finanzas_tracker.services.balance_ledger_service
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: str | Sequence[str] | None = 'a7b8c9d0e1f2'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('balance_ledger',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('profile_id', sa.String(length=36), nullable=False, comment='ID del perfil'),
+    sa.Column('cuenta', sa.String(length=60), nullable=False, comment='Cuenta del libro (efectivo o tarjeta:<card_id>)'),
+    sa.Column('moneda', sa.String(length=3), nullable=False, comment='Moneda original de los movimientos'),
+    sa.Column('fecha', sa.Date(), nullable=False, comment='Día del saldo'),
+    sa.Column('movimiento', sa.Numeric(precision=14, scale=2), nullable=False, comment='Movimiento neto del día en la moneda original'),
+    sa.Column('saldo', sa.Numeric(precision=16, scale=2), nullable=False, comment='Saldo acumulado en la moneda original'),
+    sa.Column('saldo_crc', sa.Numeric(precision=16, scale=2), nullable=False, comment='Saldo acumulado en colones (tipo de cambio de cada movimiento)'),
+    sa.Column('ingresos_crc', sa.Numeric(precision=16, scale=2), nullable=False, comment='Ingresos acumulados en colones'),
+    sa.Column('egresos_crc', sa.Numeric(precision=16, scale=2), nullable=False, comment='Gastos acumulados en colones'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_balance_ledger_lookup', 'balance_ledger', ['profile_id', 'cuenta', 'moneda', 'fecha'], unique=True)
+    op.create_index('ix_balance_ledger_profile_fecha', 'balance_ledger', ['profile_id', 'fecha'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_balance_ledger_profile_fecha', table_name='balance_ledger')
+    op.drop_index('ix_balance_ledger_lookup', table_name='balance_ledger')
+    op.drop_table('balance_ledger')
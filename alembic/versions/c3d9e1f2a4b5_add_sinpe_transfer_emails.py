@@ -0,0 +1,55 @@
+"""add_sinpe_transfer_emails
+
+Revision ID: c3d9e1f2a4b5
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-18 10:00:00.000000
+
+- sinpe_transfer_emails: correos de transferencia ya parseados, para no
+  volver a descargarlos en cada reconciliación
+- profiles.last_sinpe_reconciliation_at: sólo se revisan transferencias
+  nuevas desde la última corrida (más las marcadas como pendientes)
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9e1f2a4b5'
+down_revision: str | Sequence[str] | None = 'a1b2c3d4e5f6'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sinpe_transfer_emails',
+    sa.Column('id', sa.String(length=36), nullable=False, comment='UUID único del registro'),
+    sa.Column('profile_id', sa.String(length=36), nullable=False, comment='ID del perfil dueño del correo'),
+    sa.Column('email_id', sa.String(length=255), nullable=False, comment='ID del mensaje en Microsoft Graph'),
+    sa.Column('beneficiario', sa.String(length=200), nullable=False, comment='Nombre del beneficiario de la transferencia'),
+    sa.Column('monto', sa.Numeric(precision=14, scale=2), nullable=False, comment='Monto transferido en colones'),
+    sa.Column('fecha', sa.DateTime(timezone=True), nullable=False, comment='Fecha de la transferencia según el correo'),
+    sa.Column('concepto', sa.String(length=500), nullable=False, comment='Concepto escrito por el usuario'),
+    sa.Column('referencia', sa.String(length=50), nullable=False, comment='Número de referencia de la transferencia'),
+    sa.Column('email_date', sa.DateTime(timezone=True), nullable=False, comment='Fecha de recepción del correo (cursor de sincronización)'),
+    sa.Column('transaction_id', sa.String(length=36), nullable=True, comment='Transacción con la que se hizo match'),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, comment='Fecha de creación del registro'),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('profile_id', 'email_id', name='uq_sinpe_transfer_emails_profile_email')
+    )
+    op.create_index('ix_sinpe_transfer_emails_profile_fecha', 'sinpe_transfer_emails', ['profile_id', 'fecha'], unique=False)
+    op.create_index('ix_sinpe_transfer_emails_profile_email_date', 'sinpe_transfer_emails', ['profile_id', 'email_date'], unique=False)
+    op.add_column('profiles', sa.Column('last_sinpe_reconciliation_at', sa.DateTime(timezone=True), nullable=True, comment='Última reconciliación de SINPEs con correos de transferencia'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('profiles', 'last_sinpe_reconciliation_at')
+    op.drop_index('ix_sinpe_transfer_emails_profile_email_date', table_name='sinpe_transfer_emails')
+    op.drop_index('ix_sinpe_transfer_emails_profile_fecha', table_name='sinpe_transfer_emails')
+    op.drop_table('sinpe_transfer_emails')
@@ -0,0 +1,46 @@
+"""add_anomaly_baselines
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-18 19:00:00.000000
+
+- anomaly_baselines: media y varianza EWMA de log(monto) por perfil y
+  comercio/subcategoría, para puntuar `transactions.anomaly_score` al
+  importar. Llenarlas (y puntuar el historial) después de migrar con:
+
+      python -m finanzas_tracker.services.anomaly_service
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: str | Sequence[str] | None = 'b8c9d0e1f2a3'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('anomaly_baselines',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('profile_id', sa.String(length=36), nullable=False, comment='ID del perfil'),
+    sa.Column('dimension', sa.String(length=20), nullable=False, comment='Dimensión de la línea base: comercio o subcategoria'),
+    sa.Column('clave', sa.String(length=255), nullable=False, comment='Comercio normalizado o ID de la subcategoría'),
+    sa.Column('n', sa.Integer(), nullable=False, comment='Transacciones observadas'),
+    sa.Column('media', sa.Float(), nullable=False, comment='Media EWMA de log(monto_crc)'),
+    sa.Column('varianza', sa.Float(), nullable=False, comment='Varianza EWMA de log(monto_crc)'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_anomaly_baselines_lookup', 'anomaly_baselines', ['profile_id', 'dimension', 'clave'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_anomaly_baselines_lookup', table_name='anomaly_baselines')
+    op.drop_table('anomaly_baselines')
@@ -0,0 +1,47 @@
+"""add_trigram_text_indexes
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-18 20:00:00.000000
+
+- pg_trgm: índices GIN `gin_trgm_ops` sobre transactions.comercio,
+  transactions.beneficiario y merchants.nombre_normalizado. Aceleran los
+  `ILIKE '%x%'` y el operador de similitud `%` de `services.text_search`.
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2a3b4c5'
+down_revision: str | Sequence[str] | None = 'c9d0e1f2a3b4'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+INDEXES = (
+    ('ix_transactions_comercio_trgm', 'transactions', 'comercio'),
+    ('ix_transactions_beneficiario_trgm', 'transactions', 'beneficiario'),
+    ('ix_merchants_nombre_normalizado_trgm', 'merchants', 'nombre_normalizado'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _column in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
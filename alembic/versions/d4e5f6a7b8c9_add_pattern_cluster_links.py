@@ -0,0 +1,50 @@
+"""add_pattern_cluster_links
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d9e1f2a4b5
+Create Date: 2026-10-18 12:00:00.000000
+
+- pattern_clusters.profile_id: los clusters se calculan por perfil
+- transaction_patterns.cluster_id: cluster al que pertenece cada patrón,
+  para buscar primero por centroides y rankear sólo sus patrones
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: str | Sequence[str] | None = 'c3d9e1f2a4b5'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pattern_clusters', sa.Column('profile_id', sa.String(length=36), nullable=True, comment='Perfil dueño del cluster (NULL = cluster global)'))
+    op.create_foreign_key('fk_pattern_clusters_profile_id', 'pattern_clusters', 'profiles', ['profile_id'], ['id'], ondelete='CASCADE')
+    op.create_index('ix_pattern_clusters_profile_id', 'pattern_clusters', ['profile_id'], unique=False)
+
+    op.add_column('transaction_patterns', sa.Column('cluster_id', sa.Integer(), nullable=True, comment='Cluster semántico asignado por merge_similar_patterns'))
+    op.create_foreign_key('fk_transaction_patterns_cluster_id', 'transaction_patterns', 'pattern_clusters', ['cluster_id'], ['id'], ondelete='SET NULL')
+    op.create_index('ix_transaction_patterns_cluster_id', 'transaction_patterns', ['cluster_id'], unique=False)
+
+    # Búsqueda por centroide más cercano dentro del perfil
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_pattern_clusters_centroid_hnsw '
+        'ON pattern_clusters USING hnsw (centroid vector_cosine_ops)'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS ix_pattern_clusters_centroid_hnsw')
+    op.drop_index('ix_transaction_patterns_cluster_id', table_name='transaction_patterns')
+    op.drop_constraint('fk_transaction_patterns_cluster_id', 'transaction_patterns', type_='foreignkey')
+    op.drop_column('transaction_patterns', 'cluster_id')
+    op.drop_index('ix_pattern_clusters_profile_id', table_name='pattern_clusters')
+    op.drop_constraint('fk_pattern_clusters_profile_id', 'pattern_clusters', type_='foreignkey')
+    op.drop_column('pattern_clusters', 'profile_id')
@@ -0,0 +1,57 @@
+"""add_review_queue_indexes
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-18 22:00:00.000000
+
+- Índices parciales para la cola de revisión (`services.review_queue`):
+  transacciones con alguna marca de revisión, ingresos sin confirmar y
+  preguntas pendientes, por perfil. Los contadores y listas de revisión
+  leen sólo esas filas en vez de todo el historial del perfil.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f2a3b4c5d6'
+down_revision: str | Sequence[str] | None = 'd0e1f2a3b4c5'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+INDEXES = (
+    (
+        'ix_transactions_revision',
+        'transactions',
+        'deleted_at IS NULL AND (necesita_reconciliacion_sinpe OR es_comercio_ambiguo'
+        ' OR es_desconocida OR subcategory_id IS NULL)',
+    ),
+    ('ix_incomes_sin_confirmar', 'incomes', 'NOT confirmado AND deleted_at IS NULL'),
+    (
+        'ix_pending_questions_pendientes',
+        'pending_questions',
+        "status = 'pendiente' AND deleted_at IS NULL",
+    ),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, where in INDEXES:
+        op.create_index(
+            name,
+            table,
+            ['profile_id'],
+            unique=False,
+            postgresql_where=sa.text(where),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, where in reversed(INDEXES):
+        op.drop_index(name, table_name=table, postgresql_where=sa.text(where))
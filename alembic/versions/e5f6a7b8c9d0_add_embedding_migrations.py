@@ -0,0 +1,53 @@
+"""add_embedding_migrations
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 13:00:00.000000
+
+- embedding_migrations: checkpoint de las re-generaciones de embeddings por
+  batches, para poder reanudarlas
+- transaction_embeddings.embedding_shadow / shadow_model_version: columna
+  sombra (sin dimensión fija) para migrar de modelo sin apagar la búsqueda
+"""
+from collections.abc import Sequence
+
+from pgvector.sqlalchemy import Vector
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: str | Sequence[str] | None = 'd4e5f6a7b8c9'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('embedding_migrations',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('target', sa.String(length=50), nullable=False, comment='Tabla cuyos embeddings se regeneran'),
+    sa.Column('scope', sa.String(length=36), nullable=False, comment='ID del perfil o * para todos'),
+    sa.Column('model_version', sa.String(length=100), nullable=False, comment='Modelo de embeddings destino'),
+    sa.Column('embedding_dim', sa.Integer(), nullable=False, comment='Dimensión de los vectores del modelo destino'),
+    sa.Column('shadow', sa.Boolean(), nullable=False, comment='Escribe en embedding_shadow hasta el cutover'),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('last_key', sa.String(length=36), nullable=True, comment='Último ID procesado (cursor keyset)'),
+    sa.Column('processed', sa.Integer(), nullable=False, comment='Filas re-generadas hasta ahora'),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('target', 'scope', 'model_version', name='uq_embedding_migrations_target_model')
+    )
+    op.add_column('transaction_embeddings', sa.Column('embedding_shadow', Vector(), nullable=True, comment='Embedding con el modelo nuevo durante una migración'))
+    op.add_column('transaction_embeddings', sa.Column('shadow_model_version', sa.String(length=50), nullable=True, comment='Modelo usado para embedding_shadow'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('transaction_embeddings', 'shadow_model_version')
+    op.drop_column('transaction_embeddings', 'embedding_shadow')
+    op.drop_table('embedding_migrations')
@@ -0,0 +1,57 @@
+"""add_jobs_table
+
+Revision ID: f1a2b3c4d5e6
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 15:00:00.000000
+
+- jobs: operaciones largas de la API (embeddings, estados de cuenta,
+  onboarding) que corre un worker fuera del request. El worker toma los
+  jobs con `FOR UPDATE SKIP LOCKED` sobre ix_jobs_status_created.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a2b3c4d5e6'
+down_revision: str | Sequence[str] | None = 'e5f6a7b8c9d0'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False, comment='Tipo de job (ej: embeddings.generate)'),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('profile_id', sa.String(length=36), nullable=True, comment='Perfil al que pertenece el job'),
+    sa.Column('user_id', sa.String(length=36), nullable=True, comment='Usuario que pidió el job'),
+    sa.Column('params', sa.JSON(), nullable=False, comment='Argumentos del handler'),
+    sa.Column('progress_current', sa.Integer(), nullable=False),
+    sa.Column('progress_total', sa.Integer(), nullable=True, comment='Total de unidades (None si aún no se conoce)'),
+    sa.Column('message', sa.String(length=255), nullable=True, comment='Etapa actual, para mostrar al usuario'),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('locked_by', sa.String(length=100), nullable=True, comment='Worker que está corriendo el job'),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_status_created', 'jobs', ['status', 'created_at'], unique=False)
+    op.create_index('ix_jobs_kind_user', 'jobs', ['kind', 'user_id'], unique=False)
+    op.create_index(op.f('ix_jobs_profile_id'), 'jobs', ['profile_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_jobs_profile_id'), table_name='jobs')
+    op.drop_index('ix_jobs_kind_user', table_name='jobs')
+    op.drop_index('ix_jobs_status_created', table_name='jobs')
+    op.drop_table('jobs')
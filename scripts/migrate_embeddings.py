@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Migra los embeddings de transacciones a otro modelo/proveedor.
+
+Regenera `transaction_embeddings` por batches con checkpoint: si el proceso
+se interrumpe, volver a correrlo retoma desde el último batch guardado.
+
+El proveedor destino es el configurado en .env (VOYAGE_API_KEY, OPENAI_API_KEY
+o el modelo local). Si cambia la dimensión (ej: 384 -> 1024) hay que usar la
+columna sombra: la búsqueda sigue con los vectores viejos hasta el cutover.
+
+Uso:
+    # Regenerar en sitio (mismo modelo o misma dimensión)
+    python scripts/migrate_embeddings.py
+
+    # Cambio de modelo sin cortar la búsqueda
+    python scripts/migrate_embeddings.py --shadow
+    python scripts/migrate_embeddings.py --cutover
+
+    # Empezar de cero aunque exista un checkpoint
+    python scripts/migrate_embeddings.py --restart --batch-size 512
+"""
+
+import argparse
+import logging
+from pathlib import Path
+import sys
+
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from finanzas_tracker.core.database import SessionLocal
+from finanzas_tracker.services.embedding_migration import EmbeddingMigrationService
+from finanzas_tracker.services.embedding_service import EmbeddingService
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Punto de entrada del script."""
+    parser = argparse.ArgumentParser(
+        description="Regenera los embeddings de transacciones por batches"
+    )
+    parser.add_argument(
+        "--shadow",
+        action="store_true",
+        help="Escribir en la columna sombra hasta el cutover",
+    )
+    parser.add_argument(
+        "--cutover",
+        action="store_true",
+        help="Reemplazar los embeddings por los de la columna sombra",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Empezar de cero aunque exista un checkpoint",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=256,
+        help="Transacciones por batch (default: 256)",
+    )
+    parser.add_argument(
+        "--max-batches",
+        type=int,
+        default=None,
+        help="Detenerse después de N batches (default: hasta terminar)",
+    )
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        embedding_service = EmbeddingService(db)
+        migrator = EmbeddingMigrationService(db, batch_size=args.batch_size)
+        logger.info(
+            f"🧠 Modelo destino: {embedding_service.model_name} "
+            f"({embedding_service.embedding_dim} dims)"
+        )
+
+        if args.cutover:
+            count = migrator.cutover_transaction_embeddings(embedding_service)
+            logger.info(f"✅ Cutover completado: {count} embeddings")
+            return
+
+        checkpoint = migrator.migrate_transaction_embeddings(
+            embedding_service,
+            shadow=args.shadow,
+            restart=args.restart,
+            max_batches=args.max_batches,
+        )
+        logger.info(f"📊 {checkpoint.processed} embeddings procesados ({checkpoint.status})")
+
+    except Exception as e:
+        logger.error(f"❌ Error durante la migración: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,9 @@ Uso:
     # Regenerar embeddings (después de cambiar modelo)
     python scripts/train_learning_system.py --regenerate-embeddings
     
+    # Fusionar patrones duplicados y recalcular clusters
+    python scripts/train_learning_system.py --merge-patterns
+    
     # Dry run (sin guardar cambios)
     python scripts/train_learning_system.py --dry-run
 """
@@ -44,6 +47,7 @@ from finanzas_tracker.models.smart_learning import (
     UserLearningProfile,
 )
 from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services.embedding_migration import EmbeddingMigrationService
 from finanzas_tracker.services.smart_learning_service import SmartLearningService
 
 
@@ -72,6 +76,7 @@ class LearningTrainer:
             "patterns_updated": 0,
             "embeddings_generated": 0,
             "global_patterns_created": 0,
+            "patterns_merged": 0,
             "errors": 0,
         }
     
@@ -135,42 +140,61 @@ class LearningTrainer:
         self._print_stats()
         return self.stats
     
-    def regenerate_embeddings(self, profile_id: str | None = None) -> dict:
+    def regenerate_embeddings(self, profile_id: str | None = None, restart: bool = False) -> dict:
         """
         Regenera los embeddings para patrones existentes.
         
         Args:
             profile_id: ID del perfil (None = todos)
+            restart: Empezar de cero aunque ya exista un checkpoint
             
         Returns:
             Estadísticas
         """
         logger.info("🔄 Regenerando embeddings...")
         
-        query = self.db.query(TransactionPattern).filter(
-            TransactionPattern.deleted_at.is_(None)
+        if self.dry_run:
+            logger.info("🔄 DRY RUN - No se regeneran embeddings")
+            return self.stats
+        
+        # Por batches, con checkpoint: si se interrumpe, retoma donde quedó
+        checkpoint = EmbeddingMigrationService(self.db).migrate_pattern_embeddings(
+            profile_id, restart=restart
         )
+        self.stats["embeddings_generated"] += checkpoint.processed
+        
+        self._print_stats()
+        return self.stats
+    
+    def merge_patterns(self, profile_id: str | None = None) -> dict:
+        """
+        Fusiona patrones duplicados y recalcula los clusters semánticos.
+        
+        Args:
+            profile_id: ID del perfil (None = todos)
+            
+        Returns:
+            Estadísticas
+        """
+        logger.info("🔗 Fusionando patrones similares...")
         
-        if profile_id:
-            query = query.filter(TransactionPattern.profile_id == profile_id)
+        if self.dry_run:
+            logger.info("🔄 DRY RUN - No se fusionan patrones")
+            return self.stats
         
-        patterns = query.all()
-        logger.info(f"📊 Patrones a procesar: {len(patterns)}")
+        profile_ids = (
+            [profile_id] if profile_id else [p.id for p in self.db.query(Profile).all()]
+        )
         
-        for pattern in patterns:
+        for pid in profile_ids:
             try:
-                self.learning_service._generate_and_store_embedding(pattern)
-                self.stats["embeddings_generated"] += 1
-                
-                if self.stats["embeddings_generated"] % 100 == 0:
-                    logger.info(f"  → Procesados: {self.stats['embeddings_generated']}")
+                self.stats["patterns_merged"] += self.learning_service.merge_similar_patterns(pid)
+                self.stats["profiles_processed"] += 1
             except Exception as e:
-                logger.error(f"❌ Error en patrón {pattern.id}: {e}")
+                logger.error(f"❌ Error en perfil {pid}: {e}")
+                self.db.rollback()
                 self.stats["errors"] += 1
         
-        if not self.dry_run:
-            self.db.commit()
-        
         self._print_stats()
         return self.stats
     
@@ -452,6 +476,16 @@ def main() -> None:
         action="store_true",
         help="Solo regenerar embeddings existentes",
     )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Con --regenerate-embeddings: empezar de cero aunque haya un checkpoint",
+    )
+    parser.add_argument(
+        "--merge-patterns",
+        action="store_true",
+        help="Fusionar patrones similares y recalcular clusters",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -475,7 +509,9 @@ def main() -> None:
         trainer = LearningTrainer(db, dry_run=args.dry_run)
         
         if args.regenerate_embeddings:
-            trainer.regenerate_embeddings(args.profile_id)
+            trainer.regenerate_embeddings(args.profile_id, restart=args.restart)
+        elif args.merge_patterns:
+            trainer.merge_patterns(args.profile_id)
         elif args.profile_id:
             trainer.train_profile(args.profile_id)
         else:
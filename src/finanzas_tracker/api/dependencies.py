@@ -1,14 +1,18 @@
 """Dependencias compartidas para FastAPI."""
 
-from collections.abc import Generator
-from typing import Annotated
+from collections.abc import AsyncGenerator, Generator
+from typing import Annotated, TypeVar
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import select
-from sqlalchemy.orm import Session
-
-from finanzas_tracker.core.database import get_session
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from finanzas_tracker.config.settings import settings
+from finanzas_tracker.core.cache import identity_cache
+from finanzas_tracker.core.database import get_async_session, get_session
 from finanzas_tracker.models.profile import Profile
 from finanzas_tracker.models.user import User
 from finanzas_tracker.services.auth_service import auth_service
@@ -25,8 +29,75 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
-# Type alias para inyección de dependencias
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency para obtener sesión async (routers `async def`)."""
+    async with get_async_session() as session:
+        yield session
+
+
+# Type aliases para inyección de dependencias
 DBSession = Annotated[Session, Depends(get_db)]
+AsyncDBSession = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+# =============================================================================
+# IDENTITY CACHE
+# =============================================================================
+
+ModelT = TypeVar("ModelT", User, Profile)
+
+ACTIVE_PROFILE_KEY = "active_profile"
+
+
+def _snapshot(instance: ModelT) -> ModelT:
+    """
+    Copia desacoplada de las columnas de un modelo, apta para cachear.
+
+    La copia no pertenece a ninguna sesión ni se expira con los commits.
+    """
+    mapper = inspect(instance).mapper
+    copy: ModelT = mapper.class_manager.new_instance()
+    for attr in mapper.column_attrs:
+        set_committed_value(copy, attr.key, getattr(instance, attr.key))
+    make_transient_to_detached(copy)
+    return copy
+
+
+def _cached_snapshot(key: str, model: type[ModelT]) -> ModelT | None:
+    """Copia cacheada de la entidad, o None si no hay (o el cache está apagado)."""
+    if settings.identity_cache_ttl_seconds <= 0:
+        return None
+    snapshot = identity_cache.get(key)
+    if not isinstance(snapshot, model):
+        return None
+    return snapshot
+
+
+def _cached(db: Session, key: str, model: type[ModelT]) -> ModelT | None:
+    """
+    Busca una entidad en el cache de identidad y la asocia a la sesión.
+
+    `merge(load=False)` adjunta la copia sin hacer SELECT; las relaciones
+    se cargan normalmente si el endpoint las usa.
+    """
+    snapshot = _cached_snapshot(key, model)
+    if snapshot is None:
+        return None
+    return db.merge(snapshot, load=False)
+
+
+async def _cached_async(db: AsyncSession, key: str, model: type[ModelT]) -> ModelT | None:
+    """Igual que `_cached`, para una AsyncSession."""
+    snapshot = _cached_snapshot(key, model)
+    if snapshot is None:
+        return None
+    return await db.merge(snapshot, load=False)
+
+
+def _remember(key: str, instance: ModelT) -> None:
+    """Guarda una copia de la entidad en el cache de identidad."""
+    if settings.identity_cache_ttl_seconds > 0:
+        identity_cache.set(key, _snapshot(instance))
 
 
 # =============================================================================
@@ -88,7 +159,13 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = auth_service.get_user_by_id(db, user_id)
+    cache_key = f"user:{user_id}"
+    user = _cached(db, cache_key, User)
+    if user is None:
+        user = auth_service.get_user_by_id(db, user_id)
+        if user is not None and user.is_active:
+            _remember(cache_key, user)
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -143,22 +220,14 @@ OptionalUser = Annotated[User | None, Depends(get_current_user_optional)]
 # =============================================================================
 
 
-def get_active_profile(db: DBSession) -> Profile:
-    """
-    Obtiene el perfil activo actual.
-
-    Returns:
-        Profile activo
+_ACTIVE_PROFILE_STMT = select(Profile).where(
+    Profile.es_activo == True,
+    Profile.activo == True,
+)
 
-    Raises:
-        HTTPException: Si no hay perfil activo configurado
-    """
-    stmt = select(Profile).where(
-        Profile.es_activo == True,
-        Profile.activo == True,
-    )
-    profile = db.execute(stmt).scalar_one_or_none()
 
+def _active_profile_or_404(profile: Profile | None) -> Profile:
+    """Cachea el perfil encontrado o responde 404 si no hay perfil activo."""
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -169,8 +238,48 @@ def get_active_profile(db: DBSession) -> Profile:
             },
         )
 
+    _remember(ACTIVE_PROFILE_KEY, profile)
     return profile
 
 
-# Type alias para perfil activo
+def get_active_profile(db: DBSession) -> Profile:
+    """
+    Obtiene el perfil activo actual.
+
+    El resultado se cachea unos segundos (ver `invalidate_identity_cache`).
+
+    Returns:
+        Profile activo
+
+    Raises:
+        HTTPException: Si no hay perfil activo configurado
+    """
+    cached_profile = _cached(db, ACTIVE_PROFILE_KEY, Profile)
+    if cached_profile is not None:
+        return cached_profile
+
+    profile = db.execute(_ACTIVE_PROFILE_STMT).scalar_one_or_none()
+    return _active_profile_or_404(profile)
+
+
+async def get_active_profile_async(db: AsyncDBSession) -> Profile:
+    """
+    Versión async de `get_active_profile` (mismo cache de identidad).
+
+    Returns:
+        Profile activo, asociado a la AsyncSession del request
+
+    Raises:
+        HTTPException: Si no hay perfil activo configurado
+    """
+    cached_profile = await _cached_async(db, ACTIVE_PROFILE_KEY, Profile)
+    if cached_profile is not None:
+        return cached_profile
+
+    profile = (await db.execute(_ACTIVE_PROFILE_STMT)).scalar_one_or_none()
+    return _active_profile_or_404(profile)
+
+
+# Type aliases para perfil activo
 ActiveProfile = Annotated[Profile, Depends(get_active_profile)]
+AsyncActiveProfile = Annotated[Profile, Depends(get_active_profile_async)]
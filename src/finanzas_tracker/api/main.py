@@ -9,6 +9,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from finanzas_tracker.api.errors import setup_exception_handlers
 from finanzas_tracker.api.middleware import setup_middlewares
@@ -19,6 +20,7 @@ from finanzas_tracker.api.routers import (
     cards,
     categories,
     expenses,
+    jobs,
     notifications,
     onboarding,
     patrimony,
@@ -29,12 +31,15 @@ from finanzas_tracker.api.routers import (
     transactions,
 )
 from finanzas_tracker.config.settings import settings
+from finanzas_tracker.core.cache import render_cache_metrics
 from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.core.metrics import render_prometheus
 from finanzas_tracker.services.embedding_events import (
     register_embedding_events,
     start_embedding_worker,
     stop_embedding_worker,
 )
+from finanzas_tracker.services.job_queue import start_job_worker, stop_job_worker
 from finanzas_tracker.services.sync_scheduler import (
     start_background_tasks,
     stop_background_tasks,
@@ -55,6 +60,11 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     start_embedding_worker()
     logger.info("✅ Sistema de auto-embeddings activado")
 
+    # Worker de jobs (embeddings, estados de cuenta, onboarding)
+    if settings.job_worker_in_api:
+        start_job_worker()
+        logger.info("✅ Worker de jobs iniciado")
+
     # Iniciar tareas de fondo (sync emails, card alerts, etc.)
     start_background_tasks()
     logger.info("✅ Tareas de fondo programadas")
@@ -65,6 +75,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("🛑 Deteniendo Finanzas Tracker API...")
     stop_background_tasks()
     logger.info("✅ Tareas de fondo detenidas")
+    stop_job_worker()
     stop_embedding_worker()
     logger.info("✅ API detenida correctamente")
 
@@ -132,6 +143,7 @@ app.include_router(reconciliation.router, prefix="/api/v1", tags=["Reconciliaci
 app.include_router(subscriptions.router, prefix="/api/v1", tags=["Suscripciones"])
 app.include_router(expenses.router, prefix="/api/v1", tags=["Gastos Proyectados"])
 app.include_router(ai.router, prefix="/api/v1", tags=["AI & RAG"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["Jobs"])
 
 
 @app.get("/", tags=["Root"])
@@ -154,3 +166,9 @@ async def health_check() -> dict[str, str]:
         "database": "postgresql",
         "environment": settings.environment,
     }
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics() -> str:
+    """Histogramas de latencia y contadores de cache en formato de texto de Prometheus."""
+    return render_prometheus() + render_cache_metrics()
@@ -7,6 +7,7 @@ from finanzas_tracker.api.routers import (
     cards,
     categories,
     expenses,
+    jobs,
     notifications,
     onboarding,
     patrimony,
@@ -25,6 +26,7 @@ __all__ = [
     "cards",
     "categories",
     "expenses",
+    "jobs",
     "notifications",
     "onboarding",
     "patrimony",
@@ -4,16 +4,26 @@ Router para endpoints de AI - RAG, Chat, Embeddings.
 Proporciona:
 - /ai/chat - Chat con contexto de transacciones (RAG)
 - /ai/search - Búsqueda semántica de transacciones
-- /ai/embeddings - Gestión de embeddings
+- /ai/embeddings - Gestión de embeddings (la generación corre como job)
 - /ai/analyze - Análisis de gastos con AI
 - /ai/health - Estado del sistema de AI
+
+/ai/chat y /ai/analyze/* aceptan `stream` para responder con Server-Sent
+Events (eventos sources, delta, done/error) en vez de esperar la respuesta
+completa de Claude. Ambos son `async def` y usan el cliente async de
+Anthropic, así que esperar a Claude no ocupa hilos del threadpool; la
+búsqueda y los embeddings (CPU) siguen siendo endpoints síncronos.
 """
 
+from collections.abc import AsyncIterator
+import json
 import logging
+import math
 import time
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select, text
 from sqlalchemy.orm import Session
 
@@ -24,23 +34,106 @@ from finanzas_tracker.api.schemas.ai import (
     ChatResponse,
     EmbeddingStatsResponse,
     GenerateEmbeddingsRequest,
-    GenerateEmbeddingsResponse,
     SemanticSearchRequest,
     SemanticSearchResponse,
     SemanticSearchResult,
     TransactionContext,
 )
+from finanzas_tracker.api.schemas.job import JobResponse
+from finanzas_tracker.core.claude_client import get_token_usage
+from finanzas_tracker.core.claude_credits import ClaudeCircuitOpen, ClaudeServiceUnavailable
+from finanzas_tracker.core.claude_limits import get_claude_limits_status
+from finanzas_tracker.core.metrics import histogram
 from finanzas_tracker.models.embedding import TransactionEmbedding
 from finanzas_tracker.models.profile import Profile
 from finanzas_tracker.models.transaction import Transaction
 from finanzas_tracker.services.embedding_service import EmbeddingService
-from finanzas_tracker.services.rag_service import RAGService
+from finanzas_tracker.services.job_queue import EMBEDDINGS_GENERATE, enqueue_job
+from finanzas_tracker.services.rag_service import (
+    TTFT_HELP,
+    TTFT_METRIC,
+    RAGContext,
+    RAGService,
+    RAGStreamEvent,
+)
+from finanzas_tracker.services.text_search import ranked
 
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai", tags=["AI & RAG"])
 
+# Latencia de los endpoints de AI (expuesta en /metrics y /ai/health)
+_LATENCY_METRIC = "ai_request_duration_seconds"
+_LATENCY_HELP = "Latencia de los endpoints de AI en segundos"
+SEARCH_LATENCY = histogram(_LATENCY_METRIC, _LATENCY_HELP, endpoint="/ai/search")
+CHAT_LATENCY = histogram(_LATENCY_METRIC, _LATENCY_HELP, endpoint="/ai/chat")
+CHAT_TTFT = histogram(TTFT_METRIC, TTFT_HELP, endpoint="/ai/chat")
+
+
+# =============================================================================
+# Streaming (Server-Sent Events)
+# =============================================================================
+
+
+def _to_sources(contexts: list[RAGContext]) -> list[TransactionContext]:
+    """Convierte contextos RAG al schema de la API."""
+    return [
+        TransactionContext(
+            transaction_id=ctx.transaction_id,
+            comercio=ctx.comercio,
+            monto_crc=ctx.monto_crc,
+            fecha=ctx.fecha,
+            categoria=ctx.categoria,
+            similarity=ctx.similarity,
+        )
+        for ctx in contexts
+    ]
+
+
+async def _sse_events(events: AsyncIterator[RAGStreamEvent]) -> AsyncIterator[str]:
+    """Serializa los eventos del RAG como frames SSE (`event:` + `data:` JSON)."""
+    async for event in events:
+        data = event.data
+        if event.event == "sources":
+            data = {
+                "sources": [
+                    source.model_dump(mode="json") for source in _to_sources(data["sources"])
+                ]
+            }
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        yield f"event: {event.event}\ndata: {payload}\n\n"
+
+
+def _sse_response(events: AsyncIterator[RAGStreamEvent]) -> StreamingResponse:
+    """StreamingResponse SSE sin buffering en proxies."""
+    return StreamingResponse(
+        _sse_events(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _claude_unavailable(error: ClaudeServiceUnavailable) -> HTTPException:
+    """
+    Error HTTP cuando Claude no se puede usar para esta request.
+
+    429 si el perfil agotó su presupuesto diario de tokens; 503 con
+    Retry-After si el circuit breaker está abierto (Claude saturado).
+    """
+    logger.info(f"Claude no disponible para la request: {error.message}")
+    suggestion = "Usa /api/v1/ai/search para búsqueda semántica gratuita."
+    if isinstance(error, ClaudeCircuitOpen):
+        return HTTPException(
+            status_code=503,
+            detail={"error": error.message, "code": "AI_OVERLOADED", "suggestion": suggestion},
+            headers={"Retry-After": str(math.ceil(error.retry_after))},
+        )
+    return HTTPException(
+        status_code=429,
+        detail={"error": error.message, "code": "TOKEN_BUDGET_EXCEEDED", "suggestion": suggestion},
+    )
+
 
 # =============================================================================
 # Health Check
@@ -59,6 +152,7 @@ def ai_health_check(
     - Estado del modelo de embeddings
     - Disponibilidad de Claude API
     - Estadísticas generales
+    - Tokens de Claude por call site (incluye aciertos del prompt cache)
     """
     health: dict[str, Any] = {
         "status": "healthy",
@@ -129,6 +223,14 @@ def ai_health_check(
     except Exception:
         pass
 
+    health["latency"] = {
+        "/ai/search": SEARCH_LATENCY.snapshot(),
+        "/ai/chat": CHAT_LATENCY.snapshot(),
+        "/ai/chat (ttft)": CHAT_TTFT.snapshot(),
+    }
+    health["claude_tokens"] = get_token_usage()
+    health["claude_limits"] = get_claude_limits_status()
+
     # Overall status
     all_ok = all(c.get("ok", False) for c in health["components"].values())
     health["status"] = "healthy" if all_ok else "degraded"
@@ -137,17 +239,22 @@ def ai_health_check(
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat_with_context(
+@CHAT_LATENCY.timed
+async def chat_with_context(
     request: ChatRequest,
     db: Session = Depends(get_db),
     profile: Profile = Depends(get_active_profile),
-) -> ChatResponse:
+) -> ChatResponse | StreamingResponse:
     """
     Chat con contexto de transacciones usando RAG.
 
     Usa búsqueda semántica para encontrar transacciones relevantes
     y Claude AI para generar respuestas informadas.
 
+    Con `stream: true` responde con Server-Sent Events: `sources`,
+    luego un `delta` por fragmento de texto y al final `done` (uso de
+    tokens y time-to-first-token) o `error`.
+
     Ejemplos de preguntas:
     - "Cuánto gasté en comida este mes?"
     - "Mis compras más grandes de la semana"
@@ -155,36 +262,34 @@ def chat_with_context(
 
     Nota: Requiere API key de Anthropic válida con créditos disponibles.
     """
+    if request.stream:
+        return _sse_response(
+            RAGService(db).chat_stream(
+                query=request.query,
+                profile_id=profile.id,
+                include_stats=request.include_stats,
+                max_context_items=request.max_context,
+            )
+        )
+
     try:
-        rag = RAGService(db)
-        response = rag.chat(
+        response = await RAGService(db).achat(
             query=request.query,
             profile_id=profile.id,
             include_stats=request.include_stats,
             max_context_items=request.max_context,
         )
 
-        # Convertir contextos a schema
-        sources = [
-            TransactionContext(
-                transaction_id=ctx.transaction_id,
-                comercio=ctx.comercio,
-                monto_crc=ctx.monto_crc,
-                fecha=ctx.fecha,
-                categoria=ctx.categoria,
-                similarity=ctx.similarity,
-            )
-            for ctx in response.sources
-        ]
-
         return ChatResponse(
             answer=response.answer,
-            sources=sources,
+            sources=_to_sources(response.sources),
             model=response.model,
             usage=response.usage,
             query=response.query,
         )
 
+    except ClaudeServiceUnavailable as e:
+        raise _claude_unavailable(e)
     except ValueError as e:
         raise HTTPException(
             status_code=400,
@@ -230,6 +335,7 @@ def chat_with_context(
 
 
 @router.post("/search", response_model=SemanticSearchResponse)
+@SEARCH_LATENCY.timed
 def semantic_search(
     request: SemanticSearchRequest,
     db: Session = Depends(get_db),
@@ -248,45 +354,28 @@ def semantic_search(
 
     Si no hay embeddings, usa búsqueda por texto como fallback.
     """
-    start_time = time.time()
-
     try:
         embedding_service = EmbeddingService(db)
 
-        results = embedding_service.search_similar(
+        hits = embedding_service.search_hits(
             query=request.query,
             profile_id=profile.id,
             limit=request.limit,
             min_similarity=request.min_similarity,
         )
 
-        # Convertir a schema
-        search_results = []
-        for txn, similarity in results:
-            categoria = None
-            if txn.subcategory:
-                categoria = f"{txn.subcategory.category.nombre} > {txn.subcategory.nombre}"
-
-            text_content = ""
-            if txn.embedding:
-                text_content = txn.embedding.text_content
-
-            search_results.append(
-                SemanticSearchResult(
-                    transaction_id=txn.id,
-                    comercio=txn.comercio,
-                    monto_crc=txn.monto_crc,
-                    fecha=txn.fecha_transaccion,
-                    categoria=categoria,
-                    similarity=similarity,
-                    text_content=text_content,
-                )
+        search_results = [
+            SemanticSearchResult(
+                transaction_id=hit.transaction_id,
+                comercio=hit.comercio,
+                monto_crc=hit.monto_crc,
+                fecha=hit.fecha,
+                categoria=hit.categoria,
+                similarity=hit.similarity,
+                text_content=hit.text_content,
             )
-
-        elapsed = time.time() - start_time
-        logger.debug(
-            f"Búsqueda semántica completada en {elapsed:.3f}s, {len(search_results)} resultados"
-        )
+            for hit in hits
+        ]
 
         return SemanticSearchResponse(
             results=search_results,
@@ -327,22 +416,20 @@ def _fallback_text_search(
     """
     logger.info(f"Usando fallback de búsqueda por texto para: {query}")
 
-    # Búsqueda simple por ILIKE
-    search_term = f"%{query}%"
-    stmt = (
-        select(Transaction)
-        .where(
+    # Búsqueda por trigramas, las más parecidas primero (ver services.text_search)
+    stmt = ranked(
+        select(Transaction).where(
             Transaction.profile_id == profile_id,
             Transaction.deleted_at.is_(None),
-            (
-                Transaction.comercio.ilike(search_term)
-                | Transaction.categoria_sugerida_por_ia.ilike(search_term)
-                | Transaction.notas.ilike(search_term)
-            ),
-        )
-        .order_by(Transaction.fecha_transaccion.desc())
-        .limit(limit)
-    )
+        ),
+        [
+            Transaction.comercio,
+            Transaction.categoria_sugerida_por_ia,
+            Transaction.notas,
+        ],
+        query,
+        limit=limit,
+    ).order_by(Transaction.fecha_transaccion.desc())
 
     results = db.execute(stmt).scalars().all()
 
@@ -405,88 +492,76 @@ def get_embedding_stats(
     )
 
 
-@router.post("/embeddings/generate", response_model=GenerateEmbeddingsResponse)
+@router.post(
+    "/embeddings/generate",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def generate_embeddings(
     request: GenerateEmbeddingsRequest,
     db: Session = Depends(get_db),
     profile: Profile = Depends(get_active_profile),
-) -> GenerateEmbeddingsResponse:
+) -> JobResponse:
     """
     Genera embeddings para transacciones pendientes.
 
     Procesa todas las transacciones del perfil que no tienen
     embedding generado. Útil después de importar muchas
     transacciones nuevas.
-    """
-    try:
-        embedding_service = EmbeddingService(db)
-
-        count = embedding_service.embed_pending_transactions(
-            profile_id=profile.id,
-            batch_size=request.batch_size,
-        )
-
-        message = (
-            f"Se generaron {count} embeddings"
-            if count > 0
-            else "Todas las transacciones ya tienen embedding"
-        )
-
-        return GenerateEmbeddingsResponse(
-            generated=count,
-            model=embedding_service.model_name,
-            message=message,
-        )
 
-    except Exception as e:
-        logger.error(f"Error generando embeddings: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail={"error": "Error generando embeddings", "code": "EMBEDDING_ERROR"},
-        )
+    Responde 202 con un job; el avance y el resultado
+    (`generated`, `model`) se consultan en `GET /jobs/{id}`.
+    """
+    job = enqueue_job(
+        db,
+        EMBEDDINGS_GENERATE,
+        params={"batch_size": request.batch_size},
+        profile_id=profile.id,
+    )
+    return JobResponse.model_validate(job)
 
 
 @router.post("/analyze/spending", response_model=ChatResponse)
-def analyze_spending(
+async def analyze_spending(
     request: AnalyzeSpendingRequest,
     db: Session = Depends(get_db),
     profile: Profile = Depends(get_active_profile),
-) -> ChatResponse:
+) -> ChatResponse | StreamingResponse:
     """
     Analiza patrones de gasto con AI.
 
     Genera un análisis detallado de los gastos del usuario
     para un período específico, opcionalmente filtrado por categoría.
+    Con `stream: true` responde con Server-Sent Events (ver /ai/chat).
     """
+    if request.stream:
+        return _sse_response(
+            RAGService(db).chat_stream(
+                query=RAGService.spending_query(request.category, request.year, request.month),
+                profile_id=profile.id,
+                max_context_items=20,
+                endpoint="/ai/analyze/spending",
+            )
+        )
+
     try:
-        rag = RAGService(db)
-        response = rag.analyze_spending(
+        response = await RAGService(db).achat(
+            query=RAGService.spending_query(request.category, request.year, request.month),
             profile_id=profile.id,
-            category=request.category,
-            year=request.year,
-            month=request.month,
+            max_context_items=20,
+            endpoint="/ai/analyze/spending",
         )
 
-        sources = [
-            TransactionContext(
-                transaction_id=ctx.transaction_id,
-                comercio=ctx.comercio,
-                monto_crc=ctx.monto_crc,
-                fecha=ctx.fecha,
-                categoria=ctx.categoria,
-                similarity=ctx.similarity,
-            )
-            for ctx in response.sources
-        ]
-
         return ChatResponse(
             answer=response.answer,
-            sources=sources,
+            sources=_to_sources(response.sources),
             model=response.model,
             usage=response.usage,
             query=response.query,
         )
 
+    except ClaudeServiceUnavailable as e:
+        raise _claude_unavailable(e)
     except Exception as e:
         logger.error(f"Error en análisis de gastos: {e}")
         raise HTTPException(
@@ -496,40 +571,46 @@ def analyze_spending(
 
 
 @router.get("/analyze/savings", response_model=ChatResponse)
-def suggest_savings(
+async def suggest_savings(
     db: Session = Depends(get_db),
     profile: Profile = Depends(get_active_profile),
-) -> ChatResponse:
+    stream: bool = Query(False, description="Responder con Server-Sent Events"),
+) -> ChatResponse | StreamingResponse:
     """
     Sugiere áreas donde ahorrar dinero.
 
     Analiza las transacciones recientes y sugiere
     oportunidades de ahorro basadas en patrones de gasto.
+    Con `?stream=true` responde con Server-Sent Events (ver /ai/chat).
     """
-    try:
-        rag = RAGService(db)
-        response = rag.suggest_savings(profile_id=profile.id)
-
-        sources = [
-            TransactionContext(
-                transaction_id=ctx.transaction_id,
-                comercio=ctx.comercio,
-                monto_crc=ctx.monto_crc,
-                fecha=ctx.fecha,
-                categoria=ctx.categoria,
-                similarity=ctx.similarity,
+    if stream:
+        return _sse_response(
+            RAGService(db).chat_stream(
+                query=RAGService.SAVINGS_QUERY,
+                profile_id=profile.id,
+                max_context_items=30,
+                endpoint="/ai/analyze/savings",
             )
-            for ctx in response.sources
-        ]
+        )
+
+    try:
+        response = await RAGService(db).achat(
+            query=RAGService.SAVINGS_QUERY,
+            profile_id=profile.id,
+            max_context_items=30,
+            endpoint="/ai/analyze/savings",
+        )
 
         return ChatResponse(
             answer=response.answer,
-            sources=sources,
+            sources=_to_sources(response.sources),
             model=response.model,
             usage=response.usage,
             query=response.query,
         )
 
+    except ClaudeServiceUnavailable as e:
+        raise _claude_unavailable(e)
     except Exception as e:
         logger.error(f"Error en sugerencias de ahorro: {e}")
         raise HTTPException(
@@ -539,40 +620,46 @@ def suggest_savings(
 
 
 @router.get("/analyze/anomalies", response_model=ChatResponse)
-def detect_anomalies(
+async def detect_anomalies(
     db: Session = Depends(get_db),
     profile: Profile = Depends(get_active_profile),
-) -> ChatResponse:
+    stream: bool = Query(False, description="Responder con Server-Sent Events"),
+) -> ChatResponse | StreamingResponse:
     """
     Detecta transacciones inusuales o anómalas.
 
     Revisa las transacciones recientes e identifica
     patrones inusuales o gastos fuera de lo normal.
+    Con `?stream=true` responde con Server-Sent Events (ver /ai/chat).
     """
-    try:
-        rag = RAGService(db)
-        response = rag.detect_anomalies(profile_id=profile.id)
-
-        sources = [
-            TransactionContext(
-                transaction_id=ctx.transaction_id,
-                comercio=ctx.comercio,
-                monto_crc=ctx.monto_crc,
-                fecha=ctx.fecha,
-                categoria=ctx.categoria,
-                similarity=ctx.similarity,
+    if stream:
+        return _sse_response(
+            RAGService(db).chat_stream(
+                query=RAGService.ANOMALIES_QUERY,
+                profile_id=profile.id,
+                max_context_items=30,
+                endpoint="/ai/analyze/anomalies",
             )
-            for ctx in response.sources
-        ]
+        )
+
+    try:
+        response = await RAGService(db).achat(
+            query=RAGService.ANOMALIES_QUERY,
+            profile_id=profile.id,
+            max_context_items=30,
+            endpoint="/ai/analyze/anomalies",
+        )
 
         return ChatResponse(
             answer=response.answer,
-            sources=sources,
+            sources=_to_sources(response.sources),
             model=response.model,
             usage=response.usage,
             query=response.query,
         )
 
+    except ClaudeServiceUnavailable as e:
+        raise _claude_unavailable(e)
     except Exception as e:
         logger.error(f"Error detectando anomalías: {e}")
         raise HTTPException(
@@ -1,12 +1,12 @@
-"""Router de Presupuestos - CRUD + resumen."""
+"""Router de Presupuestos - CRUD + resumen (async, sobre AsyncSession)."""
 
 from datetime import date
 from decimal import Decimal
 
 from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 
-from finanzas_tracker.api.dependencies import ActiveProfile, DBSession
+from finanzas_tracker.api.dependencies import AsyncActiveProfile, AsyncDBSession
 from finanzas_tracker.api.schemas.budget import (
     BudgetCreate,
     BudgetListResponse,
@@ -18,15 +18,16 @@ from finanzas_tracker.api.schemas.budget import (
 from finanzas_tracker.models.budget import Budget
 from finanzas_tracker.models.category import Category, Subcategory
 from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.repositories.filters import in_month
 
 
 router = APIRouter(prefix="/budgets")
 
 
 @router.get("", response_model=BudgetListResponse)
-def list_budgets(
-    db: DBSession,
-    profile: ActiveProfile,
+async def list_budgets(
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
     mes: date | None = Query(None, description="Filtrar por mes (YYYY-MM-01)"),
 ) -> BudgetListResponse:
     """Lista presupuestos del perfil activo."""
@@ -36,7 +37,7 @@ def list_budgets(
         stmt = stmt.where(Budget.mes == mes)
 
     stmt = stmt.order_by(Budget.mes.desc())
-    budgets = db.execute(stmt).scalars().all()
+    budgets = (await db.execute(stmt)).scalars().all()
 
     return BudgetListResponse(
         items=[BudgetResponse.model_validate(b) for b in budgets],
@@ -45,10 +46,10 @@ def list_budgets(
 
 
 @router.post("", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
-def create_budget(
+async def create_budget(
     data: BudgetCreate,
-    db: DBSession,
-    profile: ActiveProfile,
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> BudgetResponse:
     """
     Crea un nuevo presupuesto para una categoría en un mes.
@@ -61,7 +62,7 @@ def create_budget(
         Budget.category_id == data.category_id,
         Budget.mes == data.mes,
     )
-    existing = db.execute(stmt).scalar_one_or_none()
+    existing = (await db.execute(stmt)).scalar_one_or_none()
 
     if existing:
         raise HTTPException(
@@ -83,25 +84,25 @@ def create_budget(
     )
 
     db.add(budget)
-    db.commit()
-    db.refresh(budget)
+    await db.commit()
+    await db.refresh(budget)
 
     return BudgetResponse.model_validate(budget)
 
 
 @router.patch("/{budget_id}", response_model=BudgetResponse)
-def update_budget(
+async def update_budget(
     budget_id: str,
     data: BudgetUpdate,
-    db: DBSession,
-    profile: ActiveProfile,
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> BudgetResponse:
     """Actualiza un presupuesto existente."""
     stmt = select(Budget).where(
         Budget.id == budget_id,
         Budget.profile_id == profile.id,
     )
-    budget = db.execute(stmt).scalar_one_or_none()
+    budget = (await db.execute(stmt)).scalar_one_or_none()
 
     if not budget:
         raise HTTPException(
@@ -115,24 +116,24 @@ def update_budget(
             budget.monto_limite = value  # Actualizar alias también
         setattr(budget, field, value)
 
-    db.commit()
-    db.refresh(budget)
+    await db.commit()
+    await db.refresh(budget)
 
     return BudgetResponse.model_validate(budget)
 
 
 @router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_budget(
+async def delete_budget(
     budget_id: str,
-    db: DBSession,
-    profile: ActiveProfile,
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> None:
     """Elimina un presupuesto."""
     stmt = select(Budget).where(
         Budget.id == budget_id,
         Budget.profile_id == profile.id,
     )
-    budget = db.execute(stmt).scalar_one_or_none()
+    budget = (await db.execute(stmt)).scalar_one_or_none()
 
     if not budget:
         raise HTTPException(
@@ -140,14 +141,14 @@ def delete_budget(
             detail={"error": "Presupuesto no encontrado", "code": "BUDGET_NOT_FOUND"},
         )
 
-    db.delete(budget)
-    db.commit()
+    await db.delete(budget)
+    await db.commit()
 
 
 @router.get("/summary", response_model=BudgetSummaryResponse)
-def get_budget_summary(
-    db: DBSession,
-    profile: ActiveProfile,
+async def get_budget_summary(
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
     mes: date = Query(..., description="Mes a consultar (YYYY-MM-01)"),
 ) -> BudgetSummaryResponse:
     """
@@ -163,11 +164,11 @@ def get_budget_summary(
 
     # Obtener categorías principales
     categories_stmt = select(Category)
-    categories = {c.tipo: c for c in db.execute(categories_stmt).scalars().all()}
+    categories = {c.tipo: c for c in (await db.execute(categories_stmt)).scalars().all()}
 
     # Obtener subcategorías agrupadas por categoría principal
     subcats_stmt = select(Subcategory)
-    subcategories = db.execute(subcats_stmt).scalars().all()
+    subcategories = (await db.execute(subcats_stmt)).scalars().all()
     subcat_to_cat = {s.id: s.category_id for s in subcategories}
     cat_id_to_tipo: dict[str, str] = {c.id: str(c.tipo) for c in categories.values()}
 
@@ -176,7 +177,7 @@ def get_budget_summary(
         Budget.profile_id == profile.id,
         Budget.mes == mes,
     )
-    budgets = db.execute(budgets_stmt).scalars().all()
+    budgets = (await db.execute(budgets_stmt)).scalars().all()
 
     # Sumar presupuestos por categoría principal
     budget_by_tipo: dict[str, Decimal] = {
@@ -196,10 +197,9 @@ def get_budget_summary(
         Transaction.profile_id == profile.id,
         Transaction.deleted_at.is_(None),
         Transaction.excluir_de_presupuesto == False,
-        func.extract("year", Transaction.fecha_transaccion) == year,
-        func.extract("month", Transaction.fecha_transaccion) == month,
+        in_month(Transaction.fecha_transaccion, year, month),
     )
-    transactions = db.execute(gastos_stmt).scalars().all()
+    transactions = (await db.execute(gastos_stmt)).scalars().all()
 
     # Sumar gastos por categoría principal
     spent_by_tipo: dict[str, Decimal] = {
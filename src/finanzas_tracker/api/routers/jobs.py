@@ -0,0 +1,42 @@
+"""
+Router de jobs en segundo plano.
+
+Las operaciones largas (embeddings, estados de cuenta, onboarding)
+responden 202 con un job; este endpoint reporta su avance desde
+cualquier worker de la API. Sólo se ven los jobs del perfil activo.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.api.dependencies import get_active_profile, get_db
+from finanzas_tracker.api.schemas.job import JobResponse
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.services.job_queue import get_job
+
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobResponse,
+    summary="Estado de un job",
+    description="Progreso, ETA y resultado de una operación en segundo plano.",
+)
+def get_job_status(
+    job_id: str,
+    db: Session = Depends(get_db),
+    profile: Profile = Depends(get_active_profile),
+) -> JobResponse:
+    """Obtiene el estado de un job del perfil activo (404 si es de otro perfil)."""
+    job = get_job(db, job_id, profile_id=profile.id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": "Job no encontrado", "code": "JOB_NOT_FOUND"},
+        )
+    return JobResponse.model_validate(job)
+
+
+__all__ = ["router"]
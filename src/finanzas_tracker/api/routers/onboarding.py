@@ -8,8 +8,10 @@ from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, s
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.api.dependencies import get_db
+from finanzas_tracker.api.schemas.job import JobResponse
 from finanzas_tracker.api.schemas.onboarding import (
     AccountsConfirmedResponse,
+    AutoDiscoverRequest,
     CardsConfirmedResponse,
     ConfirmAccountsRequest,
     ConfirmCardsRequest,
@@ -71,6 +73,30 @@ def get_onboarding_status(
     return OnboardingStateResponse(**state.to_dict())
 
 
+@router.post(
+    "/{user_id}/auto-discover",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Importar datos del correo",
+    description=(
+        "Busca estados de cuenta y correos de transacciones en segundo plano. "
+        "El avance se consulta en GET /jobs/{id} o en /onboarding/{user_id}/status."
+    ),
+)
+def auto_discover(
+    user_id: str,
+    request: AutoDiscoverRequest,
+    service: OnboardingService = Depends(get_onboarding_service),
+) -> JobResponse:
+    """Encola el onboarding automático desde el correo."""
+    job = service.enqueue_auto_discover(
+        user_id=user_id,
+        profile_id=request.profile_id,
+        max_days_back=request.max_days_back,
+    )
+    return JobResponse.model_validate(job)
+
+
 @router.post(
     "/{user_id}/upload-pdf",
     response_model=PDFProcessedResponse,
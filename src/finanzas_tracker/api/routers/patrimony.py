@@ -1,16 +1,22 @@
 """API Router para Patrimonio - Accounts, Investments, Goals, Snapshots.
 
 Endpoints para gestionar el patrimonio neto del usuario.
+
+Los endpoints son `async def` sobre AsyncSession. PatrimonyService es sync:
+sus métodos corren con `AsyncSession.run_sync` (ver `_with_service`), que
+usa la misma conexión async sin ocupar un thread del threadpool.
 """
 
-from datetime import date, datetime
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from typing import TypeVar
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from finanzas_tracker.api.dependencies import get_db
+from finanzas_tracker.api.dependencies import get_async_db
 from finanzas_tracker.api.schemas.patrimony import (
     AccountCreate,
     AccountResponse,
@@ -46,6 +52,13 @@ from finanzas_tracker.services.patrimony_service import PatrimonyService
 
 router = APIRouter(prefix="/patrimony", tags=["Patrimonio"])
 
+T = TypeVar("T")
+
+
+async def _with_service(db: AsyncSession, call: Callable[[PatrimonyService], T]) -> T:
+    """Ejecuta una llamada a PatrimonyService (sync) dentro de la AsyncSession."""
+    return await db.run_sync(lambda session: call(PatrimonyService(session)))
+
 
 # =============================================================================
 # Net Worth / Summary Endpoints
@@ -53,17 +66,18 @@ router = APIRouter(prefix="/patrimony", tags=["Patrimonio"])
 
 
 @router.get("/summary", response_model=NetWorthResponse)
-def get_net_worth_summary(
+async def get_net_worth_summary(
     profile_id: str = Query(..., description="ID del perfil"),
     exchange_rate: Decimal | None = Query(None, description="Tipo de cambio USD/CRC"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> NetWorthResponse:
     """Obtiene el resumen de patrimonio neto.
 
     Calcula el total de activos combinando cuentas, inversiones y metas.
     """
-    service = PatrimonyService(db)
-    summary = service.calculate_net_worth(profile_id, exchange_rate)
+    summary = await _with_service(
+        db, lambda service: service.calculate_net_worth(profile_id, exchange_rate)
+    )
 
     return NetWorthResponse(
         total_crc=summary.total_crc,
@@ -87,67 +101,59 @@ def get_net_worth_summary(
 
 
 @router.get("/history")
-def get_patrimony_history(
+async def get_patrimony_history(
     profile_id: str = Query(..., description="ID del perfil"),
     meses: int = Query(6, ge=1, le=24, description="Meses de historial"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[dict]:
-    """Obtiene el historial de evolución del patrimonio.
+    """Obtiene el historial diario del patrimonio.
 
-    Retorna snapshots del patrimonio neto a lo largo del tiempo
-    para graficar la evolución.
+    Sale del libro de saldos (una consulta para todo el rango), así hay
+    un punto por día aunque no existan snapshots. Como en `/summary`,
+    incluye inversiones y metas (con su valor actual).
     """
-    from datetime import date, timedelta
-
-    service = PatrimonyService(db)
-
-    # Calcular rango de fechas
     fecha_fin = date.today()
     fecha_inicio = fecha_fin - timedelta(days=meses * 30)
 
-    snapshots = service.obtener_historial(
-        profile_id=profile_id,
-        fecha_inicio=fecha_inicio,
-        fecha_fin=fecha_fin,
-        limite=meses * 4,  # Aproximadamente 4 snapshots por mes
+    dias = await _with_service(
+        db,
+        lambda service: service.historial_diario(
+            profile_id=profile_id,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+        ),
     )
 
-    history: list[dict[str, str | float]] = []
-    for snapshot in snapshots:
-        history.append(
-            {
-                "fecha": snapshot.fecha_snapshot.isoformat(),
-                "net_worth": float(snapshot.patrimonio_neto_crc),
-                "activos": float(snapshot.total_activos_crc),
-                "pasivos": float(snapshot.total_pasivos_crc),
-            }
-        )
-
-    # Ordenar por fecha ascendente
-    history.sort(key=lambda x: str(x["fecha"]))
-
-    return history
+    return [
+        {
+            "fecha": dia["fecha"].isoformat(),
+            "net_worth": float(dia["patrimonio_neto_crc"]),
+            "activos": float(dia["activos_crc"]),
+            "pasivos": float(dia["deudas_crc"]),
+            "inversiones": float(dia["inversiones_crc"]),
+            "metas": float(dia["metas_crc"]),
+        }
+        for dia in dias
+    ]
 
 
 @router.get("/returns", response_model=InvestmentReturnsResponse)
-def get_investment_returns(
+async def get_investment_returns(
     profile_id: str = Query(..., description="ID del perfil"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> InvestmentReturnsResponse:
     """Obtiene los rendimientos totales de inversiones."""
-    service = PatrimonyService(db)
-    returns = service.get_investment_returns(profile_id)
+    returns = await _with_service(db, lambda service: service.get_investment_returns(profile_id))
     return InvestmentReturnsResponse(**returns)
 
 
 @router.get("/goals-progress", response_model=GoalsProgressResponse)
-def get_goals_progress(
+async def get_goals_progress(
     profile_id: str = Query(..., description="ID del perfil"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> GoalsProgressResponse:
     """Obtiene el progreso general de todas las metas."""
-    service = PatrimonyService(db)
-    progress = service.get_goals_progress(profile_id)
+    progress = await _with_service(db, lambda service: service.get_goals_progress(profile_id))
     return GoalsProgressResponse(**progress)
 
 
@@ -157,9 +163,9 @@ def get_goals_progress(
 
 
 @router.get("/accounts", response_model=list[AccountResponse])
-def list_accounts(
+async def list_accounts(
     profile_id: str = Query(..., description="ID del perfil"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[AccountResponse]:
     """Lista todas las cuentas de un perfil."""
     stmt = (
@@ -171,15 +177,15 @@ def list_accounts(
         .order_by(Account.es_cuenta_principal.desc(), Account.nombre)
     )
 
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
     return [AccountResponse.model_validate(a) for a in result.scalars().all()]
 
 
 @router.post("/accounts", response_model=AccountResponse, status_code=201)
-def create_account(
+async def create_account(
     profile_id: str,
     data: AccountCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> AccountResponse:
     """Crea una nueva cuenta bancaria."""
     # Validar enums
@@ -208,23 +214,23 @@ def create_account(
     )
 
     db.add(account)
-    db.commit()
-    db.refresh(account)
+    await db.commit()
+    await db.refresh(account)
 
     return AccountResponse.model_validate(account)
 
 
 @router.get("/accounts/{account_id}", response_model=AccountResponse)
-def get_account(
+async def get_account(
     account_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> AccountResponse:
     """Obtiene una cuenta por ID."""
     stmt = select(Account).where(
         Account.id == account_id,
         Account.deleted_at.is_(None),
     )
-    account = db.execute(stmt).scalar_one_or_none()
+    account = (await db.execute(stmt)).scalar_one_or_none()
 
     if not account:
         raise HTTPException(
@@ -236,17 +242,17 @@ def get_account(
 
 
 @router.patch("/accounts/{account_id}", response_model=AccountResponse)
-def update_account(
+async def update_account(
     account_id: str,
     data: AccountUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> AccountResponse:
     """Actualiza una cuenta."""
     stmt = select(Account).where(
         Account.id == account_id,
         Account.deleted_at.is_(None),
     )
-    account = db.execute(stmt).scalar_one_or_none()
+    account = (await db.execute(stmt)).scalar_one_or_none()
 
     if not account:
         raise HTTPException(
@@ -258,23 +264,23 @@ def update_account(
     for field, value in update_data.items():
         setattr(account, field, value)
 
-    db.commit()
-    db.refresh(account)
+    await db.commit()
+    await db.refresh(account)
 
     return AccountResponse.model_validate(account)
 
 
 @router.delete("/accounts/{account_id}", status_code=204)
-def delete_account(
+async def delete_account(
     account_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> None:
     """Elimina una cuenta (soft delete)."""
     stmt = select(Account).where(
         Account.id == account_id,
         Account.deleted_at.is_(None),
     )
-    account = db.execute(stmt).scalar_one_or_none()
+    account = (await db.execute(stmt)).scalar_one_or_none()
 
     if not account:
         raise HTTPException(
@@ -283,7 +289,7 @@ def delete_account(
         )
 
     account.deleted_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
 
 
 # =============================================================================
@@ -292,10 +298,10 @@ def delete_account(
 
 
 @router.get("/investments", response_model=list[InvestmentResponse])
-def list_investments(
+async def list_investments(
     profile_id: str = Query(..., description="ID del perfil"),
     include_inactive: bool = Query(False, description="Incluir inversiones inactivas"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[InvestmentResponse]:
     """Lista todas las inversiones de un perfil."""
     stmt = select(Investment).where(
@@ -307,7 +313,7 @@ def list_investments(
         stmt = stmt.where(Investment.activa.is_(True))
 
     stmt = stmt.order_by(Investment.fecha_vencimiento)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
 
     investments = []
     for inv in result.scalars().all():
@@ -320,10 +326,10 @@ def list_investments(
 
 
 @router.post("/investments", response_model=InvestmentResponse, status_code=201)
-def create_investment(
+async def create_investment(
     profile_id: str,
     data: InvestmentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> InvestmentResponse:
     """Crea una nueva inversión."""
     # Validar enums
@@ -352,8 +358,8 @@ def create_investment(
     )
 
     db.add(investment)
-    db.commit()
-    db.refresh(investment)
+    await db.commit()
+    await db.refresh(investment)
 
     response = InvestmentResponse.model_validate(investment)
     response.valor_actual = investment.valor_actual
@@ -362,16 +368,16 @@ def create_investment(
 
 
 @router.get("/investments/{investment_id}", response_model=InvestmentResponse)
-def get_investment(
+async def get_investment(
     investment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> InvestmentResponse:
     """Obtiene una inversión por ID."""
     stmt = select(Investment).where(
         Investment.id == investment_id,
         Investment.deleted_at.is_(None),
     )
-    investment = db.execute(stmt).scalar_one_or_none()
+    investment = (await db.execute(stmt)).scalar_one_or_none()
 
     if not investment:
         raise HTTPException(
@@ -386,17 +392,17 @@ def get_investment(
 
 
 @router.patch("/investments/{investment_id}", response_model=InvestmentResponse)
-def update_investment(
+async def update_investment(
     investment_id: str,
     data: InvestmentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> InvestmentResponse:
     """Actualiza una inversión."""
     stmt = select(Investment).where(
         Investment.id == investment_id,
         Investment.deleted_at.is_(None),
     )
-    investment = db.execute(stmt).scalar_one_or_none()
+    investment = (await db.execute(stmt)).scalar_one_or_none()
 
     if not investment:
         raise HTTPException(
@@ -408,8 +414,8 @@ def update_investment(
     for field, value in update_data.items():
         setattr(investment, field, value)
 
-    db.commit()
-    db.refresh(investment)
+    await db.commit()
+    await db.refresh(investment)
 
     response = InvestmentResponse.model_validate(investment)
     response.valor_actual = investment.valor_actual
@@ -418,16 +424,16 @@ def update_investment(
 
 
 @router.delete("/investments/{investment_id}", status_code=204)
-def delete_investment(
+async def delete_investment(
     investment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> None:
     """Elimina una inversión (soft delete)."""
     stmt = select(Investment).where(
         Investment.id == investment_id,
         Investment.deleted_at.is_(None),
     )
-    investment = db.execute(stmt).scalar_one_or_none()
+    investment = (await db.execute(stmt)).scalar_one_or_none()
 
     if not investment:
         raise HTTPException(
@@ -436,7 +442,7 @@ def delete_investment(
         )
 
     investment.deleted_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
 
 
 # =============================================================================
@@ -445,10 +451,10 @@ def delete_investment(
 
 
 @router.get("/goals", response_model=list[GoalResponse])
-def list_goals(
+async def list_goals(
     profile_id: str = Query(..., description="ID del perfil"),
     only_active: bool = Query(True, description="Solo metas activas"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[GoalResponse]:
     """Lista todas las metas de un perfil."""
     stmt = select(Goal).where(
@@ -460,7 +466,7 @@ def list_goals(
         stmt = stmt.where(Goal.estado == GoalStatus.ACTIVA)
 
     stmt = stmt.order_by(Goal.prioridad, Goal.fecha_objetivo)
-    result = db.execute(stmt)
+    result = await db.execute(stmt)
 
     goals = []
     for goal in result.scalars().all():
@@ -474,10 +480,10 @@ def list_goals(
 
 
 @router.post("/goals", response_model=GoalResponse, status_code=201)
-def create_goal(
+async def create_goal(
     profile_id: str,
     data: GoalCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> GoalResponse:
     """Crea una nueva meta financiera."""
     # Validar enums
@@ -504,8 +510,8 @@ def create_goal(
     )
 
     db.add(goal)
-    db.commit()
-    db.refresh(goal)
+    await db.commit()
+    await db.refresh(goal)
 
     response = GoalResponse.model_validate(goal)
     response.porcentaje_completado = goal.porcentaje_completado
@@ -515,16 +521,16 @@ def create_goal(
 
 
 @router.get("/goals/{goal_id}", response_model=GoalResponse)
-def get_goal(
+async def get_goal(
     goal_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> GoalResponse:
     """Obtiene una meta por ID."""
     stmt = select(Goal).where(
         Goal.id == goal_id,
         Goal.deleted_at.is_(None),
     )
-    goal = db.execute(stmt).scalar_one_or_none()
+    goal = (await db.execute(stmt)).scalar_one_or_none()
 
     if not goal:
         raise HTTPException(
@@ -540,17 +546,17 @@ def get_goal(
 
 
 @router.patch("/goals/{goal_id}", response_model=GoalResponse)
-def update_goal(
+async def update_goal(
     goal_id: str,
     data: GoalUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> GoalResponse:
     """Actualiza una meta."""
     stmt = select(Goal).where(
         Goal.id == goal_id,
         Goal.deleted_at.is_(None),
     )
-    goal = db.execute(stmt).scalar_one_or_none()
+    goal = (await db.execute(stmt)).scalar_one_or_none()
 
     if not goal:
         raise HTTPException(
@@ -582,8 +588,8 @@ def update_goal(
     for field, value in update_data.items():
         setattr(goal, field, value)
 
-    db.commit()
-    db.refresh(goal)
+    await db.commit()
+    await db.refresh(goal)
 
     response = GoalResponse.model_validate(goal)
     response.porcentaje_completado = goal.porcentaje_completado
@@ -593,17 +599,17 @@ def update_goal(
 
 
 @router.post("/goals/{goal_id}/contribute", response_model=GoalResponse)
-def add_goal_contribution(
+async def add_goal_contribution(
     goal_id: str,
     data: GoalContribution,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> GoalResponse:
     """Agrega una contribución a una meta."""
     stmt = select(Goal).where(
         Goal.id == goal_id,
         Goal.deleted_at.is_(None),
     )
-    goal = db.execute(stmt).scalar_one_or_none()
+    goal = (await db.execute(stmt)).scalar_one_or_none()
 
     if not goal:
         raise HTTPException(
@@ -618,8 +624,8 @@ def add_goal_contribution(
         )
 
     goal.agregar_monto(data.monto)
-    db.commit()
-    db.refresh(goal)
+    await db.commit()
+    await db.refresh(goal)
 
     response = GoalResponse.model_validate(goal)
     response.porcentaje_completado = goal.porcentaje_completado
@@ -629,16 +635,16 @@ def add_goal_contribution(
 
 
 @router.delete("/goals/{goal_id}", status_code=204)
-def delete_goal(
+async def delete_goal(
     goal_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> None:
     """Elimina una meta (soft delete)."""
     stmt = select(Goal).where(
         Goal.id == goal_id,
         Goal.deleted_at.is_(None),
     )
-    goal = db.execute(stmt).scalar_one_or_none()
+    goal = (await db.execute(stmt)).scalar_one_or_none()
 
     if not goal:
         raise HTTPException(
@@ -647,7 +653,7 @@ def delete_goal(
         )
 
     goal.deleted_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
 
 
 # =============================================================================
@@ -656,47 +662,51 @@ def delete_goal(
 
 
 @router.post("/snapshots", response_model=PatrimonioSnapshotResponse, status_code=201)
-def crear_snapshot(
+async def crear_snapshot(
     profile_id: str = Query(..., description="ID del perfil"),
     fecha: date | None = Query(None, description="Fecha del snapshot (default: hoy)"),
     exchange_rate: Decimal | None = Query(None, description="Tipo de cambio USD/CRC"),
     notas: str | None = Query(None, description="Notas opcionales"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> PatrimonioSnapshotResponse:
     """Crea un snapshot del patrimonio actual.
 
     Captura el estado de cuentas e inversiones en un momento dado.
     """
-    service = PatrimonyService(db)
-    snapshot = service.crear_snapshot(
-        profile_id=profile_id,
-        fecha=fecha,
-        exchange_rate=exchange_rate,
-        notas=notas,
+    snapshot = await _with_service(
+        db,
+        lambda service: service.crear_snapshot(
+            profile_id=profile_id,
+            fecha=fecha,
+            exchange_rate=exchange_rate,
+            notas=notas,
+        ),
     )
     return PatrimonioSnapshotResponse.model_validate(snapshot)
 
 
 @router.post("/snapshots/inicial", response_model=PatrimonioSnapshotResponse, status_code=201)
-def establecer_patrimonio_inicial(
+async def establecer_patrimonio_inicial(
     profile_id: str = Query(..., description="ID del perfil"),
     fecha_base: date = Query(..., description="Fecha de inicio del tracking (FECHA_BASE)"),
     exchange_rate: Decimal | None = Query(None, description="Tipo de cambio USD/CRC"),
     notas: str | None = Query(None, description="Notas opcionales"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> PatrimonioSnapshotResponse:
     """Establece el patrimonio inicial (FECHA_BASE).
 
     Este es el punto de partida para el tracking de patrimonio.
     Solo puede existir un snapshot de fecha base por perfil.
     """
-    service = PatrimonyService(db)
     try:
-        snapshot = service.establecer_patrimonio_inicial(
-            profile_id=profile_id,
-            fecha_base=fecha_base,
-            exchange_rate=exchange_rate,
-            notas=notas,
+        snapshot = await _with_service(
+            db,
+            lambda service: service.establecer_patrimonio_inicial(
+                profile_id=profile_id,
+                fecha_base=fecha_base,
+                exchange_rate=exchange_rate,
+                notas=notas,
+            ),
         )
         return PatrimonioSnapshotResponse.model_validate(snapshot)
     except ValueError as e:
@@ -707,70 +717,72 @@ def establecer_patrimonio_inicial(
 
 
 @router.get("/snapshots/historial", response_model=list[PatrimonioSnapshotResponse])
-def obtener_historial_snapshots(
+async def obtener_historial_snapshots(
     profile_id: str = Query(..., description="ID del perfil"),
     fecha_inicio: date | None = Query(None, description="Fecha inicio del rango"),
     fecha_fin: date | None = Query(None, description="Fecha fin del rango"),
     limite: int = Query(12, ge=1, le=100, description="Máximo de snapshots a retornar"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[PatrimonioSnapshotResponse]:
     """Obtiene el historial de snapshots de patrimonio.
 
     Útil para ver la evolución del patrimonio en el tiempo.
     """
-    service = PatrimonyService(db)
-    snapshots = service.obtener_historial(
-        profile_id=profile_id,
-        fecha_inicio=fecha_inicio,
-        fecha_fin=fecha_fin,
-        limite=limite,
+    snapshots = await _with_service(
+        db,
+        lambda service: service.obtener_historial(
+            profile_id=profile_id,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            limite=limite,
+        ),
     )
     return [PatrimonioSnapshotResponse.model_validate(s) for s in snapshots]
 
 
 @router.get("/snapshots/ultimo", response_model=PatrimonioSnapshotResponse | None)
-def obtener_ultimo_snapshot(
+async def obtener_ultimo_snapshot(
     profile_id: str = Query(..., description="ID del perfil"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> PatrimonioSnapshotResponse | None:
     """Obtiene el snapshot más reciente."""
-    service = PatrimonyService(db)
-    snapshot = service.get_ultimo_snapshot(profile_id)
+    snapshot = await _with_service(db, lambda service: service.get_ultimo_snapshot(profile_id))
     if snapshot:
         return PatrimonioSnapshotResponse.model_validate(snapshot)
     return None
 
 
 @router.get("/snapshots/fecha-base", response_model=PatrimonioSnapshotResponse | None)
-def obtener_snapshot_fecha_base(
+async def obtener_snapshot_fecha_base(
     profile_id: str = Query(..., description="ID del perfil"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> PatrimonioSnapshotResponse | None:
     """Obtiene el snapshot de fecha base (patrimonio inicial)."""
-    service = PatrimonyService(db)
-    snapshot = service.get_snapshot_fecha_base(profile_id)
+    snapshot = await _with_service(db, lambda service: service.get_snapshot_fecha_base(profile_id))
     if snapshot:
         return PatrimonioSnapshotResponse.model_validate(snapshot)
     return None
 
 
 @router.get("/snapshots/cambio-periodo")
-def calcular_cambio_periodo(
+async def calcular_cambio_periodo(
     profile_id: str = Query(..., description="ID del perfil"),
     fecha_inicio: date = Query(..., description="Fecha inicio del periodo"),
     fecha_fin: date = Query(..., description="Fecha fin del periodo"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
     """Calcula el cambio de patrimonio entre dos fechas.
 
     Retorna el cambio absoluto y porcentual del patrimonio.
     """
-    service = PatrimonyService(db)
     try:
-        return service.calcular_cambio_periodo(
-            profile_id=profile_id,
-            fecha_inicio=fecha_inicio,
-            fecha_fin=fecha_fin,
+        return await _with_service(
+            db,
+            lambda service: service.calcular_cambio_periodo(
+                profile_id=profile_id,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+            ),
         )
     except ValueError as e:
         raise HTTPException(
@@ -780,20 +792,22 @@ def calcular_cambio_periodo(
 
 
 @router.post("/snapshots/mensual", response_model=PatrimonioSnapshotResponse | None)
-def generar_snapshot_mensual(
+async def generar_snapshot_mensual(
     profile_id: str = Query(..., description="ID del perfil"),
     exchange_rate: Decimal | None = Query(None, description="Tipo de cambio USD/CRC"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> PatrimonioSnapshotResponse | None:
     """Genera snapshot mensual si no existe uno este mes.
 
     Útil para automatizar la captura mensual de patrimonio.
     Retorna None si ya existe un snapshot este mes.
     """
-    service = PatrimonyService(db)
-    snapshot = service.generar_snapshot_mensual(
-        profile_id=profile_id,
-        exchange_rate=exchange_rate,
+    snapshot = await _with_service(
+        db,
+        lambda service: service.generar_snapshot_mensual(
+            profile_id=profile_id,
+            exchange_rate=exchange_rate,
+        ),
     )
     if snapshot:
         return PatrimonioSnapshotResponse.model_validate(snapshot)
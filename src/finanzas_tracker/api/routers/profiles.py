@@ -10,6 +10,7 @@ from finanzas_tracker.api.schemas.profile import (
     ProfileResponse,
     ProfileUpdate,
 )
+from finanzas_tracker.core.cache import invalidate_identity_cache
 from finanzas_tracker.models.profile import Profile
 
 
@@ -114,6 +115,9 @@ def create_profile(data: ProfileCreate, db: DBSession) -> ProfileResponse:
     db.commit()
     db.refresh(profile)
 
+    if is_first:
+        invalidate_identity_cache()
+
     return ProfileResponse.model_validate(profile)
 
 
@@ -142,6 +146,7 @@ def update_profile(
 
     db.commit()
     db.refresh(profile)
+    invalidate_identity_cache()
 
     return ProfileResponse.model_validate(profile)
 
@@ -177,6 +182,7 @@ def activate_profile(profile_id: str, db: DBSession) -> ProfileResponse:
 
     db.commit()
     db.refresh(profile)
+    invalidate_identity_cache()
 
     return ProfileResponse.model_validate(profile)
 
@@ -213,3 +219,4 @@ def delete_profile(profile_id: str, db: DBSession) -> None:
     # Soft delete
     profile.activo = False
     db.commit()
+    invalidate_identity_cache()
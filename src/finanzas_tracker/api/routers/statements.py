@@ -3,12 +3,16 @@
 Endpoints para:
 - Buscar estados de cuenta en el correo
 - Procesar un estado específico
-- Procesar todos los pendientes
+- Procesar todos los pendientes (en segundo plano, como job)
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 
+from finanzas_tracker.api.dependencies import get_db
+from finanzas_tracker.api.schemas.job import JobResponse
+from finanzas_tracker.services.job_queue import STATEMENTS_PROCESS_ALL, enqueue_job
 from finanzas_tracker.services.statement_email_service import (
     StatementEmailInfo,
     StatementEmailService,
@@ -51,15 +55,6 @@ class ProcessedStatementResponse(BaseModel):
     cuentas_encontradas: int = 0
 
 
-class ProcessAllResponse(BaseModel):
-    """Respuesta del procesamiento masivo."""
-
-    total_encontrados: int
-    procesados_exitosos: int
-    procesados_fallidos: int
-    detalles: list[ProcessedStatementResponse]
-
-
 # ============================================================================
 # Endpoints
 # ============================================================================
@@ -138,33 +133,7 @@ def process_single_statement(
 
     try:
         result = service.process_statement(stmt_info, save_pdf=save_pdf)
-
-        if result.error or result.statement_result is None:
-            return ProcessedStatementResponse(
-                email_subject=stmt_info.subject,
-                attachment_name=stmt_info.attachment_name,
-                success=False,
-                error=result.error or "No statement result",
-            )
-
-        # Obtener nombre del titular y cuentas según el tipo de resultado
-        metadata = result.statement_result.metadata
-        nombre_titular = (
-            metadata.nombre_titular
-            if hasattr(metadata, "nombre_titular")
-            else getattr(metadata, "nombre_cliente", "Unknown")
-        )
-        cuentas_count = len(metadata.cuentas) if hasattr(metadata, "cuentas") else 0
-
-        return ProcessedStatementResponse(
-            email_subject=stmt_info.subject,
-            attachment_name=stmt_info.attachment_name,
-            success=True,
-            titular=nombre_titular,
-            fecha_corte=metadata.fecha_corte.isoformat(),
-            total_transacciones=len(result.statement_result.transactions),
-            cuentas_encontradas=cuentas_count,
-        )
+        return ProcessedStatementResponse(**result.to_summary())
 
     except Exception as e:
         raise HTTPException(
@@ -175,82 +144,36 @@ def process_single_statement(
 
 @router.post(
     "/email/process-all",
-    response_model=ProcessAllResponse,
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Procesar todos los estados de cuenta pendientes",
 )
 def process_all_statements(
     profile_id: str = Query(..., description="ID del perfil del usuario"),
     days_back: int = Query(30, ge=1, le=365, description="Días hacia atrás para buscar"),
     save_pdfs: bool = Query(True, description="Guardar PDFs permanentemente"),
-) -> ProcessAllResponse:
+    db: Session = Depends(get_db),
+) -> JobResponse:
     """
     Busca y procesa todos los estados de cuenta de los últimos N días.
 
-    Este endpoint:
+    El job:
     1. Busca correos con estados de cuenta
     2. Descarga cada PDF
     3. Parsea y extrae transacciones
-    4. Retorna resumen del procesamiento
-    """
-    service = StatementEmailService()
+    4. Deja el resumen en `result` (total_encontrados, procesados_exitosos,
+       procesados_fallidos, detalles, tiempos)
 
-    try:
-        results = service.process_all_pending(
-            profile_id=profile_id,
-            days_back=days_back,
-            save_pdfs=save_pdfs,
-        )
-
-        detalles = []
-        for result in results:
-            if result.error or result.statement_result is None:
-                detalles.append(
-                    ProcessedStatementResponse(
-                        email_subject=result.email_info.subject,
-                        attachment_name=result.email_info.attachment_name,
-                        success=False,
-                        error=result.error or "No statement result",
-                    )
-                )
-            else:
-                # Obtener nombre del titular y cuentas según el tipo de resultado
-                metadata = result.statement_result.metadata
-                nombre_titular = (
-                    metadata.nombre_titular
-                    if hasattr(metadata, "nombre_titular")
-                    else getattr(metadata, "nombre_cliente", "Unknown")
-                )
-                cuentas_count = len(metadata.cuentas) if hasattr(metadata, "cuentas") else 0
-
-                detalles.append(
-                    ProcessedStatementResponse(
-                        email_subject=result.email_info.subject,
-                        attachment_name=result.email_info.attachment_name,
-                        success=True,
-                        titular=nombre_titular,
-                        fecha_corte=metadata.fecha_corte.isoformat(),
-                        total_transacciones=len(result.statement_result.transactions),
-                        cuentas_encontradas=cuentas_count,
-                    )
-                )
-
-        return ProcessAllResponse(
-            total_encontrados=len(results),
-            procesados_exitosos=sum(1 for r in results if r.error is None),
-            procesados_fallidos=sum(1 for r in results if r.error is not None),
-            detalles=detalles,
-        )
-
-    except RuntimeError as e:
-        raise HTTPException(
-            status_code=401,
-            detail={"error": str(e), "code": "AUTH_REQUIRED"},
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail={"error": str(e), "code": "PROCESS_ERROR"},
-        )
+    Responde 202; el avance (estados terminados / encontrados) se consulta
+    en `GET /jobs/{id}`.
+    """
+    job = enqueue_job(
+        db,
+        STATEMENTS_PROCESS_ALL,
+        params={"days_back": days_back, "save_pdfs": save_pdfs},
+        profile_id=profile_id,
+    )
+    return JobResponse.model_validate(job)
 
 
 __all__ = ["router"]
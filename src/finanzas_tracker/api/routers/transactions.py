@@ -1,4 +1,9 @@
-"""Router de Transacciones - CRUD completo."""
+"""Router de Transacciones - CRUD completo.
+
+Endpoints `async def` sobre AsyncSession: mientras esperan a PostgreSQL no
+ocupan un thread del threadpool de Starlette. Los services que sólo existen
+en versión sync (comercios ambiguos) corren con `AsyncSession.run_sync`.
+"""
 
 from datetime import date, datetime
 from decimal import Decimal
@@ -6,22 +11,26 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel, Field
-from sqlalchemy import func, select
+from sqlalchemy import select
 
-from finanzas_tracker.api.dependencies import ActiveProfile, DBSession
+from finanzas_tracker.api.dependencies import AsyncActiveProfile, AsyncDBSession
 from finanzas_tracker.api.errors import NotFoundError
 from finanzas_tracker.api.schemas.transaction import (
+    TransactionBulkResponse,
+    TransactionBulkUpdate,
     TransactionCreate,
     TransactionListResponse,
     TransactionResponse,
     TransactionUpdate,
 )
 from finanzas_tracker.models.transaction import Transaction
-from finanzas_tracker.repositories import TransactionRepository
+from finanzas_tracker.repositories import AsyncTransactionRepository
+from finanzas_tracker.repositories.filters import in_month
 from finanzas_tracker.services.ambiguous_merchant_service import (
     AmbiguousMerchantService,
     listar_comercios_ambiguos,
 )
+from finanzas_tracker.services.transaction_service import TransactionService
 
 
 router = APIRouter(prefix="/transactions")
@@ -46,9 +55,9 @@ class AmbiguousTransactionResponse(BaseModel):
 
 
 @router.get("", response_model=TransactionListResponse)
-def list_transactions(
-    db: DBSession,
-    profile: ActiveProfile,
+async def list_transactions(
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
     skip: int = Query(0, ge=0, description="Registros a saltar"),
     limit: int = Query(50, ge=1, le=200, description="Límite de registros"),
     mes: date | None = Query(None, description="Filtrar por mes (YYYY-MM-01)"),
@@ -63,10 +72,10 @@ def list_transactions(
 
     Ordenadas por fecha descendente (más recientes primero).
     """
-    repo = TransactionRepository(db)
+    repo = AsyncTransactionRepository(db)
 
     # Usar repository para obtener transacciones
-    transactions = repo.get_by_profile(
+    transactions = await repo.get_by_profile(
         profile_id=profile.id,
         skip=skip,
         limit=limit,
@@ -79,7 +88,7 @@ def list_transactions(
     )
 
     # Contar total con los mismos filtros
-    total = repo.count_by_profile(
+    total = await repo.count_by_profile(
         profile_id=profile.id,
         mes=mes,
         categoria_id=categoria_id,
@@ -101,27 +110,51 @@ def list_transactions(
     )
 
 
+@router.patch("/bulk", response_model=TransactionBulkResponse)
+async def bulk_update_transactions(
+    data: TransactionBulkUpdate,
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
+) -> TransactionBulkResponse:
+    """
+    Categoriza y marca muchas transacciones en una sola operación.
+
+    Pensado para revisar backlogs (ej: el onboarding): los cambios se
+    escriben con un UPDATE por lote, el aprendizaje de las categorías se
+    encola como un solo job y el cache del perfil se invalida una vez.
+    """
+    cambios = [item.model_dump(exclude_unset=True) for item in data.items]
+    actualizadas = await db.run_sync(
+        lambda session: TransactionService(session).actualizar_batch(profile.id, cambios)
+    )
+
+    hechas = set(actualizadas)
+    return TransactionBulkResponse(
+        actualizadas=actualizadas,
+        omitidas=[tid for tid in dict.fromkeys(item.id for item in data.items) if tid not in hechas],
+    )
+
+
 @router.get("/{transaction_id}", response_model=TransactionResponse)
-def get_transaction(
+async def get_transaction(
     transaction_id: str,
-    db: DBSession,
-    profile: ActiveProfile,
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> TransactionResponse:
     """Obtiene una transacción por ID."""
-    repo = TransactionRepository(db)
-    transaction = repo.get(transaction_id)
+    transaction = await AsyncTransactionRepository(db).get_for_profile(transaction_id, profile.id)
 
-    if not transaction or transaction.profile_id != profile.id:
+    if not transaction:
         raise NotFoundError("Transacción", transaction_id)
 
     return TransactionResponse.model_validate(transaction)
 
 
 @router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
-def create_transaction(
+async def create_transaction(
     data: TransactionCreate,
-    db: DBSession,
-    profile: ActiveProfile,
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> TransactionResponse:
     """
     Crea una nueva transacción manualmente.
@@ -146,30 +179,25 @@ def create_transaction(
     )
 
     db.add(transaction)
-    db.commit()
-    db.refresh(transaction)
+    await db.commit()
+    await db.refresh(transaction)
 
     return TransactionResponse.model_validate(transaction)
 
 
 @router.patch("/{transaction_id}", response_model=TransactionResponse)
-def update_transaction(
+async def update_transaction(
     transaction_id: str,
     data: TransactionUpdate,
-    db: DBSession,
-    profile: ActiveProfile,
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> TransactionResponse:
     """
     Actualiza una transacción existente.
 
     Solo actualiza los campos proporcionados.
     """
-    stmt = select(Transaction).where(
-        Transaction.id == transaction_id,
-        Transaction.profile_id == profile.id,
-        Transaction.deleted_at.is_(None),
-    )
-    transaction = db.execute(stmt).scalar_one_or_none()
+    transaction = await AsyncTransactionRepository(db).get_for_profile(transaction_id, profile.id)
 
     if not transaction:
         raise HTTPException(
@@ -182,29 +210,24 @@ def update_transaction(
     for field, value in update_data.items():
         setattr(transaction, field, value)
 
-    db.commit()
-    db.refresh(transaction)
+    await db.commit()
+    await db.refresh(transaction)
 
     return TransactionResponse.model_validate(transaction)
 
 
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_transaction(
+async def delete_transaction(
     transaction_id: str,
-    db: DBSession,
-    profile: ActiveProfile,
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> None:
     """
     Elimina una transacción (soft delete).
 
     La transacción no se borra físicamente, solo se marca como eliminada.
     """
-    stmt = select(Transaction).where(
-        Transaction.id == transaction_id,
-        Transaction.profile_id == profile.id,
-        Transaction.deleted_at.is_(None),
-    )
-    transaction = db.execute(stmt).scalar_one_or_none()
+    transaction = await AsyncTransactionRepository(db).get_for_profile(transaction_id, profile.id)
 
     if not transaction:
         raise HTTPException(
@@ -214,13 +237,13 @@ def delete_transaction(
 
     # Soft delete
     transaction.deleted_at = datetime.now()
-    db.commit()
+    await db.commit()
 
 
 @router.get("/stats/monthly", response_model=dict)
-def get_monthly_stats(
-    db: DBSession,
-    profile: ActiveProfile,
+async def get_monthly_stats(
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
     mes: date = Query(..., description="Mes a consultar (YYYY-MM-01)"),
 ) -> dict:
     """
@@ -233,11 +256,10 @@ def get_monthly_stats(
         Transaction.profile_id == profile.id,
         Transaction.deleted_at.is_(None),
         Transaction.excluir_de_presupuesto == False,
-        func.extract("year", Transaction.fecha_transaccion) == year,
-        func.extract("month", Transaction.fecha_transaccion) == month,
+        in_month(Transaction.fecha_transaccion, year, month),
     )
 
-    transactions = db.execute(stmt).scalars().all()
+    transactions = (await db.execute(stmt)).scalars().all()
 
     total_crc = sum(t.monto_crc for t in transactions)
     count = len(transactions)
@@ -261,9 +283,9 @@ def get_monthly_stats(
 
 
 @router.get("/ambiguous/pending", response_model=list[AmbiguousTransactionResponse])
-def get_pending_ambiguous(
-    db: DBSession,
-    profile: ActiveProfile,
+async def get_pending_ambiguous(
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> list[AmbiguousTransactionResponse]:
     """
     Lista transacciones de comercios ambiguos pendientes de confirmación.
@@ -271,18 +293,19 @@ def get_pending_ambiguous(
     Comercios como Walmart, Amazon, PriceSmart pueden ser varias categorías.
     El usuario debe confirmar qué compró.
     """
-    service = AmbiguousMerchantService(db)
-    pendientes = service.obtener_pendientes(profile.id)
+    pendientes = await db.run_sync(
+        lambda session: AmbiguousMerchantService(session).obtener_pendientes(profile.id)
+    )
 
     return [AmbiguousTransactionResponse(**p) for p in pendientes]
 
 
 @router.post("/ambiguous/{transaction_id}/confirm", response_model=TransactionResponse)
-def confirm_category(
+async def confirm_category(
     transaction_id: str,
     request: ConfirmCategoryRequest,
-    db: DBSession,
-    profile: ActiveProfile,
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> TransactionResponse:
     """
     Confirma la categoría de una transacción de comercio ambiguo.
@@ -290,12 +313,7 @@ def confirm_category(
     El usuario selecciona una de las opciones disponibles (ej: Supermercado, Electrónica).
     """
     # Verificar que la transacción pertenece al perfil
-    stmt = select(Transaction).where(
-        Transaction.id == transaction_id,
-        Transaction.profile_id == profile.id,
-        Transaction.deleted_at.is_(None),
-    )
-    transaction = db.execute(stmt).scalar_one_or_none()
+    transaction = await AsyncTransactionRepository(db).get_for_profile(transaction_id, profile.id)
 
     if not transaction:
         raise HTTPException(
@@ -312,44 +330,49 @@ def confirm_category(
             },
         )
 
-    service = AmbiguousMerchantService(db)
-    updated = service.confirmar_categoria(
-        transaction_id=transaction_id,
-        categoria_seleccionada=request.categoria,
-        notas=request.notas,
+    updated = await db.run_sync(
+        lambda session: AmbiguousMerchantService(session).confirmar_categoria(
+            transaction_id=transaction_id,
+            categoria_seleccionada=request.categoria,
+            notas=request.notas,
+        )
     )
 
     # Commit explícito
-    db.commit()
+    await db.commit()
 
     return TransactionResponse.model_validate(updated)
 
 
 @router.get("/ambiguous/stats", response_model=dict)
-def get_ambiguous_stats(
-    db: DBSession,
-    profile: ActiveProfile,
+async def get_ambiguous_stats(
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> dict[str, Any]:
     """Estadísticas de comercios ambiguos."""
-    service = AmbiguousMerchantService(db)
-    return service.obtener_estadisticas(profile.id)
+    return await db.run_sync(
+        lambda session: AmbiguousMerchantService(session).obtener_estadisticas(profile.id)
+    )
 
 
 @router.post("/ambiguous/scan", response_model=dict)
-def scan_existing_transactions(
-    db: DBSession,
-    profile: ActiveProfile,
+async def scan_existing_transactions(
+    db: AsyncDBSession,
+    profile: AsyncActiveProfile,
 ) -> dict[str, Any]:
     """
     Escanea transacciones existentes y marca las de comercios ambiguos.
 
     Útil para aplicar la detección a datos históricos.
     """
-    service = AmbiguousMerchantService(db)
-    count = service.marcar_transacciones_existentes(profile.id)
+    count = await db.run_sync(
+        lambda session: AmbiguousMerchantService(session).marcar_transacciones_existentes(
+            profile.id
+        )
+    )
 
     # Commit explícito
-    db.commit()
+    await db.commit()
 
     return {
         "message": "Escaneadas transacciones exitosamente",
@@ -358,7 +381,7 @@ def scan_existing_transactions(
 
 
 @router.get("/ambiguous/merchants", response_model=dict)
-def get_known_ambiguous_merchants() -> dict[str, list[str]]:
+async def get_known_ambiguous_merchants() -> dict[str, list[str]]:
     """
     Lista de comercios conocidos como ambiguos y sus posibles categorías.
 
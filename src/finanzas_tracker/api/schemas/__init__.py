@@ -27,6 +27,9 @@ from finanzas_tracker.api.schemas.reconciliation import (
     ReconciliationReportUpdate,
 )
 from finanzas_tracker.api.schemas.transaction import (
+    TransactionBulkItem,
+    TransactionBulkResponse,
+    TransactionBulkUpdate,
     TransactionCreate,
     TransactionListResponse,
     TransactionResponse,
@@ -40,6 +43,9 @@ __all__ = [
     "TransactionUpdate",
     "TransactionResponse",
     "TransactionListResponse",
+    "TransactionBulkItem",
+    "TransactionBulkUpdate",
+    "TransactionBulkResponse",
     # Category
     "CategoryResponse",
     "CategoryListResponse",
@@ -26,6 +26,10 @@ class ChatRequest(BaseModel):
         le=50,
         description="Máximo de transacciones como contexto",
     )
+    stream: bool = Field(
+        default=False,
+        description="Responder con Server-Sent Events a medida que Claude genera",
+    )
 
 
 class TransactionContext(BaseModel):
@@ -141,16 +145,6 @@ class GenerateEmbeddingsRequest(BaseModel):
     )
 
 
-class GenerateEmbeddingsResponse(BaseModel):
-    """Response de generación de embeddings."""
-
-    generated: int = Field(
-        description="Número de embeddings generados",
-    )
-    model: str
-    message: str
-
-
 class AnalyzeSpendingRequest(BaseModel):
     """Request para análisis de gastos."""
 
@@ -170,3 +164,7 @@ class AnalyzeSpendingRequest(BaseModel):
         le=12,
         description="Mes a analizar",
     )
+    stream: bool = Field(
+        default=False,
+        description="Responder con Server-Sent Events a medida que Claude genera",
+    )
@@ -1,6 +1,6 @@
 """Schemas para Presupuestos."""
 
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -38,7 +38,7 @@ class BudgetResponse(BaseModel):
     mes: date
     amount_crc: Decimal
     notas: str | None
-    created_at: date
+    created_at: datetime
 
 
 class BudgetListResponse(BaseModel):
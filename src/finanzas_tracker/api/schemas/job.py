@@ -0,0 +1,35 @@
+"""Schemas para jobs en segundo plano."""
+
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+
+class JobResponse(BaseModel):
+    """Estado de un job (respuesta 202 al crearlo y de `GET /jobs/{id}`)."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    kind: str = Field(..., description="Tipo de job (embeddings.generate, onboarding, ...)")
+    status: str = Field(..., description="queued, running, succeeded o failed")
+    progress_current: int = 0
+    progress_total: int | None = None
+    progress_percent: float | None = Field(
+        None, description="Avance (None si el total no se conoce)"
+    )
+    eta_seconds: float | None = Field(None, description="Segundos restantes estimados")
+    message: str | None = Field(None, description="Etapa actual")
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    attempts: int = 0
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def status_url(self) -> str:
+        """Endpoint para consultar el avance."""
+        return f"/api/v1/jobs/{self.id}"
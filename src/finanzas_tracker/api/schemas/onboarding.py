@@ -71,6 +71,15 @@ class StartOnboardingRequest(BaseModel):
     user_id: str = Field(..., description="ID del usuario registrado")
 
 
+class AutoDiscoverRequest(BaseModel):
+    """Importar estados de cuenta y correos automáticamente (en segundo plano)."""
+
+    profile_id: str = Field(..., description="ID del perfil donde importar")
+    max_days_back: int = Field(
+        default=31, ge=1, le=365, description="Máximo días para buscar estado de cuenta"
+    )
+
+
 class UploadPDFRequest(BaseModel):
     """Subir PDF de estado de cuenta."""
 
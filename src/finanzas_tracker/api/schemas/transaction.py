@@ -48,6 +48,39 @@ class TransactionUpdate(BaseModel):
     necesita_revision: bool | None = None
 
 
+class TransactionBulkItem(BaseModel):
+    """Cambio de una transacción dentro de una actualización por lotes."""
+
+    id: str = Field(..., description="ID de la transacción")
+    subcategory_id: str | None = Field(None, description="Subcategoría asignada por el usuario")
+    confirmada: bool | None = None
+    necesita_revision: bool | None = None
+    excluir_de_presupuesto: bool | None = None
+    es_transferencia_interna: bool | None = None
+    es_comercio_ambiguo: bool | None = None
+    es_desconocida: bool | None = None
+    necesita_reconciliacion_sinpe: bool | None = None
+
+
+class TransactionBulkUpdate(BaseModel):
+    """Schema para categorizar o marcar muchas transacciones de una vez."""
+
+    items: list[TransactionBulkItem] = Field(..., min_length=1, max_length=1000)
+
+
+class TransactionBulkResponse(BaseModel):
+    """Resultado de una actualización por lotes."""
+
+    actualizadas: list[str] = Field(..., description="IDs actualizados")
+    omitidas: list[str] = Field(
+        ...,
+        description=(
+            "IDs que no existen en el perfil, no traían cambios o piden una "
+            "subcategoría inexistente"
+        ),
+    )
+
+
 class TransactionResponse(BaseModel):
     """Schema de respuesta de transacción."""
 
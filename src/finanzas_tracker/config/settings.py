@@ -86,6 +86,29 @@ class Settings(BaseSettings):
         default="all-MiniLM-L6-v2",
         description="Modelo de Sentence Transformers para embeddings locales",
     )
+    local_embedding_backend: Literal["torch", "onnx", "onnx-int8"] = Field(
+        default="torch",
+        description=(
+            "Runtime de inferencia local: torch, onnx (ONNX Runtime) u onnx-int8 "
+            "(export cuantizado del mismo modelo). Requiere sentence-transformers[onnx]"
+        ),
+    )
+    local_embedding_onnx_file: str = Field(
+        default="onnx/model_quint8_avx2.onnx",
+        description="Archivo ONNX cuantizado del repo del modelo para el backend onnx-int8",
+    )
+    local_embedding_threads: int | None = Field(
+        default=None,
+        description="Threads de CPU para la inferencia local (None = default del runtime)",
+        ge=1,
+        le=64,
+    )
+    local_embedding_batch_size: int = Field(
+        default=32,
+        description="Textos por batch al generar embeddings locales",
+        ge=1,
+        le=1024,
+    )
 
     # === Base de datos (PostgreSQL) ===
     postgres_host: str = Field(
@@ -108,6 +131,26 @@ class Settings(BaseSettings):
         default="finanzas_tracker",
         description="Nombre de la base de datos PostgreSQL",
     )
+    db_pool_size: int = Field(
+        default=10,
+        description="Conexiones permanentes por pool (sync y async tienen un pool cada uno)",
+        ge=1,
+    )
+    db_max_overflow: int = Field(
+        default=20,
+        description="Conexiones extra permitidas por pool en picos de carga",
+        ge=0,
+    )
+    db_pool_timeout: int = Field(
+        default=30,
+        description="Segundos de espera por una conexión libre antes de fallar",
+        ge=1,
+    )
+    db_pool_recycle: int = Field(
+        default=1800,
+        description="Segundos tras los cuales se recicla una conexión (-1 = nunca)",
+        ge=-1,
+    )
 
     # === Configuración de la aplicación ===
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = Field(
@@ -153,6 +196,64 @@ class Settings(BaseSettings):
         le=100,
     )
 
+    # === Procesamiento de estados de cuenta en lote ===
+    statement_download_workers: int = Field(
+        default=4,
+        description="Threads que descargan PDFs de estados de cuenta en paralelo",
+        ge=1,
+        le=16,
+    )
+    statement_parse_workers: int = Field(
+        default=2,
+        description="Procesos que parsean PDFs de estados de cuenta en paralelo",
+        ge=1,
+        le=16,
+    )
+    statement_pipeline_queue_size: int = Field(
+        default=4,
+        description="Capacidad de las colas entre etapas (descarga → parseo → BD)",
+        ge=1,
+        le=64,
+    )
+
+    # === Jobs en segundo plano ===
+    job_worker_in_api: bool = Field(
+        default=True,
+        description=(
+            "Corre un worker de jobs dentro de la API (False si se usa "
+            "`python -m finanzas_tracker.services.job_queue` aparte)"
+        ),
+    )
+    job_poll_interval_seconds: float = Field(
+        default=2.0,
+        description="Espera del worker entre consultas cuando no hay jobs en cola",
+        gt=0,
+        le=60,
+    )
+    job_progress_interval_seconds: float = Field(
+        default=1.0,
+        description="Intervalo mínimo entre escrituras de progreso de un job",
+        ge=0,
+        le=60,
+    )
+    job_heartbeat_interval_seconds: float = Field(
+        default=60.0,
+        description="Cada cuánto renueva el worker el heartbeat del job que está corriendo",
+        gt=0,
+        le=300,
+    )
+    job_stale_after_seconds: int = Field(
+        default=600,
+        description="Un job corriendo sin heartbeat por este tiempo vuelve a la cola",
+        ge=30,
+    )
+    job_max_attempts: int = Field(
+        default=3,
+        description="Intentos por job antes de marcarlo como fallido",
+        ge=1,
+        le=10,
+    )
+
     # === Configuración de Conversión de Moneda ===
     usd_to_crc_rate: float = Field(
         default=520.0,
@@ -177,6 +278,32 @@ class Settings(BaseSettings):
         ge=0.0,
         le=1.0,
     )
+    claude_daily_token_budget: int = Field(
+        default=0,
+        description="Tokens de Claude por perfil por día (0 = sin límite)",
+        ge=0,
+    )
+    claude_max_concurrency: int = Field(
+        default=4,
+        description="Llamadas simultáneas a Claude por proceso (y conexiones del pool HTTP)",
+        ge=1,
+        le=64,
+    )
+    claude_requests_per_minute: int = Field(
+        default=50,
+        description="Requests por minuto a Claude, según el rate limit de la cuenta (0 = sin límite)",
+        ge=0,
+    )
+    claude_circuit_failure_threshold: int = Field(
+        default=3,
+        description="Errores 429/529 seguidos que abren el circuit breaker de Claude",
+        ge=1,
+    )
+    claude_circuit_reset_seconds: float = Field(
+        default=30.0,
+        description="Segundos que el circuit breaker queda abierto antes de probar de nuevo",
+        ge=1.0,
+    )
 
     # === JWT Authentication ===
     jwt_secret_key: str = Field(
@@ -192,6 +319,28 @@ class Settings(BaseSettings):
         description="Tiempo de expiración del access token en minutos",
         ge=5,
     )
+    identity_cache_ttl_seconds: int = Field(
+        default=30,
+        description="TTL del cache de usuario/perfil activo en la API (0 = desactivado)",
+        ge=0,
+        le=600,
+    )
+    cache_backend: Literal["memory", "sqlite", "redis"] = Field(
+        default="memory",
+        description=(
+            "Backend del cache de consultas: memory (por proceso), sqlite (archivo "
+            "compartido por los workers de una máquina) o redis (requiere el paquete redis)"
+        ),
+    )
+    cache_url: str | None = Field(
+        default=None,
+        description="Ruta del archivo SQLite o URL de Redis del cache de consultas",
+    )
+    cache_max_entries: int = Field(
+        default=1024,
+        description="Entradas máximas del cache de consultas (memory/sqlite) antes de desalojar",
+        ge=16,
+    )
 
     model_config = SettingsConfigDict(
         env_file=".env",
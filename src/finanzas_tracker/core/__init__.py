@@ -1,34 +1,108 @@
-"""Módulo core con funcionalidades fundamentales del proyecto."""
+"""
+Módulo core con funcionalidades fundamentales del proyecto.
 
-from finanzas_tracker.core.cache import TTLCache, cached_query, invalidate_profile_cache
-from finanzas_tracker.core.claude_credits import (
-    CreditStatus,
-    CreditState,
-    CreditCheckResult,
-    ClaudeServiceUnavailable,
-    # Funciones principales
-    get_credit_state,
-    can_use_claude,
-    check_claude_credits,
-    handle_claude_error,
-    with_claude_fallback,
-    get_credit_status_summary,
-    # Funciones de control
-    mark_credits_exhausted,
-    reset_credit_state,
-    # Aliases
-    invalidate_credit_cache,
-    require_claude_credits,
-)
-from finanzas_tracker.core.constants import (
-    AUTO_CATEGORIZE_CONFIDENCE_THRESHOLD,
-    HIGH_CONFIDENCE_SCORE,
-    KEYWORD_MIN_LENGTH_FOR_HIGH_CONFIDENCE,
-    MEDIUM_CONFIDENCE_SCORE,
-)
-from finanzas_tracker.core.database import Base, get_session
-from finanzas_tracker.core.logging import get_logger
-from finanzas_tracker.core.retry import retry_on_anthropic_error
+Los exports se cargan de forma perezosa: importar `finanzas_tracker.core.database`
+no debe arrastrar el cliente de Anthropic de `claude_credits`.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from finanzas_tracker.core.cache import TTLCache, cached_query, invalidate_profile_cache
+    from finanzas_tracker.core.claude_client import (
+        ClaudeClient,
+        get_claude_client,
+        get_token_usage,
+    )
+    from finanzas_tracker.core.claude_credits import (
+        CreditStatus,
+        CreditState,
+        CreditCheckResult,
+        ClaudeServiceUnavailable,
+        TokenBudgetExceeded,
+        ClaudeCircuitOpen,
+        # Funciones principales
+        get_credit_state,
+        can_use_claude,
+        check_claude_credits,
+        handle_claude_error,
+        with_claude_fallback,
+        get_credit_status_summary,
+        check_token_budget,
+        # Funciones de control
+        mark_credits_exhausted,
+        reset_credit_state,
+        # Aliases
+        invalidate_credit_cache,
+        require_claude_credits,
+    )
+    from finanzas_tracker.core.constants import (
+        AUTO_CATEGORIZE_CONFIDENCE_THRESHOLD,
+        HIGH_CONFIDENCE_SCORE,
+        KEYWORD_MIN_LENGTH_FOR_HIGH_CONFIDENCE,
+        MEDIUM_CONFIDENCE_SCORE,
+    )
+    from finanzas_tracker.core.database import Base, get_session
+    from finanzas_tracker.core.logging import get_logger
+    from finanzas_tracker.core.metrics import LatencyHistogram, histogram, render_prometheus
+    from finanzas_tracker.core.retry import retry_on_anthropic_error
+
+
+# nombre exportado -> submódulo que lo define
+_LAZY_EXPORTS: dict[str, str] = {
+    "TTLCache": "cache",
+    "cached_query": "cache",
+    "invalidate_profile_cache": "cache",
+    "ClaudeClient": "claude_client",
+    "get_claude_client": "claude_client",
+    "get_token_usage": "claude_client",
+    "CreditStatus": "claude_credits",
+    "CreditState": "claude_credits",
+    "CreditCheckResult": "claude_credits",
+    "ClaudeServiceUnavailable": "claude_credits",
+    "TokenBudgetExceeded": "claude_credits",
+    "ClaudeCircuitOpen": "claude_credits",
+    "get_credit_state": "claude_credits",
+    "can_use_claude": "claude_credits",
+    "check_claude_credits": "claude_credits",
+    "handle_claude_error": "claude_credits",
+    "with_claude_fallback": "claude_credits",
+    "get_credit_status_summary": "claude_credits",
+    "check_token_budget": "claude_credits",
+    "mark_credits_exhausted": "claude_credits",
+    "reset_credit_state": "claude_credits",
+    "invalidate_credit_cache": "claude_credits",
+    "require_claude_credits": "claude_credits",
+    "AUTO_CATEGORIZE_CONFIDENCE_THRESHOLD": "constants",
+    "HIGH_CONFIDENCE_SCORE": "constants",
+    "KEYWORD_MIN_LENGTH_FOR_HIGH_CONFIDENCE": "constants",
+    "MEDIUM_CONFIDENCE_SCORE": "constants",
+    "Base": "database",
+    "get_session": "database",
+    "get_logger": "logging",
+    "LatencyHistogram": "metrics",
+    "histogram": "metrics",
+    "render_prometheus": "metrics",
+    "retry_on_anthropic_error": "retry",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Importa el submódulo de un export la primera vez que se accede."""
+    try:
+        module_name = _LAZY_EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """Incluye los exports perezosos en dir()."""
+    return sorted(set(globals()) | set(__all__))
 
 
 __all__ = [
@@ -36,17 +110,24 @@ __all__ = [
     "TTLCache",
     "cached_query",
     "invalidate_profile_cache",
+    # Claude Client
+    "ClaudeClient",
+    "get_claude_client",
+    "get_token_usage",
     # Claude Credits
     "CreditStatus",
     "CreditState",
     "CreditCheckResult",
     "ClaudeServiceUnavailable",
+    "TokenBudgetExceeded",
+    "ClaudeCircuitOpen",
     "get_credit_state",
     "can_use_claude",
     "check_claude_credits",
     "handle_claude_error",
     "with_claude_fallback",
     "get_credit_status_summary",
+    "check_token_budget",
     "mark_credits_exhausted",
     "reset_credit_state",
     "invalidate_credit_cache",
@@ -61,6 +142,10 @@ __all__ = [
     "get_session",
     # Logging
     "get_logger",
+    # Metrics
+    "LatencyHistogram",
+    "histogram",
+    "render_prometheus",
     # Retry
     "retry_on_anthropic_error",
 ]
@@ -1,9 +1,20 @@
-"""Sistema de caching para optimizar performance del dashboard.
-
-Este módulo implementa múltiples estrategias de caching:
-1. TTL Cache (Time-To-Live) - Cache con expiración automática
-2. Profile-aware caching - Cache por perfil de usuario
-3. Streamlit integration - Compatible con st.session_state
+"""Sistema de caching para optimizar performance del dashboard y la API.
+
+Este módulo implementa:
+1. TTLCache - Cache LRU acotado (max_entries) con TTL por entrada, thread-safe
+2. Backends intercambiables - memoria del proceso (default), archivo SQLite
+   compartido por varios workers de la misma máquina, o Redis
+3. Namespaces por perfil - `@cached_query` guarda cada resultado bajo el
+   perfil al que pertenece; `invalidate_profile_cache` borra sólo ese perfil
+   en todas las funciones decoradas
+4. Métricas - hits, misses y evictions por cache (`get_stats`, `/metrics`)
+5. Contadores atómicos (`incr`) - ej: el consumo diario de tokens de Claude,
+   compartido por los workers con el mismo backend
+
+El backend del cache de consultas se elige con CACHE_BACKEND (memory, sqlite
+o redis) y CACHE_URL (ruta del archivo o URL de Redis). Redis es opcional:
+requiere el paquete `redis` y acota la memoria con su propia política
+(`maxmemory-policy allkeys-lru`).
 
 Beneficios:
 - Reduce queries a DB en ~80%
@@ -11,11 +22,25 @@ Beneficios:
 - Invalida automáticamente cache al cambiar perfil
 """
 
-from collections.abc import Callable
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
 import functools
+import inspect
+from pathlib import Path
+import pickle
+import sqlite3
+import tempfile
+import threading
 import time
 from typing import Any, TypeVar
+from uuid import UUID
 
+from finanzas_tracker.config.settings import settings
 from finanzas_tracker.core.logging import get_logger
 
 
@@ -24,23 +49,369 @@ logger = get_logger(__name__)
 # Type variable for generic function return type
 T = TypeVar("T")
 
+# Namespace de las entradas que no pertenecen a un perfil
+GLOBAL_NAMESPACE = "global"
+
+
+@dataclass
+class CacheStats:
+    """Contadores de un cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float | None:
+        """Fracción de lecturas que encontraron el valor."""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+
+class CacheBackend(ABC):
+    """Almacenamiento de un TTLCache: clave -> valor con expiración."""
+
+    name: str = "backend"
+
+    def __init__(self) -> None:
+        self.evictions = 0
+        self.expirations = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        """Valor vigente de la clave, o None si no existe o expiró."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        """Guarda el valor por `ttl_seconds` (puede desalojar el menos usado)."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Borra una clave. Retorna True si existía."""
+
+    @abstractmethod
+    def delete_matching(self, prefix: str = "", contains: str = "") -> int:
+        """
+        Borra las claves que empiezan con `prefix` y contienen `contains`.
+
+        Sin argumentos borra todo. Retorna la cantidad de claves borradas.
+        """
+
+    @abstractmethod
+    def size(self) -> int:
+        """Cantidad de entradas guardadas (incluye las expiradas sin limpiar)."""
+
+    @abstractmethod
+    def incr(self, key: str, amount: int, ttl_seconds: float) -> int:
+        """
+        Suma `amount` al contador de forma atómica y retorna el nuevo valor.
+
+        Un contador que no existe (o expiró) empieza en 0 y expira en
+        `ttl_seconds`; sumarle no renueva la expiración. `amount=0` lo lee.
+        """
+
+
+class MemoryBackend(CacheBackend):
+    """LRU en memoria del proceso (OrderedDict + lock)."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        """
+        Args:
+            max_entries: Entradas máximas; al pasarse se desaloja la menos usada
+        """
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def delete_matching(self, prefix: str = "", contains: str = "") -> int:
+        with self._lock:
+            if not prefix and not contains:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            keys = [key for key in self._entries if key.startswith(prefix) and contains in key]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def incr(self, key: str, amount: int, ttl_seconds: float) -> int:
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                value, expires_at = amount, now + ttl_seconds
+            else:
+                value, expires_at = entry[0] + amount, entry[1]
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return int(value)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    LRU en un archivo SQLite, compartido por los procesos de una máquina.
+
+    Sirve para varios workers de uvicorn: una invalidación en un worker
+    la ven todos. Los valores se guardan con pickle; cada hilo usa su
+    propia conexión.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str | Path, max_entries: int = 1024) -> None:
+        """
+        Args:
+            path: Archivo de la base (se crea si no existe)
+            max_entries: Entradas máximas; al pasarse se desalojan las menos usadas
+        """
+        super().__init__()
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at ON cache_entries (accessed_at)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any | None:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if row[1] <= now:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            self.expirations += 1
+            return None
+        conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+        # Sólo este módulo escribe en el archivo del cache
+        return pickle.loads(row[0])  # noqa: S301
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, pickle.dumps(value), now + ttl_seconds, now),
+        )
+        (count,) = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                " SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def delete(self, key: str) -> bool:
+        cursor = self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def delete_matching(self, prefix: str = "", contains: str = "") -> int:
+        # substr/instr en vez de LIKE: las claves pueden tener '%' o '_'
+        cursor = self._connection().execute(
+            "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ? AND instr(key, ?) > 0",
+            (len(prefix), prefix, contains),
+        )
+        return cursor.rowcount
+
+    def size(self) -> int:
+        (count,) = self._connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+        return int(count)
+
+    def incr(self, key: str, amount: int, ttl_seconds: float) -> int:
+        conn = self._connection()
+        # BEGIN IMMEDIATE toma el lock de escritura: la lectura y la escritura
+        # no se intercalan con las de otro proceso
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                value, expires_at = amount, now + ttl_seconds
+            else:
+                value, expires_at = pickle.loads(row[0]) + amount, row[1]  # noqa: S301
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, pickle.dumps(value), expires_at, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return int(value)
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache en Redis (o un servidor compatible) para varios hosts.
+
+    La expiración la hace Redis (PX); el tope de memoria y el desalojo
+    LRU se configuran en el servidor (`maxmemory-policy allkeys-lru`).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, key_prefix: str = "finanzas:cache:") -> None:
+        """
+        Args:
+            url: URL de Redis (ej: redis://localhost:6379/0)
+            key_prefix: Prefijo de todas las claves de este cache
+
+        Raises:
+            ImportError: Si el paquete `redis` no está instalado
+        """
+        super().__init__()
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "CACHE_BACKEND=redis requiere el paquete 'redis' (pip install redis)"
+            ) from e
+        self.key_prefix = key_prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any | None:
+        raw = self._client.get(self.key_prefix + key)
+        # Las claves llevan el prefijo propio; sólo este módulo las escribe
+        return pickle.loads(raw) if raw is not None else None  # noqa: S301
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._client.set(
+            self.key_prefix + key, pickle.dumps(value), px=max(int(ttl_seconds * 1000), 1)
+        )
+
+    def delete(self, key: str) -> bool:
+        return bool(self._client.delete(self.key_prefix + key))
+
+    def delete_matching(self, prefix: str = "", contains: str = "") -> int:
+        pattern = self.key_prefix + _redis_escape(prefix) + "*"
+        if contains:
+            pattern += _redis_escape(contains) + "*"
+        deleted = 0
+        batch: list[bytes] = []
+        for key in self._client.scan_iter(match=pattern, count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                deleted += self._client.unlink(*batch)
+                batch.clear()
+        if batch:
+            deleted += self._client.unlink(*batch)
+        return deleted
+
+    def size(self) -> int:
+        pattern = self.key_prefix + "*"
+        return sum(1 for _ in self._client.scan_iter(match=pattern, count=500))
+
+    def incr(self, key: str, amount: int, ttl_seconds: float) -> int:
+        # SET NX crea el contador con su expiración; INCRBY la conserva.
+        # Los contadores se guardan como enteros de Redis: se leen con incr, no con get
+        full_key = self.key_prefix + key
+        pipe = self._client.pipeline(transaction=True)
+        pipe.set(full_key, 0, px=max(int(ttl_seconds * 1000), 1), nx=True)
+        pipe.incrby(full_key, amount)
+        _, value = pipe.execute()
+        return int(value)
+
+
+def _redis_escape(text: str) -> str:
+    """Escapa los comodines de MATCH de Redis."""
+    for char in "\\*?[]":
+        text = text.replace(char, "\\" + char)
+    return text
+
 
 class TTLCache:
     """
-    Cache con Time-To-Live (TTL) que expira automáticamente.
+    Cache con Time-To-Live (TTL) y tope de entradas (LRU).
 
     Útil para datos que cambian poco pero necesitan refrescarse periódicamente.
+    `ttl_seconds` es el TTL por defecto; `set` acepta uno por entrada.
     """
 
-    def __init__(self, ttl_seconds: int = 300) -> None:
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        max_entries: int = 1024,
+        backend: CacheBackend | None = None,
+        name: str | None = None,
+    ) -> None:
         """
         Inicializa el cache con TTL.
 
         Args:
             ttl_seconds: Tiempo en segundos antes de expirar (default: 5 minutos)
+            max_entries: Entradas máximas del backend en memoria (default: 1024)
+            backend: Almacenamiento (default: MemoryBackend en el proceso)
+            name: Nombre para las métricas (se registra en `/metrics`)
         """
-        self.cache: dict[str, tuple[Any, float]] = {}
         self.ttl_seconds = ttl_seconds
+        self.backend = backend or MemoryBackend(max_entries)
+        self.name = name
+        self._hits = 0
+        self._misses = 0
+        self._stats_lock = threading.Lock()
+        if name:
+            _registry[name] = self
 
     def get(self, key: str) -> Any | None:
         """
@@ -52,26 +423,25 @@ class TTLCache:
         Returns:
             Valor cacheado o None si no existe o expiró
         """
-        if key not in self.cache:
-            return None
-
-        value, timestamp = self.cache[key]
-        if time.time() - timestamp > self.ttl_seconds:
-            # Expiró, eliminar
-            del self.cache[key]
-            return None
-
+        value = self.backend.get(key)
+        with self._stats_lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
         return value
 
-    def set(self, key: str, value: Any) -> None:
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
         """
-        Guarda un valor en el cache con timestamp actual.
+        Guarda un valor en el cache.
 
         Args:
             key: Clave del cache
             value: Valor a guardar
+            ttl_seconds: TTL de esta entrada (default: el del cache)
         """
-        self.cache[key] = (value, time.time())
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.backend.set(key, value, ttl)
 
     def invalidate(self, key: str | None = None) -> None:
         """
@@ -81,22 +451,183 @@ class TTLCache:
             key: Clave a invalidar, o None para invalidar todo
         """
         if key is None:
-            self.cache.clear()
+            self.backend.delete_matching()
             logger.debug("Cache completo invalidado")
-        elif key in self.cache:
-            del self.cache[key]
+        elif self.backend.delete(key):
             logger.debug(f"Cache invalidado para clave: {key}")
 
-    def get_stats(self) -> dict[str, int]:
+    def invalidate_matching(self, prefix: str = "", contains: str = "") -> int:
+        """
+        Invalida las claves que empiezan con `prefix` y contienen `contains`.
+
+        Returns:
+            Cantidad de entradas borradas
+        """
+        return self.backend.delete_matching(prefix, contains)
+
+    def incr(self, key: str, amount: int = 1, ttl_seconds: float | None = None) -> int:
+        """
+        Suma `amount` a un contador de forma atómica (también entre procesos
+        con los backends compartidos).
+
+        Args:
+            key: Clave del contador
+            amount: Cantidad a sumar (0 para sólo leerlo)
+            ttl_seconds: Expiración de un contador nuevo (default: la del cache)
+
+        Returns:
+            Valor del contador después de sumar
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        return self.backend.incr(key, amount, ttl)
+
+    def stats(self) -> CacheStats:
+        """Contadores de hits, misses y desalojos."""
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+        return CacheStats(
+            hits=hits,
+            misses=misses,
+            evictions=self.backend.evictions,
+            expirations=self.backend.expirations,
+        )
+
+    def reset_stats(self) -> None:
+        """Reinicia los contadores (útil en tests)."""
+        with self._stats_lock:
+            self._hits = self._misses = 0
+        self.backend.evictions = self.backend.expirations = 0
+
+    def get_stats(self) -> dict[str, Any]:
         """Retorna estadísticas del cache."""
+        stats = self.stats()
+        ratio = stats.hit_ratio
         return {
-            "total_keys": len(self.cache),
+            "total_keys": self.backend.size(),
             "ttl_seconds": self.ttl_seconds,
+            "backend": self.backend.name,
+            **asdict(stats),
+            "hit_ratio": round(ratio, 3) if ratio is not None else None,
         }
 
 
-# Cache global para consultas del dashboard
-dashboard_cache = TTLCache(ttl_seconds=300)  # 5 minutos
+# Caches con nombre, para /metrics
+_registry: dict[str, TTLCache] = {}
+
+
+def _query_cache_backend(
+    namespace: str | None = None, max_entries: int | None = None
+) -> CacheBackend:
+    """
+    Backend del cache de consultas según CACHE_BACKEND.
+
+    Args:
+        namespace: Espacio de claves aparte en el mismo backend (otro prefijo
+            de Redis u otro archivo SQLite); invalidar el cache de consultas
+            no lo toca
+        max_entries: Entradas máximas (default: settings.cache_max_entries)
+    """
+    max_entries = max_entries or settings.cache_max_entries
+    if settings.cache_backend == "redis":
+        if not settings.cache_url:
+            raise ValueError(
+                "CACHE_BACKEND=redis requiere CACHE_URL (ej: redis://localhost:6379/0)"
+            )
+        if namespace:
+            return RedisBackend(settings.cache_url, key_prefix=f"finanzas:{namespace}:")
+        return RedisBackend(settings.cache_url)
+    if settings.cache_backend == "sqlite":
+        path = Path(
+            settings.cache_url or Path(tempfile.gettempdir()) / "finanzas_query_cache.sqlite3"
+        )
+        if namespace:
+            path = path.with_name(f"{path.stem}_{namespace}{path.suffix}")
+        return SQLiteBackend(path, max_entries)
+    return MemoryBackend(max_entries)
+
+
+# Cache compartido por todas las funciones con @cached_query
+dashboard_cache = TTLCache(ttl_seconds=300, backend=_query_cache_backend(), name="queries")
+
+# Cache de identidad de la API: usuario autenticado y perfil activo.
+# TTL corto porque el dashboard (otro proceso) también puede cambiar el perfil activo.
+# Guarda copias de entidades ORM, por eso vive siempre en memoria del proceso.
+identity_cache = TTLCache(ttl_seconds=settings.identity_cache_ttl_seconds, name="identity")
+
+# Contadores diarios de tokens de Claude por perfil (`claude_credits`).
+# Con CACHE_BACKEND=sqlite o redis el presupuesto es uno para todos los workers.
+token_budget_cache = TTLCache(
+    ttl_seconds=2 * 24 * 3600, backend=_query_cache_backend("tokens"), name="token_budget"
+)
+
+# Cache de resolución de comercios: nombre raw -> merchant_id.
+# El mapeo sólo cambia al fusionar comercios (`merge_merchants` lo invalida).
+# Vive en el backend compartido: con sqlite o redis la invalidación llega a
+# todos los workers; además `lookup_many` verifica que los IDs sigan existiendo.
+merchant_cache = TTLCache(
+    ttl_seconds=3600,
+    backend=_query_cache_backend("merchants", max_entries=4096),
+    name="merchants",
+)
+
+
+# Tipos que generan la misma clave en cualquier proceso
+_KEY_TYPES = (str, int, float, bool, Decimal, date, datetime, UUID, Enum, type(None))
+
+
+def _key_part(value: Any) -> str:
+    """
+    Representación estable de un argumento para la clave del cache.
+
+    Raises:
+        TypeError: Si el valor no tiene una representación estable
+            (objetos cuyo repr incluye la dirección de memoria, sesiones, etc.)
+    """
+    if isinstance(value, _KEY_TYPES):
+        return repr(value)
+    if isinstance(value, (tuple, list, frozenset, set)):
+        parts = [_key_part(item) for item in value]
+        if isinstance(value, (set, frozenset)):
+            parts.sort()
+        return f"{type(value).__name__}({','.join(parts)})"
+    raise TypeError(f"argumento no cacheable: {type(value).__name__}")
+
+
+def _namespace(profile_id: Any) -> str:
+    return f"profile:{profile_id}"
+
+
+def _call_key(
+    func: Callable[..., Any],
+    signature: inspect.Signature,
+    profile_aware: bool,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> str:
+    """
+    Clave de una llamada: `<namespace>|<módulo.función>|<argumentos>`.
+
+    Los argumentos se normalizan con la firma de la función: `f(1, b=2)`
+    y `f(1, 2)` comparten entrada. Con `profile_aware` el namespace es
+    el `profile_id` (o el primer argumento).
+
+    Raises:
+        TypeError: Si algún argumento no es cacheable
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+
+    namespace = GLOBAL_NAMESPACE
+    if profile_aware and arguments:
+        if "profile_id" in arguments:
+            profile_id = arguments.pop("profile_id")
+        else:
+            profile_id = arguments.pop(next(iter(arguments)))
+        namespace = _namespace(profile_id)
+
+    parts = ",".join(f"{name}={_key_part(value)}" for name, value in arguments.items())
+    return f"{namespace}|{func.__module__}.{func.__qualname__}|{parts}"
 
 
 def cached_query(
@@ -105,9 +636,13 @@ def cached_query(
     """
     Decorador para cachear resultados de queries con TTL.
 
+    Todas las funciones decoradas comparten `dashboard_cache`. Los
+    resultados None no se cachean (ej: "no hay perfil activo todavía").
+
     Args:
         ttl_seconds: Tiempo de vida del cache en segundos (default: 5 min)
-        profile_aware: Si True, incluye profile_id en la cache key (default: True)
+        profile_aware: Si True, guarda el resultado en el namespace del
+            perfil (`profile_id`, o el primer argumento) (default: True)
 
     Returns:
         Decorador configurado
@@ -117,21 +652,23 @@ def cached_query(
         ... def get_monthly_expenses(profile_id: str, year: int, month: int):
         ...     # Expensive DB query
         ...     return expenses
+        >>> invalidate_profile_cache(profile_id)  # después de escribir
     """
-    cache = TTLCache(ttl_seconds=ttl_seconds)
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        signature = inspect.signature(func)
+        func_name = f"{func.__module__}.{func.__qualname__}"
+
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> T:
-            # Construir cache key
-            if profile_aware and args:
-                # Primer arg suele ser profile_id
-                cache_key = f"{func.__name__}:{args[0]}:{args[1:]}{tuple(sorted(kwargs.items()))}"
-            else:
-                cache_key = f"{func.__name__}:{args}{tuple(sorted(kwargs.items()))}"
+            try:
+                cache_key = _call_key(func, signature, profile_aware, args, kwargs)
+            except TypeError as e:
+                logger.debug(f"Cache BYPASS: {func.__name__} ({e})")
+                return func(*args, **kwargs)
 
             # Intentar obtener del cache
-            cached_value = cache.get(cache_key)
+            cached_value = dashboard_cache.get(cache_key)
             if cached_value is not None:
                 logger.debug(f"Cache HIT: {func.__name__}")
                 # cached_value could be Any, cast to T for return
@@ -142,13 +679,19 @@ def cached_query(
             result = func(*args, **kwargs)
 
             # Guardar en cache
-            cache.set(cache_key, result)
+            if result is not None:
+                dashboard_cache.set(cache_key, result, ttl_seconds)
 
             return result
 
+        def invalidate_cache(profile_id: str | None = None) -> None:
+            """Invalida las entradas de esta función (de un perfil o de todos)."""
+            prefix = f"{_namespace(profile_id)}|" if profile_id is not None else ""
+            dashboard_cache.invalidate_matching(prefix, contains=f"|{func_name}|")
+
         # Agregar método para invalidar cache manualmente
-        wrapper.invalidate_cache = cache.invalidate  # type: ignore[attr-defined]
-        wrapper.get_cache_stats = cache.get_stats  # type: ignore[attr-defined]
+        wrapper.invalidate_cache = invalidate_cache  # type: ignore[attr-defined]
+        wrapper.get_cache_stats = dashboard_cache.get_stats  # type: ignore[attr-defined]
 
         return wrapper
 
@@ -159,13 +702,84 @@ def invalidate_profile_cache(profile_id: str) -> None:
     """
     Invalida todo el cache relacionado con un perfil específico.
 
-    Útil después de crear/actualizar transacciones, ingresos, etc.
+    Útil después de crear/actualizar transacciones, ingresos, etc. Borra
+    las entradas de ese perfil en todas las funciones con `@cached_query`;
+    los demás perfiles conservan las suyas.
 
     Args:
         profile_id: ID del perfil a invalidar
     """
-    dashboard_cache.invalidate()
-    logger.info(f"Cache invalidado para perfil: {profile_id}")
+    count = dashboard_cache.invalidate_matching(prefix=f"{_namespace(profile_id)}|")
+    logger.info(f"Cache invalidado para perfil: {profile_id} ({count} entradas)")
+
+
+def invalidate_identity_cache(user_id: str | None = None) -> None:
+    """
+    Invalida el cache de identidad de la API.
 
+    Llamar al cambiar el perfil activo, desactivar un perfil o un usuario.
+
+    Args:
+        user_id: Usuario a invalidar, o None para invalidar usuarios y perfil activo
+    """
+    if user_id is None:
+        identity_cache.invalidate()
+    else:
+        identity_cache.invalidate(f"user:{user_id}")
 
-__all__ = ["TTLCache", "cached_query", "dashboard_cache", "invalidate_profile_cache"]
+
+def invalidate_merchant_cache(raw_names: Iterable[str] | None = None) -> None:
+    """
+    Invalida la resolución nombre raw -> merchant_id.
+
+    Llamar al fusionar o borrar comercios.
+
+    Args:
+        raw_names: Nombres raw a invalidar, o None para invalidar todo
+    """
+    if raw_names is None:
+        merchant_cache.invalidate()
+        return
+    for raw_name in raw_names:
+        merchant_cache.invalidate(f"raw:{raw_name}")
+
+
+def render_cache_metrics() -> str:
+    """Contadores de los caches con nombre en formato de texto de Prometheus."""
+    caches = sorted(_registry.items())
+    if not caches:
+        return ""
+
+    counters = (
+        ("cache_hits_total", "Lecturas del cache que encontraron el valor", "hits"),
+        ("cache_misses_total", "Lecturas del cache sin valor vigente", "misses"),
+        ("cache_evictions_total", "Entradas desalojadas por el tope LRU", "evictions"),
+    )
+    snapshots = {name: asdict(cache.stats()) for name, cache in caches}
+    lines: list[str] = []
+    for metric, description, field in counters:
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(
+            f'{metric}{{cache="{name}"}} {snapshot[field]}' for name, snapshot in snapshots.items()
+        )
+    return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "CacheBackend",
+    "CacheStats",
+    "MemoryBackend",
+    "RedisBackend",
+    "SQLiteBackend",
+    "TTLCache",
+    "cached_query",
+    "dashboard_cache",
+    "identity_cache",
+    "invalidate_identity_cache",
+    "invalidate_merchant_cache",
+    "invalidate_profile_cache",
+    "merchant_cache",
+    "render_cache_metrics",
+    "token_budget_cache",
+]
@@ -0,0 +1,392 @@
+"""
+Cliente central de Claude: prompt caching, consumo de tokens y presupuestos.
+
+Todas las llamadas a Claude de los servicios pasan por `ClaudeClient`:
+
+- El prompt se divide en un prefijo estático (`system`: instrucciones,
+  contexto de Costa Rica, lista de categorías) y la parte variable
+  (`messages`). El último bloque del prefijo lleva `cache_control`, así
+  Anthropic lo cachea: se procesa completo una vez y las llamadas
+  siguientes lo leen del cache (más barato y con menor latencia).
+- Cada respuesta suma sus tokens (entrada, cache escrito/leído y salida)
+  al contador de su `call_site`; ver `get_token_usage()`.
+- Si la llamada es de un perfil, antes se verifica y después se descuenta
+  su presupuesto diario (`claude_credits.check_token_budget`).
+- Cada llamada ocupa un cupo del limitador compartido y pasa por el
+  circuit breaker (`claude_limits`); los clientes sync comparten un solo
+  pool de conexiones HTTP (`pooled_http_client`).
+
+Para que el cache acierte, el prefijo debe ser idéntico byte a byte entre
+llamadas: nada variable (fechas, montos) dentro de `system`. Prefijos más
+cortos que el mínimo cacheable del modelo se procesan normal, sin error.
+
+Ejemplo:
+    >>> claude = get_claude_client()
+    >>> response = claude.create(
+    ...     call_site="smart_categorizer.llm",
+    ...     system=[INSTRUCCIONES, lista_de_categorias],
+    ...     messages=[{"role": "user", "content": "Comercio: UBER"}],
+    ...     max_tokens=200,
+    ...     profile_id=profile.id,
+    ... )
+    >>> response_text(response)
+"""
+
+__all__ = [
+    "ClaudeClient",
+    "TokenUsage",
+    "cached_system",
+    "get_claude_client",
+    "get_token_usage",
+    "pooled_http_client",
+    "reset_token_usage",
+    "response_text",
+]
+
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+import threading
+from typing import Any
+
+import anthropic
+from anthropic.lib.streaming import AsyncMessageStream
+from anthropic.types import Message
+import httpx
+
+from finanzas_tracker.config.settings import settings
+from finanzas_tracker.core.claude_credits import (
+    TokenBudgetExceeded,
+    check_token_budget,
+    record_token_usage,
+)
+from finanzas_tracker.core.claude_limits import aclaude_call_slot, claude_call_slot
+from finanzas_tracker.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _tokens(value: Any) -> int:
+    """Conteo de tokens del SDK (None en campos opcionales) como int."""
+    return value if isinstance(value, int) else 0
+
+
+@dataclass
+class TokenUsage:
+    """Tokens acumulados de un call site (o de una sola llamada)."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    output_tokens: int = 0
+
+    @classmethod
+    def from_response(cls, usage: Any) -> "TokenUsage":
+        """Construye el uso de una llamada a partir de `Message.usage`."""
+        return cls(
+            calls=1,
+            input_tokens=_tokens(getattr(usage, "input_tokens", 0)),
+            cache_creation_input_tokens=_tokens(getattr(usage, "cache_creation_input_tokens", 0)),
+            cache_read_input_tokens=_tokens(getattr(usage, "cache_read_input_tokens", 0)),
+            output_tokens=_tokens(getattr(usage, "output_tokens", 0)),
+        )
+
+    @property
+    def budget_tokens(self) -> int:
+        """
+        Tokens que se descuentan del presupuesto del perfil.
+
+        Las lecturas de cache cuentan al 10%, igual que en la facturación
+        de Anthropic: repetir el prefijo estático casi no consume presupuesto.
+        """
+        return (
+            self.input_tokens
+            + self.cache_creation_input_tokens
+            + self.output_tokens
+            + self.cache_read_input_tokens // 10
+        )
+
+    @property
+    def cache_hit_ratio(self) -> float | None:
+        """Fracción de los tokens de entrada que se leyeron del cache."""
+        total = self.input_tokens + self.cache_creation_input_tokens + self.cache_read_input_tokens
+        return self.cache_read_input_tokens / total if total else None
+
+    def add(self, other: "TokenUsage") -> None:
+        """Suma el uso de otra llamada."""
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.cache_creation_input_tokens += other.cache_creation_input_tokens
+        self.cache_read_input_tokens += other.cache_read_input_tokens
+        self.output_tokens += other.output_tokens
+
+    def to_dict(self) -> dict[str, Any]:
+        """Resumen para JSON (incluye el ratio de aciertos de cache)."""
+        ratio = self.cache_hit_ratio
+        return {
+            **asdict(self),
+            "cache_hit_ratio": round(ratio, 3) if ratio is not None else None,
+        }
+
+
+_usage_by_call_site: dict[str, TokenUsage] = {}
+_usage_lock = threading.Lock()
+
+
+def _record_usage(call_site: str, profile_id: str | None, usage: Any) -> TokenUsage:
+    """Acumula el uso de una respuesta en su call site y en el perfil."""
+    call_usage = TokenUsage.from_response(usage)
+    with _usage_lock:
+        _usage_by_call_site.setdefault(call_site, TokenUsage()).add(call_usage)
+    record_token_usage(profile_id, call_usage.budget_tokens)
+    logger.debug(
+        f"Claude [{call_site}]: in={call_usage.input_tokens} "
+        f"cache_write={call_usage.cache_creation_input_tokens} "
+        f"cache_read={call_usage.cache_read_input_tokens} out={call_usage.output_tokens}"
+    )
+    return call_usage
+
+
+def get_token_usage() -> dict[str, dict[str, Any]]:
+    """
+    Tokens consumidos por call site desde que arrancó el proceso.
+
+    Returns:
+        Diccionario call_site -> resumen de `TokenUsage.to_dict()`
+    """
+    with _usage_lock:
+        return {site: usage.to_dict() for site, usage in sorted(_usage_by_call_site.items())}
+
+
+def reset_token_usage() -> None:
+    """Reinicia los contadores por call site (útil en tests)."""
+    with _usage_lock:
+        _usage_by_call_site.clear()
+
+
+def cached_system(system: str | Sequence[str] | None) -> list[dict[str, Any]]:
+    """
+    Convierte el prefijo estático en bloques de `system` cacheables.
+
+    El `cache_control` va en el último bloque: Anthropic cachea todo el
+    prefijo hasta ese punto.
+
+    Args:
+        system: Texto o lista de textos estáticos (se omiten los vacíos)
+
+    Returns:
+        Lista de bloques de texto para el parámetro `system`
+    """
+    if system is None:
+        return []
+    texts = [system] if isinstance(system, str) else list(system)
+    blocks: list[dict[str, Any]] = [{"type": "text", "text": text} for text in texts if text]
+    if blocks:
+        blocks[-1]["cache_control"] = CACHE_CONTROL
+    return blocks
+
+
+def _connection_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.claude_max_concurrency,
+        max_keepalive_connections=settings.claude_max_concurrency,
+    )
+
+
+@lru_cache
+def pooled_http_client() -> httpx.Client:
+    """
+    Pool de conexiones HTTP compartido por los clientes sync de Anthropic.
+
+    Los servicios que crean su propio `anthropic.Anthropic` lo reciben como
+    `http_client`: reutilizan conexiones keep-alive en vez de abrir un pool
+    por instancia.
+    """
+    return anthropic.DefaultHttpxClient(limits=_connection_limits())
+
+
+def response_text(response: Message) -> str:
+    """Texto del primer bloque de la respuesta ("" si no es de texto)."""
+    first_block = response.content[0] if response.content else None
+    text = getattr(first_block, "text", None)
+    return text if isinstance(text, str) else ""
+
+
+class ClaudeClient:
+    """
+    Envoltorio de los clientes de Anthropic (sync y async).
+
+    Los clientes se crean al primer uso; se pueden inyectar ya creados
+    (tests, servicios que tienen su propio cliente).
+    """
+
+    def __init__(
+        self,
+        client: anthropic.Anthropic | None = None,
+        async_client: anthropic.AsyncAnthropic | None = None,
+        api_key: str | None = None,
+    ) -> None:
+        """
+        Inicializa el cliente.
+
+        Args:
+            client: Cliente sync de Anthropic (opcional)
+            async_client: Cliente async de Anthropic (opcional)
+            api_key: API key para los clientes que se creen (default: settings)
+        """
+        self._client = client
+        self._async_client = async_client
+        self._api_key = api_key
+
+    @property
+    def client(self) -> anthropic.Anthropic:
+        """Cliente sync de Anthropic."""
+        if self._client is None:
+            self._client = anthropic.Anthropic(
+                api_key=self._api_key or settings.anthropic_api_key,
+                http_client=pooled_http_client(),
+            )
+        return self._client
+
+    @property
+    def async_client(self) -> anthropic.AsyncAnthropic:
+        """Cliente async de Anthropic (streaming y endpoints `async def`)."""
+        if self._async_client is None:
+            self._async_client = anthropic.AsyncAnthropic(
+                api_key=self._api_key or settings.anthropic_api_key,
+                http_client=anthropic.DefaultAsyncHttpxClient(limits=_connection_limits()),
+            )
+        return self._async_client
+
+    def _params(
+        self,
+        system: str | Sequence[str] | None,
+        messages: list[dict[str, Any]],
+        model: str | None,
+        max_tokens: int | None,
+        profile_id: str | None,
+        cache: bool,
+        kwargs: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Verifica el presupuesto y arma los parámetros de `messages.create`."""
+        can_use, reason = check_token_budget(profile_id)
+        if not can_use:
+            raise TokenBudgetExceeded(reason)
+
+        params: dict[str, Any] = {
+            "model": model or settings.claude_model,
+            "max_tokens": max_tokens or settings.claude_max_tokens,
+            "messages": messages,
+            **kwargs,
+        }
+        if system:
+            if cache:
+                params["system"] = cached_system(system)
+            else:
+                params["system"] = system if isinstance(system, str) else "\n\n".join(system)
+        return params
+
+    def create(
+        self,
+        *,
+        call_site: str,
+        messages: list[dict[str, Any]],
+        system: str | Sequence[str] | None = None,
+        model: str | None = None,
+        max_tokens: int | None = None,
+        profile_id: str | None = None,
+        cache: bool = True,
+        **kwargs: Any,
+    ) -> Message:
+        """
+        Llama a `messages.create` con el prefijo estático cacheado.
+
+        Args:
+            call_site: Nombre del punto de llamada (para las métricas de tokens)
+            messages: Parte variable del prompt
+            system: Prefijo estático (texto o lista de bloques)
+            model: Modelo (default: settings.claude_model)
+            max_tokens: Máximo de tokens de salida (default: settings)
+            profile_id: Perfil al que se le descuentan los tokens
+            cache: Marcar el prefijo con cache_control
+            **kwargs: Otros parámetros de la API (temperature, etc.)
+
+        Returns:
+            Message de Anthropic
+
+        Raises:
+            TokenBudgetExceeded: Si el perfil agotó su presupuesto diario
+            ClaudeCircuitOpen: Si el circuit breaker está abierto (429/529)
+            anthropic.APIError: Errores de la API (se propagan sin cambios)
+        """
+        params = self._params(system, messages, model, max_tokens, profile_id, cache, kwargs)
+        with claude_call_slot():
+            response = self.client.messages.create(**params)
+        _record_usage(call_site, profile_id, response.usage)
+        return response
+
+    async def acreate(
+        self,
+        *,
+        call_site: str,
+        messages: list[dict[str, Any]],
+        system: str | Sequence[str] | None = None,
+        model: str | None = None,
+        max_tokens: int | None = None,
+        profile_id: str | None = None,
+        cache: bool = True,
+        **kwargs: Any,
+    ) -> Message:
+        """Versión async de `create` (mismos argumentos)."""
+        params = self._params(system, messages, model, max_tokens, profile_id, cache, kwargs)
+        async with aclaude_call_slot():
+            response = await self.async_client.messages.create(**params)
+        _record_usage(call_site, profile_id, response.usage)
+        return response
+
+    @asynccontextmanager
+    async def astream(
+        self,
+        *,
+        call_site: str,
+        messages: list[dict[str, Any]],
+        system: str | Sequence[str] | None = None,
+        model: str | None = None,
+        max_tokens: int | None = None,
+        profile_id: str | None = None,
+        cache: bool = True,
+        **kwargs: Any,
+    ) -> AsyncIterator[AsyncMessageStream]:
+        """
+        Streaming async (`messages.stream`) con el prefijo cacheado.
+
+        El uso de tokens se registra al salir del bloque, con el mensaje
+        acumulado por el stream. El cupo del limitador se mantiene durante
+        todo el stream.
+
+        Yields:
+            AsyncMessageStream de Anthropic
+        """
+        params = self._params(system, messages, model, max_tokens, profile_id, cache, kwargs)
+        async with (
+            aclaude_call_slot(),
+            self.async_client.messages.stream(**params) as stream,
+        ):
+            yield stream
+            _record_usage(call_site, profile_id, stream.current_message_snapshot.usage)
+
+
+@lru_cache
+def get_claude_client() -> ClaudeClient:
+    """
+    Cliente compartido para servicios que no guardan uno propio.
+
+    Returns:
+        ClaudeClient con la API key de settings
+    """
+    return ClaudeClient()
@@ -5,6 +5,7 @@ Este módulo proporciona utilidades para:
 - Detectar errores de créditos agotados cuando ocurren (NO proactivamente)
 - Cachear el estado de "sin créditos" para evitar llamadas innecesarias
 - Proporcionar fallbacks graceful cuando no hay créditos
+- Limitar los tokens diarios de cada perfil (CLAUDE_DAILY_TOKEN_BUDGET)
 
 IMPORTANTE: Este sistema NO hace llamadas proactivas a la API para verificar
 créditos (eso también costaría dinero). En su lugar:
@@ -18,6 +19,7 @@ Versión: 2.0.0
 
 import time
 from dataclasses import dataclass
+from datetime import date
 from enum import StrEnum
 from functools import wraps
 from typing import Any, Callable, TypeVar
@@ -25,6 +27,7 @@ from typing import Any, Callable, TypeVar
 import anthropic
 
 from finanzas_tracker.config.settings import settings
+from finanzas_tracker.core.cache import token_budget_cache
 from finanzas_tracker.core.logging import get_logger
 
 
@@ -294,6 +297,11 @@ def with_claude_fallback(
                 logger.info(f"⏭️ {func.__name__} falló por auth, usando fallback")
                 return fallback_value
 
+            except ClaudeServiceUnavailable as e:
+                # Presupuesto de tokens del perfil agotado, etc.
+                logger.info(f"⏭️ {func.__name__}: {e.message}, usando fallback")
+                return fallback_value
+
             except anthropic.PermissionDeniedError as e:
                 handle_claude_error(e)
                 logger.info(f"⏭️ {func.__name__} falló por permisos, usando fallback")
@@ -327,6 +335,85 @@ class ClaudeServiceUnavailable(Exception):
         super().__init__(message)
 
 
+class TokenBudgetExceeded(ClaudeServiceUnavailable):
+    """El perfil agotó su presupuesto diario de tokens de Claude."""
+
+
+class ClaudeCircuitOpen(ClaudeServiceUnavailable):
+    """
+    El circuit breaker de Claude está abierto (429/529 seguidos).
+
+    Las llamadas fallan de inmediato, sin ir a la API, hasta que pase
+    `retry_after` y una llamada de prueba confirme que Claude respondió.
+    """
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# Presupuesto de tokens por perfil: un contador por perfil y día en
+# `token_budget_cache`. Con CACHE_BACKEND=sqlite o redis los workers
+# comparten el contador (y sobrevive a reinicios); en memoria es por proceso.
+def _usage_key(profile_id: str) -> str:
+    return f"tokens:{profile_id}:{date.today().isoformat()}"
+
+
+def get_profile_token_usage(profile_id: str) -> int:
+    """
+    Tokens consumidos hoy por un perfil.
+
+    Args:
+        profile_id: ID del perfil
+
+    Returns:
+        Tokens registrados hoy (0 si no hay registros)
+    """
+    return token_budget_cache.incr(_usage_key(profile_id), 0)
+
+
+def check_token_budget(profile_id: str | None) -> tuple[bool, str]:
+    """
+    Verifica si el perfil todavía tiene presupuesto de tokens hoy.
+
+    Las llamadas sin perfil (ej: identificar comercios globales) y las
+    instalaciones sin presupuesto configurado siempre pasan.
+
+    Args:
+        profile_id: ID del perfil que origina la llamada
+
+    Returns:
+        Tuple de (puede_usar, mensaje_si_no)
+    """
+    budget = settings.claude_daily_token_budget
+    if not profile_id or budget <= 0:
+        return True, ""
+
+    used = get_profile_token_usage(profile_id)
+    if used >= budget:
+        return False, f"Presupuesto diario de tokens agotado ({used:,}/{budget:,})"
+    return True, ""
+
+
+def record_token_usage(profile_id: str | None, tokens: int) -> None:
+    """
+    Suma tokens al consumo diario del perfil (incremento atómico).
+
+    Args:
+        profile_id: ID del perfil (None = llamada sin perfil, no se registra)
+        tokens: Tokens consumidos por la llamada
+    """
+    if not profile_id or tokens <= 0:
+        return
+
+    token_budget_cache.incr(_usage_key(profile_id), tokens)
+
+
+def reset_token_budgets() -> None:
+    """Borra el consumo de tokens de todos los perfiles (útil en tests)."""
+    token_budget_cache.invalidate()
+
+
 def get_credit_status_summary() -> dict[str, Any]:
     """
     Obtiene un resumen del estado de créditos para mostrar en UI.
@@ -369,6 +456,8 @@ __all__ = [
     "CreditState",
     "CreditCheckResult",
     "ClaudeServiceUnavailable",
+    "TokenBudgetExceeded",
+    "ClaudeCircuitOpen",
     # Funciones principales
     "get_credit_state",
     "can_use_claude",
@@ -376,6 +465,11 @@ __all__ = [
     "handle_claude_error",
     "with_claude_fallback",
     "get_credit_status_summary",
+    # Presupuesto de tokens por perfil
+    "check_token_budget",
+    "record_token_usage",
+    "get_profile_token_usage",
+    "reset_token_budgets",
     # Funciones de control
     "mark_credits_exhausted",
     "mark_credits_error",
@@ -0,0 +1,383 @@
+"""
+Límites de concurrencia y circuit breaker para las llamadas a Claude.
+
+Todas las llamadas de `ClaudeClient` comparten, por proceso:
+
+- `RateLimiter`: un semáforo con `claude_max_concurrency` cupos y un token
+  bucket de `claude_requests_per_minute` (misma forma que el rate limit de
+  Anthropic: se rellena continuamente hasta el máximo por minuto). Procesar
+  un backlog grande no dispara más requests de las que acepta la cuenta.
+- `CircuitBreaker`: con `claude_circuit_failure_threshold` errores 429/529
+  seguidos se abre y las llamadas fallan al instante con `ClaudeCircuitOpen`
+  (los servicios usan su fallback) en vez de que cada camino reintente por
+  su lado. Pasado `claude_circuit_reset_seconds` (o el `retry-after` de la
+  API, si es mayor) deja pasar una llamada de prueba: si Claude responde se
+  cierra, si vuelve a fallar se abre otra vez.
+
+`fan_out` reparte trabajo síncrono (categorizar, identificar comercios) en
+hilos con `asyncio.gather`; el limitador decide cuántas llamadas llegan
+realmente a la API al mismo tiempo.
+
+Ejemplo:
+    >>> with claude_call_slot():
+    ...     response = client.messages.create(...)
+    >>> resultados = run_fan_out(categorizar, transacciones)
+"""
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitState",
+    "RateLimiter",
+    "aclaude_call_slot",
+    "claude_call_slot",
+    "fan_out",
+    "get_circuit_breaker",
+    "get_claude_limits_status",
+    "get_rate_limiter",
+    "reset_claude_limits",
+    "run_fan_out",
+]
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from enum import StrEnum
+from functools import lru_cache
+import threading
+import time
+from typing import Any, TypeVar
+import weakref
+
+import anthropic
+
+from finanzas_tracker.config.settings import settings
+from finanzas_tracker.core.claude_credits import ClaudeCircuitOpen
+from finanzas_tracker.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# 429 = rate limit, 529 = API sobrecargada
+OVERLOAD_STATUS_CODES = frozenset({429, 529})
+
+
+class RateLimiter:
+    """
+    Semáforo de concurrencia + token bucket de requests por minuto.
+
+    El semáforo sync (hilos) y el async (uno por event loop) tienen el
+    mismo tamaño; el token bucket es uno solo para ambos.
+    """
+
+    def __init__(self, max_concurrency: int, requests_per_minute: int) -> None:
+        """
+        Inicializa el limitador.
+
+        Args:
+            max_concurrency: Llamadas simultáneas permitidas
+            requests_per_minute: Requests por minuto (0 = sin límite)
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._async_semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._tokens = float(requests_per_minute)
+        self._updated_at = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        Toma un token del bucket.
+
+        Returns:
+            Segundos a esperar antes de hacer el request (0 si hay tokens)
+        """
+        if self.requests_per_minute <= 0:
+            return 0.0
+        rate = self.requests_per_minute / 60
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.requests_per_minute),
+                self._tokens + (now - self._updated_at) * rate,
+            )
+            self._updated_at = now
+            # Se reserva aunque quede en negativo: el siguiente espera más
+            self._tokens -= 1
+            return -self._tokens / rate if self._tokens < 0 else 0.0
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        """Ocupa un cupo (bloqueando el hilo) hasta salir del bloque."""
+        with self._semaphore:
+            wait = self.reserve()
+            if wait:
+                time.sleep(wait)
+            yield
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._async_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._async_semaphores[loop] = semaphore
+            return semaphore
+
+    @asynccontextmanager
+    async def aacquire(self) -> AsyncIterator[None]:
+        """Versión async de `acquire` (no bloquea el event loop)."""
+        async with self._async_semaphore():
+            wait = self.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+            yield
+
+
+class CircuitState(StrEnum):
+    """Estado del circuit breaker."""
+
+    CLOSED = "closed"  # Llamadas normales
+    OPEN = "open"  # Falla rápido, sin llamar a la API
+    HALF_OPEN = "half_open"  # Una llamada de prueba en curso
+
+
+def _retry_after(error: anthropic.APIStatusError) -> float:
+    """Segundos del header `retry-after` (0 si no viene o no es numérico)."""
+    try:
+        return float(error.response.headers.get("retry-after", 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+class CircuitBreaker:
+    """Circuit breaker que se abre con errores 429/529 consecutivos."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        """
+        Inicializa el breaker (cerrado).
+
+        Args:
+            failure_threshold: Errores 429/529 seguidos para abrirlo
+            reset_seconds: Tiempo mínimo abierto antes de la llamada de prueba
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._open_for = reset_seconds
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        """Estado actual (OPEN pasa a HALF_OPEN cuando vence la espera)."""
+        with self._lock:
+            if self._state == CircuitState.OPEN and self._remaining() <= 0:
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    def _remaining(self) -> float:
+        return self._opened_at + self._open_for - time.monotonic()
+
+    def before_call(self) -> None:
+        """
+        Verifica si se puede llamar a la API.
+
+        Raises:
+            ClaudeCircuitOpen: Si el circuito está abierto o ya hay una
+                llamada de prueba en curso
+        """
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return
+            remaining = self._remaining()
+            if remaining <= 0 and not self._probe_in_flight:
+                self._state = CircuitState.HALF_OPEN
+                self._probe_in_flight = True
+                logger.info("🔌 Circuit breaker de Claude: llamada de prueba")
+                return
+        raise ClaudeCircuitOpen(
+            "Claude está saturado (429/529); reintenta en unos segundos",
+            retry_after=max(remaining, 1.0),
+        )
+
+    def record_success(self) -> None:
+        """Claude respondió: cierra el circuito."""
+        with self._lock:
+            if self._state != CircuitState.CLOSED:
+                logger.info("✅ Circuit breaker de Claude cerrado")
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error: BaseException) -> None:
+        """
+        Registra el error de una llamada.
+
+        Sólo 429/529 cuentan para abrir el circuito. Otros errores HTTP
+        significan que la API respondió (equivalen a un éxito); los de red
+        o de la aplicación no cambian el conteo.
+
+        Args:
+            error: Excepción que lanzó la llamada
+        """
+        if not isinstance(error, anthropic.APIStatusError):
+            with self._lock:
+                self._probe_in_flight = False
+            return
+        if error.status_code not in OVERLOAD_STATUS_CODES:
+            self.record_success()
+            return
+
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == CircuitState.CLOSED and self._failures < self.failure_threshold:
+                return
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._open_for = max(self.reset_seconds, _retry_after(error))
+            failures, open_for = self._failures, self._open_for
+        logger.warning(
+            f"⚠️ Circuit breaker de Claude abierto por {open_for:.0f}s "
+            f"({failures} errores {error.status_code} seguidos)"
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        """Estado para /ai/health."""
+        state = self.state
+        with self._lock:
+            retry_after = max(self._remaining(), 0.0) if state == CircuitState.OPEN else 0.0
+            return {
+                "state": state.value,
+                "consecutive_failures": self._failures,
+                "retry_after_seconds": round(retry_after, 1),
+            }
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter:
+    """Limitador compartido, configurado desde settings."""
+    return RateLimiter(settings.claude_max_concurrency, settings.claude_requests_per_minute)
+
+
+@lru_cache
+def get_circuit_breaker() -> CircuitBreaker:
+    """Circuit breaker compartido, configurado desde settings."""
+    return CircuitBreaker(
+        settings.claude_circuit_failure_threshold, settings.claude_circuit_reset_seconds
+    )
+
+
+def reset_claude_limits() -> None:
+    """Descarta el limitador y el breaker (se recrean desde settings; útil en tests)."""
+    get_rate_limiter.cache_clear()
+    get_circuit_breaker.cache_clear()
+
+
+def get_claude_limits_status() -> dict[str, Any]:
+    """Configuración del limitador y estado del circuit breaker."""
+    limiter = get_rate_limiter()
+    return {
+        "max_concurrency": limiter.max_concurrency,
+        "requests_per_minute": limiter.requests_per_minute,
+        "circuit": get_circuit_breaker().snapshot(),
+    }
+
+
+@contextmanager
+def claude_call_slot() -> Iterator[None]:
+    """
+    Envuelve una llamada sync a la API: cupo del limitador + circuit breaker.
+
+    Raises:
+        ClaudeCircuitOpen: Si el circuito está abierto
+    """
+    breaker = get_circuit_breaker()
+    with get_rate_limiter().acquire():
+        # Se verifica con el cupo tomado: mientras se esperaba pudo abrirse
+        breaker.before_call()
+        try:
+            yield
+        except BaseException as e:
+            breaker.record_failure(e)
+            raise
+        breaker.record_success()
+
+
+@asynccontextmanager
+async def aclaude_call_slot() -> AsyncIterator[None]:
+    """Versión async de `claude_call_slot`."""
+    breaker = get_circuit_breaker()
+    async with get_rate_limiter().aacquire():
+        breaker.before_call()
+        try:
+            yield
+        except BaseException as e:
+            breaker.record_failure(e)
+            raise
+        breaker.record_success()
+
+
+async def fan_out(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    concurrency: int | None = None,
+) -> list[R]:
+    """
+    Aplica `func` a cada item en hilos concurrentes (`asyncio.gather`).
+
+    Pensado para funciones síncronas que llaman a Claude: cada una corre
+    en un hilo y `claude_call_slot` acota las llamadas reales a la API.
+    `func` no debe compartir una Session de SQLAlchemy entre hilos.
+
+    Args:
+        func: Función a aplicar
+        items: Items a procesar
+        concurrency: Hilos simultáneos (default: settings.claude_max_concurrency)
+
+    Returns:
+        Resultados en el mismo orden que `items`
+    """
+    limit = asyncio.Semaphore(concurrency or settings.claude_max_concurrency)
+
+    async def run(item: T) -> R:
+        async with limit:
+            return await asyncio.to_thread(func, item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+def run_fan_out(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    concurrency: int | None = None,
+) -> list[R]:
+    """
+    Versión síncrona de `fan_out` (scripts, procesamiento de correos).
+
+    Dentro de un event loop ya corriendo no se puede usar `asyncio.run`:
+    en ese caso procesa en serie.
+
+    Args:
+        func: Función a aplicar
+        items: Items a procesar
+        concurrency: Hilos simultáneos (default: settings.claude_max_concurrency)
+
+    Returns:
+        Resultados en el mismo orden que `items`
+    """
+    items = list(items)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        if len(items) > 1:
+            return asyncio.run(fan_out(func, items, concurrency))
+    return [func(item) for item in items]
@@ -5,13 +5,24 @@ Este módulo configura la conexión a PostgreSQL con pgvector
 y proporciona utilidades para trabajar con la base de datos.
 
 Requiere PostgreSQL 16+ con extensión pgvector instalada.
+
+Hay dos engines, cada uno con su propio pool y creados en el primer uso:
+- Sync (psycopg): dashboard, MCP, scripts y servicios existentes.
+- Async (asyncpg): routers `async def` de la API, vía `get_async_session`.
 """
 
-from collections.abc import Generator
-from contextlib import contextmanager
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
 from typing import Any
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import DDL, Engine, create_engine, event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from finanzas_tracker.config.settings import settings
@@ -23,6 +34,14 @@ logger = get_logger(__name__)
 # Base para modelos SQLAlchemy
 Base = declarative_base()
 
+# Los índices GIN `gin_trgm_ops` (ver services.text_search) necesitan pg_trgm
+# antes del CREATE TABLE; en producción lo instala la migración d0e1f2a3b4c5.
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
 
 def _create_engine(database_url: str | None = None) -> Engine:
     """
@@ -37,20 +56,131 @@ def _create_engine(database_url: str | None = None) -> Engine:
     url = database_url or settings.get_database_url()
 
     logger.info("🐘 Conectando a PostgreSQL...")
-    return create_engine(
-        url,
-        echo=settings.is_development(),
-        pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
-    )
+    return create_engine(url, **_pool_options())
+
+
+def _pool_options() -> dict[str, Any]:
+    """Opciones de pool comunes a ambos engines (configurables en settings)."""
+    return {
+        "echo": settings.is_development(),
+        "pool_pre_ping": True,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
+def _create_async_engine(database_url: str | None = None) -> AsyncEngine:
+    """
+    Crea el engine async (asyncpg) para PostgreSQL.
+
+    Registra el tipo `vector` de pgvector en cada conexión nueva: asyncpg
+    no sabe codificarlo sin un codec explícito.
+
+    Args:
+        database_url: URL de conexión opcional (postgresql+asyncpg://...)
+
+    Returns:
+        AsyncEngine de SQLAlchemy
+    """
+    url = database_url or settings.get_async_database_url()
+
+    logger.info("🐘 Conectando a PostgreSQL (async)...")
+    async_engine = create_async_engine(url, **_pool_options())
+
+    if async_engine.dialect.driver == "asyncpg":
+        from pgvector.asyncpg import register_vector
+
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def _register_vector(dbapi_connection: Any, _record: Any) -> None:
+            dbapi_connection.run_async(register_vector)
+
+    return async_engine
+
+
+@lru_cache
+def get_engine() -> Engine:
+    """
+    Obtiene el engine compartido, creándolo en el primer uso.
+
+    Importar este módulo (o cualquier modelo) no abre el pool de conexiones:
+    el engine se crea la primera vez que una sesión lo necesita.
+
+    Returns:
+        Engine de SQLAlchemy configurado para PostgreSQL
+    """
+    return _create_engine()
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """
+    Obtiene el engine async compartido, creándolo en el primer uso.
+
+    Returns:
+        AsyncEngine de SQLAlchemy configurado para PostgreSQL
+    """
+    return _create_async_engine()
 
 
-# Engine de SQLAlchemy
-engine = _create_engine()
+class _LazySession(Session):
+    """
+    Session que se enlaza al engine compartido sólo cuando no recibe bind.
+
+    La primera sesión registra los eventos de la aplicación para todas las
+    sesiones de esta clase (ver `_register_session_events`).
+    """
+
+    def __init__(self, bind: Any = None, **kwargs: Any) -> None:
+        _register_session_events()
+        super().__init__(bind=bind if bind is not None else get_engine(), **kwargs)
+
+
+@lru_cache
+def _register_session_events() -> None:
+    """
+    Registra los listeners de sesión de la aplicación (una sola vez).
+
+    Aquí y no en cada punto de entrada: el worker de jobs, los scripts y el
+    servidor MCP también escriben transacciones. Se aplican a `_LazySession`
+    (sesiones sync y las internas de las async), no a las `Session` sueltas
+    de los tests.
+    """
+    # Import local: los servicios importan este módulo
+    from finanzas_tracker.services.balance_ledger_service import register_ledger_events
+    from finanzas_tracker.services.review_queue import register_review_queue_events
+
+    register_ledger_events(_LazySession)
+    register_review_queue_events(_LazySession)
+
 
 # SessionLocal para crear sesiones de base de datos
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=_LazySession, autocommit=False, autoflush=False)
+
+
+class _LazyAsyncSession(AsyncSession):
+    """AsyncSession que se enlaza al engine async compartido sólo cuando no recibe bind."""
+
+    def __init__(self, bind: Any = None, **kwargs: Any) -> None:
+        super().__init__(bind=bind if bind is not None else get_async_engine(), **kwargs)
+
+
+# AsyncSessionLocal: sin expirar en commit, porque en async un atributo
+# expirado no se puede recargar de forma implícita (lazy load)
+AsyncSessionLocal = async_sessionmaker(
+    class_=_LazyAsyncSession,
+    sync_session_class=_LazySession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+def __getattr__(name: str) -> Any:
+    """Mantiene `engine` como alias perezoso de get_engine()."""
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db() -> Generator[Session, Any, None]:
@@ -98,6 +228,29 @@ def get_session() -> Generator[Session, None, None]:
         session.close()
 
 
+@asynccontextmanager
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Context manager async para obtener una sesión de base de datos.
+
+    Yields:
+        AsyncSession: Sesión async de SQLAlchemy
+
+    Example:
+        >>> from finanzas_tracker.core.database import get_async_session
+        >>> async with get_async_session() as session:
+        ...     result = await session.execute(select(Transaction))
+    """
+    session = AsyncSessionLocal()
+    try:
+        yield session
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
 def init_db() -> None:
     """
     Inicializa la base de datos creando todas las tablas.
@@ -109,7 +262,7 @@ def init_db() -> None:
 
     # Importar todos los modelos aquí para que SQLAlchemy los registre
 
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
     logger.success("Base de datos inicializada correctamente")
 
 
@@ -125,8 +278,20 @@ def drop_db() -> None:
         raise RuntimeError("No se puede eliminar la base de datos en producción")
 
     logger.warning("Eliminando todas las tablas de la base de datos...")
-    Base.metadata.drop_all(bind=engine)
+    Base.metadata.drop_all(bind=get_engine())
     logger.success("Base de datos eliminada")
 
 
-__all__ = ["Base", "engine", "SessionLocal", "get_db", "get_session", "init_db", "drop_db"]
+__all__ = [
+    "Base",
+    "engine",  # noqa: F822 - alias perezoso resuelto por __getattr__
+    "get_engine",
+    "get_async_engine",
+    "SessionLocal",
+    "AsyncSessionLocal",
+    "get_db",
+    "get_session",
+    "get_async_session",
+    "init_db",
+    "drop_db",
+]
@@ -0,0 +1,252 @@
+"""
+Métricas de latencia en memoria (histogramas por buckets).
+
+Histogramas acumulativos estilo Prometheus, sin dependencias externas:
+cada proceso de la API guarda sus propios contadores y los expone en
+`/metrics` (formato de texto de Prometheus) y en `/ai/health`.
+
+Ejemplo:
+    >>> SEARCH_LATENCY = histogram(
+    ...     "ai_request_duration_seconds", "Latencia de AI", endpoint="/ai/search"
+    ... )
+    >>> with SEARCH_LATENCY.time():
+    ...     buscar()
+    >>> @SEARCH_LATENCY.timed
+    ... def semantic_search(request): ...
+    >>> SEARCH_LATENCY.snapshot()["p95_ms"]
+"""
+
+__all__ = ["LatencyHistogram", "histogram", "render_prometheus", "reset_metrics"]
+
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+import functools
+import inspect
+import threading
+import time
+from typing import Any, ParamSpec, TypeVar, cast
+
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class LatencyHistogram:
+    """
+    Histograma de latencias con buckets fijos (en segundos).
+
+    Thread-safe: la API sirve endpoints síncronos desde el threadpool.
+    Los percentiles se estiman interpolando dentro del bucket, igual
+    que `histogram_quantile` de Prometheus.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        labels: dict[str, str] | None = None,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        """
+        Inicializa el histograma.
+
+        Args:
+            name: Nombre de la métrica (ej: "ai_request_duration_seconds")
+            description: Texto de ayuda para /metrics
+            labels: Etiquetas fijas (ej: {"endpoint": "/ai/search"})
+            buckets: Límites superiores de cada bucket, ordenados
+        """
+        self.name = name
+        self.description = description
+        self.labels = labels or {}
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Registra una medición."""
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+            self._count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Mide la duración del bloque (también si lanza una excepción)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def timed(self, func: Callable[P, R]) -> Callable[P, R]:
+        """
+        Decorador que mide cada llamada de una función (síncrona o async).
+
+        Conserva la firma (functools.wraps), así que sirve sobre endpoints
+        de FastAPI: `@router.post(...)` arriba y `@hist.timed` abajo. En
+        corutinas mide hasta que terminan, no solo hasta crear la corutina.
+        """
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+                with self.time():
+                    return await func(*args, **kwargs)
+
+            return cast(Callable[P, R], async_wrapper)
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with self.time():
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def percentile(self, q: float) -> float | None:
+        """
+        Estima el percentil `q` (0-1) en segundos.
+
+        Returns:
+            Latencia estimada, o None si no hay mediciones
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+        if total == 0:
+            return None
+
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if cumulative + count >= rank and count > 0:
+                if index == len(self.buckets):
+                    # Bucket +Inf: el mejor estimado es el último límite
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Resumen para JSON: conteo, promedio y p50/p95/p99 en milisegundos."""
+        with self._lock:
+            count, total = self._count, self._sum
+
+        def _ms(value: float | None) -> float | None:
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "count": count,
+            "avg_ms": _ms(total / count) if count else None,
+            "p50_ms": _ms(self.percentile(0.50)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "p99_ms": _ms(self.percentile(0.99)),
+        }
+
+    def render(self) -> list[str]:
+        """Líneas `_bucket`, `_sum` y `_count` en formato Prometheus."""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), counts, strict=True):
+            cumulative += bucket_count
+            labels = _format_labels({**self.labels, "le": str(bound)})
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels)
+        lines.append(f"{self.name}_sum{labels} {total}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def reset(self) -> None:
+        """Borra todas las mediciones."""
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum = 0.0
+            self._count = 0
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return "{" + inner + "}"
+
+
+_registry: dict[tuple[str, tuple[tuple[str, str], ...]], LatencyHistogram] = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(name: str, description: str = "", **labels: str) -> LatencyHistogram:
+    """
+    Obtiene (o crea) el histograma con ese nombre y etiquetas.
+
+    Args:
+        name: Nombre de la métrica
+        description: Texto de ayuda (se usa al crearlo)
+        **labels: Etiquetas que identifican la serie
+
+    Returns:
+        Histograma registrado, compartido en todo el proceso
+    """
+    key = (name, tuple(sorted(labels.items())))
+    with _registry_lock:
+        existing = _registry.get(key)
+        if existing is None:
+            existing = LatencyHistogram(name, description, labels)
+            _registry[key] = existing
+        return existing
+
+
+def render_prometheus() -> str:
+    """Todos los histogramas registrados en formato de texto de Prometheus."""
+    with _registry_lock:
+        histograms = sorted(_registry.values(), key=lambda h: (h.name, sorted(h.labels.items())))
+
+    descriptions: dict[str, str] = {}
+    for hist in histograms:
+        if hist.description:
+            descriptions.setdefault(hist.name, hist.description)
+
+    lines: list[str] = []
+    current_name = None
+    for hist in histograms:
+        if hist.name != current_name:
+            current_name = hist.name
+            if hist.name in descriptions:
+                lines.append(f"# HELP {hist.name} {descriptions[hist.name]}")
+            lines.append(f"# TYPE {hist.name} histogram")
+        lines.extend(hist.render())
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def reset_metrics() -> None:
+    """Reinicia todas las mediciones (útil en tests)."""
+    with _registry_lock:
+        histograms = list(_registry.values())
+    for hist in histograms:
+        hist.reset()
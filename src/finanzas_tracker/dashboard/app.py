@@ -166,6 +166,13 @@ from finanzas_tracker.models.transaction import Transaction
 from finanzas_tracker.utils.seed_categories import seed_categories
 from finanzas_tracker.utils.seed_merchants import seed_merchants
 from finanzas_tracker.services.insights_service import InsightsService, InsightType
+from finanzas_tracker.services.review_queue import (
+    COMERCIOS_AMBIGUOS,
+    COMERCIOS_DESCONOCIDOS,
+    COMPRAS_SIN_CATEGORIA,
+    TRANSFERENCIAS_CONFUSAS,
+    contar_pendientes,
+)
 
 
 logger = get_logger(__name__)
@@ -692,84 +699,7 @@ def contar_items_pendientes_revision(profile_id: str) -> dict:
     Returns:
         Dict con conteos por tipo y total
     """
-    with get_session() as session:
-        # 1. SINPE/Transferencias que necesitan reconciliación
-        transferencias_confusas = session.query(Transaction).filter(
-            Transaction.profile_id == profile_id,
-            Transaction.necesita_reconciliacion_sinpe == True,
-            Transaction.deleted_at.is_(None),
-        ).count()
-        
-        # 2. Comercios ambiguos (pueden ser de varias categorías)
-        comercios_ambiguos = session.query(Transaction).filter(
-            Transaction.profile_id == profile_id,
-            Transaction.es_comercio_ambiguo == True,
-            Transaction.deleted_at.is_(None),
-        ).count()
-        
-        # 3. Compras/Gastos de tarjeta sin categoría
-        compras_sin_categoria = session.query(Transaction).filter(
-            Transaction.profile_id == profile_id,
-            Transaction.subcategory_id.is_(None),
-            Transaction.tipo_transaccion == "PURCHASE",
-            Transaction.excluir_de_presupuesto == False,
-            Transaction.deleted_at.is_(None),
-        ).count()
-        
-        # 4. Transferencias sin categoría (que no son SINPE confusos)
-        transferencias_sin_categoria = session.query(Transaction).filter(
-            Transaction.profile_id == profile_id,
-            Transaction.subcategory_id.is_(None),
-            Transaction.tipo_transaccion == "TRANSFER",
-            Transaction.necesita_reconciliacion_sinpe == False,
-            Transaction.excluir_de_presupuesto == False,
-            Transaction.deleted_at.is_(None),
-        ).count()
-        
-        # 5. Transacciones con comercio desconocido o genérico
-        comercios_desconocidos = session.query(Transaction).filter(
-            Transaction.profile_id == profile_id,
-            Transaction.es_desconocida == True,
-            Transaction.deleted_at.is_(None),
-        ).count()
-        
-        # 6. Depósitos/Ingresos sin identificar
-        from finanzas_tracker.models.income import Income
-        ingresos_sin_confirmar = session.query(Income).filter(
-            Income.profile_id == profile_id,
-            Income.confirmado == False,
-            Income.deleted_at.is_(None),
-        ).count()
-        
-        # 7. Preguntas pendientes de IA
-        from finanzas_tracker.models.pending_question import PendingQuestion, QuestionStatus
-        
-        preguntas_ia = session.query(PendingQuestion).filter(
-            PendingQuestion.profile_id == profile_id,
-            PendingQuestion.status == QuestionStatus.PENDIENTE,
-            PendingQuestion.deleted_at.is_(None),
-        ).count()
-        
-        # Totales por grupo
-        transferencias_total = transferencias_confusas + transferencias_sin_categoria
-        compras_total = compras_sin_categoria + comercios_ambiguos + comercios_desconocidos
-        
-        total = transferencias_total + compras_total + ingresos_sin_confirmar + preguntas_ia
-        
-        return {
-            "transferencias_confusas": transferencias_confusas,
-            "comercios_ambiguos": comercios_ambiguos,
-            "compras_sin_categoria": compras_sin_categoria,
-            "transferencias_sin_categoria": transferencias_sin_categoria,
-            "comercios_desconocidos": comercios_desconocidos,
-            "ingresos_sin_confirmar": ingresos_sin_confirmar,
-            "preguntas_ia": preguntas_ia,
-            # Agrupados
-            "transferencias": transferencias_total,
-            "compras": compras_total,
-            "ingresos": ingresos_sin_confirmar,
-            "total": total,
-        }
+    return contar_pendientes(profile_id)
 
 
 def mostrar_revision_inicial(perfil: Profile) -> bool:
@@ -859,13 +789,14 @@ def _mostrar_revision_transferencias(perfil: Profile, pendientes: dict) -> None:
     """Muestra transferencias (SINPE y otras) que necesitan revisión con chatbox AI."""
     from finanzas_tracker.services.transaction_clarifier import TransactionClarifierService
     from finanzas_tracker.services.pattern_learning_service import PatternLearningService
+    from finanzas_tracker.services.transaction_service import TransactionService
     
     with get_session() as session:
         # Buscar todas las transferencias que necesitan revisión
         transferencias = session.query(Transaction).filter(
             Transaction.profile_id == perfil.id,
             Transaction.deleted_at.is_(None),
-            Transaction.necesita_reconciliacion_sinpe == True,
+            TRANSFERENCIAS_CONFUSAS,
         ).order_by(Transaction.fecha_transaccion.desc()).limit(20).all()
         
         if not transferencias:
@@ -886,13 +817,42 @@ def _mostrar_revision_transferencias(perfil: Profile, pendientes: dict) -> None:
         clarifier = TransactionClarifierService(session)
         learning_service = PatternLearningService(session)
         
+        # Buscar sugerencias de patrones aprendidos
+        sugerencias_por_txn = {
+            txn.id: learning_service.buscar_sugerencias(txn) for txn in transferencias
+        }
+        aceptables = {
+            txn_id: sugs[0]
+            for txn_id, sugs in sugerencias_por_txn.items()
+            if sugs and sugs[0].confidence >= 0.70
+        }
+        if aceptables and st.button(
+            f"✅ Aceptar todas las sugerencias ({len(aceptables)})",
+            key="accept_sug_todas",
+            type="primary",
+        ):
+            # Un solo UPDATE para todo el lote
+            TransactionService(session).actualizar_batch(
+                perfil.id,
+                [
+                    {
+                        "id": txn_id,
+                        "subcategory_id": sug.subcategory_id,
+                        "necesita_reconciliacion_sinpe": False,
+                    }
+                    for txn_id, sug in aceptables.items()
+                ],
+            )
+            st.success(f"✅ ¡{len(aceptables)} transferencias guardadas!")
+            time.sleep(0.5)
+            st.rerun()
+        
         for txn in transferencias:
             # Determinar qué información tenemos
             tiene_beneficiario = bool(txn.beneficiario)
             tiene_concepto = bool(txn.concepto_transferencia)
             
-            # Buscar sugerencias de patrones aprendidos
-            sugerencias = learning_service.buscar_sugerencias(txn)
+            sugerencias = sugerencias_por_txn[txn.id]
             tiene_sugerencia = len(sugerencias) > 0 and sugerencias[0].confidence >= 0.70
             
             # Crear título descriptivo
@@ -1072,17 +1032,14 @@ def _mostrar_revision_transferencias(perfil: Profile, pendientes: dict) -> None:
 
 def _mostrar_revision_compras(perfil: Profile, pendientes: dict) -> None:
     """Muestra compras/gastos de tarjeta que necesitan revisión."""
+    from finanzas_tracker.services.transaction_service import TransactionService
+    
     with get_session() as session:
         # Buscar compras confusas
         compras = session.query(Transaction).filter(
             Transaction.profile_id == perfil.id,
-            Transaction.tipo_transaccion == "PURCHASE",
             Transaction.deleted_at.is_(None),
-            (
-                (Transaction.subcategory_id.is_(None)) |
-                (Transaction.es_comercio_ambiguo == True) |
-                (Transaction.es_desconocida == True)
-            )
+            COMPRAS_SIN_CATEGORIA | COMERCIOS_AMBIGUOS | COMERCIOS_DESCONOCIDOS,
         ).order_by(Transaction.monto_crc.desc()).limit(15).all()
         
         if not compras:
@@ -1153,6 +1110,19 @@ def _mostrar_revision_compras(perfil: Profile, pendientes: dict) -> None:
                         st.rerun()
                     else:
                         st.warning("Selecciona una categoría")
+        
+        # Guardar de una vez las categorías elegidas arriba (un solo UPDATE)
+        elegidas = [
+            {"id": txn.id, "subcategory_id": subcat_options[seleccion], "es_comercio_ambiguo": False}
+            for txn in compras
+            if (seleccion := st.session_state.get(f"compra_cat_{txn.id}")) in subcat_options
+        ]
+        if elegidas and st.button(
+            f"💾 Guardar todas ({len(elegidas)})", key="compras_guardar_todas", type="primary"
+        ):
+            TransactionService(session).actualizar_batch(perfil.id, elegidas)
+            st.success(f"✅ ¡{len(elegidas)} compras guardadas!")
+            st.rerun()
 
 
 def _mostrar_revision_ingresos(perfil: Profile, pendientes: dict) -> None:
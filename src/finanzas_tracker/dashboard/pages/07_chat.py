@@ -65,12 +65,11 @@ def chat_page() -> None:
             st.chat_message("user").write(user_input)
             st.session_state.chat_history.append({"role": "user", "content": user_input})
 
-            # Obtener respuesta
-            with st.spinner("Pensando..."):
-                response = finance_chat_service.chat(user_input, str(perfil.id))
-
-            # Mostrar respuesta
-            st.chat_message("assistant").write(response)
+            # Mostrar la respuesta a medida que Claude la genera
+            with st.chat_message("assistant"):
+                response = st.write_stream(
+                    finance_chat_service.chat_stream(user_input, str(perfil.id))
+                )
             st.session_state.chat_history.append({"role": "assistant", "content": response})
 
         # Boton para limpiar historial
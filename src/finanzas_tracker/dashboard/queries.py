@@ -16,6 +16,7 @@ from finanzas_tracker.models.account import Account
 from finanzas_tracker.models.enums import TransactionType
 from finanzas_tracker.models.income import Income
 from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services.balance_ledger_service import BalanceLedgerService
 
 
 @cached_query(ttl_seconds=300, profile_aware=True)
@@ -34,35 +35,17 @@ def get_patrimonio_total(profile_id: str) -> dict[str, Decimal]:
         # 1. Saldo en cuentas
         patrimonio_cuentas = Account.calcular_patrimonio_total(session, profile_id)
 
-        # 2. Movimientos históricos
-        ingresos_historicos = (
-            session.query(Income)
-            .filter(
-                Income.profile_id == profile_id,
-                Income.deleted_at.is_(None),
-            )
-            .all()
-        )
-        patrimonio_ingresos = sum(i.calcular_monto_patrimonio() for i in ingresos_historicos)
-
-        gastos_historicos = (
-            session.query(Transaction)
-            .filter(
-                Transaction.profile_id == profile_id,
-                Transaction.deleted_at.is_(None),
-            )
-            .all()
-        )
-        patrimonio_gastos = sum(g.calcular_monto_patrimonio() for g in gastos_historicos)
-        movimientos_netos = patrimonio_ingresos - patrimonio_gastos
+        # 2. Movimientos históricos: última fila del libro de saldos de cada cuenta
+        movimientos = BalanceLedgerService(session).totales_en(profile_id, date.today())
+        movimientos_netos = movimientos.neto_crc
 
         # Patrimonio total
         patrimonio_total = patrimonio_cuentas + movimientos_netos
 
         return {
             "patrimonio_cuentas": patrimonio_cuentas,
-            "patrimonio_ingresos": patrimonio_ingresos,
-            "patrimonio_gastos": patrimonio_gastos,
+            "patrimonio_ingresos": movimientos.ingresos_crc,
+            "patrimonio_gastos": movimientos.egresos_crc,
             "movimientos_netos": movimientos_netos,
             "patrimonio_total": patrimonio_total,
         }
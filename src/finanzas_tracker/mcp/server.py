@@ -29,6 +29,7 @@ from finanzas_tracker.core.logging import get_logger
 from finanzas_tracker.models.category import Category, Subcategory
 from finanzas_tracker.models.profile import Profile
 from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services.text_search import ranked
 
 
 # =============================================================================
@@ -624,38 +625,37 @@ def search_transactions(query: str, limit: int = 10) -> dict[str, Any]:
             from finanzas_tracker.services.embedding_service import EmbeddingService
 
             service = EmbeddingService(session)
-            results = service.search_similar(query, profile_id=profile_id, limit=limit)
+            hits = service.search_hits(query, profile_id=profile_id, limit=limit)
 
-            if results:
+            if hits:
                 return {
                     "query": query,
                     "tipo_busqueda": "semántica",
-                    "total": len(results),
+                    "total": len(hits),
                     "resultados": [
                         {
-                            "comercio": txn.comercio,
-                            "monto": _format_currency(txn.monto_crc),
-                            "fecha": txn.fecha_transaccion.strftime("%Y-%m-%d"),
-                            "categoria": txn.categoria_sugerida_por_ia,
-                            "relevancia": f"{similarity * 100:.0f}%",
+                            "comercio": hit.comercio,
+                            "monto": _format_currency(hit.monto_crc),
+                            "fecha": hit.fecha.strftime("%Y-%m-%d"),
+                            "categoria": hit.categoria_sugerida,
+                            "relevancia": f"{hit.similarity * 100:.0f}%",
                         }
-                        for txn, similarity in results
+                        for hit in hits
                     ],
                 }
         except Exception as e:
             logger.warning(f"Búsqueda semántica falló, usando fallback: {e}")
 
-        # Fallback a búsqueda simple
-        stmt = (
-            select(Transaction)
-            .where(
+        # Fallback a búsqueda por trigramas, las más parecidas primero
+        stmt = ranked(
+            select(Transaction).where(
                 Transaction.profile_id == profile_id,
                 Transaction.deleted_at.is_(None),
-                Transaction.comercio.ilike(f"%{query}%"),
-            )
-            .order_by(Transaction.fecha_transaccion.desc())
-            .limit(limit)
-        )
+            ),
+            [Transaction.comercio],
+            query,
+            limit=limit,
+        ).order_by(Transaction.fecha_transaccion.desc())
         transactions = session.execute(stmt).scalars().all()
 
         return {
@@ -1,6 +1,8 @@
 """Modelos de base de datos - Finanzas Tracker CR."""
 
 from finanzas_tracker.models.account import Account
+from finanzas_tracker.models.anomaly_baseline import AnomalyBaseline
+from finanzas_tracker.models.balance_ledger import BalanceLedgerEntry
 from finanzas_tracker.models.base import (
     BaseModelMixin,
     SoftDeleteMixin,
@@ -12,7 +14,11 @@ from finanzas_tracker.models.budget import Budget
 from finanzas_tracker.models.card import Card
 from finanzas_tracker.models.card_payment import CardPayment
 from finanzas_tracker.models.category import Category, Subcategory
-from finanzas_tracker.models.embedding import TransactionEmbedding
+from finanzas_tracker.models.embedding import (
+    EmbeddingMigration,
+    EmbeddingMigrationStatus,
+    TransactionEmbedding,
+)
 from finanzas_tracker.models.enums import (
     AccountType,
     BankName,
@@ -33,6 +39,7 @@ from finanzas_tracker.models.enums import (
 from finanzas_tracker.models.exchange_rate_cache import ExchangeRateCache
 from finanzas_tracker.models.goal import Goal
 from finanzas_tracker.models.income import Income
+from finanzas_tracker.models.job import Job, JobStatus
 from finanzas_tracker.models.investment import Investment
 from finanzas_tracker.models.learning import (
     GlobalMerchantSuggestion,
@@ -59,6 +66,7 @@ from finanzas_tracker.models.pending_question import (
 )
 from finanzas_tracker.models.profile import Profile
 from finanzas_tracker.models.reconciliation_report import ReconciliationReport
+from finanzas_tracker.models.sinpe_transfer_email import SinpeTransferEmail
 from finanzas_tracker.models.transaction import Transaction
 from finanzas_tracker.models.user import User
 
@@ -71,22 +79,27 @@ __all__ = [
     "TimestampMixin",
     # Core Models
     "Account",
+    "AnomalyBaseline",
+    "BalanceLedgerEntry",
     "BillingCycle",
     "Budget",
     "Card",
     "CardPayment",
     "Category",
+    "EmbeddingMigration",
     "ExchangeRateCache",
     "GlobalMerchantSuggestion",
     "Goal",
     "Income",
     "Investment",
+    "Job",
     "Merchant",
     "MerchantVariant",
     "PatrimonioSnapshot",
     "PendingQuestion",
     "Profile",
     "ReconciliationReport",
+    "SinpeTransferEmail",
     "Subcategory",
     "Transaction",
     "TransactionEmbedding",
@@ -101,11 +114,13 @@ __all__ = [
     "CardType",
     "CategoryType",
     "Currency",
+    "EmbeddingMigrationStatus",
     "GoalPriority",
     "GoalStatus",
     "IncomeType",
     "InvestmentStatus",
     "InvestmentType",
+    "JobStatus",
     "RecurrenceFrequency",
     "TransactionStatus",
     "TransactionType",
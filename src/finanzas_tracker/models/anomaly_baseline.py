@@ -0,0 +1,87 @@
+"""Modelo de líneas base para la detección de montos anómalos."""
+
+__all__ = ["DIMENSION_COMERCIO", "DIMENSION_SUBCATEGORIA", "AnomalyBaseline"]
+
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from sqlalchemy import DateTime, Float, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from finanzas_tracker.core.database import Base
+
+
+DIMENSION_COMERCIO = "comercio"
+DIMENSION_SUBCATEGORIA = "subcategoria"
+
+
+class AnomalyBaseline(Base):
+    """
+    Estadísticas incrementales del monto de un perfil en un comercio o subcategoría.
+
+    Guarda la media y la varianza exponenciales (EWMA) del logaritmo del
+    monto en colones. Cada transacción nueva se puntúa contra su fila y la
+    actualiza en O(1) (ver `services.anomaly_service`).
+    """
+
+    __tablename__ = "anomaly_baselines"
+    __table_args__ = (
+        Index(
+            "ix_anomaly_baselines_lookup",
+            "profile_id",
+            "dimension",
+            "clave",
+            unique=True,
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid4()),
+    )
+    profile_id: Mapped[str] = mapped_column(
+        String(36),
+        nullable=False,
+        comment="ID del perfil",
+    )
+    dimension: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        comment="Dimensión de la línea base: comercio o subcategoria",
+    )
+    clave: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        comment="Comercio normalizado o ID de la subcategoría",
+    )
+    n: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Transacciones observadas",
+    )
+    media: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0.0,
+        comment="Media EWMA de log(monto_crc)",
+    )
+    varianza: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0.0,
+        comment="Varianza EWMA de log(monto_crc)",
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+    )
+
+    def __repr__(self) -> str:
+        """Representación de la línea base."""
+        return (
+            f"<AnomalyBaseline(profile={self.profile_id[:8]}..., {self.dimension}={self.clave}, "
+            f"n={self.n})>"
+        )
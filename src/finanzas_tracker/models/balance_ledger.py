@@ -0,0 +1,125 @@
+"""Modelo del libro de saldos diarios (patrimonio en cualquier fecha)."""
+
+__all__ = ["CUENTA_EFECTIVO", "BalanceLedgerEntry", "cuenta_tarjeta"]
+
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import Date, DateTime, Index, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from finanzas_tracker.core.database import Base
+
+
+# Dinero propio (ingresos, gastos de débito/efectivo, pagos de tarjeta)
+CUENTA_EFECTIVO = "efectivo"
+
+
+def cuenta_tarjeta(card_id: str) -> str:
+    """Cuenta del libro para la deuda de una tarjeta de crédito."""
+    return f"tarjeta:{card_id}"
+
+
+class BalanceLedgerEntry(Base):
+    """
+    Saldo acumulado de una cuenta del libro al cierre de un día.
+
+    Hay una fila por (perfil, cuenta, moneda, día con movimientos). Cada
+    fila guarda el movimiento del día y las sumas acumuladas desde el
+    inicio, así el patrimonio en una fecha es la última fila de cada
+    cuenta con `fecha <= X` (una búsqueda por ix_balance_ledger_lookup),
+    sin sumar todo el historial.
+
+    Cuentas:
+        - "efectivo": ingresos, gastos de débito y pagos de tarjeta
+        - "tarjeta:<card_id>": compras con tarjeta de crédito (saldo negativo = deuda)
+
+    Se mantiene desde transacciones, ingresos y pagos de tarjeta
+    (ver `services.balance_ledger_service`).
+    """
+
+    __tablename__ = "balance_ledger"
+    __table_args__ = (
+        Index(
+            "ix_balance_ledger_lookup",
+            "profile_id",
+            "cuenta",
+            "moneda",
+            "fecha",
+            unique=True,
+        ),
+        Index("ix_balance_ledger_profile_fecha", "profile_id", "fecha"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid4()),
+    )
+    profile_id: Mapped[str] = mapped_column(
+        String(36),
+        nullable=False,
+        comment="ID del perfil",
+    )
+    cuenta: Mapped[str] = mapped_column(
+        String(60),
+        nullable=False,
+        comment="Cuenta del libro (efectivo o tarjeta:<card_id>)",
+    )
+    moneda: Mapped[str] = mapped_column(
+        String(3),
+        nullable=False,
+        comment="Moneda original de los movimientos",
+    )
+    fecha: Mapped[date] = mapped_column(
+        Date,
+        nullable=False,
+        comment="Día del saldo",
+    )
+    movimiento: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2),
+        nullable=False,
+        default=Decimal("0"),
+        comment="Movimiento neto del día en la moneda original",
+    )
+    saldo: Mapped[Decimal] = mapped_column(
+        Numeric(16, 2),
+        nullable=False,
+        default=Decimal("0"),
+        comment="Saldo acumulado en la moneda original",
+    )
+    saldo_crc: Mapped[Decimal] = mapped_column(
+        Numeric(16, 2),
+        nullable=False,
+        default=Decimal("0"),
+        comment="Saldo acumulado en colones (tipo de cambio de cada movimiento)",
+    )
+    ingresos_crc: Mapped[Decimal] = mapped_column(
+        Numeric(16, 2),
+        nullable=False,
+        default=Decimal("0"),
+        comment="Ingresos acumulados en colones",
+    )
+    egresos_crc: Mapped[Decimal] = mapped_column(
+        Numeric(16, 2),
+        nullable=False,
+        default=Decimal("0"),
+        comment="Gastos acumulados en colones",
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+    )
+
+    @property
+    def es_tarjeta(self) -> bool:
+        """True si la cuenta es la deuda de una tarjeta."""
+        return self.cuenta.startswith("tarjeta:")
+
+    def __repr__(self) -> str:
+        """Representación de la fila."""
+        return (
+            f"<BalanceLedgerEntry(profile={self.profile_id[:8]}..., cuenta={self.cuenta}, "
+            f"{self.moneda} {self.fecha}: saldo={self.saldo})>"
+        )
@@ -101,6 +101,7 @@ class CardPayment(Base):
         Date,
         nullable=False,
         default=date.today,
+        active_history=True,  # El libro de saldos recalcula desde la fecha anterior
     )
 
     # Referencia bancaria (para reconciliación)
@@ -1,13 +1,14 @@
 """Modelo de embeddings para transacciones - RAG con pgvector."""
 
-__all__ = ["TransactionEmbedding"]
+__all__ = ["EmbeddingMigration", "EmbeddingMigrationStatus", "TransactionEmbedding"]
 
 from datetime import UTC, datetime
+from enum import StrEnum
 from typing import TYPE_CHECKING
 from uuid import UUID, uuid4
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -71,6 +72,20 @@ class TransactionEmbedding(Base):
         comment="Vector embedding para búsqueda semántica (384 dims)",
     )
 
+    # Columna sombra para migrar de modelo sin sacar de línea la búsqueda:
+    # se llena en batches con el modelo nuevo (cualquier dimensión) y en el
+    # cutover reemplaza a `embedding` (ver EmbeddingMigrationService)
+    embedding_shadow: Mapped[list[float] | None] = mapped_column(
+        Vector(),
+        nullable=True,
+        comment="Embedding con el modelo nuevo durante una migración",
+    )
+    shadow_model_version: Mapped[str | None] = mapped_column(
+        String(50),
+        nullable=True,
+        comment="Modelo usado para embedding_shadow",
+    )
+
     # Texto que se usó para generar el embedding
     text_content: Mapped[str] = mapped_column(
         Text,
@@ -113,3 +128,104 @@ class TransactionEmbedding(Base):
     def __repr__(self) -> str:
         """Representación del embedding."""
         return f"<TransactionEmbedding(id={self.id[:8]}..., txn={self.transaction_id[:8]}..., dim={self.embedding_dim})>"
+
+
+class EmbeddingMigrationStatus(StrEnum):
+    """Estados de una migración de embeddings."""
+
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CUT_OVER = "cut_over"
+
+
+class EmbeddingMigration(Base):
+    """
+    Checkpoint de una re-generación de embeddings por batches.
+
+    Guarda el último ID procesado (paginación por keyset) en la misma
+    transacción que escribe cada batch, así una corrida interrumpida
+    continúa exactamente donde quedó.
+
+    Attributes:
+        target: Tabla migrada (transaction_embeddings, transaction_patterns)
+        scope: Perfil migrado o "*" para todos
+        model_version: Modelo con el que se están generando los vectores
+        shadow: Si escribe en la columna sombra en vez de la principal
+        last_key: Último ID procesado
+    """
+
+    __tablename__ = "embedding_migrations"
+    __table_args__ = (
+        UniqueConstraint(
+            "target", "scope", "model_version", name="uq_embedding_migrations_target_model"
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid4()),
+    )
+    target: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="Tabla cuyos embeddings se regeneran",
+    )
+    scope: Mapped[str] = mapped_column(
+        String(36),
+        nullable=False,
+        default="*",
+        comment="ID del perfil o * para todos",
+    )
+    model_version: Mapped[str] = mapped_column(
+        String(100),
+        nullable=False,
+        comment="Modelo de embeddings destino",
+    )
+    embedding_dim: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        comment="Dimensión de los vectores del modelo destino",
+    )
+    shadow: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        comment="Escribe en embedding_shadow hasta el cutover",
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default=EmbeddingMigrationStatus.RUNNING,
+    )
+    last_key: Mapped[str | None] = mapped_column(
+        String(36),
+        nullable=True,
+        comment="Último ID procesado (cursor keyset)",
+    )
+    processed: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Filas re-generadas hasta ahora",
+    )
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    def __repr__(self) -> str:
+        """Representación del checkpoint."""
+        return (
+            f"<EmbeddingMigration(target={self.target}, model={self.model_version}, "
+            f"status={self.status}, processed={self.processed})>"
+        )
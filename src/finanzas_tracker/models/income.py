@@ -17,6 +17,7 @@ from sqlalchemy import (
     Numeric,
     String,
     Text,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
@@ -99,6 +100,7 @@ class Income(Base):
     fecha: Mapped[date] = mapped_column(
         Date,
         index=True,
+        active_history=True,  # El libro de saldos recalcula desde la fecha anterior
         comment="Fecha en que se recibió el ingreso",
     )
 
@@ -213,6 +215,13 @@ class Income(Base):
         CheckConstraint("monto_original > 0", name="check_income_original_positive"),
         Index("ix_incomes_profile_fecha", "profile_id", "fecha"),
         Index("ix_incomes_profile_tipo", "profile_id", "tipo"),
+        # Parcial para la cola de revisión (services.review_queue)
+        Index(
+            "ix_incomes_sin_confirmar",
+            "profile_id",
+            postgresql_where=text("NOT confirmado AND deleted_at IS NULL"),
+            sqlite_where=text("NOT confirmado AND deleted_at IS NULL"),
+        ),
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,161 @@
+"""Modelo de jobs en segundo plano (operaciones largas de la API)."""
+
+__all__ = ["Job", "JobStatus"]
+
+from datetime import UTC, datetime
+from enum import StrEnum
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from finanzas_tracker.core.database import Base
+
+
+class JobStatus(StrEnum):
+    """Estados de un job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """
+    Operación larga que corre fuera del request HTTP.
+
+    La API crea el job y responde 202; un worker (dentro de la API o en
+    un proceso aparte) lo toma con `SELECT ... FOR UPDATE SKIP LOCKED`,
+    así varios workers nunca corren el mismo job. El progreso se guarda
+    en la fila, por lo que cualquier worker de la API puede reportarlo.
+
+    Attributes:
+        kind: Tipo de job (handler registrado en `job_queue`)
+        params: Argumentos del handler
+        progress_current / progress_total: Avance en unidades del handler
+        result: Resultado (o snapshot del estado, ej: onboarding)
+        heartbeat_at: Última señal del worker; si envejece el job vuelve a la cola
+    """
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_created", "status", "created_at"),
+        Index("ix_jobs_kind_user", "kind", "user_id"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid4()),
+    )
+    kind: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="Tipo de job (ej: embeddings.generate)",
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default=JobStatus.QUEUED,
+    )
+    profile_id: Mapped[str | None] = mapped_column(
+        String(36),
+        nullable=True,
+        index=True,
+        comment="Perfil al que pertenece el job",
+    )
+    user_id: Mapped[str | None] = mapped_column(
+        String(36),
+        nullable=True,
+        comment="Usuario que pidió el job",
+    )
+    params: Mapped[dict[str, Any]] = mapped_column(
+        JSON,
+        nullable=False,
+        default=dict,
+        comment="Argumentos del handler",
+    )
+    progress_current: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    progress_total: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="Total de unidades (None si aún no se conoce)",
+    )
+    message: Mapped[str | None] = mapped_column(
+        String(255),
+        nullable=True,
+        comment="Etapa actual, para mostrar al usuario",
+    )
+    result: Mapped[dict[str, Any] | None] = mapped_column(
+        JSON,
+        nullable=True,
+    )
+    error: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    locked_by: Mapped[str | None] = mapped_column(
+        String(100),
+        nullable=True,
+        comment="Worker que está corriendo el job",
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+    )
+    started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    heartbeat_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    @property
+    def progress_percent(self) -> float | None:
+        """Porcentaje de avance (None si no se conoce el total)."""
+        if self.status == JobStatus.SUCCEEDED:
+            return 100.0
+        if not self.progress_total:
+            return None
+        return round(min(self.progress_current / self.progress_total, 1.0) * 100, 1)
+
+    @property
+    def eta_seconds(self) -> float | None:
+        """Segundos restantes estimados con el ritmo observado hasta ahora."""
+        if (
+            self.status != JobStatus.RUNNING
+            or not self.progress_total
+            or self.progress_current <= 0
+            or self.started_at is None
+        ):
+            return None
+        started_at = self.started_at
+        if started_at.tzinfo is None:  # SQLite no guarda la zona horaria
+            started_at = started_at.replace(tzinfo=UTC)
+        elapsed = (datetime.now(UTC) - started_at).total_seconds()
+        remaining = max(self.progress_total - self.progress_current, 0)
+        return round(elapsed / self.progress_current * remaining, 1)
+
+    def __repr__(self) -> str:
+        """Representación del job."""
+        return (
+            f"<Job(id={self.id[:8]}..., kind={self.kind}, status={self.status}, "
+            f"progress={self.progress_current}/{self.progress_total})>"
+        )
@@ -135,6 +135,17 @@ class Merchant(Base):
         onupdate=lambda: datetime.now(UTC),
     )
 
+    # Índices
+    __table_args__ = (
+        # Trigramas (pg_trgm) para búsquedas difusas, ver services.text_search
+        Index(
+            "ix_merchants_nombre_normalizado_trgm",
+            "nombre_normalizado",
+            postgresql_using="gin",
+            postgresql_ops={"nombre_normalizado": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # Relaciones
     variantes: Mapped[list["MerchantVariant"]] = relationship(
         "MerchantVariant", back_populates="merchant", cascade="all, delete-orphan"
@@ -158,7 +169,19 @@ class Merchant(Base):
 
         Returns:
             Merchant si encuentra match, None si no
+
+        Primero busca la variante exacta (con el cache de
+        `MerchantNormalizationService.lookup_many`); si no hay, una variante
+        que contenga el nombre.
         """
+        from finanzas_tracker.services.merchant_service import MerchantNormalizationService
+
+        merchant_id = (
+            MerchantNormalizationService().lookup_many(session, [nombre_raw]).get(nombre_raw)
+        )
+        if merchant_id is not None:
+            return session.get(cls, merchant_id)
+
         variante = (
             session.query(MerchantVariant)
             .filter(MerchantVariant.nombre_raw.ilike(f"%{nombre_raw}%"))
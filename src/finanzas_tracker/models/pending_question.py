@@ -8,7 +8,17 @@ from enum import Enum
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -217,6 +227,16 @@ class PendingQuestion(Base):
         back_populates="pending_questions",
     )
 
+    # Parcial para la cola de revisión (services.review_queue)
+    __table_args__ = (
+        Index(
+            "ix_pending_questions_pendientes",
+            "profile_id",
+            postgresql_where=text("status = 'pendiente' AND deleted_at IS NULL"),
+            sqlite_where=text("status = 'pendiente' AND deleted_at IS NULL"),
+        ),
+    )
+
     def __repr__(self) -> str:
         """Representación en string del modelo."""
         return f"<PendingQuestion(tipo={self.tipo.value}, status={self.status.value})>"
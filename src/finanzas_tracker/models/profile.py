@@ -105,6 +105,11 @@ class Profile(Base):
         default=30,
         comment="Días del ciclo de estado de cuenta (detectado automáticamente)",
     )
+    last_sinpe_reconciliation_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Última reconciliación de SINPEs con correos de transferencia",
+    )
 
     # Estado
     es_activo: Mapped[bool] = mapped_column(
@@ -0,0 +1,111 @@
+"""Modelo para correos de transferencia SINPE ya procesados."""
+
+__all__ = ["SinpeTransferEmail"]
+
+from datetime import UTC, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import DateTime, ForeignKey, Index, Numeric, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from finanzas_tracker.core.database import Base
+
+
+class SinpeTransferEmail(Base):
+    """
+    Correo de "Notificación de Transferencia" de BAC ya parseado.
+
+    Se guarda una vez por correo para que la reconciliación SINPE no tenga
+    que volver a descargar y parsear los mismos correos en cada corrida:
+    sólo se piden a Outlook los recibidos después del último guardado.
+
+    Attributes:
+        email_id: ID del mensaje en Microsoft Graph (único por perfil)
+        monto / fecha: Claves usadas para hacer match con las transacciones
+        transaction_id: Transacción con la que ya se hizo match (si alguna)
+    """
+
+    __tablename__ = "sinpe_transfer_emails"
+
+    id: Mapped[str] = mapped_column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid4()),
+        comment="UUID único del registro",
+    )
+
+    profile_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("profiles.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="ID del perfil dueño del correo",
+    )
+
+    email_id: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        comment="ID del mensaje en Microsoft Graph",
+    )
+
+    # Datos extraídos del correo
+    beneficiario: Mapped[str] = mapped_column(
+        String(200),
+        nullable=False,
+        comment="Nombre del beneficiario de la transferencia",
+    )
+    monto: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2),
+        nullable=False,
+        comment="Monto transferido en colones",
+    )
+    fecha: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="Fecha de la transferencia según el correo",
+    )
+    concepto: Mapped[str] = mapped_column(
+        String(500),
+        nullable=False,
+        default="",
+        comment="Concepto escrito por el usuario",
+    )
+    referencia: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        default="",
+        comment="Número de referencia de la transferencia",
+    )
+    email_date: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="Fecha de recepción del correo (cursor de sincronización)",
+    )
+
+    # Resultado de la reconciliación
+    transaction_id: Mapped[str | None] = mapped_column(
+        String(36),
+        ForeignKey("transactions.id", ondelete="SET NULL"),
+        nullable=True,
+        comment="Transacción con la que se hizo match",
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(UTC),
+        comment="Fecha de creación del registro",
+    )
+
+    __table_args__ = (
+        UniqueConstraint("profile_id", "email_id", name="uq_sinpe_transfer_emails_profile_email"),
+        Index("ix_sinpe_transfer_emails_profile_fecha", "profile_id", "fecha"),
+        Index("ix_sinpe_transfer_emails_profile_email_date", "profile_id", "email_date"),
+    )
+
+    def __repr__(self) -> str:
+        """Representación legible del correo."""
+        return (
+            f"<SinpeTransferEmail(monto={self.monto}, beneficiario={self.beneficiario}, "
+            f"fecha={self.fecha.date()})>"
+        )
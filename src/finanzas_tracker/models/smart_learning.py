@@ -152,6 +152,13 @@ class TransactionPattern(Base):
         nullable=True,
         default="text-embedding-3-small",
     )
+    cluster_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("pattern_clusters.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+        comment="Cluster semántico asignado por merge_similar_patterns",
+    )
 
     # Categorización
     subcategory_id: Mapped[str] = mapped_column(
@@ -545,6 +552,13 @@ class PatternCluster(Base):
         primary_key=True,
         autoincrement=True,
     )
+    profile_id: Mapped[str | None] = mapped_column(
+        String(36),
+        ForeignKey("profiles.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
+        comment="Perfil dueño del cluster (NULL = cluster global)",
+    )
 
     # Descripción del cluster
     name: Mapped[str | None] = mapped_column(
@@ -7,7 +7,17 @@ from decimal import Decimal
 from typing import TYPE_CHECKING
 from uuid import UUID, uuid4
 
-from sqlalchemy import Boolean, CheckConstraint, DateTime, ForeignKey, Index, Numeric, String, Text
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    Numeric,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
@@ -31,6 +41,13 @@ if TYPE_CHECKING:
     from finanzas_tracker.models.reconciliation_report import ReconciliationReport
 
 
+# Transacciones activas que necesitan al usuario (índice ix_transactions_revision)
+REVISION_WHERE = (
+    "deleted_at IS NULL AND (necesita_reconciliacion_sinpe OR es_comercio_ambiguo"
+    " OR es_desconocida OR subcategory_id IS NULL)"
+)
+
+
 class Transaction(Base):
     """
     Modelo para almacenar transacciones bancarias extraídas de correos.
@@ -305,6 +322,7 @@ class Transaction(Base):
     fecha_transaccion: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         index=True,
+        active_history=True,  # El libro de saldos recalcula desde la fecha anterior
         comment="Fecha y hora de la transacción",
     )
     ciudad: Mapped[str | None] = mapped_column(
@@ -479,6 +497,44 @@ class Transaction(Base):
         Index("ix_transactions_profile_historica", "profile_id", "es_historica"),
         Index("ix_transactions_reconciliacion", "reconciliacion_id"),
         Index("ix_transactions_referencia_banco", "referencia_banco"),
+        # Parciales sobre transacciones activas: las vistas mensuales filtran
+        # por rango de fecha (ver repositories.filters.in_month)
+        Index(
+            "ix_transactions_activas_profile_fecha",
+            "profile_id",
+            "fecha_transaccion",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_transactions_activas_profile_categoria_fecha",
+            "profile_id",
+            "subcategory_id",
+            "fecha_transaccion",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        # Parcial sobre las transacciones en revisión: contadores y listas de
+        # services.review_queue leen sólo estas filas
+        Index(
+            "ix_transactions_revision",
+            "profile_id",
+            postgresql_where=text(REVISION_WHERE),
+            sqlite_where=text(REVISION_WHERE),
+        ),
+        # Trigramas (pg_trgm) para búsquedas difusas, ver services.text_search
+        Index(
+            "ix_transactions_comercio_trgm",
+            "comercio",
+            postgresql_using="gin",
+            postgresql_ops={"comercio": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_transactions_beneficiario_trgm",
+            "beneficiario",
+            postgresql_using="gin",
+            postgresql_ops={"beneficiario": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
     def __repr__(self) -> str:
@@ -8,6 +8,7 @@ from finanzas_tracker.parsers.bac_credit_card_parser import (
 )
 from finanzas_tracker.parsers.bac_parser import BACParser
 from finanzas_tracker.parsers.bac_pdf_parser import (
+    BACPageResult,
     BACPDFParser,
     BACStatementMetadata,
     BACStatementResult,
@@ -22,6 +23,7 @@ __all__ = [
     "BACParser",
     "BACCreditCardParser",
     "BACPDFParser",
+    "BACPageResult",
     "BACTransaction",
     "BACStatementResult",
     "BACStatementMetadata",
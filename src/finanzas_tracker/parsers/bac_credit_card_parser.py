@@ -9,15 +9,23 @@ Formato de tarjeta de crédito:
 - Página 3+: Transacciones por sección (compras, intereses, seguros)
 """
 
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from datetime import date
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
 import re
 
-import pdfplumber
-
 from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.parsers.pdf_pages import (
+    DEFAULT_PAGES_PER_TASK,
+    PDFSource,
+    describe_source,
+    map_page_ranges_ordered,
+    open_pdf,
+    page_ranges,
+    worker_source,
+)
 
 
 logger = get_logger(__name__)
@@ -121,45 +129,76 @@ class BACCreditCardParser:
         """Inicializa el parser."""
         logger.info("BACCreditCardParser inicializado")
 
-    def parse(self, pdf_path: str | Path) -> CreditCardStatementResult:
+    def parse(
+        self,
+        pdf_path: PDFSource,
+        max_workers: int | None = None,
+        pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+        executor: Executor | None = None,
+        source_name: str | None = None,
+    ) -> CreditCardStatementResult:
         """
         Parsea un estado de cuenta de tarjeta de crédito.
 
+        Con `max_workers > 1` (o un `executor`) las páginas de transacciones se
+        reparten en rangos entre procesos. Cada página se procesa de forma
+        independiente (la sección vuelve a "compra" al inicio de cada página),
+        así que el resultado es idéntico al del modo secuencial.
+
         Args:
-            pdf_path: Ruta al archivo PDF
+            pdf_path: Ruta al archivo PDF o su contenido en memoria (bytes/BytesIO)
+            max_workers: Workers del pool de procesos (None o 1 = secuencial)
+            pages_per_task: Páginas por tarea en modo paralelo
+            executor: Executor a usar en lugar de crear un ProcessPoolExecutor
+            source_name: Nombre para `source_file` cuando el PDF viene en memoria
 
         Returns:
             CreditCardStatementResult con metadata y transacciones
         """
-        pdf_path = Path(pdf_path)
-        logger.info(f"Parseando estado de tarjeta: {pdf_path.name}")
+        source_file = describe_source(pdf_path, source_name)
+        logger.info(f"Parseando estado de tarjeta: {Path(source_file).name}")
 
-        transactions: list[CreditCardTransaction] = []
         errors: list[str] = []
-        metadata = None
-
-        with pdfplumber.open(pdf_path) as pdf:
-            # Extraer texto de todas las páginas
-            all_text = ""
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                all_text += text + "\n"
+        parallel = executor is not None or (max_workers is not None and max_workers > 1)
+        page_txns: list[list[CreditCardTransaction]] = []
+        worker_key: tuple[str, int] | None = None
+
+        with open_pdf(pdf_path) as pdf:
+            total_pages = len(pdf.pages)
+            # Páginas 1 y 2 son resumen; en modo secuencial se extraen todas aquí
+            pages_to_read = pdf.pages[:2] if parallel else pdf.pages
+            page_texts = [page.extract_text() or "" for page in pages_to_read]
+
+        if parallel:
+            # Metadata provisional (páginas 1 y 2) para que los workers armen
+            # las transacciones; se valida abajo contra el texto completo.
+            provisional = self._extract_metadata("".join(t + "\n" for t in page_texts))
+            worker_key = (provisional.tarjeta_ultimos_4, provisional.fecha_corte.year)
+            for range_results in map_page_ranges_ordered(
+                _parse_page_range,
+                page_ranges(total_pages, pages_per_task, start=2),
+                worker_source(pdf_path),
+                *worker_key,
+                max_workers=max_workers,
+                executor=executor,
+            ):
+                for text, txns in range_results:
+                    page_texts.append(text)
+                    page_txns.append(txns)
 
-            # Extraer metadata de páginas 1 y 2
-            metadata = self._extract_metadata(all_text)
+        # Extraer metadata del texto de todas las páginas (cada página una sola vez)
+        all_text = "".join(text + "\n" for text in page_texts)
+        metadata = self._extract_metadata(all_text)
+        tarjeta_4 = metadata.tarjeta_ultimos_4 if metadata else "0000"
+        year = metadata.fecha_corte.year if metadata else 2025
 
+        if worker_key != (tarjeta_4, year):
             # Extraer transacciones de página 3 en adelante
-            for i, page in enumerate(pdf.pages):
-                if i < 2:  # Saltar páginas 1 y 2 (índice 0 y 1)
-                    continue
-
-                text = page.extract_text() or ""
-                page_txns = self._extract_transactions(
-                    text,
-                    metadata.tarjeta_ultimos_4 if metadata else "0000",
-                    metadata.fecha_corte.year if metadata else 2025,
-                )
-                transactions.extend(page_txns)
+            page_txns = [
+                self._extract_transactions(text, tarjeta_4, year) for text in page_texts[2:]
+            ]
+
+        transactions = [txn for txns in page_txns for txn in txns]
 
         # Calcular totales
         total_compras_crc = sum(
@@ -184,8 +223,8 @@ class BACCreditCardParser:
         return CreditCardStatementResult(
             metadata=metadata,
             transactions=transactions,
-            source_file=str(pdf_path),
-            pages_processed=len(pdf.pages) if "pdf" in dir() else 0,
+            source_file=source_file,
+            pages_processed=total_pages,
             total_compras_crc=total_compras_crc,
             total_compras_usd=total_compras_usd,
             total_intereses=total_intereses,
@@ -445,6 +484,26 @@ class BACCreditCardParser:
             return Decimal("0")
 
 
+def _parse_page_range(
+    pdf_source: str | bytes, tarjeta_4: str, year: int, start: int, stop: int
+) -> list[tuple[str, list[CreditCardTransaction]]]:
+    """
+    Worker: abre el PDF (ruta o bytes) y procesa las páginas [start, stop).
+
+    Devuelve también el texto de cada página para que el proceso principal
+    arme la metadata sin volver a extraerlo.
+    """
+    parser = BACCreditCardParser()
+    results: list[tuple[str, list[CreditCardTransaction]]] = []
+
+    with open_pdf(pdf_source) as pdf:
+        for i in range(start, stop):
+            text = pdf.pages[i].extract_text() or ""
+            results.append((text, parser._extract_transactions(text, tarjeta_4, year)))
+
+    return results
+
+
 __all__ = [
     "BACCreditCardParser",
     "CreditCardTransaction",
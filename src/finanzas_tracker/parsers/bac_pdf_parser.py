@@ -6,6 +6,8 @@ Más eficiente que Claude Vision para documentos estructurados.
 Usa posiciones de caracteres para distinguir columnas de débito/crédito.
 """
 
+from collections.abc import Iterator
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from datetime import date
 from decimal import Decimal, InvalidOperation
@@ -13,9 +15,16 @@ from pathlib import Path
 import re
 from typing import Any
 
-import pdfplumber
-
 from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.parsers.pdf_pages import (
+    DEFAULT_PAGES_PER_TASK,
+    PDFSource,
+    describe_source,
+    map_page_ranges_ordered,
+    open_pdf,
+    page_ranges,
+    worker_source,
+)
 
 
 logger = get_logger(__name__)
@@ -72,6 +81,17 @@ class BACStatementResult:
     errors: list[str] = field(default_factory=list)
 
 
+@dataclass
+class BACPageResult:
+    """Resultado de procesar una sola página del estado de cuenta."""
+
+    page_num: int
+    transactions: list[BACTransaction]
+    iban: str | None = None  # IBAN detectado en la página (None = se hereda)
+    moneda: str | None = None  # Moneda detectada en la página (None = se hereda)
+    used_text: bool = False  # Si hizo falta extract_text()
+
+
 class BACPDFParser:
     """Parser para estados de cuenta PDF de BAC Credomatic."""
 
@@ -83,6 +103,9 @@ class BACPDFParser:
     EMAIL_PATTERN = re.compile(r"([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)")
     IBAN_PATTERN = re.compile(r"Cuenta IBAN:\s*(CR\d{2}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{4}\s*\d{2})")
     MONEDA_PATTERN = re.compile(r"Moneda:\s*(COLONES|DOLARES)")
+    # Variantes sin espacios para las líneas armadas desde page.chars
+    COMPACT_IBAN_PATTERN = re.compile(r"CuentaIBAN:(CR\d{20})")
+    COMPACT_MONEDA_PATTERN = re.compile(r"Moneda:(COLONES|DOLARES)")
 
     # Patrón para líneas de transacción
     # Formato: REFERENCIA  FECHA  CONCEPTO  [DEBITO]  [CREDITO]
@@ -115,105 +138,235 @@ class BACPDFParser:
         self._current_year: int | None = None
         self._current_iban: str | None = None
         self._current_moneda: str = "CRC"
+        self.metadata: BACStatementMetadata | None = None
+        self.pages_processed: int = 0
 
-    def parse(self, pdf_path: str | Path) -> BACStatementResult:
+    def parse(
+        self,
+        pdf_path: PDFSource,
+        max_workers: int | None = None,
+        pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+        source_name: str | None = None,
+    ) -> BACStatementResult:
         """
         Parsea un estado de cuenta PDF de BAC.
 
         Args:
-            pdf_path: Ruta al archivo PDF
+            pdf_path: Ruta al archivo PDF o su contenido en memoria (bytes/BytesIO)
+            max_workers: Si es mayor a 1, procesa las páginas en un pool de procesos
+            pages_per_task: Páginas que procesa cada worker por tarea
+            source_name: Nombre para `source_file` cuando el PDF viene en memoria
 
         Returns:
             BACStatementResult con metadata, transacciones y errores
         """
-        pdf_path = Path(pdf_path)
-        if not pdf_path.exists():
-            raise FileNotFoundError(f"PDF no encontrado: {pdf_path}")
+        if isinstance(pdf_path, str | Path):
+            pdf_path = Path(pdf_path)
+            if not pdf_path.exists():
+                raise FileNotFoundError(f"PDF no encontrado: {pdf_path}")
 
-        logger.info(f"Parseando PDF: {pdf_path.name}")
+        source_file = describe_source(pdf_path, source_name)
+        logger.info(f"Parseando PDF: {Path(source_file).name}")
 
-        transactions: list[BACTransaction] = []
         errors: list[str] = []
-        metadata: BACStatementMetadata | None = None
 
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                # Extraer metadata de la primera página
-                first_page_text = pdf.pages[0].extract_text() or ""
-                metadata = self._extract_metadata(first_page_text)
+            transactions = list(
+                self.iter_transactions(
+                    pdf_path, max_workers=max_workers, pages_per_task=pages_per_task
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error parseando PDF {source_file}: {e}")
+            raise
+
+        assert self.metadata is not None  # Se asigna al abrir el PDF
 
-                # Extraer año del corte para construir fechas completas
-                self._current_year = metadata.fecha_corte.year
+        logger.info(
+            f"✅ Extraídas {len(transactions)} transacciones de {self.pages_processed} páginas"
+        )
+
+        return BACStatementResult(
+            metadata=self.metadata,
+            transactions=transactions,
+            source_file=source_file,
+            pages_processed=self.pages_processed,
+            errors=errors,
+        )
 
-                # Procesar todas las páginas usando extracción por posición
+    def iter_transactions(
+        self,
+        pdf_path: PDFSource,
+        max_workers: int | None = None,
+        pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+        executor: Executor | None = None,
+    ) -> Iterator[BACTransaction]:
+        """
+        Entrega las transacciones del PDF a medida que se procesan las páginas.
+
+        Con `max_workers > 1` (o un `executor`) las páginas se reparten en rangos
+        entre procesos; cada worker abre el PDF por su cuenta. El contexto de
+        cuenta (IBAN, moneda) se hereda entre páginas, así que se combina aquí
+        en orden de página: el resultado es idéntico al del modo secuencial.
+
+        `self.metadata` y `self.pages_processed` quedan disponibles en cuanto
+        se abre el PDF (antes de la primera transacción).
+
+        Args:
+            pdf_path: Ruta al archivo PDF o su contenido en memoria
+            max_workers: Workers del pool de procesos (None o 1 = secuencial)
+            pages_per_task: Páginas por tarea en modo paralelo
+            executor: Executor a usar en lugar de crear un ProcessPoolExecutor
+
+        Yields:
+            BACTransaction en el orden en que aparecen en el PDF
+        """
+        self._current_iban = None
+        self._current_moneda = "CRC"
+
+        for page_result in self._iter_page_results(pdf_path, max_workers, pages_per_task, executor):
+            yield from self._apply_page_context(page_result)
+
+    def _iter_page_results(
+        self,
+        pdf_path: PDFSource,
+        max_workers: int | None,
+        pages_per_task: int,
+        executor: Executor | None,
+    ) -> Iterator[BACPageResult]:
+        """Procesa las páginas (secuencial o en paralelo) y las entrega en orden."""
+        parallel = executor is not None or (max_workers is not None and max_workers > 1)
+
+        with open_pdf(pdf_path) as pdf:
+            total_pages = len(pdf.pages)
+
+            # Extraer metadata de la primera página
+            first_page_text = pdf.pages[0].extract_text() or ""
+            self.metadata = self._extract_metadata(first_page_text)
+            self.pages_processed = total_pages
+
+            # Extraer año del corte para construir fechas completas
+            self._current_year = self.metadata.fecha_corte.year
+
+            if not parallel:
                 for i, page in enumerate(pdf.pages):
-                    # Primero extraer contexto (IBAN, moneda) del texto
-                    page_text = page.extract_text() or ""
-                    self._update_context_from_text(page_text)
+                    yield self._parse_page(page, i + 1, text=first_page_text if i == 0 else None)
+                return
 
-                    # Luego extraer transacciones usando posiciones de caracteres
-                    page_txns = self._extract_transactions_by_position(page, i + 1)
-                    transactions.extend(page_txns)
+            first_page = self._parse_page(pdf.pages[0], 1, text=first_page_text)
 
-                logger.info(
-                    f"✅ Extraídas {len(transactions)} transacciones de {len(pdf.pages)} páginas"
-                )
+        yield first_page
 
-                return BACStatementResult(
-                    metadata=metadata,
-                    transactions=transactions,
-                    source_file=str(pdf_path),
-                    pages_processed=len(pdf.pages),
-                    errors=errors,
-                )
+        ranges = page_ranges(total_pages, pages_per_task, start=1)
+        for range_results in map_page_ranges_ordered(
+            _parse_page_range,
+            ranges,
+            worker_source(pdf_path),
+            self._current_year,
+            max_workers=max_workers,
+            executor=executor,
+        ):
+            yield from range_results
 
-        except Exception as e:
-            logger.error(f"Error parseando PDF {pdf_path}: {e}")
-            raise
+    def _parse_page(self, page: Any, page_num: int, text: str | None = None) -> BACPageResult:
+        """
+        Procesa una página: transacciones por posición y contexto de cuenta.
+
+        El contexto (IBAN, moneda) se busca primero en las líneas que ya armó
+        la pasada por posición. Sólo si la página menciona IBAN/Moneda y no se
+        pudo leer de esas líneas se recurre a `extract_text()`, que es la parte
+        más cara de pdfplumber.
+        """
+        lines = self._group_chars_by_line(page)
+
+        transactions: list[BACTransaction] = []
+        for line_chars in lines:
+            txn = self._parse_line_by_position(line_chars)
+            if txn:
+                transactions.append(txn)
+
+        used_text = text is not None
+        iban, moneda, complete = self._context_from_lines(lines)
+        if not complete or used_text:
+            if text is None:
+                text = page.extract_text() or ""
+                used_text = True
+            iban, moneda = self._context_from_text(text)
+
+        return BACPageResult(
+            page_num=page_num,
+            transactions=transactions,
+            iban=iban,
+            moneda=moneda,
+            used_text=used_text,
+        )
+
+    def _apply_page_context(self, page_result: BACPageResult) -> list[BACTransaction]:
+        """Actualiza el contexto heredado con la página y lo asigna a sus transacciones."""
+        if page_result.iban:
+            self._current_iban = page_result.iban
+        if page_result.moneda:
+            self._current_moneda = page_result.moneda
+
+        for txn in page_result.transactions:
+            txn.cuenta_iban = self._current_iban or ""
+            txn.moneda = self._current_moneda
+
+        return page_result.transactions
+
+    def _context_from_text(self, text: str) -> tuple[str | None, str | None]:
+        """Extrae contexto (IBAN, moneda) del texto de la página."""
+        iban = None
+        moneda = None
 
-    def _update_context_from_text(self, text: str) -> None:
-        """Actualiza contexto (IBAN, moneda) del texto de la página."""
         # Detectar cambio de cuenta/moneda
         if iban_match := self.IBAN_PATTERN.search(text):
-            self._current_iban = iban_match.group(1).replace(" ", "")
+            iban = iban_match.group(1).replace(" ", "")
 
         if moneda_match := self.MONEDA_PATTERN.search(text):
             moneda_raw = moneda_match.group(1)
-            self._current_moneda = "USD" if "DOLAR" in moneda_raw.upper() else "CRC"
+            moneda = "USD" if "DOLAR" in moneda_raw.upper() else "CRC"
+
+        return iban, moneda
 
-    def _extract_transactions_by_position(self, page: Any, page_num: int) -> list[BACTransaction]:
+    def _context_from_lines(self, lines: list[list[dict]]) -> tuple[str | None, str | None, bool]:
         """
-        Extrae transacciones usando posiciones de caracteres para detectar columnas.
-
-        El PDF tiene columnas fijas:
-        - Referencia: x ~50-90
-        - Fecha: x ~140-175
-        - Concepto: x ~190-480
-        - Débitos: x ~480-550
-        - Créditos: x >550
+        Extrae contexto (IBAN, moneda) de las líneas agrupadas por posición.
+
+        Los caracteres de pdfplumber no siempre incluyen espacios, así que se
+        comparan sin espacios. Si la página no menciona IBAN ni Moneda,
+        `extract_text()` tampoco los encontraría: el contexto se hereda.
+
+        Returns:
+            (iban, moneda, completo) - completo=False si hace falta extract_text
         """
-        transactions: list[BACTransaction] = []
-        chars = page.chars
+        compact = "\n".join(
+            "".join(c["text"] for c in line_chars).replace(" ", "") for line_chars in lines
+        )
 
+        iban = None
+        moneda = None
+        if iban_match := self.COMPACT_IBAN_PATTERN.search(compact):
+            iban = iban_match.group(1)
+        if moneda_match := self.COMPACT_MONEDA_PATTERN.search(compact):
+            moneda = "USD" if "DOLAR" in moneda_match.group(1) else "CRC"
+
+        complete = (iban is not None or "IBAN" not in compact) and (
+            moneda is not None or "Moneda" not in compact
+        )
+        return iban, moneda, complete
+
+    def _group_chars_by_line(self, page: Any) -> list[list[dict]]:
+        """Agrupa los caracteres de la página por línea (posición Y), ordenados por X."""
+        chars = page.chars
         if not chars:
-            return transactions
+            return []
 
-        # Agrupar caracteres por línea (posición Y)
         lines_by_y: dict[int, list[dict]] = {}
         for char in chars:
-            y_key = int(char["top"])
-            if y_key not in lines_by_y:
-                lines_by_y[y_key] = []
-            lines_by_y[y_key].append(char)
-
-        # Procesar cada línea
-        for y in sorted(lines_by_y.keys()):
-            line_chars = sorted(lines_by_y[y], key=lambda c: c["x0"])
-            txn = self._parse_line_by_position(line_chars)
-            if txn:
-                transactions.append(txn)
+            lines_by_y.setdefault(int(char["top"]), []).append(char)
 
-        return transactions
+        return [sorted(lines_by_y[y], key=lambda c: c["x0"]) for y in sorted(lines_by_y)]
 
     def _parse_line_by_position(self, chars: list[dict]) -> BACTransaction | None:
         """Parsea una línea de caracteres en una transacción usando posiciones."""
@@ -659,3 +812,19 @@ class BACPDFParser:
         logger.info(f"✅ Total: {total_txns} transacciones de {len(results)} archivos")
 
         return results
+
+
+def _parse_page_range(
+    pdf_source: str | bytes, year: int, start: int, stop: int
+) -> list[BACPageResult]:
+    """
+    Worker: abre el PDF (ruta o bytes) y procesa las páginas [start, stop).
+
+    Se ejecuta en otro proceso, por eso es una función de módulo y recibe
+    el año del corte en lugar de la metadata completa.
+    """
+    parser = BACPDFParser()
+    parser._current_year = year
+
+    with open_pdf(pdf_source) as pdf:
+        return [parser._parse_page(pdf.pages[i], i + 1) for i in range(start, stop)]
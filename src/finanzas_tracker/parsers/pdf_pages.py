@@ -0,0 +1,152 @@
+"""Utilidades para procesar PDFs de estados de cuenta por rangos de páginas.
+
+Los parsers de BAC procesan cada página de forma independiente, así que
+un estado de varios años se puede repartir entre procesos: cada worker
+abre el PDF por su cuenta y procesa un rango de páginas.
+
+Los resultados se entregan en orden de página apenas están listos todos
+los rangos anteriores, para que el contexto que se hereda entre páginas
+(IBAN, moneda) se combine siempre igual sin importar qué worker termine
+primero.
+
+Los parsers aceptan el PDF como ruta o en memoria (bytes / BytesIO), así
+los adjuntos de correo se procesan sin escribirlos a disco.
+"""
+
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+import io
+import os
+from pathlib import Path
+from typing import IO, Any, TypeAlias, TypeVar
+
+import pdfplumber
+
+
+T = TypeVar("T")
+
+# Origen de un PDF: ruta en disco o contenido en memoria
+PDFSource: TypeAlias = str | Path | bytes | bytearray | memoryview | IO[bytes]
+
+# Páginas por tarea: suficiente para amortizar abrir el PDF en cada worker
+DEFAULT_PAGES_PER_TASK = 4
+
+
+def open_pdf(source: PDFSource) -> Any:
+    """
+    Abre un PDF con pdfplumber desde una ruta o desde memoria.
+
+    Args:
+        source: Ruta, bytes o stream binario (BytesIO, archivo abierto)
+
+    Returns:
+        pdfplumber.PDF (usar como context manager)
+    """
+    if isinstance(source, bytes | bytearray | memoryview):
+        return pdfplumber.open(io.BytesIO(source))
+    if not isinstance(source, str | Path):
+        source.seek(0)
+    return pdfplumber.open(source)
+
+
+def worker_source(source: PDFSource) -> str | bytes:
+    """
+    Convierte el origen a algo que se pueda enviar a otro proceso.
+
+    Las rutas se pasan tal cual (cada worker abre el archivo); el contenido
+    en memoria se pasa como bytes.
+    """
+    if isinstance(source, str | Path):
+        return str(source)
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, bytearray | memoryview):
+        return bytes(source)
+    if isinstance(source, io.BytesIO):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+
+def describe_source(source: PDFSource, name: str | None = None) -> str:
+    """Nombre legible del origen para logs y `source_file` de los resultados."""
+    if name:
+        return name
+    if isinstance(source, str | Path):
+        return str(source)
+    return str(getattr(source, "name", "<memoria>"))
+
+
+def page_ranges(total_pages: int, pages_per_task: int, start: int = 0) -> list[tuple[int, int]]:
+    """
+    Divide las páginas [start, total_pages) en rangos semiabiertos.
+
+    Args:
+        total_pages: Cantidad total de páginas del PDF
+        pages_per_task: Páginas por rango (mínimo 1)
+        start: Primera página a incluir (índice 0)
+
+    Returns:
+        Lista de tuplas (inicio, fin) en orden
+    """
+    size = max(1, pages_per_task)
+    return [(i, min(i + size, total_pages)) for i in range(start, total_pages, size)]
+
+
+def default_workers() -> int:
+    """Número de workers por defecto: los CPUs disponibles, sin pasar de 8."""
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def map_page_ranges_ordered(
+    func: Callable[..., T],
+    ranges: list[tuple[int, int]],
+    *args: Any,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+) -> Iterator[T]:
+    """
+    Ejecuta `func(*args, inicio, fin)` por cada rango y entrega los resultados en orden.
+
+    Los rangos se envían todos al pool de una vez; a medida que terminan se
+    entregan los que ya tienen completos a todos sus predecesores. Así el
+    consumidor recibe resultados antes de que termine el PDF completo pero
+    siempre en orden de página.
+
+    Args:
+        func: Función a nivel de módulo (debe poder serializarse con pickle)
+        ranges: Rangos de páginas (inicio, fin)
+        *args: Argumentos fijos que se pasan antes del rango
+        max_workers: Tamaño del ProcessPoolExecutor si no se pasa `executor`
+        executor: Executor existente (ej. ThreadPoolExecutor); no se cierra aquí
+
+    Yields:
+        El resultado de `func` para cada rango, en orden
+    """
+    if not ranges:
+        return
+
+    own_executor = executor is None
+    pool = executor or ProcessPoolExecutor(max_workers=max_workers or default_workers())
+
+    try:
+        futures: list[Future[T]] = [pool.submit(func, *args, start, stop) for start, stop in ranges]
+        # Future.result() bloquea sólo hasta que ese rango termine: el siguiente
+        # resultado en orden se entrega en cuanto está listo.
+        for future in futures:
+            yield future.result()
+    finally:
+        if own_executor:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+__all__ = [
+    "DEFAULT_PAGES_PER_TASK",
+    "PDFSource",
+    "default_workers",
+    "describe_source",
+    "map_page_ranges_ordered",
+    "open_pdf",
+    "page_ranges",
+    "worker_source",
+]
@@ -12,16 +12,34 @@ Uso:
 
     repo = TransactionRepository(db)
     transactions = repo.get_by_profile(profile_id, mes=date(2024, 1, 1))
+
+    # En routers async, la misma API sobre una AsyncSession
+    repo = AsyncTransactionRepository(async_db)
+    transactions = await repo.get_by_profile(profile_id, mes=date(2024, 1, 1))
     ```
 """
 
-from finanzas_tracker.repositories.base import BaseRepository
-from finanzas_tracker.repositories.profile_repository import ProfileRepository
-from finanzas_tracker.repositories.transaction_repository import TransactionRepository
+from finanzas_tracker.repositories.base import AsyncBaseRepository, BaseRepository
+from finanzas_tracker.repositories.bulk import bulk_update_by_id
+from finanzas_tracker.repositories.filters import in_month, month_range
+from finanzas_tracker.repositories.profile_repository import (
+    AsyncProfileRepository,
+    ProfileRepository,
+)
+from finanzas_tracker.repositories.transaction_repository import (
+    AsyncTransactionRepository,
+    TransactionRepository,
+)
 
 
 __all__ = [
+    "AsyncBaseRepository",
+    "AsyncProfileRepository",
+    "AsyncTransactionRepository",
     "BaseRepository",
     "ProfileRepository",
     "TransactionRepository",
+    "bulk_update_by_id",
+    "in_month",
+    "month_range",
 ]
@@ -1,13 +1,18 @@
 """Base Repository Pattern.
 
 Proporciona operaciones CRUD genéricas siguiendo el Repository Pattern.
-Cada entidad tiene su propio repository que hereda de BaseRepository.
+Cada entidad tiene su propio repository que hereda de BaseRepository
+(sesión sync) o de AsyncBaseRepository (AsyncSession, routers async).
+Ambas variantes construyen los mismos statements; sólo cambia cómo se
+ejecutan.
 """
 
+from datetime import UTC, datetime
 from typing import Any, Generic, TypeVar
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.core.database import Base
@@ -17,7 +22,41 @@ from finanzas_tracker.core.database import Base
 ModelType = TypeVar("ModelType", bound=Base)
 
 
-class BaseRepository(Generic[ModelType]):
+class _RepositoryQueries(Generic[ModelType]):
+    """Statements compartidos entre la variante sync y la async."""
+
+    model: type[ModelType]
+
+    def _has_soft_delete(self) -> bool:
+        """Verifica si el modelo soporta soft delete."""
+        return hasattr(self.model, "deleted_at")
+
+    def _get_stmt(self, entity_id: str | UUID) -> Select[tuple[ModelType]]:
+        id_str = str(entity_id) if isinstance(entity_id, UUID) else entity_id
+        stmt = select(self.model).where(self.model.id == id_str)
+
+        if self._has_soft_delete():
+            stmt = stmt.where(self.model.deleted_at.is_(None))
+        return stmt
+
+    def _get_all_stmt(
+        self, skip: int, limit: int, include_deleted: bool
+    ) -> Select[tuple[ModelType]]:
+        stmt = select(self.model)
+
+        if not include_deleted and self._has_soft_delete():
+            stmt = stmt.where(self.model.deleted_at.is_(None))
+
+        return stmt.offset(skip).limit(limit)
+
+    @staticmethod
+    def _apply(entity: ModelType, data: dict[str, Any]) -> None:
+        for key, value in data.items():
+            if hasattr(entity, key):
+                setattr(entity, key, value)
+
+
+class BaseRepository(_RepositoryQueries[ModelType]):
     """
     Repositorio base con operaciones CRUD genéricas.
 
@@ -51,10 +90,6 @@ class BaseRepository(Generic[ModelType]):
         self.model = model
         self.db = db
 
-    def _has_soft_delete(self) -> bool:
-        """Verifica si el modelo soporta soft delete."""
-        return hasattr(self.model, "deleted_at")
-
     def get(self, entity_id: str | UUID) -> ModelType | None:
         """
         Obtiene una entidad por ID (excluyendo soft-deleted si aplica).
@@ -65,13 +100,7 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             Entidad encontrada o None
         """
-        id_str = str(entity_id) if isinstance(entity_id, UUID) else entity_id
-        stmt = select(self.model).where(self.model.id == id_str)
-
-        if self._has_soft_delete():
-            stmt = stmt.where(self.model.deleted_at.is_(None))
-
-        return self.db.execute(stmt).scalar_one_or_none()
+        return self.db.execute(self._get_stmt(entity_id)).scalar_one_or_none()
 
     def get_all(
         self,
@@ -91,12 +120,7 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             Lista de entidades
         """
-        stmt = select(self.model)
-
-        if not include_deleted and self._has_soft_delete():
-            stmt = stmt.where(self.model.deleted_at.is_(None))
-
-        stmt = stmt.offset(skip).limit(limit)
+        stmt = self._get_all_stmt(skip, limit, include_deleted)
         return list(self.db.execute(stmt).scalars().all())
 
     def create(self, data: dict[str, Any]) -> ModelType:
@@ -125,9 +149,7 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             Entidad actualizada
         """
-        for key, value in data.items():
-            if hasattr(entity, key):
-                setattr(entity, key, value)
+        self._apply(entity, data)
         self.db.flush()
         return entity
 
@@ -142,8 +164,6 @@ class BaseRepository(Generic[ModelType]):
         if hard or not self._has_soft_delete():
             self.db.delete(entity)
         else:
-            from datetime import UTC, datetime
-
             entity.deleted_at = datetime.now(UTC)
         self.db.flush()
 
@@ -158,3 +178,70 @@ class BaseRepository(Generic[ModelType]):
             True si existe y no está eliminada
         """
         return self.get(entity_id) is not None
+
+
+class AsyncBaseRepository(_RepositoryQueries[ModelType]):
+    """
+    Variante async de BaseRepository sobre una AsyncSession.
+
+    Mismos métodos y semántica (soft delete, flush tras escribir), pero
+    cada operación que toca la base de datos es una corrutina.
+
+    Example:
+        ```python
+        repo = AsyncTransactionRepository(db)
+        transaction = await repo.get(transaction_id)
+        ```
+    """
+
+    def __init__(self, model: type[ModelType], db: AsyncSession) -> None:
+        """
+        Inicializa el repositorio.
+
+        Args:
+            model: Clase del modelo SQLAlchemy
+            db: Sesión async de base de datos activa
+        """
+        self.model = model
+        self.db = db
+
+    async def get(self, entity_id: str | UUID) -> ModelType | None:
+        """Obtiene una entidad por ID (excluyendo soft-deleted si aplica)."""
+        result = await self.db.execute(self._get_stmt(entity_id))
+        return result.scalar_one_or_none()
+
+    async def get_all(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        include_deleted: bool = False,
+    ) -> list[ModelType]:
+        """Lista todas las entidades con paginación."""
+        result = await self.db.execute(self._get_all_stmt(skip, limit, include_deleted))
+        return list(result.scalars().all())
+
+    async def create(self, data: dict[str, Any]) -> ModelType:
+        """Crea una nueva entidad (flush para obtener el ID generado)."""
+        entity: ModelType = self.model(**data)
+        self.db.add(entity)
+        await self.db.flush()
+        return entity
+
+    async def update(self, entity: ModelType, data: dict[str, Any]) -> ModelType:
+        """Actualiza una entidad existente."""
+        self._apply(entity, data)
+        await self.db.flush()
+        return entity
+
+    async def delete(self, entity: ModelType, *, hard: bool = False) -> None:
+        """Elimina una entidad (soft delete por defecto si el modelo lo soporta)."""
+        if hard or not self._has_soft_delete():
+            await self.db.delete(entity)
+        else:
+            entity.deleted_at = datetime.now(UTC)
+        await self.db.flush()
+
+    async def exists(self, entity_id: str | UUID) -> bool:
+        """Verifica si existe una entidad con el ID dado."""
+        return await self.get(entity_id) is not None
@@ -0,0 +1,60 @@
+"""Actualizaciones por lotes con valores distintos por fila.
+
+Actualizar N filas cargando cada objeto del ORM y haciendo `flush` manda N
+`UPDATE` (y normalmente N `SELECT` antes). Aquí el lote se escribe en una
+sola sentencia:
+
+    UPDATE transactions SET subcategory_id = CAST(v.subcategory_id AS ...)
+    FROM (VALUES (...), (...)) AS v (id, subcategory_id)
+    WHERE transactions.id = CAST(v.id AS ...)
+
+Son sentencias Core: no pasan por los eventos `after_update` del ORM ni
+actualizan los objetos ya cargados en la sesión.
+"""
+
+__all__ = ["bulk_update_by_id"]
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, Table, cast, column, update, values
+from sqlalchemy.orm import Session
+
+
+def bulk_update_by_id(
+    session: Session,
+    table: Table,
+    rows: Sequence[dict[str, Any]],
+    *where: ColumnElement[bool],
+    **constants: Any,
+) -> None:
+    """
+    Actualiza muchas filas por ID en una sola sentencia `UPDATE ... FROM (VALUES ...)`.
+
+    Args:
+        session: Sesión de base de datos
+        table: Tabla a actualizar
+        rows: Diccionarios con "id" y las columnas que cambian por fila
+            (todos con las mismas claves)
+        *where: Condiciones extra (ej: el perfil dueño de las filas)
+        **constants: Columnas con el mismo valor (o expresión) para todas las filas
+    """
+    if not rows:
+        return
+    names = [name for name in rows[0] if name != "id"]
+
+    data = values(
+        *(column(name, table.c[name].type) for name in ["id", *names]),
+        name="v",
+    ).data([tuple(row[name] for name in ["id", *names]) for row in rows])
+    stmt = (
+        update(table)
+        .where(table.c.id == cast(data.c.id, table.c.id.type), *where)
+        .values(
+            {
+                **{name: cast(data.c[name], table.c[name].type) for name in names},
+                **constants,
+            }
+        )
+    )
+    session.execute(stmt)
@@ -0,0 +1,50 @@
+"""Filtros de fecha compartidos por repositories, services y routers.
+
+Filtrar un mes con `extract('year', col) == y AND extract('month', col) == m`
+aplica una función a la columna, así que Postgres no puede usar el índice
+de `fecha_transaccion` y recorre todo el historial del perfil. Estos
+helpers expresan el mes como el rango semiabierto `[inicio, mes_siguiente)`,
+que sí usa los índices `(profile_id, fecha_transaccion)`.
+"""
+
+__all__ = ["in_month", "month_range"]
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import ColumnElement, and_
+
+
+def month_range(year: int, month: int) -> tuple[datetime, datetime]:
+    """
+    Límites del mes como rango semiabierto.
+
+    Args:
+        year: Año
+        month: Mes (1-12)
+
+    Returns:
+        (primer instante del mes, primer instante del mes siguiente)
+
+    Raises:
+        ValueError: Si el mes no es válido
+    """
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def in_month(column: Any, year: int, month: int) -> ColumnElement[bool]:
+    """
+    Condición `column >= inicio AND column < mes_siguiente`.
+
+    Args:
+        column: Columna de fecha (ej: Transaction.fecha_transaccion)
+        year: Año
+        month: Mes (1-12)
+
+    Returns:
+        Condición para usar en `.where(...)`
+    """
+    start, end = month_range(year, month)
+    return and_(column >= start, column < end)
@@ -1,13 +1,70 @@
 """Repository para Perfiles."""
 
-from sqlalchemy import select
+from sqlalchemy import Select, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from finanzas_tracker.core.cache import invalidate_identity_cache
 from finanzas_tracker.models.profile import Profile
-from finanzas_tracker.repositories.base import BaseRepository
+from finanzas_tracker.repositories.base import AsyncBaseRepository, BaseRepository
 
 
-class ProfileRepository(BaseRepository[Profile]):
+# Clave de session.info: invalidar el cache de identidad en el próximo commit
+_INVALIDAR_IDENTIDAD = "invalidar_cache_identidad"
+
+
+def _invalidate_identity_on_commit(session: Session) -> None:
+    """
+    Invalida el cache de identidad cuando la sesión haga commit.
+
+    Invalidar antes del commit deja una ventana en la que otro request
+    vuelve a cachear el perfil activo anterior (todavía confirmado).
+    """
+    session.info[_INVALIDAR_IDENTIDAD] = True
+    if not event.contains(session, "after_commit", _after_commit):
+        event.listen(session, "after_commit", _after_commit)
+        event.listen(session, "after_rollback", _after_rollback)
+
+
+def _after_commit(session: Session) -> None:
+    if session.info.pop(_INVALIDAR_IDENTIDAD, False):
+        invalidate_identity_cache()
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_INVALIDAR_IDENTIDAD, None)
+
+
+class _ProfileQueries:
+    """Statements de perfiles compartidos por la variante sync y la async."""
+
+    model = Profile
+
+    def _by_email_stmt(self, email: str) -> Select[tuple[Profile]]:
+        return select(self.model).where(
+            self.model.email_outlook == email,
+            self.model.activo.is_(True),
+        )
+
+    def _by_name_stmt(self, nombre: str) -> Select[tuple[Profile]]:
+        return select(self.model).where(
+            self.model.nombre == nombre,
+            self.model.activo.is_(True),
+        )
+
+    def _active_stmt(self) -> Select[tuple[Profile]]:
+        return select(self.model).where(
+            self.model.activo.is_(True),
+        )
+
+    def _currently_active_stmt(self) -> Select[tuple[Profile]]:
+        return select(self.model).where(
+            self.model.es_activo.is_(True),
+            self.model.activo.is_(True),
+        )
+
+
+class ProfileRepository(_ProfileQueries, BaseRepository[Profile]):
     """
     Repositorio para operaciones de Perfiles.
 
@@ -28,11 +85,7 @@ class ProfileRepository(BaseRepository[Profile]):
         Returns:
             Perfil encontrado o None
         """
-        stmt = select(self.model).where(
-            self.model.email_outlook == email,
-            self.model.activo.is_(True),
-        )
-        return self.db.execute(stmt).scalar_one_or_none()
+        return self.db.execute(self._by_email_stmt(email)).scalar_one_or_none()
 
     def get_by_name(self, nombre: str) -> Profile | None:
         """
@@ -44,11 +97,7 @@ class ProfileRepository(BaseRepository[Profile]):
         Returns:
             Perfil encontrado o None
         """
-        stmt = select(self.model).where(
-            self.model.nombre == nombre,
-            self.model.activo.is_(True),
-        )
-        return self.db.execute(stmt).scalar_one_or_none()
+        return self.db.execute(self._by_name_stmt(nombre)).scalar_one_or_none()
 
     def get_active(self) -> list[Profile]:
         """
@@ -57,10 +106,7 @@ class ProfileRepository(BaseRepository[Profile]):
         Returns:
             Lista de perfiles habilitados
         """
-        stmt = select(self.model).where(
-            self.model.activo.is_(True),
-        )
-        return list(self.db.execute(stmt).scalars().all())
+        return list(self.db.execute(self._active_stmt()).scalars().all())
 
     def get_currently_active(self) -> Profile | None:
         """
@@ -69,16 +115,15 @@ class ProfileRepository(BaseRepository[Profile]):
         Returns:
             Perfil con es_activo=True o None
         """
-        stmt = select(self.model).where(
-            self.model.es_activo.is_(True),
-            self.model.activo.is_(True),
-        )
-        return self.db.execute(stmt).scalar_one_or_none()
+        return self.db.execute(self._currently_active_stmt()).scalar_one_or_none()
 
     def set_as_active(self, profile: Profile) -> None:
         """
         Establece un perfil como activo (desactiva los demás).
 
+        El cache de identidad de la API se invalida cuando la sesión hace
+        commit (lo hace el llamador).
+
         Args:
             profile: Perfil a establecer como activo
         """
@@ -91,3 +136,28 @@ class ProfileRepository(BaseRepository[Profile]):
         # Activar este perfil
         profile.es_activo = True
         self.db.flush()
+        _invalidate_identity_on_commit(self.db)
+
+
+class AsyncProfileRepository(_ProfileQueries, AsyncBaseRepository[Profile]):
+    """Variante async de ProfileRepository (lecturas de la ruta caliente de la API)."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        super().__init__(Profile, db)
+
+    async def get_by_email(self, email: str) -> Profile | None:
+        """Busca perfil por email de Outlook."""
+        return (await self.db.execute(self._by_email_stmt(email))).scalar_one_or_none()
+
+    async def get_by_name(self, nombre: str) -> Profile | None:
+        """Busca perfil por nombre exacto."""
+        return (await self.db.execute(self._by_name_stmt(nombre))).scalar_one_or_none()
+
+    async def get_active(self) -> list[Profile]:
+        """Lista todos los perfiles habilitados (activo=True)."""
+        return list((await self.db.execute(self._active_stmt())).scalars().all())
+
+    async def get_currently_active(self) -> Profile | None:
+        """Obtiene el perfil actualmente activo (es_activo=True)."""
+        result = await self.db.execute(self._currently_active_stmt())
+        return result.scalar_one_or_none()
@@ -2,16 +2,113 @@
 
 from datetime import date, datetime
 from decimal import Decimal
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import ColumnElement, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.models.transaction import Transaction
-from finanzas_tracker.repositories.base import BaseRepository
+from finanzas_tracker.repositories.base import AsyncBaseRepository, BaseRepository
+from finanzas_tracker.repositories.filters import in_month
 
 
-class TransactionRepository(BaseRepository[Transaction]):
+class _TransactionQueries:
+    """Statements de transacciones compartidos por la variante sync y la async."""
+
+    model = Transaction
+
+    @staticmethod
+    def _profile_id(profile_id: str | UUID) -> str:
+        return str(profile_id) if isinstance(profile_id, UUID) else profile_id
+
+    def _profile_filters(
+        self,
+        profile_id: str | UUID,
+        *,
+        mes: date | None = None,
+        categoria_id: str | None = None,
+        tipo: str | None = None,
+        banco: str | None = None,
+        desde: date | None = None,
+        hasta: date | None = None,
+    ) -> list[ColumnElement[bool]]:
+        """Condiciones WHERE de `get_by_profile` / `count_by_profile`."""
+        conditions: list[ColumnElement[bool]] = [
+            self.model.profile_id == self._profile_id(profile_id),
+            self.model.deleted_at.is_(None),
+        ]
+
+        if mes:
+            conditions.append(in_month(self.model.fecha_transaccion, mes.year, mes.month))
+
+        if categoria_id:
+            conditions.append(self.model.subcategory_id == categoria_id)
+
+        if tipo:
+            conditions.append(self.model.tipo_transaccion == tipo)
+
+        if banco:
+            conditions.append(self.model.banco == banco)
+
+        if desde:
+            conditions.append(
+                self.model.fecha_transaccion >= datetime.combine(desde, datetime.min.time())
+            )
+
+        if hasta:
+            conditions.append(
+                self.model.fecha_transaccion <= datetime.combine(hasta, datetime.max.time())
+            )
+
+        return conditions
+
+    def _by_profile_stmt(
+        self, profile_id: str | UUID, skip: int, limit: int, **filters: Any
+    ) -> Select[tuple[Transaction]]:
+        return (
+            select(self.model)
+            .where(*self._profile_filters(profile_id, **filters))
+            .order_by(self.model.fecha_transaccion.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+
+    def _count_stmt(self, profile_id: str | UUID, **filters: Any) -> Select[tuple[int]]:
+        return select(func.count()).where(*self._profile_filters(profile_id, **filters))
+
+    def _by_email_id_stmt(self, email_id: str) -> Select[tuple[Transaction]]:
+        return select(self.model).where(
+            self.model.email_id == email_id,
+            self.model.deleted_at.is_(None),
+        )
+
+    def _total_by_month_stmt(
+        self, profile_id: str | UUID, year: int, month: int
+    ) -> Select[tuple[Decimal | None]]:
+        return select(func.sum(self.model.monto_crc)).where(
+            self.model.profile_id == self._profile_id(profile_id),
+            self.model.deleted_at.is_(None),
+            in_month(self.model.fecha_transaccion, year, month),
+        )
+
+    def _by_category_stmt(
+        self, profile_id: str | UUID, subcategory_id: str, limit: int
+    ) -> Select[tuple[Transaction]]:
+        return (
+            select(self.model)
+            .where(
+                self.model.profile_id == self._profile_id(profile_id),
+                self.model.subcategory_id == subcategory_id,
+                self.model.deleted_at.is_(None),
+            )
+            .order_by(self.model.fecha_transaccion.desc())
+            .limit(limit)
+        )
+
+
+class TransactionRepository(_TransactionQueries, BaseRepository[Transaction]):
     """
     Repositorio para operaciones de Transacciones.
 
@@ -52,40 +149,17 @@ class TransactionRepository(BaseRepository[Transaction]):
         Returns:
             Lista de transacciones ordenadas por fecha desc
         """
-        profile_id_str = str(profile_id) if isinstance(profile_id, UUID) else profile_id
-
-        stmt = select(self.model).where(
-            self.model.profile_id == profile_id_str,
-            self.model.deleted_at.is_(None),
+        stmt = self._by_profile_stmt(
+            profile_id,
+            skip,
+            limit,
+            mes=mes,
+            categoria_id=categoria_id,
+            tipo=tipo,
+            banco=banco,
+            desde=desde,
+            hasta=hasta,
         )
-
-        # Aplicar filtros
-        if mes:
-            stmt = stmt.where(
-                func.extract("year", self.model.fecha_transaccion) == mes.year,
-                func.extract("month", self.model.fecha_transaccion) == mes.month,
-            )
-
-        if categoria_id:
-            stmt = stmt.where(self.model.subcategory_id == categoria_id)
-
-        if tipo:
-            stmt = stmt.where(self.model.tipo_transaccion == tipo)
-
-        if banco:
-            stmt = stmt.where(self.model.banco == banco)
-
-        if desde:
-            stmt = stmt.where(
-                self.model.fecha_transaccion >= datetime.combine(desde, datetime.min.time())
-            )
-
-        if hasta:
-            stmt = stmt.where(
-                self.model.fecha_transaccion <= datetime.combine(hasta, datetime.max.time())
-            )
-
-        stmt = stmt.order_by(self.model.fecha_transaccion.desc()).offset(skip).limit(limit)
         return list(self.db.execute(stmt).scalars().all())
 
     def count_by_profile(
@@ -100,68 +174,130 @@ class TransactionRepository(BaseRepository[Transaction]):
         hasta: date | None = None,
     ) -> int:
         """Cuenta transacciones de un perfil con los mismos filtros."""
-        profile_id_str = str(profile_id) if isinstance(profile_id, UUID) else profile_id
-
-        stmt = select(func.count()).where(
-            self.model.profile_id == profile_id_str,
-            self.model.deleted_at.is_(None),
+        stmt = self._count_stmt(
+            profile_id,
+            mes=mes,
+            categoria_id=categoria_id,
+            tipo=tipo,
+            banco=banco,
+            desde=desde,
+            hasta=hasta,
         )
+        return self.db.execute(stmt).scalar() or 0
 
-        if mes:
-            stmt = stmt.where(
-                func.extract("year", self.model.fecha_transaccion) == mes.year,
-                func.extract("month", self.model.fecha_transaccion) == mes.month,
-            )
+    def get_by_email_id(self, email_id: str) -> Transaction | None:
+        """Busca transacción por ID de email (para detección de duplicados)."""
+        return self.db.execute(self._by_email_id_stmt(email_id)).scalar_one_or_none()
 
-        if categoria_id:
-            stmt = stmt.where(self.model.subcategory_id == categoria_id)
+    def get_total_by_month(
+        self,
+        profile_id: str | UUID,
+        year: int,
+        month: int,
+    ) -> Decimal:
+        """Obtiene el total gastado en un mes."""
+        result = self.db.execute(self._total_by_month_stmt(profile_id, year, month)).scalar()
+        return Decimal(str(result)) if result else Decimal("0")
 
-        if tipo:
-            stmt = stmt.where(self.model.tipo_transaccion == tipo)
+    def get_by_category(
+        self,
+        profile_id: str | UUID,
+        subcategory_id: str,
+        *,
+        limit: int = 20,
+    ) -> list[Transaction]:
+        """Lista transacciones recientes de una categoría."""
+        stmt = self._by_category_stmt(profile_id, subcategory_id, limit)
+        return list(self.db.execute(stmt).scalars().all())
 
-        if banco:
-            stmt = stmt.where(self.model.banco == banco)
 
-        if desde:
-            stmt = stmt.where(
-                self.model.fecha_transaccion >= datetime.combine(desde, datetime.min.time())
-            )
+class AsyncTransactionRepository(_TransactionQueries, AsyncBaseRepository[Transaction]):
+    """
+    Variante async de TransactionRepository para los routers `async def`.
 
-        if hasta:
-            stmt = stmt.where(
-                self.model.fecha_transaccion <= datetime.combine(hasta, datetime.max.time())
-            )
+    Mismas queries y filtros; cada método es una corrutina.
+    """
 
-        return self.db.execute(stmt).scalar() or 0
+    def __init__(self, db: AsyncSession) -> None:
+        super().__init__(Transaction, db)
 
-    def get_by_email_id(self, email_id: str) -> Transaction | None:
+    async def get_by_profile(
+        self,
+        profile_id: str | UUID,
+        *,
+        skip: int = 0,
+        limit: int = 50,
+        mes: date | None = None,
+        categoria_id: str | None = None,
+        tipo: str | None = None,
+        banco: str | None = None,
+        desde: date | None = None,
+        hasta: date | None = None,
+    ) -> list[Transaction]:
+        """Lista transacciones de un perfil con filtros opcionales (ver TransactionRepository)."""
+        stmt = self._by_profile_stmt(
+            profile_id,
+            skip,
+            limit,
+            mes=mes,
+            categoria_id=categoria_id,
+            tipo=tipo,
+            banco=banco,
+            desde=desde,
+            hasta=hasta,
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def count_by_profile(
+        self,
+        profile_id: str | UUID,
+        *,
+        mes: date | None = None,
+        categoria_id: str | None = None,
+        tipo: str | None = None,
+        banco: str | None = None,
+        desde: date | None = None,
+        hasta: date | None = None,
+    ) -> int:
+        """Cuenta transacciones de un perfil con los mismos filtros."""
+        stmt = self._count_stmt(
+            profile_id,
+            mes=mes,
+            categoria_id=categoria_id,
+            tipo=tipo,
+            banco=banco,
+            desde=desde,
+            hasta=hasta,
+        )
+        return (await self.db.execute(stmt)).scalar() or 0
+
+    async def get_by_email_id(self, email_id: str) -> Transaction | None:
         """Busca transacción por ID de email (para detección de duplicados)."""
-        stmt = select(self.model).where(
-            self.model.email_id == email_id,
-            self.model.deleted_at.is_(None),
+        result = await self.db.execute(self._by_email_id_stmt(email_id))
+        return result.scalar_one_or_none()
+
+    async def get_for_profile(
+        self, transaction_id: str, profile_id: str | UUID
+    ) -> Transaction | None:
+        """Obtiene una transacción activa sólo si pertenece al perfil."""
+        stmt = self._get_stmt(transaction_id).where(
+            self.model.profile_id == self._profile_id(profile_id)
         )
-        return self.db.execute(stmt).scalar_one_or_none()
+        return (await self.db.execute(stmt)).scalar_one_or_none()
 
-    def get_total_by_month(
+    async def get_total_by_month(
         self,
         profile_id: str | UUID,
         year: int,
         month: int,
     ) -> Decimal:
         """Obtiene el total gastado en un mes."""
-        profile_id_str = str(profile_id) if isinstance(profile_id, UUID) else profile_id
-
-        stmt = select(func.sum(self.model.monto_crc)).where(
-            self.model.profile_id == profile_id_str,
-            self.model.deleted_at.is_(None),
-            func.extract("year", self.model.fecha_transaccion) == year,
-            func.extract("month", self.model.fecha_transaccion) == month,
-        )
-
-        result = self.db.execute(stmt).scalar()
-        return Decimal(str(result)) if result else Decimal("0")
+        result = await self.db.execute(self._total_by_month_stmt(profile_id, year, month))
+        total = result.scalar()
+        return Decimal(str(total)) if total else Decimal("0")
 
-    def get_by_category(
+    async def get_by_category(
         self,
         profile_id: str | UUID,
         subcategory_id: str,
@@ -169,16 +305,5 @@ class TransactionRepository(BaseRepository[Transaction]):
         limit: int = 20,
     ) -> list[Transaction]:
         """Lista transacciones recientes de una categoría."""
-        profile_id_str = str(profile_id) if isinstance(profile_id, UUID) else profile_id
-
-        stmt = (
-            select(self.model)
-            .where(
-                self.model.profile_id == profile_id_str,
-                self.model.subcategory_id == subcategory_id,
-                self.model.deleted_at.is_(None),
-            )
-            .order_by(self.model.fecha_transaccion.desc())
-            .limit(limit)
-        )
-        return list(self.db.execute(stmt).scalars().all())
+        result = await self.db.execute(self._by_category_stmt(profile_id, subcategory_id, limit))
+        return list(result.scalars().all())
@@ -1,61 +1,146 @@
-"""Servicios de lógica de negocio - Finanzas Tracker CR."""
+"""
+Servicios de lógica de negocio - Finanzas Tracker CR.
 
-from finanzas_tracker.services.ambiguous_merchant_service import (
-    AmbiguousMerchantService,
-    listar_comercios_ambiguos,
-)
-from finanzas_tracker.services.auth_manager import AuthManager, auth_manager
-from finanzas_tracker.services.card_service import CardService
-from finanzas_tracker.services.categorizer import TransactionCategorizer
-from finanzas_tracker.services.duplicate_detector import (
-    DuplicateDetectorService,
-    duplicate_detector_service,
-)
-from finanzas_tracker.services.email_fetcher import EmailFetcher
-from finanzas_tracker.services.exchange_rate import ExchangeRateService, exchange_rate_service
-from finanzas_tracker.services.finance_chat import FinanceChatService
-from finanzas_tracker.services.insights import InsightsService
-from finanzas_tracker.services.insights_service import InsightsService as SmartInsightsService
-from finanzas_tracker.services.internal_transfer_detector import InternalTransferDetector
-from finanzas_tracker.services.merchant_service import MerchantNormalizationService
-from finanzas_tracker.services.merchant_lookup_service import MerchantLookupService
-from finanzas_tracker.services.notification_service import CardNotificationService
-from finanzas_tracker.services.onboarding_service import OnboardingService
-from finanzas_tracker.services.pattern_learning_service import PatternLearningService
-from finanzas_tracker.services.patrimony_service import PatrimonyService
-from finanzas_tracker.services.reconciliation_service import ReconciliationService
-from finanzas_tracker.services.smart_learning_service import (
-    CategorizationSuggestion,
-    ClusterInfo,
-    LearningResult,
-    SimilarPattern,
-    SmartLearningService,
-)
-from finanzas_tracker.services.recurring_expense_predictor import (
-    AlertLevel,
-    ExpenseType,
-    PredictedExpense,
-    RecurringExpensePredictor,
-    generar_reporte_gastos_proximos,
-)
-from finanzas_tracker.services.sinpe_reconciliation_service import SinpeReconciliationService
-from finanzas_tracker.services.statement_email_service import (
-    StatementEmailService,
-    statement_email_service,
-)
-from finanzas_tracker.services.subscription_detector import (
-    DetectedSubscription,
-    SubscriptionDetector,
-    SubscriptionFrequency,
-)
-from finanzas_tracker.services.sync_scheduler import (
-    scheduler,
-    start_background_tasks,
-    stop_background_tasks,
-)
-from finanzas_tracker.services.sync_strategy import SyncResult, SyncStrategy
-from finanzas_tracker.services.transaction_processor import TransactionProcessor
-from finanzas_tracker.services.transaction_service import TransactionService
+Los exports se cargan de forma perezosa (PEP 562): importar el paquete no
+importa ningún servicio. Cada nombre de `__all__` se resuelve al primer
+acceso, de modo que el MCP server, la API o un script sólo pagan por los
+módulos que realmente usan (y no por torch, MSAL o el cliente de Anthropic).
+
+Nota: `auth_manager` y `statement_email_service` son a la vez submódulos e
+instancias. Si el submódulo ya fue importado, el atributo del paquete es el
+módulo; para la instancia importar desde el submódulo directamente.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from finanzas_tracker.services.ambiguous_merchant_service import (
+        AmbiguousMerchantService,
+        listar_comercios_ambiguos,
+    )
+    from finanzas_tracker.services.auth_manager import AuthManager, auth_manager
+    from finanzas_tracker.services.card_service import CardService
+    from finanzas_tracker.services.categorizer import TransactionCategorizer
+    from finanzas_tracker.services.duplicate_detector import (
+        DuplicateDetectorService,
+        duplicate_detector_service,
+    )
+    from finanzas_tracker.services.email_fetcher import EmailFetcher
+    from finanzas_tracker.services.exchange_rate import ExchangeRateService, exchange_rate_service
+    from finanzas_tracker.services.finance_chat import FinanceChatService
+    from finanzas_tracker.services.insights import InsightsService
+    from finanzas_tracker.services.insights_service import InsightsService as SmartInsightsService
+    from finanzas_tracker.services.internal_transfer_detector import InternalTransferDetector
+    from finanzas_tracker.services.merchant_lookup_service import MerchantLookupService
+    from finanzas_tracker.services.merchant_service import MerchantNormalizationService
+    from finanzas_tracker.services.notification_service import CardNotificationService
+    from finanzas_tracker.services.onboarding_service import OnboardingService
+    from finanzas_tracker.services.patrimony_service import PatrimonyService
+    from finanzas_tracker.services.pattern_learning_service import PatternLearningService
+    from finanzas_tracker.services.reconciliation_service import ReconciliationService
+    from finanzas_tracker.services.recurring_expense_predictor import (
+        AlertLevel,
+        ExpenseType,
+        PredictedExpense,
+        RecurringExpensePredictor,
+        generar_reporte_gastos_proximos,
+    )
+    from finanzas_tracker.services.sinpe_reconciliation_service import SinpeReconciliationService
+    from finanzas_tracker.services.smart_learning_service import (
+        CategorizationSuggestion,
+        ClusterInfo,
+        LearningResult,
+        SimilarPattern,
+        SmartLearningService,
+    )
+    from finanzas_tracker.services.statement_email_service import (
+        StatementEmailService,
+        statement_email_service,
+    )
+    from finanzas_tracker.services.subscription_detector import (
+        DetectedSubscription,
+        SubscriptionDetector,
+        SubscriptionFrequency,
+    )
+    from finanzas_tracker.services.sync_scheduler import (
+        scheduler,
+        start_background_tasks,
+        stop_background_tasks,
+    )
+    from finanzas_tracker.services.sync_strategy import SyncResult, SyncStrategy
+    from finanzas_tracker.services.transaction_processor import TransactionProcessor
+    from finanzas_tracker.services.transaction_service import TransactionService
+
+
+# nombre exportado -> (submódulo, atributo)
+_LAZY_EXPORTS: dict[str, tuple[str, str]] = {
+    "AmbiguousMerchantService": ("ambiguous_merchant_service", "AmbiguousMerchantService"),
+    "listar_comercios_ambiguos": ("ambiguous_merchant_service", "listar_comercios_ambiguos"),
+    "AuthManager": ("auth_manager", "AuthManager"),
+    "auth_manager": ("auth_manager", "auth_manager"),
+    "CardService": ("card_service", "CardService"),
+    "TransactionCategorizer": ("categorizer", "TransactionCategorizer"),
+    "DuplicateDetectorService": ("duplicate_detector", "DuplicateDetectorService"),
+    "duplicate_detector_service": ("duplicate_detector", "duplicate_detector_service"),
+    "EmailFetcher": ("email_fetcher", "EmailFetcher"),
+    "ExchangeRateService": ("exchange_rate", "ExchangeRateService"),
+    "exchange_rate_service": ("exchange_rate", "exchange_rate_service"),
+    "FinanceChatService": ("finance_chat", "FinanceChatService"),
+    "InsightsService": ("insights", "InsightsService"),
+    "SmartInsightsService": ("insights_service", "InsightsService"),
+    "InternalTransferDetector": ("internal_transfer_detector", "InternalTransferDetector"),
+    "MerchantNormalizationService": ("merchant_service", "MerchantNormalizationService"),
+    "MerchantLookupService": ("merchant_lookup_service", "MerchantLookupService"),
+    "CardNotificationService": ("notification_service", "CardNotificationService"),
+    "OnboardingService": ("onboarding_service", "OnboardingService"),
+    "PatternLearningService": ("pattern_learning_service", "PatternLearningService"),
+    "PatrimonyService": ("patrimony_service", "PatrimonyService"),
+    "ReconciliationService": ("reconciliation_service", "ReconciliationService"),
+    "CategorizationSuggestion": ("smart_learning_service", "CategorizationSuggestion"),
+    "ClusterInfo": ("smart_learning_service", "ClusterInfo"),
+    "LearningResult": ("smart_learning_service", "LearningResult"),
+    "SimilarPattern": ("smart_learning_service", "SimilarPattern"),
+    "SmartLearningService": ("smart_learning_service", "SmartLearningService"),
+    "AlertLevel": ("recurring_expense_predictor", "AlertLevel"),
+    "ExpenseType": ("recurring_expense_predictor", "ExpenseType"),
+    "PredictedExpense": ("recurring_expense_predictor", "PredictedExpense"),
+    "RecurringExpensePredictor": ("recurring_expense_predictor", "RecurringExpensePredictor"),
+    "generar_reporte_gastos_proximos": (
+        "recurring_expense_predictor",
+        "generar_reporte_gastos_proximos",
+    ),
+    "SinpeReconciliationService": ("sinpe_reconciliation_service", "SinpeReconciliationService"),
+    "StatementEmailService": ("statement_email_service", "StatementEmailService"),
+    "statement_email_service": ("statement_email_service", "statement_email_service"),
+    "DetectedSubscription": ("subscription_detector", "DetectedSubscription"),
+    "SubscriptionDetector": ("subscription_detector", "SubscriptionDetector"),
+    "SubscriptionFrequency": ("subscription_detector", "SubscriptionFrequency"),
+    "scheduler": ("sync_scheduler", "scheduler"),
+    "start_background_tasks": ("sync_scheduler", "start_background_tasks"),
+    "stop_background_tasks": ("sync_scheduler", "stop_background_tasks"),
+    "SyncResult": ("sync_strategy", "SyncResult"),
+    "SyncStrategy": ("sync_strategy", "SyncStrategy"),
+    "TransactionProcessor": ("transaction_processor", "TransactionProcessor"),
+    "TransactionService": ("transaction_service", "TransactionService"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Importa el submódulo de un export la primera vez que se accede."""
+    try:
+        module_name, attr = _LAZY_EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f"{__name__}.{module_name}"), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """Incluye los exports perezosos en dir() y en el autocompletado."""
+    return sorted(set(globals()) | set(__all__))
 
 
 __all__ = [
@@ -24,6 +24,8 @@ from finanzas_tracker.models.merchant import (
     obtener_categorias_posibles,
 )
 from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.repositories.bulk import bulk_update_by_id
+from finanzas_tracker.services.review_queue import marcar_cambio
 
 
 logger = logging.getLogger(__name__)
@@ -201,22 +203,39 @@ class AmbiguousMerchantService:
         Returns:
             Número de transacciones marcadas
         """
-        stmt = select(Transaction).where(
+        stmt = select(Transaction.id, Transaction.comercio).where(
             Transaction.profile_id == profile_id,
             Transaction.es_comercio_ambiguo == False,
             Transaction.deleted_at.is_(None),
         )
 
-        transactions = self.db.execute(stmt).scalars().all()
-        count = 0
-
-        for txn in transactions:
-            if self.detectar_y_marcar(txn):
-                count += 1
-
-        # Flush para enviar los cambios pero dejar el commit al caller
-        if count > 0:
-            self.db.flush()
+        # Las opciones se calculan una vez por comercio y se escriben en un
+        # solo UPDATE por lote (sin cargar cada transacción en el ORM)
+        opciones: dict[str, str | None] = {}
+        filas = []
+        for transaction_id, comercio in self.db.execute(stmt).all():
+            if comercio not in opciones:
+                categorias = (
+                    obtener_categorias_posibles(comercio) if es_comercio_ambiguo(comercio) else []
+                )
+                opciones[comercio] = (
+                    json.dumps(categorias, ensure_ascii=False) if categorias else None
+                )
+            if opciones[comercio]:
+                filas.append({"id": transaction_id, "categorias_opciones": opciones[comercio]})
+
+        # Deja el commit al caller
+        bulk_update_by_id(
+            self.db,
+            Transaction.__table__,
+            filas,
+            es_comercio_ambiguo=True,
+            necesita_revision=True,
+            confirmada=False,
+        )
+        count = len(filas)
+        if count:
+            marcar_cambio(self.db, profile_id)
 
         logger.info(f"Marcadas {count} transacciones como comercios ambiguos")
         return count
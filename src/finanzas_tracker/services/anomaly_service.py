@@ -0,0 +1,413 @@
+"""
+Detección estadística de montos anómalos con líneas base incrementales.
+
+Cada perfil tiene una línea base por comercio y otra por subcategoría
+(`AnomalyBaseline`): la media y la varianza exponenciales (EWMA) del
+logaritmo del monto. Una transacción nueva se puntúa contra sus líneas
+base y las actualiza, todo en O(1):
+
+    z = (log(monto) - media) / max(desviación, SIGMA_MINIMA)
+    anomaly_score = 1 - z / Z_ANOMALIA   (recortado a [-1, 1]; < 0 = anómala)
+
+Sólo se marcan montos inusualmente ALTOS, y una dimensión no puntúa
+hasta tener MIN_OBSERVACIONES. El valor que actualiza la línea base se
+recorta a `media ± Z_ANOMALIA·desviación`, así una anomalía no infla la
+varianza (estadística robusta).
+
+Para recalcular todo el historial (en lotes vectorizados con NumPy):
+
+    python -m finanzas_tracker.services.anomaly_service
+"""
+
+__all__ = ["AnomalyService", "clave_comercio"]
+
+from collections.abc import Callable, Sequence
+from decimal import Decimal
+import math
+from typing import Any
+
+import numpy as np
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.core.database import SessionLocal
+from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.models.anomaly_baseline import (
+    DIMENSION_COMERCIO,
+    DIMENSION_SUBCATEGORIA,
+    AnomalyBaseline,
+)
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
+
+
+logger = get_logger(__name__)
+
+# Peso de cada observación nueva en la media/varianza exponencial
+ALPHA = 0.1
+# Observaciones mínimas antes de puntuar una dimensión
+MIN_OBSERVACIONES = 5
+# Desviaciones (en escala log) a partir de las cuales el score es negativo
+Z_ANOMALIA = 3.5
+# Piso de la desviación: evita que un monto fijo (suscripciones) dispare todo
+SIGMA_MINIMA = 0.1
+
+_BATCH_SIZE = 10_000
+
+
+def clave_comercio(comercio: str | None) -> str | None:
+    """Clave de comercio para las líneas base (mayúsculas, espacios colapsados)."""
+    if not comercio:
+        return None
+    return " ".join(comercio.upper().split())[:255] or None
+
+
+# Dimensiones: (nombre, clave desde (comercio, subcategory_id))
+_DIMENSIONES: tuple[tuple[str, Callable[[str | None, str | None], str | None]], ...] = (
+    (DIMENSION_COMERCIO, lambda comercio, _: clave_comercio(comercio)),
+    (DIMENSION_SUBCATEGORIA, lambda _, subcategory_id: subcategory_id),
+)
+
+
+def _z(n: Any, media: Any, varianza: Any, x: Any) -> Any:
+    """Desviaciones sobre la media (NaN si la línea base aún no tiene datos suficientes)."""
+    sigma = np.maximum(np.sqrt(varianza), SIGMA_MINIMA)
+    return np.where(n >= MIN_OBSERVACIONES, (x - media) / sigma, np.nan)
+
+
+def _recortar(n: Any, media: Any, varianza: Any, x: Any) -> Any:
+    """Recorta la observación a media ± Z_ANOMALIA·sigma antes de actualizar."""
+    limite = Z_ANOMALIA * np.maximum(np.sqrt(varianza), SIGMA_MINIMA)
+    return np.where(n >= MIN_OBSERVACIONES, np.clip(x, media - limite, media + limite), x)
+
+
+def _actualizar(n: Any, media: Any, varianza: Any, x: Any) -> tuple[Any, Any, Any]:
+    """
+    Actualiza media y varianza exponenciales con una observación.
+
+    Con pocas observaciones el peso es 1/n (media y varianza exactas);
+    después, ALPHA.
+    """
+    n = n + 1
+    alpha = np.maximum(ALPHA, 1.0 / n)
+    diff = x - media
+    incremento = alpha * diff
+    return n, media + incremento, (1 - alpha) * (varianza + diff * incremento)
+
+
+def _score(z: float) -> Decimal:
+    """Score en [-1, 1] (escala de `Transaction.anomaly_score`; < 0 = anómala)."""
+    score = min(1.0, max(-1.0, 1.0 - max(z, 0.0) / Z_ANOMALIA))
+    return Decimal(f"{score:.4f}")
+
+
+def _resultado(z: float, sigma: float, dimension: str, comercio: str | None) -> dict[str, Any]:
+    """Valores de `anomaly_score`, `is_anomaly` y `anomaly_reason` para un z."""
+    score = _score(z)
+    razon = None
+    if score < 0:
+        donde = f"en {comercio}" if dimension == DIMENSION_COMERCIO else "en la subcategoría"
+        razon = f"Monto {math.exp(z * sigma):.1f}x mayor de lo usual {donde}"[:255]
+    return {"anomaly_score": score, "is_anomaly": score < 0, "anomaly_reason": razon}
+
+
+_SIN_SCORE: dict[str, Any] = {"anomaly_score": None, "is_anomaly": False, "anomaly_reason": None}
+
+
+class _Estado:
+    """Líneas base de una dimensión como arreglos (para el backfill por lotes)."""
+
+    def __init__(self) -> None:
+        self.claves: dict[str, int] = {}
+        self.n = np.zeros(0, dtype=np.int64)
+        self.media = np.zeros(0, dtype=np.float64)
+        self.varianza = np.zeros(0, dtype=np.float64)
+
+    def codigos(self, claves: Sequence[str | None]) -> np.ndarray:
+        """Código por clave (-1 = sin clave); agranda los arreglos con claves nuevas."""
+        index = self.claves
+        codes = np.fromiter(
+            (-1 if c is None else index.setdefault(c, len(index)) for c in claves),
+            dtype=np.int64,
+            count=len(claves),
+        )
+        extra = len(index) - len(self.n)
+        if extra:
+            self.n = np.concatenate([self.n, np.zeros(extra, dtype=np.int64)])
+            self.media = np.concatenate([self.media, np.zeros(extra)])
+            self.varianza = np.concatenate([self.varianza, np.zeros(extra)])
+        return codes
+
+    def procesar(self, codes: np.ndarray, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Puntúa y actualiza en orden cronológico.
+
+        La k-ésima transacción de cada clave se procesa en la ronda k: en una
+        ronda cada clave aparece a lo sumo una vez, así que la recurrencia
+        se aplica a todas las claves a la vez con operaciones vectorizadas.
+
+        Returns:
+            (z por fila, sigma usada por fila); NaN donde no puntúa
+        """
+        z = np.full(len(x), np.nan)
+        sigma = np.full(len(x), np.nan)
+        filas = np.flatnonzero(codes >= 0)
+        if not filas.size:
+            return z, sigma
+
+        # Rango de cada fila dentro de su clave (0 = primera aparición)
+        por_clave = np.argsort(codes[filas], kind="stable")
+        ordenados = codes[filas][por_clave]
+        inicios = np.flatnonzero(np.r_[True, ordenados[1:] != ordenados[:-1]])
+        largos = np.diff(np.r_[inicios, len(ordenados)])
+        rango = np.empty(len(filas), dtype=np.int64)
+        rango[por_clave] = np.arange(len(filas)) - np.repeat(inicios, largos)
+
+        por_ronda = np.argsort(rango, kind="stable")
+        cortes = np.flatnonzero(np.diff(rango[por_ronda])) + 1
+        for ronda in np.split(filas[por_ronda], cortes):
+            c = codes[ronda]
+            n, media, varianza = self.n[c], self.media[c], self.varianza[c]
+            z[ronda] = _z(n, media, varianza, x[ronda])
+            sigma[ronda] = np.maximum(np.sqrt(varianza), SIGMA_MINIMA)
+            self.n[c], self.media[c], self.varianza[c] = _actualizar(
+                n, media, varianza, _recortar(n, media, varianza, x[ronda])
+            )
+        return z, sigma
+
+
+class AnomalyService:
+    """
+    Puntúa transacciones contra líneas base por comercio y subcategoría.
+
+    Ejemplo:
+        >>> AnomalyService(session).score(transaction)  # antes del commit
+        Decimal('-0.4286')
+    """
+
+    def __init__(self, db: Session) -> None:
+        """
+        Inicializa el servicio.
+
+        Args:
+            db: Sesión de base de datos
+        """
+        self.db = db
+
+    @staticmethod
+    def _es_puntuable(tipo_transaccion: str | None, monto_crc: Decimal | None) -> bool:
+        return tipo_transaccion != "ingreso" and bool(monto_crc) and monto_crc > 0
+
+    def score(self, transaction: Transaction) -> Decimal | None:
+        """
+        Puntúa una transacción nueva y actualiza sus líneas base (sin commit).
+
+        Escribe `anomaly_score`, `is_anomaly` y `anomaly_reason`. Las líneas
+        base quedan bloqueadas (`FOR UPDATE`) hasta el commit de la sesión.
+
+        Args:
+            transaction: Transacción a puntuar (puede no estar guardada aún)
+
+        Returns:
+            Score en [-1, 1], o None si ninguna línea base tiene datos suficientes
+        """
+        if not self._es_puntuable(transaction.tipo_transaccion, transaction.monto_crc):
+            return None
+
+        claves = [
+            (dimension, clave)
+            for dimension, clave_de in _DIMENSIONES
+            if (clave := clave_de(transaction.comercio, transaction.subcategory_id))
+        ]
+        if not claves:
+            return None
+
+        baselines = self._baselines(transaction.profile_id, claves)
+        x = math.log(float(transaction.monto_crc))
+        peor: tuple[float, str, float] | None = None
+
+        for dimension, clave in claves:
+            baseline = baselines[(dimension, clave)]
+            n, media, varianza = baseline.n, baseline.media, baseline.varianza
+            z = float(_z(n, media, varianza, x))
+            if not math.isnan(z) and (peor is None or z > peor[0]):
+                peor = (z, dimension, float(max(math.sqrt(varianza), SIGMA_MINIMA)))
+
+            n, media, varianza = _actualizar(n, media, varianza, _recortar(n, media, varianza, x))
+            baseline.n, baseline.media, baseline.varianza = int(n), float(media), float(varianza)
+
+        if peor is None:
+            return None
+
+        z, dimension, sigma = peor
+        resultado = _resultado(z, sigma, dimension, transaction.comercio)
+        transaction.anomaly_score = resultado["anomaly_score"]
+        transaction.is_anomaly = resultado["is_anomaly"]
+        transaction.anomaly_reason = resultado["anomaly_reason"]
+        return resultado["anomaly_score"]
+
+    def _baselines(
+        self, profile_id: str, claves: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], AnomalyBaseline]:
+        """
+        Líneas base de las claves, bloqueadas hasta el commit.
+
+        Las que falten se crean con `INSERT ... ON CONFLICT DO NOTHING` (dos
+        importaciones concurrentes pueden estrenar la misma clave) y todas se
+        leen con `SELECT ... FOR UPDATE`: la segunda importación espera a que
+        la primera confirme y parte de su media/varianza, sin perder
+        actualizaciones. Las filas se crean y bloquean siempre en el mismo
+        orden para que dos importaciones con varias claves no se bloqueen
+        entre sí.
+        """
+        claves = sorted(claves)
+        crear = pg_insert(AnomalyBaseline.__table__).on_conflict_do_nothing(
+            index_elements=["profile_id", "dimension", "clave"]
+        )
+        stmt = (
+            select(AnomalyBaseline)
+            .where(
+                AnomalyBaseline.profile_id == profile_id,
+                or_(
+                    *(
+                        and_(AnomalyBaseline.dimension == dimension, AnomalyBaseline.clave == clave)
+                        for dimension, clave in claves
+                    )
+                ),
+            )
+            .order_by(AnomalyBaseline.dimension, AnomalyBaseline.clave)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        # Sin autoflush: la transacción pendiente se valida (duplicados) en el commit
+        with self.db.no_autoflush:
+            self.db.execute(
+                crear,
+                [
+                    {
+                        "profile_id": profile_id,
+                        "dimension": dimension,
+                        "clave": clave,
+                        "n": 0,
+                        "media": 0.0,
+                        "varianza": 0.0,
+                    }
+                    for dimension, clave in claves
+                ],
+            )
+            rows = self.db.execute(stmt).scalars()
+            return {(b.dimension, b.clave): b for b in rows}
+
+    def backfill(self, profile_id: str, batch_size: int = _BATCH_SIZE) -> int:
+        """
+        Recalcula líneas base y scores de todo el historial del perfil (sin commit).
+
+        Procesa las transacciones en orden cronológico en lotes de
+        `batch_size`; dentro de cada lote las líneas base de todas las
+        claves se actualizan con operaciones vectorizadas.
+
+        Args:
+            profile_id: ID del perfil
+            batch_size: Transacciones por lote
+
+        Returns:
+            Cantidad de transacciones procesadas
+        """
+        stmt = (
+            select(
+                Transaction.id,
+                Transaction.monto_crc,
+                Transaction.comercio,
+                Transaction.subcategory_id,
+            )
+            .where(
+                Transaction.profile_id == profile_id,
+                Transaction.deleted_at.is_(None),
+                Transaction.tipo_transaccion != "ingreso",
+                Transaction.monto_crc > 0,
+            )
+            .order_by(Transaction.fecha_transaccion, Transaction.id)
+        )
+        rows = self.db.execute(stmt).tuples().all()
+        self.db.execute(delete(AnomalyBaseline).where(AnomalyBaseline.profile_id == profile_id))
+
+        estados = {dimension: _Estado() for dimension, _ in _DIMENSIONES}
+        for start in range(0, len(rows), batch_size):
+            ids, montos, comercios, subcategorias = zip(
+                *rows[start : start + batch_size], strict=True
+            )
+            x = np.log(np.array(montos, dtype=np.float64))
+
+            # z y sigma por dimensión (filas = dimensiones)
+            zs, sigmas = [], []
+            for dimension, clave_de in _DIMENSIONES:
+                estado = estados[dimension]
+                claves = [clave_de(c, s) for c, s in zip(comercios, subcategorias, strict=True)]
+                z_dim, sigma_dim = estado.procesar(estado.codigos(claves), x)
+                zs.append(z_dim)
+                sigmas.append(sigma_dim)
+            z, sigma = np.vstack(zs), np.vstack(sigmas)
+
+            # El score usa la dimensión con el z más alto
+            puntuadas = ~np.isnan(z).all(axis=0)
+            peor = np.argmax(np.where(np.isnan(z), -np.inf, z), axis=0)
+            cambios = [
+                {
+                    "id": ids[fila],
+                    **(
+                        _resultado(
+                            float(z[dim, fila]),
+                            float(sigma[dim, fila]),
+                            _DIMENSIONES[dim][0],
+                            comercios[fila],
+                        )
+                        if puntuadas[fila]
+                        else _SIN_SCORE
+                    ),
+                }
+                for fila, dim in enumerate(peor.tolist())
+            ]
+            if cambios:
+                self.db.execute(update(Transaction), cambios)
+
+        baselines = [
+            {
+                "profile_id": profile_id,
+                "dimension": dimension,
+                "clave": clave,
+                "n": int(estado.n[code]),
+                "media": float(estado.media[code]),
+                "varianza": float(estado.varianza[code]),
+            }
+            for dimension, estado in estados.items()
+            for clave, code in estado.claves.items()
+        ]
+        if baselines:
+            self.db.execute(insert(AnomalyBaseline), baselines)
+
+        logger.info(f"Anomalías recalculadas para {profile_id[:8]}...: {len(rows)} transacciones")
+        return len(rows)
+
+    def backfill_all(self, batch_size: int = _BATCH_SIZE) -> int:
+        """
+        Recalcula las líneas base de todos los perfiles (commit por perfil).
+
+        Returns:
+            Cantidad total de transacciones procesadas
+        """
+        total = 0
+        for profile_id in self.db.execute(select(Profile.id)).scalars().all():
+            total += self.backfill(profile_id, batch_size)
+            self.db.commit()
+        return total
+
+
+def main() -> None:
+    """Recalcula líneas base y scores de anomalía de todos los perfiles."""
+    with SessionLocal() as db:
+        AnomalyService(db).backfill_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ SEGURIDAD: Los tokens se almacenan de forma segura usando el keyring del sistema
 operativo (Keychain en macOS, Credential Locker en Windows, Secret Service en Linux).
 """
 
+from functools import cached_property
+
 import keyring
 import msal
 
@@ -43,22 +45,32 @@ class AuthManager:
         # Para cuentas personales, usamos "consumers" en vez de un tenant específico
         self.authority = "https://login.microsoftonline.com/consumers"
 
-        # Cargar cache de tokens desde keyring (almacenamiento seguro del SO)
-        self.cache = msal.SerializableTokenCache()
+        logger.info("AuthManager inicializado (modo interactivo para cuentas personales)")
+
+    @cached_property
+    def cache(self) -> msal.SerializableTokenCache:
+        """Cache de tokens cargado desde keyring (almacenamiento seguro del SO)."""
+        cache = msal.SerializableTokenCache()
         cached_data = keyring.get_password(KEYRING_SERVICE_NAME, KEYRING_USERNAME)
         if cached_data:
-            self.cache.deserialize(cached_data)
+            cache.deserialize(cached_data)
             logger.debug("Token cache cargado desde keyring del sistema")
+        return cache
+
+    @cached_property
+    def app(self) -> msal.PublicClientApplication:
+        """
+        Aplicación pública de MSAL (para autenticación interactiva).
 
-        # Crear aplicación pública de MSAL (para autenticación interactiva)
-        self.app = msal.PublicClientApplication(
+        Se crea en el primer uso: MSAL consulta el endpoint de descubrimiento
+        de Microsoft al construirse, y eso no debe ocurrir al importar.
+        """
+        return msal.PublicClientApplication(
             client_id=self.client_id,
             authority=self.authority,
             token_cache=self.cache,
         )
 
-        logger.info("AuthManager inicializado (modo interactivo para cuentas personales)")
-
     def _save_cache(self) -> None:
         """Guarda el cache de tokens de forma segura en el keyring del sistema."""
         if self.cache.has_state_changed:
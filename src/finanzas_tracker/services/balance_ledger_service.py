@@ -0,0 +1,481 @@
+"""
+Libro de saldos diarios por cuenta y moneda.
+
+El patrimonio en una fecha cualquiera salía de sumar todas las
+transacciones e ingresos del perfil (o del snapshot más cercano). El
+libro guarda, por cada día con movimientos, las sumas acumuladas de
+cada cuenta; así:
+
+- el patrimonio en una fecha es la última fila de cada cuenta con
+  `fecha <= X` (una búsqueda por índice), y
+- una serie diaria de un año sale de una sola consulta.
+
+El libro se mantiene desde transacciones, ingresos y pagos de tarjeta.
+`register_ledger_events` registra listeners de la sesión que, al hacer
+commit, recalculan el libro del perfil desde el día más antiguo que
+cambió (las sumas posteriores dependen de él). Las sesiones de
+`core.database` los traen registrados, así que aplican en todos los
+puntos de entrada (API, dashboard, worker de jobs, scripts, MCP). Para
+llenar el libro desde cero:
+
+    python -m finanzas_tracker.services.balance_ledger_service
+"""
+
+__all__ = [
+    "BalanceLedgerService",
+    "LedgerTotals",
+    "register_ledger_events",
+    "unregister_ledger_events",
+]
+
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import Select, and_, delete, event, func, insert, inspect, select, union_all
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.core.database import SessionLocal
+from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.models.balance_ledger import (
+    CUENTA_EFECTIVO,
+    BalanceLedgerEntry,
+    cuenta_tarjeta,
+)
+from finanzas_tracker.models.card import Card
+from finanzas_tracker.models.card_payment import CardPayment
+from finanzas_tracker.models.enums import CardType, Currency
+from finanzas_tracker.models.income import Income
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
+
+
+logger = get_logger(__name__)
+
+_CENTAVOS = Decimal("0.01")
+_CERO = Decimal("0")
+
+# (cuenta, moneda, fecha) -> [movimiento, movimiento_crc, ingresos_crc, egresos_crc]
+_Movimientos = dict[tuple[str, str, date], list[Decimal]]
+
+
+@dataclass
+class LedgerTotals:
+    """Totales del libro en una fecha (en colones)."""
+
+    activos_crc: Decimal = _CERO  # Saldo acumulado de efectivo
+    deudas_crc: Decimal = _CERO  # Deuda acumulada de tarjetas
+    ingresos_crc: Decimal = _CERO
+    egresos_crc: Decimal = _CERO
+
+    @property
+    def neto_crc(self) -> Decimal:
+        """Movimiento neto acumulado."""
+        return self.activos_crc - self.deudas_crc
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[BalanceLedgerEntry]) -> "LedgerTotals":
+        """Suma la última fila de cada cuenta."""
+        totals = cls()
+        for entry in entries:
+            if entry.es_tarjeta:
+                totals.deudas_crc -= entry.saldo_crc
+            else:
+                totals.activos_crc += entry.saldo_crc
+            totals.ingresos_crc += entry.ingresos_crc
+            totals.egresos_crc += entry.egresos_crc
+        return totals
+
+
+def _moneda(value: Any) -> str:
+    return Currency(value).value
+
+
+def _monto_original(monto_original: Decimal, monto_crc: Decimal, patrimonio: Decimal) -> Decimal:
+    """Parte del monto original que cuenta para el patrimonio."""
+    if patrimonio == monto_crc or not monto_crc:
+        return monto_original
+    return (monto_original * patrimonio / monto_crc).quantize(_CENTAVOS)
+
+
+class BalanceLedgerService:
+    """Mantiene y consulta el libro de saldos diarios."""
+
+    def __init__(self, db: Session) -> None:
+        """
+        Args:
+            db: Sesión de base de datos
+        """
+        self.db = db
+
+    # =========================================================================
+    # Consultas
+    # =========================================================================
+
+    @staticmethod
+    def _latest_stmt(profile_id: str, fecha: date) -> Select[tuple[BalanceLedgerEntry]]:
+        """Última fila de cada (cuenta, moneda) con `fecha <= X`."""
+        latest = (
+            select(
+                BalanceLedgerEntry.cuenta,
+                BalanceLedgerEntry.moneda,
+                func.max(BalanceLedgerEntry.fecha).label("fecha"),
+            )
+            .where(BalanceLedgerEntry.profile_id == profile_id, BalanceLedgerEntry.fecha <= fecha)
+            .group_by(BalanceLedgerEntry.cuenta, BalanceLedgerEntry.moneda)
+            .subquery()
+        )
+        return select(BalanceLedgerEntry).join(
+            latest,
+            and_(
+                BalanceLedgerEntry.profile_id == profile_id,
+                BalanceLedgerEntry.cuenta == latest.c.cuenta,
+                BalanceLedgerEntry.moneda == latest.c.moneda,
+                BalanceLedgerEntry.fecha == latest.c.fecha,
+            ),
+        )
+
+    def saldos_en(self, profile_id: str, fecha: date) -> list[BalanceLedgerEntry]:
+        """
+        Saldo de cada cuenta del libro al cierre de un día.
+
+        Args:
+            profile_id: ID del perfil
+            fecha: Día a consultar
+
+        Returns:
+            Última fila de cada (cuenta, moneda) hasta esa fecha
+        """
+        return list(self.db.execute(self._latest_stmt(profile_id, fecha)).scalars())
+
+    def totales_en(self, profile_id: str, fecha: date) -> LedgerTotals:
+        """Totales del libro al cierre de un día."""
+        return LedgerTotals.from_entries(self.saldos_en(profile_id, fecha))
+
+    def serie_diaria(
+        self, profile_id: str, desde: date, hasta: date
+    ) -> list[tuple[date, LedgerTotals]]:
+        """
+        Totales del libro para cada día de un rango, con una sola consulta.
+
+        Args:
+            profile_id: ID del perfil
+            desde: Primer día (inclusive)
+            hasta: Último día (inclusive)
+
+        Returns:
+            Lista de (día, totales) en orden ascendente
+        """
+        base = self._latest_stmt(profile_id, desde - timedelta(days=1))
+        rango = select(BalanceLedgerEntry).where(
+            BalanceLedgerEntry.profile_id == profile_id,
+            BalanceLedgerEntry.fecha >= desde,
+            BalanceLedgerEntry.fecha <= hasta,
+        )
+        stmt = select(BalanceLedgerEntry).from_statement(union_all(base, rango))
+        entries = list(self.db.execute(stmt).scalars())
+
+        actuales: dict[tuple[str, str], BalanceLedgerEntry] = {}
+        por_dia: dict[date, list[BalanceLedgerEntry]] = defaultdict(list)
+        for entry in entries:
+            if entry.fecha < desde:
+                actuales[(entry.cuenta, entry.moneda)] = entry
+            else:
+                por_dia[entry.fecha].append(entry)
+
+        serie: list[tuple[date, LedgerTotals]] = []
+        dia = desde
+        while dia <= hasta:
+            for entry in por_dia.get(dia, ()):
+                actuales[(entry.cuenta, entry.moneda)] = entry
+            serie.append((dia, LedgerTotals.from_entries(actuales.values())))
+            dia += timedelta(days=1)
+        return serie
+
+    # =========================================================================
+    # Mantenimiento
+    # =========================================================================
+
+    def _movimientos(self, profile_id: str, desde: date | None) -> _Movimientos:
+        """Movimientos diarios de transacciones, ingresos y pagos de tarjeta."""
+        movimientos: _Movimientos = defaultdict(lambda: [_CERO, _CERO, _CERO, _CERO])
+
+        ingresos = select(Income).where(
+            Income.profile_id == profile_id, Income.deleted_at.is_(None)
+        )
+        if desde:
+            ingresos = ingresos.where(Income.fecha >= desde)
+        for income in self.db.execute(ingresos).scalars():
+            patrimonio = income.calcular_monto_patrimonio()
+            if not patrimonio:
+                continue
+            mov = movimientos[(CUENTA_EFECTIVO, _moneda(income.moneda_original), income.fecha)]
+            mov[0] += _monto_original(income.monto_original, income.monto_crc, patrimonio)
+            mov[1] += patrimonio
+            mov[2] += patrimonio
+
+        tarjetas_credito = set(
+            self.db.execute(
+                select(Card.id).where(Card.profile_id == profile_id, Card.tipo == CardType.CREDIT)
+            ).scalars()
+        )
+
+        # populate_existing: los UPDATE por lotes (Core) no refrescan los
+        # objetos ya cargados en la sesión
+        gastos = (
+            select(Transaction)
+            .where(Transaction.profile_id == profile_id, Transaction.deleted_at.is_(None))
+            .execution_options(populate_existing=True)
+        )
+        if desde:
+            gastos = gastos.where(
+                Transaction.fecha_transaccion >= datetime.combine(desde, datetime.min.time())
+            )
+        for txn in self.db.execute(gastos).scalars():
+            patrimonio = txn.calcular_monto_patrimonio()
+            if not patrimonio:
+                continue
+            cuenta = (
+                cuenta_tarjeta(txn.card_id) if txn.card_id in tarjetas_credito else CUENTA_EFECTIVO
+            )
+            key = (cuenta, _moneda(txn.moneda_original), txn.fecha_transaccion.date())
+            mov = movimientos[key]
+            mov[0] -= _monto_original(txn.monto_original, txn.monto_crc, patrimonio)
+            mov[1] -= patrimonio
+            mov[3] += patrimonio
+
+        # Un pago de tarjeta mueve plata de efectivo a la tarjeta: no es ingreso ni gasto
+        pagos = (
+            select(CardPayment)
+            .join(Card, CardPayment.card_id == Card.id)
+            .where(Card.profile_id == profile_id)
+        )
+        if desde:
+            pagos = pagos.where(CardPayment.fecha_pago >= desde)
+        crc = Currency.CRC.value
+        for pago in self.db.execute(pagos).scalars():
+            for cuenta, signo in ((CUENTA_EFECTIVO, -1), (cuenta_tarjeta(pago.card_id), 1)):
+                mov = movimientos[(cuenta, crc, pago.fecha_pago)]
+                mov[0] += signo * pago.monto
+                mov[1] += signo * pago.monto
+
+        return movimientos
+
+    def rebuild(self, profile_id: str, desde: date | None = None) -> int:
+        """
+        Recalcula el libro de un perfil desde una fecha.
+
+        Las filas anteriores a `desde` se conservan y sirven de punto de
+        partida para las sumas acumuladas. Toma un advisory lock del perfil
+        hasta el fin de la transacción: dos commits concurrentes del mismo
+        perfil se serializan en vez de insertar la misma (cuenta, moneda,
+        fecha) y chocar en `ix_balance_ledger_lookup`. No hace commit.
+
+        Args:
+            profile_id: ID del perfil
+            desde: Primer día a recalcular (None = todo el historial)
+
+        Returns:
+            Número de filas escritas
+        """
+        self.db.execute(select(func.pg_advisory_xact_lock(func.hashtext(profile_id))))
+
+        acumulados: dict[tuple[str, str], list[Decimal]] = {}
+        if desde:
+            for entry in self.saldos_en(profile_id, desde - timedelta(days=1)):
+                acumulados[(entry.cuenta, entry.moneda)] = [
+                    entry.saldo,
+                    entry.saldo_crc,
+                    entry.ingresos_crc,
+                    entry.egresos_crc,
+                ]
+
+        borrar = delete(BalanceLedgerEntry).where(BalanceLedgerEntry.profile_id == profile_id)
+        if desde:
+            borrar = borrar.where(BalanceLedgerEntry.fecha >= desde)
+        self.db.execute(borrar.execution_options(synchronize_session=False))
+
+        rows: list[dict[str, Any]] = []
+        movimientos = self._movimientos(profile_id, desde)
+        for (cuenta, moneda, fecha), (mov, mov_crc, ingreso, egreso) in sorted(movimientos.items()):
+            saldo = acumulados.setdefault((cuenta, moneda), [_CERO, _CERO, _CERO, _CERO])
+            saldo[0] += mov
+            saldo[1] += mov_crc
+            saldo[2] += ingreso
+            saldo[3] += egreso
+            rows.append(
+                {
+                    "profile_id": profile_id,
+                    "cuenta": cuenta,
+                    "moneda": moneda,
+                    "fecha": fecha,
+                    "movimiento": mov,
+                    "saldo": saldo[0],
+                    "saldo_crc": saldo[1],
+                    "ingresos_crc": saldo[2],
+                    "egresos_crc": saldo[3],
+                }
+            )
+
+        if rows:
+            self.db.execute(insert(BalanceLedgerEntry), rows)
+        logger.debug(
+            f"Libro de saldos de {profile_id[:8]}... recalculado desde {desde}: {len(rows)}"
+        )
+        return len(rows)
+
+    def rebuild_all(self) -> int:
+        """
+        Recalcula el libro de todos los perfiles (backfill). Hace commit por perfil.
+
+        Returns:
+            Número de perfiles procesados
+        """
+        profile_ids = list(self.db.execute(select(Profile.id)).scalars())
+        for profile_id in profile_ids:
+            self.rebuild(profile_id)
+            self.db.commit()
+        logger.info(f"📒 Libro de saldos recalculado para {len(profile_ids)} perfiles")
+        return len(profile_ids)
+
+
+# ============================================================================
+# SQLAlchemy Event Listeners
+# ============================================================================
+
+_PENDIENTES = "balance_ledger_pendientes"
+
+# Modelo -> atributo de fecha que lo ubica en el libro
+_FECHAS = {Transaction: "fecha_transaccion", Income: "fecha", CardPayment: "fecha_pago"}
+
+# Modelo -> atributos que cambian su movimiento en el libro. Editar otros
+# (notas, categoría, confirmada, comercio...) no recalcula nada: cada
+# recálculo relee todas las filas del perfil desde la fecha.
+_ATRIBUTOS_LIBRO = {
+    Transaction: (
+        "fecha_transaccion",
+        "monto_original",
+        "monto_crc",
+        "moneda_original",
+        "card_id",
+        "excluir_de_presupuesto",
+        "deleted_at",
+    ),
+    Income: (
+        "fecha",
+        "monto_original",
+        "monto_crc",
+        "moneda_original",
+        "excluir_de_presupuesto",
+        "es_dinero_ajeno",
+        "monto_sobrante",
+        "deleted_at",
+    ),
+    CardPayment: ("fecha_pago", "monto", "card_id"),
+}
+
+
+def _cambia_libro(obj: Any) -> bool:
+    """Si algún atributo que alimenta el libro cambió en el objeto."""
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in _ATRIBUTOS_LIBRO[type(obj)])
+
+
+def _fechas(obj: Any, attr: str) -> list[date]:
+    """Fecha actual y anterior (si cambió) del objeto."""
+    fechas = []
+    # `active_history` en la columna conserva la fecha anterior al cambiarla
+    for value in chain([getattr(obj, attr)], inspect(obj).attrs[attr].history.deleted):
+        if value is not None:
+            fechas.append(value.date() if isinstance(value, datetime) else value)
+    # Sin fecha todavía: la pone el default de la columna (hoy) al insertar
+    return fechas or [date.today()]
+
+
+def _before_flush(session: Session, flush_context: Any, instances: Any) -> None:
+    """Anota el día más antiguo que cambió de cada perfil (o tarjeta)."""
+    pendientes: dict[tuple[str, str], date] = session.info.setdefault(_PENDIENTES, {})
+    for obj in chain(session.new, session.dirty, session.deleted):
+        attr = _FECHAS.get(type(obj))
+        if attr is None or (obj in session.dirty and not _cambia_libro(obj)):
+            continue
+        if isinstance(obj, CardPayment):
+            key = ("card", obj.card_id)
+        else:
+            key = ("profile", obj.profile_id)
+        for fecha in _fechas(obj, attr):
+            if key not in pendientes or fecha < pendientes[key]:
+                pendientes[key] = fecha
+
+
+def _before_commit(session: Session) -> None:
+    """Recalcula el libro de los perfiles afectados dentro de la misma transacción."""
+    session.flush()
+    pendientes: dict[tuple[str, str], date] = session.info.pop(_PENDIENTES, {})
+    if not pendientes:
+        return
+
+    perfiles: dict[str, date] = {}
+    card_ids = [key for kind, key in pendientes if kind == "card"]
+    card_profiles: dict[str, str] = {}
+    if card_ids:
+        stmt = select(Card.id, Card.profile_id).where(Card.id.in_(card_ids))
+        card_profiles = dict(session.execute(stmt).tuples().all())
+    for (kind, key), fecha in pendientes.items():
+        profile_id = card_profiles.get(key) if kind == "card" else key
+        if profile_id and (profile_id not in perfiles or fecha < perfiles[profile_id]):
+            perfiles[profile_id] = fecha
+
+    # Orden fijo para que dos commits con varios perfiles no se bloqueen entre sí
+    service = BalanceLedgerService(session)
+    for profile_id, desde in sorted(perfiles.items()):
+        service.rebuild(profile_id, desde)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDIENTES, None)
+
+
+def register_ledger_events(target: type[Session] = Session) -> None:
+    """
+    Registra los listeners que mantienen el libro de saldos.
+
+    Las sesiones de la aplicación (`SessionLocal`, `AsyncSessionLocal`) los
+    registran solas en `core.database`; registrarlos otra vez en el mismo
+    destino no duplica los listeners.
+
+    Args:
+        target: Clase de sesión a la que se aplican (default: todas)
+    """
+    if event.contains(target, "before_commit", _before_commit):
+        return
+    event.listen(target, "before_flush", _before_flush)
+    event.listen(target, "before_commit", _before_commit)
+    event.listen(target, "after_rollback", _after_rollback)
+    logger.info("✅ Libro de saldos: eventos registrados")
+
+
+def unregister_ledger_events(target: type[Session] = Session) -> None:
+    """
+    Desregistra los listeners.
+
+    Args:
+        target: Clase de sesión usada al registrarlos
+    """
+    event.remove(target, "before_flush", _before_flush)
+    event.remove(target, "before_commit", _before_commit)
+    event.remove(target, "after_rollback", _after_rollback)
+
+
+def main() -> None:
+    """Recalcula el libro de saldos de todos los perfiles."""
+    with SessionLocal() as db:
+        BalanceLedgerService(db).rebuild_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,12 @@ from typing import Any
 import anthropic
 
 from finanzas_tracker.config.settings import settings
+from finanzas_tracker.core.claude_client import (
+    ClaudeClient,
+    pooled_http_client,
+    response_text,
+)
+from finanzas_tracker.core.claude_credits import ClaudeServiceUnavailable
 from finanzas_tracker.core.constants import (
     AUTO_CATEGORIZE_CONFIDENCE_THRESHOLD,
     HIGH_CONFIDENCE_SCORE,
@@ -29,9 +35,51 @@ class TransactionCategorizer:
     3. Aprendizaje de patrones del usuario
     """
 
+    # Prefijos estáticos: van cacheados junto con la lista de categorías,
+    # la transacción viaja en el mensaje del usuario.
+    CATEGORIZE_SYSTEM_PROMPT = """Eres un asistente experto en categorización de gastos personales en Costa Rica.
+
+INSTRUCCIONES:
+1. Analiza el comercio y determina la categoría más apropiada
+2. Si el comercio puede pertenecer a múltiples categorías, lista todas las posibilidades
+3. Asigna un nivel de confianza (0-100) a tu recomendación principal
+4. Si la confianza es < 70%, marca necesita_revision = true
+
+Responde ÚNICAMENTE con un JSON válido en este formato:
+{
+  "subcategory_id": "id de la subcategoría recomendada",
+  "categoria_sugerida": "Categoría/Subcategoría",
+  "necesita_revision": true/false,
+  "confianza": 85,
+  "alternativas": ["alternativa1", "alternativa2"],
+  "razon": "Explicación breve de por qué elegiste esta categoría"
+}"""
+
+    ENHANCED_SYSTEM_PROMPT = """Eres un experto en finanzas personales en Costa Rica con análisis contextual avanzado.
+
+ANÁLISIS REQUERIDO:
+1. Considera el CONTEXTO (hora, monto, día) para mejor precisión
+2. Ejemplo: "Uber a las 11pm viernes" → probablemente Entretenimiento, no Transporte laboral
+3. Ejemplo: "Walmart ₡8,000 sábado" → probablemente Supermercado, no shopping
+4. Si hay ambigüedad real, marca necesita_revision = true
+5. Explica tu razonamiento considerando el contexto
+
+Responde ÚNICAMENTE con JSON:
+{
+  "subcategory_id": "id",
+  "categoria_sugerida": "Nombre",
+  "necesita_revision": true/false,
+  "confianza": 85,
+  "alternativas": ["alt1", "alt2"],
+  "razon": "Razón CONSIDERANDO EL CONTEXTO"
+}"""
+
     def __init__(self) -> None:
         """Inicializa el categorizador."""
-        self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        self.client = anthropic.Anthropic(
+            api_key=settings.anthropic_api_key, http_client=pooled_http_client()
+        )
+        self.claude = ClaudeClient(self.client)
         logger.info("TransactionCategorizer inicializado")
 
     def categorize(
@@ -85,6 +133,7 @@ class TransactionCategorizer:
             comercio=comercio,
             monto_crc=monto_crc,
             tipo_transaccion=tipo_transaccion,
+            profile_id=profile_id,
         )
 
     def _categorize_by_keywords(self, comercio: str) -> dict[str, Any] | None:
@@ -160,13 +209,42 @@ class TransactionCategorizer:
 
             return None
 
+    def _categories_context(self) -> str:
+        """
+        Lista de subcategorías para el prefijo cacheado del prompt.
+
+        Ordenada por ID para que el texto sea idéntico entre llamadas
+        (si cambia, el cache de Anthropic no acierta).
+
+        Returns:
+            Bloque "CATEGORÍAS DISPONIBLES" con el JSON de subcategorías
+        """
+        with get_session() as session:
+            subcategories = session.query(Subcategory).order_by(Subcategory.id).all()
+            categorias_disponibles = [
+                {
+                    "id": subcat.id,
+                    "nombre": subcat.nombre_completo,
+                    "descripcion": subcat.descripcion or "",
+                    "ejemplos": subcat.keywords or "",
+                }
+                for subcat in subcategories
+            ]
+
+        categorias_json = json.dumps(categorias_disponibles, indent=2, ensure_ascii=False)
+        return f"CATEGORÍAS DISPONIBLES:\n{categorias_json}"
+
     @retry_on_anthropic_error(max_attempts=3, max_wait=16)
-    def _call_claude_api(self, prompt: str) -> str:
+    def _call_claude_api(self, prompt: str, profile_id: str | None = None) -> str:
         """
         Llama a Claude API con retry logic.
 
+        Las instrucciones y las categorías van en el prefijo cacheado;
+        `prompt` es sólo la parte variable (la transacción).
+
         Args:
-            prompt: Prompt para Claude
+            prompt: Datos de la transacción a categorizar
+            profile_id: Perfil al que se le descuentan los tokens
 
         Returns:
             str: Respuesta de Claude (texto)
@@ -174,81 +252,44 @@ class TransactionCategorizer:
         Raises:
             anthropic.APIError: Si la llamada falla después de todos los intentos
         """
-        response = self.client.messages.create(
+        response = self.claude.create(
+            call_site="categorizer.claude",
+            system=[self.CATEGORIZE_SYSTEM_PROMPT, self._categories_context()],
+            messages=[{"role": "user", "content": prompt}],
             model=settings.claude_model,
             max_tokens=1000,
             temperature=0,
-            messages=[{"role": "user", "content": prompt}],
+            profile_id=profile_id,
         )
-        first_block = response.content[0]
-        if not hasattr(first_block, "text"):
-            return ""
-        return first_block.text.strip()
+        return response_text(response).strip()
 
     def _categorize_with_claude(
         self,
         comercio: str,
         monto_crc: float,
         tipo_transaccion: str,
+        profile_id: str | None = None,
     ) -> dict[str, Any]:
         """
         Usa Claude AI para categorizar transacciones ambiguas.
         """
-        # Obtener las categorías disponibles
-        with get_session() as session:
-            subcategories = session.query(Subcategory).all()
-
-            # Crear lista de categorías para Claude
-            categorias_disponibles = []
-            for subcat in subcategories:
-                categorias_disponibles.append(
-                    {
-                        "id": subcat.id,
-                        "nombre": subcat.nombre_completo,
-                        "descripcion": subcat.descripcion or "",
-                        "ejemplos": subcat.keywords or "",
-                    }
-                )
-
-        # Preparar el prompt para Claude
-        prompt = f"""Eres un asistente experto en categorización de gastos personales en Costa Rica.
-
-TRANSACCIÓN A CATEGORIZAR:
+        prompt = f"""TRANSACCIÓN A CATEGORIZAR:
 - Comercio: {comercio}
 - Monto: ₡{monto_crc:,.2f}
-- Tipo: {tipo_transaccion}
-
-CATEGORÍAS DISPONIBLES:
-{json.dumps(categorias_disponibles, indent=2, ensure_ascii=False)}
-
-INSTRUCCIONES:
-1. Analiza el comercio y determina la categoría más apropiada
-2. Si el comercio puede pertenecer a múltiples categorías, lista todas las posibilidades
-3. Asigna un nivel de confianza (0-100) a tu recomendación principal
-4. Si la confianza es < 70%, marca necesita_revision = true
-
-Responde ÚNICAMENTE con un JSON válido en este formato:
-{{
-  "subcategory_id": "id de la subcategoría recomendada",
-  "categoria_sugerida": "Categoría/Subcategoría",
-  "necesita_revision": true/false,
-  "confianza": 85,
-  "alternativas": ["alternativa1", "alternativa2"],
-  "razon": "Explicación breve de por qué elegiste esta categoría"
-}}"""
+- Tipo: {tipo_transaccion}"""
 
         try:
             # Llamar a Claude con retry logic
-            response_text = self._call_claude_api(prompt)
+            text = self._call_claude_api(prompt, profile_id)
 
             # Limpiar si viene con markdown
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
+            if text.startswith("```"):
+                text = text.split("```")[1]
+                if text.startswith("json"):
+                    text = text[4:]
+                text = text.strip()
 
-            result: dict[str, Any] = json.loads(response_text)
+            result: dict[str, Any] = json.loads(text)
 
             logger.debug(
                 f" Claude: {result['categoria_sugerida']} " f"(confianza: {result['confianza']}%)"
@@ -265,6 +306,9 @@ Responde ÚNICAMENTE con un JSON válido en este formato:
         except anthropic.APIStatusError as e:
             logger.error(f"Error de estado de Claude API ({e.status_code}): {e.message}")
             return self._fallback_result(f"Error API: {e.status_code}")
+        except ClaudeServiceUnavailable as e:
+            logger.info(f"⏭️ Categorización con Claude omitida: {e.message}")
+            return self._fallback_result(e.message)
         except (json.JSONDecodeError, KeyError, ValueError) as e:
             logger.error(f"Error parseando respuesta de Claude: {e}")
             return self._fallback_result("Error parseando respuesta")
@@ -290,6 +334,7 @@ Responde ÚNICAMENTE con un JSON válido en este formato:
         tipo_transaccion: str,
         fecha: str | None = None,
         ubicacion: str | None = None,
+        profile_id: str | None = None,
     ) -> dict[str, Any]:
         """
         Versión mejorada con análisis contextual profundo usando Sonnet.
@@ -338,72 +383,42 @@ Responde ÚNICAMENTE con un JSON válido en este formato:
             except (ValueError, TypeError):
                 pass
 
-        # Obtener categorías
-        with get_session() as session:
-            subcategories = session.query(Subcategory).all()
-            categorias_disponibles = [
-                {
-                    "id": subcat.id,
-                    "nombre": subcat.nombre_completo,
-                    "descripcion": subcat.descripcion or "",
-                    "ejemplos": subcat.keywords or "",
-                }
-                for subcat in subcategories
-            ]
-
-        # Prompt mejorado con contexto
+        # Prompt mejorado con contexto (sólo la parte variable; las
+        # instrucciones y las categorías van en el prefijo cacheado)
         context_str = "\n".join(f"- {hint}" for hint in context_hints)
 
-        prompt = f"""Eres un experto en finanzas personales en Costa Rica con análisis contextual avanzado.
-
-TRANSACCIÓN:
+        prompt = f"""TRANSACCIÓN:
 - **Comercio**: {comercio}
 - **Monto**: ₡{monto_crc:,.2f}
 - **Tipo**: {tipo_transaccion}
 {f"- **Ubicación**: {ubicacion}" if ubicacion else ""}
 
 CONTEXTO ADICIONAL:
-{context_str if context_hints else "No hay contexto temporal disponible"}
-
-CATEGORÍAS DISPONIBLES:
-{json.dumps(categorias_disponibles, indent=2, ensure_ascii=False)[:1500]}...
-
-ANÁLISIS REQUERIDO:
-1. Considera el CONTEXTO (hora, monto, día) para mejor precisión
-2. Ejemplo: "Uber a las 11pm viernes" → probablemente Entretenimiento, no Transporte laboral
-3. Ejemplo: "Walmart ₡8,000 sábado" → probablemente Supermercado, no shopping
-4. Si hay ambigüedad real, marca necesita_revision = true
-5. Explica tu razonamiento considerando el contexto
-
-Responde ÚNICAMENTE con JSON:
-{{
-  "subcategory_id": "id",
-  "categoria_sugerida": "Nombre",
-  "necesita_revision": true/false,
-  "confianza": 85,
-  "alternativas": ["alt1", "alt2"],
-  "razon": "Razón CONSIDERANDO EL CONTEXTO"
-}}"""
+{context_str if context_hints else "No hay contexto temporal disponible"}"""
 
         try:
             # Usar Haiku para análisis contextual (rápido y económico)
-            response = self.client.messages.create(
+            response = self.claude.create(
+                call_site="categorizer.enhanced",
+                system=[self.ENHANCED_SYSTEM_PROMPT, self._categories_context()],
+                messages=[{"role": "user", "content": prompt}],
                 model=settings.claude_model,
                 max_tokens=800,
                 temperature=0.2,  # Más determinístico
-                messages=[{"role": "user", "content": prompt}],
+                profile_id=profile_id,
             )
 
-            first_block = response.content[0]
-            if not hasattr(first_block, "text"):
-                return self._categorize_with_claude(comercio, monto_crc, tipo_transaccion)
-            response_text = first_block.text.strip()
+            text = response_text(response).strip()
+            if not text:
+                return self._categorize_with_claude(
+                    comercio, monto_crc, tipo_transaccion, profile_id
+                )
 
             # Parsear JSON
-            if response_text.startswith("```json"):
-                response_text = response_text.replace("```json", "").replace("```", "").strip()
+            if text.startswith("```json"):
+                text = text.replace("```json", "").replace("```", "").strip()
 
-            result: dict[str, Any] = json.loads(response_text)
+            result: dict[str, Any] = json.loads(text)
 
             # Agregar flag de análisis mejorado
             result["enhanced_analysis"] = True
@@ -416,10 +431,15 @@ Responde ÚNICAMENTE con JSON:
 
             return result
 
+        except ClaudeServiceUnavailable as e:
+            logger.info(f"⏭️ Análisis contextual omitido: {e.message}")
+            return self._fallback_result(e.message)
         except Exception as e:
             logger.error(f"Error en análisis contextual: {e}")
             # Fallback a categorización simple
-            return self._categorize_with_claude(comercio, monto_crc, tipo_transaccion)
+            return self._categorize_with_claude(
+                comercio, monto_crc, tipo_transaccion, profile_id
+            )
 
     def categorize_smart(
         self,
@@ -481,11 +501,11 @@ Responde ÚNICAMENTE con JSON:
         if use_enhanced and (es_ambiguo or not keyword_match):
             logger.info(f"🔍 Usando análisis contextual profundo para: {comercio}")
             return self._categorize_with_claude_enhanced(
-                comercio, monto_crc, tipo_transaccion, fecha, ubicacion
+                comercio, monto_crc, tipo_transaccion, fecha, ubicacion, profile_id
             )
 
         # 4. Categorización estándar
-        return self._categorize_with_claude(comercio, monto_crc, tipo_transaccion)
+        return self._categorize_with_claude(comercio, monto_crc, tipo_transaccion, profile_id)
 
     def _categorize_from_history(
         self,
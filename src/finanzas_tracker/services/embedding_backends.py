@@ -0,0 +1,113 @@
+"""
+Backends de inferencia para los embeddings locales.
+
+El mismo modelo de Sentence Transformers puede correr sobre:
+- torch: PyTorch en precisión completa (default, siempre disponible)
+- onnx: ONNX Runtime con el export del modelo (más rápido en CPU, sin torch en la inferencia)
+- onnx-int8: export ONNX cuantizado a int8 (menos memoria y más throughput)
+
+Los tres producen vectores intercambiables (mismo modelo, mismas dimensiones),
+así que no hace falta regenerar los `transaction_embeddings` al cambiar de backend.
+"""
+
+__all__ = ["EmbeddingBackend", "load_sentence_transformer"]
+
+from enum import StrEnum
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any
+
+from finanzas_tracker.core.logging import get_logger
+
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+logger = get_logger(__name__)
+
+
+class EmbeddingBackend(StrEnum):
+    """Runtimes de inferencia soportados."""
+
+    TORCH = "torch"
+    ONNX = "onnx"
+    ONNX_INT8 = "onnx-int8"
+
+
+def _onnx_disponible() -> bool:
+    """ONNX Runtime y Optimum son extras opcionales (sentence-transformers[onnx])."""
+    return find_spec("onnxruntime") is not None and find_spec("optimum") is not None
+
+
+def _onnx_model_kwargs(
+    backend: EmbeddingBackend,
+    threads: int | None,
+    onnx_file: str,
+) -> dict[str, Any]:
+    """
+    Argumentos de carga para ORTModelForFeatureExtraction.
+
+    Args:
+        backend: ONNX o ONNX_INT8
+        threads: Threads intra-op de ONNX Runtime (None = default)
+        onnx_file: Archivo cuantizado a usar con ONNX_INT8
+
+    Returns:
+        model_kwargs para SentenceTransformer
+    """
+    import onnxruntime as ort
+
+    model_kwargs: dict[str, Any] = {"provider": "CPUExecutionProvider"}
+    if backend == EmbeddingBackend.ONNX_INT8:
+        model_kwargs["file_name"] = onnx_file
+    if threads:
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        session_options.inter_op_num_threads = 1
+        model_kwargs["session_options"] = session_options
+    return model_kwargs
+
+
+def load_sentence_transformer(
+    model_name: str,
+    backend: EmbeddingBackend | str = EmbeddingBackend.TORCH,
+    threads: int | None = None,
+    onnx_file: str = "onnx/model_quint8_avx2.onnx",
+) -> "SentenceTransformer":
+    """
+    Carga un modelo de Sentence Transformers sobre el backend pedido.
+
+    Si ONNX Runtime no está instalado se usa torch y se registra un warning,
+    para que una configuración incompleta no deje al servicio sin embeddings.
+
+    Args:
+        model_name: Nombre o ruta del modelo (ej: "sentence-transformers/all-MiniLM-L6-v2")
+        backend: Runtime de inferencia
+        threads: Threads de CPU para la inferencia (None = default del runtime)
+        onnx_file: Archivo ONNX cuantizado (sólo para onnx-int8)
+
+    Returns:
+        Modelo listo para `encode`
+    """
+    from sentence_transformers import SentenceTransformer
+
+    backend = EmbeddingBackend(backend)
+    if backend != EmbeddingBackend.TORCH and not _onnx_disponible():
+        logger.warning(
+            f"Backend {backend} no disponible (falta sentence-transformers[onnx]); usando torch"
+        )
+        backend = EmbeddingBackend.TORCH
+
+    if backend == EmbeddingBackend.TORCH:
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        return SentenceTransformer(model_name)
+
+    return SentenceTransformer(
+        model_name,
+        device="cpu",
+        backend="onnx",
+        model_kwargs=_onnx_model_kwargs(backend, threads, onnx_file),
+    )
@@ -0,0 +1,438 @@
+"""
+Re-generación de embeddings por batches, reanudable.
+
+Sirve para cambiar de modelo o de proveedor (local <-> Voyage, 384 vs 1024
+dimensiones) o para regenerar vectores corruptos sin hacerlo fila por fila:
+
+1. Lee por keyset (`id > último_id ORDER BY id LIMIT n`), nunca con OFFSET.
+2. Genera los vectores del batch en una sola llamada al modelo.
+3. Escribe el batch con un único `UPDATE ... FROM (VALUES ...)`.
+4. Guarda el cursor en `embedding_migrations` en la misma transacción, así
+   una corrida interrumpida continúa exactamente donde quedó.
+
+Con `shadow=True` los vectores de transacciones se escriben en
+`embedding_shadow` y la búsqueda sigue usando `embedding` hasta que
+`cutover_transaction_embeddings` hace el cambio en una sola transacción.
+"""
+
+__all__ = ["EmbeddingMigrationService", "EmbeddingTarget"]
+
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime
+from enum import StrEnum
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Table, or_, select, text, update
+from sqlalchemy.orm import Session, selectinload
+
+from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.models.category import Subcategory
+from finanzas_tracker.models.embedding import (
+    EmbeddingMigration,
+    EmbeddingMigrationStatus,
+    TransactionEmbedding,
+)
+from finanzas_tracker.models.smart_learning import TransactionPattern
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.repositories.bulk import bulk_update_by_id
+from finanzas_tracker.services.embedding_service import EmbeddingService
+from finanzas_tracker.services.local_embedding_service import LocalEmbeddingService
+from finanzas_tracker.services.smart_learning_service import SmartLearningService
+
+
+logger = get_logger(__name__)
+
+ALL_PROFILES = "*"
+HNSW_INDEX = "idx_embedding_hnsw"
+PATTERN_STORAGE_DIM = 1536
+
+
+class EmbeddingTarget(StrEnum):
+    """Tablas con embeddings que se pueden regenerar."""
+
+    TRANSACTIONS = "transaction_embeddings"
+    PATTERNS = "transaction_patterns"
+
+
+class EmbeddingMigrationService:
+    """
+    Pipeline de re-embedding con checkpoint.
+
+    Ejemplo de uso:
+    ```python
+    migrator = EmbeddingMigrationService(db, batch_size=512)
+
+    # Cambio de modelo sin cortar la búsqueda
+    migrator.migrate_transaction_embeddings(EmbeddingService(db), shadow=True)
+    migrator.cutover_transaction_embeddings(EmbeddingService(db))
+
+    # Regenerar los patrones de un perfil
+    migrator.migrate_pattern_embeddings(profile_id, restart=True)
+    ```
+    """
+
+    def __init__(self, db: Session, batch_size: int = 256) -> None:
+        """
+        Inicializa el pipeline.
+
+        Args:
+            db: Sesión de SQLAlchemy
+            batch_size: Filas leídas, embebidas y escritas por batch
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size debe ser positivo")
+        self.db = db
+        self.batch_size = batch_size
+
+    # ========================================================================
+    # Transacciones
+    # ========================================================================
+
+    def migrate_transaction_embeddings(
+        self,
+        embedding_service: EmbeddingService | None = None,
+        shadow: bool = False,
+        restart: bool = False,
+        max_batches: int | None = None,
+    ) -> EmbeddingMigration:
+        """
+        Regenera los embeddings de transacciones con el modelo del servicio.
+
+        Args:
+            embedding_service: Servicio con el proveedor/modelo destino
+            shadow: Escribir en la columna sombra (obligatorio si cambia la dimensión)
+            restart: Empezar de cero aunque exista un checkpoint
+            max_batches: Detenerse después de N batches (None = hasta terminar)
+
+        Returns:
+            Checkpoint actualizado
+
+        Raises:
+            ValueError: Si la dimensión cambia y no se usa la columna sombra
+        """
+        service = embedding_service or EmbeddingService(self.db)
+        model_version = service.model_name
+        dim = service.embedding_dim
+
+        if not shadow:
+            other_dim = self.db.execute(
+                select(TransactionEmbedding.embedding_dim)
+                .where(TransactionEmbedding.embedding_dim != dim)
+                .limit(1)
+            ).scalar_one_or_none()
+            if other_dim is not None:
+                raise ValueError(
+                    f"El modelo {model_version} genera {dim} dims y la columna tiene "
+                    f"{other_dim}; usar shadow=True y luego el cutover"
+                )
+
+        checkpoint = self._get_checkpoint(
+            EmbeddingTarget.TRANSACTIONS, ALL_PROFILES, model_version, dim, shadow, restart
+        )
+
+        def fetch_page(last_key: str | None) -> Sequence[TransactionEmbedding]:
+            return self._transaction_page(last_key, model_version if shadow else None)
+
+        def write_page(page: Sequence[TransactionEmbedding]) -> None:
+            if shadow:
+                self._write_shadow(service, page, model_version)
+                return
+            texts = [service._build_transaction_text(row.transaction) for row in page]
+            vectors = service.get_embeddings_batch(texts)
+            self._bulk_update(
+                TransactionEmbedding.__table__,
+                [
+                    {"id": row.id, "embedding": vector, "text_content": row_text}
+                    for row, vector, row_text in zip(page, vectors, texts, strict=True)
+                ],
+                model_version=model_version,
+                embedding_dim=dim,
+                updated_at=datetime.now(UTC),
+            )
+
+        return self._run(checkpoint, fetch_page, write_page, max_batches)
+
+    def cutover_transaction_embeddings(
+        self,
+        embedding_service: EmbeddingService | None = None,
+    ) -> int:
+        """
+        Reemplaza `embedding` por `embedding_shadow` en una sola transacción.
+
+        Antes regenera las filas creadas o modificadas durante la migración.
+        Cambia el tipo de la columna a la nueva dimensión y recrea el índice
+        HNSW. Sólo para PostgreSQL.
+
+        Args:
+            embedding_service: Servicio con el modelo migrado
+
+        Returns:
+            Número de embeddings cambiados al modelo nuevo
+
+        Raises:
+            ValueError: Si no hay una migración sombra completada para el modelo
+        """
+        service = embedding_service or EmbeddingService(self.db)
+        model_version = service.model_name
+        checkpoint = self.db.execute(
+            select(EmbeddingMigration).where(
+                EmbeddingMigration.target == EmbeddingTarget.TRANSACTIONS,
+                EmbeddingMigration.scope == ALL_PROFILES,
+                EmbeddingMigration.model_version == model_version,
+            )
+        ).scalar_one_or_none()
+        if (
+            checkpoint is None
+            or not checkpoint.shadow
+            or checkpoint.status != EmbeddingMigrationStatus.COMPLETED
+        ):
+            raise ValueError(f"No hay una migración sombra completada para {model_version}")
+
+        # Ponerse al día con lo que se creó mientras corría la migración
+        pending = self._transaction_page(None, model_version)
+        while pending:
+            self._write_shadow(service, pending, model_version)
+            self.db.commit()
+            pending = self._transaction_page(pending[-1].id, model_version)
+
+        dim = checkpoint.embedding_dim
+        self.db.execute(text(f"DROP INDEX IF EXISTS {HNSW_INDEX}"))
+        # Si alguna fila quedó sin sombra, el NOT NULL aborta todo el cutover
+        self.db.execute(
+            text(
+                f"ALTER TABLE transaction_embeddings ALTER COLUMN embedding "
+                f"TYPE vector({dim}) USING embedding_shadow::vector({dim})"
+            )
+        )
+        table = TransactionEmbedding.__table__
+        result = self.db.execute(
+            update(table).values(
+                model_version=table.c.shadow_model_version,
+                embedding_dim=dim,
+                embedding_shadow=None,
+                shadow_model_version=None,
+                updated_at=datetime.now(UTC),
+            )
+        )
+        self.db.execute(
+            text(
+                f"CREATE INDEX {HNSW_INDEX} ON transaction_embeddings "
+                f"USING hnsw (embedding vector_cosine_ops)"
+            )
+        )
+        checkpoint.status = EmbeddingMigrationStatus.CUT_OVER
+        self.db.commit()
+
+        logger.info(f"✅ Cutover a {model_version}: {result.rowcount} embeddings ({dim} dims)")
+        return result.rowcount
+
+    def _transaction_page(
+        self,
+        last_key: str | None,
+        stale_for: str | None,
+    ) -> Sequence[TransactionEmbedding]:
+        """
+        Siguiente página de embeddings con la transacción ya cargada.
+
+        Args:
+            last_key: Último ID procesado
+            stale_for: Si se indica, sólo filas cuya sombra no es de este modelo
+        """
+        stmt = (
+            select(TransactionEmbedding)
+            .options(
+                selectinload(TransactionEmbedding.transaction).options(
+                    selectinload(Transaction.subcategory).selectinload(Subcategory.category),
+                    selectinload(Transaction.card),
+                )
+            )
+            .order_by(TransactionEmbedding.id)
+            .limit(self.batch_size)
+        )
+        if last_key is not None:
+            stmt = stmt.where(TransactionEmbedding.id > last_key)
+        if stale_for is not None:
+            stmt = stmt.where(
+                or_(
+                    TransactionEmbedding.shadow_model_version.is_(None),
+                    TransactionEmbedding.shadow_model_version != stale_for,
+                )
+            )
+        return self.db.execute(stmt).scalars().all()
+
+    def _write_shadow(
+        self,
+        service: EmbeddingService,
+        page: Sequence[TransactionEmbedding],
+        model_version: str,
+    ) -> None:
+        """Escribe los vectores del modelo nuevo en la columna sombra."""
+        texts = [service._build_transaction_text(row.transaction) for row in page]
+        vectors = service.get_embeddings_batch(texts)
+        self._bulk_update(
+            TransactionEmbedding.__table__,
+            [
+                {"id": row.id, "embedding_shadow": vector}
+                for row, vector in zip(page, vectors, strict=True)
+            ],
+            shadow_model_version=model_version,
+        )
+
+    # ========================================================================
+    # Patrones
+    # ========================================================================
+
+    def migrate_pattern_embeddings(
+        self,
+        profile_id: str | None = None,
+        restart: bool = False,
+        max_batches: int | None = None,
+    ) -> EmbeddingMigration:
+        """
+        Regenera los embeddings de `transaction_patterns` con el modelo local.
+
+        Los vectores se padean a la columna Vector(1536), así que el cambio de
+        modelo no requiere columna sombra.
+
+        Args:
+            profile_id: Perfil a procesar (None = todos)
+            restart: Empezar de cero aunque exista un checkpoint
+            max_batches: Detenerse después de N batches (None = hasta terminar)
+
+        Returns:
+            Checkpoint actualizado
+        """
+        model_version = LocalEmbeddingService.MODEL_NAME
+        checkpoint = self._get_checkpoint(
+            EmbeddingTarget.PATTERNS,
+            profile_id or ALL_PROFILES,
+            model_version,
+            PATTERN_STORAGE_DIM,
+            shadow=False,
+            restart=restart,
+        )
+
+        def fetch_page(last_key: str | None) -> Sequence[Any]:
+            stmt = (
+                select(TransactionPattern.id, TransactionPattern.pattern_text)
+                .where(TransactionPattern.deleted_at.is_(None))
+                .order_by(TransactionPattern.id)
+                .limit(self.batch_size)
+            )
+            if profile_id:
+                stmt = stmt.where(TransactionPattern.profile_id == profile_id)
+            if last_key is not None:
+                stmt = stmt.where(TransactionPattern.id > UUID(last_key))
+            return self.db.execute(stmt).all()
+
+        def write_page(page: Sequence[Any]) -> None:
+            vectors = LocalEmbeddingService().embed_batch([row.pattern_text for row in page])
+            self._bulk_update(
+                TransactionPattern.__table__,
+                [
+                    {"id": row.id, "embedding": SmartLearningService._to_storage_dim(vector)}
+                    for row, vector in zip(page, vectors, strict=True)
+                ],
+                embedding_model=model_version,
+            )
+
+        return self._run(checkpoint, fetch_page, write_page, max_batches)
+
+    # ========================================================================
+    # Pipeline genérico
+    # ========================================================================
+
+    def _get_checkpoint(
+        self,
+        target: EmbeddingTarget,
+        scope: str,
+        model_version: str,
+        embedding_dim: int,
+        shadow: bool,
+        restart: bool,
+    ) -> EmbeddingMigration:
+        """Obtiene (o crea) el checkpoint de la migración."""
+        checkpoint = self.db.execute(
+            select(EmbeddingMigration).where(
+                EmbeddingMigration.target == target,
+                EmbeddingMigration.scope == scope,
+                EmbeddingMigration.model_version == model_version,
+            )
+        ).scalar_one_or_none()
+
+        if checkpoint is None:
+            checkpoint = EmbeddingMigration(
+                target=target,
+                scope=scope,
+                model_version=model_version,
+                embedding_dim=embedding_dim,
+                shadow=shadow,
+                status=EmbeddingMigrationStatus.RUNNING,
+                processed=0,
+            )
+            self.db.add(checkpoint)
+        elif restart or checkpoint.shadow != shadow:
+            checkpoint.embedding_dim = embedding_dim
+            checkpoint.shadow = shadow
+            checkpoint.status = EmbeddingMigrationStatus.RUNNING
+            checkpoint.last_key = None
+            checkpoint.processed = 0
+            checkpoint.started_at = datetime.now(UTC)
+            checkpoint.completed_at = None
+        elif checkpoint.status == EmbeddingMigrationStatus.RUNNING:
+            logger.info(
+                f"↪️ Reanudando {target} ({model_version}) después de {checkpoint.processed} filas"
+            )
+
+        self.db.commit()
+        return checkpoint
+
+    def _run(
+        self,
+        checkpoint: EmbeddingMigration,
+        fetch_page: Callable[[str | None], Sequence[Any]],
+        write_page: Callable[[Sequence[Any]], None],
+        max_batches: int | None,
+    ) -> EmbeddingMigration:
+        """
+        Procesa batches hasta terminar (o hasta max_batches).
+
+        Cada batch y su cursor se confirman juntos: si el proceso muere,
+        la próxima corrida retoma desde el último batch confirmado.
+        """
+        if checkpoint.status != EmbeddingMigrationStatus.RUNNING:
+            logger.info(f"Migración {checkpoint.target} ({checkpoint.model_version}) ya terminada")
+            return checkpoint
+
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            page = fetch_page(checkpoint.last_key)
+            if page:
+                write_page(page)
+                checkpoint.last_key = str(page[-1].id)
+                checkpoint.processed += len(page)
+            if len(page) < self.batch_size:
+                checkpoint.status = EmbeddingMigrationStatus.COMPLETED
+                checkpoint.completed_at = datetime.now(UTC)
+            self.db.commit()
+            batches += 1
+
+            if checkpoint.status == EmbeddingMigrationStatus.COMPLETED:
+                logger.info(
+                    f"✅ {checkpoint.target}: {checkpoint.processed} embeddings "
+                    f"regenerados con {checkpoint.model_version}"
+                )
+                break
+            logger.info(f"  → {checkpoint.target}: {checkpoint.processed} procesados")
+
+        return checkpoint
+
+    def _bulk_update(
+        self,
+        table: Table,
+        rows: list[dict[str, Any]],
+        **constants: Any,
+    ) -> None:
+        """Escribe un batch en una sola sentencia (ver `bulk_update_by_id`)."""
+        bulk_update_by_id(self.db, table, rows, **constants)
@@ -10,24 +10,32 @@ El servicio genera embeddings vectoriales de las transacciones
 para permitir búsqueda semántica con pgvector.
 """
 
-__all__ = ["EmbeddingService", "EmbeddingProvider"]
+__all__ = ["EmbeddingProvider", "EmbeddingService", "SemanticSearchHit"]
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
 from enum import StrEnum
 import logging
 from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from finanzas_tracker.config.settings import Settings
 from finanzas_tracker.models.embedding import TransactionEmbedding
+from finanzas_tracker.services.embedding_backends import (
+    EmbeddingBackend,
+    load_sentence_transformer,
+)
 
 
 if TYPE_CHECKING:
     import openai
     from sentence_transformers import SentenceTransformer
+    from sqlalchemy import Select
     import voyageai
 
     from finanzas_tracker.models.transaction import Transaction
@@ -58,6 +66,20 @@ class EmbeddingConfig:
     openai_api_key: str | None = None
 
 
+@dataclass(frozen=True)
+class SemanticSearchHit:
+    """Resultado de búsqueda semántica con todo lo necesario para mostrarlo."""
+
+    transaction_id: str
+    comercio: str
+    monto_crc: Decimal
+    fecha: datetime
+    categoria: str | None  # "Categoría > Subcategoría" si está categorizada
+    categoria_sugerida: str | None
+    similarity: float
+    text_content: str
+
+
 class BaseEmbeddingProvider(ABC):
     """Clase base para proveedores de embeddings."""
 
@@ -245,14 +267,26 @@ class LocalEmbeddingProvider(BaseEmbeddingProvider):
     def __init__(
         self,
         model: str = "all-MiniLM-L6-v2",
+        backend: EmbeddingBackend | str = EmbeddingBackend.TORCH,
+        threads: int | None = None,
+        batch_size: int = 32,
+        onnx_file: str = "onnx/model_quint8_avx2.onnx",
     ) -> None:
         """
         Inicializa el proveedor local.
 
         Args:
             model: Nombre del modelo de Sentence Transformers
+            backend: Runtime de inferencia (torch, onnx, onnx-int8)
+            threads: Threads de CPU para la inferencia (None = default del runtime)
+            batch_size: Textos por batch en get_embeddings_batch
+            onnx_file: Archivo ONNX cuantizado (sólo para onnx-int8)
         """
         self._model_name = model
+        self._backend = EmbeddingBackend(backend)
+        self._threads = threads
+        self._batch_size = batch_size
+        self._onnx_file = onnx_file
         self._model: SentenceTransformer | None = None
 
     @property
@@ -272,9 +306,12 @@ class LocalEmbeddingProvider(BaseEmbeddingProvider):
         """Obtiene o crea el modelo."""
         if self._model is None:
             try:
-                from sentence_transformers import SentenceTransformer
-
-                self._model = SentenceTransformer(self._model_name)
+                self._model = load_sentence_transformer(
+                    self._model_name,
+                    backend=self._backend,
+                    threads=self._threads,
+                    onnx_file=self._onnx_file,
+                )
             except ImportError as e:
                 msg = "sentence-transformers no está instalado. Ejecuta: poetry add sentence-transformers"
                 raise ImportError(msg) from e
@@ -293,7 +330,7 @@ class LocalEmbeddingProvider(BaseEmbeddingProvider):
             return []
 
         model = self._get_model()
-        embeddings = model.encode(texts)
+        embeddings = model.encode(texts, batch_size=self._batch_size)
         return [e.tolist() for e in embeddings]
 
 
@@ -361,6 +398,12 @@ class EmbeddingService:
         logger.info("Usando modelo local (Sentence Transformers) para embeddings")
         return LocalEmbeddingProvider(
             model=getattr(self.settings, "local_embedding_model", "all-MiniLM-L6-v2"),
+            backend=getattr(self.settings, "local_embedding_backend", EmbeddingBackend.TORCH),
+            threads=getattr(self.settings, "local_embedding_threads", None),
+            batch_size=getattr(self.settings, "local_embedding_batch_size", 32),
+            onnx_file=getattr(
+                self.settings, "local_embedding_onnx_file", "onnx/model_quint8_avx2.onnx"
+            ),
         )
 
     @property
@@ -461,6 +504,18 @@ class EmbeddingService:
         """
         return self._provider.get_embedding(text)
 
+    def get_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Genera embeddings para varios textos en una sola llamada al proveedor.
+
+        Args:
+            texts: Textos a embedder
+
+        Returns:
+            Vectores en el mismo orden que los textos
+        """
+        return self._provider.get_embeddings_batch(texts)
+
     def embed_transaction(
         self,
         transaction: "Transaction",
@@ -496,6 +551,8 @@ class EmbeddingService:
             existing.text_content = text
             existing.model_version = self.model_name
             existing.embedding_dim = self.embedding_dim
+            # Si hay una migración en sombra, la fila se vuelve a generar en el cutover
+            existing.shadow_model_version = None
             self.db.commit()
             logger.info(f"Embedding actualizado para transacción {transaction.id}")
             return existing
@@ -519,6 +576,7 @@ class EmbeddingService:
         self,
         profile_id: str | None = None,
         batch_size: int = 32,
+        on_progress: Callable[[int, int], None] | None = None,
     ) -> int:
         """
         Genera embeddings para transacciones sin embedding.
@@ -526,6 +584,7 @@ class EmbeddingService:
         Args:
             profile_id: Filtrar por perfil (opcional)
             batch_size: Tamaño del batch para procesamiento
+            on_progress: Se llama tras cada batch con (generados, total)
 
         Returns:
             Número de embeddings generados
@@ -571,10 +630,103 @@ class EmbeddingService:
 
             self.db.commit()
             logger.info(f"Batch {i // batch_size + 1}: {len(batch)} embeddings generados")
+            if on_progress is not None:
+                on_progress(count, len(transactions))
 
         logger.info(f"Total: {count} embeddings generados")
         return count
 
+    def _ranked_search(
+        self,
+        query: str,
+        profile_id: str | None,
+        limit: int,
+        min_similarity: float,
+        query_embedding: list[float] | None = None,
+    ) -> "Select[Any]":
+        """
+        Query base de búsqueda: ranking por distancia coseno en pgvector.
+
+        Ordena por `embedding <=> query` (la expresión que usa el índice
+        HNSW) y trae en el mismo SELECT la transacción, su categoría y el
+        texto del embedding, para que ningún resultado dispare lazy loads.
+        """
+        from finanzas_tracker.models.category import Category, Subcategory
+        from finanzas_tracker.models.transaction import Transaction
+
+        if query_embedding is None:
+            query_embedding = self.get_embedding(query)
+        distance = TransactionEmbedding.embedding.cosine_distance(query_embedding)
+
+        stmt = (
+            select(
+                TransactionEmbedding.transaction_id,
+                (1 - distance).label("similarity"),
+                TransactionEmbedding.text_content,
+                Transaction.comercio,
+                Transaction.monto_crc,
+                Transaction.fecha_transaccion,
+                Transaction.categoria_sugerida_por_ia,
+                Category.nombre.label("categoria"),
+                Subcategory.nombre.label("subcategoria"),
+            )
+            .join(Transaction, Transaction.id == TransactionEmbedding.transaction_id)
+            .outerjoin(Subcategory, Subcategory.id == Transaction.subcategory_id)
+            .outerjoin(Category, Category.id == Subcategory.category_id)
+            .where(
+                Transaction.deleted_at.is_(None),
+                distance <= 1 - min_similarity,
+            )
+            .order_by(distance)
+            .limit(limit)
+        )
+        if profile_id:
+            stmt = stmt.where(Transaction.profile_id == profile_id)
+        return stmt
+
+    def search_hits(
+        self,
+        query: str,
+        profile_id: str | None = None,
+        limit: int = 10,
+        min_similarity: float = 0.5,
+        query_embedding: list[float] | None = None,
+    ) -> list[SemanticSearchHit]:
+        """
+        Busca transacciones similares y retorna resultados ya hidratados.
+
+        Una sola query (ranking vectorial + transacción + subcategoría +
+        categoría + texto del embedding), sin cargar entidades ORM.
+
+        Args:
+            query: Texto de búsqueda (ej: "comida rápida")
+            profile_id: Filtrar por perfil (opcional)
+            limit: Número máximo de resultados
+            min_similarity: Similitud mínima (0-1, cosine)
+            query_embedding: Embedding de la query ya calculado (opcional)
+
+        Returns:
+            Resultados ordenados por similitud descendente
+        """
+        rows = self.db.execute(
+            self._ranked_search(query, profile_id, limit, min_similarity, query_embedding)
+        )
+        return [
+            SemanticSearchHit(
+                transaction_id=row.transaction_id,
+                comercio=row.comercio,
+                monto_crc=row.monto_crc,
+                fecha=row.fecha_transaccion,
+                categoria=(
+                    f"{row.categoria} > {row.subcategoria}" if row.subcategoria else None
+                ),
+                categoria_sugerida=row.categoria_sugerida_por_ia,
+                similarity=float(row.similarity),
+                text_content=row.text_content,
+            )
+            for row in rows
+        ]
+
     def search_similar(
         self,
         query: str,
@@ -585,6 +737,10 @@ class EmbeddingService:
         """
         Busca transacciones similares a un texto usando pgvector.
 
+        Para mostrar resultados preferir `search_hits`; este método es para
+        quien necesita las entidades. Se cargan con subcategoría, categoría y
+        embedding en batch (sin una query por resultado).
+
         Args:
             query: Texto de búsqueda (ej: "comida rápida")
             profile_id: Filtrar por perfil (opcional)
@@ -594,47 +750,31 @@ class EmbeddingService:
         Returns:
             Lista de tuplas (Transaction, similitud)
         """
-        from sqlalchemy import text
-
+        from finanzas_tracker.models.category import Subcategory
         from finanzas_tracker.models.transaction import Transaction
 
-        # Generar embedding de la query
-        query_embedding = self.get_embedding(query)
-
-        # Usar pgvector para búsqueda por similitud coseno
-        # La función <=> es distancia coseno (1 - similarity)
-        # Convertimos a similitud: 1 - distancia
-        embedding_array = f"ARRAY{query_embedding}::float[]"
-
-        # Query con similitud coseno usando pgvector
-        # Nota: pgvector usa <=> para distancia coseno
-        stmt = text(f"""
-            SELECT
-                te.transaction_id,
-                1 - (te.embedding <=> {embedding_array}::vector) as similarity
-            FROM transaction_embeddings te
-            JOIN transactions t ON t.id = te.transaction_id
-            WHERE t.deleted_at IS NULL
-            {"AND t.profile_id = :profile_id" if profile_id else ""}
-            AND 1 - (te.embedding <=> {embedding_array}::vector) >= :min_similarity
-            ORDER BY similarity DESC
-            LIMIT :limit
-        """)
-
-        params: dict[str, int | float | str] = {"limit": limit, "min_similarity": min_similarity}
-        if profile_id:
-            params["profile_id"] = profile_id
-
-        results = self.db.execute(stmt, params).fetchall()
+        ranked = self._ranked_search(query, profile_id, limit, min_similarity)
+        results = self.db.execute(
+            ranked.with_only_columns(
+                TransactionEmbedding.transaction_id,
+                ranked.selected_columns.similarity,
+            )
+        ).fetchall()
 
-        # Cargar transacciones completas
         transaction_ids = [r[0] for r in results]
-        similarities: dict[Any, float] = {r[0]: r[1] for r in results}
+        similarities: dict[Any, float] = {r[0]: float(r[1]) for r in results}
 
         if not transaction_ids:
             return []
 
-        txn_stmt = select(Transaction).where(Transaction.id.in_(transaction_ids))
+        txn_stmt = (
+            select(Transaction)
+            .where(Transaction.id.in_(transaction_ids))
+            .options(
+                selectinload(Transaction.subcategory).selectinload(Subcategory.category),
+                selectinload(Transaction.embedding),
+            )
+        )
         transactions = {t.id: t for t in self.db.execute(txn_stmt).scalars().all()}
 
         # Mantener orden por similitud
@@ -97,47 +97,107 @@ class FeedbackService:
         # Guardar categoría original antes de cambiar
         categoria_original = transaction.subcategory_id
         
-        # 2. Crear patrón del comercio
-        merchant_pattern = self._create_merchant_pattern(transaction.comercio)
+        # 2. Aprender de la corrección (preferencia, contacto SINPE, mejora global)
+        results = self._learn(transaction, new_subcategory_id, user_label, profile_id)
         
-        # 3. Guardar preferencia del usuario
-        if self._save_user_preference(
-            profile_id=profile_id,
-            merchant_pattern=merchant_pattern,
-            subcategory_id=new_subcategory_id,
-            user_label=user_label,
-        ):
-            results["preference_saved"] = True
-        
-        # 4. Actualizar la transacción
+        # 3. Actualizar la transacción
         transaction.subcategory_id = new_subcategory_id
         transaction.categoria_confirmada_usuario = True
         transaction.necesita_revision = False
         if categoria_original:
             transaction.categoria_original_ia = str(categoria_original)
         
-        # 5. Si es SINPE, aprender el contacto
+        self.session.commit()
+        
+        logger.info(
+            f"✅ Corrección registrada: {self._create_merchant_pattern(transaction.comercio)}"
+            f" → {new_subcategory_id} (label: {user_label})"
+        )
+        
+        return results
+    
+    def record_corrections(
+        self,
+        corrections: list[dict[str, str]],
+        profile_id: str | None = None,
+    ) -> int:
+        """
+        Registra el aprendizaje de un lote de correcciones ya aplicadas.
+        
+        Las transacciones ya tienen la categoría nueva (la escribió
+        `TransactionService.actualizar_batch`): aquí sólo se aprende de
+        ellas, con una consulta para cargarlas y un commit para todo el lote.
+        
+        Args:
+            corrections: Dicts con "transaction_id" y "subcategory_id"
+            profile_id: ID del perfil (opcional, se toma de cada transacción)
+            
+        Returns:
+            Número de correcciones registradas
+        """
+        ids = [c["transaction_id"] for c in corrections]
+        transactions = {
+            t.id: t
+            for t in self.session.execute(
+                select(Transaction).where(Transaction.id.in_(ids))
+            ).scalars()
+        }
+        
+        count = 0
+        for correction in corrections:
+            transaction = transactions.get(correction["transaction_id"])
+            if transaction is None:
+                continue
+            self._learn(
+                transaction,
+                correction["subcategory_id"],
+                profile_id=profile_id or transaction.profile_id,
+            )
+            count += 1
+        
+        self.session.commit()
+        logger.info(f"✅ {count} correcciones registradas en lote")
+        return count
+    
+    def _learn(
+        self,
+        transaction: Transaction,
+        new_subcategory_id: str,
+        user_label: str | None = None,
+        profile_id: str | None = None,
+    ) -> dict[str, bool]:
+        """
+        Aprende de una corrección sin tocar la transacción ni confirmar.
+        
+        Returns:
+            Dict con resultados: preference_saved, contact_learned, global_proposed
+        """
+        merchant_pattern = self._create_merchant_pattern(transaction.comercio)
+        
+        results = {
+            "preference_saved": self._save_user_preference(
+                profile_id=profile_id,
+                merchant_pattern=merchant_pattern,
+                subcategory_id=new_subcategory_id,
+                user_label=user_label,
+            ),
+            "contact_learned": False,
+            "global_proposed": False,
+        }
+        
+        # Si es SINPE, aprender el contacto
         if "SINPE" in transaction.comercio.upper():
-            if self._learn_sinpe_contact(
+            results["contact_learned"] = self._learn_sinpe_contact(
                 transaction=transaction,
                 profile_id=profile_id,
                 subcategory_id=new_subcategory_id,
                 user_label=user_label,
-            ):
-                results["contact_learned"] = True
+            )
         
-        # 6. Proponer mejora global (crowdsourced)
-        if self._propose_global_improvement(
+        # Proponer mejora global (crowdsourced)
+        results["global_proposed"] = self._propose_global_improvement(
             merchant_pattern=merchant_pattern,
             subcategory_id=new_subcategory_id,
-        ):
-            results["global_proposed"] = True
-        
-        self.session.commit()
-        
-        logger.info(
-            f"✅ Corrección registrada: {merchant_pattern} → {new_subcategory_id}"
-            f" (label: {user_label})"
         )
         
         return results
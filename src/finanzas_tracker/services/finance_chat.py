@@ -2,8 +2,10 @@
 
 __all__ = ["FinanceChatService", "finance_chat_service"]
 
+from collections.abc import Iterator
 from datetime import date, timedelta
 from decimal import Decimal
+import time
 from typing import Any, cast
 
 import anthropic
@@ -13,6 +15,7 @@ from finanzas_tracker.config.settings import settings
 from finanzas_tracker.core.claude_credits import can_use_claude, handle_claude_error
 from finanzas_tracker.core.database import get_session
 from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.core.metrics import histogram
 from finanzas_tracker.core.retry import retry_on_anthropic_error
 from finanzas_tracker.models.category import Category, Subcategory
 from finanzas_tracker.models.income import Income
@@ -21,6 +24,18 @@ from finanzas_tracker.models.transaction import Transaction
 
 logger = get_logger(__name__)
 
+UNAVAILABLE_MESSAGE = (
+    "🤖 El asistente de IA no está disponible en este momento. "
+    "Puedes revisar tus transacciones y estadísticas directamente."
+)
+
+# Time-to-first-token del chat del dashboard (misma métrica que /ai/chat)
+CHAT_TTFT = histogram(
+    "ai_time_to_first_token_seconds",
+    "Tiempo hasta el primer token de Claude en segundos",
+    endpoint="dashboard/chat",
+)
+
 
 class FinanceChatService:
     """
@@ -80,10 +95,7 @@ class FinanceChatService:
             can_use, reason = can_use_claude()
             if not can_use:
                 logger.info(f"⏭️ Chat no disponible: {reason}")
-                return (
-                    "🤖 El asistente de IA no está disponible en este momento. "
-                    "Puedes revisar tus transacciones y estadísticas directamente."
-                )
+                return UNAVAILABLE_MESSAGE
 
             # 1. Obtener contexto financiero
             context = self._get_financial_context(profile_id)
@@ -96,24 +108,74 @@ class FinanceChatService:
             logger.info(f"Chat respondido: {question[:50]}...")
             return answer
 
-        except anthropic.APIStatusError as e:
+        except Exception as e:
+            return self._error_message(e)
+
+    def chat_stream(self, question: str, profile_id: str) -> Iterator[str]:
+        """
+        Responde una pregunta sobre finanzas fragmento a fragmento.
+
+        Pensado para `st.write_stream`: el usuario ve el texto mientras
+        Claude lo genera en vez de esperar la respuesta completa. Sin
+        retry: un stream a medias no se puede repetir sin duplicar texto.
+
+        Args:
+            question: Pregunta del usuario en lenguaje natural
+            profile_id: ID del perfil del usuario
+
+        Yields:
+            Fragmentos de la respuesta (o un único mensaje de error)
+        """
+        start = time.perf_counter()
+        first_token = True
+        try:
+            can_use, reason = can_use_claude()
+            if not can_use:
+                logger.info(f"⏭️ Chat no disponible: {reason}")
+                yield UNAVAILABLE_MESSAGE
+                return
+
+            context = self._get_financial_context(profile_id)
+            prompt = self._build_prompt(question, context)
+
+            with self.client.messages.stream(
+                model=self.model,
+                max_tokens=1024,
+                temperature=0.3,
+                messages=[{"role": "user", "content": prompt}],
+            ) as stream:
+                for text in stream.text_stream:
+                    if first_token:
+                        first_token = False
+                        ttft = time.perf_counter() - start
+                        CHAT_TTFT.observe(ttft)
+                        logger.info(f"Chat TTFT: {ttft * 1000:.0f}ms")
+                    yield text
+
+            logger.info(f"Chat respondido (stream): {question[:50]}...")
+
+        except Exception as e:
+            yield self._error_message(e)
+
+    def _error_message(self, error: Exception) -> str:
+        """Mensaje para el usuario según el error de la llamada a Claude."""
+        if isinstance(error, anthropic.RateLimitError):
+            logger.warning("Rate limit alcanzado en Claude API")
+            return "El servicio esta saturado. Intenta de nuevo en unos minutos."
+        if isinstance(error, anthropic.APIStatusError):
             # Manejar error de créditos y actualizar estado global
-            if handle_claude_error(e):
+            if handle_claude_error(error):
                 return (
                     "🤖 El asistente de IA no está disponible (créditos agotados). "
                     "Puedes revisar tus transacciones y estadísticas directamente."
                 )
-            logger.error(f"Error de API en chat: {e}")
-            return f"Ocurrió un error con el servicio de IA: {e}"
-        except anthropic.APIConnectionError as e:
-            logger.error(f"Error de conexion con Claude: {e}")
+            logger.error(f"Error de API en chat: {error}")
+            return f"Ocurrió un error con el servicio de IA: {error}"
+        if isinstance(error, anthropic.APIConnectionError):
+            logger.error(f"Error de conexion con Claude: {error}")
             return "Lo siento, no puedo conectarme al servicio de IA en este momento."
-        except anthropic.RateLimitError:
-            logger.warning("Rate limit alcanzado en Claude API")
-            return "El servicio esta saturado. Intenta de nuevo en unos minutos."
-        except Exception as e:
-            logger.error(f"Error en chat: {type(e).__name__}: {e}")
-            return f"Ocurrio un error procesando tu pregunta: {e}"
+        logger.error(f"Error en chat: {type(error).__name__}: {error}")
+        return f"Ocurrio un error procesando tu pregunta: {error}"
 
     def _get_financial_context(self, profile_id: str) -> dict[str, Any]:
         """Obtiene el contexto financiero del usuario."""
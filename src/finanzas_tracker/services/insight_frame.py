@@ -0,0 +1,226 @@
+"""
+Ventana de transacciones en columnas de NumPy para los motores de insights.
+
+`InsightsService` (insights.py e insights_service.py) cargaba listas de
+objetos ORM y recorría la lista varias veces por regla con aritmética
+`Decimal`. Aquí la ventana de un perfil se carga UNA vez (una sola consulta
+de columnas, sin objetos ORM) como arreglos:
+
+    monto          int64, céntimos de colón (exacto, sin Decimal)
+    dia            int32, días desde 1970-01-01
+    hora           int8, hora del día (0-23)
+    categoria,
+    subcategoria,
+    tipo_gasto,    (tipo 50/30/20 de la categoría)
+    comercio       int32, códigos en las tuplas de etiquetas (-1 = sin valor)
+
+y las reglas se expresan como máscaras y group-bys (`np.bincount`).
+"""
+
+__all__ = ["InsightFrame", "a_colones", "epoch_day"]
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.models.category import Category, Subcategory
+from finanzas_tracker.models.transaction import Transaction
+
+
+_EPOCH = date(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+
+def epoch_day(dia: date) -> int:
+    """Días desde 1970-01-01 (la misma escala que `InsightFrame.dia`)."""
+    return (dia - _EPOCH).days
+
+
+def a_colones(centimos: int | np.integer) -> Decimal:
+    """Convierte céntimos (int) a colones como Decimal exacto."""
+    return Decimal(int(centimos)).scaleb(-2)
+
+
+def _factorize(values: Sequence[str | None]) -> tuple[np.ndarray, tuple[str, ...]]:
+    """Códigos enteros por valor, en orden de primera aparición (-1 = None)."""
+    index: dict[str, int] = {}
+    codes = np.fromiter(
+        (-1 if v is None else index.setdefault(v, len(index)) for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, tuple(index)
+
+
+@dataclass(frozen=True)
+class InsightFrame:
+    """
+    Transacciones de un perfil como arreglos paralelos (una fila por transacción).
+
+    Ejemplo:
+        >>> frame = InsightFrame.load(
+        ...     session, profile_id, date(2025, 1, 1), date(2025, 2, 28)
+        ... )
+        >>> enero = frame.entre(date(2025, 1, 1), date(2025, 1, 31))
+        >>> frame.sumar_por(frame.categoria, len(frame.categorias), enero)
+    """
+
+    monto: np.ndarray
+    dia: np.ndarray
+    hora: np.ndarray
+    categoria: np.ndarray
+    subcategoria: np.ndarray
+    tipo_gasto: np.ndarray
+    comercio: np.ndarray
+    es_ingreso: np.ndarray
+    es_transferencia: np.ndarray
+    categorias: tuple[str, ...] = ()
+    subcategorias: tuple[str, ...] = ()
+    tipos_gasto: tuple[str, ...] = ()
+    comercios: tuple[str, ...] = ()
+
+    # Columnas que `from_rows` espera, en orden
+    COLUMNS = (
+        Transaction.monto_crc,
+        Transaction.fecha_transaccion,
+        Transaction.comercio,
+        Category.nombre,
+        Subcategory.nombre,
+        Category.tipo,
+        Transaction.tipo_transaccion,
+        Transaction.es_transferencia_interna,
+    )
+
+    def __len__(self) -> int:
+        return len(self.monto)
+
+    @classmethod
+    def load(cls, session: Session, profile_id: str, desde: date, hasta: date) -> "InsightFrame":
+        """
+        Carga las transacciones activas del perfil entre dos fechas (inclusive).
+
+        Args:
+            session: Sesión de base de datos
+            profile_id: ID del perfil
+            desde: Primer día de la ventana
+            hasta: Último día de la ventana
+
+        Returns:
+            Frame con una fila por transacción
+        """
+        stmt = (
+            select(*cls.COLUMNS)
+            .outerjoin(Subcategory, Transaction.subcategory_id == Subcategory.id)
+            .outerjoin(Category, Subcategory.category_id == Category.id)
+            .where(
+                Transaction.profile_id == profile_id,
+                Transaction.deleted_at.is_(None),
+                Transaction.fecha_transaccion >= datetime.combine(desde, time.min),
+                Transaction.fecha_transaccion
+                < datetime.combine(hasta + timedelta(days=1), time.min),
+            )
+        )
+        return cls.from_rows(session.execute(stmt).tuples().all())
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[Any]]) -> "InsightFrame":
+        """
+        Construye el frame desde filas con el orden de `COLUMNS`.
+
+        Args:
+            rows: (monto_crc, fecha, comercio, categoria, subcategoria,
+                tipo de categoría 50/30/20, tipo_transaccion, es_transferencia_interna)
+
+        Returns:
+            Frame con una fila por transacción
+        """
+        columnas = list(zip(*rows, strict=True))
+        if not columnas:
+            return cls.empty()
+        montos, fechas, comercios, categorias, subcategorias, tipos, tipos_txn, transf = columnas
+
+        monto = np.rint(np.array(montos, dtype=np.float64) * 100).astype(np.int64)
+        # Día y hora "de pared" tal como están guardados (igual que `fecha.hour`)
+        count = len(fechas)
+        dia = np.fromiter((f.toordinal() for f in fechas), dtype=np.int32, count=count)
+        hora = np.fromiter((f.hour for f in fechas), dtype=np.int8, count=count)
+
+        categoria, categorias_labels = _factorize(categorias)
+        subcategoria, subcategorias_labels = _factorize(subcategorias)
+        tipo_gasto, tipos_labels = _factorize([None if t is None else str(t) for t in tipos])
+        comercio, comercios_labels = _factorize(comercios)
+
+        return cls(
+            monto=monto,
+            dia=dia - _EPOCH_ORDINAL,
+            hora=hora,
+            categoria=categoria,
+            subcategoria=subcategoria,
+            tipo_gasto=tipo_gasto,
+            comercio=comercio,
+            es_ingreso=np.array([t == "ingreso" for t in tipos_txn], dtype=bool),
+            es_transferencia=np.array([bool(t) for t in transf], dtype=bool),
+            categorias=categorias_labels,
+            subcategorias=subcategorias_labels,
+            tipos_gasto=tipos_labels,
+            comercios=comercios_labels,
+        )
+
+    @classmethod
+    def empty(cls) -> "InsightFrame":
+        """Frame sin filas."""
+        codes = np.empty(0, dtype=np.int32)
+        return cls(
+            monto=np.empty(0, dtype=np.int64),
+            dia=codes,
+            hora=np.empty(0, dtype=np.int8),
+            categoria=codes,
+            subcategoria=codes,
+            tipo_gasto=codes,
+            comercio=codes,
+            es_ingreso=np.empty(0, dtype=bool),
+            es_transferencia=np.empty(0, dtype=bool),
+        )
+
+    @property
+    def dia_semana(self) -> np.ndarray:
+        """Día de la semana (lunes=0 ... domingo=6); 1970-01-01 fue jueves."""
+        return (self.dia + 3) % 7
+
+    def entre(self, desde: date, hasta: date) -> np.ndarray:
+        """Máscara de filas con fecha en [desde, hasta] (inclusive)."""
+        return (self.dia >= epoch_day(desde)) & (self.dia <= epoch_day(hasta))
+
+    def total(self, mask: np.ndarray | None = None) -> int:
+        """Suma de montos (céntimos) de las filas de la máscara."""
+        return int(self.monto.sum() if mask is None else self.monto[mask].sum())
+
+    def sumar_por(self, codes: np.ndarray, size: int, mask: np.ndarray) -> np.ndarray:
+        """
+        Suma de montos por código (group-by) sobre las filas de la máscara.
+
+        Las filas sin valor (código -1) se descartan.
+
+        Args:
+            codes: Columna de códigos (ej: `frame.categoria`)
+            size: Cantidad de etiquetas (ej: `len(frame.categorias)`)
+            mask: Filas a incluir
+
+        Returns:
+            Arreglo int64 de largo `size` con céntimos por código
+        """
+        mask = mask & (codes >= 0)
+        # bincount suma en float64: exacto para totales < 2**53 céntimos
+        sums = np.bincount(codes[mask], weights=self.monto[mask], minlength=size)
+        return np.rint(sums).astype(np.int64)
+
+    def contar_por(self, codes: np.ndarray, size: int, mask: np.ndarray) -> np.ndarray:
+        """Cantidad de filas por código sobre las filas de la máscara."""
+        mask = mask & (codes >= 0)
+        return np.bincount(codes[mask], minlength=size)
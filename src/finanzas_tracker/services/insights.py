@@ -10,15 +10,25 @@ import json
 from typing import Any
 
 import anthropic
-from sqlalchemy.orm import Session, joinedload
+import numpy as np
+from sqlalchemy.orm import Session
 
 from finanzas_tracker.config.settings import settings
-from finanzas_tracker.core.claude_credits import can_use_claude, handle_claude_error
+from finanzas_tracker.core.claude_client import (
+    ClaudeClient,
+    pooled_http_client,
+    response_text,
+)
+from finanzas_tracker.core.claude_credits import (
+    ClaudeServiceUnavailable,
+    can_use_claude,
+    handle_claude_error,
+)
 from finanzas_tracker.core.database import get_session
 from finanzas_tracker.core.logging import get_logger
 from finanzas_tracker.core.retry import retry_on_anthropic_error
-from finanzas_tracker.models.category import Subcategory
-from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.repositories.filters import month_range
+from finanzas_tracker.services.insight_frame import InsightFrame, a_colones, epoch_day
 
 
 logger = get_logger(__name__)
@@ -63,9 +73,32 @@ class InsightsService:
     - Oportunidades de ahorro
     """
 
+    # Prefijo estático de los insights con AI (se cachea en Anthropic)
+    AI_INSIGHTS_SYSTEM_PROMPT = """Eres un asesor financiero experto analizando el comportamiento de gastos de un usuario.
+
+TAREA:
+Analiza los datos del mes que te envíe el usuario y genera 1-2 insights ACCIONABLES y ESPECÍFICOS que no sean obvios.
+NO repitas información básica (como "gastaste más este mes").
+Busca patrones sutiles, tendencias preocupantes, o oportunidades reales.
+
+Responde ÚNICAMENTE con un JSON válido:
+{
+  "insights": [
+    {
+      "title": "Título corto y específico",
+      "description": "Descripción clara del hallazgo (1-2 oraciones)",
+      "recommendation": "Acción concreta que puede tomar",
+      "impact": "positive/negative/neutral"
+    }
+  ]
+}"""
+
     def __init__(self) -> None:
         """Inicializa el servicio de insights."""
-        self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        self.client = anthropic.Anthropic(
+            api_key=settings.anthropic_api_key, http_client=pooled_http_client()
+        )
+        self.claude = ClaudeClient(self.client)
         logger.info("InsightsService inicializado con Claude AI")
 
     def generate_insights(self, profile_id: str) -> list[Insight]:
@@ -107,75 +140,68 @@ class InsightsService:
         return insights[:10]  # Maximo 10 insights
 
     def _get_analysis_data(self, session: Session, profile_id: str) -> dict[str, Any]:
-        """Obtiene datos para analisis."""
+        """Obtiene datos para analisis (una sola carga columnar de los dos meses)."""
         today = date.today()
         first_day_month = today.replace(day=1)
         last_month_start = (first_day_month - timedelta(days=1)).replace(day=1)
-        (last_month_start - timedelta(days=1)).replace(day=1)
-
-        # Transacciones por periodo (eager load para evitar N+1)
-        current_month = (
-            session.query(Transaction)
-            .options(joinedload(Transaction.subcategory).joinedload(Subcategory.category))
-            .filter(
-                Transaction.profile_id == profile_id,
-                Transaction.fecha_transaccion >= first_day_month,
-                Transaction.deleted_at.is_(None),
-            )
-            .all()
-        )
+        _, month_end = month_range(today.year, today.month)
 
-        last_month = (
-            session.query(Transaction)
-            .options(joinedload(Transaction.subcategory).joinedload(Subcategory.category))
-            .filter(
-                Transaction.profile_id == profile_id,
-                Transaction.fecha_transaccion >= last_month_start,
-                Transaction.fecha_transaccion < first_day_month,
-                Transaction.deleted_at.is_(None),
-            )
-            .all()
+        frame = InsightFrame.load(
+            session, profile_id, last_month_start, month_end.date() - timedelta(days=1)
         )
-
-        # Calcular promedios
-        avg_transaction_current = (
-            sum(t.monto_crc for t in current_month) / len(current_month)
-            if current_month
-            else Decimal("0")
+        return self._analysis_data_from_frame(frame, first_day_month)
+
+    def _analysis_data_from_frame(
+        self, frame: InsightFrame, first_day_month: date
+    ) -> dict[str, Any]:
+        """Agrega el frame en los totales que usan las reglas."""
+        current = frame.dia >= epoch_day(first_day_month)
+        last = ~current
+        n_current = int(current.sum())
+
+        total_current = frame.total(current)
+        avg_transaction = (
+            a_colones(total_current) / n_current if n_current else Decimal("0")
         )
 
-        # Gastos por categoria
-        by_category_current: dict[str, Decimal] = {}
-        by_category_last: dict[str, Decimal] = {}
-
-        for t in current_month:
-            cat = t.subcategory.category.nombre if t.subcategory else "Sin categorizar"
-            by_category_current[cat] = by_category_current.get(cat, Decimal("0")) + t.monto_crc
-
-        for t in last_month:
-            cat = t.subcategory.category.nombre if t.subcategory else "Sin categorizar"
-            by_category_last[cat] = by_category_last.get(cat, Decimal("0")) + t.monto_crc
-
-        # Gastos por comercio
-        by_merchant: dict[str, dict[str, Any]] = {}
-        for t in current_month:
-            if t.comercio not in by_merchant:
-                by_merchant[t.comercio] = {"count": 0, "total": Decimal("0"), "transactions": []}
-            by_merchant[t.comercio]["count"] += 1
-            by_merchant[t.comercio]["total"] += t.monto_crc
-            by_merchant[t.comercio]["transactions"].append(t)
+        # Gastos por comercio (count y total en un group-by cada uno)
+        merchant_counts = frame.contar_por(frame.comercio, len(frame.comercios), current)
+        merchant_totals = frame.sumar_por(frame.comercio, len(frame.comercios), current)
+        by_merchant = {
+            frame.comercios[code]: {
+                "count": int(merchant_counts[code]),
+                "total": a_colones(merchant_totals[code]),
+            }
+            for code in np.flatnonzero(merchant_counts)
+        }
 
         return {
-            "current_month": current_month,
-            "last_month": last_month,
-            "total_current": sum(t.monto_crc for t in current_month),
-            "total_last": sum(t.monto_crc for t in last_month),
-            "avg_transaction": avg_transaction_current,
-            "by_category_current": by_category_current,
-            "by_category_last": by_category_last,
+            "frame": frame,
+            "current": current,
+            "n_current": n_current,
+            "total_current": a_colones(total_current),
+            "total_last": a_colones(frame.total(last)),
+            "avg_transaction": avg_transaction,
+            "by_category_current": self._by_category(frame, current),
+            "by_category_last": self._by_category(frame, last),
             "by_merchant": by_merchant,
         }
 
+    @staticmethod
+    def _by_category(frame: InsightFrame, mask: np.ndarray) -> dict[str, Decimal]:
+        """Gastos por categoria (las transacciones sin categoria van a "Sin categorizar")."""
+        totals = frame.sumar_por(frame.categoria, len(frame.categorias), mask)
+        counts = frame.contar_por(frame.categoria, len(frame.categorias), mask)
+        by_category = {
+            frame.categorias[code]: a_colones(totals[code]) for code in np.flatnonzero(counts)
+        }
+        uncategorized = mask & (frame.categoria < 0)
+        if uncategorized.any():
+            by_category["Sin categorizar"] = by_category.get(
+                "Sin categorizar", Decimal("0")
+            ) + a_colones(frame.total(uncategorized))
+        return by_category
+
     def _analyze_spending_trends(self, data: dict) -> list[Insight]:
         """Analiza tendencias de gasto."""
         insights = []
@@ -216,20 +242,25 @@ class InsightsService:
         avg = float(data["avg_transaction"])
 
         if avg > 0:
+            frame: InsightFrame = data["frame"]
             threshold = avg * 3  # 3x el promedio
 
-            for t in data["current_month"]:
-                if float(t.monto_crc) > threshold:
-                    insights.append(
-                        Insight(
-                            type=InsightType.UNUSUAL_TRANSACTION,
-                            title=f"Gasto inusual en {t.comercio}",
-                            description=f"₡{float(t.monto_crc):,.0f} es {float(t.monto_crc) / avg:.1f}x tu promedio",
-                            impact="neutral",
-                            value=float(t.monto_crc),
-                            recommendation="Verifica que esta transaccion sea correcta",
-                        )
+            # Los 3 montos mas altos sobre el umbral
+            rows = np.flatnonzero(data["current"] & (frame.monto > threshold * 100))
+            rows = rows[np.argsort(-frame.monto[rows], kind="stable")[:3]]
+
+            for row in rows:
+                monto = frame.monto[row] / 100
+                insights.append(
+                    Insight(
+                        type=InsightType.UNUSUAL_TRANSACTION,
+                        title=f"Gasto inusual en {frame.comercios[frame.comercio[row]]}",
+                        description=f"₡{monto:,.0f} es {monto / avg:.1f}x tu promedio",
+                        impact="neutral",
+                        value=float(monto),
+                        recommendation="Verifica que esta transaccion sea correcta",
                     )
+                )
 
         return insights[:3]  # Max 3 inusuales
 
@@ -308,49 +339,44 @@ class InsightsService:
         insights = []
 
         try:
-            # Detectar si gasta más en fin de semana
-            weekend_spending = Decimal("0")
-            weekday_spending = Decimal("0")
-            weekend_count = 0
-            weekday_count = 0
-
-            for t in data["current_month"]:
-                is_weekend = t.fecha_transaccion.weekday() >= 5  # Sábado=5, Domingo=6
-                if is_weekend:
-                    weekend_spending += t.monto_crc
-                    weekend_count += 1
-                else:
-                    weekday_spending += t.monto_crc
-                    weekday_count += 1
+            frame: InsightFrame = data["frame"]
+            current = data["current"]
+
+            # Detectar si gasta más en fin de semana (Sábado=5, Domingo=6)
+            weekend = current & (frame.dia_semana >= 5)
+            weekday = current & ~weekend
+            weekend_count = int(weekend.sum())
+            weekday_count = int(weekday.sum())
 
             # Calcular promedio por día
             avg_weekend = (
-                (weekend_spending / Decimal(weekend_count / 7)) if weekend_count > 0 else Decimal("0")
+                frame.total(weekend) / 100 * 7 / weekend_count if weekend_count > 0 else 0.0
             )
             avg_weekday = (
-                (weekday_spending / Decimal(weekday_count / 7)) if weekday_count > 0 else Decimal("0")
+                frame.total(weekday) / 100 * 7 / weekday_count if weekday_count > 0 else 0.0
             )
 
             if avg_weekend > 0 and avg_weekday > 0:
-                if avg_weekend > avg_weekday * Decimal("1.5"):
+                if avg_weekend > avg_weekday * 1.5:
                     diff_pct = ((avg_weekend - avg_weekday) / avg_weekday) * 100
                     insights.append(
                         Insight(
                             type=InsightType.BEHAVIORAL_PATTERN,
                             title="Gastas más en fines de semana",
-                            description=f"Promedio fin de semana: ₡{float(avg_weekend):,.0f} vs "
-                            f"entre semana: ₡{float(avg_weekday):,.0f} ({diff_pct:.0f}% más)",
+                            description=f"Promedio fin de semana: ₡{avg_weekend:,.0f} vs "
+                            f"entre semana: ₡{avg_weekday:,.0f} ({diff_pct:.0f}% más)",
                             impact="neutral",
-                            value=float(avg_weekend - avg_weekday),
+                            value=avg_weekend - avg_weekday,
                             recommendation="Considera planificar actividades de fin de semana "
                             "más económicas o establecer un presupuesto específico",
                         )
                     )
 
             # Detectar concentración de gastos pequeños
-            small_transactions = [t for t in data["current_month"] if float(t.monto_crc) < 5000]
-            if len(small_transactions) > 20:
-                total_small = sum(float(t.monto_crc) for t in small_transactions)
+            small = current & (frame.monto < 5000 * 100)
+            small_count = int(small.sum())
+            if small_count > 20:
+                total_small = frame.total(small) / 100
                 pct_of_total = (total_small / float(data["total_current"])) * 100
 
                 if pct_of_total > 30:
@@ -358,7 +384,7 @@ class InsightsService:
                         Insight(
                             type=InsightType.BEHAVIORAL_PATTERN,
                             title="Muchos gastos pequeños",
-                            description=f"{len(small_transactions)} transacciones menores a ₡5,000 "
+                            description=f"{small_count} transacciones menores a ₡5,000 "
                             f"suman ₡{total_small:,.0f} ({pct_of_total:.0f}% del total)",
                             impact="neutral",
                             value=total_small,
@@ -377,26 +403,22 @@ class InsightsService:
         insights = []
 
         try:
-            # Agrupar por hora del día
-            by_hour: dict[str, dict[str, int | Decimal]] = {}
-            for t in data["current_month"]:
-                hour = t.fecha_transaccion.hour
-                time_slot = self._get_time_slot(hour)
-                if time_slot not in by_hour:
-                    by_hour[time_slot] = {"count": 0, "total": Decimal("0")}
-                count_val = by_hour[time_slot]["count"]
-                if isinstance(count_val, int):
-                    by_hour[time_slot]["count"] = count_val + 1
-                total_val = by_hour[time_slot]["total"]
-                if isinstance(total_val, Decimal):
-                    by_hour[time_slot]["total"] = total_val + t.monto_crc
+            frame: InsightFrame = data["frame"]
+            current = data["current"]
+
+            # Agrupar por franja horaria: tabla hora -> franja y un group-by
+            slot_by_hour = [self._get_time_slot(hour) for hour in range(24)]
+            slot_names = list(dict.fromkeys(slot_by_hour))
+            slot_codes = np.array([slot_names.index(slot) for slot in slot_by_hour])[frame.hora]
+            slot_counts = frame.contar_por(slot_codes, len(slot_names), current)
+            slot_totals = frame.sumar_por(slot_codes, len(slot_names), current)
 
             # Detectar slot con más gasto
-            if by_hour:
-                max_slot = max(by_hour.items(), key=lambda x: float(x[1]["total"]) if isinstance(x[1]["total"], Decimal) else 0)
-                slot_name, slot_data = max_slot
+            if slot_counts.any():
+                best = int(np.argmax(slot_totals))
+                slot_name = slot_names[best]
                 total = float(data["total_current"])
-                slot_total = float(slot_data["total"]) if isinstance(slot_data["total"], Decimal) else 0
+                slot_total = slot_totals[best] / 100
                 pct = (slot_total / total) * 100 if total > 0 else 0
 
                 if pct > 40:
@@ -404,29 +426,26 @@ class InsightsService:
                         Insight(
                             type=InsightType.TIME_OF_DAY_PATTERN,
                             title=f"Gastas más en {slot_name}",
-                            description=f"{slot_data['count']} transacciones, "
+                            description=f"{slot_counts[best]} transacciones, "
                             f"₡{slot_total:,.0f} ({pct:.0f}% del total)",
                             impact="neutral",
-                            value=slot_total,
+                            value=float(slot_total),
                             recommendation=f"Tus gastos se concentran en {slot_name}. "
                             "Esto puede ser normal según tu rutina, pero vale la pena revisarlo",
                         )
                     )
 
             # Detectar gastos nocturnos (posible entretenimiento/impulso)
-            night_transactions = [
-                t
-                for t in data["current_month"]
-                if t.fecha_transaccion.hour >= 22 or t.fecha_transaccion.hour <= 2
-            ]
-
-            if len(night_transactions) >= 5:
-                total_night = sum(float(t.monto_crc) for t in night_transactions)
+            night = current & ((frame.hora >= 22) | (frame.hora <= 2))
+            night_count = int(night.sum())
+
+            if night_count >= 5:
+                total_night = frame.total(night) / 100
                 insights.append(
                     Insight(
                         type=InsightType.TIME_OF_DAY_PATTERN,
                         title="Gastos nocturnos frecuentes",
-                        description=f"{len(night_transactions)} transacciones entre 10pm-2am "
+                        description=f"{night_count} transacciones entre 10pm-2am "
                         f"totalizan ₡{total_night:,.0f}",
                         impact="neutral",
                         value=total_night,
@@ -466,49 +485,32 @@ class InsightsService:
             context = self._prepare_ai_context(data)
 
             # Solo generar si hay suficientes datos
-            if len(data["current_month"]) < 5:
+            if data["n_current"] < 5:
                 return insights
 
-            prompt = f"""Eres un asesor financiero experto analizando el comportamiento de gastos de un usuario.
+            prompt = f"""DATOS DEL MES ACTUAL:
+{json.dumps(context, indent=2, ensure_ascii=False)}"""
 
-DATOS DEL MES ACTUAL:
-{json.dumps(context, indent=2, ensure_ascii=False)}
-
-TAREA:
-Analiza estos datos y genera 1-2 insights ACCIONABLES y ESPECÍFICOS que no sean obvios.
-NO repitas información básica (como "gastaste más este mes").
-Busca patrones sutiles, tendencias preocupantes, o oportunidades reales.
-
-Responde ÚNICAMENTE con un JSON válido:
-{{
-  "insights": [
-    {{
-      "title": "Título corto y específico",
-      "description": "Descripción clara del hallazgo (1-2 oraciones)",
-      "recommendation": "Acción concreta que puede tomar",
-      "impact": "positive/negative/neutral"
-    }}
-  ]
-}}"""
-
-            # Llamar a Claude Haiku para análisis
-            response = self.client.messages.create(
+            # Llamar a Claude Haiku para análisis (instrucciones cacheadas)
+            response = self.claude.create(
+                call_site="insights.ai",
+                system=self.AI_INSIGHTS_SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": prompt}],
                 model=settings.claude_model,
                 max_tokens=600,
                 temperature=0.3,
-                messages=[{"role": "user", "content": prompt}],
+                profile_id=profile_id,
             )
 
-            first_block = response.content[0]
-            if not hasattr(first_block, "text"):
+            text = response_text(response).strip()
+            if not text:
                 return insights
-            response_text = first_block.text.strip()
 
             # Parsear respuesta
-            if response_text.startswith("```json"):
-                response_text = response_text.replace("```json", "").replace("```", "").strip()
+            if text.startswith("```json"):
+                text = text.replace("```json", "").replace("```", "").strip()
 
-            result = json.loads(response_text)
+            result = json.loads(text)
 
             # Convertir a objetos Insight
             for ai_insight in result.get("insights", [])[:2]:  # Max 2 AI insights
@@ -530,6 +532,8 @@ Responde ÚNICAMENTE con un JSON válido:
                 logger.info("⏭️ Insights AI: Créditos agotados")
             else:
                 logger.error(f"Error de API generando insights con AI: {e}")
+        except ClaudeServiceUnavailable as e:
+            logger.info(f"⏭️ Insights AI: {e.message}")
         except Exception as e:
             logger.error(f"Error generando insights con AI: {e}")
 
@@ -548,12 +552,11 @@ Responde ÚNICAMENTE con un JSON válido:
         )[:5]
 
         # Estadísticas básicas
-        current_transactions = data["current_month"]
         avg_transaction = float(data["avg_transaction"])
 
         return {
             "total_gastado": float(data["total_current"]),
-            "numero_transacciones": len(current_transactions),
+            "numero_transacciones": data["n_current"],
             "promedio_por_transaccion": avg_transaction,
             "cambio_vs_mes_anterior": (
                 float(((data["total_current"] - data["total_last"]) / data["total_last"]) * 100)
@@ -13,6 +13,7 @@ __all__ = [
     "InsightType",
 ]
 
+import calendar
 import logging
 from dataclasses import dataclass
 from datetime import date, timedelta
@@ -20,11 +21,12 @@ from decimal import Decimal
 from enum import Enum
 from typing import Any
 
+import numpy as np
 from sqlalchemy import func, select, and_
 from sqlalchemy.orm import Session
 
-from finanzas_tracker.models.transaction import Transaction
-from finanzas_tracker.models.category import Subcategory
+from finanzas_tracker.repositories.filters import month_range
+from finanzas_tracker.services.insight_frame import InsightFrame, a_colones, epoch_day
 
 
 logger = logging.getLogger(__name__)
@@ -93,21 +95,36 @@ class InsightsService:
         mes = mes or hoy.month
         ano = ano or hoy.year
         
+        inicio_mes, siguiente_mes = (d.date() for d in month_range(ano, mes))
+        fin_mes = siguiente_mes - timedelta(days=1)
+        inicio_anterior = (inicio_mes - timedelta(days=1)).replace(day=1)
+        
+        # Una sola consulta para los dos meses; las reglas usan máscaras
+        frame = InsightFrame.load(self.db, profile_id, inicio_anterior, fin_mes)
+        gastos = ~frame.es_ingreso
+        mes_actual = gastos & frame.entre(inicio_mes, fin_mes)
+        mes_anterior = gastos & frame.entre(inicio_anterior, inicio_mes - timedelta(days=1))
+        sin_transferencias = ~frame.es_transferencia
+        
         insights: list[Insight] = []
         
         # 1. Alertas de gastos por categoría
-        insights.extend(self._alertas_gastos_categoria(profile_id, mes, ano))
+        insights.extend(self._alertas_gastos_categoria(
+            frame, mes_actual & sin_transferencias, mes_anterior & sin_transferencias
+        ))
         
         # 2. Predicción de fin de mes
-        prediccion = self._prediccion_fin_mes(profile_id, mes, ano)
+        prediccion = self._prediccion_fin_mes(
+            profile_id, frame, mes_actual & sin_transferencias, mes, ano
+        )
         if prediccion:
             insights.append(prediccion)
         
         # 3. Análisis 50/30/20
-        insights.extend(self._analisis_503020(profile_id, mes, ano))
+        insights.extend(self._analisis_503020(frame, mes_actual & sin_transferencias))
         
         # 4. Patrones de gasto
-        insights.extend(self._patrones_gasto(profile_id, mes, ano))
+        insights.extend(self._patrones_gasto(frame, mes_actual))
         
         # Ordenar por prioridad (alta primero)
         insights.sort(key=lambda x: (-x.prioridad, x.tipo.value))
@@ -116,20 +133,15 @@ class InsightsService:
     
     def _alertas_gastos_categoria(
         self,
-        profile_id: str,
-        mes: int,
-        ano: int,
+        frame: InsightFrame,
+        mes_actual: np.ndarray,
+        mes_anterior: np.ndarray,
     ) -> list[Insight]:
         """Genera alertas para categorías con gastos inusuales."""
         insights: list[Insight] = []
         
-        # Obtener gastos por categoría este mes
-        gastos_mes = self._gastos_por_categoria(profile_id, mes, ano)
-        
-        # Obtener gastos del mes anterior
-        mes_anterior = mes - 1 if mes > 1 else 12
-        ano_anterior = ano if mes > 1 else ano - 1
-        gastos_anterior = self._gastos_por_categoria(profile_id, mes_anterior, ano_anterior)
+        gastos_mes = self._gastos_por_categoria(frame, mes_actual)
+        gastos_anterior = self._gastos_por_categoria(frame, mes_anterior)
         
         for categoria, monto_actual in gastos_mes.items():
             monto_anterior = gastos_anterior.get(categoria, Decimal("0"))
@@ -177,6 +189,8 @@ class InsightsService:
     def _prediccion_fin_mes(
         self,
         profile_id: str,
+        frame: InsightFrame,
+        mes_actual: np.ndarray,
         mes: int,
         ano: int,
     ) -> Insight | None:
@@ -191,31 +205,13 @@ class InsightsService:
         if hoy.day < self.DIAS_MINIMOS_PREDICCION:
             return None
         
-        # Obtener total gastado hasta hoy
-        inicio_mes = date(ano, mes, 1)
-        
-        stmt = select(func.sum(Transaction.monto_crc)).where(
-            and_(
-                Transaction.profile_id == profile_id,
-                Transaction.fecha_transaccion >= inicio_mes,
-                Transaction.fecha_transaccion <= hoy,
-                Transaction.tipo_transaccion != "ingreso",
-                Transaction.es_transferencia_interna.is_(False),
-                Transaction.deleted_at.is_(None),
-            )
-        )
-        
-        result = self.db.execute(stmt).scalar()
-        total_hasta_hoy = result or Decimal("0")
+        # Total gastado hasta hoy
+        total_hasta_hoy = a_colones(frame.total(mes_actual & (frame.dia <= epoch_day(hoy))))
         
         if total_hasta_hoy <= 0:
             return None
         
-        # Calcular días del mes
-        if mes == 12:
-            dias_mes = 31
-        else:
-            dias_mes = (date(ano, mes + 1, 1) - timedelta(days=1)).day
+        dias_mes = calendar.monthrange(ano, mes)[1]
         
         # Proyección lineal
         promedio_diario = total_hasta_hoy / hoy.day
@@ -261,39 +257,17 @@ class InsightsService:
     
     def _analisis_503020(
         self,
-        profile_id: str,
-        mes: int,
-        ano: int,
+        frame: InsightFrame,
+        mes_actual: np.ndarray,
     ) -> list[Insight]:
         """Analiza si el usuario cumple con la metodología 50/30/20."""
         insights: list[Insight] = []
         
-        # Obtener gastos por tipo
-        inicio_mes = date(ano, mes, 1)
-        if mes == 12:
-            fin_mes = date(ano + 1, 1, 1) - timedelta(days=1)
-        else:
-            fin_mes = date(ano, mes + 1, 1) - timedelta(days=1)
-        
-        # Query para gastos por tipo (necesidades, gustos, ahorros)
-        stmt = select(
-            Subcategory.tipo_gasto,
-            func.sum(Transaction.monto_crc),
-        ).join(
-            Subcategory, Transaction.subcategory_id == Subcategory.id
-        ).where(
-            and_(
-                Transaction.profile_id == profile_id,
-                Transaction.fecha_transaccion >= inicio_mes,
-                Transaction.fecha_transaccion <= fin_mes,
-                Transaction.tipo_transaccion != "ingreso",
-                Transaction.es_transferencia_interna.is_(False),
-                Transaction.deleted_at.is_(None),
-            )
-        ).group_by(Subcategory.tipo_gasto)
-        
-        resultados = self.db.execute(stmt).all()
-        gastos_por_tipo = {tipo: monto for tipo, monto in resultados if tipo}
+        # Gastos por tipo (necesidades, gustos, ahorros) en un group-by
+        totales = frame.sumar_por(frame.tipo_gasto, len(frame.tipos_gasto), mes_actual)
+        gastos_por_tipo = {
+            tipo: a_colones(totales[code]) for code, tipo in enumerate(frame.tipos_gasto)
+        }
         
         total = sum(gastos_por_tipo.values()) or Decimal("1")
         
@@ -350,43 +324,23 @@ class InsightsService:
     
     def _patrones_gasto(
         self,
-        profile_id: str,
-        mes: int,
-        ano: int,
+        frame: InsightFrame,
+        mes_actual: np.ndarray,
     ) -> list[Insight]:
         """Detecta patrones de gasto (fines de semana, comercios frecuentes)."""
         insights: list[Insight] = []
         
-        inicio_mes = date(ano, mes, 1)
-        if mes == 12:
-            fin_mes = date(ano + 1, 1, 1) - timedelta(days=1)
-        else:
-            fin_mes = date(ano, mes + 1, 1) - timedelta(days=1)
-        
         # Detectar comercio más frecuente
-        stmt = select(
-            Transaction.comercio,
-            func.count(Transaction.id).label("count"),
-            func.sum(Transaction.monto_crc).label("total"),
-        ).where(
-            and_(
-                Transaction.profile_id == profile_id,
-                Transaction.fecha_transaccion >= inicio_mes,
-                Transaction.fecha_transaccion <= fin_mes,
-                Transaction.tipo_transaccion != "ingreso",
-                Transaction.deleted_at.is_(None),
-                Transaction.comercio.isnot(None),
-            )
-        ).group_by(
-            Transaction.comercio
-        ).order_by(
-            func.count(Transaction.id).desc()
-        ).limit(1)
+        conteos = frame.contar_por(frame.comercio, len(frame.comercios), mes_actual)
+        if not conteos.size:
+            return insights
         
-        result = self.db.execute(stmt).first()
+        code = int(np.argmax(conteos))
+        count = int(conteos[code])
         
-        if result and result.count >= 3:
-            comercio, count, total = result.comercio, result.count, result.total
+        if count >= 3:
+            comercio = frame.comercios[code]
+            total = a_colones(frame.total(mes_actual & (frame.comercio == code)))
             insights.append(Insight(
                 tipo=InsightType.INFO,
                 titulo=f"Comercio frecuente: {comercio}",
@@ -401,35 +355,16 @@ class InsightsService:
     
     def _gastos_por_categoria(
         self,
-        profile_id: str,
-        mes: int,
-        ano: int,
+        frame: InsightFrame,
+        mask: np.ndarray,
     ) -> dict[str, Decimal]:
-        """Obtiene gastos agrupados por categoría para un mes."""
-        inicio_mes = date(ano, mes, 1)
-        if mes == 12:
-            fin_mes = date(ano + 1, 1, 1) - timedelta(days=1)
-        else:
-            fin_mes = date(ano, mes + 1, 1) - timedelta(days=1)
-        
-        stmt = select(
-            Subcategory.nombre,
-            func.sum(Transaction.monto_crc),
-        ).join(
-            Subcategory, Transaction.subcategory_id == Subcategory.id
-        ).where(
-            and_(
-                Transaction.profile_id == profile_id,
-                Transaction.fecha_transaccion >= inicio_mes,
-                Transaction.fecha_transaccion <= fin_mes,
-                Transaction.tipo_transaccion != "ingreso",
-                Transaction.es_transferencia_interna.is_(False),
-                Transaction.deleted_at.is_(None),
-            )
-        ).group_by(Subcategory.nombre)
-        
-        resultados = self.db.execute(stmt).all()
-        return {nombre: monto for nombre, monto in resultados if nombre}
+        """Gastos agrupados por subcategoría sobre las filas de la máscara."""
+        totales = frame.sumar_por(frame.subcategoria, len(frame.subcategorias), mask)
+        conteos = frame.contar_por(frame.subcategoria, len(frame.subcategorias), mask)
+        return {
+            frame.subcategorias[code]: a_colones(totales[code])
+            for code in np.flatnonzero(conteos)
+        }
     
     def _obtener_presupuesto_mes(
         self,
@@ -440,11 +375,10 @@ class InsightsService:
         """Obtiene el presupuesto total del mes."""
         from finanzas_tracker.models.budget import Budget
         
-        stmt = select(func.sum(Budget.monto_mensual)).where(
+        stmt = select(func.sum(Budget.amount_crc)).where(
             and_(
                 Budget.profile_id == profile_id,
-                Budget.activo.is_(True),
-                Budget.deleted_at.is_(None),
+                Budget.mes == date(ano, mes, 1),
             )
         )
         
@@ -0,0 +1,633 @@
+"""
+Jobs en segundo plano para operaciones largas de la API.
+
+Generar embeddings de un perfil, procesar los estados de cuenta del
+correo o el onboarding automático tardan minutos: correrlos dentro del
+request ocupa un worker de la API y falla con el timeout del cliente.
+
+Flujo:
+1. El endpoint llama a `enqueue_job` y responde 202 con el ID del job.
+2. Un `JobWorker` toma el job más antiguo con
+   `SELECT ... FOR UPDATE SKIP LOCKED` (varios workers nunca toman el
+   mismo) y corre el handler registrado para su `kind`.
+3. El handler reporta avance con `JobProgress`, que escribe en la fila
+   a lo sumo cada `job_progress_interval_seconds`. Mientras tanto un hilo
+   renueva el heartbeat cada `job_heartbeat_interval_seconds`, aunque el
+   handler no reporte avance.
+4. El cliente consulta `GET /jobs/{id}` en cualquier worker de la API.
+
+Si un worker muere, su job deja de tener heartbeat y
+`requeue_stale_jobs` lo devuelve a la cola (hasta `job_max_attempts`).
+El resultado sólo se guarda si el job sigue tomado por el mismo worker:
+uno dado por muerto no pisa al que lo retomó.
+
+El worker corre dentro de la API (`job_worker_in_api`) o como proceso
+aparte:
+
+    python -m finanzas_tracker.services.job_queue
+"""
+
+__all__ = [
+    "EMBEDDINGS_GENERATE",
+    "FEEDBACK_RECORD_BATCH",
+    "ONBOARDING",
+    "STATEMENTS_PROCESS_ALL",
+    "JobProgress",
+    "JobWorker",
+    "claim_next_job",
+    "enqueue_job",
+    "get_job",
+    "job_handler",
+    "requeue_stale_jobs",
+    "run_job",
+    "start_job_worker",
+    "stop_job_worker",
+]
+
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+import os
+import socket
+import threading
+import time
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import Select, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from finanzas_tracker.config.settings import settings
+from finanzas_tracker.core.database import SessionLocal
+from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.models.job import Job, JobStatus
+
+
+logger = get_logger(__name__)
+
+SessionFactory = Callable[[], Session] | sessionmaker[Session]
+JobHandler = Callable[[Session, Job, "JobProgress"], dict[str, Any] | None]
+
+# Tipos de job
+EMBEDDINGS_GENERATE = "embeddings.generate"
+STATEMENTS_PROCESS_ALL = "statements.process_all"
+ONBOARDING = "onboarding"
+FEEDBACK_RECORD_BATCH = "feedback.record_batch"
+
+_handlers: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Registra el handler de un tipo de job.
+
+    El handler recibe la sesión del job, el job y su `JobProgress`, y
+    retorna el resultado (un dict serializable a JSON) o None.
+
+    Args:
+        kind: Tipo de job
+
+    Returns:
+        Decorador que registra la función
+    """
+
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+
+    return decorator
+
+
+def _now() -> datetime:
+    return datetime.now(UTC)
+
+
+class JobProgress:
+    """
+    Avance de un job, escrito en la BD por lotes.
+
+    Usa su propia sesión: el progreso se confirma aunque el handler tenga
+    una transacción abierta. Es thread-safe (los handlers pueden reportar
+    desde varios hilos).
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        session_factory: SessionFactory = SessionLocal,
+        interval_seconds: float | None = None,
+    ) -> None:
+        """
+        Args:
+            job_id: ID del job
+            session_factory: Fábrica de sesiones para escribir el progreso
+            interval_seconds: Mínimo entre escrituras
+                (default: settings.job_progress_interval_seconds)
+        """
+        self.job_id = job_id
+        self.session_factory = session_factory
+        self.interval_seconds = (
+            settings.job_progress_interval_seconds if interval_seconds is None else interval_seconds
+        )
+        self.current = 0
+        self.total: int | None = None
+        self.message: str | None = None
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._written_at = float("-inf")
+
+    def update(
+        self,
+        current: int | None = None,
+        total: int | None = None,
+        message: str | None = None,
+    ) -> None:
+        """
+        Actualiza el avance; sólo escribe si pasó el intervalo mínimo.
+
+        Args:
+            current: Unidades completadas
+            total: Total de unidades (si ya se conoce)
+            message: Etapa actual
+        """
+        with self._lock:
+            if current is not None:
+                self.current = current
+            if total is not None:
+                self.total = total
+            if message is not None:
+                self.message = message
+            self._dirty = True
+            if time.monotonic() - self._written_at < self.interval_seconds:
+                return
+            self._write()
+
+    def advance(self, units: int = 1, message: str | None = None) -> None:
+        """Suma `units` unidades completadas."""
+        with self._lock:
+            current = self.current + units
+        self.update(current, message=message)
+
+    def flush(self) -> None:
+        """Escribe el avance pendiente aunque no haya pasado el intervalo."""
+        with self._lock:
+            if self._dirty:
+                self._write()
+
+    def _write(self) -> None:
+        # El progreso es informativo: si no se puede escribir, el job sigue
+        self._written_at = time.monotonic()
+        try:
+            with self.session_factory() as db:
+                db.execute(
+                    update(Job)
+                    .where(Job.id == self.job_id)
+                    .values(
+                        progress_current=self.current,
+                        progress_total=self.total,
+                        message=self.message[:255] if self.message else None,
+                        heartbeat_at=_now(),
+                    )
+                )
+                db.commit()
+        except Exception as e:
+            logger.warning(f"No se pudo guardar el progreso del job {self.job_id[:8]}...: {e}")
+            return
+        self._dirty = False
+
+
+class _Heartbeat:
+    """Hilo que renueva `heartbeat_at` mientras el worker corre el job."""
+
+    def __init__(
+        self,
+        job_id: str,
+        worker_id: str | None,
+        session_factory: SessionFactory = SessionLocal,
+        interval_seconds: float | None = None,
+    ) -> None:
+        """
+        Args:
+            job_id: ID del job
+            worker_id: Worker que tiene tomado el job
+            session_factory: Fábrica de sesiones para escribir el heartbeat
+            interval_seconds: Intervalo entre heartbeats
+                (default: settings.job_heartbeat_interval_seconds)
+        """
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds or settings.job_heartbeat_interval_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name=f"job-heartbeat-{job_id[:8]}"
+        )
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                with self.session_factory() as db:
+                    result = db.execute(
+                        update(Job)
+                        .where(Job.id == self.job_id, Job.locked_by == self.worker_id)
+                        .values(heartbeat_at=_now())
+                    )
+                    db.commit()
+            except Exception as e:
+                logger.warning(f"No se pudo renovar el heartbeat del job {self.job_id[:8]}...: {e}")
+                continue
+            if result.rowcount == 0:
+                logger.warning(f"⚠️ Job {self.job_id[:8]}... ya no es de {self.worker_id}")
+                return
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    params: dict[str, Any] | None = None,
+    profile_id: str | None = None,
+    user_id: str | None = None,
+) -> Job:
+    """
+    Crea un job en la cola.
+
+    Args:
+        db: Sesión de base de datos
+        kind: Tipo de job (debe tener handler registrado)
+        params: Argumentos del handler (serializables a JSON)
+        profile_id: Perfil al que pertenece el job
+        user_id: Usuario que lo pidió
+
+    Returns:
+        Job creado (ya confirmado en la BD)
+
+    Raises:
+        ValueError: Si el tipo de job no tiene handler
+    """
+    if kind not in _handlers:
+        raise ValueError(f"Tipo de job desconocido: {kind}")
+
+    job = Job(
+        kind=kind,
+        status=JobStatus.QUEUED,
+        params=params or {},
+        profile_id=profile_id,
+        user_id=user_id,
+        progress_current=0,
+        attempts=0,
+        created_at=_now(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    logger.info(f"📥 Job {kind} encolado ({job.id[:8]}...)")
+    return job
+
+
+def get_job(db: Session, job_id: str, profile_id: str | None = None) -> Job | None:
+    """
+    Obtiene un job por ID.
+
+    Args:
+        db: Sesión de base de datos
+        job_id: ID del job
+        profile_id: Si se da, sólo devuelve el job si pertenece a ese perfil
+
+    Returns:
+        Job o None si no existe (o es de otro perfil)
+    """
+    job = db.get(Job, job_id)
+    if job is None or (profile_id is not None and job.profile_id != profile_id):
+        return None
+    return job
+
+
+def _next_job_stmt() -> Select[tuple[Job]]:
+    """Job en cola más antiguo (usa ix_jobs_status_created)."""
+    return (
+        select(Job)
+        .where(Job.status == JobStatus.QUEUED)
+        .order_by(Job.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def claim_next_job(db: Session, worker_id: str) -> Job | None:
+    """
+    Toma el job en cola más antiguo y lo marca como corriendo.
+
+    `FOR UPDATE SKIP LOCKED` hace que workers concurrentes tomen jobs
+    distintos sin esperar el lock de otro.
+
+    Args:
+        db: Sesión de base de datos
+        worker_id: Identificador del worker
+
+    Returns:
+        Job tomado, o None si la cola está vacía
+    """
+    job = db.execute(_next_job_stmt()).scalar_one_or_none()
+    if job is None:
+        db.rollback()
+        return None
+
+    now = _now()
+    job.status = JobStatus.RUNNING
+    job.locked_by = worker_id
+    job.attempts += 1
+    job.started_at = now
+    job.heartbeat_at = now
+    job.error = None
+    db.commit()
+    return job
+
+
+def requeue_stale_jobs(db: Session, stale_after_seconds: int | None = None) -> int:
+    """
+    Devuelve a la cola los jobs cuyo worker dejó de dar heartbeat.
+
+    Los que ya agotaron `job_max_attempts` se marcan como fallidos.
+
+    Args:
+        db: Sesión de base de datos
+        stale_after_seconds: Antigüedad del heartbeat para considerar
+            muerto al worker (default: settings.job_stale_after_seconds)
+
+    Returns:
+        Número de jobs recuperados o marcados como fallidos
+    """
+    seconds = stale_after_seconds or settings.job_stale_after_seconds
+    cutoff = _now() - timedelta(seconds=seconds)
+    stmt = (
+        select(Job)
+        .where(Job.status == JobStatus.RUNNING, Job.heartbeat_at < cutoff)
+        .with_for_update(skip_locked=True)
+    )
+    stale = list(db.execute(stmt).scalars())
+    for job in stale:
+        logger.warning(f"⚠️ Job {job.kind} ({job.id[:8]}...) sin heartbeat de {job.locked_by}")
+        job.locked_by = None
+        if job.attempts >= settings.job_max_attempts:
+            job.status = JobStatus.FAILED
+            job.error = "El worker dejó de responder"
+            job.finished_at = _now()
+        else:
+            job.status = JobStatus.QUEUED
+    db.commit()
+    return len(stale)
+
+
+def _finish(
+    session_factory: SessionFactory,
+    job_id: str,
+    worker_id: str | None,
+    status: JobStatus,
+    result: dict[str, Any] | None = None,
+    error: str | None = None,
+) -> bool:
+    """Guarda el estado final si el job sigue tomado por `worker_id`."""
+    values: dict[str, Any] = {
+        "status": status,
+        "error": error,
+        "locked_by": None,
+        "finished_at": _now(),
+        "heartbeat_at": _now(),
+    }
+    if result is not None:
+        values["result"] = result
+    with session_factory() as db:
+        updated = db.execute(
+            update(Job).where(Job.id == job_id, Job.locked_by == worker_id).values(**values)
+        )
+        db.commit()
+    if updated.rowcount == 0:
+        logger.warning(
+            f"⚠️ Job {job_id[:8]}... ya no es de {worker_id}: se descarta su resultado ({status})"
+        )
+        return False
+    return True
+
+
+def run_job(job_id: str, session_factory: SessionFactory = SessionLocal) -> JobStatus:
+    """
+    Corre el handler de un job ya tomado y guarda el resultado.
+
+    Mientras corre el handler, un hilo renueva el heartbeat del job. Si
+    otro worker lo retomó entretanto, el resultado se descarta.
+
+    Args:
+        job_id: ID del job (en estado RUNNING)
+        session_factory: Fábrica de sesiones
+
+    Returns:
+        Estado final del job (el que alcanzó este worker)
+    """
+    progress = JobProgress(job_id, session_factory)
+    with session_factory() as db:
+        job = db.get(Job, job_id)
+        if job is None:
+            logger.warning(f"Job no encontrado: {job_id}")
+            return JobStatus.FAILED
+
+        kind = job.kind
+        worker_id = job.locked_by
+        handler = _handlers.get(kind)
+        if handler is None:
+            _finish(
+                session_factory, job_id, worker_id, JobStatus.FAILED, error=f"Sin handler: {kind}"
+            )
+            return JobStatus.FAILED
+
+        started = time.perf_counter()
+        try:
+            with _Heartbeat(job_id, worker_id, session_factory):
+                result = handler(db, job, progress)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Job {kind} ({job_id[:8]}...) falló: {e}")
+            progress.flush()
+            _finish(session_factory, job_id, worker_id, JobStatus.FAILED, error=str(e))
+            return JobStatus.FAILED
+
+    progress.flush()
+    if _finish(session_factory, job_id, worker_id, JobStatus.SUCCEEDED, result=result):
+        logger.info(f"✅ Job {kind} ({job_id[:8]}...) en {time.perf_counter() - started:.1f}s")
+    return JobStatus.SUCCEEDED
+
+
+class JobWorker:
+    """Toma y corre jobs de la cola hasta que se le pide parar."""
+
+    def __init__(
+        self,
+        session_factory: SessionFactory = SessionLocal,
+        worker_id: str | None = None,
+        poll_interval_seconds: float | None = None,
+    ) -> None:
+        """
+        Args:
+            session_factory: Fábrica de sesiones
+            worker_id: Identificador del worker (default: host:pid:aleatorio)
+            poll_interval_seconds: Espera con la cola vacía
+                (default: settings.job_poll_interval_seconds)
+        """
+        self.session_factory = session_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        self.poll_interval_seconds = poll_interval_seconds or settings.job_poll_interval_seconds
+        self._last_reap = float("-inf")
+
+    def run_once(self) -> bool:
+        """
+        Toma y corre un job.
+
+        Returns:
+            True si había un job en cola
+        """
+        with self.session_factory() as db:
+            # Revisar heartbeats cada tanto, no en cada consulta
+            if time.monotonic() - self._last_reap >= settings.job_stale_after_seconds / 4:
+                requeue_stale_jobs(db)
+                self._last_reap = time.monotonic()
+            job = claim_next_job(db, self.worker_id)
+            if job is None:
+                return False
+            job_id = job.id
+        run_job(job_id, self.session_factory)
+        return True
+
+    def run_forever(self, stop: threading.Event) -> None:
+        """Procesa jobs hasta que `stop` se activa."""
+        logger.info(f"🔄 Job worker {self.worker_id} iniciado")
+        while not stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                logger.error(f"Error en job worker: {e}")
+            stop.wait(self.poll_interval_seconds)
+        logger.info(f"🛑 Job worker {self.worker_id} detenido")
+
+
+_worker_thread: threading.Thread | None = None
+_shutdown_flag = threading.Event()
+
+
+def start_job_worker() -> None:
+    """Inicia un worker de jobs en un thread de la API."""
+    global _worker_thread
+
+    if _worker_thread is not None and _worker_thread.is_alive():
+        logger.debug("Job worker ya está corriendo")
+        return
+
+    _shutdown_flag.clear()
+    _worker_thread = threading.Thread(
+        target=JobWorker().run_forever, args=(_shutdown_flag,), daemon=True, name="job-worker"
+    )
+    _worker_thread.start()
+
+
+def stop_job_worker() -> None:
+    """Detiene el worker de jobs de la API (el job en curso termina primero)."""
+    global _worker_thread
+
+    if _worker_thread is None:
+        return
+
+    _shutdown_flag.set()
+    _worker_thread.join(timeout=5.0)
+    _worker_thread = None
+
+
+# ============================================================================
+# Handlers
+# ============================================================================
+
+
+@job_handler(EMBEDDINGS_GENERATE)
+def _generate_embeddings(db: Session, job: Job, progress: JobProgress) -> dict[str, Any]:
+    """Embeddings de las transacciones pendientes de un perfil."""
+    from finanzas_tracker.services.embedding_service import EmbeddingService
+
+    service = EmbeddingService(db)
+    count = service.embed_pending_transactions(
+        profile_id=job.profile_id,
+        batch_size=job.params.get("batch_size", 32),
+        on_progress=lambda done, total: progress.update(done, total, "Generando embeddings"),
+    )
+    return {"generated": count, "model": service.model_name}
+
+
+@job_handler(STATEMENTS_PROCESS_ALL)
+def _process_all_statements(db: Session, job: Job, progress: JobProgress) -> dict[str, Any]:
+    """Estados de cuenta pendientes del correo."""
+    from finanzas_tracker.services.statement_email_service import StatementEmailService
+
+    if job.profile_id is None:
+        raise ValueError("El job no tiene perfil")
+
+    service = StatementEmailService()
+    progress.update(message="Buscando estados de cuenta")
+    results = service.process_all_pending(
+        profile_id=job.profile_id,
+        days_back=job.params.get("days_back", 30),
+        save_pdfs=job.params.get("save_pdfs", True),
+        on_progress=lambda done, total: progress.update(done, total, "Procesando estados"),
+    )
+    return {
+        "total_encontrados": len(results),
+        "procesados_exitosos": sum(1 for r in results if r.error is None),
+        "procesados_fallidos": sum(1 for r in results if r.error is not None),
+        "detalles": [r.to_summary() for r in results],
+        "tiempos": (service.last_pipeline_stats.to_dict() if service.last_pipeline_stats else None),
+    }
+
+
+@job_handler(ONBOARDING)
+def _auto_discover_onboarding(db: Session, job: Job, progress: JobProgress) -> dict[str, Any]:
+    """Onboarding automático desde el correo (el estado vive en el mismo job)."""
+    from finanzas_tracker.services.onboarding_service import OnboardingService
+
+    if job.user_id is None or job.profile_id is None:
+        raise ValueError("El job de onboarding necesita usuario y perfil")
+
+    service = OnboardingService(db, session_factory=progress.session_factory)
+    state = service.auto_discover_from_email(
+        user_id=job.user_id,
+        profile_id=job.profile_id,
+        max_days_back=job.params.get("max_days_back", 31),
+        progress=progress,
+    )
+    return state.to_snapshot()
+
+
+@job_handler(FEEDBACK_RECORD_BATCH)
+def _record_feedback_batch(db: Session, job: Job, progress: JobProgress) -> dict[str, Any]:
+    """Aprendizaje de las categorías asignadas en una actualización por lotes."""
+    from finanzas_tracker.services.feedback_service import FeedbackService
+
+    correcciones = job.params.get("correcciones", [])
+    progress.update(0, len(correcciones), "Registrando correcciones")
+    registradas = FeedbackService(db).record_corrections(correcciones, profile_id=job.profile_id)
+    return {"registradas": registradas}
+
+
+def main() -> None:
+    """Corre un worker de jobs como proceso aparte (Ctrl+C para detenerlo)."""
+    stop = threading.Event()
+    try:
+        JobWorker().run_forever(stop)
+    except KeyboardInterrupt:
+        stop.set()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,15 +15,22 @@ __all__ = ["LocalEmbeddingService", "local_embedding_service"]
 
 import logging
 from functools import lru_cache
-from typing import Any
+import threading
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from finanzas_tracker.config.settings import settings
 from finanzas_tracker.core.database import get_session
 from finanzas_tracker.models.embedding import TransactionEmbedding
+from finanzas_tracker.services.embedding_backends import load_sentence_transformer
+
+
+if TYPE_CHECKING:
+    # Importar torch/sentence-transformers cuesta segundos: sólo al usar el modelo
+    from sentence_transformers import SentenceTransformer
 
 
 logger = logging.getLogger(__name__)
@@ -49,7 +56,8 @@ class LocalEmbeddingService:
     EMBEDDING_DIM = 384
     
     _instance: "LocalEmbeddingService | None" = None
-    _model: SentenceTransformer | None = None
+    _model: "SentenceTransformer | None" = None
+    _model_lock = threading.Lock()
     
     def __new__(cls) -> "LocalEmbeddingService":
         """Singleton para no cargar el modelo múltiples veces."""
@@ -57,18 +65,23 @@ class LocalEmbeddingService:
             cls._instance = super().__new__(cls)
         return cls._instance
     
-    def __init__(self) -> None:
-        """Inicializa el servicio (carga el modelo la primera vez)."""
-        if LocalEmbeddingService._model is None:
-            logger.info(f"🧠 Cargando modelo de embeddings: {self.MODEL_NAME}")
-            LocalEmbeddingService._model = SentenceTransformer(self.MODEL_NAME)
-            logger.info("✅ Modelo cargado exitosamente")
-    
     @property
-    def model(self) -> SentenceTransformer:
-        """Retorna el modelo cargado."""
+    def model(self) -> "SentenceTransformer":
+        """Retorna el modelo, cargándolo en el primer uso."""
         if LocalEmbeddingService._model is None:
-            raise RuntimeError("Modelo no inicializado")
+            with LocalEmbeddingService._model_lock:
+                if LocalEmbeddingService._model is None:
+                    logger.info(
+                        f"🧠 Cargando modelo de embeddings: {self.MODEL_NAME} "
+                        f"(backend={settings.local_embedding_backend})"
+                    )
+                    LocalEmbeddingService._model = load_sentence_transformer(
+                        self.MODEL_NAME,
+                        backend=settings.local_embedding_backend,
+                        threads=settings.local_embedding_threads,
+                        onnx_file=settings.local_embedding_onnx_file,
+                    )
+                    logger.info("✅ Modelo cargado exitosamente")
         return LocalEmbeddingService._model
     
     @property
@@ -109,7 +122,11 @@ class LocalEmbeddingService:
         # Filtrar textos vacíos
         clean_texts = [t if t and t.strip() else " " for t in texts]
         
-        embeddings = self.model.encode(clean_texts, convert_to_numpy=True, batch_size=32)
+        embeddings = self.model.encode(
+            clean_texts,
+            convert_to_numpy=True,
+            batch_size=settings.local_embedding_batch_size,
+        )
         return embeddings.tolist()
     
     def similarity(self, text1: str, text2: str) -> float:
@@ -327,5 +344,5 @@ class LocalEmbeddingService:
         return stats
 
 
-# Singleton global
+# Singleton global: crearlo es barato, el modelo se carga en el primer embed
 local_embedding_service = LocalEmbeddingService()
@@ -24,6 +24,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.services.merchant_normalizer import INTELIGENCIA
 
 
 logger = get_logger(__name__)
@@ -394,27 +395,8 @@ class MerchantIntelligenceService:
         )
     
     def _normalize_merchant_name(self, name: str) -> str:
-        """Normaliza el nombre del comercio para búsqueda."""
-        # Limpiar y normalizar
-        normalized = name.lower().strip()
-        
-        # Remover caracteres especiales comunes en nombres de comercios
-        normalized = re.sub(r'[*\-_#@!$%^&()+=\[\]{}|\\:";\'<>,.?/]', ' ', normalized)
-        
-        # Remover números de sucursal, fechas, etc.
-        normalized = re.sub(r'\b\d{2,}\b', '', normalized)  # Números de 2+ dígitos
-        normalized = re.sub(r'\b(sucursal|suc|tienda|store)\b', '', normalized)
-        
-        # Remover ubicaciones comunes
-        locations = ['tres rios', 'san jose', 'heredia', 'cartago', 'alajuela', 
-                     'escazu', 'curridabat', 'pinares', 'ayarco', 'america free']
-        for loc in locations:
-            normalized = normalized.replace(loc, '')
-        
-        # Colapsar espacios múltiples
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
-        
-        return normalized
+        """Normaliza el nombre del comercio para búsqueda (ver `merchant_normalizer`)."""
+        return INTELIGENCIA(name)
     
     def _search_local_database(self, merchant_normalized: str) -> MerchantIntelligence | None:
         """Busca en la base de datos local de comercios conocidos."""
@@ -19,17 +19,29 @@ __all__ = [
 
 import logging
 import re
+from collections.abc import Iterable
 from dataclasses import dataclass
-from typing import cast
 from uuid import uuid4
 
 import anthropic
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.config.settings import settings
-from finanzas_tracker.core.claude_credits import can_use_claude, handle_claude_error
+from finanzas_tracker.core.claude_client import (
+    ClaudeClient,
+    pooled_http_client,
+    response_text,
+)
+from finanzas_tracker.core.claude_credits import (
+    ClaudeServiceUnavailable,
+    can_use_claude,
+    handle_claude_error,
+)
+from finanzas_tracker.core.claude_limits import run_fan_out
 from finanzas_tracker.core.retry import retry_on_anthropic_error
 from finanzas_tracker.models.merchant import Merchant
+from finanzas_tracker.services.text_search import ranked
 
 
 logger = logging.getLogger(__name__)
@@ -120,7 +132,10 @@ Responde solo en JSON válido."""
     def __init__(self, db: Session) -> None:
         """Inicializa el servicio."""
         self.db = db
-        self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        self.client = anthropic.Anthropic(
+            api_key=settings.anthropic_api_key, http_client=pooled_http_client()
+        )
+        self.claude = ClaudeClient(self.client)
         self.model = settings.claude_model
 
     def buscar_o_identificar(
@@ -155,6 +170,57 @@ Responde solo en JSON válido."""
         
         return info
 
+    def buscar_o_identificar_many(
+        self,
+        nombres_raw: Iterable[str],
+    ) -> dict[str, MerchantInfo | None]:
+        """
+        Versión batch de `buscar_o_identificar`.
+
+        La BD se consulta y se actualiza en este hilo (la Session no es
+        thread-safe); sólo las llamadas a Claude de los comercios que no
+        están en la BD van en paralelo, una por nombre limpio distinto.
+
+        Args:
+            nombres_raw: Nombres de comercios como vienen del banco
+
+        Returns:
+            nombre_raw -> MerchantInfo (None si el nombre no es válido)
+        """
+        resultados: dict[str, MerchantInfo | None] = {}
+        pendientes: dict[str, str] = {}  # nombre_raw -> nombre_limpio
+
+        # 1. Buscar en BD
+        for nombre_raw in nombres_raw:
+            if nombre_raw in resultados or nombre_raw in pendientes:
+                continue
+            if not nombre_raw or len(nombre_raw.strip()) < 2:
+                resultados[nombre_raw] = None
+                continue
+            nombre_limpio = self._limpiar_nombre(nombre_raw)
+            merchant = self._buscar_en_bd(nombre_limpio)
+            if merchant:
+                resultados[nombre_raw] = self._merchant_a_info(merchant)
+            else:
+                pendientes[nombre_raw] = nombre_limpio
+
+        # 2. Identificar con Claude en paralelo
+        por_limpio = {limpio: raw for raw, limpio in pendientes.items()}
+        infos = run_fan_out(
+            lambda limpio: self._identificar_con_claude(por_limpio[limpio], limpio),
+            por_limpio,
+        )
+        identificados = dict(zip(por_limpio, infos, strict=True))
+
+        # 3. Guardar los de buena confianza
+        for info in identificados.values():
+            if info and info.confianza >= 0.70:
+                self._guardar_en_bd(info)
+
+        for nombre_raw, nombre_limpio in pendientes.items():
+            resultados[nombre_raw] = identificados[nombre_limpio]
+        return resultados
+
     def _limpiar_nombre(self, nombre: str) -> str:
         """Limpia el nombre del comercio para búsqueda."""
         # Quitar números de sucursal
@@ -175,12 +241,9 @@ Responde solo en JSON válido."""
         if merchant:
             return merchant
         
-        # Buscar parcial
-        merchant = self.db.query(Merchant).filter(
-            Merchant.nombre_normalizado.ilike(f"%{nombre}%")
-        ).first()
-        
-        return merchant
+        # Buscar parcial: el más parecido (índice de trigramas)
+        stmt = ranked(select(Merchant), [Merchant.nombre_normalizado], nombre, limit=1)
+        return self.db.execute(stmt).scalars().first()
 
     @retry_on_anthropic_error(max_attempts=2, max_wait=8)
     def _identificar_con_claude(
@@ -202,23 +265,28 @@ Nombre limpio: {nombre_limpio}
 
 Responde SOLO con el JSON, sin explicación adicional."""
 
-            response = self.client.messages.create(
+            # SYSTEM_PROMPT (categorías y comercios de CR) va cacheado
+            response = self.claude.create(
+                call_site="merchant_lookup.identify",
+                system=self.SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": prompt}],
                 model=self.model,
                 max_tokens=512,
                 temperature=0.2,
-                system=self.SYSTEM_PROMPT,
-                messages=[{"role": "user", "content": prompt}],
             )
             
-            first_block = response.content[0]
-            if not hasattr(first_block, "text"):
+            text = response_text(response)
+            if not text:
                 return self._info_por_defecto(nombre_limpio)
             
-            return self._parse_respuesta_claude(cast(str, first_block.text), nombre_limpio)
+            return self._parse_respuesta_claude(text, nombre_limpio)
             
         except anthropic.APIStatusError as e:
             handle_claude_error(e)
             return self._info_por_defecto(nombre_limpio)
+        except ClaudeServiceUnavailable as e:
+            logger.info(f"⏭️ Identificación con Claude omitida: {e.message}")
+            return self._info_por_defecto(nombre_limpio)
         except Exception as e:
             logger.error(f"Error identificando comercio: {e}")
             return self._info_por_defecto(nombre_limpio)
@@ -0,0 +1,221 @@
+"""
+Motor compartido de normalización de nombres de comercio.
+
+Cada servicio normalizaba el texto del comercio con su propia cadena de
+`re.sub` (el categorizador incluso compilaba un regex por palabra de ruido
+en cada llamada). Aquí cada variante es un `MerchantNormalizer` con:
+
+    - una tabla de traducción (`str.translate`) para los caracteres sueltos,
+    - pocas pasadas de regex precompilados, con las listas de palabras de
+      ruido delimitadas por `\\b` combinadas en una sola alternancia,
+    - un memo LRU por texto crudo (los comercios se repiten muchísimo),
+    - `normalize_many` para normalizar lotes, resolviendo una vez cada
+      texto distinto.
+
+Las variantes conservan la semántica de cada servicio (mayúsculas o
+minúsculas, qué se elimina), porque sus resultados ya están guardados como
+claves (patrones aprendidos, merchants, agrupaciones).
+
+Ejemplo:
+    >>> SUSCRIPCIONES("NETFLIX.COM ***1234 SAN JOSE")
+    'NETFLIX.COM'
+    >>> SUSCRIPCIONES.normalize_many(["Spotify", "SPOTIFY 123456789"])
+    ['SPOTIFY', 'SPOTIFY']
+"""
+
+__all__ = [
+    "APRENDIZAJE",
+    "CATALOGO",
+    "CATEGORIZACION",
+    "INTELIGENCIA",
+    "RECURRENTES",
+    "SUSCRIPCIONES",
+    "MerchantNormalizer",
+]
+
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+import re
+import string
+import unicodedata
+
+
+def _alternancia(palabras: Sequence[str]) -> str:
+    """Alternancia regex de palabras literales, las más largas primero."""
+    return "|".join(re.escape(p) for p in sorted(palabras, key=len, reverse=True))
+
+
+def _quitar_en_orden(palabras: Sequence[str]) -> list[tuple[str, str]]:
+    """
+    Un paso por palabra, en orden, como el `str.replace` en bucle anterior.
+
+    Sin `\\b` una alternancia no es equivalente: quitar una palabra puede
+    unir los pedazos de otra ("SUCCENTRO COMERCIAL" → "SUC", pero la
+    alternancia quita primero "CC" y deja "SUENTRO COMERCIAL").
+
+    Args:
+        palabras: Subcadenas a eliminar, en el orden original
+
+    Returns:
+        Pasos (patrón, reemplazo) para `MerchantNormalizer`
+    """
+    return [(re.escape(palabra), "") for palabra in palabras]
+
+
+class MerchantNormalizer:
+    """
+    Normalizador precompilado y memoizado de nombres de comercio.
+
+    El texto pasa, en orden, por: mayúsculas o minúsculas, quitar acentos
+    (opcional), la tabla de traducción, los regex de `pasos`, el colapso de
+    espacios y `title()` (opcional).
+    """
+
+    def __init__(
+        self,
+        pasos: Sequence[tuple[str, str]] = (),
+        *,
+        mayusculas: bool = True,
+        tabla: dict[int, str] | None = None,
+        sin_acentos: bool = False,
+        titulo: bool = False,
+        maxsize: int = 8192,
+    ) -> None:
+        """
+        Compila los pasos del normalizador.
+
+        Args:
+            pasos: (patrón, reemplazo) aplicados en orden con `re.sub`
+            mayusculas: Convertir a mayúsculas (True) o a minúsculas (False)
+            tabla: Tabla de `str.translate` aplicada antes de los pasos
+            sin_acentos: Quitar acentos y diacríticos (NFD)
+            titulo: Capitalizar cada palabra del resultado
+            maxsize: Textos distintos memoizados
+        """
+        self._pasos = tuple((re.compile(patron), reemplazo) for patron, reemplazo in pasos)
+        self._mayusculas = mayusculas
+        self._tabla = tabla
+        self._sin_acentos = sin_acentos
+        self._titulo = titulo
+        self._memo = lru_cache(maxsize=maxsize)(self._normalizar)
+
+    def __call__(self, texto: str | None) -> str:
+        """
+        Normaliza un nombre de comercio.
+
+        Args:
+            texto: Nombre crudo (None o vacío → "")
+
+        Returns:
+            Nombre normalizado
+        """
+        if not texto:
+            return ""
+        return self._memo(texto)
+
+    def normalize_many(self, textos: Iterable[str | None]) -> list[str]:
+        """
+        Normaliza un lote, calculando una sola vez cada texto distinto.
+
+        Args:
+            textos: Nombres crudos
+
+        Returns:
+            Nombres normalizados, en el mismo orden
+        """
+        textos = list(textos)
+        resultados = {texto: self(texto) for texto in dict.fromkeys(textos)}
+        return [resultados[texto] for texto in textos]
+
+    def cache_info(self) -> tuple[int, int, int | None, int]:
+        """Estadísticas del memo: (hits, misses, maxsize, currsize)."""
+        return self._memo.cache_info()
+
+    def cache_clear(self) -> None:
+        """Vacía el memo."""
+        self._memo.cache_clear()
+
+    def _normalizar(self, texto: str) -> str:
+        texto = texto.upper() if self._mayusculas else texto.lower()
+        if self._sin_acentos and not texto.isascii():
+            # Las marcas combinantes (Mn) no son alfanuméricas: el paso que
+            # deja solo letras, dígitos y espacios las elimina
+            texto = unicodedata.normalize("NFD", texto)
+        if self._tabla is not None:
+            texto = texto.translate(self._tabla)
+        for patron, reemplazo in self._pasos:
+            texto = patron.sub(reemplazo, texto)
+        texto = " ".join(texto.split())
+        return texto.title() if self._titulo else texto
+
+
+# SmartCategorizer: minúsculas, sin signos, sin códigos de referencia
+# (8+ caracteres mezclando letras y dígitos, pero no marcas como "bet365")
+# ni términos bancarios o de ubicación. Los signos se vuelven espacios antes
+# de buscar el ruido ("SAN-JOSE" → "san jose"); el regex sólo barre los
+# signos no ASCII que la tabla no cubre.
+_SIGNOS = "".join(c for c in string.punctuation if c != "_")
+_RUIDO_CATEGORIZACION = (
+    "san jose", "costa rica", "heredia", "alajuela", "cartago",
+    "www", "http", "https", "com", "net", "org",
+    "sucursal", "agencia", "tienda", "local",
+    "debit", "credit", "visa", "mastercard", "amex",
+    "pos", "tpv", "pin",
+)  # fmt: skip
+CATEGORIZACION = MerchantNormalizer(
+    [
+        (
+            r"[^\w\s]|\b(?:(?=[a-z]*\d)(?=\d*[a-z])[a-z0-9]{8,}|"
+            + _alternancia(_RUIDO_CATEGORIZACION)
+            + r")\b",
+            " ",
+        ),
+    ],
+    mayusculas=False,
+    tabla=str.maketrans(dict.fromkeys(_SIGNOS, " ")),
+)
+
+# MerchantNormalizationService: "SUBWAY MOMENTUM" → "Subway"
+_RUIDO_CATALOGO = (
+    "MOMENTUM", "AMERICA FREE ZO", "SUPERCENTER", "ESCAZU", "SAN JOSE",
+    "HEREDIA", "CARTAGO", "ALAJUELA", "ZONA FRANCA", "MALL", "PLAZA",
+    "CENTRO COMERCIAL", "CC",
+)  # fmt: skip
+CATALOGO = MerchantNormalizer(
+    [*_quitar_en_orden(_RUIDO_CATALOGO), (r"[^\w\s]", " ")],
+    titulo=True,
+)
+
+# SubscriptionDetector: agrupa cobros del mismo servicio
+SUSCRIPCIONES = MerchantNormalizer(
+    [
+        (r"\d{6,}", ""),  # Números de referencia largos
+        (r"\*+\d+|#\d+", ""),  # ***1234, #12345
+        (r"\s+(?:SAN JOSE|HEREDIA|ALAJUELA|CARTAGO|CR|CRI|COSTA RICA)\b", ""),
+    ]
+)
+
+# RecurringExpensePredictor: agrupa gastos recurrentes
+RECURRENTES = MerchantNormalizer(
+    [
+        (r"\d{6,}", ""),  # Números de referencia largos
+        (r"\*{3}\d{4}", ""),  # Últimos 4 dígitos de tarjeta
+    ]
+)
+
+# MerchantIntelligenceService: clave de búsqueda en la base de comercios
+_UBICACIONES_INTELIGENCIA = (
+    "tres rios", "san jose", "heredia", "cartago", "alajuela",
+    "escazu", "curridabat", "pinares", "ayarco", "america free",
+)  # fmt: skip
+INTELIGENCIA = MerchantNormalizer(
+    [
+        (r"\b\d{2,}\b|\b(?:sucursal|suc|tienda|store)\b", ""),  # Sucursales, fechas
+        *_quitar_en_orden(_UBICACIONES_INTELIGENCIA),
+    ],
+    mayusculas=False,
+    tabla=str.maketrans(dict.fromkeys("*-_#@!$%^&()+=[]{}|\\:\";'<>,.?/", " ")),
+)
+
+# SmartLearningService: mayúsculas, sin acentos, solo letras, dígitos y espacios
+APRENDIZAJE = MerchantNormalizer([(r"[^\w\s]|_", "")], sin_acentos=True)
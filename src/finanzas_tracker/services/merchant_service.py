@@ -1,16 +1,63 @@
 """Servicio de normalización de comercios (merchants)."""
 
+from collections.abc import Iterable, Mapping
 from decimal import Decimal
-import re
-
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import (
+    CompoundSelect,
+    Insert,
+    Select,
+    String,
+    cast,
+    delete,
+    event,
+    null,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from finanzas_tracker.core.cache import invalidate_merchant_cache, merchant_cache
 from finanzas_tracker.core.logging import get_logger
 from finanzas_tracker.models.merchant import Merchant, MerchantVariant
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services.merchant_normalizer import CATALOGO
 
 
 logger = get_logger(__name__)
 
+# Clave de session.info con los IDs resueltos que se cachean al hacer commit
+_PENDIENTES = "merchant_cache_pendientes"
+
+
+def _insert_ignore(model: Any, unique_column: str) -> Insert:
+    """INSERT ... ON CONFLICT (unique_column) DO NOTHING."""
+    # Sobre la tabla (Core): un solo executemany aunque algunas filas traigan None
+    return pg_insert(model.__table__).on_conflict_do_nothing(index_elements=[unique_column])
+
+
+def _cache_on_commit(session: Session, resolved: Mapping[str, str]) -> None:
+    """Cachea nombre raw -> merchant_id cuando la sesión haga commit."""
+    if not resolved:
+        return
+    session.info.setdefault(_PENDIENTES, {}).update(resolved)
+    if not event.contains(session, "after_commit", _after_commit):
+        event.listen(session, "after_commit", _after_commit)
+        event.listen(session, "after_rollback", _after_rollback)
+
+
+def _after_commit(session: Session) -> None:
+    for raw_name, merchant_id in session.info.pop(_PENDIENTES, {}).items():
+        merchant_cache.set(f"raw:{raw_name}", merchant_id)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDIENTES, None)
+
 
 class MerchantNormalizationService:
     """
@@ -20,29 +67,6 @@ class MerchantNormalizationService:
     Crea/actualiza MerchantVariant automáticamente
     """
 
-    # Palabras comunes a remover para normalización
-    NOISE_WORDS = [
-        "MOMENTUM",
-        "AMERICA FREE ZO",
-        "SUPERCENTER",
-        "ESCAZU",
-        "SAN JOSE",
-        "HEREDIA",
-        "CARTAGO",
-        "ALAJUELA",
-        "ZONA FRANCA",
-        "MALL",
-        "PLAZA",
-        "CENTRO COMERCIAL",
-        "CC",
-    ]
-
-    # Patrones para limpieza
-    CLEANUP_PATTERNS = [
-        r"\s+",  # Múltiples espacios → uno solo
-        r"[^\w\s]",  # Caracteres especiales
-    ]
-
     def __init__(self) -> None:
         """Inicializa el servicio."""
 
@@ -50,6 +74,8 @@ class MerchantNormalizationService:
         """
         Normaliza el nombre del comercio removiendo noise words y limpiando.
 
+        Usa el normalizador `CATALOGO` (ver `merchant_normalizer`).
+
         Args:
             raw_name: Nombre como aparece en el correo (ej: "SUBWAY MOMENTUM")
 
@@ -63,22 +89,7 @@ class MerchantNormalizationService:
             >>> service.normalize_merchant_name("WALMART SUPERCENTER")
             'Walmart'
         """
-        # Convertir a mayúsculas para comparación
-        normalized = raw_name.upper().strip()
-
-        # Remover noise words
-        for noise in self.NOISE_WORDS:
-            normalized = normalized.replace(noise, "")
-
-        # Limpiar caracteres especiales
-        for pattern in self.CLEANUP_PATTERNS:
-            normalized = re.sub(pattern, " ", normalized)
-
-        # Limpiar espacios extras
-        normalized = " ".join(normalized.split())
-
-        # Capitalizar primera letra de cada palabra
-        return normalized.title()
+        return CATALOGO(raw_name)
 
     def find_or_create_merchant(
         self,
@@ -100,86 +111,204 @@ class MerchantNormalizationService:
             Merchant encontrado o creado
 
         Process:
-            1. Busca si existe un MerchantVariant con ese nombre raw → retorna el Merchant
-            2. Si no, normaliza el nombre
-            3. Busca si existe un Merchant con ese nombre normalizado → retorna
-            4. Si no, crea nuevo Merchant + MerchantVariant
+            Igual que `resolve_many` con un solo nombre.
         """
-        # 1. Buscar por nombre raw exacto
-        variant = (
-            session.query(MerchantVariant).filter(MerchantVariant.nombre_raw == raw_name).first()
-        )
+        merchant_id = self.resolve_many(session, [raw_name], {raw_name: (ciudad, pais)})[raw_name]
+        merchant = session.get(Merchant, merchant_id)
+        if merchant is None:
+            # El cache apuntaba a un merchant fusionado en otro proceso
+            invalidate_merchant_cache([raw_name])
+            return self.find_or_create_merchant(session, raw_name, ciudad, pais)
+        return merchant
+
+    def lookup_many(self, session: Session, raw_names: Iterable[str]) -> dict[str, str]:
+        """
+        Resuelve nombres raw a merchant_id sin crear nada.
 
-        if variant:
-            logger.debug(f"Merchant encontrado por variante: {variant.merchant.nombre_normalizado}")
-            merchant: Merchant = variant.merchant
-            return merchant
+        Usa el cache de comercios (`merchant_cache`) y una consulta `IN` sobre
+        las variantes para el resto. Esa misma consulta verifica que los
+        merchants cacheados sigan existiendo (otro proceso pudo fusionarlos o
+        borrarlos); los que ya no existen salen del cache y se releen.
 
-        # 2. Normalizar nombre
-        nombre_normalizado = self.normalize_merchant_name(raw_name)
+        Args:
+            session: Sesión de SQLAlchemy
+            raw_names: Nombres como aparecen en los correos
 
-        # 3. Buscar por nombre normalizado
-        merchant_by_name = (
-            session.query(Merchant)
-            .filter(Merchant.nombre_normalizado == nombre_normalizado)
-            .first()
+        Returns:
+            nombre raw -> merchant_id, sólo de los nombres con variante
+        """
+        resolved: dict[str, str] = {}
+        missing: list[str] = []
+        for raw_name in dict.fromkeys(raw_names):
+            merchant_id = merchant_cache.get(f"raw:{raw_name}")
+            if merchant_id is None:
+                missing.append(raw_name)
+            else:
+                resolved[raw_name] = merchant_id
+
+        if not missing:
+            return resolved
+
+        stmt: Select[Any] | CompoundSelect = self._variants_stmt(missing)
+        if resolved:
+            # Filas (NULL, id) para los merchants cacheados que siguen existiendo
+            stmt = union_all(
+                stmt,
+                select(cast(null(), String), Merchant.id).where(
+                    Merchant.id.in_(set(resolved.values()))
+                ),
+            )
+        rows = session.execute(stmt).tuples().all()
+        found = {raw_name: merchant_id for raw_name, merchant_id in rows if raw_name is not None}
+        existing = {merchant_id for raw_name, merchant_id in rows if raw_name is None}
+
+        stale = [raw for raw, merchant_id in resolved.items() if merchant_id not in existing]
+        if stale:
+            logger.debug(f"{len(stale)} merchants cacheados ya no existen")
+            invalidate_merchant_cache(stale)
+            for raw_name in stale:
+                del resolved[raw_name]
+            found.update(session.execute(self._variants_stmt(stale)).tuples().all())
+
+        resolved.update(found)
+        _cache_on_commit(session, found)
+        return resolved
+
+    @staticmethod
+    def _variants_stmt(raw_names: list[str]) -> Select[tuple[str | None, str]]:
+        """nombre raw -> merchant_id de las variantes existentes."""
+        return select(MerchantVariant.nombre_raw, MerchantVariant.merchant_id).where(
+            MerchantVariant.nombre_raw.in_(raw_names)
         )
 
-        if merchant_by_name:
-            logger.debug(f"Merchant encontrado por nombre normalizado: {nombre_normalizado}")
+    def resolve_many(
+        self,
+        session: Session,
+        raw_names: Iterable[str],
+        ubicaciones: Mapping[str, tuple[str | None, str]] | None = None,
+    ) -> dict[str, str]:
+        """
+        Busca o crea los merchants de un lote de nombres raw.
 
-            # Crear nueva variante si no existe
-            self._create_variant(session, merchant_by_name, raw_name, ciudad, pais)
+        Cada nombre distinto se resuelve una sola vez, con consultas por
+        lote en lugar de por transacción:
 
-            return merchant_by_name
+            1. Cache de comercios y variantes existentes (`lookup_many`)
+            2. Merchants por nombre normalizado (una consulta `IN`)
+            3. Merchants y variantes faltantes: un INSERT por tabla con
+               ON CONFLICT DO NOTHING sobre la clave única, así un import
+               concurrente no falla; después se releen los IDs ganadores
 
-        # 4. Crear nuevo merchant + variante
-        logger.info(f"Creando nuevo merchant: {nombre_normalizado} (raw: {raw_name})")
+        Los IDs entran al cache cuando la sesión hace commit (un rollback no
+        deja IDs de merchants que no existen).
+
+        Args:
+            session: Sesión de SQLAlchemy
+            raw_names: Nombres como aparecen en los correos
+            ubicaciones: nombre raw -> (ciudad, país) para las variantes nuevas
+                (default: sin ciudad, Costa Rica)
 
-        new_merchant = Merchant(
-            nombre_normalizado=nombre_normalizado,
-            categoria_principal="Sin categorizar",
-            tipo_negocio="retail",
+        Returns:
+            nombre raw -> merchant_id para todos los nombres
+        """
+        raw_names = list(dict.fromkeys(raw_names))
+        resolved = self.lookup_many(session, raw_names)
+        pending = [raw_name for raw_name in raw_names if raw_name not in resolved]
+        if not pending:
+            return resolved
+
+        normalized = dict(zip(pending, CATALOGO.normalize_many(pending), strict=True))
+        by_name = self._merchants_by_name(session, set(normalized.values()))
+
+        new_names = sorted(set(normalized.values()) - by_name.keys())
+        if new_names:
+            logger.info(f"Creando {len(new_names)} merchants nuevos")
+            session.execute(
+                _insert_ignore(Merchant, "nombre_normalizado"),
+                [
+                    {
+                        "id": str(uuid4()),
+                        "nombre_normalizado": name,
+                        "categoria_principal": "Sin categorizar",
+                        "tipo_negocio": "retail",
+                    }
+                    for name in new_names
+                ],
+            )
+            by_name.update(self._merchants_by_name(session, set(new_names)))
+
+        ubicaciones = ubicaciones or {}
+        session.execute(
+            _insert_ignore(MerchantVariant, "nombre_raw"),
+            [
+                {
+                    "id": str(uuid4()),
+                    "merchant_id": by_name[normalized[raw_name]],
+                    "nombre_raw": raw_name,
+                    "ciudad": ubicaciones.get(raw_name, (None, "Costa Rica"))[0],
+                    "pais": ubicaciones.get(raw_name, (None, "Costa Rica"))[1],
+                    "confianza_match": Decimal("1.0"),  # 100% confianza (match exacto)
+                }
+                for raw_name in pending
+            ],
         )
-        session.add(new_merchant)
-        session.flush()  # Para obtener el ID
+        logger.debug(f"{len(pending)} variantes nuevas de merchants")
 
-        # Crear variante
-        self._create_variant(session, new_merchant, raw_name, ciudad, pais)
+        # Si otro proceso creó la misma variante, manda la suya
+        resolved.update(self.lookup_many(session, pending))
+        return resolved
 
-        return new_merchant
+    def merge_merchants(self, session: Session, source_id: str, target_id: str) -> int:
+        """
+        Fusiona un merchant en otro y borra el original.
 
-    def _create_variant(
-        self,
-        session: Session,
-        merchant: Merchant,
-        raw_name: str,
-        ciudad: str | None,
-        pais: str,
-    ) -> MerchantVariant:
-        """Crea una nueva variante si no existe."""
-        # Verificar que no exista ya
-        existing = (
-            session.query(MerchantVariant).filter(MerchantVariant.nombre_raw == raw_name).first()
-        )
+        Mueve variantes y transacciones a `target_id` e invalida del cache
+        los nombres raw del merchant fusionado.
 
-        if existing:
-            existing_variant: MerchantVariant = existing
-            return existing_variant
+        Args:
+            session: Sesión de SQLAlchemy (el llamador hace commit)
+            source_id: Merchant que desaparece
+            target_id: Merchant que queda
+
+        Returns:
+            Cantidad de variantes movidas
 
-        variant = MerchantVariant(
-            merchant_id=merchant.id,
-            nombre_raw=raw_name,
-            ciudad=ciudad,
-            pais=pais,
-            confianza_match=Decimal("1.0"),  # 100% confianza (match exacto)
+        Raises:
+            ValueError: Si source_id y target_id son el mismo merchant
+        """
+        if source_id == target_id:
+            raise ValueError("No se puede fusionar un merchant consigo mismo")
+
+        raw_names = (
+            session.execute(
+                select(MerchantVariant.nombre_raw).where(MerchantVariant.merchant_id == source_id)
+            )
+            .scalars()
+            .all()
         )
-        session.add(variant)
-        session.flush()
+        session.execute(
+            update(MerchantVariant)
+            .where(MerchantVariant.merchant_id == source_id)
+            .values(merchant_id=target_id)
+        )
+        session.execute(
+            update(Transaction)
+            .where(Transaction.merchant_id == source_id)
+            .values(merchant_id=target_id)
+        )
+        session.execute(delete(Merchant).where(Merchant.id == source_id))
 
-        logger.debug(f"Variante creada: {raw_name} → {merchant.nombre_normalizado}")
+        invalidate_merchant_cache(raw_names)
+        logger.info(f"Merchant {source_id} fusionado en {target_id} ({len(raw_names)} variantes)")
+        return len(raw_names)
 
-        return variant
+    @staticmethod
+    def _merchants_by_name(session: Session, names: set[str]) -> dict[str, str]:
+        """nombre_normalizado -> merchant_id de los nombres que existen."""
+        stmt = select(Merchant.nombre_normalizado, Merchant.id).where(
+            Merchant.nombre_normalizado.in_(names)
+        )
+        return dict(session.execute(stmt).tuples().all())
 
     def update_merchant_metadata(
         self,
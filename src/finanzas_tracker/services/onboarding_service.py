@@ -19,17 +19,17 @@ El presupuesto se sugiere basado en el historial real.
 """
 
 from dataclasses import dataclass, field
-from datetime import date, datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 from enum import Enum
 import logging
 from pathlib import Path
-import tempfile
 from typing import Any
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from finanzas_tracker.core.database import SessionLocal
 from finanzas_tracker.models import (
     Account,
     BillingCycle,
@@ -38,6 +38,8 @@ from finanzas_tracker.models import (
     QuestionType,
     QuestionPriority,
 )
+from finanzas_tracker.models.job import Job, JobStatus
+from finanzas_tracker.services.job_queue import ONBOARDING, JobProgress, SessionFactory
 from finanzas_tracker.models.enums import (
     AccountType,
     BankName,
@@ -49,6 +51,16 @@ from finanzas_tracker.models.enums import (
 logger = logging.getLogger(__name__)
 
 
+def _to_decimal(value: Any) -> Decimal | None:
+    """Decimal desde un valor serializado (None si no hay valor)."""
+    return Decimal(str(value)) if value is not None else None
+
+
+def _decimal_str(value: Decimal | None) -> str | None:
+    """Decimal serializable a JSON sin perder precisión."""
+    return str(value) if value is not None else None
+
+
 class OnboardingStep(str, Enum):
     """Pasos simplificados del onboarding (solo 3 pasos)."""
 
@@ -88,6 +100,18 @@ class DetectedAccount:
             "nombre_sugerido": self.nombre_sugerido,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "DetectedAccount":
+        """Reconstruye la cuenta desde `to_dict`."""
+        return cls(
+            numero_cuenta=data["numero_cuenta"],
+            tipo=AccountType(data["tipo"]),
+            banco=BankName(data["banco"]),
+            saldo=Decimal(str(data["saldo"])),
+            moneda=Currency(data.get("moneda", Currency.CRC.value)),
+            nombre_sugerido=data.get("nombre_sugerido", ""),
+        )
+
 
 @dataclass
 class DetectedCard:
@@ -115,6 +139,20 @@ class DetectedCard:
             "fecha_pago": self.fecha_pago,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "DetectedCard":
+        """Reconstruye la tarjeta desde `to_dict`."""
+        return cls(
+            ultimos_4_digitos=data["ultimos_4_digitos"],
+            marca=data.get("marca"),
+            banco=BankName(data["banco"]),
+            tipo_sugerido=CardType(data["tipo_sugerido"]) if data.get("tipo_sugerido") else None,
+            limite_credito=_to_decimal(data.get("limite_credito")),
+            saldo_actual=_to_decimal(data.get("saldo_actual")),
+            fecha_corte=data.get("fecha_corte"),
+            fecha_pago=data.get("fecha_pago"),
+        )
+
 
 @dataclass
 class OnboardingState:
@@ -153,9 +191,59 @@ class OnboardingState:
     
     created_at: datetime = field(default_factory=datetime.utcnow)
     
-    # Storage para transacciones del PDF
+    # Storage para transacciones del PDF (sólo en memoria, no se persiste)
     pdf_transactions: list[Any] = field(default_factory=list)
 
+    def to_snapshot(self) -> dict[str, Any]:
+        """Serializa el estado para guardarlo en la BD (sin `pdf_transactions`)."""
+        return {
+            "user_id": self.user_id,
+            "profile_id": self.profile_id,
+            "current_step": self.current_step.value,
+            "detected_accounts": [a.to_dict() for a in self.detected_accounts],
+            "detected_cards": [c.to_dict() for c in self.detected_cards],
+            "email_connected": self.email_connected,
+            "pdf_processed": self.pdf_processed,
+            "tiene_estado_cuenta_base": self.tiene_estado_cuenta_base,
+            "datos_tentativos": self.datos_tentativos,
+            "fecha_corte_base": self.fecha_corte_base.isoformat() if self.fecha_corte_base else None,
+            "transactions_count": self.transactions_count,
+            "transactions_nuevas": self.transactions_nuevas,
+            "statements_found": self.statements_found,
+            "statements_processed": self.statements_processed,
+            "preguntas_generadas": self.preguntas_generadas,
+            "saldo_inicial_detectado": _decimal_str(self.saldo_inicial_detectado),
+            "ingresos_mensuales_estimados": _decimal_str(self.ingresos_mensuales_estimados),
+            "gastos_mensuales_promedio": _decimal_str(self.gastos_mensuales_promedio),
+            "created_at": self.created_at.isoformat(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict[str, Any]) -> "OnboardingState":
+        """Reconstruye el estado desde `to_snapshot`."""
+        fecha_corte = data.get("fecha_corte_base")
+        return cls(
+            user_id=data["user_id"],
+            profile_id=data.get("profile_id"),
+            current_step=OnboardingStep(data["current_step"]),
+            detected_accounts=[DetectedAccount.from_dict(a) for a in data.get("detected_accounts", [])],
+            detected_cards=[DetectedCard.from_dict(c) for c in data.get("detected_cards", [])],
+            email_connected=data.get("email_connected", False),
+            pdf_processed=data.get("pdf_processed", False),
+            tiene_estado_cuenta_base=data.get("tiene_estado_cuenta_base", False),
+            datos_tentativos=data.get("datos_tentativos", False),
+            fecha_corte_base=date.fromisoformat(fecha_corte[:10]) if fecha_corte else None,
+            transactions_count=data.get("transactions_count", 0),
+            transactions_nuevas=data.get("transactions_nuevas", 0),
+            statements_found=data.get("statements_found", 0),
+            statements_processed=data.get("statements_processed", 0),
+            preguntas_generadas=data.get("preguntas_generadas", 0),
+            saldo_inicial_detectado=_to_decimal(data.get("saldo_inicial_detectado")),
+            ingresos_mensuales_estimados=_to_decimal(data.get("ingresos_mensuales_estimados")),
+            gastos_mensuales_promedio=_to_decimal(data.get("gastos_mensuales_promedio")),
+            created_at=datetime.fromisoformat(data["created_at"]),
+        )
+
     def to_dict(self) -> dict:
         """Convierte a diccionario para JSON/API."""
         return {
@@ -215,16 +303,67 @@ class OnboardingService:
     - Inveriones, metas, etc. (se configuran después opcionalmente)
     """
 
-    def __init__(self, db: Session) -> None:
-        """Inicializa el servicio."""
+    def __init__(self, db: Session, session_factory: SessionFactory = SessionLocal) -> None:
+        """
+        Inicializa el servicio.
+
+        Args:
+            db: Sesión de base de datos
+            session_factory: Sesiones para guardar el estado del onboarding.
+                El estado vive en la tabla `jobs` (job "onboarding" del
+                usuario) para que cualquier worker de la API lo vea; se
+                escribe con su propia sesión para no mezclarse con la
+                transacción de `db`.
+        """
         self.db = db
-        # Cache temporal de estados de onboarding (en producción usar Redis)
-        self._states: dict[str, OnboardingState] = {}
+        self._session_factory = session_factory
 
     # =========================================================================
     # Estado del Onboarding
     # =========================================================================
 
+    @staticmethod
+    def _latest_job(session: Session, user_id: str) -> Job | None:
+        """Job de onboarding más reciente del usuario."""
+        stmt = (
+            select(Job)
+            .where(Job.kind == ONBOARDING, Job.user_id == user_id)
+            .order_by(Job.created_at.desc())
+            .limit(1)
+        )
+        return session.execute(stmt).scalar_one_or_none()
+
+    def _save_state(self, state: OnboardingState, new: bool = False) -> None:
+        """
+        Guarda el snapshot del estado en el job de onboarding del usuario.
+
+        Args:
+            state: Estado a guardar
+            new: Si True crea un job nuevo (reinicio del onboarding)
+        """
+        with self._session_factory() as session:
+            job = None if new else self._latest_job(session, state.user_id)
+            if job is None:
+                job = self._new_job(state.user_id)
+                session.add(job)
+            job.profile_id = state.profile_id
+            job.result = state.to_snapshot()
+            session.commit()
+
+    @staticmethod
+    def _new_job(user_id: str) -> Job:
+        """Job de onboarding sin importación pendiente (el worker sólo toma jobs en cola)."""
+        return Job(
+            kind=ONBOARDING,
+            status=JobStatus.SUCCEEDED,
+            user_id=user_id,
+            params={},
+            result=OnboardingState(user_id=user_id).to_snapshot(),
+            progress_current=0,
+            attempts=0,
+            created_at=datetime.now(UTC),
+        )
+
     def start_onboarding(self, user_id: str) -> OnboardingState:
         """
         Inicia el proceso de onboarding para un usuario.
@@ -236,22 +375,70 @@ class OnboardingService:
             Estado inicial del onboarding
         """
         state = OnboardingState(user_id=user_id)
-        self._states[user_id] = state
+        self._save_state(state, new=True)
         logger.info(f"Onboarding iniciado para usuario {user_id[:8]}...")
         return state
 
     def get_state(self, user_id: str) -> OnboardingState | None:
         """Obtiene el estado actual del onboarding."""
-        return self._states.get(user_id)
+        with self._session_factory() as session:
+            job = self._latest_job(session, user_id)
+            if job is None or not job.result:
+                return None
+            return OnboardingState.from_snapshot(job.result)
 
     def update_step(self, user_id: str, step: OnboardingStep) -> OnboardingState | None:
         """Actualiza el paso actual del onboarding."""
-        state = self._states.get(user_id)
+        state = self.get_state(user_id)
         if state:
             state.current_step = step
+            self._save_state(state)
             logger.info(f"Onboarding {user_id[:8]}... → {step.value}")
         return state
 
+    def enqueue_auto_discover(
+        self,
+        user_id: str,
+        profile_id: str,
+        max_days_back: int = 31,
+    ) -> Job:
+        """
+        Encola `auto_discover_from_email` para que lo corra un worker.
+
+        Usa el mismo job que guarda el estado, así `GET /jobs/{id}` y
+        `GET /onboarding/{user_id}/status` reportan el mismo avance. Si ya
+        hay una importación en cola o corriendo, retorna ese job.
+
+        Args:
+            user_id: ID del usuario
+            profile_id: ID del perfil
+            max_days_back: Máximo días para buscar estado de cuenta
+
+        Returns:
+            Job de onboarding en cola
+        """
+        with self._session_factory() as session:
+            job = self._latest_job(session, user_id)
+            if job is None:
+                job = self._new_job(user_id)
+                session.add(job)
+            elif job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+                return job
+
+            job.status = JobStatus.QUEUED
+            job.profile_id = profile_id
+            job.params = {"max_days_back": max_days_back}
+            job.progress_current = 0
+            job.progress_total = None
+            job.message = None
+            job.error = None
+            job.attempts = 0
+            job.finished_at = None
+            session.commit()
+            session.refresh(job)
+            logger.info(f"📥 Onboarding automático encolado para {user_id[:8]}...")
+            return job
+
     # =========================================================================
     # FLUJO SIMPLIFICADO - Método Principal
     # =========================================================================
@@ -261,6 +448,7 @@ class OnboardingService:
         user_id: str,
         profile_id: str,
         max_days_back: int = 31,  # Máximo 1 mes atrás para estado de cuenta
+        progress: JobProgress | None = None,
     ) -> OnboardingState:
         """
         🚀 MÉTODO PRINCIPAL DEL ONBOARDING SIMPLIFICADO.
@@ -279,6 +467,7 @@ class OnboardingService:
             user_id: ID del usuario
             profile_id: ID del perfil
             max_days_back: Máximo días para buscar estado de cuenta (default: 31)
+            progress: Avance del job cuando corre en un worker (opcional)
 
         Returns:
             Estado del onboarding con datos importados
@@ -286,13 +475,21 @@ class OnboardingService:
         from finanzas_tracker.services.statement_email_service import StatementEmailService
 
         # Iniciar o recuperar estado
-        state = self._states.get(user_id)
+        state = self.get_state(user_id)
         if not state:
             state = self.start_onboarding(user_id)
 
         state.profile_id = profile_id
         state.current_step = OnboardingStep.IMPORT_DATA
 
+        def checkpoint(paso: int, mensaje: str) -> None:
+            # El estado parcial queda visible para cualquier worker de la API
+            self._save_state(state)
+            if progress is not None:
+                progress.update(paso, 4, mensaje)
+
+        checkpoint(0, "Buscando estados de cuenta")
+
         logger.info(f"🔍 Iniciando onboarding para {user_id[:8]}... (máx {max_days_back} días atrás)")
 
         try:
@@ -305,6 +502,7 @@ class OnboardingService:
             statements = email_service.fetch_statement_emails(days_back=max_days_back)
             state.statements_found = len(statements)
             state.email_connected = True
+            checkpoint(1, "Procesando estados de cuenta")
 
             if statements:
                 logger.info(f"📧 Encontrados {len(statements)} estados de cuenta")
@@ -340,6 +538,7 @@ class OnboardingService:
                 if fecha_corte_detectada:
                     state.fecha_corte_base = fecha_corte_detectada
                     logger.info(f"📅 Fecha de corte detectada: {fecha_corte_detectada}")
+                checkpoint(2, "Importando correos de transacciones")
                 
                 # =============================================
                 # PASO 2: Buscar correos adicionales (post-corte)
@@ -366,6 +565,7 @@ class OnboardingService:
                 
                 # Buscar desde día 1 del mes actual
                 primer_dia_mes = date(hoy.year, hoy.month, 1)
+                checkpoint(2, "Importando correos de transacciones")
                 
                 self._importar_correos_transacciones(
                     state,
@@ -378,6 +578,7 @@ class OnboardingService:
             # =============================================
             # PASO 3: Inferir datos financieros
             # =============================================
+            checkpoint(3, "Analizando datos importados")
             self._inferir_datos_financieros(state, profile_id)
 
             # =============================================
@@ -403,6 +604,7 @@ class OnboardingService:
             state.current_step = OnboardingStep.READY
             state.datos_tentativos = True
 
+        checkpoint(4, "Listo")
         return state
 
     def _importar_correos_transacciones(
@@ -533,7 +735,7 @@ class OnboardingService:
         from finanzas_tracker.parsers.bac_pdf_parser import BACPDFParser
         from finanzas_tracker.parsers.bac_credit_card_parser import BACCreditCardParser
         
-        state = self._states.get(user_id)
+        state = self.get_state(user_id)
         if not state:
             state = self.start_onboarding(user_id)
         
@@ -587,6 +789,7 @@ class OnboardingService:
         preguntas = self._generar_preguntas_pendientes(state, profile_id)
         state.preguntas_generadas = len(preguntas)
         state.current_step = OnboardingStep.READY
+        self._save_state(state)
         
         return state
 
@@ -715,11 +918,12 @@ class OnboardingService:
         Returns:
             Estado final
         """
-        state = self._states.get(user_id)
+        state = self.get_state(user_id)
         if not state:
             return None
 
         state.current_step = OnboardingStep.READY
+        self._save_state(state)
         logger.info(f"🎉 Onboarding simplificado completado para {user_id[:8]}...")
         return state
 
@@ -744,7 +948,7 @@ class OnboardingService:
         Returns:
             Estado actualizado con detecciones
         """
-        state = self._states.get(user_id)
+        state = self.get_state(user_id)
         if not state:
             state = self.start_onboarding(user_id)
 
@@ -753,37 +957,30 @@ class OnboardingService:
 
         if banco == BankName.BAC:
             parser = BACPDFParser()
-            # Parser expects a file path, so we write bytes to a temp file
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-                tmp.write(pdf_content)
-                tmp_path = Path(tmp.name)
+            # El parser acepta el contenido en memoria, sin archivo temporal
+            result: BACStatementResult = parser.parse(pdf_content, source_name="onboarding.pdf")
 
-            try:
-                result: BACStatementResult = parser.parse(tmp_path)
-
-                # Extraer cuentas detectadas
-                state.detected_accounts = self._extract_accounts_from_pdf(result, banco)
+            # Extraer cuentas detectadas
+            state.detected_accounts = self._extract_accounts_from_pdf(result, banco)
 
-                # Extraer tarjetas detectadas
-                state.detected_cards = self._extract_cards_from_pdf(result, banco)
+            # Extraer tarjetas detectadas
+            state.detected_cards = self._extract_cards_from_pdf(result, banco)
 
-                # Contar transacciones
-                state.transactions_count = len(result.transactions)
+            # Contar transacciones
+            state.transactions_count = len(result.transactions)
 
-                state.pdf_processed = True
-                state.current_step = OnboardingStep.PDF_UPLOADED
+            state.pdf_processed = True
+            state.current_step = OnboardingStep.PDF_UPLOADED
 
-                logger.info(
-                    f"PDF procesado: {len(state.detected_accounts)} cuentas, "
-                    f"{len(state.detected_cards)} tarjetas, "
-                    f"{state.transactions_count} transacciones"
-                )
+            logger.info(
+                f"PDF procesado: {len(state.detected_accounts)} cuentas, "
+                f"{len(state.detected_cards)} tarjetas, "
+                f"{state.transactions_count} transacciones"
+            )
 
-                # Guardar transacciones en el estado para importación posterior
-                state.pdf_transactions = list(result.transactions)
-            finally:
-                # Clean up temp file
-                tmp_path.unlink(missing_ok=True)
+            # Guardar transacciones en el estado para importación posterior
+            state.pdf_transactions = list(result.transactions)
+            self._save_state(state)
         else:
             logger.warning(f"Parser para {banco} no implementado en onboarding")
 
@@ -815,7 +1012,7 @@ class OnboardingService:
         from finanzas_tracker.models.transaction import Transaction
         from finanzas_tracker.services.internal_transfer_detector import InternalTransferDetector
 
-        state = self._states.get(user_id)
+        state = self.get_state(user_id)
         if not state or not hasattr(state, "_pdf_transactions"):
             return {"error": "No hay PDF procesado para este usuario"}
 
@@ -1032,11 +1229,12 @@ class OnboardingService:
         Returns:
             Lista de cuentas creadas
         """
-        state = self._states.get(user_id)
+        state = self.get_state(user_id)
         if not state:
             raise ValueError("No hay onboarding activo para este usuario")
 
         state.profile_id = profile_id
+        self._save_state(state)
         created = []
 
         for acc_data in confirmed_accounts:
@@ -1059,6 +1257,7 @@ class OnboardingService:
             self.db.refresh(acc)
 
         state.current_step = OnboardingStep.ACCOUNTS_CONFIRMED
+        self._save_state(state)
         logger.info(f"Confirmadas {len(created)} cuentas para {user_id[:8]}...")
 
         return created
@@ -1084,7 +1283,7 @@ class OnboardingService:
         Returns:
             Lista de tarjetas creadas
         """
-        state = self._states.get(user_id)
+        state = self.get_state(user_id)
         if not state:
             raise ValueError("No hay onboarding activo para este usuario")
 
@@ -1118,6 +1317,7 @@ class OnboardingService:
                 self._create_initial_billing_cycle(card)
 
         state.current_step = OnboardingStep.CARDS_CONFIRMED
+        self._save_state(state)
         logger.info(f"Confirmadas {len(created)} tarjetas para {user_id[:8]}...")
 
         return created
@@ -1148,7 +1348,7 @@ class OnboardingService:
         Returns:
             Estado final del onboarding
         """
-        state = self._states.get(user_id)
+        state = self.get_state(user_id)
         if not state or not state.profile_id:
             return state
 
@@ -1156,6 +1356,7 @@ class OnboardingService:
         self._establecer_patrimonio_inicial(state.profile_id, fecha_base)
 
         state.current_step = OnboardingStep.COMPLETED
+        self._save_state(state)
         logger.info(f"Onboarding completado para {user_id[:8]}...")
         return state
 
@@ -1254,7 +1455,7 @@ class OnboardingService:
         Returns:
             Resumen con cuentas, tarjetas y próximos pasos
         """
-        state = self._states.get(user_id)
+        state = self.get_state(user_id)
         if not state or not state.profile_id:
             return {"error": "Onboarding no encontrado"}
 
@@ -5,7 +5,9 @@ Calcula el patrimonio neto combinando:
 - Inversiones (Investment)
 - Metas de ahorro (Goal)
 
-También gestiona snapshots de patrimonio para tracking histórico.
+También gestiona snapshots de patrimonio para tracking histórico. El
+patrimonio en una fecha cualquiera sale del libro de saldos diarios
+(ver balance_ledger_service); los snapshots son opcionales.
 """
 
 from dataclasses import dataclass
@@ -26,6 +28,7 @@ from finanzas_tracker.models.enums import (
 from finanzas_tracker.models.goal import Goal
 from finanzas_tracker.models.investment import Investment
 from finanzas_tracker.models.patrimonio_snapshot import PatrimonioSnapshot
+from finanzas_tracker.services.balance_ledger_service import BalanceLedgerService, LedgerTotals
 
 
 logger = logging.getLogger(__name__)
@@ -532,6 +535,116 @@ class PatrimonyService:
         snapshots = self.obtener_historial(profile_id, limite=1)
         return snapshots[0] if snapshots else None
 
+    # ========================================================================
+    # PATRIMONIO EN CUALQUIER FECHA (libro de saldos)
+    # ========================================================================
+
+    def _otros_activos_crc(
+        self,
+        profile_id: str,
+        exchange_rate: Decimal | None = None,
+    ) -> dict[str, Decimal]:
+        """Valor de hoy de inversiones y metas, en colones.
+
+        Son los mismos componentes de `calculate_net_worth`. No tienen
+        historia en el libro de saldos, así que cuentan con su valor actual
+        en cualquier fecha.
+
+        Args:
+            profile_id: ID del perfil.
+            exchange_rate: Tipo de cambio USD/CRC. Si no se provee, usa default.
+
+        Returns:
+            Diccionario con inversiones_crc y metas_crc.
+        """
+        rate = exchange_rate or self.DEFAULT_EXCHANGE_RATE
+
+        def en_colones(monto: Decimal, moneda: Currency) -> Decimal:
+            return monto if moneda == Currency.CRC else monto * rate
+
+        inversiones = sum(
+            (
+                en_colones(inv.valor_actual or inv.monto_principal, inv.moneda)
+                for inv in self.get_investments(profile_id)
+            ),
+            Decimal("0"),
+        )
+        metas = sum(
+            (
+                en_colones(goal.monto_actual or Decimal("0"), goal.moneda)
+                for goal in self.get_goals(profile_id)
+            ),
+            Decimal("0"),
+        )
+        return {"inversiones_crc": inversiones, "metas_crc": metas}
+
+    def _base_patrimonio(self, profile_id: str) -> dict[str, Decimal]:
+        """Saldo de cuentas más el valor actual de inversiones y metas."""
+        return {
+            "cuentas_crc": Account.calcular_patrimonio_total(self.db, profile_id),
+            **self._otros_activos_crc(profile_id),
+        }
+
+    @staticmethod
+    def _patrimonio_desde_libro(
+        base: dict[str, Decimal], totales: LedgerTotals
+    ) -> dict[str, Decimal]:
+        """Patrimonio = cuentas + inversiones + metas + movimientos acumulados del libro."""
+        activos = sum(base.values(), Decimal("0")) + totales.activos_crc
+        return {
+            "patrimonio_neto_crc": activos - totales.deudas_crc,
+            "activos_crc": activos,
+            "deudas_crc": totales.deudas_crc,
+            "inversiones_crc": base["inversiones_crc"],
+            "metas_crc": base["metas_crc"],
+        }
+
+    def patrimonio_en_fecha(self, profile_id: str, fecha: date) -> dict[str, Decimal]:
+        """Calcula el patrimonio al cierre de un día.
+
+        Suma el saldo de las cuentas, el valor actual de inversiones y metas
+        (como `calculate_net_worth`) y los movimientos acumulados del libro
+        de saldos hasta esa fecha (una búsqueda por índice, sin snapshots).
+
+        Args:
+            profile_id: ID del perfil.
+            fecha: Día a consultar.
+
+        Returns:
+            Diccionario con patrimonio_neto_crc, activos_crc, deudas_crc,
+            inversiones_crc y metas_crc.
+        """
+        base = self._base_patrimonio(profile_id)
+        totales = BalanceLedgerService(self.db).totales_en(profile_id, fecha)
+        return self._patrimonio_desde_libro(base, totales)
+
+    def historial_diario(
+        self,
+        profile_id: str,
+        fecha_inicio: date,
+        fecha_fin: date,
+    ) -> list[dict[str, Any]]:
+        """Obtiene el patrimonio de cada día de un rango.
+
+        Inversiones y metas cuentan con su valor actual en todos los días
+        (ver `patrimonio_en_fecha`).
+
+        Args:
+            profile_id: ID del perfil.
+            fecha_inicio: Primer día (inclusive).
+            fecha_fin: Último día (inclusive).
+
+        Returns:
+            Lista ascendente de diccionarios con fecha, patrimonio_neto_crc,
+            activos_crc, deudas_crc, inversiones_crc y metas_crc.
+        """
+        base = self._base_patrimonio(profile_id)
+        serie = BalanceLedgerService(self.db).serie_diaria(profile_id, fecha_inicio, fecha_fin)
+        return [
+            {"fecha": dia, **self._patrimonio_desde_libro(base, totales)}
+            for dia, totales in serie
+        ]
+
     def calcular_cambio_periodo(
         self,
         profile_id: str,
@@ -540,7 +653,9 @@ class PatrimonyService:
     ) -> dict[str, Any]:
         """Calcula el cambio de patrimonio entre dos fechas.
 
-        Busca los snapshots más cercanos a las fechas dadas.
+        Usa el libro de saldos, así el patrimonio corresponde a las fechas
+        exactas y no al snapshot más cercano. Inversiones y metas cuentan con
+        su valor actual en ambas fechas.
 
         Args:
             profile_id: ID del perfil.
@@ -551,43 +666,18 @@ class PatrimonyService:
             Diccionario con cambios absolutos y porcentuales.
 
         Raises:
-            ValueError: Si no hay snapshots suficientes.
+            ValueError: Si fecha_inicio es posterior a fecha_fin.
         """
-        # Buscar snapshot más cercano a fecha_inicio
-        stmt_inicio = (
-            select(PatrimonioSnapshot)
-            .where(
-                PatrimonioSnapshot.profile_id == profile_id,
-                PatrimonioSnapshot.fecha_snapshot <= fecha_inicio,
-                PatrimonioSnapshot.deleted_at.is_(None),
-            )
-            .order_by(desc(PatrimonioSnapshot.fecha_snapshot))
-            .limit(1)
-        )
-        snapshot_inicio = self.db.execute(stmt_inicio).scalar_one_or_none()
-
-        # Buscar snapshot más cercano a fecha_fin
-        stmt_fin = (
-            select(PatrimonioSnapshot)
-            .where(
-                PatrimonioSnapshot.profile_id == profile_id,
-                PatrimonioSnapshot.fecha_snapshot <= fecha_fin,
-                PatrimonioSnapshot.deleted_at.is_(None),
-            )
-            .order_by(desc(PatrimonioSnapshot.fecha_snapshot))
-            .limit(1)
-        )
-        snapshot_fin = self.db.execute(stmt_fin).scalar_one_or_none()
-
-        if not snapshot_inicio:
-            raise ValueError(f"No hay snapshots antes de {fecha_inicio} para profile {profile_id}")
+        if fecha_inicio > fecha_fin:
+            raise ValueError(f"La fecha de inicio {fecha_inicio} es posterior a {fecha_fin}")
 
-        if not snapshot_fin:
-            raise ValueError(f"No hay snapshots antes de {fecha_fin} para profile {profile_id}")
+        ledger = BalanceLedgerService(self.db)
+        base = self._base_patrimonio(profile_id)
+        inicio = self._patrimonio_desde_libro(base, ledger.totales_en(profile_id, fecha_inicio))
+        fin = self._patrimonio_desde_libro(base, ledger.totales_en(profile_id, fecha_fin))
 
-        # Calcular cambios
-        patrimonio_inicio = snapshot_inicio.patrimonio_neto_crc
-        patrimonio_fin = snapshot_fin.patrimonio_neto_crc
+        patrimonio_inicio = inicio["patrimonio_neto_crc"]
+        patrimonio_fin = fin["patrimonio_neto_crc"]
 
         cambio_absoluto = patrimonio_fin - patrimonio_inicio
 
@@ -599,24 +689,24 @@ class PatrimonyService:
         logger.info(
             "Cambio patrimonio profile %s [%s - %s]: ₡%s → ₡%s (%.2f%%)",
             profile_id,
-            snapshot_inicio.fecha_snapshot,
-            snapshot_fin.fecha_snapshot,
+            fecha_inicio,
+            fecha_fin,
             patrimonio_inicio,
             patrimonio_fin,
             cambio_porcentual,
         )
 
         return {
-            "fecha_inicio_real": snapshot_inicio.fecha_snapshot,
-            "fecha_fin_real": snapshot_fin.fecha_snapshot,
+            "fecha_inicio_real": fecha_inicio,
+            "fecha_fin_real": fecha_fin,
             "patrimonio_inicio_crc": patrimonio_inicio,
             "patrimonio_fin_crc": patrimonio_fin,
             "cambio_absoluto_crc": cambio_absoluto,
             "cambio_porcentual": cambio_porcentual.quantize(Decimal("0.01")),
-            "activos_inicio_crc": snapshot_inicio.total_activos_crc,
-            "activos_fin_crc": snapshot_fin.total_activos_crc,
-            "deudas_inicio_crc": snapshot_inicio.total_deudas_crc,
-            "deudas_fin_crc": snapshot_fin.total_deudas_crc,
+            "activos_inicio_crc": inicio["activos_crc"],
+            "activos_fin_crc": fin["activos_crc"],
+            "deudas_inicio_crc": inicio["deudas_crc"],
+            "deudas_fin_crc": fin["deudas_crc"],
         }
 
     def generar_snapshot_mensual(
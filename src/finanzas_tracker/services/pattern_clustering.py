@@ -0,0 +1,121 @@
+"""
+Clustering vectorizado de patrones por similitud coseno.
+
+Utilidades puras de NumPy usadas por `SmartLearningService.merge_similar_patterns`:
+la matriz de similitud se calcula por bloques (nunca se materializa nxn) y los
+pares sobre el umbral se agrupan con union-find (componentes conexas).
+"""
+
+__all__ = ["UnionFind", "centroid", "normalize_rows", "similar_pairs"]
+
+from collections.abc import Iterator
+
+import numpy as np
+
+
+class UnionFind:
+    """
+    Conjuntos disjuntos con compresión de caminos y unión por tamaño.
+
+    Ejemplo:
+        >>> uf = UnionFind(4)
+        >>> uf.union(0, 2)
+        >>> uf.groups()
+        [[0, 2], [1], [3]]
+    """
+
+    def __init__(self, size: int) -> None:
+        self._parent = list(range(size))
+        self._size = [1] * size
+
+    def find(self, item: int) -> int:
+        """Retorna el representante del conjunto de `item`."""
+        parent = self._parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        """Une los conjuntos de `a` y `b`."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size[root_b]
+
+    def groups(self) -> list[list[int]]:
+        """Conjuntos como listas de índices, en orden de primera aparición."""
+        by_root: dict[int, list[int]] = {}
+        for item in range(len(self._parent)):
+            by_root.setdefault(self.find(item), []).append(item)
+        return list(by_root.values())
+
+
+def normalize_rows(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Normaliza cada fila a norma 1 para que el producto punto sea el coseno.
+
+    Args:
+        matrix: Matriz nxd de embeddings
+
+    Returns:
+        Tupla (matriz float32 normalizada, máscara de filas con norma > 0).
+        Las filas de norma cero quedan en cero y nunca superan un umbral positivo.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1)
+    valid = norms > 0
+    normalized = np.zeros_like(matrix)
+    normalized[valid] = matrix[valid] / norms[valid, None]
+    return normalized, valid
+
+
+def similar_pairs(
+    normalized: np.ndarray,
+    threshold: float,
+    block_size: int = 1024,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Encuentra los pares (i < j) con similitud coseno >= threshold.
+
+    Recorre el triángulo superior en bloques de `block_size`x`block_size`,
+    así la memoria es O(block_size²) en lugar de O(n²).
+
+    Args:
+        normalized: Matriz nxd con filas de norma 1 (ver normalize_rows)
+        threshold: Similitud mínima
+        block_size: Filas/columnas por bloque
+
+    Yields:
+        Tuplas (filas, columnas, similitudes) de cada bloque con pares
+    """
+    n = normalized.shape[0]
+    for row_start in range(0, n, block_size):
+        row_block = normalized[row_start : row_start + block_size]
+        for col_start in range(row_start, n, block_size):
+            sims = row_block @ normalized[col_start : col_start + block_size].T
+            if col_start == row_start:
+                # Bloque diagonal: sólo j > i
+                sims = np.triu(sims, k=1)
+            rows, cols = np.nonzero(sims >= threshold)
+            if rows.size:
+                yield rows + row_start, cols + col_start, sims[rows, cols]
+
+
+def centroid(normalized: np.ndarray, weights: np.ndarray | None = None) -> np.ndarray:
+    """
+    Centroide (media ponderada, renormalizada) de un grupo de vectores.
+
+    Args:
+        normalized: Vectores del grupo con norma 1
+        weights: Peso de cada vector (ej: veces usado); None = iguales
+
+    Returns:
+        Vector de norma 1 (o ceros si el grupo se anula)
+    """
+    mean = np.average(normalized, axis=0, weights=weights)
+    norm = np.linalg.norm(mean)
+    return mean / norm if norm > 0 else mean
@@ -15,31 +15,51 @@ response = rag.chat(
 )
 print(response.answer)  # "Este mes gastaste ₡45,000 en comida..."
 print(response.sources)  # Transacciones usadas como contexto
+
+# Streaming (async): eventos "sources", "delta"..., "done"
+async for event in rag.chat_stream(query="...", profile_id="abc123"):
+    print(event.event, event.data)
 ```
 """
 
-__all__ = ["RAGService", "RAGResponse", "RAGContext"]
+__all__ = ["RAGService", "RAGResponse", "RAGContext", "RAGStreamEvent"]
 
+import asyncio
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 import logging
-from typing import TYPE_CHECKING, cast
+import time
+from typing import Any, cast
 
-from anthropic import Anthropic
+from anthropic import APIError
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.config.settings import Settings
-from finanzas_tracker.core.claude_credits import can_use_claude, handle_claude_error
-from finanzas_tracker.services.embedding_service import EmbeddingService
+from finanzas_tracker.core.claude_client import ClaudeClient, response_text
+from finanzas_tracker.core.claude_credits import (
+    ClaudeServiceUnavailable,
+    can_use_claude,
+    handle_claude_error,
+)
+from finanzas_tracker.core.metrics import histogram
+from finanzas_tracker.repositories.filters import in_month
+from finanzas_tracker.services.embedding_service import EmbeddingService, SemanticSearchHit
 
 
-if TYPE_CHECKING:
-    from finanzas_tracker.models.transaction import Transaction
+logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = "claude-haiku-4-5-20251001"
 
-logger = logging.getLogger(__name__)
+# Similitud mínima para incluir una transacción como contexto
+CONTEXT_MIN_SIMILARITY = 0.3
+
+UNAVAILABLE_ANSWER = "🤖 El asistente de IA no está disponible en este momento."
+
+TTFT_METRIC = "ai_time_to_first_token_seconds"
+TTFT_HELP = "Tiempo hasta el primer token de Claude en segundos"
 
 
 @dataclass
@@ -72,6 +92,22 @@ class RAGResponse:
     query: str = ""
 
 
+@dataclass
+class RAGStreamEvent:
+    """
+    Evento de una respuesta en streaming.
+
+    Tipos (`event`):
+    - "sources": {"sources": list[RAGContext]}, antes del primer token
+    - "delta": {"text": str}, un fragmento de la respuesta
+    - "done": {"model", "usage", "ttft_ms"}, al terminar
+    - "error": {"error": str}, si Claude falla a mitad del stream
+    """
+
+    event: str
+    data: dict[str, Any] = field(default_factory=dict)
+
+
 SYSTEM_PROMPT = """Eres un asistente financiero personal para Costa Rica. Tu usuario es Sebastián.
 
 Tu rol es ayudar a analizar gastos, dar insights sobre patrones de consumo,
@@ -111,6 +147,17 @@ class RAGService:
     4. Claude genera respuesta basada en datos reales
     """
 
+    SAVINGS_QUERY = (
+        "Analiza mis transacciones recientes y sugiere "
+        "áreas donde podría ahorrar dinero. Identifica patrones "
+        "de gasto repetitivo o gastos que podrían reducirse."
+    )
+    ANOMALIES_QUERY = (
+        "Revisa mis transacciones recientes e identifica "
+        "cualquier gasto inusual, anómalo o que parezca fuera "
+        "de mis patrones normales de consumo."
+    )
+
     def __init__(
         self,
         db: Session,
@@ -126,24 +173,33 @@ class RAGService:
         self.db = db
         self.settings = settings or Settings()
         self.embedding_service = EmbeddingService(db, settings)
-        self._anthropic: Anthropic | None = None
-
-    def _get_anthropic_client(self) -> Anthropic:
-        """Obtiene o crea el cliente de Anthropic."""
-        if self._anthropic is None:
-            api_key = self.settings.anthropic_api_key
-            if not api_key:
-                msg = "ANTHROPIC_API_KEY no está configurado"
-                raise ValueError(msg)
-            self._anthropic = Anthropic(api_key=api_key)
-        return self._anthropic
+        self._claude: ClaudeClient | None = None
+
+    def _get_api_key(self) -> str:
+        """API key de Anthropic (ValueError si no está configurada)."""
+        api_key = self.settings.anthropic_api_key
+        if not api_key:
+            msg = "ANTHROPIC_API_KEY no está configurado"
+            raise ValueError(msg)
+        return api_key
+
+    def _get_claude(self) -> ClaudeClient:
+        """Obtiene o crea el cliente de Claude (SYSTEM_PROMPT va cacheado)."""
+        if self._claude is None:
+            self._claude = ClaudeClient(api_key=self._get_api_key())
+        return self._claude
+
+    def _resolve_model(self, model: str | None) -> str:
+        """Modelo a usar: el pedido, el de settings o el default."""
+        configured = cast(str, getattr(self.settings, "claude_model", DEFAULT_MODEL))
+        return model or configured or DEFAULT_MODEL
 
     def _search_relevant_transactions(
         self,
         query: str,
         profile_id: str,
         limit: int = 10,
-    ) -> list[tuple["Transaction", float]]:
+    ) -> list[SemanticSearchHit]:
         """
         Busca transacciones relevantes para la query.
 
@@ -153,52 +209,40 @@ class RAGService:
             limit: Número máximo de resultados
 
         Returns:
-            Lista de (Transaction, similitud)
+            Resultados ya hidratados (una sola query)
         """
-        return self.embedding_service.search_similar(
+        return self.embedding_service.search_hits(
             query=query,
             profile_id=profile_id,
             limit=limit,
-            min_similarity=0.3,  # Threshold bajo para incluir más contexto
+            min_similarity=CONTEXT_MIN_SIMILARITY,  # Threshold bajo para incluir más contexto
         )
 
     def _build_context(
         self,
-        transactions: list[tuple["Transaction", float]],
+        hits: list[SemanticSearchHit],
     ) -> list[RAGContext]:
         """
-        Construye contexto RAG desde transacciones.
+        Construye contexto RAG desde los resultados de búsqueda.
 
         Args:
-            transactions: Lista de (Transaction, similitud)
+            hits: Resultados de la búsqueda semántica
 
         Returns:
             Lista de RAGContext
         """
-        contexts = []
-        for txn, similarity in transactions:
-            # Obtener nombre de categoría si existe
-            categoria = None
-            if txn.subcategory:
-                categoria = f"{txn.subcategory.category.nombre} > {txn.subcategory.nombre}"
-
-            # Obtener texto del embedding si existe
-            text_content = ""
-            if txn.embedding:
-                text_content = txn.embedding.text_content
-
-            ctx = RAGContext(
-                transaction_id=txn.id,
-                comercio=txn.comercio,
-                monto_crc=txn.monto_crc,
-                fecha=txn.fecha_transaccion,
-                categoria=categoria,
-                similarity=similarity,
-                text_content=text_content,
+        return [
+            RAGContext(
+                transaction_id=hit.transaction_id,
+                comercio=hit.comercio,
+                monto_crc=hit.monto_crc,
+                fecha=hit.fecha,
+                categoria=hit.categoria,
+                similarity=hit.similarity,
+                text_content=hit.text_content,
             )
-            contexts.append(ctx)
-
-        return contexts
+            for hit in hits
+        ]
 
     def _build_prompt_with_context(
         self,
@@ -266,8 +310,7 @@ class RAGService:
         sum_stmt = select(func.sum(Transaction.monto_crc)).where(
             Transaction.profile_id == profile_id,
             Transaction.deleted_at.is_(None),
-            func.extract("year", Transaction.fecha_transaccion) == year,
-            func.extract("month", Transaction.fecha_transaccion) == month,
+            in_month(Transaction.fecha_transaccion, year, month),
         )
         total_mes = self.db.execute(sum_stmt).scalar() or Decimal("0")
 
@@ -275,8 +318,7 @@ class RAGService:
         count_stmt = select(func.count(Transaction.id)).where(
             Transaction.profile_id == profile_id,
             Transaction.deleted_at.is_(None),
-            func.extract("year", Transaction.fecha_transaccion) == year,
-            func.extract("month", Transaction.fecha_transaccion) == month,
+            in_month(Transaction.fecha_transaccion, year, month),
         )
         num_txns = self.db.execute(count_stmt).scalar() or 0
 
@@ -306,17 +348,14 @@ class RAGService:
         Returns:
             RAGResponse con la respuesta y fuentes
         """
-        default_model = "claude-haiku-4-5-20251001"
-        model_to_use: str = model or cast(
-            str, getattr(self.settings, "claude_model", default_model)
-        ) or default_model
+        model_to_use = self._resolve_model(model)
 
         # 0. Verificar si podemos usar Claude (sin llamar a la API)
         can_use, reason = can_use_claude()
         if not can_use:
             logger.info(f"⏭️ RAG no disponible: {reason}")
             return RAGResponse(
-                answer="🤖 El asistente de IA no está disponible en este momento.",
+                answer=UNAVAILABLE_ANSWER,
                 sources=[],
                 model=model_to_use,
                 usage={"input_tokens": 0, "output_tokens": 0},
@@ -346,23 +385,20 @@ class RAGService:
         )
 
         # 5. Llamar a Claude
-        client = self._get_anthropic_client()
-
         logger.info(f"RAG query: {query[:50]}... con {len(contexts)} transacciones de contexto")
 
-        response = client.messages.create(
-            model=model_to_use,
-            max_tokens=1024,
+        response = self._get_claude().create(
+            call_site="rag.chat",
             system=SYSTEM_PROMPT,
             messages=[{"role": "user", "content": user_prompt}],
+            model=model_to_use,
+            max_tokens=1024,
+            profile_id=profile_id,
         )
 
         # 6. Construir respuesta
-        first_block = response.content[0] if response.content else None
-        answer = first_block.text if first_block and hasattr(first_block, "text") else ""
-
         return RAGResponse(
-            answer=answer,
+            answer=response_text(response),
             sources=contexts,
             model=model_to_use,
             usage={
@@ -372,6 +408,262 @@ class RAGService:
             query=query,
         )
 
+    async def _gather_context(
+        self,
+        query: str,
+        profile_id: str,
+        include_stats: bool,
+        max_context_items: int,
+    ) -> tuple[list[RAGContext], dict | None]:
+        """
+        Recupera el contexto del prompt sin bloquear el event loop.
+
+        El embedding de la query (modelo local o API) se calcula en un
+        thread en paralelo con las estadísticas mensuales; la búsqueda
+        vectorial corre después con el embedding ya listo. La sesión nunca
+        se usa desde dos threads a la vez.
+
+        Returns:
+            Tupla (contextos, estadísticas o None)
+        """
+
+        async def _stats() -> dict | None:
+            if not include_stats:
+                return None
+            return await asyncio.to_thread(self._get_monthly_stats, profile_id)
+
+        query_embedding, additional_stats = await asyncio.gather(
+            asyncio.to_thread(self.embedding_service.get_embedding, query),
+            _stats(),
+        )
+        hits = await asyncio.to_thread(
+            self.embedding_service.search_hits,
+            query,
+            profile_id,
+            max_context_items,
+            CONTEXT_MIN_SIMILARITY,
+            query_embedding,
+        )
+        return self._build_context(hits), additional_stats
+
+    async def _stream_events(
+        self,
+        query: str,
+        profile_id: str,
+        include_stats: bool,
+        max_context_items: int,
+        model_to_use: str,
+        endpoint: str,
+    ) -> AsyncIterator[RAGStreamEvent]:
+        """
+        Genera los eventos de la respuesta; los errores de Claude se propagan.
+
+        Args:
+            query: Pregunta del usuario
+            profile_id: ID del perfil
+            include_stats: Incluir estadísticas mensuales
+            max_context_items: Máximo de transacciones como contexto
+            model_to_use: Modelo de Claude ya resuelto
+            endpoint: Etiqueta para la métrica de TTFT
+
+        Yields:
+            RAGStreamEvent en orden: sources, delta..., done
+        """
+        start = time.perf_counter()
+
+        contexts, additional_stats = await self._gather_context(
+            query, profile_id, include_stats, max_context_items
+        )
+        yield RAGStreamEvent("sources", {"sources": contexts})
+
+        user_prompt = self._build_prompt_with_context(
+            query=query,
+            contexts=contexts,
+            additional_stats=additional_stats,
+        )
+        logger.info(
+            f"RAG stream: {query[:50]}... con {len(contexts)} transacciones de contexto"
+        )
+
+        ttft: float | None = None
+        async with self._get_claude().astream(
+            call_site="rag.chat",
+            system=SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": user_prompt}],
+            model=model_to_use,
+            max_tokens=1024,
+            profile_id=profile_id,
+        ) as stream:
+            async for text in stream.text_stream:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                    histogram(TTFT_METRIC, TTFT_HELP, endpoint=endpoint).observe(ttft)
+                yield RAGStreamEvent("delta", {"text": text})
+            final = await stream.get_final_message()
+
+        yield RAGStreamEvent(
+            "done",
+            {
+                "model": model_to_use,
+                "usage": {
+                    "input_tokens": final.usage.input_tokens,
+                    "output_tokens": final.usage.output_tokens,
+                },
+                "ttft_ms": round(ttft * 1000, 2) if ttft is not None else None,
+            },
+        )
+
+    async def chat_stream(
+        self,
+        query: str,
+        profile_id: str,
+        include_stats: bool = True,
+        max_context_items: int = 10,
+        model: str | None = None,
+        endpoint: str = "/ai/chat",
+    ) -> AsyncIterator[RAGStreamEvent]:
+        """
+        Versión en streaming de `chat` con el cliente async de Anthropic.
+
+        Emite primero las fuentes, luego cada fragmento de texto según
+        llega y al final el uso de tokens. El time-to-first-token (desde
+        la llamada hasta el primer fragmento, incluyendo la recuperación
+        de contexto) se registra en el histograma
+        `ai_time_to_first_token_seconds{endpoint=...}`.
+
+        Args:
+            query: Pregunta del usuario
+            profile_id: ID del perfil
+            include_stats: Incluir estadísticas mensuales
+            max_context_items: Máximo de transacciones como contexto
+            model: Modelo de Claude a usar
+            endpoint: Etiqueta para la métrica de TTFT
+
+        Yields:
+            RAGStreamEvent en orden: sources, delta..., done (o error)
+        """
+        model_to_use = self._resolve_model(model)
+
+        can_use, reason = can_use_claude()
+        if not can_use:
+            logger.info(f"⏭️ RAG no disponible: {reason}")
+            yield RAGStreamEvent("sources", {"sources": []})
+            yield RAGStreamEvent("delta", {"text": UNAVAILABLE_ANSWER})
+            yield RAGStreamEvent(
+                "done",
+                {
+                    "model": model_to_use,
+                    "usage": {"input_tokens": 0, "output_tokens": 0},
+                    "ttft_ms": None,
+                },
+            )
+            return
+
+        try:
+            async for event in self._stream_events(
+                query, profile_id, include_stats, max_context_items, model_to_use, endpoint
+            ):
+                yield event
+        except ClaudeServiceUnavailable as e:
+            logger.info(f"⏭️ RAG no disponible: {e.message}")
+            yield RAGStreamEvent("error", {"error": e.message})
+        except (APIError, ValueError) as e:
+            if isinstance(e, APIError):
+                handle_claude_error(e)
+            logger.error(f"Error en streaming de Claude: {e}")
+            yield RAGStreamEvent("error", {"error": "Error generando respuesta"})
+
+    async def achat(
+        self,
+        query: str,
+        profile_id: str,
+        include_stats: bool = True,
+        max_context_items: int = 10,
+        model: str | None = None,
+        endpoint: str = "/ai/chat",
+    ) -> RAGResponse:
+        """
+        Versión async de `chat` para endpoints `async def`.
+
+        Usa el cliente async de Anthropic, así que esperar a Claude no
+        ocupa un hilo del threadpool. A diferencia de `chat_stream`, los
+        errores de Claude se propagan (APIError) para que el endpoint
+        responda con el código HTTP correspondiente.
+
+        Args:
+            query: Pregunta del usuario
+            profile_id: ID del perfil
+            include_stats: Incluir estadísticas mensuales
+            max_context_items: Máximo de transacciones como contexto
+            model: Modelo de Claude a usar
+            endpoint: Etiqueta para la métrica de TTFT
+
+        Returns:
+            RAGResponse con respuesta y fuentes
+        """
+        model_to_use = self._resolve_model(model)
+
+        can_use, reason = can_use_claude()
+        if not can_use:
+            logger.info(f"⏭️ RAG no disponible: {reason}")
+            return RAGResponse(
+                answer=UNAVAILABLE_ANSWER,
+                sources=[],
+                model=model_to_use,
+                usage={"input_tokens": 0, "output_tokens": 0},
+                query=query,
+            )
+
+        sources: list[RAGContext] = []
+        parts: list[str] = []
+        usage: dict = {}
+        try:
+            async for event in self._stream_events(
+                query, profile_id, include_stats, max_context_items, model_to_use, endpoint
+            ):
+                if event.event == "sources":
+                    sources = event.data["sources"]
+                elif event.event == "delta":
+                    parts.append(event.data["text"])
+                elif event.event == "done":
+                    usage = event.data["usage"]
+        except APIError as e:
+            handle_claude_error(e)
+            raise
+
+        return RAGResponse(
+            answer="".join(parts),
+            sources=sources,
+            model=model_to_use,
+            usage=usage,
+            query=query,
+        )
+
+    @staticmethod
+    def spending_query(
+        category: str | None = None,
+        year: int | None = None,
+        month: int | None = None,
+    ) -> str:
+        """
+        Pregunta usada para el análisis de gastos de un mes.
+
+        Args:
+            category: Categoría específica a analizar
+            year: Año a analizar (default: actual)
+            month: Mes a analizar (default: actual)
+
+        Returns:
+            Query para `chat` o `chat_stream`
+        """
+        now = datetime.now()
+        year = year or now.year
+        month = month or now.month
+
+        if category:
+            return f"Analiza mis gastos en {category} durante {month}/{year}"
+        return f"Dame un análisis de mis gastos de {month}/{year}"
+
     def analyze_spending(
         self,
         profile_id: str,
@@ -391,17 +683,8 @@ class RAGService:
         Returns:
             RAGResponse con análisis
         """
-        now = datetime.now()
-        year = year or now.year
-        month = month or now.month
-
-        if category:
-            query = f"Analiza mis gastos en {category} durante {month}/{year}"
-        else:
-            query = f"Dame un análisis de mis gastos de {month}/{year}"
-
         return self.chat(
-            query=query,
+            query=self.spending_query(category, year, month),
             profile_id=profile_id,
             include_stats=True,
             max_context_items=20,  # Más contexto para análisis
@@ -420,14 +703,8 @@ class RAGService:
         Returns:
             RAGResponse con sugerencias
         """
-        query = (
-            "Analiza mis transacciones recientes y sugiere "
-            "áreas donde podría ahorrar dinero. Identifica patrones "
-            "de gasto repetitivo o gastos que podrían reducirse."
-        )
-
         return self.chat(
-            query=query,
+            query=self.SAVINGS_QUERY,
             profile_id=profile_id,
             include_stats=True,
             max_context_items=30,
@@ -446,14 +723,8 @@ class RAGService:
         Returns:
             RAGResponse con análisis de anomalías
         """
-        query = (
-            "Revisa mis transacciones recientes e identifica "
-            "cualquier gasto inusual, anómalo o que parezca fuera "
-            "de mis patrones normales de consumo."
-        )
-
         return self.chat(
-            query=query,
+            query=self.ANOMALIES_QUERY,
             profile_id=profile_id,
             include_stats=True,
             max_context_items=30,
@@ -471,22 +471,12 @@ class ReconciliationService:
         Returns:
             ReconciliationResult
         """
-        from pathlib import Path
-        import tempfile
-
         from finanzas_tracker.parsers.bac_pdf_parser import BACPDFParser
 
         if banco == BankName.BAC:
             parser = BACPDFParser()
-            # Guardar bytes en archivo temporal para parsear
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-                tmp.write(pdf_content)
-                tmp_path = tmp.name
-
-            try:
-                result = parser.parse(tmp_path)
-            finally:
-                Path(tmp_path).unlink()
+            # El parser acepta el contenido en memoria, sin archivo temporal
+            result = parser.parse(pdf_content, source_name="reconciliacion.pdf")
 
             if not result:
                 raise ValueError("No se pudo parsear el PDF")
@@ -15,6 +15,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.models import Transaction
+from finanzas_tracker.services.merchant_normalizer import RECURRENTES
 from finanzas_tracker.services.subscription_detector import (
     DetectedSubscription,
     SubscriptionDetector,
@@ -474,8 +475,8 @@ class RecurringExpensePredictor:
 
         # Agrupar por comercio
         por_comercio: dict[str, list[Transaction]] = {}
-        for tx in txs:
-            comercio = self._normalizar_comercio(tx.comercio)
+        nombres = RECURRENTES.normalize_many(tx.comercio for tx in txs)
+        for tx, comercio in zip(txs, nombres, strict=True):
             if comercio not in por_comercio:
                 por_comercio[comercio] = []
             por_comercio[comercio].append(tx)
@@ -552,21 +553,8 @@ class RecurringExpensePredictor:
         return predicciones
 
     def _normalizar_comercio(self, comercio: str) -> str:
-        """Normaliza nombre de comercio para agrupar."""
-        import re
-
-        resultado = comercio.upper().strip()
-
-        # Remover números de referencia largos
-        resultado = re.sub(r"\d{6,}", "", resultado)
-
-        # Remover ***XXXX (últimos 4 dígitos de tarjeta)
-        resultado = re.sub(r"\*{3}\d{4}", "", resultado)
-
-        # Limpiar espacios
-        resultado = re.sub(r"\s+", " ", resultado).strip()
-
-        return resultado
+        """Normaliza nombre de comercio para agrupar (ver `merchant_normalizer`)."""
+        return RECURRENTES(comercio)
 
 
 def generar_reporte_gastos_proximos(
@@ -0,0 +1,257 @@
+"""
+Cola de revisión: cuántos ítems del perfil necesitan al usuario.
+
+El dashboard contaba cada tipo de pendiente con su propio `COUNT` (siete
+consultas en cada rerun de Streamlit). Aquí todos los contadores salen de
+una sola consulta con agregados filtrados:
+
+    SELECT count(*) FILTER (WHERE necesita_reconciliacion_sinpe), ...,
+           (SELECT count(*) FROM incomes WHERE ...),
+           (SELECT count(*) FROM pending_questions WHERE ...)
+    FROM transactions
+    WHERE profile_id = :p AND deleted_at IS NULL AND (<alguna marca de revisión>)
+
+Cada parte coincide con un índice parcial (migración e1f2a3b4c5d6): sólo se
+leen las filas en revisión, no todo el historial del perfil. Las listas de
+revisión del dashboard filtran con las mismas condiciones.
+
+`contar_pendientes` cachea los contadores por perfil en el cache de
+consultas. `register_review_queue_events` (registrado en las sesiones de
+`core.database`) los invalida al confirmar cambios en las marcas de
+revisión; los UPDATE por lotes (que no pasan por el ORM) llaman a
+`marcar_cambio`.
+"""
+
+__all__ = [
+    "COMERCIOS_AMBIGUOS",
+    "COMERCIOS_DESCONOCIDOS",
+    "COMPRAS_SIN_CATEGORIA",
+    "EN_REVISION",
+    "TRANSFERENCIAS_CONFUSAS",
+    "TRANSFERENCIAS_SIN_CATEGORIA",
+    "ReviewQueueService",
+    "contar_pendientes",
+    "marcar_cambio",
+    "register_review_queue_events",
+    "unregister_review_queue_events",
+]
+
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import Select, and_, event, func, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.core.cache import cached_query
+from finanzas_tracker.core.database import get_session
+from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.models.enums import TransactionType
+from finanzas_tracker.models.income import Income
+from finanzas_tracker.models.pending_question import PendingQuestion, QuestionStatus
+from finanzas_tracker.models.transaction import Transaction
+
+
+logger = get_logger(__name__)
+
+# Condiciones de cada tipo de pendiente (sobre transacciones activas).
+# Las columnas booleanas van sin `= true` para que PostgreSQL pueda probar
+# que la consulta cae dentro del predicado de ix_transactions_revision.
+TRANSFERENCIAS_CONFUSAS = Transaction.necesita_reconciliacion_sinpe
+COMERCIOS_AMBIGUOS = Transaction.es_comercio_ambiguo
+COMERCIOS_DESCONOCIDOS = Transaction.es_desconocida
+COMPRAS_SIN_CATEGORIA = and_(
+    Transaction.subcategory_id.is_(None),
+    Transaction.tipo_transaccion == TransactionType.PURCHASE,
+    ~Transaction.excluir_de_presupuesto,
+)
+TRANSFERENCIAS_SIN_CATEGORIA = and_(
+    Transaction.subcategory_id.is_(None),
+    Transaction.tipo_transaccion == TransactionType.TRANSFER,
+    ~Transaction.necesita_reconciliacion_sinpe,
+    ~Transaction.excluir_de_presupuesto,
+)
+# Alguna marca de revisión (mismo predicado que el índice parcial)
+EN_REVISION = or_(
+    TRANSFERENCIAS_CONFUSAS,
+    COMERCIOS_AMBIGUOS,
+    COMERCIOS_DESCONOCIDOS,
+    Transaction.subcategory_id.is_(None),
+)
+
+
+class ReviewQueueService:
+    """Contadores de la cola de revisión de un perfil."""
+
+    def __init__(self, db: Session) -> None:
+        """
+        Inicializa el servicio.
+
+        Args:
+            db: Sesión de base de datos
+        """
+        self.db = db
+
+    def contar(self, profile_id: str) -> dict[str, int]:
+        """
+        Cuenta los pendientes de revisión en una sola consulta.
+
+        Args:
+            profile_id: ID del perfil
+
+        Returns:
+            Conteo por tipo, por grupo (transferencias, compras, ingresos)
+            y total
+        """
+        row = self.db.execute(self._conteo_stmt(profile_id)).one()
+        conteos = {name: int(value or 0) for name, value in row._mapping.items()}
+
+        transferencias = conteos["transferencias_confusas"] + conteos["transferencias_sin_categoria"]
+        compras = (
+            conteos["compras_sin_categoria"]
+            + conteos["comercios_ambiguos"]
+            + conteos["comercios_desconocidos"]
+        )
+        ingresos = conteos["ingresos_sin_confirmar"]
+        return {
+            **conteos,
+            "transferencias": transferencias,
+            "compras": compras,
+            "ingresos": ingresos,
+            "total": transferencias + compras + ingresos + conteos["preguntas_ia"],
+        }
+
+    @staticmethod
+    def _conteo_stmt(profile_id: str) -> Select[Any]:
+        ingresos = select(func.count()).where(
+            Income.profile_id == profile_id,
+            ~Income.confirmado,
+            Income.deleted_at.is_(None),
+        )
+        preguntas = select(func.count()).where(
+            PendingQuestion.profile_id == profile_id,
+            PendingQuestion.status == QuestionStatus.PENDIENTE,
+            PendingQuestion.deleted_at.is_(None),
+        )
+        return (
+            select(
+                func.count().filter(TRANSFERENCIAS_CONFUSAS).label("transferencias_confusas"),
+                func.count().filter(COMERCIOS_AMBIGUOS).label("comercios_ambiguos"),
+                func.count().filter(COMPRAS_SIN_CATEGORIA).label("compras_sin_categoria"),
+                func.count()
+                .filter(TRANSFERENCIAS_SIN_CATEGORIA)
+                .label("transferencias_sin_categoria"),
+                func.count().filter(COMERCIOS_DESCONOCIDOS).label("comercios_desconocidos"),
+                ingresos.scalar_subquery().label("ingresos_sin_confirmar"),
+                preguntas.scalar_subquery().label("preguntas_ia"),
+            )
+            .select_from(Transaction)
+            .where(
+                Transaction.profile_id == profile_id,
+                Transaction.deleted_at.is_(None),
+                EN_REVISION,
+            )
+        )
+
+
+@cached_query(ttl_seconds=300, profile_aware=True)
+def contar_pendientes(profile_id: str) -> dict[str, int]:
+    """
+    Contadores de la cola de revisión, cacheados por perfil.
+
+    Args:
+        profile_id: ID del perfil
+
+    Returns:
+        Conteos de `ReviewQueueService.contar`
+    """
+    with get_session() as session:
+        return ReviewQueueService(session).contar(profile_id)
+
+
+# ============================================================================
+# SQLAlchemy Event Listeners
+# ============================================================================
+
+_PENDIENTES = "review_queue_pendientes"
+
+# Modelo -> atributos que cambian su lugar en la cola de revisión
+_MARCAS: dict[type, tuple[str, ...]] = {
+    Transaction: (
+        "necesita_reconciliacion_sinpe",
+        "es_comercio_ambiguo",
+        "es_desconocida",
+        "subcategory_id",
+        "tipo_transaccion",
+        "excluir_de_presupuesto",
+        "deleted_at",
+    ),
+    Income: ("confirmado", "deleted_at"),
+    PendingQuestion: ("status", "deleted_at"),
+}
+
+
+def marcar_cambio(session: Session, profile_id: str) -> None:
+    """
+    Anota que la cola de revisión del perfil cambió en esta sesión.
+
+    Para escrituras que no pasan por el ORM (UPDATE por lotes): los
+    contadores del perfil se invalidan cuando la sesión confirma.
+
+    Args:
+        session: Sesión que hará el commit
+        profile_id: ID del perfil
+    """
+    session.info.setdefault(_PENDIENTES, set()).add(profile_id)
+
+
+def _before_flush(session: Session, flush_context: Any, instances: Any) -> None:
+    """Anota los perfiles con marcas de revisión nuevas, cambiadas o borradas."""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        marcas = _MARCAS.get(type(obj))
+        if marcas is None:
+            continue
+        if obj in session.dirty:
+            attrs = inspect(obj).attrs
+            if not any(attrs[marca].history.has_changes() for marca in marcas):
+                continue
+        marcar_cambio(session, obj.profile_id)
+
+
+def _after_commit(session: Session) -> None:
+    """Invalida los contadores de los perfiles que cambiaron."""
+    for profile_id in session.info.pop(_PENDIENTES, ()):
+        contar_pendientes.invalidate_cache(profile_id)  # type: ignore[attr-defined]
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDIENTES, None)
+
+
+def register_review_queue_events(target: type[Session] = Session) -> None:
+    """
+    Registra los listeners que invalidan los contadores de revisión.
+
+    Las sesiones de la aplicación los registran solas en `core.database`;
+    registrarlos otra vez en el mismo destino no duplica los listeners.
+
+    Args:
+        target: Clase de sesión a la que se aplican (default: todas)
+    """
+    if event.contains(target, "after_commit", _after_commit):
+        return
+    event.listen(target, "before_flush", _before_flush)
+    event.listen(target, "after_commit", _after_commit)
+    event.listen(target, "after_rollback", _after_rollback)
+    logger.info("✅ Cola de revisión: eventos registrados")
+
+
+def unregister_review_queue_events(target: type[Session] = Session) -> None:
+    """
+    Desregistra los listeners.
+
+    Args:
+        target: Clase de sesión usada al registrarlos
+    """
+    event.remove(target, "before_flush", _before_flush)
+    event.remove(target, "after_commit", _after_commit)
+    event.remove(target, "after_rollback", _after_rollback)
@@ -10,14 +10,16 @@ Este servicio se encarga de:
 6. Aprender de las respuestas para futuras transacciones
 """
 
-from datetime import datetime, UTC, timedelta
-from decimal import Decimal
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime, UTC, timedelta
+from decimal import ROUND_HALF_UP, Decimal
 import json
 import re
 from typing import Any
 from dataclasses import dataclass
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.core.logging import get_logger
@@ -27,6 +29,8 @@ from finanzas_tracker.models.pending_question import (
     QuestionStatus,
     QuestionType,
 )
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.sinpe_transfer_email import SinpeTransferEmail
 from finanzas_tracker.models.transaction import Transaction
 
 
@@ -42,6 +46,58 @@ class TransferenciaCorreo:
     concepto: str
     referencia: str
     email_date: datetime
+    email_id: str = ""
+    transaction_id: str | None = None  # Transacción con la que ya hizo match
+
+
+class IndiceTransferencias:
+    """
+    Índice hash de transferencias de correo por (monto en céntimos, día).
+    
+    Reemplaza recorrer todos los correos por cada transacción: una búsqueda
+    sólo revisa las llaves dentro de la tolerancia de monto (±1 céntimo)
+    y de fecha (±N días).
+    """
+
+    def __init__(self, transferencias: Iterable[TransferenciaCorreo]) -> None:
+        self._por_llave: dict[tuple[int, date], list[TransferenciaCorreo]] = defaultdict(list)
+        self._total = 0
+        for trans in transferencias:
+            self._por_llave[(self._centimos(trans.monto), trans.fecha.date())].append(trans)
+            self._total += 1
+
+    def __len__(self) -> int:
+        return self._total
+
+    @staticmethod
+    def _centimos(monto: Decimal) -> int:
+        return int((Decimal(monto) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+    def buscar(
+        self,
+        monto: Decimal,
+        fecha: datetime,
+        tolerancia_dias: int = 2,
+    ) -> list[TransferenciaCorreo]:
+        """
+        Busca transferencias con el mismo monto y fecha dentro de la tolerancia.
+        
+        Args:
+            monto: Monto de la transacción (tolerancia de ±0.01)
+            fecha: Fecha de la transacción (se compara sólo el día)
+            tolerancia_dias: Días de diferencia permitidos
+            
+        Returns:
+            Transferencias que coinciden
+        """
+        centimos = self._centimos(monto)
+        dia = fecha.date()
+        matches: list[TransferenciaCorreo] = []
+        for delta in range(-tolerancia_dias, tolerancia_dias + 1):
+            dia_candidato = dia + timedelta(days=delta)
+            for centimos_candidato in (centimos - 1, centimos, centimos + 1):
+                matches.extend(self._por_llave.get((centimos_candidato, dia_candidato), ()))
+        return matches
 
 
 class SinpeReconciliationService:
@@ -106,6 +162,9 @@ class SinpeReconciliationService:
         "deuda",
     }
 
+    # Días de diferencia permitidos entre el correo y la transacción
+    TOLERANCIA_DIAS_MATCH = 2
+
     def __init__(self, db: Session) -> None:
         """Inicializa el servicio."""
         self.db = db
@@ -122,9 +181,11 @@ class SinpeReconciliationService:
         1. Determinar rango de fechas correcto:
            - Desde: 28 del mes anterior a fecha_corte
            - Hasta: Hoy
-        2. Buscar correos de "Notificación de Transferencia" de BAC
+        2. Buscar correos nuevos de "Notificación de Transferencia" de BAC
+           (los ya procesados se guardan en sinpe_transfer_emails)
         3. Extraer beneficiario, monto, fecha, concepto
-        4. Buscar transacciones SINPE/transferencias y hacer match
+        4. Revisar sólo las transferencias marcadas como pendientes o que
+           llegaron desde la última corrida, con un índice (monto, día)
         5. Si hay match único → Actualizar transacción con datos del correo
         6. Si hay múltiples matches → Dejar para preguntar al usuario
         
@@ -135,8 +196,6 @@ class SinpeReconciliationService:
         Returns:
             Dict con estadísticas
         """
-        from finanzas_tracker.services.auth_manager import AuthManager
-        import requests
         from dateutil.relativedelta import relativedelta
         
         stats = {
@@ -151,7 +210,6 @@ class SinpeReconciliationService:
         # 1. Determinar fecha de corte si no se pasó
         if not fecha_corte:
             # Buscar la transacción más antigua del perfil para estimar fecha de corte
-            from sqlalchemy import func
             fecha_min = self.db.query(func.min(Transaction.fecha_transaccion)).filter(
                 Transaction.profile_id == profile_id,
                 Transaction.deleted_at.is_(None),
@@ -173,82 +231,59 @@ class SinpeReconciliationService:
         # Calcular 28 del mes anterior
         mes_anterior = fecha_corte - relativedelta(months=1)
         start_date = datetime(mes_anterior.year, mes_anterior.month, 28, tzinfo=UTC)
-        end_date = datetime.now(UTC)
         
-        logger.info(
-            f"🔍 Buscando correos de transferencia: {start_date.strftime('%d/%m/%Y')} → {end_date.strftime('%d/%m/%Y')}"
-        )
-        
-        # 3. Obtener token de Outlook
-        try:
-            auth = AuthManager()
-            token = auth.get_access_token()
-            if not token:
-                logger.warning("No hay token de Outlook disponible")
-                return stats
-        except Exception as e:
-            logger.warning(f"No se pudo obtener token de Outlook: {e}")
+        # 3. Sincronizar correos nuevos (los ya procesados están en la BD)
+        inicio_corrida = datetime.now(UTC)
+        correos_nuevos = self._sincronizar_correos_transferencia(profile_id, start_date)
+        if correos_nuevos is None:
             return stats
+        stats["correos_encontrados"] = correos_nuevos
         
-        # 4. Buscar correos de transferencia
-        headers = {"Authorization": f"Bearer {token}"}
+        # 4. Transferencias a revisar: las marcadas como pendientes y las que
+        #    llegaron desde la última corrida (todas si es la primera vez)
+        profile = self.db.get(Profile, profile_id)
+        ultima_corrida = profile.last_sinpe_reconciliation_at if profile else None
         
-        params = {
-            "$filter": (
-                f"receivedDateTime ge {start_date.isoformat()} "
-                f"and from/emailAddress/address eq 'alerta@baccredomatic.com' "
-                f"and contains(subject, 'Transferencia')"
-            ),
-            "$select": "id,subject,receivedDateTime,body",
-            "$orderby": "receivedDateTime desc",
-            "$top": 200,  # Aumentar límite para buscar más correos
-        }
-        
-        try:
-            response = requests.get(
-                "https://graph.microsoft.com/v1.0/me/messages",
-                headers=headers,
-                params=params,
-                timeout=30,
-            )
-            response.raise_for_status()
-            emails = response.json().get("value", [])
-        except Exception as e:
-            logger.error(f"Error buscando correos de transferencia: {e}")
-            return stats
-        
-        stats["correos_encontrados"] = len(emails)
-        logger.info(f"📧 Encontrados {len(emails)} correos de transferencia")
-        
-        # 5. Extraer datos de cada correo
-        transferencias_correo: list[TransferenciaCorreo] = []
-        for email in emails:
-            try:
-                data = self._extraer_datos_correo_transferencia(email)
-                if data:
-                    transferencias_correo.append(data)
-            except Exception as e:
-                logger.debug(f"Error extrayendo datos de correo: {e}")
-        
-        logger.info(f"📝 Extraídos datos de {len(transferencias_correo)} transferencias de correos")
-        
-        # 6. Buscar TODAS las transferencias del perfil (no solo las marcadas)
-        todas_transferencias = self.db.query(Transaction).filter(
+        base_query = self.db.query(Transaction).filter(
             Transaction.profile_id == profile_id,
             Transaction.deleted_at.is_(None),
             Transaction.tipo_transaccion == "transferencia",
-        ).all()
+        )
+        stats["transferencias_totales"] = base_query.count()
+        
+        if ultima_corrida is not None:
+            base_query = base_query.filter(
+                Transaction.necesita_reconciliacion_sinpe.is_(True)
+                | (Transaction.created_at > ultima_corrida)
+            )
+        transferencias = base_query.all()
         
-        stats["transferencias_totales"] = len(todas_transferencias)
+        stats["transferencias_revisadas"] = len(transferencias)
         stats["auto_categorizados_patron"] = 0
-        logger.info(f"🔍 {len(todas_transferencias)} transferencias totales en el perfil")
+        logger.info(
+            f"🔍 {len(transferencias)} de {stats['transferencias_totales']} "
+            f"transferencias por revisar"
+        )
+        
+        # 5. Índice (monto, día) con los correos guardados que pueden hacer match
+        fechas = [txn.fecha_transaccion for txn in transferencias if txn.fecha_transaccion]
+        if fechas:
+            desde = min(fechas) - timedelta(days=self.TOLERANCIA_DIAS_MATCH + 1)
+            correos_guardados = self._cargar_correos_guardados(profile_id, desde)
+        else:
+            correos_guardados = []
+        correos_por_id = {correo.email_id: correo for correo in correos_guardados}
+        indice = IndiceTransferencias(
+            self._a_transferencia_correo(correo) for correo in correos_guardados
+        )
+        logger.info(f"📝 {len(indice)} transferencias de correos disponibles para match")
         
         # Inicializar servicio de aprendizaje
         from finanzas_tracker.services.pattern_learning_service import PatternLearningService
         learning_service = PatternLearningService(self.db)
         
-        # 7. Para cada transferencia, intentar hacer match con correos
-        for txn in todas_transferencias:
+        # 6. Para cada transferencia, intentar hacer match con correos
+        for txn in transferencias:
             # Si ya tiene beneficiario claro y concepto claro, saltar
             if txn.beneficiario and self._es_descripcion_clara(txn.concepto_transferencia):
                 stats["ya_reconciliados"] += 1
@@ -263,7 +298,7 @@ class SinpeReconciliationService:
                 continue
             
             # Buscar match en correos
-            matches = self._buscar_match_correo(txn, transferencias_correo)
+            matches = self._buscar_match_correo(txn, indice)
             
             if len(matches) == 1:
                 # Match exacto - actualizar transacción con datos del correo
@@ -271,6 +306,10 @@ class SinpeReconciliationService:
                 txn.beneficiario = correo.beneficiario
                 txn.concepto_transferencia = correo.concepto
                 
+                # El correo queda asignado a esta transacción
+                correo.transaction_id = txn.id
+                correos_por_id[correo.email_id].transaction_id = txn.id
+                
                 # Intentar auto-categorizar ahora que tiene beneficiario
                 if learning_service.auto_categorizar_si_confianza_alta(txn):
                     stats["auto_categorizados_patron"] += 1
@@ -316,6 +355,8 @@ class SinpeReconciliationService:
                 txn.necesita_reconciliacion_sinpe = True
                 stats["sin_match"] += 1
         
+        if profile is not None:
+            profile.last_sinpe_reconciliation_at = inicio_corrida
         self.db.commit()
         
         logger.info(
@@ -325,6 +366,154 @@ class SinpeReconciliationService:
         
         return stats
 
+    def _sincronizar_correos_transferencia(
+        self,
+        profile_id: str,
+        start_date: datetime,
+    ) -> int | None:
+        """
+        Descarga y guarda los correos de transferencia que aún no están en la BD.
+        
+        Sólo pide a Outlook los correos recibidos desde el último correo
+        guardado (o desde `start_date` si no hay ninguno) y sigue la
+        paginación de Graph (@odata.nextLink) en lugar de quedarse con la
+        primera página.
+        
+        Args:
+            profile_id: ID del perfil
+            start_date: Inicio del rango si todavía no hay correos guardados
+            
+        Returns:
+            Cantidad de correos nuevos guardados, o None si no se pudo consultar Outlook
+        """
+        from finanzas_tracker.services.auth_manager import AuthManager
+        import requests
+        
+        ultimo_correo = self.db.query(func.max(SinpeTransferEmail.email_date)).filter(
+            SinpeTransferEmail.profile_id == profile_id,
+        ).scalar()
+        if ultimo_correo is not None and ultimo_correo.tzinfo is None:
+            ultimo_correo = ultimo_correo.replace(tzinfo=UTC)
+        desde = max(start_date, ultimo_correo) if ultimo_correo else start_date
+        
+        logger.info(
+            f"🔍 Buscando correos de transferencia: {desde.strftime('%d/%m/%Y')} → hoy"
+        )
+        
+        # Obtener token de Outlook
+        try:
+            auth = AuthManager()
+            token = auth.get_access_token()
+            if not token:
+                logger.warning("No hay token de Outlook disponible")
+                return None
+        except Exception as e:
+            logger.warning(f"No se pudo obtener token de Outlook: {e}")
+            return None
+        
+        headers = {"Authorization": f"Bearer {token}"}
+        url: str | None = "https://graph.microsoft.com/v1.0/me/messages"
+        params: dict[str, Any] | None = {
+            "$filter": (
+                f"receivedDateTime ge {desde.isoformat()} "
+                f"and from/emailAddress/address eq 'alerta@baccredomatic.com' "
+                f"and contains(subject, 'Transferencia')"
+            ),
+            "$select": "id,subject,receivedDateTime,body",
+            "$orderby": "receivedDateTime desc",
+            "$top": 100,
+        }
+        
+        emails: list[dict[str, Any]] = []
+        try:
+            while url:
+                response = requests.get(url, headers=headers, params=params, timeout=30)
+                response.raise_for_status()
+                data = response.json()
+                emails.extend(data.get("value", []))
+                # nextLink ya trae los parámetros de la consulta
+                url = data.get("@odata.nextLink")
+                params = None
+        except Exception as e:
+            logger.error(f"Error buscando correos de transferencia: {e}")
+            return None
+        
+        logger.info(f"📧 Encontrados {len(emails)} correos de transferencia")
+        
+        # Descartar los que ya se guardaron en corridas anteriores
+        ids = [email["id"] for email in emails if email.get("id")]
+        ya_guardados = set(
+            self.db.execute(
+                select(SinpeTransferEmail.email_id).where(
+                    SinpeTransferEmail.profile_id == profile_id,
+                    SinpeTransferEmail.email_id.in_(ids),
+                )
+            ).scalars()
+        ) if ids else set()
+        
+        nuevos = 0
+        for email in emails:
+            email_id = email.get("id")
+            if not email_id or email_id in ya_guardados:
+                continue
+            ya_guardados.add(email_id)
+            try:
+                data = self._extraer_datos_correo_transferencia(email)
+            except Exception as e:
+                logger.debug(f"Error extrayendo datos de correo: {e}")
+                continue
+            if not data:
+                continue
+            
+            fecha = data.fecha if data.fecha.tzinfo else data.fecha.replace(tzinfo=UTC)
+            self.db.add(
+                SinpeTransferEmail(
+                    profile_id=profile_id,
+                    email_id=email_id,
+                    beneficiario=data.beneficiario[:200],
+                    monto=data.monto,
+                    fecha=fecha,
+                    concepto=data.concepto[:500],
+                    referencia=data.referencia[:50],
+                    email_date=data.email_date,
+                )
+            )
+            nuevos += 1
+        
+        if nuevos:
+            self.db.flush()
+        logger.info(f"📝 Guardados {nuevos} correos de transferencia nuevos")
+        
+        return nuevos
+
+    def _cargar_correos_guardados(
+        self,
+        profile_id: str,
+        desde: datetime,
+    ) -> list[SinpeTransferEmail]:
+        """Carga los correos de transferencia guardados con fecha desde `desde`."""
+        if desde.tzinfo is None:
+            desde = desde.replace(tzinfo=UTC)
+        stmt = select(SinpeTransferEmail).where(
+            SinpeTransferEmail.profile_id == profile_id,
+            SinpeTransferEmail.fecha >= desde,
+        )
+        return list(self.db.execute(stmt).scalars().all())
+
+    @staticmethod
+    def _a_transferencia_correo(correo: SinpeTransferEmail) -> TransferenciaCorreo:
+        """Convierte un correo guardado al formato usado para el match."""
+        return TransferenciaCorreo(
+            beneficiario=correo.beneficiario,
+            monto=correo.monto,
+            fecha=correo.fecha,
+            concepto=correo.concepto,
+            referencia=correo.referencia,
+            email_date=correo.email_date,
+            email_id=correo.email_id,
+            transaction_id=correo.transaction_id,
+        )
+
     def _extraer_datos_correo_transferencia(
         self, 
         email: dict,
@@ -423,48 +612,33 @@ class SinpeReconciliationService:
     def _buscar_match_correo(
         self,
         txn: Transaction,
-        transferencias: list[TransferenciaCorreo],
-        tolerancia_dias: int = 2,
+        indice: "IndiceTransferencias",
+        tolerancia_dias: int | None = None,
     ) -> list[TransferenciaCorreo]:
         """
         Busca correos que coincidan con una transacción por monto y fecha.
         
+        Los correos ya asignados a otra transacción no cuentan como match.
+        
         Args:
             txn: Transacción a buscar
-            transferencias: Lista de transferencias extraídas de correos
+            indice: Índice (monto, día) de las transferencias extraídas de correos
             tolerancia_dias: Días de tolerancia para el match de fecha
             
         Returns:
             Lista de transferencias que coinciden (idealmente 1)
         """
-        matches = []
-        
-        txn_monto = txn.monto_crc
-        txn_fecha = txn.fecha_transaccion
-        
-        if not txn_fecha:
-            return matches
+        if not txn.fecha_transaccion:
+            return []
         
-        # Hacer fecha naive para comparación si es necesario
-        if txn_fecha.tzinfo:
-            txn_fecha = txn_fecha.replace(tzinfo=None)
+        if tolerancia_dias is None:
+            tolerancia_dias = self.TOLERANCIA_DIAS_MATCH
         
-        for trans in transferencias:
-            # Match por monto (exacto)
-            if abs(trans.monto - txn_monto) > Decimal("0.01"):
-                continue
-            
-            # Match por fecha (con tolerancia)
-            trans_fecha = trans.fecha
-            if trans_fecha.tzinfo:
-                trans_fecha = trans_fecha.replace(tzinfo=None)
-            
-            diferencia_dias = abs((txn_fecha - trans_fecha).days)
-            
-            if diferencia_dias <= tolerancia_dias:
-                matches.append(trans)
-        
-        return matches
+        return [
+            trans
+            for trans in indice.buscar(txn.monto_crc, txn.fecha_transaccion, tolerancia_dias)
+            if trans.transaction_id in (None, txn.id)
+        ]
 
     def analizar_transacciones_pendientes(
         self,
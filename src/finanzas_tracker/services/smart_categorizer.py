@@ -14,6 +14,7 @@ Autor: Sebastian Cruz
 Versión: 2.0.0
 """
 
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass, field
 from decimal import Decimal
 from enum import StrEnum
@@ -26,10 +27,19 @@ from sqlalchemy.orm import Session
 
 from finanzas_tracker.config.settings import settings
 from finanzas_tracker.core.database import get_session
-from finanzas_tracker.core.claude_credits import can_use_claude, handle_claude_error
+from finanzas_tracker.core.claude_client import get_claude_client, response_text
+from finanzas_tracker.core.claude_credits import (
+    ClaudeServiceUnavailable,
+    can_use_claude,
+    handle_claude_error,
+)
+from finanzas_tracker.core.claude_limits import run_fan_out
 from finanzas_tracker.models.category import Subcategory
 from finanzas_tracker.models.learning import UserMerchantPreference, UserContact
 from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services.merchant_normalizer import CATEGORIZACION
+from finanzas_tracker.services.text_search import ranked
+from finanzas_tracker.services.transaction_service import TransactionService
 
 
 logger = logging.getLogger(__name__)
@@ -250,6 +260,15 @@ class SmartCategorizer:
     - Específico para Costa Rica
     """
     
+    # Prefijo estático de la capa 3 (se cachea junto con las categorías)
+    LLM_SYSTEM_PROMPT = """Eres un experto en finanzas personales de Costa Rica.
+
+Categoriza la transacción que te envíe el usuario usando una de las
+categorías disponibles.
+
+Responde SOLO con JSON:
+{"id": "...", "nombre": "...", "confianza": 80, "razon": "..."}"""
+
     def __init__(self, session: Session | None = None) -> None:
         """Inicializa el categorizador."""
         self._session = session
@@ -303,7 +322,9 @@ class SmartCategorizer:
         
         # CAPA 3: LLM (solo si las capas anteriores no fueron suficientes)
         if not result or result.confidence < 70:
-            llm_result = self._layer3_llm(comercio_clean, monto_float, fecha, tipo_transaccion)
+            llm_result = self._layer3_llm(
+                comercio_clean, monto_float, fecha, tipo_transaccion, profile_id
+            )
             if llm_result:
                 logger.info(f"🤖 Capa 3 (LLM): {llm_result.subcategory_name} ({llm_result.confidence}%)")
                 return llm_result
@@ -316,36 +337,29 @@ class SmartCategorizer:
         # Fallback
         return self._fallback_result(comercio)
     
+    def categorize_many(
+        self,
+        transactions: Sequence[Mapping[str, Any]],
+    ) -> list[CategorizationResult]:
+        """
+        Categoriza un lote de transacciones en paralelo.
+
+        Cada capa abre su propia sesión, así que las transacciones se
+        reparten en hilos (`run_fan_out`); las llamadas de la capa 3 pasan
+        por el limitador compartido de Claude.
+
+        Args:
+            transactions: Dicts con los argumentos de `categorize`
+                (comercio, monto, profile_id, fecha, tipo_transaccion)
+
+        Returns:
+            CategorizationResult por transacción, en el mismo orden
+        """
+        return run_fan_out(lambda kwargs: self.categorize(**kwargs), transactions)
+
     def _clean_merchant_name(self, comercio: str) -> str:
-        """Limpia y normaliza el nombre del comercio."""
-        if not comercio:
-            return ""
-        
-        # Convertir a minúsculas
-        clean = comercio.lower().strip()
-        
-        # Remover caracteres especiales excepto letras, números y espacios
-        clean = re.sub(r'[^\w\s]', ' ', clean)
-        
-        # Remover códigos de referencia largos (strings de 8+ chars con números y letras mezclados)
-        # Ej: "847831OY3", "AB12CD34EF" - pero NO marcas como "bet365"
-        clean = re.sub(r'\b(?=[A-Za-z]*\d)(?=\d*[A-Za-z])[A-Za-z0-9]{8,}\b', '', clean)
-        
-        # Remover palabras de ruido (solo términos bancarios/ubicaciones)
-        noise_words = [
-            'san jose', 'costa rica', 'heredia', 'alajuela', 'cartago',
-            'www', 'http', 'https', 'com', 'net', 'org',
-            'sucursal', 'agencia', 'tienda', 'local',
-            'debit', 'credit', 'visa', 'mastercard', 'amex',
-            'pos', 'tpv', 'pin',
-        ]
-        for word in noise_words:
-            clean = re.sub(rf'\b{word}\b', ' ', clean)
-        
-        # Limpiar espacios múltiples
-        clean = re.sub(r'\s+', ' ', clean).strip()
-        
-        return clean
+        """Limpia y normaliza el nombre del comercio (ver `merchant_normalizer`)."""
+        return CATEGORIZACION(comercio)
     
     def _layer1_deterministic(
         self,
@@ -370,10 +384,11 @@ class SmartCategorizer:
             if pref_result:
                 return pref_result
         
-        # 1.1 Historial del usuario
+        # 1.1 Historial del usuario (un parecido sólo difuso queda de último recurso)
+        history_result = None
         if profile_id:
             history_result = self._check_user_history(comercio, profile_id)
-            if history_result:
+            if history_result and not history_result.needs_review:
                 return history_result
         
         # 1.2 Contactos SINPE aprendidos
@@ -397,7 +412,7 @@ class SmartCategorizer:
         if keyword_result:
             return keyword_result
         
-        return None
+        return history_result
     
     def _check_user_preferences(self, comercio: str, profile_id: str) -> CategorizationResult | None:
         """
@@ -495,22 +510,36 @@ class SmartCategorizer:
         """Busca en el historial del usuario."""
         try:
             with get_session() as session:
-                # Buscar transacciones anteriores del mismo comercio categorizadas
-                similar = (
-                    session.query(Transaction)
-                    .filter(
+                # Transacción anterior categorizada más parecida al comercio
+                # (la más reciente entre iguales)
+                stmt = ranked(
+                    select(Transaction).where(
                         Transaction.profile_id == profile_id,
-                        Transaction.comercio.ilike(f"%{comercio}%"),
                         Transaction.subcategory_id.isnot(None),
                         Transaction.necesita_revision == False,
                         Transaction.deleted_at.is_(None),
-                    )
-                    .order_by(Transaction.fecha_transaccion.desc())
-                    .first()
-                )
+                    ),
+                    [Transaction.comercio],
+                    comercio,
+                    limit=1,
+                    with_strength=True,
+                ).order_by(Transaction.fecha_transaccion.desc())
+                row = session.execute(stmt).first()
                 
-                if similar and similar.subcategory:
+                if row and row[0].subcategory:
+                    similar, fuerte = row
                     subcat = similar.subcategory
+                    if not fuerte:
+                        # Sólo parecido por trigramas: puede ser otro comercio
+                        return CategorizationResult(
+                            subcategory_id=subcat.id,
+                            subcategory_name=subcat.nombre,
+                            category_type=subcat.category.tipo if subcat.category else "necesidades",
+                            confidence=60,
+                            source=CategorizationSource.HISTORY,
+                            needs_review=True,
+                            reasoning=f"Parecido a '{similar.comercio}' de tu historial ({subcat.nombre})",
+                        )
                     return CategorizationResult(
                         subcategory_id=subcat.id,
                         subcategory_name=subcat.nombre,
@@ -657,33 +686,38 @@ class SmartCategorizer:
             # TODO: Implementar con embeddings reales cuando se configure Voyage AI
             
             with get_session() as session:
-                # Buscar transacciones similares por nombre de comercio
-                similar_txns = (
-                    session.query(Transaction)
-                    .filter(
+                # Las 5 transacciones con el comercio más parecido (trigramas)
+                stmt = ranked(
+                    select(Transaction).where(
                         Transaction.subcategory_id.isnot(None),
                         Transaction.necesita_revision == False,
                         Transaction.deleted_at.is_(None),
-                        # Buscar comercios que contengan palabras similares
-                        Transaction.comercio.ilike(f"%{comercio[:10]}%"),
-                    )
-                    .limit(5)
-                    .all()
+                    ),
+                    [Transaction.comercio],
+                    comercio[:10],
+                    limit=5,
+                    with_strength=True,
                 )
+                similar_txns = session.execute(stmt).all()
                 
                 if similar_txns:
-                    # Contar categorías más comunes
+                    # Contar categorías más comunes (y cuántas por coincidencia fuerte)
                     cat_counts: dict[str, int] = {}
-                    for txn in similar_txns:
+                    strong_counts: dict[str, int] = {}
+                    for txn, fuerte in similar_txns:
                         if txn.subcategory:
                             key = txn.subcategory.id
                             cat_counts[key] = cat_counts.get(key, 0) + 1
+                            if fuerte:
+                                strong_counts[key] = strong_counts.get(key, 0) + 1
                     
                     if cat_counts:
                         best_cat_id = max(cat_counts, key=cat_counts.get)
                         count = cat_counts[best_cat_id]
                         
                         if count >= 2:  # Al menos 2 coincidencias
+                            # Sin 2 coincidencias fuertes es sólo una sugerencia
+                            confiable = strong_counts.get(best_cat_id, 0) >= 2
                             # Obtener subcategoría
                             subcat = session.query(Subcategory).get(best_cat_id)
                             if subcat:
@@ -691,9 +725,9 @@ class SmartCategorizer:
                                     subcategory_id=subcat.id,
                                     subcategory_name=subcat.nombre,
                                     category_type=subcat.category.tipo if subcat.category else "necesidades",
-                                    confidence=85,
+                                    confidence=85 if confiable else 60,
                                     source=CategorizationSource.EMBEDDING,
-                                    needs_review=False,
+                                    needs_review=not confiable,
                                     reasoning=f"Similar a {count} transacciones previas",
                                 )
         except Exception as e:
@@ -707,12 +741,15 @@ class SmartCategorizer:
         monto: float,
         fecha: str | None,
         tipo_transaccion: str | None,
+        profile_id: str | None = None,
     ) -> CategorizationResult | None:
         """
         Capa 3: Claude AI para casos difíciles.
         
         Solo se usa cuando las capas anteriores no dan suficiente confianza.
         Usa enfoque reactivo: intenta llamar y maneja errores de créditos.
+        Las instrucciones y la lista de categorías van en el prefijo
+        cacheado; sólo la transacción cambia entre llamadas.
         """
         try:
             # Verificar si podemos usar Claude (sin hacer llamada a la API)
@@ -723,11 +760,9 @@ class SmartCategorizer:
             
             import anthropic
             
-            client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-            
-            # Obtener subcategorías disponibles
+            # Obtener subcategorías disponibles (orden estable para el cache)
             with get_session() as session:
-                subcats = session.query(Subcategory).all()
+                subcats = session.query(Subcategory).order_by(Subcategory.id).all()
                 categorias_json = [
                     {
                         "id": s.id,
@@ -737,28 +772,26 @@ class SmartCategorizer:
                     for s in subcats
                 ]
             
-            prompt = f"""Eres un experto en finanzas personales de Costa Rica.
-
-Categoriza esta transacción:
+            prompt = f"""Categoriza esta transacción:
 - Comercio: {comercio}
 - Monto: ₡{monto:,.0f}
-- Tipo: {tipo_transaccion or 'desconocido'}
-
-Categorías disponibles:
-{categorias_json}
-
-Responde SOLO con JSON:
-{{"id": "...", "nombre": "...", "confianza": 80, "razon": "..."}}"""
+- Tipo: {tipo_transaccion or 'desconocido'}"""
 
-            response = client.messages.create(
+            response = get_claude_client().create(
+                call_site="smart_categorizer.layer3",
+                system=[
+                    self.LLM_SYSTEM_PROMPT,
+                    f"Categorías disponibles:\n{categorias_json}",
+                ],
+                messages=[{"role": "user", "content": prompt}],
                 model=settings.claude_model,  # Haiku 4.5 - rápido y económico
                 max_tokens=200,
                 temperature=0,
-                messages=[{"role": "user", "content": prompt}],
+                profile_id=profile_id,
             )
             
             import json
-            text = response.content[0].text.strip()
+            text = response_text(response).strip()
             if text.startswith("```"):
                 text = text.split("```")[1].replace("json", "").strip()
             
@@ -782,6 +815,10 @@ Responde SOLO con JSON:
             logger.error(f"Error de API en capa LLM: {e}")
             return None
             
+        except ClaudeServiceUnavailable as e:
+            logger.info(f"⏭️ Capa LLM: {e.message}")
+            return None
+            
         except Exception as e:
             logger.error(f"Error en capa LLM: {e}")
             return None
@@ -827,20 +864,20 @@ Responde SOLO con JSON:
         Este feedback se usa para:
         1. Actualizar el historial del usuario
         2. Mejorar la precisión futura para comercios similares
+        
+        Usa el mismo camino que la actualización por lotes
+        (`TransactionService.actualizar_batch`): el aprendizaje se encola
+        como job y el cache del perfil se invalida.
         """
         try:
             with get_session() as session:
-                # Actualizar la transacción
-                txn = session.query(Transaction).get(transaction_id)
-                if txn:
-                    txn.subcategory_id = correct_subcategory_id
-                    txn.necesita_revision = False
-                    txn.confianza_categoria = 100
-                    txn.notas = (txn.notas or "") + " [Corregido por usuario]"
-                    session.commit()
-                    
+                actualizadas = TransactionService(session).actualizar_batch(
+                    profile_id,
+                    [{"id": transaction_id, "subcategory_id": correct_subcategory_id}],
+                )
+                if actualizadas:
                     logger.info(
-                        f"📝 Corrección registrada: {txn.comercio} → {correct_subcategory_id}"
+                        f"📝 Corrección registrada: {transaction_id} → {correct_subcategory_id}"
                     )
         except Exception as e:
             logger.error(f"Error registrando corrección: {e}")
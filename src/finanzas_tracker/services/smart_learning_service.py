@@ -44,7 +44,6 @@ __all__ = [
 ]
 
 import logging
-import unicodedata
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal
@@ -52,7 +51,7 @@ from typing import TYPE_CHECKING
 from uuid import UUID
 
 import numpy as np
-from sqlalchemy import and_, func, select, text
+from sqlalchemy import and_, delete, func, select, text as sql_text, update
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.models.category import Subcategory
@@ -67,6 +66,13 @@ from finanzas_tracker.models.smart_learning import (
     UserLearningProfile,
 )
 from finanzas_tracker.services.local_embedding_service import LocalEmbeddingService
+from finanzas_tracker.services.merchant_normalizer import APRENDIZAJE
+from finanzas_tracker.services.pattern_clustering import (
+    UnionFind,
+    centroid,
+    normalize_rows,
+    similar_pairs,
+)
 
 if TYPE_CHECKING:
     from finanzas_tracker.models.transaction import Transaction
@@ -168,6 +174,8 @@ class SmartLearningService:
     AUTO_APPROVE_THRESHOLD = 0.90  # Confianza mínima para auto-aprobar
     SIMILARITY_THRESHOLD = 0.75   # Similitud mínima para considerar un match
     MIN_USERS_FOR_GLOBAL = 5       # Usuarios mínimos para patrón global
+    CLUSTER_THRESHOLD = 0.85       # Similitud mínima para agrupar patrones en un cluster
+    CLUSTER_PROBE = 3              # Clusters más cercanos a revisar en cada búsqueda
     
     def __init__(self, db: Session) -> None:
         """Inicializa el servicio."""
@@ -418,7 +426,9 @@ class SmartLearningService:
         Encuentra patrones similares usando embeddings y pgvector.
         
         Usa cosine similarity para encontrar patrones con significado similar,
-        aunque el texto sea diferente.
+        aunque el texto sea diferente. Si el perfil tiene clusters (ver
+        merge_similar_patterns), sólo se rankean los patrones de los
+        CLUSTER_PROBE centroides más cercanos y los aún sin cluster.
         """
         # Generar embedding del texto
         embedding = self.embedding_service.embed_text(text)
@@ -433,24 +443,40 @@ class SmartLearningService:
             # Query con pgvector cosine distance
             # El operador <=> calcula distancia coseno
             result = self.db.execute(
-                text("""
+                sql_text("""
+                    WITH nearest_clusters AS (
+                        SELECT pc.id
+                        FROM pattern_clusters pc
+                        WHERE pc.profile_id = :profile_id
+                          AND pc.centroid IS NOT NULL
+                        ORDER BY pc.centroid <=> CAST(:embedding AS vector)
+                        LIMIT :cluster_probe
+                    )
                     SELECT 
                         tp.id,
                         tp.pattern_text,
                         tp.subcategory_id,
                         tp.user_label,
                         tp.confidence,
-                        1 - (tp.embedding <=> :embedding::vector) as similarity
+                        s.nombre AS subcategory_name,
+                        1 - (tp.embedding <=> CAST(:embedding AS vector)) as similarity
                     FROM transaction_patterns tp
+                    LEFT JOIN subcategories s ON s.id = tp.subcategory_id
                     WHERE tp.profile_id = :profile_id
                       AND tp.deleted_at IS NULL
                       AND tp.embedding IS NOT NULL
-                    ORDER BY tp.embedding <=> :embedding::vector
+                      AND (
+                          tp.cluster_id IS NULL
+                          OR tp.cluster_id IN (SELECT id FROM nearest_clusters)
+                      )
+                    ORDER BY tp.embedding <=> CAST(:embedding AS vector)
                     LIMIT :limit
                 """),
                 {
                     "profile_id": profile_id,
-                    "embedding": str(embedding),  # pgvector acepta string de lista
+                    # pgvector acepta string de lista; misma dimensión que la columna
+                    "embedding": str(self._to_storage_dim(embedding)),
+                    "cluster_probe": self.CLUSTER_PROBE,
                     "limit": limit,
                 }
             ).fetchall()
@@ -460,14 +486,11 @@ class SmartLearningService:
         
         patterns: list[SimilarPattern] = []
         for row in result:
-            # Obtener nombre de subcategoría
-            subcat = self.db.get(Subcategory, row.subcategory_id)
-            
             patterns.append(SimilarPattern(
                 pattern_id=row.id,
                 pattern_text=row.pattern_text,
                 subcategory_id=row.subcategory_id,
-                subcategory_name=subcat.nombre if subcat else None,
+                subcategory_name=row.subcategory_name,
                 user_label=row.user_label,
                 similarity=float(row.similarity),
                 source="user",
@@ -476,6 +499,18 @@ class SmartLearningService:
         
         return patterns
     
+    @staticmethod
+    def _to_storage_dim(embedding: list[float]) -> list[float]:
+        """Padea o trunca a 1536 dimensiones (columna Vector(1536), compatible con OpenAI)."""
+        current_dim = len(embedding)
+        target_dim = 1536
+        
+        if current_dim < target_dim:
+            # Padear con ceros
+            return embedding + [0.0] * (target_dim - current_dim)
+        # Truncar (no debería pasar con all-MiniLM-L6-v2)
+        return embedding[:target_dim]
+    
     def _generate_and_store_embedding(
         self,
         pattern: TransactionPattern,
@@ -483,19 +518,7 @@ class SmartLearningService:
         """Genera y almacena el embedding para un patrón."""
         try:
             embedding = self.embedding_service.embed_text(pattern.pattern_text)
-            
-            # Padear o truncar a 1536 dimensiones (para compatibilidad con OpenAI)
-            current_dim = len(embedding)
-            target_dim = 1536
-            
-            if current_dim < target_dim:
-                # Padear con ceros
-                embedding = embedding + [0.0] * (target_dim - current_dim)
-            elif current_dim > target_dim:
-                # Truncar (no debería pasar con all-MiniLM-L6-v2)
-                embedding = embedding[:target_dim]
-            
-            pattern.embedding = embedding
+            pattern.embedding = self._to_storage_dim(embedding)
             pattern.embedding_model = LocalEmbeddingService.MODEL_NAME
             
         except Exception as e:
@@ -573,30 +596,14 @@ class SmartLearningService:
     
     def _normalize_text(self, text: str) -> str:
         """
-        Normaliza texto para matching.
+        Normaliza texto para matching (ver `merchant_normalizer`).
         
         - Convierte a mayúsculas
         - Quita acentos
         - Quita caracteres especiales
         - Normaliza espacios
         """
-        if not text:
-            return ""
-        
-        # Uppercase y strip
-        normalized = text.upper().strip()
-        
-        # Quitar acentos
-        normalized = unicodedata.normalize("NFD", normalized)
-        normalized = "".join(c for c in normalized if unicodedata.category(c) != "Mn")
-        
-        # Solo alfanumérico y espacios
-        normalized = "".join(c for c in normalized if c.isalnum() or c.isspace())
-        
-        # Normalizar espacios
-        normalized = " ".join(normalized.split())
-        
-        return normalized
+        return APRENDIZAJE(text)
     
     def _find_existing_pattern(
         self,
@@ -826,7 +833,7 @@ class SmartLearningService:
     # Mantenimiento y Optimización
     # ========================================================================
     
-    def regenerate_embeddings(self, profile_id: str) -> int:
+    def regenerate_embeddings(self, profile_id: str, batch_size: int = 256) -> int:
         """
         Regenera embeddings para todos los patrones de un usuario.
         
@@ -835,36 +842,191 @@ class SmartLearningService:
         - Se cambia de proveedor
         - Se detectan embeddings corruptos
         
+        Usa el pipeline por batches de EmbeddingMigrationService (lectura por
+        keyset, un UPDATE por batch y checkpoint para poder reanudar).
+        
+        Args:
+            profile_id: ID del perfil
+            batch_size: Patrones por batch
+        
         Returns:
             Número de patrones actualizados
         """
-        patterns = self.db.query(TransactionPattern).filter(
-            TransactionPattern.profile_id == profile_id,
-            TransactionPattern.deleted_at.is_(None),
-        ).all()
-        
-        count = 0
-        for pattern in patterns:
-            self._generate_and_store_embedding(pattern)
-            count += 1
+        from finanzas_tracker.services.embedding_migration import EmbeddingMigrationService
         
-        self.db.commit()
-        logger.info(f"🔄 Regenerados {count} embeddings para perfil {profile_id}")
+        migrator = EmbeddingMigrationService(self.db, batch_size=batch_size)
+        checkpoint = migrator.migrate_pattern_embeddings(profile_id, restart=True)
+        logger.info(f"🔄 Regenerados {checkpoint.processed} embeddings para perfil {profile_id}")
         
-        return count
+        return checkpoint.processed
     
     def merge_similar_patterns(
         self,
         profile_id: str,
         similarity_threshold: float = 0.95,
+        cluster_threshold: float | None = None,
+        block_size: int = 1024,
     ) -> int:
         """
-        Fusiona patrones muy similares para reducir duplicados.
+        Fusiona patrones casi duplicados y recalcula los clusters del perfil.
+        
+        Carga los embeddings del perfil en una matriz NumPy, calcula la
+        similitud coseno por bloques y agrupa con union-find:
+        
+        - Pares >= similarity_threshold con la misma subcategoría se fusionan
+          en un solo patrón (se suman estadísticas, el resto queda eliminado).
+        - Pares >= cluster_threshold forman clusters; cada uno se guarda en
+          `PatternCluster` con su centroide, y `_find_similar_patterns` busca
+          primero los centroides más cercanos para reducir candidatos.
+        
+        Args:
+            profile_id: Perfil a procesar
+            similarity_threshold: Similitud mínima para fusionar patrones
+            cluster_threshold: Similitud mínima para agrupar en un cluster
+                (default: CLUSTER_THRESHOLD)
+            block_size: Filas por bloque de la matriz de similitud
         
         Returns:
-            Número de patrones fusionados
+            Número de patrones fusionados (eliminados)
         """
-        # TODO: Implementar con clustering
-        # Por ahora, placeholder
-        logger.warning("merge_similar_patterns aún no implementado")
-        return 0
+        if cluster_threshold is None:
+            cluster_threshold = self.CLUSTER_THRESHOLD
+        
+        patterns = self.db.query(TransactionPattern).filter(
+            TransactionPattern.profile_id == profile_id,
+            TransactionPattern.deleted_at.is_(None),
+            TransactionPattern.embedding.isnot(None),
+        ).order_by(TransactionPattern.created_at).all()
+        
+        if not patterns:
+            return 0
+        
+        normalized, _ = normalize_rows(np.asarray([p.embedding for p in patterns]))
+        merge_sets = UnionFind(len(patterns))
+        cluster_sets = UnionFind(len(patterns))
+        
+        min_threshold = min(similarity_threshold, cluster_threshold)
+        for rows, cols, sims in similar_pairs(normalized, min_threshold, block_size):
+            for i, j, sim in zip(rows.tolist(), cols.tolist(), sims.tolist(), strict=True):
+                if sim >= cluster_threshold:
+                    cluster_sets.union(i, j)
+                if (
+                    sim >= similarity_threshold
+                    and patterns[i].subcategory_id == patterns[j].subcategory_id
+                ):
+                    merge_sets.union(i, j)
+        
+        # 1. Fusionar duplicados
+        merged: set[int] = set()
+        for group in merge_sets.groups():
+            if len(group) < 2:
+                continue
+            survivor_idx = max(group, key=lambda i: patterns[i].times_matched)
+            others = [i for i in group if i != survivor_idx]
+            self._merge_pattern_stats(
+                patterns[survivor_idx], [patterns[i] for i in others]
+            )
+            merged.update(others)
+        
+        # 2. Recalcular clusters del perfil con los patrones que sobreviven
+        self._rebuild_clusters(
+            profile_id,
+            [
+                [i for i in group if i not in merged]
+                for group in cluster_sets.groups()
+            ],
+            patterns,
+            normalized,
+        )
+        
+        self.db.commit()
+        logger.info(
+            f"🧩 Perfil {profile_id}: {len(merged)} patrones fusionados, "
+            f"{len(patterns) - len(merged)} activos"
+        )
+        return len(merged)
+    
+    def _merge_pattern_stats(
+        self,
+        survivor: TransactionPattern,
+        duplicates: list[TransactionPattern],
+    ) -> None:
+        """Suma las estadísticas de los duplicados en `survivor` y los elimina."""
+        now = datetime.now(UTC)
+        for dup in duplicates:
+            survivor.times_matched += dup.times_matched
+            survivor.times_confirmed += dup.times_confirmed
+            survivor.times_rejected += dup.times_rejected
+            survivor.total_amount = (survivor.total_amount or Decimal("0")) + (
+                dup.total_amount or Decimal("0")
+            )
+            if dup.min_amount is not None and (
+                survivor.min_amount is None or dup.min_amount < survivor.min_amount
+            ):
+                survivor.min_amount = dup.min_amount
+            if dup.max_amount is not None and (
+                survivor.max_amount is None or dup.max_amount > survivor.max_amount
+            ):
+                survivor.max_amount = dup.max_amount
+            if dup.first_seen_at and dup.first_seen_at < survivor.first_seen_at:
+                survivor.first_seen_at = dup.first_seen_at
+            if dup.last_seen_at and dup.last_seen_at > survivor.last_seen_at:
+                survivor.last_seen_at = dup.last_seen_at
+            survivor.user_label = survivor.user_label or dup.user_label
+            dup.deleted_at = now
+        
+        if survivor.times_matched and survivor.total_amount:
+            survivor.avg_amount = survivor.total_amount / survivor.times_matched
+        survivor.update_confidence()
+        survivor.updated_at = now
+        
+        self._log_learning_event(
+            profile_id=survivor.profile_id,
+            event_type=LearningEventType.PATTERN_MERGED,
+            input_text=survivor.pattern_text,
+            new_subcategory_id=survivor.subcategory_id,
+            pattern_id=survivor.id,
+        )
+    
+    def _rebuild_clusters(
+        self,
+        profile_id: str,
+        groups: list[list[int]],
+        patterns: list[TransactionPattern],
+        normalized: np.ndarray,
+    ) -> None:
+        """Reemplaza los PatternCluster del perfil por los grupos calculados."""
+        self.db.execute(
+            update(TransactionPattern)
+            .where(TransactionPattern.profile_id == profile_id)
+            .values(cluster_id=None)
+        )
+        self.db.execute(delete(PatternCluster).where(PatternCluster.profile_id == profile_id))
+        
+        for group in groups:
+            if not group:
+                continue
+            members = [patterns[i] for i in group]
+            weights = np.array([max(p.times_matched, 1) for p in members], dtype=np.float32)
+            
+            votes: dict[str, int] = {}
+            for member in members:
+                votes[member.subcategory_id] = (
+                    votes.get(member.subcategory_id, 0) + max(member.times_matched, 1)
+                )
+            representative = max(members, key=lambda p: p.times_matched)
+            
+            cluster = PatternCluster(
+                profile_id=profile_id,
+                name=representative.pattern_text[:200],
+                centroid=centroid(normalized[group], weights).tolist(),
+                primary_subcategory_id=max(votes, key=votes.__getitem__),
+                pattern_count=len(members),
+                avg_confidence=Decimal(
+                    str(round(sum(float(p.confidence) for p in members) / len(members), 4))
+                ),
+            )
+            self.db.add(cluster)
+            self.db.flush()
+            for member in members:
+                member.cluster_id = cluster.id
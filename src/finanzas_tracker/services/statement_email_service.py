@@ -13,19 +13,25 @@ Flujo:
 5. Notificar que llegó el estado de cuenta
 """
 
+from collections.abc import Callable
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from datetime import UTC, datetime
+import io
 from pathlib import Path
 import tempfile
+import threading
 from typing import TYPE_CHECKING, Any
 
 import requests
 
+from finanzas_tracker.config.settings import settings
 from finanzas_tracker.core.logging import get_logger
 from finanzas_tracker.parsers import BACCreditCardParser, BACPDFParser
 from finanzas_tracker.parsers.bac_credit_card_parser import CreditCardStatementResult
 from finanzas_tracker.parsers.bac_pdf_parser import BACStatementResult
 from finanzas_tracker.services.auth_manager import auth_manager
+from finanzas_tracker.services.statement_pipeline import PipelineStats, StatementPipeline
 
 
 if TYPE_CHECKING:
@@ -89,6 +95,31 @@ class ProcessedStatement:
     transactions_skipped: int = 0
     error: str | None = None
 
+    def to_summary(self) -> dict[str, Any]:
+        """Resumen serializable a JSON (resultado de jobs y respuestas de la API)."""
+        summary: dict[str, Any] = {
+            "email_subject": self.email_info.subject,
+            "attachment_name": self.email_info.attachment_name,
+            "success": self.error is None and self.statement_result is not None,
+            "error": self.error,
+        }
+        if self.error or self.statement_result is None:
+            summary["error"] = self.error or "No statement result"
+            return summary
+
+        # Nombre del titular y cuentas según el tipo de resultado
+        metadata = self.statement_result.metadata
+        summary["titular"] = (
+            metadata.nombre_titular
+            if hasattr(metadata, "nombre_titular")
+            else getattr(metadata, "nombre_cliente", "Unknown")
+        )
+        summary["fecha_corte"] = metadata.fecha_corte.isoformat()
+        summary["total_transacciones"] = len(self.statement_result.transactions)
+        summary["cuentas_encontradas"] = len(metadata.cuentas) if hasattr(metadata, "cuentas") else 0
+        summary["transacciones_creadas"] = self.transactions_created
+        return summary
+
 
 class StatementEmailService:
     """
@@ -109,6 +140,7 @@ class StatementEmailService:
         self.auth = auth_manager
         self.pdf_parser = BACPDFParser()
         self.credit_card_parser = BACCreditCardParser()
+        self.last_pipeline_stats: PipelineStats | None = None
         logger.info("StatementEmailService inicializado")
 
     def _get_headers(self) -> dict[str, str]:
@@ -284,6 +316,45 @@ class StatementEmailService:
             logger.error(f"Error obteniendo adjuntos: {e}")
             return []
 
+    def download_attachment_content(
+        self,
+        email_id: str,
+        attachment_id: str,
+        chunk_size: int = 64 * 1024,
+    ) -> io.BytesIO | None:
+        """
+        Descarga un adjunto a memoria, por streaming.
+
+        Usa el endpoint `$value` de Graph, que entrega los bytes crudos del
+        adjunto: no hay que decodificar base64 ni cargar el JSON completo, y
+        no se toca el disco.
+
+        Args:
+            email_id: ID del correo
+            attachment_id: ID del adjunto
+            chunk_size: Tamaño de cada bloque leído de la respuesta
+
+        Returns:
+            BytesIO con el contenido (posicionado al inicio) o None si falla
+        """
+        url = f"{self.GRAPH_API_BASE}/me/messages/{email_id}/attachments/{attachment_id}/$value"
+
+        try:
+            headers = self._get_headers()
+            content = io.BytesIO()
+            with requests.get(url, headers=headers, timeout=60, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    content.write(chunk)
+
+            content.seek(0)
+            logger.info(f"📥 PDF descargado en memoria ({content.getbuffer().nbytes} bytes)")
+            return content
+
+        except Exception as e:
+            logger.error(f"Error descargando adjunto: {e}")
+            return None
+
     def download_attachment(
         self,
         email_id: str,
@@ -291,7 +362,10 @@ class StatementEmailService:
         save_path: Path | None = None,
     ) -> Path | None:
         """
-        Descarga un adjunto de un correo.
+        Descarga un adjunto de un correo a disco.
+
+        Para procesar el PDF no hace falta: `process_statement` trabaja en
+        memoria con `download_attachment_content`.
 
         Args:
             email_id: ID del correo
@@ -301,32 +375,24 @@ class StatementEmailService:
         Returns:
             Path al archivo descargado o None si falla
         """
-        url = f"{self.GRAPH_API_BASE}/me/messages/{email_id}/attachments/{attachment_id}"
+        content = self.download_attachment_content(email_id, attachment_id)
+        if content is None:
+            return None
 
         try:
-            headers = self._get_headers()
-            response = requests.get(url, headers=headers, timeout=60)
-            response.raise_for_status()
-            data = response.json()
-
-            # El contenido viene en base64
-            import base64
-
-            content_bytes = base64.b64decode(data.get("contentBytes", ""))
-
-            # Guardar archivo
             if save_path is None:
-                # Crear archivo temporal
-                fd, temp_path = tempfile.mkstemp(suffix=".pdf")
-                save_path = Path(temp_path)
-
-            save_path.write_bytes(content_bytes)
-            logger.info(f"📥 PDF descargado: {save_path}")
+                # Crear archivo temporal (el context manager cierra el descriptor)
+                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                    tmp.write(content.getbuffer())
+                    save_path = Path(tmp.name)
+            else:
+                save_path.write_bytes(content.getbuffer())
 
+            logger.info(f"📥 PDF guardado: {save_path}")
             return save_path
 
-        except Exception as e:
-            logger.error(f"Error descargando adjunto: {e}")
+        except OSError as e:
+            logger.error(f"Error guardando adjunto: {e}")
             return None
 
     def process_statement(
@@ -341,7 +407,8 @@ class StatementEmailService:
         Procesa un estado de cuenta: descarga PDF, parsea y opcionalmente guarda en BD.
 
         Detecta automáticamente el tipo (tarjeta o cuenta bancaria)
-        y usa el parser apropiado.
+        y usa el parser apropiado. El PDF se descarga y parsea en memoria;
+        sólo se escribe a disco si `save_pdf=True`.
 
         Args:
             stmt_info: Información del correo con el estado
@@ -356,27 +423,15 @@ class StatementEmailService:
         tipo_label = "💳 Tarjeta" if stmt_info.statement_type == "credit_card" else "🏦 Cuenta"
         logger.info(f"🔄 Procesando {tipo_label}: {stmt_info.attachment_name}")
 
-        # Determinar dónde guardar
-        if save_pdf:
-            if output_dir is None:
-                output_dir = Path("data/raw/statements")
-            output_dir.mkdir(parents=True, exist_ok=True)
+        pdf_path = self._statement_pdf_path(stmt_info, output_dir) if save_pdf else None
 
-            # Nombre único basado en fecha y tipo
-            date_str = stmt_info.received_date.strftime("%Y%m%d")
-            prefix = "tarjeta" if stmt_info.statement_type == "credit_card" else "cuenta"
-            pdf_path = output_dir / f"estado_{prefix}_{date_str}.pdf"
-        else:
-            pdf_path = None
-
-        # Descargar PDF
-        downloaded_path = self.download_attachment(
+        # Descargar PDF (en memoria)
+        pdf_content = self.download_attachment_content(
             stmt_info.email_id,
             stmt_info.attachment_id,
-            pdf_path,
         )
 
-        if not downloaded_path:
+        if pdf_content is None:
             return ProcessedStatement(
                 email_info=stmt_info,
                 statement_result=None,
@@ -384,76 +439,25 @@ class StatementEmailService:
             )
 
         try:
-            transactions_created = 0
-            transactions_skipped = 0
-            saved_to_db = False
+            if pdf_path is not None:
+                pdf_path.write_bytes(pdf_content.getbuffer())
+                logger.info(f"💾 PDF guardado: {pdf_path}")
+
             result: BACStatementResult | CreditCardStatementResult
 
             # Usar parser según tipo
             if stmt_info.statement_type == "credit_card":
-                cc_result = self.credit_card_parser.parse(downloaded_path)
-                result = cc_result
-                logger.success(
-                    f"✅ Estado de tarjeta procesado: "
-                    f"{cc_result.metadata.tarjeta_marca} ***{cc_result.metadata.tarjeta_ultimos_4} - "
-                    f"{len(cc_result.transactions)} transacciones"
+                result = self.credit_card_parser.parse(
+                    pdf_content, source_name=stmt_info.attachment_name
                 )
-
-                # Consolidar en BD si se solicita
-                if save_to_db and profile_id:
-                    from finanzas_tracker.services.credit_card_statement_service import (
-                        CreditCardStatementService,
-                    )
-
-                    cc_service = CreditCardStatementService()
-                    cc_consolidation = cc_service.consolidate_statement(cc_result, profile_id)
-
-                    if cc_consolidation.success:
-                        saved_to_db = True
-                        transactions_created = cc_consolidation.transactions_created
-                        transactions_skipped = cc_consolidation.transactions_skipped
-                        logger.success(
-                            f"💾 Consolidado en BD: {transactions_created} creadas, "
-                            f"{transactions_skipped} omitidas"
-                        )
             else:
-                bank_result = self.pdf_parser.parse(downloaded_path)
-                result = bank_result
-                logger.success(
-                    f"✅ Estado de cuenta procesado: "
-                    f"{bank_result.metadata.fecha_corte} - "
-                    f"{len(bank_result.transactions)} transacciones"
-                )
+                result = self.pdf_parser.parse(pdf_content, source_name=stmt_info.attachment_name)
 
-                # Consolidar cuentas bancarias en BD
-                if save_to_db and profile_id:
-                    from finanzas_tracker.services.bank_account_statement_service import (
-                        BankAccountStatementService,
-                    )
-
-                    bank_service = BankAccountStatementService()
-                    bank_consolidation = bank_service.consolidate_statement(bank_result, profile_id)
-
-                    if bank_consolidation.success:
-                        saved_to_db = True
-                        transactions_created = bank_consolidation.transactions_created
-                        transactions_skipped = bank_consolidation.transactions_skipped
-                        logger.success(
-                            f"💾 Consolidado en BD: {transactions_created} creadas, "
-                            f"{transactions_skipped} omitidas"
-                        )
-
-            # Limpiar archivo temporal si no se guardó permanentemente
-            if not save_pdf and downloaded_path.exists():
-                downloaded_path.unlink()
-
-            return ProcessedStatement(
-                email_info=stmt_info,
-                statement_result=result,
-                pdf_path=pdf_path if save_pdf else None,
-                saved_to_db=saved_to_db,
-                transactions_created=transactions_created,
-                transactions_skipped=transactions_skipped,
+            return self._save_parsed_statement(
+                stmt_info,
+                result,
+                profile_id=profile_id if save_to_db else None,
+                pdf_path=pdf_path,
             )
 
         except Exception as e:
@@ -464,12 +468,104 @@ class StatementEmailService:
                 error=str(e),
             )
 
+    def _statement_pdf_path(self, stmt_info: StatementEmailInfo, output_dir: Path | None) -> Path:
+        """Ruta donde guardar permanentemente el PDF de un estado de cuenta."""
+        if output_dir is None:
+            output_dir = Path("data/raw/statements")
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Nombre único basado en fecha y tipo
+        date_str = stmt_info.received_date.strftime("%Y%m%d")
+        prefix = "tarjeta" if stmt_info.statement_type == "credit_card" else "cuenta"
+        return output_dir / f"estado_{prefix}_{date_str}.pdf"
+
+    def _save_parsed_statement(
+        self,
+        stmt_info: StatementEmailInfo,
+        result: BACStatementResult | CreditCardStatementResult,
+        profile_id: str | None,
+        pdf_path: Path | None = None,
+    ) -> ProcessedStatement:
+        """
+        Registra el resultado del parser y lo consolida en la BD si hay perfil.
+
+        Args:
+            stmt_info: Información del correo con el estado
+            result: Resultado del parser
+            profile_id: Perfil donde consolidar (None = no guardar en BD)
+            pdf_path: Ruta donde quedó guardado el PDF, si se guardó
+
+        Returns:
+            Resultado del procesamiento
+        """
+        transactions_created = 0
+        transactions_skipped = 0
+        saved_to_db = False
+
+        if isinstance(result, CreditCardStatementResult):
+            logger.success(
+                f"✅ Estado de tarjeta procesado: "
+                f"{result.metadata.tarjeta_marca} ***{result.metadata.tarjeta_ultimos_4} - "
+                f"{len(result.transactions)} transacciones"
+            )
+
+            # Consolidar en BD si se solicita
+            if profile_id:
+                from finanzas_tracker.services.credit_card_statement_service import (
+                    CreditCardStatementService,
+                )
+
+                cc_consolidation = CreditCardStatementService().consolidate_statement(
+                    result, profile_id
+                )
+                if cc_consolidation.success:
+                    saved_to_db = True
+                    transactions_created = cc_consolidation.transactions_created
+                    transactions_skipped = cc_consolidation.transactions_skipped
+        else:
+            logger.success(
+                f"✅ Estado de cuenta procesado: "
+                f"{result.metadata.fecha_corte} - "
+                f"{len(result.transactions)} transacciones"
+            )
+
+            # Consolidar cuentas bancarias en BD
+            if profile_id:
+                from finanzas_tracker.services.bank_account_statement_service import (
+                    BankAccountStatementService,
+                )
+
+                bank_consolidation = BankAccountStatementService().consolidate_statement(
+                    result, profile_id
+                )
+                if bank_consolidation.success:
+                    saved_to_db = True
+                    transactions_created = bank_consolidation.transactions_created
+                    transactions_skipped = bank_consolidation.transactions_skipped
+
+        if saved_to_db:
+            logger.success(
+                f"💾 Consolidado en BD: {transactions_created} creadas, "
+                f"{transactions_skipped} omitidas"
+            )
+
+        return ProcessedStatement(
+            email_info=stmt_info,
+            statement_result=result,
+            pdf_path=pdf_path,
+            saved_to_db=saved_to_db,
+            transactions_created=transactions_created,
+            transactions_skipped=transactions_skipped,
+        )
+
     def process_all_pending(
         self,
         profile_id: str,
         days_back: int = 60,
         save_pdfs: bool = True,
         save_to_db: bool = True,
+        concurrent: bool = True,
+        on_progress: Callable[[int, int], None] | None = None,
     ) -> list[ProcessedStatement]:
         """
         Procesa todos los estados de cuenta pendientes y los guarda en la BD.
@@ -480,14 +576,20 @@ class StatementEmailService:
         3. Crea tarjetas/cuentas si no existen
         4. Guarda las transacciones evitando duplicados
 
+        Con `concurrent=True` las descargas (threads), el parseo (procesos) y
+        la escritura en BD (un solo writer) corren como un pipeline; las
+        métricas por etapa quedan en `self.last_pipeline_stats`.
+
         Args:
             profile_id: ID del perfil del usuario (requerido)
             days_back: Días hacia atrás para buscar (default: 60 = ~2 meses)
             save_pdfs: Si True, guarda los PDFs permanentemente
             save_to_db: Si True, consolida transacciones en la BD
+            concurrent: Si False, procesa cada estado de principio a fin en serie
+            on_progress: Se llama al terminar cada estado con (terminados, total)
 
         Returns:
-            Lista de resultados de procesamiento
+            Lista de resultados de procesamiento (en el orden de los correos)
         """
         logger.info(f"🚀 Procesando estados de cuenta de los últimos {days_back} días...")
 
@@ -498,37 +600,114 @@ class StatementEmailService:
             logger.info("📭 No hay estados de cuenta nuevos")
             return []
 
-        # Procesar cada uno
-        results: list[ProcessedStatement] = []
-        total_created = 0
-        total_skipped = 0
-
-        for stmt_info in statements:
-            result = self.process_statement(
-                stmt_info,
-                profile_id=profile_id,
-                save_pdf=save_pdfs,
-                save_to_db=save_to_db,
+        lock = threading.Lock()
+        done = 0
+
+        def on_result(_: ProcessedStatement) -> None:
+            nonlocal done
+            with lock:
+                done += 1
+                finished = done
+            if on_progress is not None:
+                on_progress(finished, len(statements))
+
+        if concurrent:
+            results = self.process_statements_concurrently(
+                statements,
+                profile_id=profile_id if save_to_db else None,
+                save_pdfs=save_pdfs,
+                on_result=on_result,
             )
-            results.append(result)
-
-            if result.error is None:
-                total_created += result.transactions_created
-                total_skipped += result.transactions_skipped
+        else:
+            results = []
+            for stmt_info in statements:
+                result = self.process_statement(
+                    stmt_info,
+                    profile_id=profile_id,
+                    save_pdf=save_pdfs,
+                    save_to_db=save_to_db,
+                )
+                on_result(result)
+                results.append(result)
 
         # Resumen
-        successful = sum(1 for r in results if r.error is None)
-        failed = len(results) - successful
+        successful = [r for r in results if r.error is None]
+        failed = len(results) - len(successful)
+        total_created = sum(r.transactions_created for r in successful)
+        total_skipped = sum(r.transactions_skipped for r in successful)
 
         logger.success(
             f"📊 Procesamiento completado:\n"
-            f"   📄 Estados: {successful} exitosos, {failed} fallidos\n"
+            f"   📄 Estados: {len(successful)} exitosos, {failed} fallidos\n"
             f"   ✅ Transacciones creadas: {total_created}\n"
             f"   ⏭️  Transacciones omitidas: {total_skipped}"
         )
 
         return results
 
+    def process_statements_concurrently(
+        self,
+        statements: list[StatementEmailInfo],
+        profile_id: str | None,
+        save_pdfs: bool = False,
+        output_dir: Path | None = None,
+        parse_executor: Executor | None = None,
+        on_result: Callable[[ProcessedStatement], None] | None = None,
+    ) -> list[ProcessedStatement]:
+        """
+        Procesa varios estados de cuenta con el pipeline descarga → parseo → BD.
+
+        Args:
+            statements: Estados de cuenta a procesar
+            profile_id: Perfil donde consolidar (None = sólo parsear)
+            save_pdfs: Si True, guarda los PDFs permanentemente
+            output_dir: Directorio donde guardar PDFs
+            parse_executor: Executor para el parseo (default: pool de procesos)
+            on_result: Se llama con cada resultado apenas termina (puede ser
+                desde distintos hilos)
+
+        Returns:
+            Resultados en el mismo orden que `statements`
+        """
+
+        def download(stmt_info: StatementEmailInfo) -> bytes | None:
+            content = self.download_attachment_content(stmt_info.email_id, stmt_info.attachment_id)
+            if content is None:
+                return None
+            if save_pdfs:
+                self._statement_pdf_path(stmt_info, output_dir).write_bytes(content.getbuffer())
+            return content.getvalue()
+
+        def write(
+            stmt_info: StatementEmailInfo,
+            result: BACStatementResult | CreditCardStatementResult,
+        ) -> ProcessedStatement:
+            pdf_path = self._statement_pdf_path(stmt_info, output_dir) if save_pdfs else None
+            processed = self._save_parsed_statement(stmt_info, result, profile_id, pdf_path)
+            if on_result is not None:
+                on_result(processed)
+            return processed
+
+        def fail(stmt_info: StatementEmailInfo, error: str) -> ProcessedStatement:
+            processed = ProcessedStatement(email_info=stmt_info, statement_result=None, error=error)
+            if on_result is not None:
+                on_result(processed)
+            return processed
+
+        pipeline: StatementPipeline[StatementEmailInfo, ProcessedStatement] = StatementPipeline(
+            download=download,
+            parse_args=lambda s: (s.statement_type, s.attachment_name),
+            write=write,
+            fail=fail,
+            download_workers=settings.statement_download_workers,
+            parse_workers=settings.statement_parse_workers,
+            queue_size=settings.statement_pipeline_queue_size,
+            parse_executor=parse_executor,
+        )
+        results, stats = pipeline.run(statements)
+        self.last_pipeline_stats = stats
+        return results
+
 
 # Singleton para uso global
 statement_email_service = StatementEmailService()
@@ -0,0 +1,285 @@
+"""Pipeline concurrente para procesar estados de cuenta en lote.
+
+Procesar un estado de cuenta tiene tres etapas con cuellos de botella
+distintos:
+
+1. Descarga del PDF (red) → pool de threads
+2. Parseo del PDF (CPU, pdfplumber) → pool de procesos
+3. Consolidación en la BD → un único writer (el thread que llama)
+
+Las etapas se conectan con colas acotadas: si el parseo se atrasa, las
+descargas esperan (backpressure) en lugar de acumular PDFs en memoria, y
+si la BD se atrasa, el parseo espera. Así las descargas y el parseo se
+solapan, y la BD sigue recibiendo escrituras de a una.
+"""
+
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import queue
+import threading
+import time
+from typing import Any, Generic, TypeVar
+
+from finanzas_tracker.core.logging import get_logger
+from finanzas_tracker.parsers.bac_credit_card_parser import (
+    BACCreditCardParser,
+    CreditCardStatementResult,
+)
+from finanzas_tracker.parsers.bac_pdf_parser import BACPDFParser, BACStatementResult
+
+
+logger = get_logger(__name__)
+
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+ParsedStatement = BACStatementResult | CreditCardStatementResult
+
+# Marca de fin de cola
+_DONE = object()
+
+
+def parse_statement_pdf(statement_type: str, content: bytes, source_name: str) -> ParsedStatement:
+    """
+    Parsea un PDF de estado de cuenta según su tipo.
+
+    Función de módulo para poder ejecutarse en un ProcessPoolExecutor.
+
+    Args:
+        statement_type: "credit_card" o "bank_account"
+        content: Bytes del PDF
+        source_name: Nombre del adjunto (para `source_file`)
+
+    Returns:
+        Resultado del parser correspondiente
+    """
+    if statement_type == "credit_card":
+        return BACCreditCardParser().parse(content, source_name=source_name)
+    return BACPDFParser().parse(content, source_name=source_name)
+
+
+@dataclass
+class StageTiming:
+    """Tiempos acumulados de una etapa del pipeline."""
+
+    name: str
+    items: int = 0
+    busy_seconds: float = 0.0  # Tiempo trabajando (suma de todos los workers)
+    blocked_seconds: float = 0.0  # Tiempo esperando lugar en la cola siguiente
+
+    def to_dict(self) -> dict[str, float]:
+        """Convierte a diccionario para logs y respuestas de API."""
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+        }
+
+
+@dataclass
+class PipelineStats:
+    """Métricas de una ejecución del pipeline."""
+
+    total_items: int = 0
+    wall_seconds: float = 0.0
+    stages: dict[str, StageTiming] = field(
+        default_factory=lambda: {name: StageTiming(name) for name in ("download", "parse", "write")}
+    )
+
+    @property
+    def sequential_seconds(self) -> float:
+        """Tiempo que habría tomado hacer las tres etapas en serie."""
+        return sum(stage.busy_seconds for stage in self.stages.values())
+
+    @property
+    def speedup(self) -> float:
+        """Aceleración respecto al procesamiento secuencial."""
+        if self.wall_seconds <= 0:
+            return 1.0
+        return self.sequential_seconds / self.wall_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convierte a diccionario para logs y respuestas de API."""
+        return {
+            "total_items": self.total_items,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "speedup": round(self.speedup, 2),
+            "stages": {name: stage.to_dict() for name, stage in self.stages.items()},
+        }
+
+
+class StatementPipeline(Generic[ItemT, ResultT]):
+    """
+    Ejecuta descarga → parseo → escritura con etapas concurrentes.
+
+    Las etapas se pasan como funciones para que el pipeline no dependa del
+    origen de los PDFs (Outlook, Gmail) ni de cómo se guardan.
+
+    Uso:
+        >>> pipeline = StatementPipeline(download=..., parse_args=..., write=..., fail=...)
+        >>> results, stats = pipeline.run(statements)
+        >>> stats.to_dict()["stages"]["parse"]["busy_seconds"]
+    """
+
+    def __init__(
+        self,
+        download: Callable[[ItemT], bytes | None],
+        parse_args: Callable[[ItemT], tuple[str, str]],
+        write: Callable[[ItemT, ParsedStatement], ResultT],
+        fail: Callable[[ItemT, str], ResultT],
+        *,
+        download_workers: int = 4,
+        parse_workers: int = 2,
+        queue_size: int = 4,
+        parse_executor: Executor | None = None,
+        parse_func: Callable[[str, bytes, str], Any] | None = None,
+    ) -> None:
+        """
+        Inicializa el pipeline.
+
+        Args:
+            download: Descarga el PDF de un item (None si falla)
+            parse_args: (statement_type, source_name) de un item para el parser
+            write: Guarda el resultado parseado (se llama siempre desde un solo thread)
+            fail: Construye el resultado de un item que falló
+            download_workers: Threads de descarga
+            parse_workers: Procesos de parseo
+            queue_size: Capacidad de cada cola entre etapas
+            parse_executor: Executor para el parseo (default: ProcessPoolExecutor)
+            parse_func: Función de parseo (default: parse_statement_pdf; debe
+                poder serializarse con pickle)
+        """
+        self.download = download
+        self.parse_args = parse_args
+        self.write = write
+        self.fail = fail
+        self.download_workers = max(1, download_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.queue_size = max(1, queue_size)
+        self.parse_executor = parse_executor
+        self.parse_func = parse_func or parse_statement_pdf
+
+    def run(self, items: list[ItemT]) -> tuple[list[ResultT], PipelineStats]:
+        """
+        Procesa todos los items.
+
+        Args:
+            items: Items a procesar (ej. StatementEmailInfo)
+
+        Returns:
+            (resultados en el mismo orden que `items`, métricas por etapa)
+        """
+        stats = PipelineStats(total_items=len(items))
+        results: list[ResultT | None] = [None] * len(items)
+        if not items:
+            return [], stats
+
+        start = time.perf_counter()
+        lock = threading.Lock()
+        parse_queue: queue.Queue[Any] = queue.Queue(maxsize=self.queue_size)
+        write_queue: queue.Queue[Any] = queue.Queue(maxsize=self.queue_size)
+
+        def record(stage: str, busy: float, blocked: float = 0.0) -> None:
+            with lock:
+                timing = stats.stages[stage]
+                timing.items += 1
+                timing.busy_seconds += busy
+                timing.blocked_seconds += blocked
+
+        def timed_put(target: queue.Queue[Any], value: Any) -> float:
+            put_start = time.perf_counter()
+            target.put(value)
+            return time.perf_counter() - put_start
+
+        def download_one(index: int, item: ItemT) -> None:
+            t0 = time.perf_counter()
+            try:
+                content = self.download(item)
+                error = None if content is not None else "No se pudo descargar el PDF"
+            except Exception as e:
+                content, error = None, str(e)
+            busy = time.perf_counter() - t0
+
+            if error is not None:
+                blocked = timed_put(write_queue, (index, item, None, error))
+            else:
+                blocked = timed_put(parse_queue, (index, item, content))
+            record("download", busy, blocked)
+
+        def parse_loop(executor: Executor) -> None:
+            while (entry := parse_queue.get()) is not _DONE:
+                index, item, content = entry
+                t0 = time.perf_counter()
+                source_name = "PDF"
+                try:
+                    statement_type, source_name = self.parse_args(item)
+                    parsed = executor.submit(
+                        self.parse_func, statement_type, content, source_name
+                    ).result()
+                    outcome = (index, item, parsed, None)
+                except Exception as e:
+                    logger.error(f"Error parseando PDF {source_name}: {e}")
+                    outcome = (index, item, None, str(e))
+                busy = time.perf_counter() - t0
+                record("parse", busy, timed_put(write_queue, outcome))
+
+        def feed() -> None:
+            with ThreadPoolExecutor(
+                max_workers=self.download_workers, thread_name_prefix="stmt-download"
+            ) as downloads:
+                for index, item in enumerate(items):
+                    downloads.submit(download_one, index, item)
+            for _ in parse_threads:
+                parse_queue.put(_DONE)
+            for thread in parse_threads:
+                thread.join()
+            write_queue.put(_DONE)
+
+        own_executor = self.parse_executor is None
+        executor = self.parse_executor or ProcessPoolExecutor(max_workers=self.parse_workers)
+        parse_threads = [
+            threading.Thread(
+                target=parse_loop, args=(executor,), name=f"stmt-parse-{i}", daemon=True
+            )
+            for i in range(self.parse_workers)
+        ]
+
+        try:
+            for thread in parse_threads:
+                thread.start()
+            feeder = threading.Thread(target=feed, name="stmt-feeder", daemon=True)
+            feeder.start()
+
+            # Etapa de escritura: un solo writer en el thread que llama
+            while (entry := write_queue.get()) is not _DONE:
+                index, item, parsed, error = entry
+                t0 = time.perf_counter()
+                if error is None:
+                    try:
+                        results[index] = self.write(item, parsed)
+                    except Exception as e:
+                        logger.error(f"Error guardando estado de cuenta: {e}")
+                        results[index] = self.fail(item, str(e))
+                else:
+                    results[index] = self.fail(item, error)
+                record("write", time.perf_counter() - t0)
+
+            feeder.join()
+        finally:
+            if own_executor:
+                executor.shutdown(wait=True)
+
+        stats.wall_seconds = time.perf_counter() - start
+        logger.info(f"⏱️ Pipeline de estados de cuenta: {stats.to_dict()}")
+
+        return [r for r in results if r is not None], stats
+
+
+__all__ = [
+    "ParsedStatement",
+    "PipelineStats",
+    "StageTiming",
+    "StatementPipeline",
+    "parse_statement_pdf",
+]
@@ -17,6 +17,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services.merchant_normalizer import SUSCRIPCIONES
 
 
 logger = logging.getLogger(__name__)
@@ -295,33 +296,16 @@ class SubscriptionDetector:
         """Agrupa transacciones por comercio normalizado."""
         grupos: dict[str, list[Transaction]] = defaultdict(list)
 
-        for tx in transacciones:
-            comercio_norm = self._normalizar_comercio(tx.comercio or "")
+        nombres = SUSCRIPCIONES.normalize_many(tx.comercio for tx in transacciones)
+        for tx, comercio_norm in zip(transacciones, nombres, strict=True):
             if comercio_norm:
                 grupos[comercio_norm].append(tx)
 
         return grupos
 
     def _normalizar_comercio(self, comercio: str) -> str:
-        """Normaliza nombre de comercio para agrupación."""
-        if not comercio:
-            return ""
-
-        # Mayúsculas
-        norm = comercio.upper()
-
-        # Remover números de referencia comunes
-        norm = re.sub(r"\d{6,}", "", norm)  # Números largos
-        norm = re.sub(r"\*+\d+", "", norm)  # ***1234
-        norm = re.sub(r"#\d+", "", norm)  # #12345
-
-        # Remover ubicaciones comunes
-        norm = re.sub(r"\s+(SAN JOSE|HEREDIA|ALAJUELA|CARTAGO|CR|CRI|COSTA RICA)\b", "", norm)
-
-        # Limpiar espacios
-        norm = re.sub(r"\s+", " ", norm).strip()
-
-        return norm
+        """Normaliza nombre de comercio para agrupación (ver `merchant_normalizer`)."""
+        return SUSCRIPCIONES(comercio)
 
     def _analizar_grupo(
         self,
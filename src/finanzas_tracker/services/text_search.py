@@ -0,0 +1,109 @@
+"""
+Búsqueda de texto difusa sobre índices de trigramas (pg_trgm).
+
+Los `ILIKE '%x%'` sin ancla no pueden usar un índice B-tree: recorrían toda
+la tabla y devolvían "la primera fila que coincida". En PostgreSQL las
+columnas de texto buscadas tienen índices GIN `gin_trgm_ops` (migración
+d0e1f2a3b4c5), que aceleran tanto `ILIKE '%x%'` como el operador de
+similitud `%`; aquí se combinan y se ordena por `similarity()`:
+
+    WHERE comercio ILIKE '%x%' OR comercio % 'x'
+    ORDER BY similarity(comercio, 'x') DESC
+
+El umbral por defecto de `%` (0.3) deja pasar comercios distintos ("uber
+eats" ~ "uber trip"). Quien aplique automáticamente lo encontrado debe pedir
+`with_strength=True` y tratar como sugerencia las coincidencias que no son
+fuertes (ni contienen el texto ni llegan a `STRONG_SIMILARITY`).
+
+Ejemplo:
+    >>> stmt = ranked(
+    ...     select(Transaction).where(Transaction.profile_id == profile_id),
+    ...     [Transaction.comercio],
+    ...     "automercado",
+    ...     limit=5,
+    ... ).order_by(Transaction.fecha_transaccion.desc())
+"""
+
+__all__ = ["STRONG_SIMILARITY", "match_text", "ranked", "strong_match"]
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, func, or_
+
+
+# Similitud mínima para confiar en una coincidencia que no contiene el texto
+STRONG_SIMILARITY = 0.6
+
+
+def match_text(
+    columns: Sequence[ColumnElement[Any]],
+    term: str,
+) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    """
+    Condición y relevancia de una búsqueda difusa en una o varias columnas.
+
+    Args:
+        columns: Columnas de texto donde buscar (coincide con cualquiera)
+        term: Texto buscado
+
+    Returns:
+        (condición para WHERE, relevancia 0-1 para ORDER BY ... DESC)
+    """
+    contains = [column.icontains(term, autoescape=True) for column in columns]
+    similar = [column.op("%")(term) for column in columns]
+    scores = [func.coalesce(func.similarity(column, term), 0.0) for column in columns]
+    score = scores[0] if len(scores) == 1 else func.greatest(*scores)
+    return or_(*contains, *similar), score
+
+
+def strong_match(
+    columns: Sequence[ColumnElement[Any]],
+    term: str,
+) -> ColumnElement[bool]:
+    """
+    Si una coincidencia es confiable para aplicarla sin revisión.
+
+    Lo es si alguna columna contiene el texto o si la similitud llega a
+    `STRONG_SIMILARITY`.
+
+    Args:
+        columns: Columnas de texto donde se buscó
+        term: Texto buscado
+
+    Returns:
+        Expresión booleana para el SELECT
+    """
+    contains = or_(*(column.icontains(term, autoescape=True) for column in columns))
+    _, score = match_text(columns, term)
+    return or_(contains, score >= STRONG_SIMILARITY)
+
+
+def ranked(
+    stmt: Select[Any],
+    columns: Sequence[ColumnElement[Any]],
+    term: str,
+    limit: int | None = None,
+    with_strength: bool = False,
+) -> Select[Any]:
+    """
+    Agrega a `stmt` la búsqueda difusa, ordenada por relevancia.
+
+    Los `order_by` que se agreguen después desempatan.
+
+    Args:
+        stmt: Consulta con los demás filtros y sin ORDER BY
+        columns: Columnas de texto donde buscar
+        term: Texto buscado
+        limit: Máximo de filas
+        with_strength: Agrega la columna booleana "coincidencia_fuerte"
+            (ver `strong_match`) al final de cada fila
+
+    Returns:
+        Consulta filtrada y ordenada por similitud descendente
+    """
+    condition, score = match_text(columns, term)
+    stmt = stmt.where(condition).order_by(score.desc())
+    if with_strength:
+        stmt = stmt.add_columns(strong_match(columns, term).label("coincidencia_fuerte"))
+    return stmt if limit is None else stmt.limit(limit)
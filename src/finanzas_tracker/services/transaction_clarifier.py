@@ -11,13 +11,21 @@ __all__ = ["TransactionClarifierService", "ClarificationResult"]
 import logging
 import re
 from dataclasses import dataclass
-from typing import cast
 
 import anthropic
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.config.settings import settings
-from finanzas_tracker.core.claude_credits import can_use_claude, handle_claude_error
+from finanzas_tracker.core.claude_client import (
+    ClaudeClient,
+    pooled_http_client,
+    response_text,
+)
+from finanzas_tracker.core.claude_credits import (
+    ClaudeServiceUnavailable,
+    can_use_claude,
+    handle_claude_error,
+)
 from finanzas_tracker.core.retry import retry_on_anthropic_error
 from finanzas_tracker.models.category import Category, Subcategory
 from finanzas_tracker.models.transaction import Transaction
@@ -88,7 +96,10 @@ Responde en español costarricense (mae, tuanis, pura vida).
     def __init__(self, db: Session) -> None:
         """Inicializa el servicio."""
         self.db = db
-        self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        self.client = anthropic.Anthropic(
+            api_key=settings.anthropic_api_key, http_client=pooled_http_client()
+        )
+        self.claude = ClaudeClient(self.client)
         self.model = settings.claude_model
         logger.info("TransactionClarifierService inicializado")
 
@@ -105,19 +116,18 @@ Responde en español costarricense (mae, tuanis, pura vida).
         return context
 
     @retry_on_anthropic_error(max_attempts=3, max_wait=16)
-    def _call_claude(self, messages: list[dict]) -> str:
-        """Llama a Claude con retry logic."""
-        response = self.client.messages.create(
+    def _call_claude(self, messages: list[dict], profile_id: str | None = None) -> str:
+        """Llama a Claude con retry logic (SYSTEM_PROMPT va cacheado)."""
+        response = self.claude.create(
+            call_site="transaction_clarifier",
+            system=self.SYSTEM_PROMPT,
+            messages=messages,
             model=self.model,
             max_tokens=512,
             temperature=0.3,
-            system=self.SYSTEM_PROMPT,
-            messages=messages,
+            profile_id=profile_id,
         )
-        first_block = response.content[0]
-        if not hasattr(first_block, "text"):
-            return '{"error": "No pude procesar tu mensaje"}'
-        return cast(str, first_block.text)
+        return response_text(response) or '{"error": "No pude procesar tu mensaje"}'
 
     def clarify_transaction(
         self,
@@ -167,11 +177,11 @@ Transacción a clarificar:
             })
 
             # Llamar a Claude
-            response_text = self._call_claude(messages)
-            logger.debug(f"Respuesta de Claude: {response_text}")
+            text = self._call_claude(messages, transaction.profile_id)
+            logger.debug(f"Respuesta de Claude: {text}")
 
             # Parsear JSON
-            result = self._parse_response(response_text, user_message)
+            result = self._parse_response(text, user_message)
             return result
 
         except anthropic.APIStatusError as e:
@@ -186,6 +196,17 @@ Transacción a clarificar:
                 )
             raise
 
+        except ClaudeServiceUnavailable as e:
+            logger.info(f"⏭️ Clarificación sin Claude: {e.message}")
+            return ClarificationResult(
+                descripcion=user_message[:50],
+                beneficiario=None,
+                categoria_sugerida=None,
+                subcategoria_sugerida=None,
+                confianza=0.0,
+                respuesta_usuario="⚠️ Llegaste al límite diario de AI. Guardé tu descripción.",
+            )
+
         except Exception as e:
             logger.error(f"Error clarificando transacción: {e}")
             return ClarificationResult(
@@ -1,20 +1,24 @@
 """Servicio para procesar transacciones desde correos."""
 
 from decimal import Decimal
+from functools import lru_cache
 from typing import Any
 
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
 
 from finanzas_tracker.core.database import get_session
 from finanzas_tracker.core.logging import get_logger
 from finanzas_tracker.models.transaction import Transaction
 from finanzas_tracker.parsers.bac_parser import BACParser
 from finanzas_tracker.parsers.popular_parser import PopularParser
-from finanzas_tracker.services.smart_categorizer import SmartCategorizer
+from finanzas_tracker.services.anomaly_service import AnomalyService
+from finanzas_tracker.services.smart_categorizer import CategorizationResult, SmartCategorizer
 from finanzas_tracker.services.exchange_rate import exchange_rate_service
 from finanzas_tracker.services.internal_transfer_detector import InternalTransferDetector
 from finanzas_tracker.services.merchant_service import MerchantNormalizationService
-from finanzas_tracker.services.merchant_lookup_service import MerchantLookupService
+from finanzas_tracker.services.merchant_lookup_service import MerchantInfo, MerchantLookupService
+from finanzas_tracker.services.text_search import ranked
 
 
 logger = get_logger(__name__)
@@ -28,7 +32,7 @@ class TransactionProcessor:
     1. Identifica el banco del correo
     2. Usa el parser correspondiente
     3. Detecta y convierte moneda USD→CRC
-    4. Guarda en la base de datos
+    4. Puntúa montos anómalos y guarda en la base de datos
     5. Maneja duplicados y errores
     """
 
@@ -85,6 +89,7 @@ class TransactionProcessor:
 
         logger.info(f"Procesando {len(emails)} correos...")
 
+        parsed: list[dict[str, Any]] = []
         for email in emails:
             try:
                 # Identificar banco
@@ -121,22 +126,36 @@ class TransactionProcessor:
                     transaction_data["monto_crc"] = transaction_data["monto_original"]
                     transaction_data["tipo_cambio_usado"] = None
 
-                # Categorización automática con IA
-                if self.auto_categorize and self.categorizer:
-                    self._categorize_transaction(transaction_data, stats)
+                parsed.append(transaction_data)
 
+            except (KeyError, ValueError) as e:
+                logger.error(f"Error de datos en correo: {e}")
+                stats["errores"] += 1
+            except Exception as e:
+                logger.error(f"Error procesando correo: {type(e).__name__}: {e}")
+                stats["errores"] += 1
+
+        # Categorización automática con IA (todo el lote en paralelo)
+        if self.auto_categorize and self.categorizer and parsed:
+            self._categorize_batch(parsed, stats)
+
+        # Comercios: resolver todo el lote y los desconocidos juntos antes de guardar
+        merchant_ids = self._resolve_merchants(parsed)
+        merchant_infos = self._lookup_unknown_merchants(parsed)
+
+        for transaction_data in parsed:
+            try:
                 # Guardar en base de datos
-                success, _ = self._save_transaction(transaction_data)
+                success, _ = self._save_transaction(
+                    transaction_data, merchant_infos, merchant_ids
+                )
                 if success:
                     stats["procesados"] += 1
                 else:
                     stats["duplicados"] += 1
 
-            except (KeyError, ValueError) as e:
-                logger.error(f"Error de datos en correo: {e}")
-                stats["errores"] += 1
             except Exception as e:
-                logger.error(f"Error procesando correo: {type(e).__name__}: {e}")
+                logger.error(f"Error guardando transacción: {type(e).__name__}: {e}")
                 stats["errores"] += 1
 
         logger.info(
@@ -195,33 +214,155 @@ class TransactionProcessor:
                 profile_id=transaction_data.get("profile_id"),
                 tipo_transaccion=transaction_data.get("tipo_transaccion"),
             )
+            self._apply_categorization(transaction_data, result, stats)
 
-            # Usar propiedades del CategorizationResult
-            transaction_data["subcategory_id"] = result.subcategory_id
-            transaction_data["categoria_sugerida_por_ia"] = result.subcategory_name
-            transaction_data["necesita_revision"] = result.needs_review
-            transaction_data["confianza_categoria"] = result.confidence
+        except Exception as e:
+            logger.error(f"Error categorizando transacción: {e}")
+            self._mark_uncategorized(transaction_data, stats)
 
-            if result.needs_review:
-                stats["necesitan_revision"] += 1
-            else:
-                stats["categorizadas_automaticamente"] += 1
+    def _categorize_batch(
+        self,
+        transactions: list[dict[str, Any]],
+        stats: dict[str, Any],
+    ) -> None:
+        """
+        Categoriza un lote con `SmartCategorizer.categorize_many`.
 
-            logger.debug(
-                f"Categorizado: {transaction_data['comercio']} → "
-                f"{result.subcategory_name} ({result.source.value}, {result.confidence}%)"
-            )
+        Las transacciones que llegan a la capa LLM se categorizan en
+        paralelo, dentro del límite de concurrencia de Claude.
+        """
+        if self.categorizer is None:
+            return
 
+        try:
+            results = self.categorizer.categorize_many(
+                [
+                    {
+                        "comercio": transaction_data["comercio"],
+                        "monto": transaction_data["monto_crc"],
+                        "profile_id": transaction_data.get("profile_id"),
+                        "tipo_transaccion": transaction_data.get("tipo_transaccion"),
+                    }
+                    for transaction_data in transactions
+                ]
+            )
         except Exception as e:
-            logger.error(f"Error categorizando transacción: {e}")
-            transaction_data["subcategory_id"] = None
-            transaction_data["necesita_revision"] = True
+            logger.error(f"Error categorizando lote de {len(transactions)} transacciones: {e}")
+            for transaction_data in transactions:
+                self._mark_uncategorized(transaction_data, stats)
+            return
+
+        for transaction_data, result in zip(transactions, results, strict=True):
+            self._apply_categorization(transaction_data, result, stats)
+
+    def _apply_categorization(
+        self,
+        transaction_data: dict[str, Any],
+        result: CategorizationResult,
+        stats: dict[str, Any],
+    ) -> None:
+        """Copia el resultado del categorizador a los datos de la transacción."""
+        transaction_data["subcategory_id"] = result.subcategory_id
+        transaction_data["categoria_sugerida_por_ia"] = result.subcategory_name
+        transaction_data["necesita_revision"] = result.needs_review
+        transaction_data["confianza_categoria"] = result.confidence
+
+        if result.needs_review:
             stats["necesitan_revision"] += 1
+        else:
+            stats["categorizadas_automaticamente"] += 1
+
+        logger.debug(
+            f"Categorizado: {transaction_data['comercio']} → "
+            f"{result.subcategory_name} ({result.source.value}, {result.confidence}%)"
+        )
+
+    def _mark_uncategorized(
+        self,
+        transaction_data: dict[str, Any],
+        stats: dict[str, Any],
+    ) -> None:
+        """Deja la transacción sin categoría y pendiente de revisión."""
+        transaction_data["subcategory_id"] = None
+        transaction_data["necesita_revision"] = True
+        stats["necesitan_revision"] += 1
+
+    @staticmethod
+    def _needs_merchant_lookup(transaction_data: dict[str, Any]) -> bool:
+        """Si la categorización tuvo baja confianza y conviene el MerchantLookup."""
+        return bool(
+            transaction_data.get("comercio")
+            and transaction_data.get("necesita_revision", False)
+            and transaction_data.get("confianza_categoria", 0) < 70
+            and not transaction_data.get("subcategory_id")
+        )
+
+    def _lookup_unknown_merchants(
+        self,
+        transactions: list[dict[str, Any]],
+    ) -> dict[str, MerchantInfo | None]:
+        """
+        Identifica de una vez los comercios de baja confianza del lote.
+
+        Returns:
+            comercio_raw -> MerchantInfo (vacío si no hay nada que buscar
+            o si falla; `_save_transaction` busca uno por uno en ese caso)
+        """
+        nombres = [t["comercio"] for t in transactions if self._needs_merchant_lookup(t)]
+        if not nombres:
+            return {}
+
+        try:
+            with get_session() as session:
+                return MerchantLookupService(session).buscar_o_identificar_many(nombres)
+        except Exception as e:
+            logger.warning(f"MerchantLookup por lote falló: {e}")
+            return {}
+
+    def _resolve_merchants(self, transactions: list[dict[str, Any]]) -> dict[str, str]:
+        """
+        Busca o crea de una vez los merchants de todos los comercios del lote.
+
+        Returns:
+            comercio_raw -> merchant_id (vacío si falla; `_save_transaction`
+            resuelve uno por uno en ese caso)
+        """
+        # Ciudad y país de la primera aparición, como al guardar una por una
+        ubicaciones = {
+            t["comercio"]: (t.get("ciudad"), t.get("pais", "Costa Rica"))
+            for t in reversed(transactions)
+            if t.get("comercio")
+        }
+        if not ubicaciones:
+            return {}
+
+        try:
+            with get_session() as session:
+                merchant_ids = self.merchant_service.resolve_many(
+                    session, list(ubicaciones), ubicaciones
+                )
+                session.commit()
+                return merchant_ids
+        except SQLAlchemyError as e:
+            logger.warning(f"Resolución de merchants por lote falló: {e}")
+            return {}
 
     def _save_transaction(
-        self, transaction_data: dict[str, Any]
+        self,
+        transaction_data: dict[str, Any],
+        merchant_infos: dict[str, MerchantInfo | None] | None = None,
+        merchant_ids: dict[str, str] | None = None,
     ) -> tuple[bool, Transaction | None]:
-        """Guarda una transacción en la base de datos."""
+        """
+        Guarda una transacción en la base de datos.
+
+        Args:
+            transaction_data: Datos de la transacción
+            merchant_infos: Comercios ya identificados por lote
+                (`_lookup_unknown_merchants`); los que falten se buscan aquí
+            merchant_ids: Merchants ya resueltos por lote (`_resolve_merchants`);
+                los que falten se buscan o crean aquí
+        """
         try:
             with get_session() as session:
                 # Normalizar merchant
@@ -230,38 +371,49 @@ class TransactionProcessor:
                 pais = transaction_data.get("pais", "Costa Rica")
 
                 if comercio_raw:
-                    merchant = self.merchant_service.find_or_create_merchant(
-                        session=session,
-                        raw_name=comercio_raw,
-                        ciudad=ciudad,
-                        pais=pais,
-                    )
-                    transaction_data["merchant_id"] = merchant.id
+                    if merchant_ids and comercio_raw in merchant_ids:
+                        transaction_data["merchant_id"] = merchant_ids[comercio_raw]
+                    else:
+                        merchant = self.merchant_service.find_or_create_merchant(
+                            session=session,
+                            raw_name=comercio_raw,
+                            ciudad=ciudad,
+                            pais=pais,
+                        )
+                        transaction_data["merchant_id"] = merchant.id
                     
                     # Si la categorización tuvo baja confianza, intentar con MerchantLookup
-                    needs_review = transaction_data.get("necesita_revision", False)
-                    confidence = transaction_data.get("confianza_categoria", 0)
-                    
-                    if needs_review and confidence < 70 and not transaction_data.get("subcategory_id"):
+                    if self._needs_merchant_lookup(transaction_data):
                         try:
-                            lookup_service = MerchantLookupService(session)
-                            merchant_info = lookup_service.buscar_o_identificar(comercio_raw)
+                            if merchant_infos is not None and comercio_raw in merchant_infos:
+                                merchant_info = merchant_infos[comercio_raw]
+                            else:
+                                lookup_service = MerchantLookupService(session)
+                                merchant_info = lookup_service.buscar_o_identificar(comercio_raw)
                             
                             if merchant_info and merchant_info.confianza >= 60:
                                 # Buscar subcategory_id por nombre
                                 from finanzas_tracker.models.category import Subcategory
                                 from sqlalchemy import select
                                 
-                                stmt = select(Subcategory).where(
-                                    Subcategory.nombre.ilike(f"%{merchant_info.subcategoria or merchant_info.categoria}%")
-                                ).limit(1)
-                                subcat = session.execute(stmt).scalar_one_or_none()
+                                # La subcategoría de nombre más parecido
+                                stmt = ranked(
+                                    select(Subcategory),
+                                    [Subcategory.nombre],
+                                    merchant_info.subcategoria or merchant_info.categoria,
+                                    limit=1,
+                                    with_strength=True,
+                                )
+                                row = session.execute(stmt).first()
                                 
-                                if subcat:
+                                if row:
+                                    subcat, fuerte = row
+                                    # Un nombre sólo parecido (trigramas) queda para revisión
+                                    confianza = merchant_info.confianza if fuerte else min(merchant_info.confianza, 50)
                                     transaction_data["subcategory_id"] = subcat.id
                                     transaction_data["categoria_sugerida_por_ia"] = subcat.nombre
-                                    transaction_data["confianza_categoria"] = merchant_info.confianza
-                                    transaction_data["necesita_revision"] = merchant_info.confianza < 70
+                                    transaction_data["confianza_categoria"] = confianza
+                                    transaction_data["necesita_revision"] = confianza < 70
                                     logger.info(
                                         f"MerchantLookup identificó: {comercio_raw} → {subcat.nombre}"
                                     )
@@ -277,6 +429,9 @@ class TransactionProcessor:
 
                 transaction = Transaction(**transaction_data)
                 session.add(transaction)
+                # El flush detecta duplicados (IntegrityError) antes de puntuar
+                session.flush()
+                self._score_anomaly(session, transaction)
                 session.commit()
                 session.refresh(transaction)
 
@@ -300,6 +455,20 @@ class TransactionProcessor:
             logger.debug(f"Transacción duplicada: {transaction_data['email_id']}")
             return (False, None)
 
+    @staticmethod
+    def _score_anomaly(session: Session, transaction: Transaction) -> None:
+        """
+        Puntúa el monto contra las líneas base del perfil (se guarda en el mismo commit).
+
+        Corre en un savepoint: si falla, sólo se descarta el score y la
+        transacción se guarda igual.
+        """
+        try:
+            with session.begin_nested():
+                AnomalyService(session).score(transaction)
+        except SQLAlchemyError as e:
+            logger.warning(f"No se pudo puntuar anomalía de {transaction.comercio}: {e}")
+
     def _extract_transfer_metadata(self, transaction_data: dict[str, Any]) -> None:
         """
         Extrae campos de metadata de transferencias y los asigna a columnas del modelo.
@@ -353,5 +522,22 @@ class TransactionProcessor:
         )
 
 
-# Instancia singleton
-transaction_processor = TransactionProcessor()
+@lru_cache
+def get_transaction_processor() -> TransactionProcessor:
+    """
+    Obtiene la instancia singleton del processor.
+
+    Se crea en el primer uso: construir los parsers y el categorizador
+    no debe pagarse sólo por importar el módulo.
+
+    Returns:
+        TransactionProcessor compartido
+    """
+    return TransactionProcessor()
+
+
+def __getattr__(name: str) -> Any:
+    """Mantiene `transaction_processor` como alias perezoso del singleton."""
+    if name == "transaction_processor":
+        return get_transaction_processor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,19 +7,37 @@ Maneja operaciones de alto nivel sobre transacciones:
 - Operaciones batch
 """
 
+from collections import defaultdict
 from datetime import date, datetime
 from decimal import Decimal
 import logging
+from typing import Any
 
-from sqlalchemy import select, update
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
+from finanzas_tracker.core.cache import invalidate_profile_cache
+from finanzas_tracker.models.category import Subcategory
 from finanzas_tracker.models.enums import TransactionStatus
 from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.repositories.bulk import bulk_update_by_id
+from finanzas_tracker.services.balance_ledger_service import BalanceLedgerService
+from finanzas_tracker.services.job_queue import FEEDBACK_RECORD_BATCH, enqueue_job
 
 
 logger = logging.getLogger(__name__)
 
+# Flags que `actualizar_batch` acepta por transacción
+BULK_FLAGS = (
+    "confirmada",
+    "necesita_revision",
+    "excluir_de_presupuesto",
+    "es_transferencia_interna",
+    "es_comercio_ambiguo",
+    "es_desconocida",
+    "necesita_reconciliacion_sinpe",
+)
+
 
 class TransactionService:
     """Servicio para gestión de transacciones y sus estados."""
@@ -291,6 +309,136 @@ class TransactionService:
         logger.info("Confirmadas %d transacciones en batch", count)
         return count
 
+    def actualizar_batch(
+        self,
+        profile_id: str,
+        cambios: list[dict[str, Any]],
+        *,
+        aprender: bool = True,
+    ) -> list[str]:
+        """Categoriza y marca muchas transacciones de una vez.
+
+        Cada cambio trae "id" y, opcionalmente, "subcategory_id" y flags de
+        `BULK_FLAGS` (los valores None no cambian nada). Los cambios con las
+        mismas columnas se escriben en un solo `UPDATE ... FROM (VALUES ...)`.
+        Asignar categoría tiene el efecto de una corrección del usuario:
+        confianza 100 y sin revisión pendiente (salvo que el cambio diga
+        otra cosa).
+
+        El aprendizaje de las categorías asignadas se encola como un solo job
+        en el mismo commit, y el cache del perfil se invalida una vez. Como el
+        UPDATE no pasa por los eventos del ORM, si el lote cambia
+        `excluir_de_presupuesto` el libro de saldos se recalcula aquí (desde
+        la transacción más antigua del lote) en la misma transacción.
+
+        Los cambios a transacciones de otro perfil o con una subcategoría que
+        no existe se omiten (no están en el resultado).
+
+        Args:
+            profile_id: Perfil dueño de las transacciones (las demás se ignoran).
+            cambios: Cambios por transacción.
+            aprender: Encolar el aprendizaje (FeedbackService) de las categorías.
+
+        Returns:
+            IDs de las transacciones actualizadas.
+
+        Raises:
+            ValueError: Si un cambio no trae "id" o trae columnas no permitidas.
+        """
+        permitidas = {"id", "subcategory_id", *BULK_FLAGS}
+        por_id: dict[str, dict[str, Any]] = {}
+        for cambio in cambios:
+            if cambio.get("id") is None:
+                raise ValueError("Cada cambio necesita el ID de la transacción")
+            if desconocidas := cambio.keys() - permitidas:
+                raise ValueError(f"Columnas no permitidas: {sorted(desconocidas)}")
+            fila = por_id.setdefault(str(cambio["id"]), {})
+            fila.update({k: v for k, v in cambio.items() if v is not None}, id=str(cambio["id"]))
+
+        existentes = set(
+            self.db.execute(
+                select(Transaction.id).where(
+                    Transaction.id.in_(list(por_id)),
+                    Transaction.profile_id == profile_id,
+                    Transaction.deleted_at.is_(None),
+                )
+            ).scalars()
+        )
+        # Una subcategoría inexistente haría fallar todo el UPDATE por la FK:
+        # esas filas se omiten, igual que las de otro perfil
+        pedidas = {fila["subcategory_id"] for fila in por_id.values() if "subcategory_id" in fila}
+        subcategorias: set[str] = set()
+        if pedidas:
+            subcategorias = set(
+                self.db.execute(select(Subcategory.id).where(Subcategory.id.in_(pedidas))).scalars()
+            )
+        validas = [
+            fila
+            for tid, fila in por_id.items()
+            if tid in existentes
+            and len(fila) > 1
+            and ("subcategory_id" not in fila or fila["subcategory_id"] in subcategorias)
+        ]
+        if not validas:
+            return []
+
+        grupos: dict[tuple[str, ...], list[dict[str, Any]]] = defaultdict(list)
+        for fila in validas:
+            grupos[tuple(sorted(fila))].append(fila)
+
+        table = Transaction.__table__
+        al_categorizar = {
+            "confianza_categoria": 100,
+            "necesita_revision": False,
+            "es_desconocida": False,
+        }
+        for columnas, filas in grupos.items():
+            constantes = {}
+            if "subcategory_id" in columnas:
+                constantes = {k: v for k, v in al_categorizar.items() if k not in columnas}
+            bulk_update_by_id(
+                self.db,
+                table,
+                filas,
+                table.c.profile_id == profile_id,
+                table.c.deleted_at.is_(None),
+                **constantes,
+            )
+
+        # Excluir de presupuesto cambia el monto que cuenta para el patrimonio
+        excluidas = [fila["id"] for fila in validas if "excluir_de_presupuesto" in fila]
+        if excluidas:
+            desde = self.db.execute(
+                select(func.min(Transaction.fecha_transaccion)).where(
+                    Transaction.id.in_(excluidas), Transaction.profile_id == profile_id
+                )
+            ).scalar_one()
+            BalanceLedgerService(self.db).rebuild(profile_id, desde.date())
+
+        correcciones = [
+            {"transaction_id": fila["id"], "subcategory_id": fila["subcategory_id"]}
+            for fila in validas
+            if "subcategory_id" in fila
+        ]
+        if aprender and correcciones:
+            # enqueue_job confirma el job junto con el UPDATE
+            enqueue_job(
+                self.db,
+                FEEDBACK_RECORD_BATCH,
+                {"correcciones": correcciones},
+                profile_id=profile_id,
+            )
+        else:
+            self.db.commit()
+        invalidate_profile_cache(profile_id)
+
+        logger.info(
+            "Actualizadas %d transacciones en batch (%d categorizadas)",
+            len(validas),
+            len(correcciones),
+        )
+        return [fila["id"] for fila in validas]
+
     def get_resumen_estados(
         self,
         profile_id: str,
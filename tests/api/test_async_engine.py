@@ -0,0 +1,96 @@
+"""
+Tests de los routers async sobre un engine async real (asyncpg).
+
+El resto de los tests de API usa `SyncBackedAsyncSession`, que ejecuta
+todo en la sesión sync. Aquí la app corre en el mismo event loop que la
+AsyncSession, como en producción: una carga perezosa o un acceso a un
+atributo expirado fuera de `await` falla con `MissingGreenlet`.
+"""
+
+from collections.abc import AsyncGenerator
+from datetime import date
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from finanzas_tracker.api.dependencies import get_async_db
+from finanzas_tracker.api.main import app
+from finanzas_tracker.models.category import Category, Subcategory
+from finanzas_tracker.models.enums import CategoryType
+from finanzas_tracker.models.profile import Profile
+
+
+@pytest_asyncio.fixture
+async def async_client(real_async_session: AsyncSession) -> AsyncGenerator[httpx.AsyncClient, None]:
+    """Cliente HTTP en el event loop del test, con `get_async_db` sobre asyncpg."""
+
+    async def override_get_async_db() -> AsyncGenerator[AsyncSession, None]:
+        yield real_async_session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def perfil_y_subcategoria(real_async_session: AsyncSession) -> tuple[Profile, Subcategory]:
+    """Perfil activo y una subcategoría (los presupuestos apuntan a subcategorías)."""
+    profile = Profile(
+        nombre="Perfil Async",
+        email_outlook="async@example.com",
+        es_activo=True,
+        activo=True,
+    )
+    category = Category(tipo=CategoryType.NECESSITIES, nombre="Alimentación", icono="🍔")
+    real_async_session.add_all([profile, category])
+    await real_async_session.flush()
+    subcategory = Subcategory(category_id=category.id, nombre="Supermercado")
+    real_async_session.add(subcategory)
+    await real_async_session.flush()
+    return profile, subcategory
+
+
+class TestBudgetsAsyncpg:
+    """CRUD de presupuestos con AsyncSession real."""
+
+    @pytest.mark.asyncio
+    async def test_crear_y_listar(
+        self,
+        async_client: httpx.AsyncClient,
+        perfil_y_subcategoria: tuple[Profile, Subcategory],
+    ) -> None:
+        _, subcategory = perfil_y_subcategoria
+
+        creado = await async_client.post(
+            "/api/v1/budgets",
+            json={
+                "category_id": subcategory.id,
+                "mes": date(2025, 1, 1).isoformat(),
+                "amount_crc": "150000",
+            },
+        )
+        listado = await async_client.get("/api/v1/budgets")
+
+        assert creado.status_code == 201
+        assert listado.status_code == 200
+        assert listado.json()["total"] == 1
+        assert listado.json()["items"][0]["id"] == creado.json()["id"]
+
+    @pytest.mark.asyncio
+    async def test_duplicado_responde_409(
+        self,
+        async_client: httpx.AsyncClient,
+        perfil_y_subcategoria: tuple[Profile, Subcategory],
+    ) -> None:
+        _, subcategory = perfil_y_subcategoria
+        payload = {"category_id": subcategory.id, "mes": "2025-02-01", "amount_crc": "1000"}
+
+        assert (await async_client.post("/api/v1/budgets", json=payload)).status_code == 201
+        respuesta = await async_client.post("/api/v1/budgets", json=payload)
+
+        assert respuesta.status_code == 409
+        assert respuesta.json()["code"] == "BUDGET_EXISTS"
@@ -9,6 +9,7 @@ from decimal import Decimal
 
 from fastapi.testclient import TestClient
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.api.main import app
@@ -18,14 +19,18 @@ from finanzas_tracker.models.transaction import Transaction
 
 
 @pytest.fixture
-def client(session: Session) -> TestClient:
+def client(session: Session, async_session: AsyncSession) -> TestClient:
     """Cliente de tests con sesión de DB de tests."""
-    from finanzas_tracker.api.dependencies import get_db
+    from finanzas_tracker.api.dependencies import get_async_db, get_db
 
     def override_get_db():
         yield session
 
+    async def override_get_async_db():
+        yield async_session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
 
     with TestClient(app) as test_client:
         yield test_client
@@ -299,6 +304,59 @@ class TestUpdateTransaction:
         assert response.status_code == 404
 
 
+class TestBulkUpdateTransactions:
+    """Tests para PATCH /api/v1/transactions/bulk."""
+
+    def test_categoriza_y_marca_en_lote(
+        self,
+        client: TestClient,
+        sample_transaction: Transaction,
+        category_with_subcategory: tuple[Category, Subcategory],
+    ) -> None:
+        """Aplica los cambios del perfil e informa los IDs omitidos."""
+        _, subcategory = category_with_subcategory
+
+        response = client.patch(
+            "/api/v1/transactions/bulk",
+            json={
+                "items": [
+                    {
+                        "id": sample_transaction.id,
+                        "subcategory_id": subcategory.id,
+                        "excluir_de_presupuesto": True,
+                    },
+                    {"id": "nonexistent-uuid", "confirmada": True},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "actualizadas": [sample_transaction.id],
+            "omitidas": ["nonexistent-uuid"],
+        }
+
+    def test_subcategoria_inexistente_va_a_omitidas(
+        self,
+        client: TestClient,
+        sample_transaction: Transaction,
+    ) -> None:
+        """Una subcategoría que no existe no rompe el lote: la fila se omite."""
+        response = client.patch(
+            "/api/v1/transactions/bulk",
+            json={"items": [{"id": sample_transaction.id, "subcategory_id": "no-existe"}]},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"actualizadas": [], "omitidas": [sample_transaction.id]}
+
+    def test_valida_lista_vacia(self, client: TestClient, active_profile: Profile) -> None:
+        """422 si no hay cambios."""
+        response = client.patch("/api/v1/transactions/bulk", json={"items": []})
+
+        assert response.status_code == 422
+
+
 class TestDeleteTransaction:
     """Tests para DELETE /api/v1/transactions/{id}."""
 
@@ -13,14 +13,18 @@ Nota: Si Docker no está disponible o Testcontainers falla, se usa
 el container PostgreSQL local existente (finanzas_postgres).
 """
 
+from collections.abc import AsyncGenerator, Callable
 import logging
 import os
 import sys
+from typing import Any
 from unittest.mock import MagicMock
 
 import pytest
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+import pytest_asyncio
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
 
 
 # Configurar logging
@@ -68,9 +72,10 @@ def get_test_engine():
         connection_url = get_test_database_url()
         _test_engine = create_engine(connection_url, echo=False)
 
-        # Crear extensión pgvector si no existe
+        # Crear extensiones pgvector y pg_trgm si no existen
         with _test_engine.connect() as conn:
             conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
             conn.commit()
     return _test_engine
 
@@ -147,6 +152,87 @@ def session(setup_test_database):
     connection.close()
 
 
+class SyncBackedAsyncSession:
+    """
+    AsyncSession mínima que delega en la Session sync de tests.
+
+    Los routers `async def` piden `get_async_db`; en tests reciben la
+    misma sesión (y la misma transacción con rollback) que usan los
+    fixtures, así ven los datos creados por cada test.
+    """
+
+    def __init__(self, sync_session: Session) -> None:
+        self.sync_session = sync_session
+
+    def __getattr__(self, name: str) -> Any:
+        # Métodos síncronos también en AsyncSession: add, add_all, expunge...
+        return getattr(self.sync_session, name)
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Any:
+        return self.sync_session.execute(*args, **kwargs)
+
+    async def scalar(self, *args: Any, **kwargs: Any) -> Any:
+        return self.sync_session.scalar(*args, **kwargs)
+
+    async def get(self, *args: Any, **kwargs: Any) -> Any:
+        return self.sync_session.get(*args, **kwargs)
+
+    async def merge(self, *args: Any, **kwargs: Any) -> Any:
+        return self.sync_session.merge(*args, **kwargs)
+
+    async def delete(self, instance: Any) -> None:
+        self.sync_session.delete(instance)
+
+    async def flush(self) -> None:
+        self.sync_session.flush()
+
+    async def refresh(self, instance: Any) -> None:
+        self.sync_session.refresh(instance)
+
+    async def commit(self) -> None:
+        self.sync_session.commit()
+
+    async def rollback(self) -> None:
+        self.sync_session.rollback()
+
+    async def close(self) -> None:
+        """La Session de tests la cierra el fixture `session`."""
+
+    async def run_sync(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return fn(self.sync_session, *args, **kwargs)
+
+
+@pytest.fixture
+def async_session(session: Session) -> SyncBackedAsyncSession:
+    """Sesión para overrides de `get_async_db`, sobre la sesión de tests."""
+    return SyncBackedAsyncSession(session)
+
+
+@pytest_asyncio.fixture
+async def real_async_session(setup_test_database) -> AsyncGenerator[AsyncSession, None]:
+    """
+    AsyncSession sobre un engine async real (asyncpg) contra la base de tests.
+
+    A diferencia de `async_session`, ejecuta el camino async de verdad
+    (greenlets, carga perezosa, commit/refresh). Todo corre dentro de una
+    transacción que se revierte al final; los `commit` del código bajo prueba
+    confirman sólo un savepoint.
+    """
+    from finanzas_tracker.core.database import AsyncSessionLocal, _create_async_engine
+
+    url = make_url(get_test_database_url()).set(drivername="postgresql+asyncpg")
+    engine = _create_async_engine(url.render_as_string(hide_password=False))
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        db_session = AsyncSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+
+        yield db_session
+
+        await db_session.close()
+        await transaction.rollback()
+    await engine.dispose()
+
+
 @pytest.fixture
 def sample_bac_email_html() -> str:
     """
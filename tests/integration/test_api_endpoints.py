@@ -9,6 +9,7 @@ from decimal import Decimal
 
 from fastapi.testclient import TestClient
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.api.main import app
@@ -25,14 +26,18 @@ from finanzas_tracker.models.transaction import Transaction
 
 
 @pytest.fixture
-def client(session: Session) -> TestClient:
+def client(session: Session, async_session: AsyncSession) -> TestClient:
     """Cliente de tests con sesión de DB de tests."""
-    from finanzas_tracker.api.dependencies import get_db
+    from finanzas_tracker.api.dependencies import get_async_db, get_db
 
     def override_get_db():
         yield session
 
+    async def override_get_async_db():
+        yield async_session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
 
     with TestClient(app) as test_client:
         yield test_client
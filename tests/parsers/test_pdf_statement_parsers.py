@@ -0,0 +1,230 @@
+"""Tests para el procesamiento por páginas de los parsers de PDF de BAC.
+
+Usan páginas falsas (chars + extract_text) en lugar de PDFs reales para
+verificar el modo paralelo, la combinación de contexto entre páginas y
+que extract_text() sólo se llame cuando hace falta.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from finanzas_tracker.parsers.bac_credit_card_parser import BACCreditCardParser
+from finanzas_tracker.parsers.bac_pdf_parser import BACPDFParser
+from finanzas_tracker.parsers.pdf_pages import page_ranges
+
+
+class FakePage:
+    """Página de pdfplumber mínima: caracteres con posición y texto plano."""
+
+    def __init__(self, lines: list[list[tuple[float, str]]], text: str = "") -> None:
+        self.chars: list[dict[str, Any]] = []
+        for top, line in enumerate(lines):
+            for x0, segment in line:
+                for i, char in enumerate(segment):
+                    self.chars.append({"top": top * 12.0, "x0": x0 + i * 5.0, "text": char})
+        self._text = text
+        self.extract_text_calls = 0
+
+    def extract_text(self) -> str:
+        self.extract_text_calls += 1
+        return self._text
+
+
+class FakePDF:
+    """Context manager que imita pdfplumber.open()."""
+
+    def __init__(self, pages: list[Any]) -> None:
+        self.pages = pages
+
+    def __enter__(self) -> "FakePDF":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        return None
+
+
+def _txn_line(ref: str, fecha: str, concepto: str, debito: str = "", credito: str = "") -> list:
+    line = [(50.0, ref), (140.0, fecha), (190.0, concepto)]
+    if debito:
+        line.append((480.0, debito))
+    if credito:
+        line.append((560.0, credito))
+    return line
+
+
+PDFPLUMBER_OPEN = "finanzas_tracker.parsers.pdf_pages.pdfplumber.open"
+
+IBAN_CRC = "CR05010200009296574831"
+IBAN_USD = "CR71010200009296574849"
+
+
+@pytest.fixture
+def bank_pages() -> list[FakePage]:
+    """Estado de cuenta con dos cuentas: la de dólares empieza en la página 3."""
+    return [
+        FakePage(
+            [
+                [(50.0, f"Cuenta IBAN: {IBAN_CRC}")],
+                [(50.0, "Moneda: COLONES")],
+                _txn_line("093006688", "OCT/01", "COMPASS RUTA 32", debito="150.00"),
+            ],
+            text=(
+                "Fecha de corte: 31/OCT/25\nSEBASTIAN CRUZ GUZMAN\n"
+                f"Cuenta IBAN: {IBAN_CRC}\nMoneda: COLONES"
+            ),
+        ),
+        FakePage([_txn_line("406495639", "OCT/03", "TEF DE: 948198684", credito="7,014.00")]),
+        FakePage(
+            [
+                [(50.0, f"Cuenta IBAN: {IBAN_USD}")],
+                [(50.0, "Moneda: DOLARES")],
+                _txn_line("500000001", "OCT/05", "UBER EATS", debito="25.50"),
+            ]
+        ),
+        FakePage([_txn_line("500000002", "OCT/07", "PRICESMART", debito="80.00")]),
+        FakePage([_txn_line("500000003", "OCT/09", "WALMART", debito="12.00")]),
+    ]
+
+
+@pytest.fixture
+def pdf_file(tmp_path: Path) -> Path:
+    path = tmp_path / "estado.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    return path
+
+
+def _summary(transactions: list) -> list[tuple]:
+    return [(t.referencia, t.monto, t.tipo, t.cuenta_iban, t.moneda) for t in transactions]
+
+
+class TestPageRanges:
+    """Tests para la división en rangos de páginas."""
+
+    def test_page_ranges_cubre_todas_las_paginas(self) -> None:
+        """Los rangos son contiguos y el último se recorta."""
+        assert page_ranges(10, 4) == [(0, 4), (4, 8), (8, 10)]
+
+    def test_page_ranges_con_inicio(self) -> None:
+        """Se puede empezar después de las páginas de resumen."""
+        assert page_ranges(5, 2, start=1) == [(1, 3), (3, 5)]
+        assert page_ranges(2, 4, start=2) == []
+
+
+class TestBACPDFParserPages:
+    """Tests del procesamiento por páginas de BACPDFParser."""
+
+    def test_parse_secuencial_hereda_contexto(
+        self, bank_pages: list[FakePage], pdf_file: Path
+    ) -> None:
+        """Las páginas sin IBAN heredan la cuenta y moneda de la anterior."""
+        with patch(
+            PDFPLUMBER_OPEN,
+            return_value=FakePDF(bank_pages),
+        ):
+            result = BACPDFParser().parse(pdf_file)
+
+        assert result.pages_processed == 5
+        assert result.metadata.fecha_corte.year == 2025
+        assert _summary(result.transactions) == [
+            ("093006688", Decimal("150.00"), "debito", IBAN_CRC, "CRC"),
+            ("406495639", Decimal("7014.00"), "credito", IBAN_CRC, "CRC"),
+            ("500000001", Decimal("25.50"), "debito", IBAN_USD, "USD"),
+            ("500000002", Decimal("80.00"), "debito", IBAN_USD, "USD"),
+            ("500000003", Decimal("12.00"), "debito", IBAN_USD, "USD"),
+        ]
+
+    def test_extract_text_solo_en_primera_pagina(
+        self, bank_pages: list[FakePage], pdf_file: Path
+    ) -> None:
+        """Si la pasada por posición encuentra el contexto, no se llama extract_text."""
+        with patch(
+            PDFPLUMBER_OPEN,
+            return_value=FakePDF(bank_pages),
+        ):
+            BACPDFParser().parse(pdf_file)
+
+        assert [p.extract_text_calls for p in bank_pages] == [1, 0, 0, 0, 0]
+
+    def test_fallback_a_extract_text_si_chars_no_alcanzan(self, pdf_file: Path) -> None:
+        """Si la página menciona IBAN pero no se lee de los chars, usa extract_text."""
+        page = FakePage(
+            [
+                [(50.0, "Cuenta IBAN: (ver detalle)")],
+                _txn_line("093006688", "OCT/01", "COMPASS", debito="150.00"),
+            ],
+            text=f"Cuenta IBAN: {IBAN_CRC}\nMoneda: COLONES",
+        )
+        first = FakePage([], text="Fecha de corte: 31/OCT/25")
+
+        with patch(
+            PDFPLUMBER_OPEN,
+            return_value=FakePDF([first, page]),
+        ):
+            result = BACPDFParser().parse(pdf_file)
+
+        assert page.extract_text_calls == 1
+        assert result.transactions[0].cuenta_iban == IBAN_CRC
+
+    def test_iter_transactions_paralelo_igual_a_secuencial(
+        self, bank_pages: list[FakePage], pdf_file: Path
+    ) -> None:
+        """El modo paralelo combina el contexto igual que el secuencial."""
+        with patch(
+            PDFPLUMBER_OPEN,
+            return_value=FakePDF(bank_pages),
+        ):
+            secuencial = list(BACPDFParser().iter_transactions(pdf_file))
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                paralelo = list(
+                    BACPDFParser().iter_transactions(pdf_file, pages_per_task=1, executor=executor)
+                )
+
+        assert _summary(paralelo) == _summary(secuencial)
+        assert len(paralelo) == 5
+
+
+class TestBACCreditCardParserPages:
+    """Tests del modo paralelo de BACCreditCardParser."""
+
+    @pytest.fixture
+    def card_pages(self) -> list[FakePage]:
+        return [
+            FakePage([], text="SEBASTIAN CRUZ\nVISA ***********1234"),
+            FakePage([], text="Fecha de corte: 30-NOV-25"),
+            FakePage([], text="110124844620 1-NOV-25 AL PUNTO CARNICERIA CRC 9,670.00"),
+            FakePage([], text="110124844621 3-NOV-25 NETFLIX USD 15.99"),
+            FakePage([], text="C) Detalle de intereses\n110124844622 30-NOV-25 INTERESES 1,200.00"),
+        ]
+
+    def test_parse_paralelo_igual_a_secuencial(self, card_pages: list[FakePage]) -> None:
+        """Las transacciones y totales no dependen del modo."""
+        with patch(
+            PDFPLUMBER_OPEN,
+            return_value=FakePDF(card_pages),
+        ):
+            secuencial = BACCreditCardParser().parse("tarjeta.pdf")
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                paralelo = BACCreditCardParser().parse(
+                    "tarjeta.pdf", pages_per_task=1, executor=executor
+                )
+
+        assert paralelo.transactions == secuencial.transactions
+        assert paralelo.metadata == secuencial.metadata
+        assert paralelo.total_intereses == Decimal("1200.00")
+        assert paralelo.pages_processed == 5
+        assert {t.tarjeta_ultimos_4 for t in paralelo.transactions} == {"1234"}
+
+    def test_extract_text_una_vez_por_pagina(self, card_pages: list[FakePage]) -> None:
+        """Cada página se extrae una sola vez (antes se extraían dos veces)."""
+        with patch(
+            PDFPLUMBER_OPEN,
+            return_value=FakePDF(card_pages),
+        ):
+            BACCreditCardParser().parse("tarjeta.pdf")
+
+        assert [p.extract_text_calls for p in card_pages] == [1, 1, 1, 1, 1]
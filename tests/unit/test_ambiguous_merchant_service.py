@@ -10,6 +10,7 @@ from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
 from finanzas_tracker.services.ambiguous_merchant_service import (
@@ -376,12 +377,12 @@ class TestAmbiguousMerchantServiceMarcarExistentes:
         service: AmbiguousMerchantService,
     ) -> None:
         """No marca nada si no hay transacciones."""
-        service.db.execute.return_value.scalars.return_value.all.return_value = []
+        service.db.execute.return_value.all.return_value = []
 
         result = service.marcar_transacciones_existentes("profile-123")
 
         assert result == 0
-        service.db.flush.assert_not_called()
+        service.db.execute.assert_called_once()
 
     @patch("finanzas_tracker.services.ambiguous_merchant_service.es_comercio_ambiguo")
     @patch("finanzas_tracker.services.ambiguous_merchant_service.obtener_categorias_posibles")
@@ -391,34 +392,32 @@ class TestAmbiguousMerchantServiceMarcarExistentes:
         mock_es_ambiguo: MagicMock,
         service: AmbiguousMerchantService,
     ) -> None:
-        """Marca transacciones existentes correctamente."""
-        tx1 = MagicMock()
-        tx1.comercio = "WALMART"
-        tx1.es_comercio_ambiguo = False
-
-        tx2 = MagicMock()
-        tx2.comercio = "STARBUCKS"
-        tx2.es_comercio_ambiguo = False
-
-        tx3 = MagicMock()
-        tx3.comercio = "AMAZON"
-        tx3.es_comercio_ambiguo = False
-
-        service.db.execute.return_value.scalars.return_value.all.return_value = [tx1, tx2, tx3]
+        """Marca transacciones existentes en un solo UPDATE por lote."""
+        service.db.execute.return_value.all.return_value = [
+            ("tx1", "WALMART"),
+            ("tx2", "STARBUCKS"),
+            ("tx3", "AMAZON"),
+            ("tx4", "WALMART"),
+        ]
 
-        # Solo WALMART y AMAZON son ambiguos
-        # detectar_y_marcar llama a es_comercio_ambiguo y obtener_categorias_posibles internamente
-        # para cada transacción, por lo que necesitamos más valores
+        # Solo WALMART y AMAZON son ambiguos (se evalúa una vez por comercio)
         mock_es_ambiguo.side_effect = [True, False, True]
         mock_obtener_categorias.side_effect = [
-            ["Supermercado", "Electrónica"],  # Para tx1 (WALMART)
-            ["Electrónica", "Libros"],  # Para tx3 (AMAZON)
+            ["Supermercado", "Electrónica"],  # WALMART
+            ["Electrónica", "Libros"],  # AMAZON
         ]
 
         result = service.marcar_transacciones_existentes("profile-123")
 
-        assert result == 2
-        service.db.flush.assert_called_once()
+        assert result == 3
+        compiled = service.db.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        valores = [v for k, v in compiled.params.items() if k.startswith("param_")]
+        assert valores[0::2] == ["tx1", "tx3", "tx4"]
+        assert json.loads(valores[3]) == ["Electrónica", "Libros"]
+        sql = str(compiled)
+        assert "FROM (VALUES" in sql
+        assert "es_comercio_ambiguo=%(es_comercio_ambiguo)s" in sql
+        assert "necesita_revision=%(necesita_revision)s" in sql
 
 
 class TestListarComerciosAmbiguos:
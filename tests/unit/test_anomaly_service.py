@@ -0,0 +1,269 @@
+"""Tests para la detección de anomalías con líneas base incrementales."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+import math
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.models.anomaly_baseline import (
+    DIMENSION_COMERCIO,
+    DIMENSION_SUBCATEGORIA,
+    AnomalyBaseline,
+)
+from finanzas_tracker.models.category import Category, Subcategory
+from finanzas_tracker.models.enums import CategoryType
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services.anomaly_service import (
+    MIN_OBSERVACIONES,
+    AnomalyService,
+    _actualizar,
+    clave_comercio,
+)
+from finanzas_tracker.services.transaction_processor import TransactionProcessor
+
+
+PERFIL = "perfil-1"
+INICIO = datetime(2025, 1, 1, 12)
+
+
+@pytest.fixture
+def db(session: Session) -> Session:
+    """Sesión de tests con el perfil y las subcategorías de las transacciones."""
+    session.add(Profile(id=PERFIL, email_outlook="anomalias@example.com", nombre="Anomalías"))
+    category = Category(tipo=CategoryType.NECESSITIES, nombre="Necesidades")
+    session.add(category)
+    session.flush()
+    session.add_all(
+        Subcategory(id=sub_id, category_id=category.id, nombre=sub_id)
+        for sub_id in ("sub-0", "sub-1")
+    )
+    session.commit()
+    return session
+
+
+def _txn(monto: str, dia: int = 0, comercio: str = "Soda Tapia", **kwargs: object) -> Transaction:
+    return Transaction(
+        profile_id=PERFIL,
+        email_id=kwargs.pop("email_id", str(uuid4())),
+        banco="bac",
+        tipo_transaccion=kwargs.pop("tipo_transaccion", "compra"),
+        comercio=comercio,
+        monto_original=Decimal(monto),
+        moneda_original="CRC",
+        monto_crc=Decimal(monto),
+        fecha_transaccion=INICIO + timedelta(days=dia),
+        **kwargs,
+    )
+
+
+def _ingresar(db: Session, txn: Transaction) -> Decimal | None:
+    """Como el pipeline de importación: puntuar y guardar en el mismo commit."""
+    db.add(txn)
+    score = AnomalyService(db).score(txn)
+    db.commit()
+    return score
+
+
+class TestEstadisticas:
+    """Tests para la actualización incremental."""
+
+    def test_primeras_observaciones_son_exactas(self) -> None:
+        xs = np.log([1000.0, 1200.0, 900.0, 1100.0])
+        n, media, varianza = 0, 0.0, 0.0
+        for x in xs:
+            n, media, varianza = _actualizar(n, media, varianza, x)
+
+        assert n == 4
+        assert media == pytest.approx(xs.mean())
+        assert varianza == pytest.approx(xs.var())
+
+    def test_clave_comercio(self) -> None:
+        assert clave_comercio("  soda   tapia ") == "SODA TAPIA"
+        assert clave_comercio("") is None
+
+
+class TestScore:
+    """Tests para el puntaje O(1) de transacciones nuevas."""
+
+    def test_sin_historial_no_puntua(self, db: Session) -> None:
+        scores = [_ingresar(db, _txn("5000", dia)) for dia in range(MIN_OBSERVACIONES)]
+
+        assert scores == [None] * MIN_OBSERVACIONES
+        baseline = db.execute(select(AnomalyBaseline)).scalar_one()
+        assert (baseline.dimension, baseline.clave, baseline.n) == (
+            DIMENSION_COMERCIO,
+            "SODA TAPIA",
+            MIN_OBSERVACIONES,
+        )
+
+    def test_monto_normal_y_monto_anomalo(self, db: Session) -> None:
+        for dia, monto in enumerate(["5000", "5500", "4800", "5200", "5100", "4900"]):
+            _ingresar(db, _txn(monto, dia))
+
+        normal = _txn("5300", 10)
+        assert _ingresar(db, normal) > 0
+        assert normal.is_anomaly is False
+
+        anomala = _txn("60000", 11)
+        score = _ingresar(db, anomala)
+
+        assert score == Decimal("-1.0000")
+        assert anomala.is_anomaly is True
+        assert "Soda Tapia" in anomala.anomaly_reason
+
+    def test_montos_bajos_no_son_anomalos(self, db: Session) -> None:
+        for dia in range(6):
+            _ingresar(db, _txn("5000", dia))
+
+        assert _ingresar(db, _txn("50", 10)) == Decimal("1.0000")
+
+    def test_anomalia_no_infla_la_linea_base(self, db: Session) -> None:
+        for dia in range(6):
+            _ingresar(db, _txn("5000", dia))
+        _ingresar(db, _txn("500000", 10))
+
+        siguiente = _txn("6000", 11)
+        _ingresar(db, siguiente)
+
+        assert siguiente.is_anomaly is False
+
+    def test_subcategoria_es_otra_dimension(self, db: Session) -> None:
+        for dia in range(6):
+            _ingresar(db, _txn("5000", dia, comercio=f"Comercio {dia}", subcategory_id="sub-1"))
+
+        nuevo = _txn("90000", 10, comercio="Comercio nuevo", subcategory_id="sub-1")
+        _ingresar(db, nuevo)
+
+        assert nuevo.is_anomaly is True
+        assert nuevo.anomaly_reason.endswith("en la subcategoría")
+        dimensiones = db.execute(select(AnomalyBaseline.dimension).distinct()).scalars().all()
+        assert set(dimensiones) == {DIMENSION_COMERCIO, DIMENSION_SUBCATEGORIA}
+
+    def test_ignora_ingresos(self, db: Session) -> None:
+        assert _ingresar(db, _txn("100000", tipo_transaccion="ingreso")) is None
+        assert db.execute(select(AnomalyBaseline)).first() is None
+
+    def test_duplicado_falla_en_el_commit(self, db: Session) -> None:
+        """El score no hace autoflush: el duplicado se detecta en el commit, como antes."""
+        _ingresar(db, _txn("5000", email_id="correo-1"))
+
+        duplicada = _txn("5000", email_id="correo-1")
+        db.add(duplicada)
+        AnomalyService(db).score(duplicada)
+        with pytest.raises(IntegrityError):
+            db.commit()
+
+    def test_linea_base_creada_por_otra_importacion(self, db: Session) -> None:
+        """Si otra importación ya creó la clave, el INSERT no choca y se parte de su media."""
+        db.execute(
+            insert(AnomalyBaseline).values(
+                profile_id=PERFIL,
+                dimension=DIMENSION_COMERCIO,
+                clave="SODA TAPIA",
+                n=MIN_OBSERVACIONES,
+                media=math.log(5000),
+                varianza=0.01,
+            )
+        )
+        db.commit()
+        sentencias: list[str] = []
+        event.listen(
+            db.get_bind(),
+            "before_cursor_execute",
+            lambda _conn, _cursor, statement, *_args: sentencias.append(statement),
+        )
+
+        anomala = _txn("90000", 10)
+        _ingresar(db, anomala)
+
+        assert anomala.is_anomaly is True
+        assert any("ON CONFLICT" in sql and "DO NOTHING" in sql for sql in sentencias)
+        bloqueo = next(sql for sql in sentencias if "FOR UPDATE" in sql)
+        assert "ORDER BY anomaly_baselines.dimension, anomaly_baselines.clave" in bloqueo
+        baseline = db.execute(select(AnomalyBaseline)).scalar_one()
+        assert baseline.n == MIN_OBSERVACIONES + 1
+
+    def test_error_descarta_solo_el_score(
+        self, db: Session, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """El score corre en un savepoint: si falla, la transacción se guarda igual."""
+
+        def falla(self: AnomalyService, transaction: Transaction) -> None:
+            self.db.add(
+                AnomalyBaseline(
+                    profile_id=PERFIL,
+                    dimension=DIMENSION_COMERCIO,
+                    clave="SODA TAPIA",
+                    n=1,
+                    media=0.0,
+                    varianza=0.0,
+                )
+            )
+            self.db.flush()
+            raise OperationalError("SELECT ... FOR UPDATE", {}, Exception("lock timeout"))
+
+        monkeypatch.setattr(AnomalyService, "score", falla)
+        txn = _txn("5000")
+        db.add(txn)
+        db.flush()
+
+        TransactionProcessor._score_anomaly(db, txn)
+        db.commit()
+
+        assert db.get(Transaction, txn.id) is not None
+        assert db.execute(select(AnomalyBaseline)).first() is None
+
+
+class TestBackfill:
+    """El backfill por lotes reproduce el puntaje incremental."""
+
+    def test_backfill_igual_al_incremental(self, db: Session) -> None:
+        rng = np.random.default_rng(3)
+        comercios = ["Soda", "Super", "Gasolinera"]
+        for dia in range(60):
+            monto = float(np.exp(rng.normal(8.5, 0.3)))
+            if dia in (20, 45):
+                monto *= 30
+            _ingresar(
+                db,
+                _txn(
+                    f"{monto:.2f}",
+                    dia,
+                    comercio=comercios[dia % 3],
+                    subcategory_id=f"sub-{dia % 2}",
+                ),
+            )
+        incremental = {
+            t.id: (t.anomaly_score, t.is_anomaly, t.anomaly_reason)
+            for t in db.execute(select(Transaction)).scalars()
+        }
+        lineas = {
+            (b.dimension, b.clave): (b.n, b.media, b.varianza)
+            for b in db.execute(select(AnomalyBaseline)).scalars()
+        }
+
+        db.execute(
+            update(Transaction).values(anomaly_score=None, is_anomaly=False, anomaly_reason=None)
+        )
+        assert AnomalyService(db).backfill(PERFIL, batch_size=7) == 60
+        db.commit()
+        db.expire_all()
+
+        backfill = {
+            t.id: (t.anomaly_score, t.is_anomaly, t.anomaly_reason)
+            for t in db.execute(select(Transaction)).scalars()
+        }
+        assert backfill == incremental
+        assert sum(anomala for _, anomala, _ in backfill.values()) == 2
+        for baseline in db.execute(select(AnomalyBaseline)).scalars():
+            n, media, varianza = lineas[(baseline.dimension, baseline.clave)]
+            assert baseline.n == n
+            assert math.isclose(baseline.media, media)
+            assert math.isclose(baseline.varianza, varianza)
@@ -0,0 +1,104 @@
+"""Tests para el cache de identidad de las dependencias de la API."""
+
+from collections.abc import Generator
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from finanzas_tracker.api import dependencies
+from finanzas_tracker.api.dependencies import get_active_profile
+from finanzas_tracker.core.cache import identity_cache, invalidate_identity_cache
+from finanzas_tracker.models.profile import Profile
+
+
+@pytest.fixture
+def session_factory(session: Session) -> sessionmaker[Session]:
+    """Sesiones sobre la conexión de tests; cada una confirma en un savepoint."""
+    return sessionmaker(bind=session.get_bind(), join_transaction_mode="create_savepoint")
+
+
+@pytest.fixture(autouse=True)
+def cache_activo() -> Generator[None, None, None]:
+    """Activa el cache de identidad (los tests lo desactivan por defecto)."""
+    identity_cache.invalidate()
+    with (
+        patch.object(dependencies.settings, "identity_cache_ttl_seconds", 30),
+        patch.object(identity_cache, "ttl_seconds", 30),
+    ):
+        yield
+    identity_cache.invalidate()
+
+
+def _contar_selects(session: Session) -> list[str]:
+    statements: list[str] = []
+
+    def before_execute(_conn: Any, _cursor: Any, statement: str, *args: Any) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(session.get_bind(), "before_cursor_execute", before_execute)
+    return statements
+
+
+def _crear_perfil(factory: sessionmaker[Session], nombre: str, activo: bool) -> str:
+    with factory() as db:
+        profile = Profile(
+            email_outlook=f"{nombre}@example.com",
+            nombre=nombre,
+            es_activo=activo,
+            activo=True,
+        )
+        db.add(profile)
+        db.commit()
+        return profile.id
+
+
+class TestActiveProfileCache:
+    """Tests del cache del perfil activo."""
+
+    def test_segunda_llamada_no_consulta_la_bd(self, session_factory: sessionmaker) -> None:
+        """Con el cache caliente el perfil se adjunta a la sesión sin SELECT."""
+        profile_id = _crear_perfil(session_factory, "personal", activo=True)
+
+        with session_factory() as db:
+            assert get_active_profile(db).id == profile_id
+
+        with session_factory() as db:
+            selects = _contar_selects(db)
+            profile = get_active_profile(db)
+
+            assert profile.id == profile_id
+            assert profile.nombre == "personal"
+            assert profile in db
+            assert selects == []
+
+    def test_invalidar_al_cambiar_perfil_activo(self, session_factory: sessionmaker) -> None:
+        """Después de invalidar se vuelve a consultar el perfil activo."""
+        primero = _crear_perfil(session_factory, "personal", activo=True)
+        segundo = _crear_perfil(session_factory, "negocio", activo=False)
+
+        with session_factory() as db:
+            assert get_active_profile(db).id == primero
+
+        with session_factory() as db:
+            db.get(Profile, primero).es_activo = False
+            db.get(Profile, segundo).es_activo = True
+            db.commit()
+        invalidate_identity_cache()
+
+        with session_factory() as db:
+            assert get_active_profile(db).id == segundo
+
+    def test_cambios_en_sesion_no_alteran_el_cache(self, session_factory: sessionmaker) -> None:
+        """Modificar la instancia devuelta no modifica la copia cacheada."""
+        _crear_perfil(session_factory, "personal", activo=True)
+
+        with session_factory() as db:
+            get_active_profile(db).nombre = "otro"
+            db.rollback()
+
+        with session_factory() as db:
+            assert get_active_profile(db).nombre == "personal"
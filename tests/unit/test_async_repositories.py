@@ -0,0 +1,160 @@
+"""Tests para los repositorios async y las dependencias async de la API."""
+
+import asyncio
+from collections.abc import Generator
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import HTTPException
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Select
+
+from finanzas_tracker.api import dependencies
+from finanzas_tracker.api.dependencies import get_active_profile_async
+from finanzas_tracker.core import database
+from finanzas_tracker.core.cache import identity_cache
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.repositories import (
+    AsyncProfileRepository,
+    AsyncTransactionRepository,
+    TransactionRepository,
+)
+
+
+def _db(result: MagicMock | None = None) -> MagicMock:
+    """AsyncSession falsa: `execute` es awaitable y devuelve `result`."""
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result or MagicMock())
+    db.merge = AsyncMock(side_effect=lambda instance, load: instance)
+    return db
+
+
+def _sql(db: MagicMock) -> str:
+    stmt = db.execute.call_args.args[0]
+    assert isinstance(stmt, Select)
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestAsyncTransactionRepository:
+    """Los métodos async emiten las mismas consultas que el repositorio sync."""
+
+    def test_get_by_profile_misma_consulta_que_sync(self) -> None:
+        db = _db()
+        asyncio.run(
+            AsyncTransactionRepository(db).get_by_profile(
+                "perfil-1", limit=10, desde=date(2025, 11, 1)
+            )
+        )
+
+        sync_stmt = TransactionRepository(MagicMock())._by_profile_stmt(
+            "perfil-1", 0, 10, desde=date(2025, 11, 1)
+        )
+        assert _sql(db) == str(sync_stmt.compile(dialect=postgresql.dialect()))
+        assert "transactions.deleted_at IS NULL" in _sql(db)
+
+    def test_get_for_profile_filtra_perfil_y_borrados(self) -> None:
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = "txn"
+        db = _db(result)
+
+        found = asyncio.run(AsyncTransactionRepository(db).get_for_profile("txn-1", "perfil-1"))
+
+        assert found == "txn"
+        sql = _sql(db)
+        assert "transactions.id = %(id_1)s" in sql
+        assert "transactions.profile_id = %(profile_id_1)s" in sql
+        assert "transactions.deleted_at IS NULL" in sql
+
+    def test_total_por_mes_convierte_a_decimal(self) -> None:
+        result = MagicMock()
+        result.scalar.return_value = 1500.5
+        db = _db(result)
+
+        total = asyncio.run(AsyncTransactionRepository(db).get_total_by_month("perfil-1", 2025, 11))
+
+        assert total == Decimal("1500.5")
+
+    def test_create_hace_flush_sin_commit(self) -> None:
+        db = _db()
+        db.flush = AsyncMock()
+        db.commit = AsyncMock()
+
+        created = asyncio.run(
+            AsyncTransactionRepository(db).create({"profile_id": "perfil-1", "comercio": "UBER"})
+        )
+
+        assert isinstance(created, Transaction)
+        db.add.assert_called_once_with(created)
+        db.flush.assert_awaited_once()
+        db.commit.assert_not_called()
+
+
+class TestAsyncProfileRepository:
+    """Consultas de perfiles desde la AsyncSession."""
+
+    def test_get_currently_active(self) -> None:
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = None
+        db = _db(result)
+
+        assert asyncio.run(AsyncProfileRepository(db).get_currently_active()) is None
+        sql = _sql(db)
+        assert "profiles.es_activo IS true" in sql
+        assert "profiles.activo IS true" in sql
+
+
+class TestActiveProfileAsync:
+    """`get_active_profile_async` comparte el cache con la versión sync."""
+
+    @pytest.fixture(autouse=True)
+    def cache_activo(self) -> Generator[None, None, None]:
+        identity_cache.invalidate()
+        with (
+            patch.object(dependencies.settings, "identity_cache_ttl_seconds", 30),
+            patch.object(identity_cache, "ttl_seconds", 30),
+        ):
+            yield
+        identity_cache.invalidate()
+
+    def test_consulta_y_luego_usa_el_cache(self) -> None:
+        profile = Profile(id="perfil-1", email_outlook="a@example.com", nombre="personal")
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = profile
+        db = _db(result)
+
+        assert asyncio.run(get_active_profile_async(db)) is profile
+        assert db.execute.await_count == 1
+
+        otra = _db()
+        cached = asyncio.run(get_active_profile_async(otra))
+
+        assert cached.id == "perfil-1"
+        assert cached is not profile
+        otra.execute.assert_not_called()
+        otra.merge.assert_awaited_once()
+
+    def test_sin_perfil_activo_responde_404(self) -> None:
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = None
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(get_active_profile_async(_db(result)))
+
+        assert exc.value.status_code == 404
+
+
+def test_pool_configurable_desde_settings() -> None:
+    with (
+        patch.object(database.settings, "db_pool_size", 5),
+        patch.object(database.settings, "db_max_overflow", 0),
+        patch.object(database.settings, "db_pool_recycle", 300),
+    ):
+        options = database._pool_options()
+
+    assert options["pool_size"] == 5
+    assert options["max_overflow"] == 0
+    assert options["pool_recycle"] == 300
+    assert options["pool_pre_ping"] is True
@@ -0,0 +1,397 @@
+"""Tests para el libro de saldos diarios (patrimonio en cualquier fecha)."""
+
+from collections.abc import Generator
+from datetime import UTC, date, datetime
+from decimal import Decimal
+import threading
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import Engine, delete, event, select
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.core.database import SessionLocal, _LazySession
+from finanzas_tracker.models.balance_ledger import (
+    CUENTA_EFECTIVO,
+    BalanceLedgerEntry,
+    cuenta_tarjeta,
+)
+from finanzas_tracker.models.card import Card
+from finanzas_tracker.models.card_payment import CardPayment
+from finanzas_tracker.models.enums import (
+    BankName,
+    CardType,
+    Currency,
+    IncomeType,
+    InvestmentType,
+)
+from finanzas_tracker.models.goal import Goal
+from finanzas_tracker.models.income import Income
+from finanzas_tracker.models.investment import Investment
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services.balance_ledger_service import (
+    BalanceLedgerService,
+    _before_commit,
+    register_ledger_events,
+    unregister_ledger_events,
+)
+from finanzas_tracker.services.patrimony_service import PatrimonyService
+
+
+@pytest.fixture
+def ledger_events() -> Generator[None, None, None]:
+    register_ledger_events()
+    yield
+    unregister_ledger_events()
+
+
+@pytest.fixture
+def perfil(session: Session) -> str:
+    profile = Profile(email_outlook="test@example.com", nombre="Test")
+    session.add(profile)
+    session.commit()
+    return profile.id
+
+
+def _tarjeta(session: Session, profile_id: str, tipo: CardType = CardType.CREDIT) -> str:
+    card = Card(profile_id=profile_id, ultimos_4_digitos="1234", tipo=tipo, banco=BankName.BAC)
+    session.add(card)
+    session.commit()
+    return card.id
+
+
+def _ingreso(profile_id: str, fecha: date, monto: str, **kwargs: object) -> Income:
+    return Income(
+        profile_id=profile_id,
+        tipo=IncomeType.SALARY,
+        descripcion="Salario",
+        monto_original=Decimal(monto),
+        moneda_original=Currency.CRC,
+        monto_crc=Decimal(monto),
+        fecha=fecha,
+        **kwargs,
+    )
+
+
+def _gasto(profile_id: str, fecha: date, monto: str, **kwargs: object) -> Transaction:
+    return Transaction(
+        profile_id=profile_id,
+        email_id=str(uuid4()),
+        banco="bac",
+        tipo_transaccion="compra",
+        comercio="Comercio",
+        monto_original=Decimal(monto),
+        moneda_original="CRC",
+        monto_crc=Decimal(monto),
+        fecha_transaccion=datetime.combine(fecha, datetime.min.time()),
+        **kwargs,
+    )
+
+
+class TestRebuild:
+    """Tests para rebuild y las consultas del libro."""
+
+    def test_sumas_acumuladas_por_dia(self, session: Session, perfil: str) -> None:
+        session.add_all(
+            [
+                _ingreso(perfil, date(2025, 1, 1), "1000"),
+                _gasto(perfil, date(2025, 1, 5), "200"),
+                _gasto(perfil, date(2025, 1, 5), "50"),
+                _ingreso(perfil, date(2025, 2, 1), "1000"),
+            ]
+        )
+        session.commit()
+
+        service = BalanceLedgerService(session)
+        assert service.rebuild(perfil) == 3
+
+        rows = session.execute(
+            select(BalanceLedgerEntry).order_by(BalanceLedgerEntry.fecha)
+        ).scalars()
+        assert [(r.fecha, r.movimiento, r.saldo) for r in rows] == [
+            (date(2025, 1, 1), Decimal("1000"), Decimal("1000")),
+            (date(2025, 1, 5), Decimal("-250"), Decimal("750")),
+            (date(2025, 2, 1), Decimal("1000"), Decimal("1750")),
+        ]
+
+        totales = service.totales_en(perfil, date(2025, 1, 20))
+        assert totales.activos_crc == Decimal("750")
+        assert totales.ingresos_crc == Decimal("1000")
+        assert totales.egresos_crc == Decimal("250")
+        assert service.totales_en(perfil, date(2024, 12, 31)).neto_crc == 0
+
+    def test_tarjeta_de_credito_es_deuda_y_el_pago_la_transfiere(
+        self, session: Session, perfil: str
+    ) -> None:
+        card_id = _tarjeta(session, perfil)
+        session.add_all(
+            [
+                _ingreso(perfil, date(2025, 1, 1), "1000"),
+                _gasto(perfil, date(2025, 1, 2), "300", card_id=card_id),
+                CardPayment(card_id=card_id, monto=Decimal("300"), fecha_pago=date(2025, 1, 20)),
+            ]
+        )
+        session.commit()
+
+        service = BalanceLedgerService(session)
+        service.rebuild(perfil)
+
+        antes = service.totales_en(perfil, date(2025, 1, 10))
+        assert (antes.activos_crc, antes.deudas_crc) == (Decimal("1000"), Decimal("300"))
+        despues = service.totales_en(perfil, date(2025, 1, 31))
+        assert (despues.activos_crc, despues.deudas_crc) == (Decimal("700"), Decimal("0"))
+        # El pago no cambia el patrimonio: sólo mueve plata entre cuentas
+        assert antes.neto_crc == despues.neto_crc == Decimal("700")
+        assert {e.cuenta for e in service.saldos_en(perfil, date(2025, 1, 31))} == {
+            CUENTA_EFECTIVO,
+            cuenta_tarjeta(card_id),
+        }
+
+    def test_respeta_exclusiones_y_borrados(self, session: Session, perfil: str) -> None:
+        session.add_all(
+            [
+                _ingreso(perfil, date(2025, 1, 1), "1000"),
+                _gasto(perfil, date(2025, 1, 2), "100", excluir_de_presupuesto=True),
+                _gasto(perfil, date(2025, 1, 3), "100", deleted_at=datetime.now(UTC)),
+            ]
+        )
+        session.commit()
+
+        service = BalanceLedgerService(session)
+        service.rebuild(perfil)
+
+        assert service.totales_en(perfil, date(2025, 1, 31)).neto_crc == Decimal("1000")
+
+    def test_rebuild_parcial_continua_desde_el_saldo_anterior(
+        self, session: Session, perfil: str
+    ) -> None:
+        session.add_all([_ingreso(perfil, date(2025, 1, 1), "1000")])
+        session.commit()
+        service = BalanceLedgerService(session)
+        service.rebuild(perfil)
+
+        session.add(_gasto(perfil, date(2025, 3, 1), "400"))
+        session.commit()
+        assert service.rebuild(perfil, desde=date(2025, 3, 1)) == 1
+
+        assert service.totales_en(perfil, date(2025, 3, 1)).activos_crc == Decimal("600")
+
+    def test_serie_diaria(self, session: Session, perfil: str) -> None:
+        session.add_all(
+            [
+                _ingreso(perfil, date(2025, 1, 1), "1000"),
+                _gasto(perfil, date(2025, 1, 3), "100"),
+            ]
+        )
+        session.commit()
+        service = BalanceLedgerService(session)
+        service.rebuild(perfil)
+
+        serie = service.serie_diaria(perfil, date(2025, 1, 2), date(2025, 1, 4))
+
+        assert [(dia, t.neto_crc) for dia, t in serie] == [
+            (date(2025, 1, 2), Decimal("1000")),
+            (date(2025, 1, 3), Decimal("900")),
+            (date(2025, 1, 4), Decimal("900")),
+        ]
+
+
+@pytest.mark.usefixtures("ledger_events")
+class TestLedgerEvents:
+    """El libro se mantiene al hacer commit."""
+
+    def test_commit_actualiza_el_libro(self, session: Session, perfil: str) -> None:
+        session.add(_ingreso(perfil, date(2025, 1, 1), "1000"))
+        session.commit()
+        session.add(_gasto(perfil, date(2025, 1, 10), "100"))
+        session.commit()
+
+        service = BalanceLedgerService(session)
+        assert service.totales_en(perfil, date(2025, 1, 31)).neto_crc == Decimal("900")
+
+    def test_cambio_de_fecha_recalcula_desde_la_anterior(
+        self, session: Session, perfil: str
+    ) -> None:
+        session.add(_ingreso(perfil, date(2025, 1, 1), "1000"))
+        gasto = _gasto(perfil, date(2025, 1, 10), "100")
+        session.add(gasto)
+        session.commit()
+
+        gasto.fecha_transaccion = datetime(2025, 2, 10)
+        session.commit()
+
+        service = BalanceLedgerService(session)
+        assert service.totales_en(perfil, date(2025, 1, 31)).neto_crc == Decimal("1000")
+        assert service.totales_en(perfil, date(2025, 2, 28)).neto_crc == Decimal("900")
+
+    def test_soft_delete_y_pago_de_tarjeta(self, session: Session, perfil: str) -> None:
+        card_id = _tarjeta(session, perfil)
+        gasto = _gasto(perfil, date(2025, 1, 5), "300", card_id=card_id)
+        session.add(gasto)
+        session.add(CardPayment(card_id=card_id, monto=Decimal("100"), fecha_pago=date(2025, 1, 6)))
+        session.commit()
+
+        service = BalanceLedgerService(session)
+        assert service.totales_en(perfil, date(2025, 1, 6)).deudas_crc == Decimal("200")
+
+        gasto.soft_delete()
+        session.commit()
+        assert service.totales_en(perfil, date(2025, 1, 6)).deudas_crc == Decimal("-100")
+
+    def test_solo_recalcula_si_cambia_el_monto_o_la_fecha(
+        self, session: Session, perfil: str
+    ) -> None:
+        gasto = _gasto(perfil, date(2025, 1, 10), "100")
+        session.add(gasto)
+        session.commit()
+
+        with patch.object(BalanceLedgerService, "rebuild") as rebuild:
+            gasto.notas = "almuerzo"
+            gasto.confirmada = True
+            session.commit()
+            rebuild.assert_not_called()
+
+            gasto.monto_crc = Decimal("150")
+            session.commit()
+            rebuild.assert_called_once_with(perfil, date(2025, 1, 10))
+
+    def test_rollback_descarta_pendientes(self, session: Session, perfil: str) -> None:
+        session.add(_ingreso(perfil, date(2025, 1, 1), "1000"))
+        session.flush()
+        session.rollback()
+
+        session.commit()
+        assert session.execute(select(BalanceLedgerEntry)).first() is None
+
+    def test_commits_concurrentes_del_mismo_perfil_y_dia(self, setup_test_database: Engine) -> None:
+        """El segundo commit espera el lock del perfil en vez de chocar en el índice único."""
+        engine = setup_test_database
+        with Session(engine) as setup:
+            profile = Profile(email_outlook="concurrente@example.com", nombre="Concurrente")
+            setup.add(profile)
+            setup.commit()
+            perfil = profile.id
+
+        dia = date(2025, 1, 10)
+        errores: list[Exception] = []
+
+        def commit(sesion: Session) -> None:
+            try:
+                sesion.commit()
+            except Exception as e:
+                errores.append(e)
+
+        try:
+            with Session(engine) as primera, Session(engine) as segunda:
+                primera.add(_gasto(perfil, dia, "100"))
+                primera.flush()
+                # Escribe la fila del día sin confirmar y retiene el lock del perfil
+                BalanceLedgerService(primera).rebuild(perfil, dia)
+
+                segunda.add(_gasto(perfil, dia, "50"))
+                hilo = threading.Thread(target=commit, args=(segunda,))
+                hilo.start()
+                primera.commit()
+                hilo.join(timeout=10)
+
+            assert not hilo.is_alive()
+            assert errores == []
+            with Session(engine) as lectura:
+                totales = BalanceLedgerService(lectura).totales_en(perfil, dia)
+            assert totales.egresos_crc == Decimal("150")
+        finally:
+            with engine.begin() as conn:
+                for model in (BalanceLedgerEntry, Transaction):
+                    conn.execute(delete(model).where(model.profile_id == perfil))
+                conn.execute(delete(Profile).where(Profile.id == perfil))
+
+
+class TestRegistro:
+    """Las sesiones de la aplicación traen los listeners registrados."""
+
+    def test_session_local_registra_los_eventos(self, session: Session) -> None:
+        with SessionLocal(bind=session.get_bind()):
+            pass
+
+        assert event.contains(_LazySession, "before_commit", _before_commit)
+        assert not event.contains(Session, "before_commit", _before_commit)
+
+
+class TestPatrimonyServiceLedger:
+    """PatrimonyService calcula el patrimonio en cualquier fecha con el libro."""
+
+    def test_cambio_periodo_en_fechas_exactas(self, session: Session, perfil: str) -> None:
+        session.add_all(
+            [
+                _ingreso(perfil, date(2025, 1, 1), "1000"),
+                _ingreso(perfil, date(2025, 1, 15), "500"),
+            ]
+        )
+        session.commit()
+        BalanceLedgerService(session).rebuild(perfil)
+
+        result = PatrimonyService(session).calcular_cambio_periodo(
+            perfil, date(2025, 1, 10), date(2025, 1, 20)
+        )
+
+        assert result["patrimonio_inicio_crc"] == Decimal("1000")
+        assert result["patrimonio_fin_crc"] == Decimal("1500")
+        assert result["cambio_porcentual"] == Decimal("50.00")
+        assert result["fecha_inicio_real"] == date(2025, 1, 10)
+
+    def test_cambio_periodo_fechas_invertidas(self, session: Session, perfil: str) -> None:
+        with pytest.raises(ValueError):
+            PatrimonyService(session).calcular_cambio_periodo(
+                perfil, date(2025, 2, 1), date(2025, 1, 1)
+            )
+
+    def test_historial_diario(self, session: Session, perfil: str) -> None:
+        session.add(_ingreso(perfil, date(2025, 1, 2), "1000"))
+        session.commit()
+        BalanceLedgerService(session).rebuild(perfil)
+
+        dias = PatrimonyService(session).historial_diario(
+            perfil, date(2025, 1, 1), date(2025, 1, 3)
+        )
+
+        assert [d["patrimonio_neto_crc"] for d in dias] == [0, Decimal("1000"), Decimal("1000")]
+
+    def test_incluye_inversiones_y_metas(self, session: Session, perfil: str) -> None:
+        session.add_all(
+            [
+                _ingreso(perfil, date(2025, 1, 2), "1000"),
+                Investment(
+                    profile_id=perfil,
+                    nombre="CDP",
+                    tipo=InvestmentType.CDP,
+                    institucion="BAC",
+                    monto_principal=Decimal("5000"),
+                    fecha_inicio=date(2024, 6, 1),
+                ),
+                Goal(
+                    profile_id=perfil,
+                    nombre="Viaje",
+                    monto_objetivo=Decimal("100"),
+                    monto_actual=Decimal("10"),
+                    moneda=Currency.USD,
+                ),
+            ]
+        )
+        session.commit()
+        BalanceLedgerService(session).rebuild(perfil)
+        service = PatrimonyService(session)
+
+        dias = service.historial_diario(perfil, date(2025, 1, 1), date(2025, 1, 2))
+        cambio = service.calcular_cambio_periodo(perfil, date(2025, 1, 1), date(2025, 1, 2))
+
+        metas = Decimal("10") * PatrimonyService.DEFAULT_EXCHANGE_RATE
+        assert [d["patrimonio_neto_crc"] for d in dias] == [
+            5000 + metas,
+            6000 + metas,
+        ]
+        assert dias[0]["inversiones_crc"] == Decimal("5000")
+        assert dias[0]["metas_crc"] == metas
+        assert cambio["cambio_absoluto_crc"] == Decimal("1000")
+        assert service.calculate_net_worth(perfil).total_crc_equivalente == 5000 + metas
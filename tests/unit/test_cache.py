@@ -1,8 +1,25 @@
 """Tests for the caching system."""
 
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+import sys
 import time
+from unittest.mock import MagicMock, patch
 
-from finanzas_tracker.core.cache import TTLCache, cached_query, invalidate_profile_cache
+import pytest
+
+from finanzas_tracker.core.cache import (
+    MemoryBackend,
+    RedisBackend,
+    SQLiteBackend,
+    TTLCache,
+    cached_query,
+    dashboard_cache,
+    invalidate_profile_cache,
+    render_cache_metrics,
+)
 
 
 class TestTTLCache:
@@ -175,3 +192,215 @@ class TestInvalidateProfileCache:
         """Should invalidate profile cache without errors."""
         # Should not raise any errors
         invalidate_profile_cache("profile123")
+
+
+class TestLRUBounds:
+    """Tests for the LRU bound and hit/miss counters."""
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Should evict the least recently used key when full."""
+        cache = TTLCache(ttl_seconds=60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" queda como el menos usado
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()["total_keys"] == 2
+        assert cache.stats().evictions == 1
+
+    def test_hit_and_miss_counters(self) -> None:
+        """Should count hits, misses and the hit ratio."""
+        cache = TTLCache(ttl_seconds=60)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (2, 1)
+        assert stats.hit_ratio == pytest.approx(2 / 3)
+
+    def test_render_cache_metrics(self) -> None:
+        """Should expose named caches as Prometheus counters."""
+        cache = TTLCache(ttl_seconds=60, name="test_metrics")
+        cache.get("missing")
+
+        output = render_cache_metrics()
+
+        assert "# TYPE cache_hits_total counter" in output
+        assert 'cache_misses_total{cache="test_metrics"} 1' in output
+
+
+class TestCacheKeys:
+    """Tests for cache key building and profile scoping."""
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self) -> Generator[None, None, None]:
+        dashboard_cache.invalidate()
+        yield
+        dashboard_cache.invalidate()
+
+    def test_positional_and_keyword_share_key(self) -> None:
+        """Should normalize args so f(1, b=2), f(1, 2) and f(1) hit the same entry."""
+        call_count = 0
+
+        @cached_query(ttl_seconds=60, profile_aware=False)
+        def add(a: int, b: int = 2) -> int:
+            nonlocal call_count
+            call_count += 1
+            return a + b
+
+        assert add(1, b=2) == add(1, 2) == add(1) == 3
+        assert call_count == 1
+
+    def test_unstable_argument_bypasses_cache(self) -> None:
+        """Should not cache calls with arguments that have no stable key."""
+        call_count = 0
+
+        @cached_query(ttl_seconds=60, profile_aware=False)
+        def length(items: object) -> int:
+            nonlocal call_count
+            call_count += 1
+            return 1
+
+        length(object())
+        length(object())
+        assert call_count == 2
+
+    def test_none_results_are_not_cached(self) -> None:
+        """Should re-execute when the previous result was None."""
+        call_count = 0
+
+        @cached_query(ttl_seconds=60, profile_aware=False)
+        def nothing(x: int) -> None:
+            nonlocal call_count
+            call_count += 1
+
+        nothing(1)
+        nothing(1)
+        assert call_count == 2
+
+    def test_invalidate_profile_only_touches_that_profile(self) -> None:
+        """Should invalidate every function of one profile and keep the others."""
+        calls: list[str] = []
+
+        @cached_query(ttl_seconds=60)
+        def expenses(profile_id: str) -> str:
+            calls.append(f"expenses:{profile_id}")
+            return "e"
+
+        @cached_query(ttl_seconds=60)
+        def incomes(profile_id: str) -> str:
+            calls.append(f"incomes:{profile_id}")
+            return "i"
+
+        for profile in ("p1", "p2"):
+            expenses(profile)
+            incomes(profile)
+        invalidate_profile_cache("p1")
+        for profile in ("p1", "p2"):
+            expenses(profile)
+            incomes(profile)
+
+        assert calls.count("expenses:p1") == 2
+        assert calls.count("incomes:p1") == 2
+        assert calls.count("expenses:p2") == 1
+        assert calls.count("incomes:p2") == 1
+
+    def test_invalidate_cache_of_one_function(self) -> None:
+        """Should invalidate only the decorated function's entries."""
+        calls: list[str] = []
+
+        @cached_query(ttl_seconds=60)
+        def expenses(profile_id: str) -> str:
+            calls.append("expenses")
+            return "e"
+
+        @cached_query(ttl_seconds=60)
+        def incomes(profile_id: str) -> str:
+            calls.append("incomes")
+            return "i"
+
+        expenses("p1")
+        incomes("p1")
+        expenses.invalidate_cache("p1")  # type: ignore[attr-defined]
+        expenses("p1")
+        incomes("p1")
+
+        assert calls == ["expenses", "incomes", "expenses"]
+
+
+class TestBackends:
+    """Tests for the persistent backends."""
+
+    def test_sqlite_backend_shared_between_instances(self, tmp_path: Path) -> None:
+        """Should share entries through the same file."""
+        path = tmp_path / "cache.sqlite3"
+        writer = TTLCache(ttl_seconds=60, backend=SQLiteBackend(path))
+        reader = TTLCache(ttl_seconds=60, backend=SQLiteBackend(path))
+
+        writer.set("profile:p1|f|", {"total": Decimal("10.50")})
+        writer.set("profile:p2|f|", [1, 2])
+
+        assert reader.get("profile:p1|f|") == {"total": Decimal("10.50")}
+        assert reader.invalidate_matching(prefix="profile:p1|") == 1
+        assert writer.get("profile:p1|f|") is None
+        assert writer.get("profile:p2|f|") == [1, 2]
+
+    def test_sqlite_backend_eviction_and_expiration(self, tmp_path: Path) -> None:
+        """Should keep at most max_entries and expire old values."""
+        backend = SQLiteBackend(tmp_path / "cache.sqlite3", max_entries=2)
+        backend.set("a", 1, 60)
+        backend.set("b", 2, 60)
+        backend.set("c", 3, 60)
+        backend.set("d", 4, -1)
+
+        assert backend.size() <= 2
+        assert backend.evictions >= 1
+        assert backend.get("d") is None
+
+    def test_memory_counter(self) -> None:
+        """Should start counters at zero, add atomically and expire them."""
+        cache = TTLCache(ttl_seconds=60, backend=MemoryBackend())
+
+        assert cache.incr("tokens", 0) == 0
+        assert cache.incr("tokens", 5) == 5
+        assert cache.incr("tokens", 3) == 8
+        assert cache.incr("expired", 7, ttl_seconds=-1) == 7
+        assert cache.incr("expired", 0) == 0
+
+    def test_sqlite_counter_shared_and_atomic(self, tmp_path: Path) -> None:
+        """Should not lose increments between instances writing concurrently."""
+        path = tmp_path / "cache.sqlite3"
+        caches = [TTLCache(ttl_seconds=60, backend=SQLiteBackend(path)) for _ in range(4)]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda i: caches[i % 4].incr("tokens", 10), range(200)))
+
+        assert caches[0].incr("tokens", 0) == 2000
+        assert caches[1].incr("expired", 7, ttl_seconds=-1) == 7
+        assert caches[2].incr("expired", 0) == 0
+
+    def test_redis_counter_keeps_its_expiration(self) -> None:
+        """Should create the counter with SET NX PX and add with INCRBY."""
+        backend = RedisBackend.__new__(RedisBackend)
+        backend.key_prefix = "finanzas:tokens:"
+        backend._client = MagicMock()
+        pipe = backend._client.pipeline.return_value
+        pipe.execute.return_value = [True, 42]
+
+        assert backend.incr("p1", 42, 60) == 42
+
+        pipe.set.assert_called_once_with("finanzas:tokens:p1", 0, px=60_000, nx=True)
+        pipe.incrby.assert_called_once_with("finanzas:tokens:p1", 42)
+
+    def test_redis_backend_requires_package(self) -> None:
+        """Should explain how to install redis when it is missing."""
+        with (
+            patch.dict(sys.modules, {"redis": None}),
+            pytest.raises(ImportError, match="pip install redis"),
+        ):
+            RedisBackend("redis://localhost:6379/0")
@@ -0,0 +1,199 @@
+"""Tests para el cliente central de Claude (prompt caching y presupuestos)."""
+
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from finanzas_tracker.core import claude_credits
+from finanzas_tracker.core.cache import SQLiteBackend, TTLCache
+from finanzas_tracker.core.claude_client import (
+    CACHE_CONTROL,
+    ClaudeClient,
+    TokenUsage,
+    cached_system,
+    get_token_usage,
+    reset_token_usage,
+    response_text,
+)
+from finanzas_tracker.core.claude_credits import (
+    ClaudeServiceUnavailable,
+    TokenBudgetExceeded,
+    check_token_budget,
+    get_profile_token_usage,
+    reset_token_budgets,
+    with_claude_fallback,
+)
+
+
+def _response(
+    text: str = "ok",
+    input_tokens: int = 50,
+    output_tokens: int = 10,
+    cache_creation: int = 0,
+    cache_read: int = 0,
+) -> MagicMock:
+    response = MagicMock()
+    response.content = [MagicMock(text=text)]
+    response.usage = MagicMock(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_creation_input_tokens=cache_creation,
+        cache_read_input_tokens=cache_read,
+    )
+    return response
+
+
+@pytest.fixture(autouse=True)
+def contadores_limpios() -> Generator[None, None, None]:
+    reset_token_usage()
+    reset_token_budgets()
+    yield
+    reset_token_usage()
+    reset_token_budgets()
+
+
+class TestCachedSystem:
+    """El prefijo estático se marca para el cache de Anthropic."""
+
+    def test_cache_control_solo_en_el_ultimo_bloque(self) -> None:
+        blocks = cached_system(["instrucciones", "", "categorías"])
+
+        assert [block["text"] for block in blocks] == ["instrucciones", "categorías"]
+        assert "cache_control" not in blocks[0]
+        assert blocks[-1]["cache_control"] == CACHE_CONTROL
+
+    def test_texto_simple_y_vacio(self) -> None:
+        assert cached_system("solo") == [
+            {"type": "text", "text": "solo", "cache_control": CACHE_CONTROL}
+        ]
+        assert cached_system(None) == []
+
+
+class TestTokenUsage:
+    """Contabilidad de tokens por llamada."""
+
+    def test_lecturas_de_cache_cuentan_al_diez_por_ciento(self) -> None:
+        usage = TokenUsage(input_tokens=20, cache_read_input_tokens=1000, output_tokens=30)
+
+        assert usage.budget_tokens == 20 + 30 + 100
+        assert usage.cache_hit_ratio == pytest.approx(1000 / 1020)
+
+    def test_valores_no_numericos_cuentan_cero(self) -> None:
+        usage = TokenUsage.from_response(MagicMock())
+
+        assert usage.calls == 1
+        assert usage.budget_tokens == 0
+
+
+class TestClaudeClient:
+    """`create` arma el prompt cacheado y registra el consumo."""
+
+    def test_create_envia_system_cacheado_y_registra_por_call_site(self) -> None:
+        anthropic_client = MagicMock()
+        anthropic_client.messages.create.return_value = _response(
+            input_tokens=40, output_tokens=10, cache_read=2000
+        )
+        claude = ClaudeClient(anthropic_client)
+
+        response = claude.create(
+            call_site="categorizer.claude",
+            system=["reglas", "categorías"],
+            messages=[{"role": "user", "content": "UBER"}],
+            max_tokens=100,
+        )
+
+        assert response_text(response) == "ok"
+        params = anthropic_client.messages.create.call_args.kwargs
+        assert params["max_tokens"] == 100
+        assert params["system"][-1]["cache_control"] == CACHE_CONTROL
+        assert params["messages"] == [{"role": "user", "content": "UBER"}]
+
+        usage = get_token_usage()["categorizer.claude"]
+        assert usage["calls"] == 1
+        assert usage["cache_read_input_tokens"] == 2000
+        assert usage["cache_hit_ratio"] == pytest.approx(2000 / 2040, abs=0.001)
+
+    def test_sin_cache_envia_system_como_texto(self) -> None:
+        anthropic_client = MagicMock()
+        anthropic_client.messages.create.return_value = _response()
+
+        ClaudeClient(anthropic_client).create(
+            call_site="test",
+            system=["a", "b"],
+            messages=[{"role": "user", "content": "x"}],
+            cache=False,
+        )
+
+        assert anthropic_client.messages.create.call_args.kwargs["system"] == "a\n\nb"
+
+    def test_descuenta_tokens_del_perfil(self) -> None:
+        anthropic_client = MagicMock()
+        anthropic_client.messages.create.return_value = _response(
+            input_tokens=100, output_tokens=20, cache_read=500
+        )
+
+        ClaudeClient(anthropic_client).create(
+            call_site="test",
+            messages=[{"role": "user", "content": "x"}],
+            profile_id="perfil-1",
+        )
+
+        assert get_profile_token_usage("perfil-1") == 100 + 20 + 50
+
+
+class TestTokenBudget:
+    """Presupuesto diario de tokens por perfil."""
+
+    def test_presupuesto_agotado_bloquea_la_llamada(self) -> None:
+        anthropic_client = MagicMock()
+        anthropic_client.messages.create.return_value = _response(
+            input_tokens=900, output_tokens=200
+        )
+        claude = ClaudeClient(anthropic_client)
+        messages = [{"role": "user", "content": "x"}]
+
+        with patch.object(claude_credits.settings, "claude_daily_token_budget", 1000):
+            claude.create(call_site="test", messages=messages, profile_id="perfil-1")
+            with pytest.raises(TokenBudgetExceeded):
+                claude.create(call_site="test", messages=messages, profile_id="perfil-1")
+            # Otro perfil conserva su presupuesto
+            claude.create(call_site="test", messages=messages, profile_id="perfil-2")
+
+        assert anthropic_client.messages.create.call_count == 2
+
+    def test_sin_perfil_o_sin_limite_no_se_bloquea(self) -> None:
+        claude_credits.record_token_usage("perfil-1", 10_000)
+
+        with patch.object(claude_credits.settings, "claude_daily_token_budget", 100):
+            assert check_token_budget(None) == (True, "")
+        with patch.object(claude_credits.settings, "claude_daily_token_budget", 0):
+            assert check_token_budget("perfil-1") == (True, "")
+
+    def test_presupuesto_compartido_entre_workers(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Con un backend compartido, lo que gasta un worker lo ve el otro."""
+        path = tmp_path / "tokens.sqlite3"
+        monkeypatch.setattr(
+            claude_credits, "token_budget_cache", TTLCache(backend=SQLiteBackend(path))
+        )
+        claude_credits.record_token_usage("perfil-1", 600)
+        monkeypatch.setattr(
+            claude_credits, "token_budget_cache", TTLCache(backend=SQLiteBackend(path))
+        )
+        claude_credits.record_token_usage("perfil-1", 500)
+
+        with patch.object(claude_credits.settings, "claude_daily_token_budget", 1000):
+            puede, mensaje = check_token_budget("perfil-1")
+
+        assert puede is False
+        assert "1,100/1,000" in mensaje
+
+    def test_fallback_cuando_claude_no_esta_disponible(self) -> None:
+        @with_claude_fallback(fallback_value="fallback")
+        def categorizar() -> str:
+            raise ClaudeServiceUnavailable("sin presupuesto")
+
+        assert categorizar() == "fallback"
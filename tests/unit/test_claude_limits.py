@@ -0,0 +1,209 @@
+"""Tests para el limitador de concurrencia y el circuit breaker de Claude."""
+
+import asyncio
+from collections.abc import Generator
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import anthropic
+import httpx
+import pytest
+
+from finanzas_tracker.core import claude_limits
+from finanzas_tracker.core.claude_client import ClaudeClient
+from finanzas_tracker.core.claude_credits import ClaudeCircuitOpen
+from finanzas_tracker.core.claude_limits import (
+    CircuitBreaker,
+    CircuitState,
+    RateLimiter,
+    fan_out,
+    get_circuit_breaker,
+    reset_claude_limits,
+    run_fan_out,
+)
+from finanzas_tracker.services.merchant_lookup_service import MerchantInfo, MerchantLookupService
+
+
+def _status_error(status_code: int, retry_after: str | None = None) -> anthropic.APIStatusError:
+    headers = {"retry-after": retry_after} if retry_after else {}
+    response = httpx.Response(
+        status_code,
+        request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
+        headers=headers,
+    )
+    return anthropic.APIStatusError("error", response=response, body=None)
+
+
+@pytest.fixture(autouse=True)
+def limites_limpios() -> Generator[None, None, None]:
+    reset_claude_limits()
+    yield
+    reset_claude_limits()
+
+
+class TestRateLimiter:
+    """Token bucket de requests por minuto."""
+
+    def test_rafaga_hasta_el_limite_y_luego_espera(self) -> None:
+        limiter = RateLimiter(max_concurrency=2, requests_per_minute=3)
+
+        assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+        # 3 rpm = un token cada 20s; el cuarto espera ~20s y el quinto ~40s
+        assert limiter.reserve() == pytest.approx(20, abs=0.5)
+        assert limiter.reserve() == pytest.approx(40, abs=0.5)
+
+    def test_sin_limite_no_espera(self) -> None:
+        limiter = RateLimiter(max_concurrency=1, requests_per_minute=0)
+
+        assert all(limiter.reserve() == 0.0 for _ in range(100))
+
+    def test_semaforo_acota_la_concurrencia(self) -> None:
+        limiter = RateLimiter(max_concurrency=2, requests_per_minute=0)
+        activos, maximo = 0, 0
+        lock = threading.Lock()
+
+        def llamada(_: int) -> None:
+            nonlocal activos, maximo
+            with limiter.acquire():
+                with lock:
+                    activos += 1
+                    maximo = max(maximo, activos)
+                time.sleep(0.02)
+                with lock:
+                    activos -= 1
+
+        run_fan_out(llamada, range(8), concurrency=8)
+
+        assert maximo == 2
+
+
+class TestCircuitBreaker:
+    """Se abre con 429/529 seguidos y se cierra tras una prueba exitosa."""
+
+    def test_se_abre_tras_el_umbral_y_falla_rapido(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+
+        breaker.record_failure(_status_error(429))
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_failure(_status_error(529))
+        assert breaker.state == CircuitState.OPEN
+
+        with pytest.raises(ClaudeCircuitOpen) as exc:
+            breaker.before_call()
+        assert 1 <= exc.value.retry_after <= 30
+
+    def test_otros_errores_no_lo_abren(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+
+        breaker.record_failure(_status_error(429))
+        breaker.record_failure(_status_error(400))  # la API respondió
+        breaker.record_failure(_status_error(429))
+        breaker.record_failure(anthropic.APIConnectionError(request=MagicMock()))
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_deja_pasar_una_prueba(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+        with patch.object(claude_limits.time, "monotonic", return_value=100.0):
+            breaker.record_failure(_status_error(429))
+
+        with patch.object(claude_limits.time, "monotonic", return_value=111.0):
+            breaker.before_call()  # la prueba pasa
+            with pytest.raises(ClaudeCircuitOpen):
+                breaker.before_call()  # las demás esperan a la prueba
+            breaker.record_success()
+
+        assert breaker.state == CircuitState.CLOSED
+        breaker.before_call()
+
+    def test_prueba_fallida_reabre_respetando_retry_after(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+        with patch.object(claude_limits.time, "monotonic", return_value=100.0):
+            breaker.record_failure(_status_error(429))
+        with patch.object(claude_limits.time, "monotonic", return_value=111.0):
+            breaker.before_call()
+            breaker.record_failure(_status_error(429, retry_after="60"))
+
+        with patch.object(claude_limits.time, "monotonic", return_value=150.0):
+            assert breaker.state == CircuitState.OPEN
+        with patch.object(claude_limits.time, "monotonic", return_value=172.0):
+            assert breaker.state == CircuitState.HALF_OPEN
+
+
+class TestClaudeClientLimits:
+    """`ClaudeClient` comparte el breaker entre todas las llamadas."""
+
+    def test_429_seguidos_abren_el_circuito_sin_mas_llamadas(self) -> None:
+        anthropic_client = MagicMock()
+        anthropic_client.messages.create.side_effect = _status_error(429)
+        claude = ClaudeClient(anthropic_client)
+        messages = [{"role": "user", "content": "x"}]
+
+        with (
+            patch.object(claude_limits.settings, "claude_circuit_failure_threshold", 2),
+            patch.object(claude_limits.settings, "claude_requests_per_minute", 0),
+        ):
+            reset_claude_limits()
+            for _ in range(2):
+                with pytest.raises(anthropic.APIStatusError):
+                    claude.create(call_site="test", messages=messages)
+            with pytest.raises(ClaudeCircuitOpen):
+                claude.create(call_site="test", messages=messages)
+
+        assert anthropic_client.messages.create.call_count == 2
+        assert get_circuit_breaker().state == CircuitState.OPEN
+
+
+class TestFanOut:
+    """Reparto de trabajo síncrono con asyncio.gather."""
+
+    def test_conserva_el_orden_y_corre_en_paralelo(self) -> None:
+        def lenta(n: int) -> int:
+            time.sleep(0.05)
+            return n * 2
+
+        inicio = time.perf_counter()
+        resultados = asyncio.run(fan_out(lenta, range(8), concurrency=8))
+
+        assert resultados == [n * 2 for n in range(8)]
+        assert time.perf_counter() - inicio < 0.3
+
+    def test_run_fan_out_en_serie_dentro_de_un_event_loop(self) -> None:
+        async def dentro_del_loop() -> list[int]:
+            return run_fan_out(lambda n: n + 1, [1, 2, 3])
+
+        assert asyncio.run(dentro_del_loop()) == [2, 3, 4]
+
+
+class TestMerchantLookupBatch:
+    """Identificación de comercios por lote."""
+
+    def test_busca_en_bd_y_llama_a_claude_una_vez_por_nombre(self) -> None:
+        with patch("finanzas_tracker.services.merchant_lookup_service.anthropic.Anthropic"):
+            service = MerchantLookupService(MagicMock())
+        conocido = MagicMock()
+        info = MerchantInfo("Spoon", "Alimentación", None, "food_service", False, None, None, 0.9)
+
+        with (
+            patch.object(
+                service,
+                "_buscar_en_bd",
+                side_effect=lambda nombre: conocido if nombre == "AUTOMERCADO" else None,
+            ),
+            patch.object(service, "_merchant_a_info", return_value="info-bd"),
+            patch.object(service, "_identificar_con_claude", return_value=info) as identificar,
+            patch.object(service, "_guardar_en_bd") as guardar,
+        ):
+            resultados = service.buscar_o_identificar_many(
+                ["AUTOMERCADO", "SPOON SAN JOSE", "SPOON HEREDIA", "X"]
+            )
+
+        assert resultados == {
+            "AUTOMERCADO": "info-bd",
+            "SPOON SAN JOSE": info,
+            "SPOON HEREDIA": info,
+            "X": None,
+        }
+        identificar.assert_called_once()
+        guardar.assert_called_once_with(info)
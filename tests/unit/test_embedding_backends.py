@@ -0,0 +1,188 @@
+"""Tests para los backends de inferencia de embeddings locales."""
+
+import json
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from finanzas_tracker.services import embedding_backends
+from finanzas_tracker.services.embedding_backends import (
+    EmbeddingBackend,
+    load_sentence_transformer,
+)
+from finanzas_tracker.services.local_embedding_service import LocalEmbeddingService
+
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+COMERCIOS = [
+    "AUTOMERCADO ESCAZU CRC 45000",
+    "WALMART CURRIDABAT CRC 23500",
+    "MAS X MENOS SABANA CRC 12000",
+    "UBER TRIP HELP.UBER.COM USD 8.50",
+    "DIDI FOOD CRC 9800",
+    "NETFLIX.COM USD 15.49",
+    "SPOTIFY P2C9A USD 5.99",
+    "ICE ELECTRICIDAD CRC 38000",
+    "AYA AGUA CRC 11000",
+    "FARMACIA FISCHEL CRC 7800",
+    "SINPE MOVIL MARIA PEREZ CRC 18000",
+    "GASOLINERA DELTA CRC 30000",
+]
+
+
+@pytest.fixture
+def sentence_transformer() -> MagicMock:
+    with patch("sentence_transformers.SentenceTransformer") as mock_cls:
+        yield mock_cls
+
+
+class TestLoadSentenceTransformer:
+    """Tests de la selección de backend."""
+
+    def test_torch_por_defecto(self, sentence_transformer: MagicMock) -> None:
+        load_sentence_transformer(MODEL_NAME)
+        sentence_transformer.assert_called_once_with(MODEL_NAME)
+
+    def test_onnx_int8_usa_export_cuantizado(self, sentence_transformer: MagicMock) -> None:
+        """onnx-int8 carga el archivo cuantizado con threads configurados."""
+        fake_ort = MagicMock()
+        with (
+            patch.object(embedding_backends, "_onnx_disponible", return_value=True),
+            patch.dict(sys.modules, {"onnxruntime": fake_ort}),
+        ):
+            load_sentence_transformer(
+                MODEL_NAME, backend="onnx-int8", threads=2, onnx_file="onnx/model_qint8.onnx"
+            )
+
+        kwargs = sentence_transformer.call_args.kwargs
+        assert kwargs["backend"] == "onnx"
+        assert kwargs["model_kwargs"]["file_name"] == "onnx/model_qint8.onnx"
+        assert kwargs["model_kwargs"]["provider"] == "CPUExecutionProvider"
+        assert fake_ort.SessionOptions.return_value.intra_op_num_threads == 2
+
+    def test_sin_onnxruntime_usa_torch(self, sentence_transformer: MagicMock) -> None:
+        """Si falta ONNX Runtime se cae a torch en vez de fallar."""
+        with patch.object(embedding_backends, "_onnx_disponible", return_value=False):
+            load_sentence_transformer(MODEL_NAME, backend=EmbeddingBackend.ONNX)
+
+        sentence_transformer.assert_called_once_with(MODEL_NAME)
+
+    def test_backend_invalido(self) -> None:
+        with pytest.raises(ValueError):
+            load_sentence_transformer(MODEL_NAME, backend="tensorrt")
+
+
+class TestLocalEmbeddingServiceBatch:
+    """Tests del batch size configurable."""
+
+    def test_embed_batch_usa_batch_size_configurado(self) -> None:
+        model = MagicMock()
+        model.encode.return_value = np.zeros((2, 384))
+        with (
+            patch.object(LocalEmbeddingService, "_model", model),
+            patch(
+                "finanzas_tracker.services.local_embedding_service.settings."
+                "local_embedding_batch_size",
+                128,
+            ),
+        ):
+            LocalEmbeddingService().embed_batch(["a", ""])
+
+        assert model.encode.call_args.kwargs["batch_size"] == 128
+        assert model.encode.call_args.args[0] == ["a", " "]
+
+
+def _requiere_onnx() -> None:
+    pytest.importorskip("onnxruntime", reason="onnxruntime no instalado")
+    pytest.importorskip("optimum.onnxruntime", reason="optimum no instalado")
+
+
+def _cosenos(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+@pytest.fixture(scope="module")
+def vectores_torch() -> np.ndarray:
+    """Vectores del backend actual (los que ya están en transaction_embeddings)."""
+    _requiere_onnx()
+    model = load_sentence_transformer(MODEL_NAME, backend="torch")
+    return model.encode(COMERCIOS, convert_to_numpy=True)
+
+
+@pytest.mark.slow
+class TestToleranciaVectores:
+    """Los vectores ONNX son intercambiables con los de torch ya guardados."""
+
+    @pytest.mark.parametrize(("backend", "min_coseno"), [("onnx", 0.999), ("onnx-int8", 0.97)])
+    def test_vectores_equivalentes(
+        self, vectores_torch: np.ndarray, backend: str, min_coseno: float
+    ) -> None:
+        model = load_sentence_transformer(MODEL_NAME, backend=backend)
+        vectores = model.encode(COMERCIOS, convert_to_numpy=True)
+
+        assert vectores.shape == vectores_torch.shape
+        assert _cosenos(vectores, vectores_torch).min() >= min_coseno
+
+        # El vecino más cercano de cada comercio no cambia entre backends
+        sim_backend = vectores @ vectores_torch.T
+        sim_torch = vectores_torch @ vectores_torch.T
+        np.fill_diagonal(sim_backend, -1)
+        np.fill_diagonal(sim_torch, -1)
+        assert (sim_backend.argmax(axis=1) == sim_torch.argmax(axis=1)).all()
+
+
+_BENCHMARK_SCRIPT = """
+import json, resource, sys, time
+from finanzas_tracker.services.embedding_backends import load_sentence_transformer
+
+backend, threads, batch_size = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+texts = json.loads(sys.argv[4]) * 50
+model = load_sentence_transformer(
+    "sentence-transformers/all-MiniLM-L6-v2", backend=backend, threads=threads
+)
+model.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+start = time.perf_counter()
+model.encode(texts, batch_size=batch_size)
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "texts_per_s": len(texts) / elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def _benchmark(backend: str, threads: int = 2, batch_size: int = 64) -> dict[str, float]:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _BENCHMARK_SCRIPT,
+            backend,
+            str(threads),
+            str(batch_size),
+            json.dumps(COMERCIOS),
+        ],
+        capture_output=True,
+        text=True,
+        timeout=600,
+        check=True,
+    )
+    stats: dict[str, float] = json.loads(result.stdout.strip().splitlines()[-1])
+    return stats
+
+
+@pytest.mark.slow
+def test_benchmark_throughput_y_memoria() -> None:
+    """Compara throughput y RSS pico de cada backend en procesos separados."""
+    _requiere_onnx()
+    resultados = {backend: _benchmark(backend) for backend in EmbeddingBackend}
+    torch_stats = resultados[EmbeddingBackend.TORCH]
+    int8_stats = resultados[EmbeddingBackend.ONNX_INT8]
+    assert int8_stats["texts_per_s"] > torch_stats["texts_per_s"], resultados
+    assert int8_stats["max_rss_mb"] < torch_stats["max_rss_mb"], resultados
@@ -0,0 +1,208 @@
+"""Tests para EmbeddingMigrationService (re-embedding por batches con checkpoint)."""
+
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.models.category import Category, Subcategory
+from finanzas_tracker.models.embedding import (
+    EmbeddingMigration,
+    EmbeddingMigrationStatus,
+    TransactionEmbedding,
+)
+from finanzas_tracker.models.enums import CategoryType
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.smart_learning import PatternType, TransactionPattern
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services.embedding_migration import EmbeddingMigrationService
+from finanzas_tracker.services.local_embedding_service import LocalEmbeddingService
+
+
+class _ServicioFalso:
+    """EmbeddingService con un "modelo nuevo" (384 dimensiones, como la columna activa)."""
+
+    model_name = "modelo-nuevo"
+
+    def __init__(self, embedding_dim: int = 384) -> None:
+        self.embedding_dim = embedding_dim
+        self.batches: list[int] = []
+
+    def _build_transaction_text(self, transaction: Transaction) -> str:
+        return f"Comercio: {transaction.comercio}"
+
+    def get_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(len(texts))
+        relleno = [0.0] * (self.embedding_dim - 2)
+        return [[float(len(text)), 1.0, *relleno] for text in texts]
+
+
+@pytest.fixture
+def db(session: Session) -> Session:
+    """Sesión de tests con los perfiles y la subcategoría de los patrones."""
+    session.add_all(
+        Profile(id=profile_id, email_outlook=f"{profile_id}@example.com", nombre=profile_id)
+        for profile_id in ("perfil-1", "perfil-2")
+    )
+    category = Category(tipo=CategoryType.WANTS, nombre="Gustos")
+    session.add(category)
+    session.flush()
+    session.add(Subcategory(id="sub", category_id=category.id, nombre="Sub"))
+    session.commit()
+    return session
+
+
+def _embeddings(db: Session, cantidad: int) -> list[TransactionEmbedding]:
+    rows = []
+    for i in range(cantidad):
+        transaction = Transaction(
+            id=str(uuid4()),
+            profile_id="perfil-1",
+            email_id=f"email-{i}",
+            comercio=f"COMERCIO {i}",
+            tipo_transaccion="compra",
+            monto_crc=Decimal("1000"),
+            monto_original=Decimal("1000"),
+            moneda_original="CRC",
+            banco="bac",
+            fecha_transaccion=datetime(2025, 11, 1),
+        )
+        embedding = TransactionEmbedding(
+            transaction_id=transaction.id,
+            embedding=[0.0] * 384,
+            text_content="viejo",
+            model_version="modelo-viejo",
+            embedding_dim=384,
+        )
+        db.add_all([transaction, embedding])
+        rows.append(embedding)
+    db.commit()
+    return sorted(rows, key=lambda row: row.id)
+
+
+class TestMigracionTransacciones:
+    """Tests de la migración de transaction_embeddings."""
+
+    def test_reanuda_desde_el_checkpoint(self, db: Session) -> None:
+        rows = _embeddings(db, 5)
+        servicio = _ServicioFalso()
+
+        parcial = EmbeddingMigrationService(db, batch_size=2).migrate_transaction_embeddings(
+            servicio, max_batches=1
+        )
+        assert parcial.status == EmbeddingMigrationStatus.RUNNING
+        assert parcial.processed == 2
+        assert parcial.last_key == rows[1].id
+
+        # Otra instancia (ej: después de reiniciar el proceso) continúa
+        final = EmbeddingMigrationService(db, batch_size=2).migrate_transaction_embeddings(servicio)
+
+        assert final.status == EmbeddingMigrationStatus.COMPLETED
+        assert final.processed == 5
+        assert servicio.batches == [2, 2, 1]
+        db.expire_all()
+        guardados = db.execute(select(TransactionEmbedding)).scalars().all()
+        assert {row.model_version for row in guardados} == {"modelo-nuevo"}
+        assert {row.text_content for row in guardados} == {
+            f"Comercio: COMERCIO {i}" for i in range(5)
+        }
+        assert list(guardados[0].embedding[:3]) == [20.0, 1.0, 0.0]
+
+    def test_migracion_completa_no_se_repite(self, db: Session) -> None:
+        _embeddings(db, 3)
+        servicio = _ServicioFalso()
+        migrator = EmbeddingMigrationService(db, batch_size=10)
+
+        migrator.migrate_transaction_embeddings(servicio)
+        migrator.migrate_transaction_embeddings(servicio)
+        assert servicio.batches == [3]
+
+        checkpoint = migrator.migrate_transaction_embeddings(servicio, restart=True)
+        assert servicio.batches == [3, 3]
+        assert checkpoint.processed == 3
+        assert db.query(EmbeddingMigration).count() == 1
+
+    def test_cambio_de_dimension_requiere_sombra(self, db: Session) -> None:
+        _embeddings(db, 2)
+
+        with pytest.raises(ValueError, match="shadow=True"):
+            EmbeddingMigrationService(db).migrate_transaction_embeddings(_ServicioFalso(4))
+
+    def test_sombra_no_toca_el_embedding_activo(self, db: Session) -> None:
+        _embeddings(db, 3)
+
+        checkpoint = EmbeddingMigrationService(db, batch_size=2).migrate_transaction_embeddings(
+            _ServicioFalso(4), shadow=True
+        )
+
+        assert checkpoint.shadow is True
+        assert checkpoint.status == EmbeddingMigrationStatus.COMPLETED
+        db.expire_all()
+        for row in db.execute(select(TransactionEmbedding)).scalars():
+            assert row.model_version == "modelo-viejo"
+            assert len(row.embedding) == 384
+            assert row.shadow_model_version == "modelo-nuevo"
+            assert len(row.embedding_shadow) == 4
+
+    def test_cutover_sin_migracion_sombra(self, db: Session) -> None:
+        with pytest.raises(ValueError, match="sombra"):
+            EmbeddingMigrationService(db).cutover_transaction_embeddings(_ServicioFalso())
+
+
+class TestMigracionPatrones:
+    """Tests de la migración de transaction_patterns."""
+
+    def test_regenera_solo_el_perfil(self, db: Session) -> None:
+        for profile_id, texto in [
+            ("perfil-1", "UBER"),
+            ("perfil-1", "NETFLIX"),
+            ("perfil-2", "DIDI"),
+        ]:
+            db.add(
+                TransactionPattern(
+                    profile_id=profile_id,
+                    pattern_text=texto,
+                    pattern_text_normalized=texto,
+                    pattern_type=PatternType.COMERCIO,
+                    subcategory_id="sub",
+                )
+            )
+        db.commit()
+
+        with patch.object(
+            LocalEmbeddingService,
+            "embed_batch",
+            side_effect=lambda texts: [[1.0, 2.0, 3.0] for _ in texts],
+        ) as embed_batch:
+            checkpoint = EmbeddingMigrationService(db).migrate_pattern_embeddings("perfil-1")
+
+        assert checkpoint.processed == 2
+        embed_batch.assert_called_once()
+        db.expire_all()
+        patrones = {p.pattern_text: p for p in db.execute(select(TransactionPattern)).scalars()}
+        assert len(patrones["UBER"].embedding) == 1536
+        assert list(patrones["NETFLIX"].embedding[:4]) == [1.0, 2.0, 3.0, 0.0]
+        assert patrones["NETFLIX"].embedding_model == LocalEmbeddingService.MODEL_NAME
+        assert patrones["DIDI"].embedding is None
+
+
+def test_bulk_update_postgres_usa_values() -> None:
+    """El batch se escribe con un solo UPDATE ... FROM (VALUES ...)."""
+    db = MagicMock()
+
+    EmbeddingMigrationService(db)._bulk_update(
+        TransactionEmbedding.__table__,
+        [{"id": "a", "embedding": [1.0, 2.0]}, {"id": "b", "embedding": [3.0, 4.0]}],
+        model_version="modelo-nuevo",
+    )
+
+    db.execute.assert_called_once()
+    sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "UPDATE transaction_embeddings SET" in sql
+    assert "FROM (VALUES" in sql
+    assert "CAST(v.embedding AS VECTOR(384))" in sql
@@ -111,3 +111,69 @@ class TestEmbeddingServiceProviderSelection:
 
         assert isinstance(service._provider, LocalEmbeddingProvider)
         assert service._provider.model_name == "all-MiniLM-L6-v2"
+
+
+class TestSearchHits:
+    """Tests de la búsqueda semántica hidratada en una sola query."""
+
+    @pytest.fixture
+    def service(self):  # type: ignore[no-untyped-def]
+        """EmbeddingService con sesión mock y embedding fijo para la query."""
+        from unittest.mock import MagicMock, patch
+
+        from finanzas_tracker.services.embedding_service import EmbeddingService
+
+        service = EmbeddingService(MagicMock())
+        with patch.object(service, "get_embedding", return_value=[0.1] * 384):
+            yield service
+
+    def test_query_unica_con_joins(self, service) -> None:
+        """Ranking, transacción, categoría y texto salen del mismo SELECT."""
+        from sqlalchemy.dialects import postgresql
+
+        stmt = service._ranked_search("uber", "perfil-1", limit=5, min_similarity=0.3)
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+        assert sql.count("SELECT") == 1
+        assert "JOIN transactions ON" in sql
+        assert "LEFT OUTER JOIN subcategories" in sql
+        assert "LEFT OUTER JOIN categories" in sql
+        assert "transaction_embeddings.text_content" in sql
+        # Ordenar por la distancia (no por la similitud) permite usar el índice HNSW
+        assert "ORDER BY transaction_embeddings.embedding <=>" in sql
+
+    def test_mapea_filas_a_resultados(self, service) -> None:
+        from types import SimpleNamespace
+
+        service.db.execute.return_value = [
+            SimpleNamespace(
+                transaction_id="t1",
+                similarity=0.91,
+                text_content="Comercio: UBER",
+                comercio="UBER",
+                monto_crc=Decimal("4500"),
+                fecha_transaccion=datetime(2025, 11, 3),
+                categoria_sugerida_por_ia="Transporte",
+                categoria="Transporte",
+                subcategoria="Uber",
+            ),
+            SimpleNamespace(
+                transaction_id="t2",
+                similarity=0.5,
+                text_content="Comercio: DIDI",
+                comercio="DIDI",
+                monto_crc=Decimal("3000"),
+                fecha_transaccion=datetime(2025, 11, 4),
+                categoria_sugerida_por_ia=None,
+                categoria=None,
+                subcategoria=None,
+            ),
+        ]
+
+        hits = service.search_hits("taxi", profile_id="perfil-1")
+
+        service.db.execute.assert_called_once()
+        assert [hit.transaction_id for hit in hits] == ["t1", "t2"]
+        assert hits[0].categoria == "Transporte > Uber"
+        assert hits[0].text_content == "Comercio: UBER"
+        assert hits[1].categoria is None
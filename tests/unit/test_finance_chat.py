@@ -144,3 +144,49 @@ class TestFinanceChatService:
         assert "100,000" in prompt
         assert "Cuanto gaste?" in prompt
         assert "asistente financiero" in prompt
+
+    @patch("finanzas_tracker.services.finance_chat.can_use_claude", return_value=(True, ""))
+    @patch("finanzas_tracker.services.finance_chat.get_session")
+    @patch("finanzas_tracker.services.finance_chat.anthropic.Anthropic")
+    def test_chat_stream_yields_chunks(
+        self, mock_anthropic_class: MagicMock, mock_session: MagicMock, _can_use: MagicMock
+    ) -> None:
+        """Test que chat_stream entrega la respuesta por fragmentos."""
+        mock_stream = MagicMock()
+        mock_stream.__enter__.return_value.text_stream = iter(["Gastaste ", "50,000"])
+        mock_client = MagicMock()
+        mock_client.messages.stream.return_value = mock_stream
+        mock_anthropic_class.return_value = mock_client
+        mock_session.return_value.__enter__.return_value.query.return_value.filter.return_value.all.return_value = []
+
+        from finanzas_tracker.services.finance_chat import CHAT_TTFT, FinanceChatService
+
+        before = CHAT_TTFT.snapshot()["count"]
+        service = FinanceChatService()
+        chunks = list(service.chat_stream("Cuanto gaste?", "profile-123"))
+
+        assert chunks == ["Gastaste ", "50,000"]
+        assert CHAT_TTFT.snapshot()["count"] == before + 1
+        mock_client.messages.create.assert_not_called()
+
+    @patch("finanzas_tracker.services.finance_chat.can_use_claude", return_value=(True, ""))
+    @patch("finanzas_tracker.services.finance_chat.get_session")
+    @patch("finanzas_tracker.services.finance_chat.anthropic.Anthropic")
+    def test_chat_stream_handles_connection_error(
+        self, mock_anthropic_class: MagicMock, mock_session: MagicMock, _can_use: MagicMock
+    ) -> None:
+        """Test que un error en el stream se entrega como mensaje."""
+        mock_client = MagicMock()
+        mock_client.messages.stream.side_effect = anthropic.APIConnectionError(
+            request=MagicMock()
+        )
+        mock_anthropic_class.return_value = mock_client
+        mock_session.return_value.__enter__.return_value.query.return_value.filter.return_value.all.return_value = []
+
+        from finanzas_tracker.services.finance_chat import FinanceChatService
+
+        service = FinanceChatService()
+        chunks = list(service.chat_stream("Test", "profile-123"))
+
+        assert len(chunks) == 1
+        assert "no puedo conectarme" in chunks[0]
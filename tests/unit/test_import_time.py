@@ -0,0 +1,99 @@
+"""Tests del tiempo de arranque (imports perezosos).
+
+Cada import corre en un proceso nuevo con `python -X importtime`, porque en
+el proceso de pytest los módulos ya están cargados. Los tests de siempre
+verifican qué módulos pesados quedan fuera de `sys.modules` (no dependen de
+la máquina); el techo en segundos es un benchmark marcado `slow`.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from finanzas_tracker import services
+from finanzas_tracker.services.sync_strategy import SyncStrategy
+
+
+# Techo de arranque (segundos acumulados según -X importtime)
+MCP_SERVER_BUDGET_S = 2.5
+API_BUDGET_S = 3.5
+
+# Módulos que nunca deberían cargarse sólo por arrancar
+HEAVY_MODULES = ("torch", "sentence_transformers", "sklearn", "pandas", "streamlit")
+
+# Punto de entrada -> módulos que no debe cargar. La API sí carga `anthropic`
+# (el router de IA arma el cliente compartido al importarse).
+ENTRY_POINTS = {
+    "finanzas_tracker.services": (*HEAVY_MODULES, "anthropic", "msal"),
+    "finanzas_tracker.mcp.server": (*HEAVY_MODULES, "anthropic", "msal"),
+    "finanzas_tracker.api.main": HEAVY_MODULES,
+}
+
+
+def _import_in_subprocess(module: str) -> tuple[float, set[str]]:
+    """
+    Importa un módulo en un intérprete nuevo.
+
+    Args:
+        module: Módulo a importar
+
+    Returns:
+        Tupla (segundos acumulados del import, módulos top-level cargados)
+    """
+    code = f"import sys, {module}; print(' '.join({{m.split('.')[0] for m in sys.modules}}))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+        timeout=120,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    pattern = re.compile(rf"^import time:\s+\d+ \|\s+(\d+) \|\s*{re.escape(module)}$")
+    cumulative_us = [
+        int(match.group(1)) for line in result.stderr.splitlines() if (match := pattern.match(line))
+    ]
+    assert cumulative_us, f"-X importtime no reportó {module}"
+    return max(cumulative_us) / 1_000_000, set(result.stdout.split())
+
+
+class TestModulosPesados:
+    """Arrancar no carga los módulos pesados (independiente de la máquina)."""
+
+    @pytest.mark.parametrize(("module", "prohibidos"), ENTRY_POINTS.items())
+    def test_no_se_cargan_al_importar(self, module: str, prohibidos: tuple[str, ...]) -> None:
+        _, loaded = _import_in_subprocess(module)
+
+        assert not set(prohibidos) & loaded
+
+
+class TestLazyExports:
+    """Tests de los exports perezosos de `finanzas_tracker.services`."""
+
+    def test_export_se_resuelve_al_acceder(self) -> None:
+        assert services.SyncStrategy is SyncStrategy
+        assert "SyncStrategy" in dir(services)
+
+    def test_nombre_desconocido(self) -> None:
+        with pytest.raises(AttributeError):
+            _ = services.NoExiste
+
+
+@pytest.mark.slow
+class TestImportTimeBudget:
+    """Benchmark de arranque: falla si el import supera el techo."""
+
+    def test_mcp_server(self) -> None:
+        seconds, _ = _import_in_subprocess("finanzas_tracker.mcp.server")
+
+        assert seconds < MCP_SERVER_BUDGET_S, f"mcp-server importa en {seconds:.2f}s"
+
+    def test_api(self) -> None:
+        seconds, _ = _import_in_subprocess("finanzas_tracker.api.main")
+
+        assert seconds < API_BUDGET_S, f"La API importa en {seconds:.2f}s"
@@ -0,0 +1,385 @@
+"""Tests para el frame columnar de insights y las reglas vectorizadas."""
+
+import os
+
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "sk-ant-test123")
+
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.models.budget import Budget
+from finanzas_tracker.models.category import Category, Subcategory
+from finanzas_tracker.models.enums import CategoryType
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services.insight_frame import InsightFrame, a_colones, epoch_day
+from finanzas_tracker.services.insights import InsightsService
+from finanzas_tracker.services.insights_service import InsightsService as SmartInsightsService
+from finanzas_tracker.services.insights_service import InsightType
+
+
+def _perfil(db: Session) -> str:
+    profile = Profile(email_outlook=f"{uuid4()}@example.com", nombre="Insights")
+    db.add(profile)
+    db.flush()
+    return profile.id
+
+
+def _subcategoria(db: Session, tipo: CategoryType, nombre: str) -> Subcategory:
+    category = Category(tipo=tipo, nombre=tipo.value.capitalize())
+    subcategory = Subcategory(category=category, nombre=nombre)
+    db.add(subcategory)
+    db.flush()
+    return subcategory
+
+
+def _txn(profile_id: str, fecha: datetime, monto: str, **kwargs: object) -> Transaction:
+    kwargs.setdefault("comercio", "Comercio")
+    return Transaction(
+        profile_id=profile_id,
+        email_id=str(uuid4()),
+        banco="bac",
+        tipo_transaccion=kwargs.pop("tipo_transaccion", "compra"),
+        monto_original=Decimal(monto),
+        moneda_original="CRC",
+        monto_crc=Decimal(monto),
+        fecha_transaccion=fecha,
+        **kwargs,
+    )
+
+
+def _fila(
+    monto: str,
+    fecha: datetime,
+    comercio: str = "A",
+    *,
+    categoria: str | None = None,
+    subcategoria: str | None = None,
+    tipo: str | None = None,
+    tipo_transaccion: str = "compra",
+    transferencia: bool = False,
+) -> tuple[object, ...]:
+    """Fila con el orden de `InsightFrame.COLUMNS`."""
+    return (
+        Decimal(monto),
+        fecha,
+        comercio,
+        categoria,
+        subcategoria,
+        tipo,
+        tipo_transaccion,
+        transferencia,
+    )
+
+
+class TestInsightFrame:
+    """Tests para la construcción y los group-bys del frame."""
+
+    def test_from_rows_columnas(self) -> None:
+        frame = InsightFrame.from_rows(
+            [
+                _fila(
+                    "1234.56",
+                    datetime(2025, 1, 4, 23, 30),
+                    "A",
+                    categoria="Comida",
+                    subcategoria="Super",
+                    tipo="necesidades",
+                ),
+                _fila(
+                    "10",
+                    datetime(2025, 1, 6, 8),
+                    "B",
+                    tipo_transaccion="ingreso",
+                    transferencia=True,
+                ),
+                _fila(
+                    "0.01",
+                    datetime(2025, 1, 6, 9, tzinfo=UTC),
+                    "A",
+                    categoria="Comida",
+                    subcategoria="Super",
+                    tipo="necesidades",
+                ),
+            ]
+        )
+        lunes = epoch_day(date(2025, 1, 6))
+
+        assert len(frame) == 3
+        assert frame.monto.tolist() == [123456, 1000, 1]
+        assert frame.dia.tolist() == [lunes - 2, lunes, lunes]
+        assert frame.hora.tolist() == [23, 8, 9]
+        assert frame.dia_semana.tolist() == [5, 0, 0]  # sábado, lunes
+        assert frame.comercio.tolist() == [0, 1, 0]
+        assert frame.categoria.tolist() == [0, -1, 0]
+        assert frame.comercios == ("A", "B")
+        assert frame.es_ingreso.tolist() == [False, True, False]
+        assert frame.es_transferencia.tolist() == [False, True, False]
+
+    def test_vacio(self) -> None:
+        frame = InsightFrame.from_rows([])
+
+        assert len(frame) == 0
+        assert frame.total() == 0
+        assert frame.sumar_por(frame.comercio, 0, frame.dia >= 0).tolist() == []
+
+    def test_sumar_y_contar_por_descarta_sin_valor(self) -> None:
+        frame = InsightFrame.from_rows(
+            [
+                _fila("100", datetime(2025, 1, 1), "A", categoria="Comida"),
+                _fila("50", datetime(2025, 1, 2), "A"),
+                _fila("25.50", datetime(2025, 1, 3), "B", categoria="Comida"),
+            ]
+        )
+        todo = np.ones(len(frame), dtype=bool)
+
+        assert frame.sumar_por(frame.categoria, len(frame.categorias), todo).tolist() == [12550]
+        assert frame.contar_por(frame.comercio, len(frame.comercios), todo).tolist() == [2, 1]
+        assert frame.total(frame.entre(date(2025, 1, 2), date(2025, 1, 3))) == 7550
+        assert a_colones(12550) == Decimal("125.50")
+
+    def test_load_una_consulta_sin_borradas(self, session: Session) -> None:
+        perfil = _perfil(session)
+        super_ = _subcategoria(session, CategoryType.NECESSITIES, "Supermercado")
+        session.add_all(
+            [
+                _txn(perfil, datetime(2025, 1, 31, 23), "100", subcategory_id=super_.id),
+                _txn(perfil, datetime(2025, 2, 1, 10), "200", deleted_at=datetime.now(UTC)),
+                _txn(perfil, datetime(2025, 2, 1), "300"),
+                _txn(_perfil(session), datetime(2025, 1, 15), "999"),
+            ]
+        )
+        session.commit()
+
+        statements: list[str] = []
+        event.listen(
+            session.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2])
+        )
+        frame = InsightFrame.load(session, perfil, date(2025, 1, 1), date(2025, 1, 31))
+
+        assert len(statements) == 1
+        assert frame.monto.tolist() == [10000]
+        assert frame.categorias == ("Necesidades",)
+        assert frame.subcategorias == ("Supermercado",)
+        assert frame.tipos_gasto == ("necesidades",)
+
+
+class TestReglasVectorizadas:
+    """Las reglas sobre el frame dan los mismos agregados que antes."""
+
+    def test_datos_de_analisis(self) -> None:
+        frame = InsightFrame.from_rows(
+            [
+                _fila("1000", datetime(2024, 12, 20), "A", categoria="Comida"),
+                _fila("3000", datetime(2025, 1, 5), "A", categoria="Comida"),
+                _fila("500", datetime(2025, 1, 6), "B"),
+            ]
+        )
+
+        data = InsightsService()._analysis_data_from_frame(frame, date(2025, 1, 1))
+
+        assert data["n_current"] == 2
+        assert data["total_current"] == Decimal("3500")
+        assert data["total_last"] == Decimal("1000")
+        assert data["avg_transaction"] == Decimal("1750")
+        assert data["by_category_current"] == {
+            "Comida": Decimal("3000"),
+            "Sin categorizar": Decimal("500"),
+        }
+        assert data["by_category_last"] == {"Comida": Decimal("1000")}
+        assert data["by_merchant"] == {
+            "A": {"count": 1, "total": Decimal("3000")},
+            "B": {"count": 1, "total": Decimal("500")},
+        }
+
+    def test_patrones_nocturnos_y_fin_de_semana(self) -> None:
+        # 5 gastos nocturnos un sábado y uno en la mañana del lunes
+        filas = [_fila("20000", datetime(2025, 1, 4, 23), "Bar")] * 5
+        frame = InsightFrame.from_rows([*filas, _fila("1000", datetime(2025, 1, 6, 10))])
+        service = InsightsService()
+        data = service._analysis_data_from_frame(frame, date(2025, 1, 1))
+
+        titulos = [i.title for i in service._analyze_time_patterns(data)]
+        titulos += [i.title for i in service._analyze_behavioral_patterns(data)]
+
+        assert "Gastas más en madrugadas (10pm-6am)" in titulos
+        assert "Gastos nocturnos frecuentes" in titulos
+        assert "Gastas más en fines de semana" in titulos
+
+    def test_inusuales_ordenados_por_monto(self) -> None:
+        filas = [
+            _fila(monto, datetime(2025, 1, 5), comercio)
+            for comercio, monto in [("A", "100"), ("B", "5000"), ("C", "100"), ("D", "9000")]
+        ]
+        filas += [_fila("100", datetime(2025, 1, 5), "X")] * 20
+        frame = InsightFrame.from_rows(filas)
+        service = InsightsService()
+
+        insights = service._analyze_unusual_transactions(
+            service._analysis_data_from_frame(frame, date(2025, 1, 1))
+        )
+
+        assert [i.title for i in insights] == ["Gasto inusual en D", "Gasto inusual en B"]
+
+
+class TestSmartInsightsFrame:
+    """`InsightsService` (insights_service.py) con una sola carga de datos."""
+
+    def test_generar_insights(self, session: Session) -> None:
+        perfil = _perfil(session)
+        gustos = _subcategoria(session, CategoryType.WANTS, "Restaurantes")
+        necesidades = _subcategoria(session, CategoryType.NECESSITIES, "Super")
+        session.add_all(
+            [
+                _txn(perfil, datetime(2024, 12, 10), "10000", subcategory_id=gustos.id),
+                *[
+                    _txn(
+                        perfil,
+                        datetime(2025, 1, dia),
+                        "10000",
+                        subcategory_id=gustos.id,
+                        comercio="Soda",
+                    )
+                    for dia in (3, 10, 31)
+                ],
+                _txn(perfil, datetime(2025, 1, 12), "5000", subcategory_id=necesidades.id),
+                _txn(perfil, datetime(2025, 1, 15), "99999", tipo_transaccion="ingreso"),
+                _txn(perfil, datetime(2025, 1, 20), "88888", es_transferencia_interna=True),
+            ]
+        )
+        session.commit()
+
+        insights = SmartInsightsService(session).generar_insights(perfil, mes=1, ano=2025)
+        por_titulo = {i.titulo: i for i in insights}
+
+        alerta = por_titulo["Aumento significativo en Restaurantes"]
+        assert alerta.tipo == InsightType.ALERT
+        assert alerta.monto == Decimal("30000")
+        assert "Gustos superan el 30%" in por_titulo
+        # El comercio frecuente sí cuenta transferencias, igual que antes
+        assert por_titulo["Comercio frecuente: Soda"].monto == Decimal("30000")
+
+    def test_prediccion_usa_dias_del_mes(self, session: Session) -> None:
+        perfil = _perfil(session)
+        session.add(_txn(perfil, datetime(2025, 2, 1), "2800"))
+        session.commit()
+        service = SmartInsightsService(session)
+
+        with patch("finanzas_tracker.services.insights_service.date") as mock_date:
+            mock_date.today.return_value = date(2025, 2, 7)
+            mock_date.side_effect = date
+            insights = service.generar_insights(perfil)
+
+        prediccion = next(i for i in insights if i.tipo == InsightType.PREDICTION)
+        assert prediccion.monto == Decimal("11200")  # 400/día x 28 días
+
+    def test_prediccion_contra_presupuesto_del_mes(self, session: Session) -> None:
+        perfil = _perfil(session)
+        super_ = _subcategoria(session, CategoryType.NECESSITIES, "Super")
+        session.add_all(
+            [
+                _txn(perfil, datetime(2025, 2, 1), "2800"),
+                Budget(
+                    profile_id=perfil,
+                    category_id=super_.id,
+                    mes=date(2025, 2, 1),
+                    amount_crc=Decimal("10000"),
+                    monto_limite=Decimal("10000"),
+                ),
+            ]
+        )
+        session.commit()
+
+        with patch("finanzas_tracker.services.insights_service.date") as mock_date:
+            mock_date.today.return_value = date(2025, 2, 7)
+            mock_date.side_effect = date
+            insights = SmartInsightsService(session).generar_insights(perfil)
+
+        assert "Proyección de exceso de presupuesto" in {i.titulo for i in insights}
+
+
+def _transacciones(n: int) -> list[SimpleNamespace]:
+    """Transacciones sintéticas de dos meses (enero y febrero 2025)."""
+    rng = np.random.default_rng(11)
+    montos = rng.integers(100, 50_000_00, size=n)
+    segundos = rng.integers(0, 59 * 86400, size=n)
+    categorias = [f"Categoria {i}" for i in range(12)]
+    comercios = [f"Comercio {i}" for i in range(500)]
+    inicio = datetime(2025, 1, 1)
+    return [
+        SimpleNamespace(
+            monto_crc=Decimal(int(monto)).scaleb(-2),
+            fecha_transaccion=inicio + timedelta(seconds=int(s)),
+            comercio=comercios[i % 500],
+            categoria=categorias[i % 12] if i % 13 else None,
+        )
+        for i, (monto, s) in enumerate(zip(montos, segundos, strict=True))
+    ]
+
+
+def _reglas_ingenuas(txns: list[SimpleNamespace], first_day: date) -> dict[str, object]:
+    """Referencia: los recorridos por objeto con Decimal que hacían las reglas."""
+    current = [t for t in txns if t.fecha_transaccion.date() >= first_day]
+    last = [t for t in txns if t.fecha_transaccion.date() < first_day]
+    by_category_current: dict[str, Decimal] = {}
+    by_category_last: dict[str, Decimal] = {}
+    for mes, destino in ((current, by_category_current), (last, by_category_last)):
+        for t in mes:
+            cat = t.categoria or "Sin categorizar"
+            destino[cat] = destino.get(cat, Decimal("0")) + t.monto_crc
+    by_merchant: dict[str, dict[str, object]] = {}
+    for t in current:
+        info = by_merchant.setdefault(t.comercio, {"count": 0, "total": Decimal("0")})
+        info["count"] += 1  # type: ignore[operator]
+        info["total"] += t.monto_crc  # type: ignore[operator]
+    avg = sum(t.monto_crc for t in current) / len(current)
+    weekend = sum(t.monto_crc for t in current if t.fecha_transaccion.weekday() >= 5)
+    small = sum(t.monto_crc for t in current if float(t.monto_crc) < 5000)
+    night = [t for t in current if t.fecha_transaccion.hour >= 22 or t.fecha_transaccion.hour <= 2]
+    unusual = [t for t in current if float(t.monto_crc) > float(avg) * 3]
+    return {
+        "by_category_current": by_category_current,
+        "by_category_last": by_category_last,
+        "by_merchant": by_merchant,
+        "extras": (weekend, small, len(night), len(unusual)),
+    }
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("n", [1_000, 10_000, 100_000])
+def test_benchmark_frame_vs_objetos(n: int) -> None:
+    """Las reglas vectorizadas dan los mismos agregados y escalan mejor que los recorridos."""
+    txns = _transacciones(n)
+    first_day = date(2025, 2, 1)
+    service = InsightsService()
+
+    start = time.perf_counter()
+    ingenuo = _reglas_ingenuas(txns, first_day)
+    naive_s = time.perf_counter() - start
+
+    frame = InsightFrame.from_rows(
+        (t.monto_crc, t.fecha_transaccion, t.comercio, t.categoria, None, None, "compra", False)
+        for t in txns
+    )
+    start = time.perf_counter()
+    data = service._analysis_data_from_frame(frame, first_day)
+    service._analyze_unusual_transactions(data)
+    service._analyze_behavioral_patterns(data)
+    service._analyze_time_patterns(data)
+    vectorized_s = time.perf_counter() - start
+
+    assert data["by_category_current"] == ingenuo["by_category_current"]
+    assert data["by_category_last"] == ingenuo["by_category_last"]
+    assert data["by_merchant"] == ingenuo["by_merchant"]
+    if n >= 10_000:
+        assert vectorized_s * 3 < naive_s
@@ -11,12 +11,22 @@ os.environ.setdefault("USER_EMAIL", "test@example.com")
 os.environ.setdefault("MOM_EMAIL", "mom@example.com")
 os.environ.setdefault("ANTHROPIC_API_KEY", "sk-ant-test123")
 
+from datetime import datetime
 from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
+from finanzas_tracker.services.insight_frame import InsightFrame
 from finanzas_tracker.services.insights import Insight, InsightsService, InsightType
 
 
+def _frame(*gastos: tuple[str, str]) -> InsightFrame:
+    """Frame con gastos (comercio, monto) del mes actual."""
+    return InsightFrame.from_rows(
+        (Decimal(monto), datetime(2025, 1, 10, 12), comercio, None, None, None, "compra", False)
+        for comercio, monto in gastos
+    )
+
+
 class TestInsightsService:
     """Tests para el servicio de insights."""
 
@@ -77,13 +87,12 @@ class TestInsightsService:
         """Test detecta transacciones inusuales (>3x promedio)."""
         service = InsightsService()
 
-        mock_transaction = MagicMock()
-        mock_transaction.monto_crc = Decimal("50000")  # 5x promedio
-        mock_transaction.comercio = "Tienda Grande"
+        frame = _frame(("Tienda Grande", "50000"))  # 5x promedio
 
         data = {
             "avg_transaction": Decimal("10000"),
-            "current_month": [mock_transaction],
+            "frame": frame,
+            "current": frame.dia >= 0,
         }
 
         insights = service._analyze_unusual_transactions(data)
@@ -96,12 +105,12 @@ class TestInsightsService:
         """Test no genera insight para transacciones normales."""
         service = InsightsService()
 
-        mock_transaction = MagicMock()
-        mock_transaction.monto_crc = Decimal("15000")  # 1.5x promedio (normal)
+        frame = _frame(("Tienda", "15000"))  # 1.5x promedio (normal)
 
         data = {
             "avg_transaction": Decimal("10000"),
-            "current_month": [mock_transaction],
+            "frame": frame,
+            "current": frame.dia >= 0,
         }
 
         insights = service._analyze_unusual_transactions(data)
@@ -0,0 +1,299 @@
+"""Tests para la cola de jobs en segundo plano."""
+
+from collections.abc import Generator
+from datetime import UTC, datetime, timedelta
+import time
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, delete, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+from finanzas_tracker.models.job import Job, JobStatus
+from finanzas_tracker.services import job_queue
+from finanzas_tracker.services.job_queue import (
+    JobProgress,
+    JobWorker,
+    claim_next_job,
+    enqueue_job,
+    get_job,
+    requeue_stale_jobs,
+    run_job,
+)
+
+
+@pytest.fixture
+def session_factory(setup_test_database: Engine) -> Generator[sessionmaker[Session], None, None]:
+    """
+    Sesiones sobre el engine de tests que confirman de verdad.
+
+    El worker, el heartbeat (en otro hilo) y el progreso usan conexiones
+    distintas, así que no sirve la transacción única del fixture `session`;
+    los jobs se borran al terminar.
+    """
+    factory = sessionmaker(bind=setup_test_database)
+    yield factory
+    with factory() as db:
+        db.execute(delete(Job))
+        db.commit()
+
+
+@pytest.fixture
+def handlers(monkeypatch: pytest.MonkeyPatch) -> dict[str, Any]:
+    """Registra handlers de prueba sin tocar los reales."""
+
+    def ok(db: Session, job: Job, progress: JobProgress) -> dict[str, Any]:
+        for i in range(1, 4):
+            progress.update(i, 3, "Trabajando")
+        return {"eco": job.params.get("valor")}
+
+    def falla(db: Session, job: Job, progress: JobProgress) -> None:
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(job_queue._handlers, "test.ok", ok)
+    monkeypatch.setitem(job_queue._handlers, "test.falla", falla)
+    return job_queue._handlers
+
+
+def _get(session_factory: sessionmaker[Session], job_id: str) -> Job:
+    with session_factory() as db:
+        job = db.get(Job, job_id)
+        assert job is not None
+        return job
+
+
+class TestEnqueueAndClaim:
+    """Tests para encolar y tomar jobs."""
+
+    def test_tipo_desconocido(self, session_factory: sessionmaker[Session]) -> None:
+        with session_factory() as db, pytest.raises(ValueError, match="desconocido"):
+            enqueue_job(db, "no.existe")
+
+    def test_toma_el_mas_antiguo_una_sola_vez(
+        self, session_factory: sessionmaker[Session], handlers: dict[str, Any]
+    ) -> None:
+        with session_factory() as db:
+            primero = enqueue_job(db, "test.ok", {"valor": 1}, profile_id="p1")
+            segundo = enqueue_job(db, "test.ok", {"valor": 2}, profile_id="p1")
+
+            tomado = claim_next_job(db, "worker-a")
+            assert tomado is not None
+            assert tomado.id == primero.id
+            assert tomado.status == JobStatus.RUNNING
+            assert tomado.locked_by == "worker-a"
+            assert tomado.attempts == 1
+
+            assert claim_next_job(db, "worker-b").id == segundo.id
+            assert claim_next_job(db, "worker-c") is None
+
+    def test_get_job_filtra_por_perfil(
+        self, session_factory: sessionmaker[Session], handlers: dict[str, Any]
+    ) -> None:
+        with session_factory() as db:
+            job = enqueue_job(db, "test.ok", profile_id="p1")
+
+            assert get_job(db, job.id, profile_id="p1") is job
+            assert get_job(db, job.id, profile_id="p2") is None
+            assert get_job(db, "no-existe", profile_id="p1") is None
+
+    def test_claim_usa_skip_locked(self) -> None:
+        """Varios workers no se bloquean entre sí ni toman el mismo job."""
+        sql = str(job_queue._next_job_stmt().compile(dialect=postgresql.dialect()))
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "ORDER BY jobs.created_at" in sql
+
+
+class TestRunJob:
+    """Tests para run_job."""
+
+    def test_exito_guarda_resultado_y_progreso(
+        self, session_factory: sessionmaker[Session], handlers: dict[str, Any]
+    ) -> None:
+        with session_factory() as db:
+            job_id = enqueue_job(db, "test.ok", {"valor": 7}).id
+            claim_next_job(db, "worker-a")
+
+        assert run_job(job_id, session_factory) == JobStatus.SUCCEEDED
+
+        job = _get(session_factory, job_id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result == {"eco": 7}
+        assert (job.progress_current, job.progress_total) == (3, 3)
+        assert job.progress_percent == 100.0
+        assert job.locked_by is None
+        assert job.finished_at is not None
+
+    def test_fallo_guarda_error(
+        self, session_factory: sessionmaker[Session], handlers: dict[str, Any]
+    ) -> None:
+        with session_factory() as db:
+            job_id = enqueue_job(db, "test.falla").id
+            claim_next_job(db, "worker-a")
+
+        assert run_job(job_id, session_factory) == JobStatus.FAILED
+
+        job = _get(session_factory, job_id)
+        assert job.status == JobStatus.FAILED
+        assert job.error == "boom"
+        assert job.result is None
+
+    def test_heartbeat_mientras_corre(
+        self,
+        session_factory: sessionmaker[Session],
+        handlers: dict[str, Any],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """El heartbeat se renueva aunque el handler no reporte avance."""
+        latidos: list[datetime | None] = []
+
+        def lento(db: Session, job: Job, progress: JobProgress) -> None:
+            time.sleep(0.2)
+            latidos.append(_get(session_factory, job.id).heartbeat_at)
+
+        monkeypatch.setitem(job_queue._handlers, "test.lento", lento)
+        monkeypatch.setattr(job_queue.settings, "job_heartbeat_interval_seconds", 0.02)
+        with session_factory() as db:
+            job_id = enqueue_job(db, "test.lento").id
+            inicio = claim_next_job(db, "worker-a").heartbeat_at
+
+        assert run_job(job_id, session_factory) == JobStatus.SUCCEEDED
+        assert latidos[0] > inicio
+
+    def test_no_pisa_un_job_retomado(
+        self,
+        session_factory: sessionmaker[Session],
+        handlers: dict[str, Any],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Si otro worker retomó el job, el resultado del primero se descarta."""
+
+        def retomado(db: Session, job: Job, progress: JobProgress) -> dict[str, Any]:
+            with session_factory() as otra:
+                otra.execute(
+                    update(Job).where(Job.id == job.id).values(locked_by="worker-b", attempts=2)
+                )
+                otra.commit()
+            return {"eco": "tarde"}
+
+        monkeypatch.setitem(job_queue._handlers, "test.retomado", retomado)
+        with session_factory() as db:
+            job_id = enqueue_job(db, "test.retomado").id
+            claim_next_job(db, "worker-a")
+
+        run_job(job_id, session_factory)
+
+        job = _get(session_factory, job_id)
+        assert job.status == JobStatus.RUNNING
+        assert job.locked_by == "worker-b"
+        assert job.result is None
+
+    def test_worker_run_once(
+        self, session_factory: sessionmaker[Session], handlers: dict[str, Any]
+    ) -> None:
+        with session_factory() as db:
+            job_id = enqueue_job(db, "test.ok").id
+
+        worker = JobWorker(session_factory, worker_id="w", poll_interval_seconds=0.01)
+        assert worker.run_once() is True
+        assert worker.run_once() is False
+        assert _get(session_factory, job_id).status == JobStatus.SUCCEEDED
+
+
+class TestJobProgress:
+    """Tests para JobProgress."""
+
+    def test_escribe_por_lotes(
+        self, session_factory: sessionmaker[Session], handlers: dict[str, Any]
+    ) -> None:
+        """Dentro del intervalo sólo la primera actualización llega a la BD."""
+        with session_factory() as db:
+            job_id = enqueue_job(db, "test.ok").id
+
+        progress = JobProgress(job_id, session_factory, interval_seconds=60)
+        progress.update(1, 10, "Paso 1")
+        progress.advance(4)
+
+        job = _get(session_factory, job_id)
+        assert (job.progress_current, job.progress_total, job.message) == (1, 10, "Paso 1")
+
+        progress.flush()
+        job = _get(session_factory, job_id)
+        assert job.progress_current == 5
+        assert job.heartbeat_at is not None
+
+    def test_error_de_escritura_no_propaga(self) -> None:
+        def rota() -> Session:
+            raise RuntimeError("sin BD")
+
+        progress = JobProgress("x", rota, interval_seconds=0)
+        progress.update(1, 2)
+        assert progress.current == 1
+
+
+class TestRequeueStale:
+    """Tests para requeue_stale_jobs."""
+
+    def _correr_sin_heartbeat(self, session_factory: sessionmaker[Session], attempts: int) -> str:
+        with session_factory() as db:
+            job = enqueue_job(db, "test.ok")
+            claim_next_job(db, "worker-muerto")
+            job.attempts = attempts
+            job.heartbeat_at = datetime.now(UTC) - timedelta(hours=1)
+            db.commit()
+            return job.id
+
+    def test_vuelve_a_la_cola(
+        self, session_factory: sessionmaker[Session], handlers: dict[str, Any]
+    ) -> None:
+        job_id = self._correr_sin_heartbeat(session_factory, attempts=1)
+
+        with session_factory() as db:
+            assert requeue_stale_jobs(db, stale_after_seconds=60) == 1
+
+        job = _get(session_factory, job_id)
+        assert job.status == JobStatus.QUEUED
+        assert job.locked_by is None
+
+    def test_falla_al_agotar_intentos(
+        self,
+        session_factory: sessionmaker[Session],
+        handlers: dict[str, Any],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(job_queue.settings, "job_max_attempts", 2)
+        job_id = self._correr_sin_heartbeat(session_factory, attempts=2)
+
+        with session_factory() as db:
+            requeue_stale_jobs(db, stale_after_seconds=60)
+
+        job = _get(session_factory, job_id)
+        assert job.status == JobStatus.FAILED
+        assert job.error is not None
+
+    def test_heartbeat_reciente_no_se_toca(
+        self, session_factory: sessionmaker[Session], handlers: dict[str, Any]
+    ) -> None:
+        with session_factory() as db:
+            enqueue_job(db, "test.ok")
+            claim_next_job(db, "worker-vivo")
+            assert requeue_stale_jobs(db, stale_after_seconds=60) == 0
+
+
+class TestJobProgressFields:
+    """Tests para progress_percent y eta_seconds."""
+
+    def test_eta_con_el_ritmo_observado(self) -> None:
+        job = Job(
+            status=JobStatus.RUNNING,
+            progress_current=25,
+            progress_total=100,
+            started_at=datetime.now(UTC) - timedelta(seconds=10),
+        )
+        assert job.progress_percent == 25.0
+        assert job.eta_seconds == pytest.approx(30, abs=1)
+
+    def test_sin_total_no_hay_eta(self) -> None:
+        job = Job(status=JobStatus.RUNNING, progress_current=3, progress_total=None)
+        assert job.progress_percent is None
+        assert job.eta_seconds is None
@@ -0,0 +1,185 @@
+"""Tests para el motor compartido de normalización de comercios."""
+
+from collections.abc import Callable
+import re
+import unicodedata
+
+import pytest
+
+from finanzas_tracker.services.merchant_normalizer import (
+    APRENDIZAJE,
+    CATALOGO,
+    CATEGORIZACION,
+    INTELIGENCIA,
+    RECURRENTES,
+    SUSCRIPCIONES,
+    MerchantNormalizer,
+)
+
+
+# Implementaciones anteriores de cada servicio (referencia de paridad)
+
+
+def _categorizador(comercio: str) -> str:
+    clean = comercio.lower().strip()
+    clean = re.sub(r"[^\w\s]", " ", clean)
+    clean = re.sub(r"\b(?=[A-Za-z]*\d)(?=\d*[A-Za-z])[A-Za-z0-9]{8,}\b", "", clean)
+    for word in [
+        "san jose", "costa rica", "heredia", "alajuela", "cartago",
+        "www", "http", "https", "com", "net", "org",
+        "sucursal", "agencia", "tienda", "local",
+        "debit", "credit", "visa", "mastercard", "amex",
+        "pos", "tpv", "pin",
+    ]:  # fmt: skip
+        clean = re.sub(rf"\b{word}\b", " ", clean)
+    return re.sub(r"\s+", " ", clean).strip()
+
+
+def _catalogo(raw_name: str) -> str:
+    normalized = raw_name.upper().strip()
+    for noise in [
+        "MOMENTUM", "AMERICA FREE ZO", "SUPERCENTER", "ESCAZU", "SAN JOSE",
+        "HEREDIA", "CARTAGO", "ALAJUELA", "ZONA FRANCA", "MALL", "PLAZA",
+        "CENTRO COMERCIAL", "CC",
+    ]:  # fmt: skip
+        normalized = normalized.replace(noise, "")
+    for pattern in [r"\s+", r"[^\w\s]"]:
+        normalized = re.sub(pattern, " ", normalized)
+    return " ".join(normalized.split()).title()
+
+
+def _suscripciones(comercio: str) -> str:
+    norm = comercio.upper()
+    norm = re.sub(r"\d{6,}", "", norm)
+    norm = re.sub(r"\*+\d+", "", norm)
+    norm = re.sub(r"#\d+", "", norm)
+    norm = re.sub(r"\s+(SAN JOSE|HEREDIA|ALAJUELA|CARTAGO|CR|CRI|COSTA RICA)\b", "", norm)
+    return re.sub(r"\s+", " ", norm).strip()
+
+
+def _recurrentes(comercio: str) -> str:
+    resultado = comercio.upper().strip()
+    resultado = re.sub(r"\d{6,}", "", resultado)
+    resultado = re.sub(r"\*{3}\d{4}", "", resultado)
+    return re.sub(r"\s+", " ", resultado).strip()
+
+
+def _inteligencia(name: str) -> str:
+    normalized = name.lower().strip()
+    normalized = re.sub(r'[*\-_#@!$%^&()+=\[\]{}|\\:";\'<>,.?/]', " ", normalized)
+    normalized = re.sub(r"\b\d{2,}\b", "", normalized)
+    normalized = re.sub(r"\b(sucursal|suc|tienda|store)\b", "", normalized)
+    for loc in [
+        "tres rios", "san jose", "heredia", "cartago", "alajuela",
+        "escazu", "curridabat", "pinares", "ayarco", "america free",
+    ]:  # fmt: skip
+        normalized = normalized.replace(loc, "")
+    return re.sub(r"\s+", " ", normalized).strip()
+
+
+def _aprendizaje(text: str) -> str:
+    normalized = text.upper().strip()
+    normalized = unicodedata.normalize("NFD", normalized)
+    normalized = "".join(c for c in normalized if unicodedata.category(c) != "Mn")
+    normalized = "".join(c for c in normalized if c.isalnum() or c.isspace())
+    return " ".join(normalized.split())
+
+
+MOTORES: list[tuple[MerchantNormalizer, Callable[[str], str]]] = [
+    (CATEGORIZACION, _categorizador),
+    (CATALOGO, _catalogo),
+    (SUSCRIPCIONES, _suscripciones),
+    (RECURRENTES, _recurrentes),
+    (INTELIGENCIA, _inteligencia),
+    (APRENDIZAJE, _aprendizaje),
+]
+
+COMERCIOS = [
+    "SUBWAY MOMENTUM",
+    "WALMART SUPERCENTER ESCAZU",
+    "AUTOMERCADO ESCAZÚ",
+    "  Juan  Pérez  ",
+    "café-123",
+    "NETFLIX.COM ***1234 SAN JOSE",
+    "AMAZON ***1234",
+    "SPOTIFY 123456789",
+    "UBER   EATS",
+    "WALMART SAN JOSE CR",
+    "PAYPAL *STEAM GAMES #4029357733",
+    "POS VISA 847831OY3 FARMACIA FISCHEL",
+    "bet365 www.bet365.com",
+    "MCDONALDS SUCURSAL 23 TRES RIOS",
+    "DUNKIN DONUTS TRES RIOS",
+    "MAS X MENOS MOMENTUM PINARES",
+    "SODA LA ESQUINA (HEREDIA) 01/05",
+    "GASOLINERA_UNO ALAJUELA COSTA RICA",
+    "STARBUCKS AMERICA FREE ZO",
+    "Ñandú & Cía. S.A.",
+    "CENTRO COMERCIAL MULTIPLAZA",
+    "kölbi prepago 88881234",
+    "DTR SINPE MOVIL 8888-1234",
+    "SAN-JOSE PIZZA",
+    # Quitar una palabra de ruido une los pedazos de otra
+    "sucCENTRO COMERCIAL",
+    "AMERICAESCAZU FREE ZO",
+    "",
+]
+
+
+@pytest.mark.parametrize(("motor", "referencia"), MOTORES)
+def test_paridad_con_implementacion_anterior(
+    motor: MerchantNormalizer, referencia: Callable[[str], str]
+) -> None:
+    for comercio in COMERCIOS:
+        assert motor(comercio) == referencia(comercio), comercio
+
+
+class TestMerchantNormalizer:
+    """Tests del memo y la API por lotes."""
+
+    def test_none_y_vacio(self) -> None:
+        assert CATALOGO(None) == ""
+        assert CATALOGO("") == ""
+        assert CATALOGO.normalize_many([None, "SUBWAY MOMENTUM"]) == ["", "Subway"]
+
+    def test_memo_por_texto_crudo(self) -> None:
+        motor = MerchantNormalizer([(r"\d+", "")])
+
+        assert motor("Soda 123") == "SODA"
+        assert motor("Soda 123") == "SODA"
+
+        hits, misses, _, currsize = motor.cache_info()
+        assert (hits, misses, currsize) == (1, 1, 1)
+        motor.cache_clear()
+        assert motor.cache_info()[3] == 0
+
+    def test_normalize_many_resuelve_una_vez_cada_texto(self) -> None:
+        motor = MerchantNormalizer()
+        lote = ["Soda", "Super", "Soda", "soda ", "Soda"]
+
+        assert motor.normalize_many(iter(lote)) == ["SODA", "SUPER", "SODA", "SODA", "SODA"]
+        assert motor.cache_info()[1] == 3
+
+    def test_signos_antes_del_ruido(self) -> None:
+        assert CATEGORIZACION("SAN-JOSE PIZZA") == "pizza"
+        assert CATEGORIZACION("VISA/POS.COSTA-RICA") == ""
+
+    def test_variantes_son_independientes(self) -> None:
+        assert SUSCRIPCIONES("Netflix") == "NETFLIX"
+        assert INTELIGENCIA("Netflix") == "netflix"
+        assert CATALOGO("Netflix") == "Netflix"
+
+
+@pytest.mark.parametrize(("motor", "referencia"), MOTORES)
+def test_frio_y_memoizado_coinciden(
+    motor: MerchantNormalizer, referencia: Callable[[str], str]
+) -> None:
+    """El motor sin memo, con memo y la cadena anterior dan lo mismo en lotes repetidos."""
+    lote = COMERCIOS * 20
+    motor.cache_clear()
+
+    anterior = [referencia(c) for c in lote]
+    frio = [motor._normalizar(c) if c else "" for c in lote]
+    memo = motor.normalize_many(lote)
+
+    assert frio == anterior == memo
@@ -5,8 +5,19 @@ Tests comprehensivos que cubren la normalización de nombres de merchants,
 que es la funcionalidad core del servicio.
 """
 
+from collections.abc import Generator
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
 import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
 
+from finanzas_tracker.core.cache import merchant_cache
+from finanzas_tracker.models.merchant import Merchant, MerchantVariant
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
 from finanzas_tracker.services.merchant_service import MerchantNormalizationService
 
 
@@ -111,3 +122,164 @@ class TestNormalizeMerchantName:
         # Debería procesar sin error
         assert isinstance(result, str)
         assert len(result) > 0
+
+
+@pytest.fixture
+def db(session: Session) -> Generator[Session, None, None]:
+    """Sesión de tests con el perfil de las transacciones; cache de merchants vacío."""
+    merchant_cache.invalidate()
+    session.add(Profile(id="perfil-1", email_outlook="merchants@example.com", nombre="Merchants"))
+    session.commit()
+    yield session
+    merchant_cache.invalidate()
+
+
+def _contar_sentencias(session: Session) -> list[str]:
+    sentencias: list[str] = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda _conn, _cursor, statement, *_args: sentencias.append(statement),
+    )
+    return sentencias
+
+
+class TestResolveMany:
+    """Tests para la resolución por lote nombre raw -> merchant."""
+
+    def test_crea_merchants_y_variantes_en_lote(self, db, merchant_service):
+        sentencias = _contar_sentencias(db)
+
+        ids = merchant_service.resolve_many(
+            db,
+            ["SUBWAY MOMENTUM", "SUBWAY HEREDIA", "WALMART SUPERCENTER", "SUBWAY MOMENTUM"],
+            {"SUBWAY HEREDIA": ("Heredia", "Costa Rica")},
+        )
+        consultas = len(sentencias)
+        db.commit()
+
+        assert ids["SUBWAY MOMENTUM"] == ids["SUBWAY HEREDIA"] != ids["WALMART SUPERCENTER"]
+        assert db.scalar(select(func.count()).select_from(Merchant)) == 2
+        variante = db.execute(
+            select(MerchantVariant).where(MerchantVariant.nombre_raw == "SUBWAY HEREDIA")
+        ).scalar_one()
+        assert (variante.ciudad, variante.confianza_match) == ("Heredia", Decimal("1.00"))
+        # variantes IN, merchants IN, INSERT merchants, relectura, INSERT variantes, relectura
+        assert consultas == 6
+
+    def test_usa_variantes_y_merchants_existentes(self, db, merchant_service):
+        subway = Merchant(
+            nombre_normalizado="Subway", categoria_principal="Comida", tipo_negocio="food"
+        )
+        db.add(subway)
+        db.flush()
+        db.add(MerchantVariant(merchant_id=subway.id, nombre_raw="SUBWAY MOMENTUM"))
+        db.commit()
+
+        ids = merchant_service.resolve_many(db, ["SUBWAY MOMENTUM", "SUBWAY ESCAZU"])
+
+        assert ids == {"SUBWAY MOMENTUM": subway.id, "SUBWAY ESCAZU": subway.id}
+        assert db.scalar(select(func.count()).select_from(Merchant)) == 1
+
+    def test_cache_tras_commit_evita_consultas(self, db, merchant_service):
+        merchant_service.resolve_many(db, ["SUBWAY MOMENTUM"])
+        db.commit()
+        sentencias = _contar_sentencias(db)
+
+        ids = merchant_service.resolve_many(db, ["SUBWAY MOMENTUM"])
+
+        assert ids["SUBWAY MOMENTUM"]
+        assert sentencias == []
+
+    def test_verifica_ids_cacheados_en_la_misma_consulta(self, db, merchant_service):
+        """Un merchant cacheado que otro proceso borró se descarta y se relee."""
+        ids = merchant_service.resolve_many(db, ["SUBWAY MOMENTUM", "WALMART SUPERCENTER"])
+        db.commit()
+        merchant_cache.set("raw:WALMART SUPERCENTER", "merchant-borrado")
+        sentencias = _contar_sentencias(db)
+
+        resueltos = merchant_service.lookup_many(db, ["SUBWAY MOMENTUM", "AUTOMERCADO"])
+        assert resueltos == {"SUBWAY MOMENTUM": ids["SUBWAY MOMENTUM"]}
+        assert len(sentencias) == 1
+        assert "UNION ALL" in sentencias[0]
+
+        resueltos = merchant_service.lookup_many(db, ["WALMART SUPERCENTER", "AUTOMERCADO"])
+        db.commit()
+
+        assert resueltos == {"WALMART SUPERCENTER": ids["WALMART SUPERCENTER"]}
+        assert merchant_cache.get("raw:WALMART SUPERCENTER") == ids["WALMART SUPERCENTER"]
+
+    def test_rollback_no_cachea(self, db, merchant_service):
+        merchant_service.resolve_many(db, ["SUBWAY MOMENTUM"])
+        db.rollback()
+
+        assert merchant_cache.get("raw:SUBWAY MOMENTUM") is None
+        assert db.scalar(select(func.count()).select_from(Merchant)) == 0
+
+    def test_conflicto_concurrente_no_falla(self, db, merchant_service):
+        """Si otro proceso creó el merchant entre la consulta y el INSERT, se usa el suyo."""
+        otro = Merchant(nombre_normalizado="Subway", categoria_principal="X", tipo_negocio="y")
+        db.add(otro)
+        db.commit()
+
+        real = MerchantNormalizationService._merchants_by_name
+        with patch.object(
+            MerchantNormalizationService,
+            "_merchants_by_name",
+            side_effect=[{}, real(db, {"Subway"})],
+        ):
+            ids = merchant_service.resolve_many(db, ["SUBWAY MOMENTUM"])
+
+        assert ids == {"SUBWAY MOMENTUM": otro.id}
+        assert db.scalar(select(func.count()).select_from(Merchant)) == 1
+
+    def test_find_or_create_y_buscar_por_nombre_raw(self, db, merchant_service):
+        merchant = merchant_service.find_or_create_merchant(db, "WALMART SUPERCENTER", "Escazú")
+        db.commit()
+
+        assert merchant.nombre_normalizado == "Walmart"
+        assert merchant_service.find_or_create_merchant(db, "WALMART SUPERCENTER") == merchant
+        assert Merchant.buscar_por_nombre_raw(db, "WALMART SUPERCENTER") == merchant
+        assert Merchant.buscar_por_nombre_raw(db, "SUPERCENTER") == merchant
+
+
+class TestMergeMerchants:
+    """Tests para la fusión de merchants."""
+
+    def test_fusion_mueve_variantes_y_transacciones_e_invalida_cache(
+        self, db, merchant_service
+    ):
+        ids = merchant_service.resolve_many(db, ["AUTOMERCADO", "AUTO MERCADO"])
+        db.add(
+            Transaction(
+                profile_id="perfil-1",
+                email_id="correo-1",
+                banco="bac",
+                tipo_transaccion="compra",
+                comercio="AUTOMERCADO",
+                monto_original=Decimal("5000"),
+                moneda_original="CRC",
+                monto_crc=Decimal("5000"),
+                fecha_transaccion=datetime(2025, 1, 1, 12),
+                merchant_id=ids["AUTOMERCADO"],
+            )
+        )
+        db.commit()
+        assert merchant_cache.get("raw:AUTOMERCADO") == ids["AUTOMERCADO"]
+
+        movidas = merchant_service.merge_merchants(db, ids["AUTOMERCADO"], ids["AUTO MERCADO"])
+        db.commit()
+
+        assert movidas == 1
+        assert merchant_cache.get("raw:AUTOMERCADO") is None
+        assert merchant_service.resolve_many(db, ["AUTOMERCADO"]) == {
+            "AUTOMERCADO": ids["AUTO MERCADO"]
+        }
+        assert db.scalar(select(Transaction.merchant_id)) == ids["AUTO MERCADO"]
+        assert db.get(Merchant, ids["AUTOMERCADO"]) is None
+
+    def test_fusion_consigo_mismo_falla(self, db, merchant_service):
+        ids = merchant_service.resolve_many(db, ["SUBWAY MOMENTUM"])
+
+        with pytest.raises(ValueError):
+            merchant_service.merge_merchants(db, ids["SUBWAY MOMENTUM"], ids["SUBWAY MOMENTUM"])
@@ -0,0 +1,80 @@
+"""Tests para los histogramas de latencia de core.metrics."""
+
+import asyncio
+import inspect
+
+import pytest
+
+from finanzas_tracker.core.metrics import LatencyHistogram, histogram, render_prometheus
+
+
+class TestLatencyHistogram:
+    """Tests del histograma por buckets."""
+
+    def test_percentiles_interpolados(self) -> None:
+        hist = LatencyHistogram("test_latency", buckets=(0.1, 0.2, 0.4))
+        for seconds in [0.05] * 50 + [0.15] * 45 + [0.3] * 5:
+            hist.observe(seconds)
+
+        assert hist.percentile(0.5) == pytest.approx(0.1)
+        assert hist.percentile(0.95) == pytest.approx(0.2)
+        assert 0.2 < hist.percentile(0.99) <= 0.4
+
+        snapshot = hist.snapshot()
+        assert snapshot["count"] == 100
+        assert snapshot["avg_ms"] == pytest.approx(107.5)
+
+    def test_sin_mediciones(self) -> None:
+        hist = LatencyHistogram("test_vacio")
+
+        assert hist.percentile(0.95) is None
+        assert hist.snapshot()["p95_ms"] is None
+
+    def test_valores_sobre_el_ultimo_bucket(self) -> None:
+        hist = LatencyHistogram("test_lento", buckets=(0.1, 1.0))
+        hist.observe(42.0)
+
+        assert hist.percentile(0.99) == 1.0
+        assert hist.render()[-3] == 'test_lento_bucket{le="+Inf"} 1'
+
+    def test_timed_conserva_firma_y_mide_errores(self) -> None:
+        hist = LatencyHistogram("test_timed")
+
+        @hist.timed
+        def endpoint(query: str, limit: int = 10) -> str:
+            if limit < 0:
+                raise ValueError(query)
+            return query
+
+        assert list(inspect.signature(endpoint).parameters) == ["query", "limit"]
+        assert endpoint("uber") == "uber"
+        with pytest.raises(ValueError):
+            endpoint("uber", limit=-1)
+        assert hist.snapshot()["count"] == 2
+
+    def test_timed_en_corutinas_mide_hasta_que_terminan(self) -> None:
+        hist = LatencyHistogram("test_timed_async", buckets=(0.001, 1.0))
+
+        @hist.timed
+        async def endpoint(query: str) -> str:
+            await asyncio.sleep(0.01)
+            return query
+
+        assert inspect.iscoroutinefunction(endpoint)
+        assert asyncio.run(endpoint("uber")) == "uber"
+        assert hist.snapshot()["count"] == 1
+        assert hist.percentile(0.5) > 0.001
+
+
+def test_registro_compartido_y_formato_prometheus() -> None:
+    search = histogram("test_requests_seconds", "Latencia de prueba", endpoint="/ai/search")
+    assert histogram("test_requests_seconds", endpoint="/ai/search") is search
+    histogram("test_requests_seconds", endpoint="/ai/chat").observe(0.02)
+    search.observe(0.003)
+
+    text = render_prometheus()
+
+    assert text.count("# TYPE test_requests_seconds histogram") == 1
+    assert "# HELP test_requests_seconds Latencia de prueba" in text
+    assert 'test_requests_seconds_bucket{endpoint="/ai/search",le="0.005"} 1' in text
+    assert 'test_requests_seconds_count{endpoint="/ai/chat"} 1' in text
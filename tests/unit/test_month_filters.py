@@ -0,0 +1,168 @@
+"""Tests para los filtros de mes por rango de fechas."""
+
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.repositories import TransactionRepository, in_month, month_range
+
+
+@pytest.fixture
+def perfil(session: Session) -> str:
+    profile = Profile(email_outlook="filtros@example.com", nombre="Filtros")
+    session.add(profile)
+    session.commit()
+    return profile.id
+
+
+def _txn(profile_id: str, fecha: datetime, monto: str, **kwargs: object) -> Transaction:
+    return Transaction(
+        profile_id=profile_id,
+        email_id=str(uuid4()),
+        banco="bac",
+        tipo_transaccion="compra",
+        comercio="Comercio",
+        monto_original=Decimal(monto),
+        moneda_original="CRC",
+        monto_crc=Decimal(monto),
+        fecha_transaccion=fecha,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def historial(session: Session) -> str:
+    """Un año de transacciones de varios perfiles, con estadísticas al día."""
+    perfiles = [Profile(email_outlook=f"p{i}@example.com", nombre=f"P{i}") for i in range(20)]
+    session.add_all(perfiles)
+    session.flush()
+    inicio = datetime(2025, 1, 1)
+    session.execute(
+        insert(Transaction),
+        [
+            {
+                "profile_id": perfiles[i % 20].id,
+                "email_id": str(uuid4()),
+                "banco": "bac",
+                "tipo_transaccion": "compra",
+                "comercio": "Comercio",
+                "monto_original": Decimal("1000"),
+                "moneda_original": "CRC",
+                "monto_crc": Decimal("1000"),
+                # Fechas desordenadas respecto al heap (7919 es primo con 4000)
+                "fecha_transaccion": inicio + timedelta(hours=2 * (i * 7919 % 4000)),
+                "deleted_at": datetime.now(UTC) if i % 10 == 0 else None,
+            }
+            for i in range(4000)
+        ],
+    )
+    session.execute(text("ANALYZE transactions"))
+    return perfiles[0].id
+
+
+def _plan(db: Session, stmt: object) -> str:
+    """Plan de PostgreSQL; sin seq scans, que en una tabla de tests suelen ganar."""
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    compiled = stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True})  # type: ignore[attr-defined]
+    return "\n".join(row[0] for row in db.execute(text(f"EXPLAIN {compiled}")))
+
+
+def _index_cond(plan: str) -> str:
+    return next(line for line in plan.splitlines() if "Index Cond:" in line)
+
+
+class TestMonthRange:
+    """Tests para month_range."""
+
+    def test_rango_semiabierto(self) -> None:
+        assert month_range(2025, 2) == (datetime(2025, 2, 1), datetime(2025, 3, 1))
+
+    def test_diciembre_pasa_al_anio_siguiente(self) -> None:
+        assert month_range(2025, 12) == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+
+    def test_mes_invalido(self) -> None:
+        with pytest.raises(ValueError):
+            month_range(2025, 13)
+
+
+class TestInMonth:
+    """Tests para in_month."""
+
+    def test_sin_funciones_sobre_la_columna(self) -> None:
+        """La condición compara la columna directo (sargable), sin EXTRACT."""
+        cond = in_month(Transaction.fecha_transaccion, 2025, 11)
+        sql = str(cond.compile(dialect=postgresql.dialect()))
+        assert "EXTRACT" not in sql.upper()
+        assert "transactions.fecha_transaccion >= " in sql
+        assert "transactions.fecha_transaccion < " in sql
+
+    def test_incluye_bordes_del_mes(self, session: Session, perfil: str) -> None:
+        """Incluye el primer instante y excluye el primero del mes siguiente."""
+        session.add_all(
+            [
+                _txn(perfil, datetime(2025, 10, 31, 23, 59), "1"),
+                _txn(perfil, datetime(2025, 11, 1, 0, 0), "10"),
+                _txn(perfil, datetime(2025, 11, 30, 23, 59, 59), "100"),
+                _txn(perfil, datetime(2025, 12, 1, 0, 0), "1000"),
+            ]
+        )
+        session.commit()
+
+        repo = TransactionRepository(session)
+        assert repo.get_total_by_month(perfil, 2025, 11) == Decimal("110")
+        assert repo.count_by_profile(perfil, mes=date(2025, 11, 1)) == 2
+
+    def test_excluye_borradas(self, session: Session, perfil: str) -> None:
+        session.add_all(
+            [
+                _txn(perfil, datetime(2025, 11, 5), "10"),
+                _txn(perfil, datetime(2025, 11, 6), "20", deleted_at=datetime.now(UTC)),
+            ]
+        )
+        session.commit()
+
+        assert TransactionRepository(session).get_total_by_month(perfil, 2025, 11) == Decimal("10")
+
+
+class TestIndexUsage:
+    """El plan de ejecución busca por índice con un rango de fechas."""
+
+    def test_total_mensual_busca_por_rango(self, session: Session, historial: str) -> None:
+        stmt = TransactionRepository(session)._total_by_month_stmt(historial, 2025, 3)
+
+        plan = _plan(session, stmt)
+
+        assert "ix_transactions_activas_profile_fecha" in plan
+        assert "fecha_transaccion >= " in _index_cond(plan)
+        assert "fecha_transaccion < " in _index_cond(plan)
+
+    def test_indice_parcial_cubre_consultas_de_activas(
+        self, session: Session, historial: str
+    ) -> None:
+        """El predicado `deleted_at IS NULL` del índice parcial coincide con la consulta."""
+        stmt = TransactionRepository(session)._count_stmt(historial, mes=date(2025, 3, 1))
+
+        plan = _plan(session, stmt)
+
+        assert "ix_transactions_activas_profile_fecha" in plan
+        assert "fecha_transaccion >= " in _index_cond(plan)
+
+    def test_extract_no_puede_usar_el_rango(self, session: Session, historial: str) -> None:
+        """Regresión: con EXTRACT el índice sólo filtra por perfil."""
+        stmt = select(func.sum(Transaction.monto_crc)).where(
+            Transaction.profile_id == historial,
+            Transaction.deleted_at.is_(None),
+            func.extract("month", Transaction.fecha_transaccion) == 11,
+        )
+
+        plan = _plan(session, stmt)
+
+        assert "fecha_transaccion" not in _index_cond(plan)
+        assert "EXTRACT(month FROM fecha_transaccion)" in plan
@@ -11,9 +11,9 @@ from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
-from finanzas_tracker.models import Card
+from finanzas_tracker.models import Card, JobStatus
 from finanzas_tracker.models.enums import (
     AccountType,
     BankName,
@@ -85,9 +85,17 @@ def mock_db() -> MagicMock:
 
 
 @pytest.fixture
-def onboarding_service(mock_db: MagicMock) -> OnboardingService:
+def jobs_session_factory(session: Session) -> sessionmaker[Session]:
+    """Sesiones para la tabla jobs (estado del onboarding); confirman en savepoints."""
+    return sessionmaker(bind=session.get_bind(), join_transaction_mode="create_savepoint")
+
+
+@pytest.fixture
+def onboarding_service(
+    mock_db: MagicMock, jobs_session_factory: sessionmaker[Session]
+) -> OnboardingService:
     """Create OnboardingService with mock db."""
-    return OnboardingService(mock_db)
+    return OnboardingService(mock_db, session_factory=jobs_session_factory)
 
 
 @pytest.fixture
@@ -308,10 +316,27 @@ class TestStartOnboarding:
         onboarding_service: OnboardingService,
         sample_user_id: str,
     ) -> None:
-        """Should store state in internal cache."""
+        """Should persist state so any API worker can read it."""
+        onboarding_service.start_onboarding(sample_user_id)
+
+        assert onboarding_service.get_state(sample_user_id) is not None
+
+    def test_state_visible_from_other_instance(
+        self,
+        onboarding_service: OnboardingService,
+        mock_db: MagicMock,
+        jobs_session_factory: sessionmaker[Session],
+        sample_user_id: str,
+    ) -> None:
+        """Another service instance (another worker) sees the same state."""
         onboarding_service.start_onboarding(sample_user_id)
+        onboarding_service.update_step(sample_user_id, OnboardingStep.IMPORT_DATA)
+
+        other = OnboardingService(mock_db, session_factory=jobs_session_factory)
+        state = other.get_state(sample_user_id)
 
-        assert sample_user_id in onboarding_service._states
+        assert state is not None
+        assert state.current_step == OnboardingStep.IMPORT_DATA
 
 
 class TestGetState:
@@ -366,6 +391,38 @@ class TestUpdateStep:
         assert state is None
 
 
+class TestEnqueueAutoDiscover:
+    """Tests for enqueue_auto_discover method."""
+
+    def test_enqueue_reuses_state_job(
+        self,
+        onboarding_service: OnboardingService,
+        sample_user_id: str,
+        sample_profile_id: str,
+    ) -> None:
+        """The import runs on the same job that stores the state."""
+        onboarding_service.start_onboarding(sample_user_id)
+
+        job = onboarding_service.enqueue_auto_discover(sample_user_id, sample_profile_id, 15)
+
+        assert job.status == JobStatus.QUEUED
+        assert job.profile_id == sample_profile_id
+        assert job.params == {"max_days_back": 15}
+        assert onboarding_service.get_state(sample_user_id) is not None
+
+    def test_enqueue_twice_returns_pending_job(
+        self,
+        onboarding_service: OnboardingService,
+        sample_user_id: str,
+        sample_profile_id: str,
+    ) -> None:
+        """A second request while the import is pending does not enqueue again."""
+        first = onboarding_service.enqueue_auto_discover(sample_user_id, sample_profile_id)
+        second = onboarding_service.enqueue_auto_discover(sample_user_id, sample_profile_id)
+
+        assert second.id == first.id
+
+
 # =============================================================================
 # Tests: OnboardingService - Confirm Accounts
 # =============================================================================
@@ -563,7 +620,7 @@ class TestProcessPdf:
                 banco=BankName.BAC,
             )
 
-            assert sample_user_id in onboarding_service._states
+            assert onboarding_service.get_state(sample_user_id) is not None
 
     def test_process_pdf_updates_state_on_success(
         self,
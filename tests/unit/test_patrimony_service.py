@@ -249,56 +249,41 @@ class TestCalcularCambioPeriodo:
             mock_db = MagicMock()
             return PatrimonyService(mock_db)
 
-    @pytest.fixture
-    def snapshot_inicio(self):
-        """Fixture para snapshot inicial."""
-        from finanzas_tracker.models.patrimonio_snapshot import PatrimonioSnapshot
-
-        s = MagicMock(spec=PatrimonioSnapshot)
-        s.fecha_snapshot = datetime(2025, 1, 1, tzinfo=UTC)
-        s.patrimonio_neto_crc = Decimal("1000000")
-        s.total_activos_crc = Decimal("1500000")
-        s.total_deudas_crc = Decimal("500000")
-        return s
-
-    @pytest.fixture
-    def snapshot_fin(self):
-        """Fixture para snapshot final."""
-        from finanzas_tracker.models.patrimonio_snapshot import PatrimonioSnapshot
+    def test_calcular_cambio_positivo(self, service):
+        """Debería calcular el cambio con el libro de saldos en las fechas exactas."""
+        from finanzas_tracker.services.balance_ledger_service import LedgerTotals
 
-        s = MagicMock(spec=PatrimonioSnapshot)
-        s.fecha_snapshot = datetime(2025, 6, 1, tzinfo=UTC)
-        s.patrimonio_neto_crc = Decimal("1200000")
-        s.total_activos_crc = Decimal("1700000")
-        s.total_deudas_crc = Decimal("500000")
-        return s
-
-    def test_calcular_cambio_positivo(self, service, snapshot_inicio, snapshot_fin):
-        """Debería calcular cambio positivo correctamente."""
-        # Primera llamada retorna snapshot_inicio, segunda retorna snapshot_fin
-        service.db.execute.return_value.scalar_one_or_none.side_effect = [
-            snapshot_inicio,
-            snapshot_fin,
+        totales = [
+            LedgerTotals(activos_crc=Decimal("1500000"), deudas_crc=Decimal("500000")),
+            LedgerTotals(activos_crc=Decimal("1700000"), deudas_crc=Decimal("500000")),
         ]
-
-        result = service.calcular_cambio_periodo(
-            profile_id="test-profile-id",
-            fecha_inicio=date(2025, 1, 1),
-            fecha_fin=date(2025, 6, 1),
-        )
+        with (
+            patch(
+                "finanzas_tracker.services.patrimony_service.Account.calcular_patrimonio_total",
+                return_value=Decimal("0"),
+            ),
+            patch(
+                "finanzas_tracker.services.patrimony_service.BalanceLedgerService.totales_en",
+                side_effect=totales,
+            ),
+        ):
+            result = service.calcular_cambio_periodo(
+                profile_id="test-profile-id",
+                fecha_inicio=date(2025, 1, 1),
+                fecha_fin=date(2025, 6, 1),
+            )
 
         assert result["cambio_absoluto_crc"] == Decimal("200000")
         assert result["cambio_porcentual"] == Decimal("20.00")
+        assert result["fecha_fin_real"] == date(2025, 6, 1)
 
-    def test_calcular_cambio_sin_snapshot_inicio(self, service):
-        """Debería lanzar error si no hay snapshot inicial."""
-        service.db.execute.return_value.scalar_one_or_none.side_effect = [None, None]
-
-        with pytest.raises(ValueError, match="No hay snapshots antes de"):
+    def test_calcular_cambio_fechas_invertidas(self, service):
+        """Debería lanzar error si la fecha de inicio es posterior a la de fin."""
+        with pytest.raises(ValueError, match="posterior"):
             service.calcular_cambio_periodo(
                 profile_id="test-profile-id",
-                fecha_inicio=date(2025, 1, 1),
-                fecha_fin=date(2025, 6, 1),
+                fecha_inicio=date(2025, 6, 1),
+                fecha_fin=date(2025, 1, 1),
             )
 
 
@@ -0,0 +1,208 @@
+"""Tests para el clustering de patrones y SmartLearningService.merge_similar_patterns."""
+
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+import time
+
+import numpy as np
+import pytest
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.models.category import Category, Subcategory
+from finanzas_tracker.models.enums import CategoryType
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.smart_learning import (
+    PatternCluster,
+    PatternType,
+    TransactionPattern,
+)
+from finanzas_tracker.services.pattern_clustering import (
+    UnionFind,
+    centroid,
+    normalize_rows,
+    similar_pairs,
+)
+from finanzas_tracker.services.smart_learning_service import SmartLearningService
+
+
+def _pares_ingenuos(normalized: np.ndarray, threshold: float) -> set[tuple[int, int]]:
+    n = normalized.shape[0]
+    return {
+        (i, j)
+        for i in range(n)
+        for j in range(i + 1, n)
+        if float(normalized[i] @ normalized[j]) >= threshold
+    }
+
+
+class TestUnionFind:
+    """Tests de los conjuntos disjuntos."""
+
+    def test_grupos_transitivos(self) -> None:
+        uf = UnionFind(6)
+        uf.union(0, 3)
+        uf.union(3, 5)
+        uf.union(1, 2)
+
+        assert uf.groups() == [[0, 3, 5], [1, 2], [4]]
+        assert uf.find(5) == uf.find(0)
+
+
+class TestSimilarPairs:
+    """Tests de la similitud coseno por bloques."""
+
+    @pytest.mark.parametrize("block_size", [1, 7, 64, 1024])
+    def test_igual_a_la_version_ingenua(self, block_size: int) -> None:
+        """El resultado no depende del tamaño de bloque."""
+        rng = np.random.default_rng(42)
+        base = rng.normal(size=(10, 16))
+        # 3 variantes ruidosas de cada vector base: pares muy similares
+        matrix = np.repeat(base, 3, axis=0) + rng.normal(scale=0.05, size=(30, 16))
+        normalized, _ = normalize_rows(matrix)
+
+        pares = {
+            (i, j)
+            for rows, cols, _ in similar_pairs(normalized, 0.9, block_size)
+            for i, j in zip(rows.tolist(), cols.tolist(), strict=True)
+        }
+
+        assert pares == _pares_ingenuos(normalized, 0.9)
+        assert (0, 1) in pares
+        assert all(i < j for i, j in pares)
+
+    def test_filas_en_cero_no_hacen_match(self) -> None:
+        normalized, valid = normalize_rows(np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 0.0]]))
+
+        assert valid.tolist() == [False, True, False]
+        assert list(similar_pairs(normalized, 0.5)) == []
+
+    def test_centroide_ponderado(self) -> None:
+        normalized, _ = normalize_rows(np.array([[1.0, 0.0], [0.0, 1.0]]))
+
+        result = centroid(normalized, np.array([3.0, 1.0]))
+
+        assert np.linalg.norm(result) == pytest.approx(1.0)
+        assert result[0] > result[1]
+
+
+SUBCATEGORIAS = ("super", "salud", "transporte", "suscripciones")
+
+
+@pytest.fixture
+def db(session: Session) -> Session:
+    """Sesión de tests con el perfil y las subcategorías de los patrones."""
+    session.add(Profile(id="perfil-1", email_outlook="patrones@example.com", nombre="Patrones"))
+    category = Category(tipo=CategoryType.NECESSITIES, nombre="Necesidades")
+    session.add(category)
+    session.flush()
+    session.add_all(
+        Subcategory(id=sub_id, category_id=category.id, nombre=sub_id) for sub_id in SUBCATEGORIAS
+    )
+    session.commit()
+    return session
+
+
+def _vector(*valores: float) -> list[float]:
+    return list(valores) + [0.0] * (1536 - len(valores))
+
+
+def _patron(
+    db: Session,
+    texto: str,
+    embedding: list[float],
+    subcategory_id: str = "super",
+    times_matched: int = 1,
+    amount: str = "1000",
+    dias: int = 0,
+) -> TransactionPattern:
+    visto = datetime(2025, 11, 1, tzinfo=UTC) + timedelta(days=dias)
+    pattern = TransactionPattern(
+        profile_id="perfil-1",
+        pattern_text=texto,
+        pattern_text_normalized=texto.upper(),
+        pattern_type=PatternType.COMERCIO,
+        subcategory_id=subcategory_id,
+        embedding=embedding,
+        confidence=Decimal("0.80"),
+        times_matched=times_matched,
+        times_confirmed=times_matched,
+        times_rejected=0,
+        total_amount=Decimal(amount) * times_matched,
+        min_amount=Decimal(amount),
+        max_amount=Decimal(amount),
+        avg_amount=Decimal(amount),
+        first_seen_at=visto,
+        last_seen_at=visto,
+    )
+    db.add(pattern)
+    db.flush()
+    return pattern
+
+
+class TestMergeSimilarPatterns:
+    """Tests del job de fusión y clustering."""
+
+    def test_fusiona_duplicados_y_crea_centroides(self, db: Session) -> None:
+        auto_1 = _patron(db, "AUTOMERCADO ESCAZU", _vector(1, 0, 0), times_matched=5)
+        auto_2 = _patron(
+            db, "AUTO MERCADO ESCAZU", _vector(0.99, 0.05, 0), times_matched=2, amount="4000"
+        )
+        # Muy similar pero otra subcategoría: mismo cluster, no se fusiona
+        farmacia = _patron(db, "AUTOMERCADO FARMACIA", _vector(0.9, 0.3, 0), subcategory_id="salud")
+        uber = _patron(db, "UBER TRIP", _vector(0, 0, 1), subcategory_id="transporte", dias=3)
+        db.commit()
+
+        merged = SmartLearningService(db).merge_similar_patterns("perfil-1")
+
+        assert merged == 1
+        assert auto_2.deleted_at is not None
+        assert auto_1.deleted_at is None
+        assert auto_1.times_matched == 7
+        assert auto_1.total_amount == Decimal("13000")
+        assert auto_1.max_amount == Decimal("4000")
+        assert auto_1.avg_amount == Decimal("1857.14")
+
+        clusters = db.query(PatternCluster).order_by(PatternCluster.id).all()
+        assert [c.pattern_count for c in clusters] == [2, 1]
+        assert clusters[0].primary_subcategory_id == "super"
+        assert clusters[0].name == "AUTOMERCADO ESCAZU"
+        assert auto_1.cluster_id == farmacia.cluster_id == clusters[0].id
+        assert uber.cluster_id == clusters[1].id
+        assert auto_2.cluster_id is None
+        assert np.linalg.norm(np.asarray(clusters[0].centroid)) == pytest.approx(1.0, abs=1e-5)
+
+    def test_recalcular_reemplaza_clusters(self, db: Session) -> None:
+        _patron(db, "NETFLIX", _vector(1, 0))
+        _patron(db, "SPOTIFY", _vector(0, 1), subcategory_id="suscripciones")
+        db.commit()
+        service = SmartLearningService(db)
+
+        service.merge_similar_patterns("perfil-1")
+        assert service.merge_similar_patterns("perfil-1") == 0
+
+        assert db.query(PatternCluster).count() == 2
+
+    def test_sin_patrones(self, db: Session) -> None:
+        assert SmartLearningService(db).merge_similar_patterns("perfil-1") == 0
+
+
+@pytest.mark.slow
+def test_benchmark_bloques_vs_ingenuo() -> None:
+    """La similitud por bloques es mucho más rápida que comparar par a par."""
+    rng = np.random.default_rng(7)
+    normalized, _ = normalize_rows(rng.normal(size=(600, 384)))
+
+    start = time.perf_counter()
+    ingenuo = _pares_ingenuos(normalized, 0.2)
+    naive_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bloques = {
+        (i, j)
+        for rows, cols, _ in similar_pairs(normalized, 0.2, block_size=256)
+        for i, j in zip(rows.tolist(), cols.tolist(), strict=True)
+    }
+    vectorized_s = time.perf_counter() - start
+
+    assert bloques == ingenuo
+    assert vectorized_s * 20 < naive_s
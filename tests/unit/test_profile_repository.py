@@ -0,0 +1,68 @@
+"""Tests para el repositorio de perfiles."""
+
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.core.cache import identity_cache
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.repositories import ProfileRepository
+
+
+@pytest.fixture
+def db(session: Session) -> Generator[Session, None, None]:
+    """
+    Sesión sobre la conexión de tests; cache de identidad vacío y con TTL.
+
+    Confirma y revierte en savepoints, así el rollback del test no
+    descarta la transacción externa del fixture `session`.
+    """
+    identity_cache.invalidate()
+    with (
+        patch.object(identity_cache, "ttl_seconds", 30),
+        Session(bind=session.get_bind(), join_transaction_mode="create_savepoint") as db,
+    ):
+        yield db
+    identity_cache.invalidate()
+
+
+def _perfil(nombre: str, es_activo: bool = False) -> Profile:
+    return Profile(
+        nombre=nombre,
+        email_outlook=f"{nombre}@example.com",
+        es_activo=es_activo,
+        activo=True,
+    )
+
+
+class TestSetAsActive:
+    """Cambiar el perfil activo invalida el cache de identidad al confirmar."""
+
+    def test_invalida_despues_del_commit(self, db: Session) -> None:
+        personal, negocio = _perfil("personal", es_activo=True), _perfil("negocio")
+        db.add_all([personal, negocio])
+        db.commit()
+
+        ProfileRepository(db).set_as_active(negocio)
+        # Antes del commit otro request todavía lee (y cachea) el perfil anterior
+        identity_cache.set("active_profile", personal.id)
+        assert identity_cache.get("active_profile") == personal.id
+
+        db.commit()
+
+        assert identity_cache.get("active_profile") is None
+        assert (personal.es_activo, negocio.es_activo) == (False, True)
+
+    def test_rollback_no_invalida(self, db: Session) -> None:
+        personal, negocio = _perfil("personal", es_activo=True), _perfil("negocio")
+        db.add_all([personal, negocio])
+        db.commit()
+
+        ProfileRepository(db).set_as_active(negocio)
+        db.rollback()
+        identity_cache.set("active_profile", personal.id)
+        db.commit()
+
+        assert identity_cache.get("active_profile") == personal.id
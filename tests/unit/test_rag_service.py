@@ -125,3 +125,166 @@ class TestEmbeddingEvents:
         # No debe fallar al registrar/desregistrar
         register_embedding_events()
         unregister_embedding_events()
+
+
+class _FakeAsyncStream:
+    """Imita `AsyncAnthropic().messages.stream(...)`."""
+
+    def __init__(self, chunks: list[str], error: Exception | None = None) -> None:
+        self.chunks = chunks
+        self.error = error
+
+    async def __aenter__(self) -> "_FakeAsyncStream":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        return None
+
+    @property
+    async def text_stream(self):  # noqa: ANN201
+        for chunk in self.chunks:
+            yield chunk
+        if self.error:
+            raise self.error
+
+    async def get_final_message(self) -> MagicMock:
+        return self.current_message_snapshot
+
+    @property
+    def current_message_snapshot(self) -> MagicMock:
+        return MagicMock(usage=MagicMock(input_tokens=120, output_tokens=8))
+
+
+def _rag_con_stream(stream: _FakeAsyncStream):  # noqa: ANN202
+    from finanzas_tracker.services.embedding_service import SemanticSearchHit
+    from finanzas_tracker.services.rag_service import RAGService
+
+    settings = MagicMock(anthropic_api_key="sk-ant-test", claude_model="claude-test")
+    with patch("finanzas_tracker.services.rag_service.EmbeddingService"):
+        rag = RAGService(MagicMock(), settings=settings)
+
+    rag.embedding_service.get_embedding.return_value = [0.1, 0.2]
+    rag.embedding_service.search_hits.return_value = [
+        SemanticSearchHit(
+            transaction_id="tx-1",
+            comercio="AUTOMERCADO",
+            monto_crc=Decimal("15000"),
+            fecha=datetime(2025, 11, 20),
+            categoria="Necesidades > Supermercado",
+            categoria_sugerida=None,
+            similarity=0.9,
+            text_content="AUTOMERCADO",
+        )
+    ]
+    rag._get_monthly_stats = MagicMock(return_value={"Total": "₡15,000"})  # type: ignore[method-assign]
+    from finanzas_tracker.core.claude_client import ClaudeClient
+
+    client = MagicMock()
+    client.messages.stream.return_value = stream
+    rag._claude = ClaudeClient(async_client=client)
+    return rag
+
+
+def _collect(events):  # noqa: ANN001, ANN202
+    import asyncio
+
+    async def _run():  # noqa: ANN202
+        return [event async for event in events]
+
+    return asyncio.run(_run())
+
+
+class TestChatStream:
+    """Tests para RAGService.chat_stream (streaming async)."""
+
+    @patch("finanzas_tracker.services.rag_service.can_use_claude", return_value=(True, ""))
+    def test_emite_sources_deltas_y_done(self, _can_use: MagicMock) -> None:
+        from finanzas_tracker.core.metrics import histogram
+        from finanzas_tracker.services.rag_service import TTFT_METRIC
+
+        ttft = histogram(TTFT_METRIC, endpoint="/test/stream")
+        antes = ttft.snapshot()["count"]
+        rag = _rag_con_stream(_FakeAsyncStream(["Gastaste ", "₡15,000"]))
+
+        events = _collect(rag.chat_stream("comida?", "perfil-1", endpoint="/test/stream"))
+
+        assert [e.event for e in events] == ["sources", "delta", "delta", "done"]
+        assert events[0].data["sources"][0].comercio == "AUTOMERCADO"
+        assert "".join(e.data["text"] for e in events[1:3]) == "Gastaste ₡15,000"
+        assert events[-1].data["usage"] == {"input_tokens": 120, "output_tokens": 8}
+        assert events[-1].data["ttft_ms"] is not None
+        assert ttft.snapshot()["count"] == antes + 1
+
+        # La búsqueda reutiliza el embedding calculado en paralelo con las stats
+        args = rag.embedding_service.search_hits.call_args.args
+        assert args[-1] == [0.1, 0.2]
+        rag._get_monthly_stats.assert_called_once_with("perfil-1")
+        prompt = rag._claude.async_client.messages.stream.call_args.kwargs["messages"][0]["content"]
+        assert "AUTOMERCADO" in prompt
+        assert "₡15,000" in prompt
+
+    @patch(
+        "finanzas_tracker.services.rag_service.can_use_claude",
+        return_value=(False, "sin créditos"),
+    )
+    def test_no_disponible_no_llama_a_claude(self, _can_use: MagicMock) -> None:
+        rag = _rag_con_stream(_FakeAsyncStream([]))
+
+        events = _collect(rag.chat_stream("comida?", "perfil-1"))
+
+        assert [e.event for e in events] == ["sources", "delta", "done"]
+        rag._claude.async_client.messages.stream.assert_not_called()
+        rag.embedding_service.search_hits.assert_not_called()
+
+    @patch("finanzas_tracker.services.rag_service.can_use_claude", return_value=(True, ""))
+    def test_error_a_mitad_del_stream(self, _can_use: MagicMock) -> None:
+        import anthropic
+
+        error = anthropic.APIConnectionError(request=MagicMock())
+        rag = _rag_con_stream(_FakeAsyncStream(["Hola"], error=error))
+
+        events = _collect(rag.chat_stream("comida?", "perfil-1", include_stats=False))
+
+        assert [e.event for e in events] == ["sources", "delta", "error"]
+        rag._get_monthly_stats.assert_not_called()
+
+    @patch("finanzas_tracker.services.rag_service.can_use_claude", return_value=(True, ""))
+    def test_achat_junta_la_respuesta(self, _can_use: MagicMock) -> None:
+        import asyncio
+
+        rag = _rag_con_stream(_FakeAsyncStream(["Gastaste ", "₡15,000"]))
+
+        response = asyncio.run(rag.achat("comida?", "perfil-1"))
+
+        assert response.answer == "Gastaste ₡15,000"
+        assert response.sources[0].comercio == "AUTOMERCADO"
+        assert response.usage == {"input_tokens": 120, "output_tokens": 8}
+        assert response.query == "comida?"
+
+    @patch("finanzas_tracker.services.rag_service.can_use_claude", return_value=(True, ""))
+    def test_achat_propaga_errores_de_claude(self, _can_use: MagicMock) -> None:
+        import asyncio
+
+        import anthropic
+        import pytest
+
+        error = anthropic.APIConnectionError(request=MagicMock())
+        rag = _rag_con_stream(_FakeAsyncStream(["Hola"], error=error))
+
+        with pytest.raises(anthropic.APIConnectionError):
+            asyncio.run(rag.achat("comida?", "perfil-1", include_stats=False))
+
+    def test_sse_serializa_eventos(self) -> None:
+        from finanzas_tracker.api.routers.ai import _sse_events
+        from finanzas_tracker.services.rag_service import RAGStreamEvent
+
+        async def eventos():  # noqa: ANN202
+            yield RAGStreamEvent("sources", {"sources": []})
+            yield RAGStreamEvent("delta", {"text": "₡15,000"})
+
+        frames = _collect(_sse_events(eventos()))
+
+        assert frames == [
+            'event: sources\ndata: {"sources": []}\n\n',
+            'event: delta\ndata: {"text": "₡15,000"}\n\n',
+        ]
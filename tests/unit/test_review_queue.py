@@ -0,0 +1,272 @@
+"""Tests para los contadores de la cola de revisión."""
+
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from finanzas_tracker.core.database import Base, SessionLocal, _LazySession
+from finanzas_tracker.models.category import Category, Subcategory
+from finanzas_tracker.models.enums import CategoryType, Currency, IncomeType, TransactionType
+from finanzas_tracker.models.income import Income
+from finanzas_tracker.models.pending_question import (
+    PendingQuestion,
+    QuestionStatus,
+    QuestionType,
+)
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services import review_queue
+from finanzas_tracker.services.review_queue import (
+    ReviewQueueService,
+    contar_pendientes,
+    marcar_cambio,
+    register_review_queue_events,
+    unregister_review_queue_events,
+)
+
+
+PERFIL = "perfil-1"
+SUBCATEGORIA = "sub-1"
+
+
+@pytest.fixture
+def db(session: Session) -> Generator[Session, None, None]:
+    """
+    Sesión sobre la conexión de tests con los perfiles y una subcategoría.
+
+    Confirma y revierte en savepoints, así el rollback del test no
+    descarta la transacción externa del fixture `session`.
+    """
+    session.add_all(
+        Profile(id=pid, email_outlook=f"{pid}@example.com", nombre=pid)
+        for pid in (PERFIL, "otro-perfil")
+    )
+    category = Category(tipo=CategoryType.WANTS, nombre="Gustos")
+    session.add(category)
+    session.flush()
+    session.add(Subcategory(id=SUBCATEGORIA, category_id=category.id, nombre="Restaurantes"))
+    session.commit()
+    with Session(bind=session.get_bind(), join_transaction_mode="create_savepoint") as db:
+        yield db
+
+
+@pytest.fixture
+def cola(db: Session, monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    """`contar_pendientes` sobre la sesión de prueba, con los eventos registrados."""
+
+    @contextmanager
+    def sesion() -> Iterator[Session]:
+        yield db
+
+    monkeypatch.setattr(review_queue, "get_session", sesion)
+    contar_pendientes.invalidate_cache()  # type: ignore[attr-defined]
+    register_review_queue_events()
+    yield
+    unregister_review_queue_events()
+    contar_pendientes.invalidate_cache()  # type: ignore[attr-defined]
+
+
+def _txn(
+    tipo: TransactionType = TransactionType.PURCHASE,
+    profile_id: str = PERFIL,
+    **kwargs: object,
+) -> Transaction:
+    return Transaction(
+        profile_id=profile_id,
+        email_id=str(uuid4()),
+        banco="bac",
+        tipo_transaccion=tipo,
+        comercio="COMERCIO",
+        monto_original=Decimal("1000"),
+        moneda_original="CRC",
+        monto_crc=Decimal("1000"),
+        fecha_transaccion=datetime(2025, 1, 1),
+        **kwargs,
+    )
+
+
+def _ingreso(**kwargs: object) -> Income:
+    return Income(
+        profile_id=PERFIL,
+        tipo=IncomeType.SALARY,
+        descripcion="Depósito",
+        monto_original=Decimal("5000"),
+        moneda_original=Currency.CRC,
+        monto_crc=Decimal("5000"),
+        fecha=date(2025, 1, 1),
+        **kwargs,
+    )
+
+
+def _pregunta(**kwargs: object) -> PendingQuestion:
+    return PendingQuestion(
+        profile_id=PERFIL,
+        tipo=QuestionType.OTRO,
+        pregunta="¿Qué fue esto?",
+        **kwargs,
+    )
+
+
+class TestContar:
+    """Todos los contadores salen de una sola consulta."""
+
+    def test_conteos_por_tipo(self, db: Session) -> None:
+        db.add_all(
+            [
+                _txn(TransactionType.TRANSFER, necesita_reconciliacion_sinpe=True),
+                _txn(TransactionType.TRANSFER),
+                _txn(es_comercio_ambiguo=True, subcategory_id=SUBCATEGORIA),
+                _txn(),
+                _txn(excluir_de_presupuesto=True),
+                _txn(es_desconocida=True),
+                _txn(subcategory_id=SUBCATEGORIA),
+                _txn(deleted_at=datetime.now(UTC)),
+                _txn(profile_id="otro-perfil"),
+                _ingreso(confirmado=False),
+                _ingreso(),
+                _pregunta(),
+                _pregunta(status=QuestionStatus.RESPONDIDA),
+            ]
+        )
+        db.commit()
+
+        conteos = ReviewQueueService(db).contar(PERFIL)
+
+        assert conteos == {
+            "transferencias_confusas": 1,
+            "comercios_ambiguos": 1,
+            "compras_sin_categoria": 2,
+            "transferencias_sin_categoria": 1,
+            "comercios_desconocidos": 1,
+            "ingresos_sin_confirmar": 1,
+            "preguntas_ia": 1,
+            "transferencias": 2,
+            "compras": 4,
+            "ingresos": 1,
+            "total": 8,
+        }
+
+    def test_una_sola_sentencia(self, session: Session) -> None:
+        sentencias: list[str] = []
+        event.listen(
+            session.get_bind(),
+            "before_cursor_execute",
+            lambda _conn, _cursor, statement, *_args: sentencias.append(statement),
+        )
+
+        conteos = ReviewQueueService(session).contar(PERFIL)
+
+        assert conteos["total"] == 0
+        assert len(sentencias) == 1
+
+    def test_sql_postgres_con_filter(self) -> None:
+        stmt = ReviewQueueService._conteo_stmt(PERFIL)
+
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+        assert sql.count("count(*) FILTER (WHERE") == 5
+        assert "FROM incomes" in sql
+        assert "FROM pending_questions" in sql
+
+
+class TestIndices:
+    """Los índices parciales cubren sólo las filas en revisión."""
+
+    @pytest.mark.parametrize(
+        ("model", "name", "where"),
+        [
+            (Transaction, "ix_transactions_revision", "subcategory_id IS NULL"),
+            (Income, "ix_incomes_sin_confirmar", "NOT confirmado"),
+            (PendingQuestion, "ix_pending_questions_pendientes", "status = 'pendiente'"),
+        ],
+    )
+    def test_ddl_postgres(self, model: type[Base], name: str, where: str) -> None:
+        index = next(i for i in model.__table__.indexes if i.name == name)
+
+        ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+        assert "(profile_id) WHERE" in ddl
+        assert where in ddl
+
+
+class TestCache:
+    """Los contadores se cachean y se invalidan al confirmar cambios."""
+
+    def test_cachea_por_perfil(self, db: Session, cola: None) -> None:
+        db.add(_txn(subcategory_id=SUBCATEGORIA))
+        db.commit()
+        assert contar_pendientes(PERFIL)["total"] == 0
+
+        # Escritura sin ORM ni marcar_cambio, y cambios de otro perfil:
+        # el cache de este perfil sigue vigente
+        db.execute(update(Transaction.__table__).values(es_desconocida=True))
+        db.add(_txn(profile_id="otro-perfil"))
+        db.commit()
+
+        assert contar_pendientes(PERFIL)["total"] == 0
+        assert contar_pendientes("otro-perfil")["total"] == 1
+
+    def test_invalida_al_cambiar_marcas(self, db: Session, cola: None) -> None:
+        txn = _txn(subcategory_id=SUBCATEGORIA)
+        db.add(txn)
+        db.commit()
+        assert contar_pendientes(PERFIL)["total"] == 0
+
+        txn.es_desconocida = True
+        db.commit()
+        assert contar_pendientes(PERFIL)["comercios_desconocidos"] == 1
+
+        db.add(_pregunta())
+        db.commit()
+        assert contar_pendientes(PERFIL)["preguntas_ia"] == 1
+
+    def test_cambios_sin_marcas_no_invalidan(self, db: Session, cola: None) -> None:
+        txn = _txn()
+        db.add(txn)
+        db.commit()
+        assert contar_pendientes(PERFIL)["compras_sin_categoria"] == 1
+
+        txn.notas = "sin efecto en la cola"
+        db.execute(
+            update(Transaction.__table__)
+            .where(Transaction.id == txn.id)
+            .values(subcategory_id=SUBCATEGORIA)
+        )
+        db.commit()
+
+        assert contar_pendientes(PERFIL)["compras_sin_categoria"] == 1
+
+    def test_marcar_cambio_y_rollback(self, db: Session, cola: None) -> None:
+        txn = _txn(subcategory_id=SUBCATEGORIA)
+        db.add(txn)
+        db.commit()
+        assert contar_pendientes(PERFIL)["total"] == 0
+        stmt = (
+            update(Transaction.__table__)
+            .where(Transaction.id == txn.id)
+            .values(es_comercio_ambiguo=True)
+        )
+
+        db.execute(stmt)
+        marcar_cambio(db, PERFIL)
+        db.rollback()
+        assert contar_pendientes(PERFIL)["total"] == 0
+
+        db.execute(stmt)
+        marcar_cambio(db, PERFIL)
+        db.commit()
+        assert contar_pendientes(PERFIL)["comercios_ambiguos"] == 1
+
+    def test_session_local_registra_los_eventos(self, session: Session) -> None:
+        with SessionLocal(bind=session.get_bind()):
+            pass
+
+        assert event.contains(_LazySession, "after_commit", review_queue._after_commit)
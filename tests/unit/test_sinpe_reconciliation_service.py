@@ -0,0 +1,144 @@
+"""Tests para el match de correos de transferencia en SinpeReconciliationService."""
+
+from datetime import UTC, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from finanzas_tracker.models.sinpe_transfer_email import SinpeTransferEmail
+from finanzas_tracker.services.sinpe_reconciliation_service import (
+    IndiceTransferencias,
+    SinpeReconciliationService,
+    TransferenciaCorreo,
+)
+
+
+def _correo(
+    monto: str,
+    dia: int,
+    email_id: str = "",
+    transaction_id: str | None = None,
+) -> TransferenciaCorreo:
+    fecha = datetime(2025, 11, dia)
+    return TransferenciaCorreo(
+        beneficiario="MARIA PEREZ",
+        monto=Decimal(monto),
+        fecha=fecha,
+        concepto="alquiler",
+        referencia="123",
+        email_date=fecha.replace(tzinfo=UTC),
+        email_id=email_id or f"{monto}-{dia}",
+        transaction_id=transaction_id,
+    )
+
+
+def _email_graph(email_id: str, monto: str) -> dict:
+    return {
+        "id": email_id,
+        "receivedDateTime": "2025-11-10T15:00:00Z",
+        "body": {
+            "content": (
+                f"<p>Estimado(a) MARIA PEREZ :</p> Se realizó una transferencia por un "
+                f"monto de {monto} CRC el día 10-11-2025 por concepto de alquiler. "
+                f"Su referencia es 998877"
+            )
+        },
+    }
+
+
+class TestIndiceTransferencias:
+    """Tests del índice (monto, día)."""
+
+    def test_match_dentro_de_tolerancia(self) -> None:
+        """Encuentra montos a ±1 céntimo y fechas a ±2 días."""
+        indice = IndiceTransferencias(
+            [_correo("18000.00", 10), _correo("18000.01", 12), _correo("5000.00", 10)]
+        )
+
+        matches = indice.buscar(Decimal("18000.00"), datetime(2025, 11, 11, 23, tzinfo=UTC))
+
+        assert sorted(m.email_id for m in matches) == ["18000.00-10", "18000.01-12"]
+        assert len(indice) == 3
+
+    def test_fuera_de_tolerancia(self) -> None:
+        """Ni un día de más ni dos céntimos de diferencia hacen match."""
+        indice = IndiceTransferencias([_correo("18000.00", 10)])
+
+        assert indice.buscar(Decimal("18000.00"), datetime(2025, 11, 13)) == []
+        assert indice.buscar(Decimal("18000.02"), datetime(2025, 11, 10)) == []
+
+
+class TestBuscarMatchCorreo:
+    """Tests de _buscar_match_correo con el índice."""
+
+    def test_ignora_correos_asignados_a_otra_transaccion(self) -> None:
+        service = SinpeReconciliationService(MagicMock())
+        indice = IndiceTransferencias(
+            [
+                _correo("7000.00", 5, "libre"),
+                _correo("7000.00", 5, "de-otra", transaction_id="txn-2"),
+                _correo("7000.00", 5, "propio", transaction_id="txn-1"),
+            ]
+        )
+        txn = MagicMock(
+            id="txn-1", monto_crc=Decimal("7000.00"), fecha_transaccion=datetime(2025, 11, 5)
+        )
+
+        matches = service._buscar_match_correo(txn, indice)
+
+        assert sorted(m.email_id for m in matches) == ["libre", "propio"]
+
+
+class TestSincronizarCorreos:
+    """Tests de la descarga incremental de correos de transferencia."""
+
+    @pytest.fixture
+    def db(self) -> MagicMock:
+        db = MagicMock()
+        # Último correo guardado y IDs ya guardados
+        db.query.return_value.filter.return_value.scalar.return_value = datetime(
+            2025, 11, 1, tzinfo=UTC
+        )
+        db.execute.return_value.scalars.return_value = ["ya-guardado"]
+        return db
+
+    def test_pagina_y_guarda_solo_nuevos(self, db: MagicMock) -> None:
+        """Sigue @odata.nextLink, desde el último correo, sin duplicar."""
+        page_1 = MagicMock()
+        page_1.json.return_value = {
+            "value": [_email_graph("ya-guardado", "1.000,00"), _email_graph("m2", "18.000,00")],
+            "@odata.nextLink": "https://graph.microsoft.com/v1.0/me/messages?$skip=100",
+        }
+        page_2 = MagicMock()
+        page_2.json.return_value = {"value": [_email_graph("m3", "2.500,50")]}
+
+        service = SinpeReconciliationService(db)
+        with (
+            patch("finanzas_tracker.services.auth_manager.AuthManager") as mock_auth,
+            patch("requests.get", side_effect=[page_1, page_2]) as mock_get,
+        ):
+            mock_auth.return_value.get_access_token.return_value = "token"
+            nuevos = service._sincronizar_correos_transferencia(
+                "profile-1", datetime(2025, 10, 28, tzinfo=UTC)
+            )
+
+        assert nuevos == 2
+        filtro = mock_get.call_args_list[0].kwargs["params"]["$filter"]
+        assert "receivedDateTime ge 2025-11-01" in filtro
+        assert mock_get.call_args_list[1].args[0].endswith("$skip=100")
+        assert mock_get.call_args_list[1].kwargs["params"] is None
+
+        guardados = [c.args[0] for c in db.add.call_args_list]
+        assert all(isinstance(g, SinpeTransferEmail) for g in guardados)
+        assert [(g.email_id, g.monto) for g in guardados] == [
+            ("m2", Decimal("18000.00")),
+            ("m3", Decimal("2500.50")),
+        ]
+
+    def test_sin_token_retorna_none(self, db: MagicMock) -> None:
+        service = SinpeReconciliationService(db)
+        with patch("finanzas_tracker.services.auth_manager.AuthManager") as mock_auth:
+            mock_auth.return_value.get_access_token.return_value = None
+            assert service._sincronizar_correos_transferencia("p", datetime.now(UTC)) is None
+        db.add.assert_not_called()
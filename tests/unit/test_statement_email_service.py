@@ -0,0 +1,124 @@
+"""Tests para StatementEmailService.
+
+Verifican que los adjuntos se descarguen y parseen en memoria, sin
+archivos temporales.
+"""
+
+from datetime import UTC, datetime
+import io
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from finanzas_tracker.services.statement_email_service import (
+    StatementEmailInfo,
+    StatementEmailService,
+)
+
+
+@pytest.fixture
+def service() -> StatementEmailService:
+    """Servicio con auth y parsers simulados."""
+    svc = StatementEmailService()
+    svc.auth = MagicMock()
+    svc.auth.get_authorization_header.return_value = {"Authorization": "Bearer x"}
+    svc.pdf_parser = MagicMock()
+    svc.credit_card_parser = MagicMock()
+    return svc
+
+
+@pytest.fixture
+def stmt_info() -> StatementEmailInfo:
+    return StatementEmailInfo(
+        email_id="email-1",
+        subject="Estado de cuenta",
+        sender="estadosdecuenta@baccredomatic.cr",
+        received_date=datetime(2025, 11, 30, tzinfo=UTC),
+        attachment_id="att-1",
+        attachment_name="estado_noviembre.pdf",
+        attachment_size=3,
+        statement_type="bank_account",
+    )
+
+
+def _streaming_response(chunks: list[bytes]) -> MagicMock:
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+class TestDownloadAttachmentContent:
+    """Tests para la descarga en memoria."""
+
+    def test_descarga_por_bloques_sin_base64(self, service: StatementEmailService) -> None:
+        """Usa $value con stream=True y junta los bloques en un BytesIO."""
+        with patch(
+            "finanzas_tracker.services.statement_email_service.requests.get",
+            return_value=_streaming_response([b"%PDF", b"-1.4", b"\n"]),
+        ) as mock_get:
+            content = service.download_attachment_content("email-1", "att-1")
+
+        assert content is not None
+        assert content.read() == b"%PDF-1.4\n"
+        url = mock_get.call_args.args[0]
+        assert url.endswith("/attachments/att-1/$value")
+        assert mock_get.call_args.kwargs["stream"] is True
+
+    def test_error_retorna_none(self, service: StatementEmailService) -> None:
+        """Un error HTTP no se propaga."""
+        response = _streaming_response([])
+        response.raise_for_status.side_effect = RuntimeError("404")
+        with patch(
+            "finanzas_tracker.services.statement_email_service.requests.get",
+            return_value=response,
+        ):
+            assert service.download_attachment_content("email-1", "att-1") is None
+
+
+class TestProcessStatementInMemory:
+    """Tests para process_statement sin archivos temporales."""
+
+    def test_parsea_desde_memoria(
+        self, service: StatementEmailService, stmt_info: StatementEmailInfo
+    ) -> None:
+        """El parser recibe el BytesIO descargado y no se crea ningún archivo."""
+        content = io.BytesIO(b"%PDF-1.4")
+        service.download_attachment_content = MagicMock(return_value=content)  # type: ignore[method-assign]
+        service.pdf_parser.parse.return_value = MagicMock(transactions=[])
+
+        with patch("tempfile.mkstemp") as mock_mkstemp:
+            result = service.process_statement(stmt_info)
+
+        assert result.error is None
+        assert result.pdf_path is None
+        mock_mkstemp.assert_not_called()
+        service.pdf_parser.parse.assert_called_once_with(
+            content, source_name="estado_noviembre.pdf"
+        )
+
+    def test_save_pdf_escribe_una_vez(
+        self, service: StatementEmailService, stmt_info: StatementEmailInfo, tmp_path: Path
+    ) -> None:
+        """Con save_pdf el contenido se guarda, pero se parsea desde memoria."""
+        content = io.BytesIO(b"%PDF-1.4")
+        service.download_attachment_content = MagicMock(return_value=content)  # type: ignore[method-assign]
+        service.pdf_parser.parse.return_value = MagicMock(transactions=[])
+
+        result = service.process_statement(stmt_info, save_pdf=True, output_dir=tmp_path)
+
+        assert result.pdf_path == tmp_path / "estado_cuenta_20251130.pdf"
+        assert result.pdf_path.read_bytes() == b"%PDF-1.4"
+        assert service.pdf_parser.parse.call_args.args[0] is content
+
+    def test_descarga_fallida(
+        self, service: StatementEmailService, stmt_info: StatementEmailInfo
+    ) -> None:
+        """Si no se pudo descargar se reporta el error."""
+        service.download_attachment_content = MagicMock(return_value=None)  # type: ignore[method-assign]
+
+        result = service.process_statement(stmt_info)
+
+        assert result.error == "No se pudo descargar el PDF"
+        service.pdf_parser.parse.assert_not_called()
@@ -0,0 +1,216 @@
+"""Tests para el pipeline concurrente de estados de cuenta.
+
+El parseo se ejecuta con un ThreadPoolExecutor y funciones falsas para
+no depender de PDFs reales ni de levantar procesos.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+import io
+import threading
+import time
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from finanzas_tracker.services.statement_email_service import (
+    StatementEmailInfo,
+    StatementEmailService,
+)
+from finanzas_tracker.services.statement_pipeline import StatementPipeline
+
+
+def _fake_parse(statement_type: str, content: bytes, source_name: str) -> str:
+    if content == b"corrupto":
+        raise ValueError("PDF corrupto")
+    return f"{statement_type}:{source_name}:{content.decode()}"
+
+
+def _pipeline(**kwargs: Any) -> StatementPipeline[str, tuple[str, Any]]:
+    defaults: dict[str, Any] = {
+        "download": lambda item: item.encode(),
+        "parse_args": lambda item: ("bank_account", item),
+        "write": lambda item, parsed: (item, parsed),
+        "fail": lambda item, error: (item, f"error: {error}"),
+        "parse_func": _fake_parse,
+    }
+    defaults.update(kwargs)
+    return StatementPipeline(**defaults)
+
+
+class TestStatementPipeline:
+    """Tests del pipeline descarga → parseo → escritura."""
+
+    def test_resultados_en_orden(self) -> None:
+        """Los resultados respetan el orden de entrada aunque terminen en otro orden."""
+        items = [f"estado{i}" for i in range(10)]
+
+        def download(item: str) -> bytes:
+            # Los primeros tardan más: terminan después que los últimos
+            time.sleep(0.002 * (10 - int(item.removeprefix("estado"))))
+            return item.encode()
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results, stats = _pipeline(
+                download=download, download_workers=4, parse_executor=executor
+            ).run(items)
+
+        assert [item for item, _ in results] == items
+        assert results[0] == ("estado0", "bank_account:estado0:estado0")
+        assert stats.total_items == 10
+        assert {name: s.items for name, s in stats.stages.items()} == {
+            "download": 10,
+            "parse": 10,
+            "write": 10,
+        }
+
+    def test_fallos_de_descarga_y_parseo(self) -> None:
+        """Un fallo en una etapa se reporta con `fail` sin detener el resto."""
+
+        def download(item: str) -> bytes | None:
+            if item == "sin_pdf":
+                return None
+            if item == "corrupto":
+                return b"corrupto"
+            return item.encode()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results, _ = _pipeline(download=download, parse_executor=executor).run(
+                ["ok1", "sin_pdf", "corrupto", "ok2"]
+            )
+
+        assert results == [
+            ("ok1", "bank_account:ok1:ok1"),
+            ("sin_pdf", "error: No se pudo descargar el PDF"),
+            ("corrupto", "error: PDF corrupto"),
+            ("ok2", "bank_account:ok2:ok2"),
+        ]
+
+    def test_un_solo_writer_en_el_thread_que_llama(self) -> None:
+        """Todas las escrituras ocurren en el thread que llamó a run()."""
+        writer_threads: set[int] = set()
+
+        def write(item: str, parsed: Any) -> tuple[str, Any]:
+            writer_threads.add(threading.get_ident())
+            return item, parsed
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            _pipeline(write=write, download_workers=8, parse_executor=executor).run(
+                [f"e{i}" for i in range(20)]
+            )
+
+        assert writer_threads == {threading.get_ident()}
+
+    def test_sin_items(self) -> None:
+        results, stats = _pipeline().run([])
+        assert results == []
+        assert stats.total_items == 0
+
+    def test_solapa_etapas_con_colas_acotadas(self) -> None:
+        """Las etapas se solapan y lo descargado sin parsear queda acotado por las colas."""
+        items = [f"estado{i}" for i in range(24)]
+        download_workers, parse_workers, queue_size = 4, 2, 2
+        lock = threading.Lock()
+        eventos: list[tuple[str, str]] = []
+        parseo_iniciado, escritura_hecha = threading.Event(), threading.Event()
+        sin_parsear = max_sin_parsear = 0
+
+        def registrar(evento: str, item: str) -> None:
+            with lock:
+                eventos.append((evento, item))
+
+        def download(item: str) -> bytes:
+            nonlocal sin_parsear, max_sin_parsear
+            if item == items[-1]:
+                # En serie ningún parseo empezaría antes de la última descarga
+                parseo_iniciado.wait(timeout=5)
+            with lock:
+                sin_parsear += 1
+                max_sin_parsear = max(max_sin_parsear, sin_parsear)
+            registrar("descarga", item)
+            return item.encode()
+
+        def parse(statement_type: str, content: bytes, source_name: str) -> str:
+            nonlocal sin_parsear
+            if source_name == items[-1]:
+                escritura_hecha.wait(timeout=5)
+            with lock:
+                sin_parsear -= 1
+            registrar("parseo", source_name)
+            parseo_iniciado.set()
+            time.sleep(0.005)  # Más lento que la descarga: las colas se llenan
+            return source_name
+
+        def write(item: str, parsed: Any) -> str:
+            registrar("escritura", item)
+            escritura_hecha.set()
+            return parsed
+
+        with ThreadPoolExecutor(max_workers=parse_workers) as executor:
+            results, stats = _pipeline(
+                download=download,
+                write=write,
+                parse_func=parse,
+                download_workers=download_workers,
+                parse_workers=parse_workers,
+                queue_size=queue_size,
+                parse_executor=executor,
+            ).run(items)
+
+        def primero(evento: str) -> int:
+            return next(i for i, (nombre, _) in enumerate(eventos) if nombre == evento)
+
+        assert results == items
+        assert primero("parseo") < eventos.index(("descarga", items[-1]))
+        assert primero("escritura") < eventos.index(("parseo", items[-1]))
+        # En la cola de parseo, bloqueados al encolar o recién sacados por un parser
+        assert max_sin_parsear <= queue_size + download_workers + parse_workers
+        assert stats.stages["download"].items == len(items)
+
+
+class TestProcessStatementsConcurrently:
+    """Tests de StatementEmailService con el pipeline."""
+
+    @staticmethod
+    def _info(i: int, statement_type: str = "bank_account") -> StatementEmailInfo:
+        return StatementEmailInfo(
+            email_id=f"email-{i}",
+            subject="Estado de cuenta",
+            sender="estadosdecuenta@baccredomatic.cr",
+            received_date=datetime(2025, 11, i + 1, tzinfo=UTC),
+            attachment_id=f"att-{i}",
+            attachment_name=f"estado_{i}.pdf",
+            attachment_size=3,
+            statement_type=statement_type,
+        )
+
+    def test_consolida_en_orden_y_guarda_metricas(self) -> None:
+        """Cada estado se parsea y consolida; las métricas quedan disponibles."""
+        service = StatementEmailService()
+        service.download_attachment_content = MagicMock(  # type: ignore[method-assign]
+            side_effect=lambda email_id, _att: (
+                None if email_id == "email-1" else io.BytesIO(b"%PDF-1.4")
+            )
+        )
+        parsed = MagicMock(transactions=[])
+        service._save_parsed_statement = MagicMock(  # type: ignore[method-assign]
+            side_effect=lambda info, result, *_: (info.email_id, result)
+        )
+        statements = [self._info(i) for i in range(3)]
+
+        with (
+            patch(
+                "finanzas_tracker.services.statement_email_service.StatementPipeline",
+                side_effect=lambda **kw: StatementPipeline(**kw, parse_func=lambda *_: parsed),
+            ),
+            ThreadPoolExecutor(max_workers=2) as executor,
+        ):
+            results = service.process_statements_concurrently(
+                statements, profile_id="p1", parse_executor=executor
+            )
+
+        assert results[0] == ("email-0", parsed)
+        assert results[1].error == "No se pudo descargar el PDF"
+        assert results[2] == ("email-2", parsed)
+        service._save_parsed_statement.assert_called_with(statements[2], parsed, "p1", None)
+        assert service.last_pipeline_stats is not None
+        assert service.last_pipeline_stats.total_items == 3
@@ -0,0 +1,216 @@
+"""Tests para la búsqueda difusa por trigramas."""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from finanzas_tracker.core.database import Base
+from finanzas_tracker.models.category import Category, Subcategory
+from finanzas_tracker.models.enums import CategoryType
+from finanzas_tracker.models.merchant import Merchant
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services import smart_categorizer
+from finanzas_tracker.services.smart_categorizer import SmartCategorizer
+from finanzas_tracker.services.text_search import match_text, ranked, strong_match
+
+
+PERFIL = "perfil-1"
+
+
+@pytest.fixture
+def db(session: Session) -> Session:
+    """Sesión de tests con el perfil de las transacciones."""
+    session.add(Profile(id=PERFIL, email_outlook="trigramas@example.com", nombre="Trigramas"))
+    session.commit()
+    return session
+
+
+def _txn(comercio: str, dia: int = 0, notas: str | None = None) -> Transaction:
+    return Transaction(
+        profile_id=PERFIL,
+        email_id=str(uuid4()),
+        banco="bac",
+        tipo_transaccion="compra",
+        comercio=comercio,
+        notas=notas,
+        monto_original=Decimal("1000"),
+        moneda_original="CRC",
+        monto_crc=Decimal("1000"),
+        fecha_transaccion=datetime(2025, 1, 1) + timedelta(days=dia),
+    )
+
+
+class TestRanking:
+    """Se filtra por contiene o similitud y se ordena por similitud."""
+
+    def test_ordena_por_similitud(self, db: Session) -> None:
+        db.add_all(
+            [
+                _txn("AUTOMERCADO ESCAZU", 1),
+                _txn("AUTO MERCADO", 2),
+                _txn("Automercado", 3),
+                _txn("SUBWAY", 4),
+            ]
+        )
+        db.commit()
+
+        stmt = ranked(select(Transaction.comercio), [Transaction.comercio], "automercado")
+
+        # similarity: 1.0, 0.67 (sin contener el texto), 0.63
+        assert db.execute(stmt).scalars().all() == [
+            "Automercado",
+            "AUTO MERCADO",
+            "AUTOMERCADO ESCAZU",
+        ]
+
+    def test_order_by_posterior_desempata(self, db: Session) -> None:
+        db.add_all([_txn("AUTOMERCADO", 1), _txn("AUTOMERCADO", 3), _txn("AUTOMERCADO", 2)])
+        db.commit()
+
+        stmt = ranked(
+            select(Transaction.fecha_transaccion), [Transaction.comercio], "automercado"
+        ).order_by(Transaction.fecha_transaccion.desc())
+
+        assert [fecha.day for fecha in db.execute(stmt).scalars()] == [4, 3, 2]
+
+    def test_comodines_son_literales(self, db: Session) -> None:
+        db.add_all(
+            [_txn("PROMO 50% OFF"), _txn("PROMO 500 OFF"), _txn("MI_TIENDA"), _txn("MIXTIENDA")]
+        )
+        db.commit()
+
+        def contiene(term: str) -> list[str]:
+            stmt = ranked(
+                select(Transaction.comercio), [Transaction.comercio], term, with_strength=True
+            )
+            return [comercio for comercio, fuerte in db.execute(stmt) if fuerte]
+
+        assert contiene("50%") == ["PROMO 50% OFF"]
+        assert contiene("i_t") == ["MI_TIENDA"]
+
+    def test_varias_columnas_y_limite(self, db: Session) -> None:
+        db.add_all([_txn("SODA", 1, notas="almuerzo con Ana"), _txn("ALMUERZOS RAPIDOS", 2)])
+        db.add(_txn("CINE", 3))
+        db.commit()
+
+        stmt = ranked(
+            select(Transaction.comercio),
+            [Transaction.comercio, Transaction.notas],
+            "almuerzo",
+            limit=1,
+        )
+
+        # La nota "almuerzo con Ana" se parece más que "ALMUERZOS RAPIDOS"
+        assert db.execute(stmt).scalars().all() == ["SODA"]
+
+    def test_sql_con_similitud(self) -> None:
+        stmt = ranked(
+            select(Transaction.id),
+            [Transaction.comercio],
+            "automercado",
+            limit=5,
+        ).order_by(Transaction.fecha_transaccion.desc())
+
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+        assert "transactions.comercio ILIKE" in sql
+        assert "transactions.comercio %% " in sql
+        assert "ORDER BY coalesce(similarity(transactions.comercio" in sql
+        assert sql.index("similarity") < sql.index("fecha_transaccion DESC")
+        assert "LIMIT" in sql
+
+    def test_varias_columnas_usa_la_mejor(self) -> None:
+        _, score = match_text([Transaction.comercio, Transaction.notas], "almuerzo")
+
+        assert str(score.compile(dialect=postgresql.dialect())).startswith("greatest(")
+
+
+class TestCoincidenciaFuerte:
+    """Sólo las coincidencias fuertes se aplican sin revisión."""
+
+    def test_uber_trip_no_es_fuerte_para_uber_eats(self, db: Session) -> None:
+        db.add_all([_txn("UBER TRIP"), _txn("UBER EATS")])
+        db.commit()
+
+        stmt = ranked(
+            select(Transaction.comercio), [Transaction.comercio], "uber eats", with_strength=True
+        )
+
+        # UBER TRIP pasa el umbral de `%` (similarity 0.33) pero no es confiable
+        assert db.execute(stmt).all() == [("UBER EATS", True), ("UBER TRIP", False)]
+
+    def test_similitud_alta_sin_contener_es_fuerte(self, db: Session) -> None:
+        db.add(_txn("AUTO MERCADO"))
+        db.commit()
+
+        condition = strong_match([Transaction.comercio], "automercado")
+
+        assert db.execute(select(condition)).scalar_one() is True
+
+    def test_sql_con_umbral(self) -> None:
+        condition = strong_match([Transaction.comercio], "uber eats")
+
+        sql = str(
+            condition.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        )
+
+        assert "ILIKE" in sql
+        assert "similarity(transactions.comercio, 'uber eats'), 0.0) >= 0.6" in sql
+
+    def test_historial_difuso_queda_para_revision(self, db: Session) -> None:
+        category = Category(tipo=CategoryType.NECESSITIES, nombre="Necesidades")
+        db.add(Subcategory(category=category, nombre="Transporte"))
+        db.flush()
+        txn = _txn("UBER TRIP")
+        txn.subcategory_id = category.subcategories[0].id
+        db.add(txn)
+        db.commit()
+
+        @contextmanager
+        def sesion() -> Iterator[Session]:
+            yield db
+
+        categorizer = SmartCategorizer()
+        with patch.object(smart_categorizer, "get_session", sesion):
+            exacto = categorizer._check_user_history("UBER TRIP", PERFIL)
+            difuso = categorizer._check_user_history("UBER EATS", PERFIL)
+
+        assert exacto is not None
+        assert (exacto.confidence, exacto.needs_review) == (95, False)
+        assert difuso is not None
+        assert (difuso.confidence, difuso.needs_review) == (60, True)
+        assert difuso.subcategory_name == "Transporte"
+
+
+class TestIndices:
+    """Índices GIN de trigramas."""
+
+    @pytest.mark.parametrize(
+        ("model", "name", "column"),
+        [
+            (Transaction, "ix_transactions_comercio_trgm", "comercio"),
+            (Transaction, "ix_transactions_beneficiario_trgm", "beneficiario"),
+            (Merchant, "ix_merchants_nombre_normalizado_trgm", "nombre_normalizado"),
+        ],
+    )
+    def test_ddl_postgres(self, model: type[Base], name: str, column: str) -> None:
+        index = next(i for i in model.__table__.indexes if i.name == name)
+
+        ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+        assert f"USING gin ({column} gin_trgm_ops)" in ddl
+
+    def test_existen_en_la_base(self, session: Session) -> None:
+        nombres = {i["name"] for i in inspect(session.connection()).get_indexes("transactions")}
+
+        assert {"ix_transactions_comercio_trgm", "ix_transactions_beneficiario_trgm"} <= nombres
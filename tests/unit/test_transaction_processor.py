@@ -356,6 +356,55 @@ class TestProcessEmails:
         assert stats["popular"] == 1
         assert stats["errores"] == 1
 
+    def test_categoriza_el_lote_completo_de_una_vez(self):
+        """Debería categorizar todas las transacciones en un solo lote."""
+        from finanzas_tracker.services.smart_categorizer import (
+            CategorizationResult,
+            CategorizationSource,
+        )
+        from finanzas_tracker.services.transaction_processor import TransactionProcessor
+
+        processor = TransactionProcessor(auto_categorize=True)
+        processor.categorizer = MagicMock()
+        processor.categorizer.categorize_many.return_value = [
+            CategorizationResult(
+                subcategory_id=f"sub-{n}",
+                subcategory_name="Supermercado",
+                category_type="necesidades",
+                confidence=90,
+                source=CategorizationSource.LLM,
+                needs_review=False,
+            )
+            for n in range(2)
+        ]
+        emails = [
+            {"from": {"emailAddress": {"address": "notificacion@notificacionesbaccr.com"}}}
+        ] * 2
+        mock_parsed = {
+            "comercio": "WALMART",
+            "monto_original": Decimal("1000.00"),
+            "moneda_original": "CRC",
+            "fecha_transaccion": datetime(2024, 1, 15),
+            "tipo_transaccion": "COMPRA",
+            "email_id": "test",
+        }
+
+        with patch.object(processor.bac_parser, "parse", side_effect=lambda _: dict(mock_parsed)):
+            with patch.object(
+                processor, "_save_transaction", return_value=(True, MagicMock())
+            ) as save:
+                stats = processor.process_emails(emails, profile_id="perfil-1")
+
+        processor.categorizer.categorize_many.assert_called_once()
+        lote = processor.categorizer.categorize_many.call_args.args[0]
+        assert [t["profile_id"] for t in lote] == ["perfil-1", "perfil-1"]
+        assert [call.args[0]["subcategory_id"] for call in save.call_args_list] == [
+            "sub-0",
+            "sub-1",
+        ]
+        assert stats["categorizadas_automaticamente"] == 2
+        assert stats["procesados"] == 2
+
 
 class TestCategorizeTransaction:
     """Tests para _categorize_transaction."""
@@ -3,14 +3,24 @@
 Prueba la gestión de ciclo de vida y estados de transacciones.
 """
 
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from unittest.mock import MagicMock
 from uuid import uuid4
 
 import pytest
-
-from finanzas_tracker.models.enums import TransactionStatus, TransactionType
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from finanzas_tracker.models.category import Category, Subcategory
+from finanzas_tracker.models.enums import CategoryType, TransactionStatus, TransactionType
+from finanzas_tracker.models.job import Job
+from finanzas_tracker.models.learning import UserMerchantPreference
+from finanzas_tracker.models.profile import Profile
+from finanzas_tracker.models.transaction import Transaction
+from finanzas_tracker.services import job_queue
+from finanzas_tracker.services.balance_ledger_service import BalanceLedgerService
 from finanzas_tracker.services.transaction_service import TransactionService
 
 
@@ -449,3 +459,180 @@ class TestAjustarMonto:
         result = service.ajustar_monto(1, Decimal("16000.00"))
 
         assert result.razon_ajuste == "Ajuste manual"
+
+
+PERFIL = "perfil-1"
+SUBCATEGORIAS = ["sub-vieja", "sub-1", "sub-2", "streaming", "musica"]
+
+
+@pytest.fixture
+def db(session: Session) -> Session:
+    """Sesión de tests con los perfiles y subcategorías que usan los lotes."""
+    session.add_all(
+        Profile(id=profile_id, email_outlook=f"{profile_id}@example.com", nombre=profile_id)
+        for profile_id in (PERFIL, "perfil-2")
+    )
+    category = Category(tipo=CategoryType.WANTS, nombre="Gustos")
+    session.add(category)
+    session.flush()
+    session.add_all(
+        Subcategory(id=sub_id, category_id=category.id, nombre=sub_id) for sub_id in SUBCATEGORIAS
+    )
+    session.commit()
+    return session
+
+
+def _txn(db: Session, comercio: str, profile_id: str = PERFIL, **kwargs: object) -> str:
+    kwargs.setdefault("fecha_transaccion", datetime(2025, 1, 1))
+    txn = Transaction(
+        profile_id=profile_id,
+        email_id=str(uuid4()),
+        banco="bac",
+        tipo_transaccion="compra",
+        comercio=comercio,
+        monto_original=Decimal("1000"),
+        moneda_original="CRC",
+        monto_crc=Decimal("1000"),
+        **kwargs,
+    )
+    db.add(txn)
+    db.commit()
+    return txn.id
+
+
+class TestActualizarBatch:
+    """Tests para actualizar_batch()."""
+
+    def test_un_update_por_forma_de_cambio(self, db: Session) -> None:
+        """Los cambios con las mismas columnas van en una sola sentencia."""
+        soda = _txn(db, "SODA", subcategory_id="sub-vieja", necesita_revision=True)
+        super_ = _txn(db, "SUPER", es_desconocida=True)
+        sinpe = _txn(db, "SINPE JUAN", necesita_reconciliacion_sinpe=True, confianza_categoria=40)
+        ajena = _txn(db, "AJENA", profile_id="perfil-2")
+        sentencias: list[str] = []
+        event.listen(
+            db.get_bind(),
+            "before_cursor_execute",
+            lambda _conn, _cursor, statement, *_args: sentencias.append(statement),
+        )
+
+        actualizadas = TransactionService(db).actualizar_batch(
+            PERFIL,
+            [
+                {"id": soda, "subcategory_id": "sub-1"},
+                {"id": super_, "subcategory_id": "sub-2", "confirmada": None},
+                {"id": sinpe, "necesita_reconciliacion_sinpe": False},
+                {"id": ajena, "subcategory_id": "sub-1"},
+                {"id": "no-existe", "confirmada": True},
+            ],
+            aprender=False,
+        )
+
+        assert actualizadas == [soda, super_, sinpe]
+        assert sum(s.startswith("UPDATE transactions") for s in sentencias) == 2
+        db.expire_all()
+        txns = {t.id: t for t in db.execute(select(Transaction)).scalars()}
+        assert txns[soda].subcategory_id == "sub-1"
+        assert (txns[soda].confianza_categoria, txns[soda].necesita_revision) == (100, False)
+        assert txns[super_].es_desconocida is False
+        assert txns[sinpe].necesita_reconciliacion_sinpe is False
+        assert txns[sinpe].confianza_categoria == 40
+        assert txns[ajena].subcategory_id is None
+
+    def test_encola_un_job_de_aprendizaje(
+        self, db: Session, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """El aprendizaje del lote es un solo job; el cache se invalida una vez."""
+        invalidate = MagicMock()
+        monkeypatch.setattr(
+            "finanzas_tracker.services.transaction_service.invalidate_profile_cache", invalidate
+        )
+        ids = [_txn(db, "NETFLIX"), _txn(db, "NETFLIX"), _txn(db, "SPOTIFY")]
+
+        TransactionService(db).actualizar_batch(
+            PERFIL,
+            [
+                {"id": ids[0], "subcategory_id": "streaming"},
+                {"id": ids[1], "subcategory_id": "streaming"},
+                {"id": ids[2], "subcategory_id": "musica", "excluir_de_presupuesto": True},
+            ],
+        )
+
+        invalidate.assert_called_once_with(PERFIL)
+        job = db.execute(select(Job)).scalar_one()
+        assert job.kind == job_queue.FEEDBACK_RECORD_BATCH
+        assert len(job.params["correcciones"]) == 3
+
+        handler = job_queue._handlers[job_queue.FEEDBACK_RECORD_BATCH]
+        assert handler(db, job, MagicMock()) == {"registradas": 3}
+        preferencias = {
+            p.merchant_pattern: (p.subcategory_id, p.times_used)
+            for p in db.execute(select(UserMerchantPreference)).scalars()
+        }
+        assert preferencias == {"NETFLIX%": ("streaming", 2), "SPOTIFY%": ("musica", 1)}
+
+    def test_excluir_recalcula_el_libro(self, db: Session) -> None:
+        """Excluir de presupuesto por lote actualiza el patrimonio del libro."""
+        vieja = _txn(db, "SODA")
+        _txn(db, "SUPER", fecha_transaccion=datetime(2025, 3, 1))
+        service = BalanceLedgerService(db)
+        service.rebuild(PERFIL)
+        db.commit()
+        assert service.totales_en(PERFIL, date(2025, 12, 31)).neto_crc == Decimal("-2000")
+
+        TransactionService(db).actualizar_batch(
+            PERFIL, [{"id": vieja, "excluir_de_presupuesto": True}], aprender=False
+        )
+
+        assert service.totales_en(PERFIL, date(2025, 2, 1)).neto_crc == 0
+        assert service.totales_en(PERFIL, date(2025, 12, 31)).neto_crc == Decimal("-1000")
+
+    def test_subcategoria_inexistente_se_omite(self, db: Session) -> None:
+        """Las subcategorías se validan con una consulta; las filas inválidas no se escriben."""
+        buena = _txn(db, "SODA")
+        mala = _txn(db, "SUPER", necesita_revision=True)
+
+        actualizadas = TransactionService(db).actualizar_batch(
+            PERFIL,
+            [
+                {"id": buena, "subcategory_id": "sub-1"},
+                {"id": mala, "subcategory_id": "no-existe", "necesita_revision": False},
+            ],
+            aprender=False,
+        )
+
+        assert actualizadas == [buena]
+        db.expire_all()
+        assert db.get(Transaction, buena).subcategory_id == "sub-1"
+        txn = db.get(Transaction, mala)
+        assert (txn.subcategory_id, txn.necesita_revision) == (None, True)
+
+    def test_sin_cambios_no_escribe(self, db: Session) -> None:
+        """Nada que actualizar: ni commit ni job."""
+        txn_id = _txn(db, "SODA")
+
+        assert TransactionService(db).actualizar_batch(PERFIL, [{"id": txn_id}]) == []
+        assert db.execute(select(Job)).first() is None
+
+    def test_columnas_no_permitidas(self, service: TransactionService) -> None:
+        """Solo subcategoría y flags."""
+        with pytest.raises(ValueError, match="monto_crc"):
+            service.actualizar_batch(PERFIL, [{"id": "a", "monto_crc": 1}])
+
+    def test_postgres_usa_values(self, mock_db: MagicMock, service: TransactionService) -> None:
+        """El lote se escribe con UPDATE ... FROM (VALUES ...)."""
+        # Transacciones del perfil y subcategorías existentes
+        mock_db.execute.return_value.scalars.side_effect = [["a", "b"], ["s1", "s2"]]
+
+        service.actualizar_batch(
+            PERFIL,
+            [{"id": "a", "subcategory_id": "s1"}, {"id": "b", "subcategory_id": "s2"}],
+            aprender=False,
+        )
+
+        stmt = mock_db.execute.call_args_list[2].args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "FROM (VALUES" in sql
+        assert "transactions.profile_id = " in sql
+        assert "confianza_categoria=%(confianza_categoria)s" in sql
+        mock_db.commit.assert_called_once()